@@ -4,9 +4,15 @@ Improved speaker alignment algorithm with lower threshold and fallback strategie
 Reduces "Unknown" speaker labels from 8.4% to <2%.
 """
 
+import sys
+from pathlib import Path
 from typing import List, Dict, Optional
 import time
 
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from speaker_alignment import match_speakers
+
 
 def align_speakers_with_segments_improved(
     segments: List[Dict],
@@ -23,6 +29,9 @@ def align_speakers_with_segments_improved(
     2. Nearest neighbor fallback for no-overlap cases
     3. Better handling of segments at recording boundaries
 
+    Matching runs as a sweep over sorted turns (src/speaker_alignment.py)
+    rather than comparing every segment with every turn.
+
     Args:
         segments: Whisper transcription segments with start/end/text
         turns: Pyannote speaker turns with start/end/speaker
@@ -46,82 +55,44 @@ def align_speakers_with_segments_improved(
     threshold_misses = 0
     fallback_assignments = 0
 
-    for seg_idx, seg in enumerate(segments):
+    matches = match_speakers(
+        segments, turns, overlap_threshold,
+        fallback_distance=5.0 if use_nearest_fallback else None  # nearest speaker within 5 seconds
+    )
+
+    for seg_idx, (seg, match) in enumerate(zip(segments, matches)):
         seg_start, seg_end = seg["start"], seg["end"]
         seg_duration = seg_end - seg_start
+        best_speaker = match.speaker
+        best_overlap_ratio = match.overlap_ratio
 
-        # Find speaker with maximum overlap
-        best_speaker = "UNKNOWN"
-        best_overlap = 0
-        best_overlap_ratio = 0
-
-        # Track all overlaps for debugging
-        overlaps = []
-
-        for turn in turns:
-            # Calculate overlap: max(0, min(end1, end2) - max(start1, start2))
-            overlap_start = max(seg_start, turn["start"])
-            overlap_end = min(seg_end, turn["end"])
-            overlap = max(0, overlap_end - overlap_start)
-
-            if overlap > 0:
-                overlap_ratio = overlap / seg_duration if seg_duration > 0 else 0
-                overlaps.append({
-                    "speaker": turn["speaker"],
-                    "overlap": overlap,
-                    "ratio": overlap_ratio
-                })
-
-                if overlap > best_overlap:
-                    best_overlap = overlap
-                    best_overlap_ratio = overlap_ratio
-                    best_speaker = turn["speaker"]
-
-        # Check if best overlap meets threshold
+        # Below the threshold the nearest-turn fallback decides (if enabled)
         if seg_duration > 0 and best_overlap_ratio < overlap_threshold:
             threshold_misses += 1
 
-            # Try fallback strategies
-            if use_nearest_fallback and best_overlap_ratio < overlap_threshold:
-                # Find nearest speaker turn
-                min_distance = float('inf')
-                nearest_speaker = None
-
-                for turn in turns:
-                    # Distance to nearest edge of turn
-                    # Consider both start and end distances
-                    dist_to_start = abs(seg_start - turn["end"])
-                    dist_to_end = abs(seg_end - turn["start"])
-                    distance = min(dist_to_start, dist_to_end)
-
-                    # Also check if segment is completely within a gap before/after turn
-                    if seg_end <= turn["start"]:
-                        distance = turn["start"] - seg_end
-                    elif seg_start >= turn["end"]:
-                        distance = seg_start - turn["end"]
-
-                    if distance < min_distance:
-                        min_distance = distance
-                        nearest_speaker = turn["speaker"]
-
-                # Use nearest speaker if within reasonable distance (5 seconds)
-                if nearest_speaker and min_distance < 5.0:
-                    best_speaker = nearest_speaker
-                    fallback_assignments += 1
-
-                    if debug and seg_idx < 5:  # Debug first few segments
-                        debug_log("FALLBACK",
-                                 f"Segment {seg_idx}: Assigned {nearest_speaker} "
-                                 f"(distance: {min_distance:.2f}s)")
-                else:
-                    best_speaker = "UNKNOWN"
-                    unknown_count += 1
+            if match.fallback:
+                fallback_assignments += 1
+
+                if debug and seg_idx < 5:  # Debug first few segments
+                    debug_log("FALLBACK",
+                             f"Segment {seg_idx}: Assigned {best_speaker} "
+                             f"(distance: {match.distance:.2f}s)")
             else:
-                best_speaker = "UNKNOWN"
                 unknown_count += 1
 
         # Log detailed debug info for first few unknown segments
         if best_speaker == "UNKNOWN" and unknown_count <= 3 and debug:
+            # All overlaps, for the few segments logged
+            overlaps = []
+            for turn in turns:
+                overlap = max(0, min(seg_end, turn["end"]) - max(seg_start, turn["start"]))
+                if overlap > 0:
+                    overlaps.append({
+                        "speaker": turn["speaker"],
+                        "overlap": overlap,
+                        "ratio": overlap / seg_duration if seg_duration > 0 else 0
+                    })
+
             debug_log("UNKNOWN",
                      f"Segment {seg_idx} [{seg_start:.1f}s-{seg_end:.1f}s]: "
                      f"\"{seg['text'][:50]}...\"")
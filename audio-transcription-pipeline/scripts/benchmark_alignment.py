@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Speaker Alignment Benchmark
+===========================
+
+Wall time of speaker alignment on synthetic sessions (default 1k/10k/100k
+Whisper segments, with about half as many pyannote turns), comparing
+
+- nested: the original loop over every segment x every turn
+- sweep: speaker_alignment.match_speakers
+- numpy: speaker_alignment.match_speakers_numpy
+
+All three use the 30% threshold and 5s nearest-turn fallback of
+PipelineService and improved_alignment.py. Past --nested-limit segments
+the nested loop is timed on a sample of segments and extrapolated (marked
+"est."). Sweep and numpy assignments are checked against each other, and
+against the nested loop whenever it runs in full.
+
+Usage:
+    python scripts/benchmark_alignment.py
+    python scripts/benchmark_alignment.py --segments 1000 10000 100000 --json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np  # noqa: F401 - imported up front so numpy timings exclude the import
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from speaker_alignment import UNKNOWN_SPEAKER, match_speakers, match_speakers_numpy
+
+THRESHOLD = 0.3
+FALLBACK_DISTANCE = 5.0
+
+
+def make_session(n_segments: int, seed: int = 0):
+    """Back-to-back segments of 1-6s with short pauses; turns alternate over the same timeline"""
+    rng = random.Random(seed)
+    segments, cursor = [], 0.0
+    for _ in range(n_segments):
+        length = rng.uniform(1.0, 6.0)
+        segments.append({"start": cursor, "end": cursor + length, "text": "..."})
+        cursor += length + rng.uniform(0.0, 1.2)
+
+    turns, cursor, speaker = [], 0.0, 0
+    while cursor < segments[-1]["end"]:
+        length = rng.uniform(2.0, 14.0)
+        turns.append({"start": cursor, "end": cursor + length, "speaker": f"SPEAKER_{speaker:02d}"})
+        cursor += length + rng.uniform(-0.3, 1.5)  # slight overlaps and gaps between turns
+        speaker = 1 - speaker if rng.random() < 0.8 else speaker
+    return segments, turns
+
+
+def nested_loop(segments, turns):
+    """The original 30% + nearest-turn aligner, speakers only"""
+    speakers = []
+    for seg in segments:
+        seg_start, seg_end = seg["start"], seg["end"]
+        seg_duration = seg_end - seg_start
+        best_speaker, best_overlap, best_ratio = "UNKNOWN", 0, 0
+        for turn in turns:
+            overlap = max(0, min(seg_end, turn["end"]) - max(seg_start, turn["start"]))
+            if overlap > best_overlap:
+                best_overlap, best_ratio, best_speaker = overlap, overlap / seg_duration, turn["speaker"]
+        if seg_duration > 0 and best_ratio < THRESHOLD:
+            best_speaker, min_distance, nearest = "UNKNOWN", float("inf"), None
+            for turn in turns:
+                distance = min(abs(seg_start - turn["end"]), abs(seg_end - turn["start"]))
+                if seg_end <= turn["start"]:
+                    distance = turn["start"] - seg_end
+                elif seg_start >= turn["end"]:
+                    distance = seg_start - turn["end"]
+                if distance < min_distance:
+                    min_distance, nearest = distance, turn["speaker"]
+            if nearest and min_distance < FALLBACK_DISTANCE:
+                best_speaker = nearest
+        speakers.append(best_speaker)
+    return speakers
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run(n_segments: int, nested_limit: int) -> dict:
+    segments, turns = make_session(n_segments)
+    row = {"segments": n_segments, "turns": len(turns)}
+
+    matches, row["sweep_seconds"] = timed(match_speakers, segments, turns, THRESHOLD, FALLBACK_DISTANCE)
+    arrays, row["numpy_seconds"] = timed(match_speakers_numpy, segments, turns, THRESHOLD, FALLBACK_DISTANCE)
+    sweep_speakers = [m.speaker for m in matches]
+    numpy_speakers = [turns[i]["speaker"] if i >= 0 else UNKNOWN_SPEAKER for i in arrays["turn"]]
+    row["numpy_matches_sweep"] = numpy_speakers == sweep_speakers
+
+    if n_segments <= nested_limit:
+        nested, row["nested_seconds"] = timed(nested_loop, segments, turns)
+        row["nested_estimated"] = False
+        row["sweep_matches_nested"] = nested == sweep_speakers
+    else:
+        step = n_segments // nested_limit
+        sample = segments[::step]
+        nested, elapsed = timed(nested_loop, sample, turns)
+        row["nested_seconds"] = elapsed * n_segments / len(sample)
+        row["nested_estimated"] = True
+        row["sweep_matches_nested"] = nested == sweep_speakers[::step]
+
+    row["unknown"] = sweep_speakers.count(UNKNOWN_SPEAKER)
+    row["fallback"] = sum(m.fallback for m in matches)
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark nested-loop vs sweep speaker alignment")
+    parser.add_argument("--segments", type=int, nargs="+", default=[1000, 10000, 100000], help="Session sizes")
+    parser.add_argument("--nested-limit", type=int, default=2000,
+                        help="Largest size the nested loop runs in full (sampled above)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [run(n, args.nested_limit) for n in args.segments]
+
+    if args.json:
+        print(json.dumps({"threshold": THRESHOLD, "fallback_distance": FALLBACK_DISTANCE, "results": results},
+                         indent=2))
+        return
+
+    print(f"\nSpeaker alignment ({THRESHOLD:.0%} threshold, {FALLBACK_DISTANCE:g}s nearest-turn fallback)")
+    print(f"{'segments':>9} {'turns':>7} {'nested s':>13} {'sweep s':>9} {'numpy s':>9} {'speedup':>9} "
+          f"{'identical':>10}")
+    for row in results:
+        nested = f"{row['nested_seconds']:.2f}" + (" est." if row["nested_estimated"] else "")
+        identical = row["sweep_matches_nested"] and row["numpy_matches_sweep"]
+        print(f"{row['segments']:>9} {row['turns']:>7} {nested:>13} {row['sweep_seconds']:>9.3f} "
+              f"{row['numpy_seconds']:>9.3f} {row['nested_seconds'] / row['sweep_seconds']:>8.0f}x "
+              f"{str(identical):>10}")
+
+
+if __name__ == "__main__":
+    main()
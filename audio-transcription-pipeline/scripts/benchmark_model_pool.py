@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Diarization Model Pool Benchmark
+================================
+
+Per-job diarization latency for short clips, comparing
+
+- per-job: a new SpeakerDiarizer for every job, as PipelineService did
+  before the pool (Pipeline.from_pretrained plus torch patches each time)
+- pooled: one ModelPool, warmed at startup, with each job borrowing the model
+
+Jobs run one after another on CPU (CUDA hidden) by default. The first
+pooled job is warm because the pool is loaded at startup; the startup load
+is reported separately.
+
+Requires torch, pyannote.audio and HF_TOKEN (or HUGGINGFACE_TOKEN).
+
+Usage:
+    python scripts/benchmark_model_pool.py
+    python scripts/benchmark_model_pool.py --audio clip.wav --jobs 10 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "ui-web" / "backend"
+sys.path.insert(0, str(SRC_DIR))
+sys.path.insert(0, str(BACKEND_DIR))
+
+SAMPLE_RATE = 16000
+
+
+def make_clip(path: Path, seconds: float = 60.0) -> None:
+    """Two alternating 'speakers' (different pitch and timbre) with short pauses"""
+    rng = np.random.default_rng(11)
+    pieces, speaker = [], 0
+    while sum(len(p) for p in pieces) < seconds * SAMPLE_RATE:
+        t = np.arange(int(rng.uniform(2.0, 5.0) * SAMPLE_RATE)) / SAMPLE_RATE
+        base = (120, 210)[speaker]
+        voiced = sum(np.sin(2 * np.pi * base * k * t) / k for k in range(1, 6))
+        envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)
+        pieces += [3000 * envelope * voiced + rng.normal(0, 30, len(t)), np.zeros(int(0.4 * SAMPLE_RATE))]
+        speaker = 1 - speaker
+    pcm = np.concatenate(pieces)[:int(seconds * SAMPLE_RATE)]
+
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(SAMPLE_RATE)
+        out.writeframes(np.clip(pcm, -32768, 32767).astype("<i2").tobytes())
+
+
+def run_jobs(service, audio_path: str, jobs: int, pooled: bool) -> list:
+    """Wall time of each job's diarization, model acquisition included"""
+    from performance_logger import PerformanceLogger
+
+    timings = []
+    for _ in range(jobs):
+        perf_logger = PerformanceLogger(enable_gpu_monitoring=False, verbose=False)
+        start = time.perf_counter()
+        if pooled:
+            service._diarize(audio_path, perf_logger)
+        else:
+            # The pre-pool path: load a fresh model for this job, then diarize
+            diarizer = service._load_diarizer()
+            diarizer.logger = perf_logger
+            diarizer.diarize(audio_path)
+            del diarizer
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings: list) -> dict:
+    return {
+        "jobs": len(timings),
+        "mean_seconds": round(statistics.mean(timings), 2),
+        "median_seconds": round(statistics.median(timings), 2),
+        "min_seconds": round(min(timings), 2),
+        "max_seconds": round(max(timings), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-job vs pooled diarization model loading")
+    parser.add_argument("--audio", default=None, help="Clip to diarize (default: synthetic 1-minute WAV)")
+    parser.add_argument("--jobs", type=int, default=5, help="Jobs per variant")
+    parser.add_argument("--gpu", action="store_true", help="Allow CUDA (default: CPU only)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if not args.gpu:
+        os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+    from app.services.pipeline_service import PipelineService
+
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_path = args.audio
+        if audio_path is None:
+            audio_path = str(Path(tmp) / "clip_1min.wav")
+            make_clip(Path(audio_path))
+
+        service = PipelineService(pipeline_path=SRC_DIR / "pipeline.py", results_dir=Path(tmp) / "results")
+        try:
+            before = run_jobs(service, audio_path, args.jobs, pooled=False)
+
+            start = time.perf_counter()
+            service.diarizer_pool.warm()
+            startup_load = time.perf_counter() - start
+            after = run_jobs(service, audio_path, args.jobs, pooled=True)
+        finally:
+            service.shutdown()
+
+    results = {
+        "audio": args.audio or "synthetic 60s WAV",
+        "device": "cuda-allowed" if args.gpu else "cpu",
+        "per_job": summarize(before),
+        "pooled": {**summarize(after), "startup_load_seconds": round(startup_load, 2)},
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"\nDiarization latency per job ({results['audio']}, {results['device']}, {args.jobs} jobs)")
+    print(f"{'variant':>10} {'mean s':>8} {'median s':>9} {'min s':>7} {'max s':>7}")
+    for variant in ("per_job", "pooled"):
+        stats = results[variant]
+        print(f"{variant:>10} {stats['mean_seconds']:>8.2f} {stats['median_seconds']:>9.2f} "
+              f"{stats['min_seconds']:>7.2f} {stats['max_seconds']:>7.2f}")
+    print(f"Pool warm-up at startup (paid once): {startup_load:.2f}s")
+    print(f"Speedup per job: {statistics.mean(before) / statistics.mean(after):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Audio Preprocessing Benchmark
+=============================
+
+Peak RSS and wall time of audio preprocessing on synthetic session audio
+(default 10/30/60/120 minutes, 44.1kHz 16-bit mono WAV with leading and
+trailing silence), comparing
+
+- pydub: the original load-everything chain (AudioSegment.from_file, reverse()
+  for trailing silence, normalize, set_channels, set_frame_rate, export)
+- streaming: AudioPreprocessor.preprocess over audio_stream (block-wise scan,
+  then one streaming ffmpeg encode)
+
+Each run happens in a fresh interpreter, so peak RSS is that run's alone.
+"Python RSS" is the preprocessing process itself. "ffmpeg RSS" is the
+largest ffmpeg child it started. A forked child counts the parent's pages
+until exec, so for pydub this column repeats the parent's peak.
+
+Usage:
+    python scripts/benchmark_preprocessing.py
+    python scripts/benchmark_preprocessing.py --minutes 10 30 60 120 --channels 1 --json
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+SAMPLE_RATE = 44100
+LEADING_SILENCE = 4.0
+TRAILING_SILENCE = 6.0
+
+
+def make_session_wav(path: Path, minutes: float, channels: int, block_seconds: float = 10.0) -> None:
+    """Speech-like bursts and pauses over a noise floor, written block by block"""
+    rng = np.random.default_rng(42)
+    total = int(minutes * 60 * SAMPLE_RATE)
+    lead, trail = int(LEADING_SILENCE * SAMPLE_RATE), int(TRAILING_SILENCE * SAMPLE_RATE)
+    block = int(block_seconds * SAMPLE_RATE)
+
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(channels)
+        out.setsampwidth(2)
+        out.setframerate(SAMPLE_RATE)
+
+        written = 0
+        while written < total:
+            n = min(block, total - written)
+            t = (written + np.arange(n)) / SAMPLE_RATE
+            envelope = np.clip(np.sin(2 * np.pi * 0.23 * t) * np.sin(2 * np.pi * 0.071 * t) * 2, 0, 1)
+            signal = envelope * 6000 * np.sin(2 * np.pi * (180 + 40 * np.sin(2 * np.pi * 3 * t)) * t)
+            signal += rng.normal(0, 40, n)
+            index = written + np.arange(n)
+            signal[(index < lead) | (index >= total - trail)] = 0
+            frames = np.repeat(signal[:, None], channels, axis=1)
+            out.writeframes(np.clip(frames, -32768, 32767).astype("<i2").tobytes())
+            written += n
+
+
+def preprocess_pydub(audio_path: str, output_path: str) -> str:
+    """The original AudioPreprocessor.preprocess body (pydub, whole file in memory)"""
+    from pydub import AudioSegment, effects
+    from pydub.silence import detect_leading_silence
+
+    audio = AudioSegment.from_file(audio_path)
+    start_trim = detect_leading_silence(audio, silence_threshold=-40)
+    end_trim = detect_leading_silence(audio.reverse(), silence_threshold=-40)
+    audio = audio[start_trim:len(audio) - end_trim]
+    audio = effects.normalize(audio, headroom=0.1)
+    audio = audio.set_channels(1)
+    audio = audio.set_frame_rate(16000)
+    audio.export(output_path, format="mp3", bitrate="64k", parameters=["-ac", "1"])
+    return output_path
+
+
+def preprocess_streaming(audio_path: str, output_path: str) -> str:
+    from pipeline import AudioPreprocessor
+
+    return AudioPreprocessor(max_file_size_mb=10_000).preprocess(audio_path, output_path)
+
+
+def run_one(variant: str, audio_path: str, output_path: str) -> None:
+    """Child mode: run one variant and print its measurements as JSON"""
+    import contextlib
+    import io
+
+    fn = {"pydub": preprocess_pydub, "streaming": preprocess_streaming}[variant]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(audio_path, output_path)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "wall_seconds": round(elapsed, 2),
+        # ru_maxrss is KB on Linux
+        "python_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "ffmpeg_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        "output_mb": round(os.path.getsize(output_path) / (1024 * 1024), 2),
+    }))
+
+
+def measure(variant: str, audio_path: Path, workdir: Path) -> dict:
+    output = workdir / f"{audio_path.stem}_{variant}.mp3"
+    result = subprocess.run(
+        [sys.executable, __file__, "--run", variant, str(audio_path), str(output)],
+        capture_output=True, text=True
+    )
+    if output.exists():
+        output.unlink()
+    if result.returncode != 0:
+        killed = result.returncode < 0 or "MemoryError" in result.stderr
+        return {"error": "out of memory" if killed else result.stderr.strip().splitlines()[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pydub vs streaming audio preprocessing")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 30, 60, 120], help="Session lengths")
+    parser.add_argument("--channels", type=int, default=1, help="Channels in the synthetic source")
+    parser.add_argument("--variants", nargs="+", default=["pydub", "streaming"], choices=["pydub", "streaming"])
+    parser.add_argument("--workdir", default=None, help="Where to write synthetic audio (default: temp dir)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--run", nargs=3, metavar=("VARIANT", "INPUT", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_one(*args.run)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmp:
+        workdir = Path(tmp)
+        for minutes in args.minutes:
+            source = workdir / f"session_{minutes:g}min.wav"
+            make_session_wav(source, minutes, args.channels)
+            row = {"minutes": minutes, "source_mb": round(source.stat().st_size / (1024 * 1024), 1)}
+            for variant in args.variants:
+                row[variant] = measure(variant, source, workdir)
+            source.unlink()
+            results.append(row)
+
+            if not args.json:
+                print(f"  {minutes:g} min done", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps({"channels": args.channels, "sample_rate": SAMPLE_RATE, "results": results}, indent=2))
+        return
+
+    print(f"\nSynthetic sessions: {SAMPLE_RATE}Hz, {args.channels}ch, 16-bit WAV -> 16kHz mono 64k MP3")
+    print(f"{'minutes':>8} {'source MB':>10} {'variant':>10} {'wall s':>8} {'python RSS MB':>14} "
+          f"{'ffmpeg RSS MB':>14}")
+    for row in results:
+        for variant in args.variants:
+            stats = row[variant]
+            if "error" in stats:
+                print(f"{row['minutes']:>8g} {row['source_mb']:>10.1f} {variant:>10} {stats['error']:>38}")
+                continue
+            print(f"{row['minutes']:>8g} {row['source_mb']:>10.1f} {variant:>10} {stats['wall_seconds']:>8.1f} "
+                  f"{stats['python_rss_mb']:>14.1f} {stats['ffmpeg_rss_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
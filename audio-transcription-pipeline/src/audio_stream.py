@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Streaming Audio Preprocessing
+=============================
+
+Constant-memory building blocks for AudioPreprocessor. The pydub version
+decoded the whole recording into memory and then made more full copies to
+reverse, trim, normalize and resample it. Here the work is done in two passes
+over an ffmpeg decode pipe:
+
+1. Scan pass: the source is decoded to 16-bit PCM and read in fixed-size
+   blocks. Each block is cut into 10ms windows. These give the leading and
+   trailing silence (the same RMS-below-threshold test as pydub's
+   detect_leading_silence) and the peak sample inside the kept span.
+2. Encode pass: a single ffmpeg run trims, applies the peak-normalization
+   gain, downmixes to mono, resamples and encodes, frame by frame.
+
+Neither pass holds more than one block of PCM, so memory stays flat as the
+session gets longer. find_silences and export_clip use the same decode for
+ChunkedWhisperTranscriber's cut points and chunk uploads.
+"""
+
+import json
+import math
+import os
+import re
+import subprocess
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFPROBE_BINARY = os.getenv("FFPROBE_BINARY", "ffprobe")
+
+SAMPLE_WIDTH = 2  # Scan pass decodes to signed 16-bit PCM
+MAX_AMPLITUDE = 1 << (8 * SAMPLE_WIDTH - 1)
+
+
+@dataclass
+class AudioScan:
+    """Result of the scan pass (all positions in source frames)"""
+    sample_rate: int
+    channels: int
+    total_frames: int
+    start_frame: int
+    end_frame: int
+    peak: int
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.total_frames / self.sample_rate
+
+    @property
+    def trimmed_seconds(self) -> float:
+        return (self.total_frames - (self.end_frame - self.start_frame)) / self.sample_rate
+
+    @property
+    def is_silent(self) -> bool:
+        return self.end_frame <= self.start_frame
+
+
+def probe_audio(audio_path: str) -> Dict:
+    """
+    Read sample rate, channel count and duration from the container headers.
+
+    Uses ffprobe, or falls back to the stream line in `ffmpeg -i` output when
+    ffprobe is not installed. The audio itself is never decoded.
+    """
+    try:
+        result = subprocess.run(
+            [FFPROBE_BINARY, "-v", "error", "-select_streams", "a:0",
+             "-show_entries", "stream=sample_rate,channels:format=duration",
+             "-of", "json", audio_path],
+            capture_output=True, text=True
+        )
+    except FileNotFoundError:
+        return _probe_with_ffmpeg(audio_path)
+
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {audio_path}: {result.stderr.strip()}")
+
+    info = json.loads(result.stdout or "{}")
+    streams = info.get("streams") or []
+    if not streams:
+        raise RuntimeError(f"No audio stream found in {audio_path}")
+
+    duration = info.get("format", {}).get("duration")
+    return {
+        "sample_rate": int(streams[0]["sample_rate"]),
+        "channels": int(streams[0]["channels"]),
+        "duration_seconds": float(duration) if duration not in (None, "N/A") else None,
+    }
+
+
+def _probe_with_ffmpeg(audio_path: str) -> Dict:
+    """Parse `ffmpeg -i` stderr, e.g. 'Audio: mp3, 44100 Hz, stereo, fltp, 128 kb/s'"""
+    result = subprocess.run(
+        [FFMPEG_BINARY, "-hide_banner", "-nostdin", "-i", audio_path],
+        capture_output=True, text=True
+    )
+    stream = re.search(r"Audio: [^\n]*?(\d+) Hz, ([^,\n]+)", result.stderr)
+    if not stream:
+        raise RuntimeError(f"No audio stream found in {audio_path}: {result.stderr.strip()[-500:]}")
+
+    layout = stream.group(2).strip()
+    counted = re.match(r"(\d+) channels", layout)
+    if layout == "mono":
+        channels = 1
+    elif counted:
+        channels = int(counted.group(1))
+    else:
+        # stereo, and layouts like 5.1 that the scan pass downmixes to stereo
+        channels = 2
+
+    duration = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    duration_seconds = None
+    if duration:
+        hours, minutes, seconds = duration.groups()
+        duration_seconds = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    return {"sample_rate": int(stream.group(1)), "channels": channels, "duration_seconds": duration_seconds}
+
+
+def iter_window_levels(audio_path: str,
+                       sample_rate: int,
+                       channels: int,
+                       chunk_ms: int = 10,
+                       block_seconds: float = 10.0) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Decode through an ffmpeg pipe and yield (frames, mean_square, peak) per block.
+
+    mean_square and peak hold one value per chunk_ms window. A block holds
+    whole windows, and the last block can end in a partial window. Only one
+    block of block_seconds of PCM is in memory at a time.
+    """
+    window = max(1, sample_rate * chunk_ms // 1000)
+    block_frames = window * max(1, int(block_seconds * 1000 // chunk_ms))
+    block_bytes = block_frames * channels * SAMPLE_WIDTH
+
+    process = subprocess.Popen(
+        [FFMPEG_BINARY, "-v", "error", "-nostdin", "-i", audio_path, "-vn",
+         "-ac", str(channels), "-f", "s16le", "-acodec", "pcm_s16le", "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+
+            samples = np.frombuffer(data, dtype="<i2")
+            frames = len(samples) // channels
+            samples = samples[:frames * channels]
+
+            # Whole windows, plus the final partial window at the end of the stream
+            full = frames // window
+            parts = [samples[:full * window * channels].reshape(full, window * channels)] if full else []
+            if frames % window:
+                parts.append(samples[full * window * channels:].reshape(1, -1))
+
+            power: List[np.ndarray] = []
+            peaks: List[np.ndarray] = []
+            for part in parts:
+                wide = part.astype(np.int32)
+                power.append(np.mean(wide * wide, axis=1))
+                peaks.append(np.max(np.abs(wide), axis=1))
+
+            yield frames, np.concatenate(power), np.concatenate(peaks)
+
+        stderr = process.stderr.read()
+        process.wait()
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to decode {audio_path}: {stderr.decode(errors='replace').strip()}")
+
+
+def silent_power(silence_threshold: float) -> float:
+    """Mean square below which a window is silent: (MAX_AMPLITUDE * 10^(dB/20))^2"""
+    return (MAX_AMPLITUDE * 10 ** (silence_threshold / 20.0)) ** 2
+
+
+def scan_audio(audio_path: str,
+               silence_threshold: float = -40.0,
+               chunk_ms: int = 10,
+               block_seconds: float = 10.0,
+               probe: Optional[Dict] = None) -> AudioScan:
+    """
+    First pass: find leading/trailing silence and the peak of the kept audio.
+
+    Windows are chunk_ms long and a window is silent when its RMS is below
+    silence_threshold dBFS, as in pydub. Trailing windows are aligned from the
+    start of the file, not from the end, so the end trim can differ from
+    pydub's by less than one window. The peak of windows after the last loud
+    one is kept separately, and it is folded into the result only if a later
+    loud window shows those windows are inside the kept span.
+    """
+    probe = probe or probe_audio(audio_path)
+    sample_rate, channels = probe["sample_rate"], probe["channels"]
+    window = max(1, sample_rate * chunk_ms // 1000)
+    threshold = silent_power(silence_threshold)
+
+    total_frames = 0
+    first_loud = None     # first loud window index
+    last_loud = None      # last loud window index
+    peak = 0              # peak over [first_loud, last_loud]
+    pending_peak = 0      # peak of windows after last_loud
+
+    for frames, power, peaks in iter_window_levels(audio_path, sample_rate, channels, chunk_ms, block_seconds):
+        base_window = total_frames // window
+        total_frames += frames
+
+        loud = np.flatnonzero(power >= threshold)
+        if len(loud):
+            start = loud[0] if first_loud is None else 0
+            if first_loud is None:
+                first_loud = base_window + int(loud[0])
+            peak = max(peak, pending_peak, int(peaks[start:loud[-1] + 1].max()))
+            last_loud = base_window + int(loud[-1])
+            tail = peaks[loud[-1] + 1:]
+            pending_peak = int(tail.max()) if len(tail) else 0
+        elif first_loud is not None:
+            pending_peak = max(pending_peak, int(peaks.max()))
+
+    if first_loud is None:
+        start_frame = end_frame = total_frames
+    else:
+        start_frame = first_loud * window
+        end_frame = min(total_frames, (last_loud + 1) * window)
+
+    return AudioScan(
+        sample_rate=sample_rate,
+        channels=channels,
+        total_frames=total_frames,
+        start_frame=start_frame,
+        end_frame=end_frame,
+        peak=peak,
+    )
+
+
+def find_silences(audio_path: str,
+                  silence_threshold: float = -40.0,
+                  min_silence_ms: int = 300,
+                  chunk_ms: int = 10,
+                  block_seconds: float = 10.0,
+                  probe: Optional[Dict] = None) -> Tuple[float, List[Tuple[float, float]]]:
+    """
+    Stream the audio once and return (duration_seconds, silences).
+
+    silences is a list of (start, end) seconds for runs of silent windows at
+    least min_silence_ms long. Runs that cross block boundaries are joined.
+    """
+    probe = probe or probe_audio(audio_path)
+    sample_rate, channels = probe["sample_rate"], probe["channels"]
+    window = max(1, sample_rate * chunk_ms // 1000)
+    threshold = silent_power(silence_threshold)
+    min_windows = max(1, min_silence_ms // chunk_ms)
+
+    silences: List[Tuple[float, float]] = []
+    total_frames = 0
+    run_start = None  # first window of the current silent run
+
+    for frames, power, _ in iter_window_levels(audio_path, sample_rate, channels, chunk_ms, block_seconds):
+        base_window = total_frames // window
+        total_frames += frames
+
+        # Edges of silent runs inside this block: +1 where a run starts, -1 past its end
+        silent = (power < threshold).astype(np.int8)
+        edges = np.diff(np.concatenate(([1 if run_start is not None else 0], silent, [0])))
+        starts = list(np.flatnonzero(edges == 1))
+        ends = np.flatnonzero(edges == -1)
+        if run_start is not None:
+            starts.insert(0, run_start - base_window)
+        still_silent = bool(silent[-1]) if len(silent) else run_start is not None
+        if still_silent:
+            run_start = base_window + int(starts.pop())
+            ends = ends[:-1]
+        else:
+            run_start = None
+
+        for first, last in zip(starts, ends):
+            if last - first >= min_windows:
+                silences.append(((base_window + first) * window / sample_rate,
+                                 (base_window + last) * window / sample_rate))
+
+    duration = total_frames / sample_rate
+    if run_start is not None and (total_frames / window) - run_start >= min_windows:
+        silences.append((run_start * window / sample_rate, duration))
+
+    return duration, silences
+
+
+def normalization_gain_db(peak: int, headroom: float = 0.1) -> float:
+    """Gain that brings the peak to -headroom dBFS (pydub effects.normalize)"""
+    if peak <= 0:
+        return 0.0
+    target_peak = MAX_AMPLITUDE * 10 ** (-headroom / 20.0)
+    return 20 * math.log10(target_peak / peak)
+
+
+def encode_audio(audio_path: str,
+                 output_path: str,
+                 scan: AudioScan,
+                 gain_db: float = 0.0,
+                 target_sample_rate: int = 16000,
+                 target_format: str = "mp3",
+                 bitrate: Optional[str] = "64k") -> str:
+    """
+    Second pass: trim, gain, downmix, resample and encode in one streaming ffmpeg run.
+
+    The trim uses source sample positions from the scan, so both passes cut at
+    the same frames.
+    """
+    filters = [f"atrim=start_sample={scan.start_frame}:end_sample={scan.end_frame}", "asetpts=PTS-STARTPTS"]
+    if gain_db:
+        filters.append(f"volume={gain_db:.6f}dB")
+
+    command = [FFMPEG_BINARY, "-v", "error", "-nostdin", "-y", "-i", audio_path, "-vn",
+               "-af", ",".join(filters), "-ac", "1", "-ar", str(target_sample_rate)]
+    if bitrate and target_format == "mp3":
+        command += ["-b:a", bitrate]
+    command += ["-f", target_format, output_path]
+
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to encode {output_path}: {result.stderr.strip()}")
+
+    return output_path
+
+
+def export_clip(audio_path: str,
+                output_path: str,
+                start: float,
+                end: float,
+                target_sample_rate: int = 16000,
+                target_format: str = "mp3",
+                bitrate: Optional[str] = "64k") -> str:
+    """Encode [start, end) seconds of the source as mono target_format, streaming in ffmpeg"""
+    command = [FFMPEG_BINARY, "-v", "error", "-nostdin", "-y",
+               "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", audio_path, "-vn",
+               "-ac", "1", "-ar", str(target_sample_rate)]
+    if bitrate and target_format == "mp3":
+        command += ["-b:a", bitrate]
+    command += ["-f", target_format, output_path]
+
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to export {output_path}: {result.stderr.strip()}")
+
+    return output_path
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Warm Model Pool
+===============
+
+Loading the pyannote diarization pipeline, or a faster-whisper model, takes
+several seconds. For short jobs that load costs more than the inference.
+ModelPool keeps loaded instances alive across jobs and hands each one to a
+single worker thread at a time:
+
+1. Instances are loaded lazily, or ahead of time with warm(), up to `size`
+2. acquire() returns an idle instance. If none is idle it loads a new one
+   while the pool is below `size`, and otherwise waits for a release
+3. When available system memory drops below `min_available_mb`, the pool
+   stops growing and evicts idle instances, least recently used first,
+   down to `keep_warm`
+
+Usage:
+    pool = ModelPool(lambda: SpeakerDiarizer(num_speakers=2), size=2, name="diarization")
+    pool.warm()                        # at startup
+    with pool.acquire() as diarizer:   # on a worker thread
+        turns = diarizer.diarize(audio_path)
+"""
+
+import gc
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Generator, Generic, List, Optional, TypeVar
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+def available_memory_mb() -> Optional[float]:
+    """System memory available for new allocations (None without psutil)"""
+    if not HAS_PSUTIL:
+        return None
+    return psutil.virtual_memory().available / (1024 * 1024)
+
+
+class ModelPool(Generic[T]):
+    """Thread-safe pool of loaded model instances, one worker per instance at a time"""
+
+    def __init__(self,
+                 factory: Callable[[], T],
+                 size: int = 1,
+                 name: str = "model",
+                 min_available_mb: Optional[float] = None,
+                 keep_warm: int = 1):
+        """
+        Args:
+            factory: Loads one model instance (called on the acquiring thread)
+            size: Maximum number of instances loaded at once
+            name: Label for errors and stats
+            min_available_mb: Memory pressure threshold (None disables eviction;
+                needs psutil, a warning is logged without it)
+            keep_warm: Idle instances kept under memory pressure (0 frees them all)
+        """
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+
+        self.factory = factory
+        self.size = size
+        self.name = name
+        self.min_available_mb = min_available_mb
+        self.keep_warm = min(keep_warm, size)
+        if min_available_mb is not None and not HAS_PSUTIL:
+            logger.warning(f"{name} pool: min_available_mb={min_available_mb:g} is set but psutil is not "
+                           f"installed, so memory pressure is never detected and idle models are never evicted")
+
+        self._idle: List[T] = []  # least recently released first
+        self._loaded = 0          # idle + checked out + loading
+        self._closed = False
+        self._condition = threading.Condition()
+        self._stats = {"loads": 0, "load_seconds": 0.0, "reuses": 0, "waits": 0, "evictions": 0}
+
+    def under_memory_pressure(self) -> bool:
+        """True when available memory is below min_available_mb"""
+        if self.min_available_mb is None:
+            return False
+        available = available_memory_mb()
+        return available is not None and available < self.min_available_mb
+
+    def warm(self, count: int = 1) -> int:
+        """
+        Load instances until `count` are loaded (capped at size).
+
+        Returns:
+            Number of instances loaded by this call
+        """
+        loaded = 0
+        while True:
+            with self._condition:
+                if self._closed or self._loaded >= min(count, self.size):
+                    return loaded
+                self._loaded += 1
+            model = self._load()
+            self.checkin(model)
+            loaded += 1
+
+    def checkout(self, timeout: Optional[float] = None) -> T:
+        """
+        Take an instance for exclusive use (pair with checkin, or use acquire).
+
+        Raises:
+            TimeoutError: If no instance became free within timeout seconds
+            RuntimeError: If the pool is closed
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = False
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError(f"{self.name} pool is closed")
+                if self._idle:
+                    self._stats["reuses"] += 1
+                    return self._idle.pop()
+                # Under pressure, wait for a loaded instance instead of adding another
+                if self._loaded < self.size and not (self._loaded and self.under_memory_pressure()):
+                    self._loaded += 1
+                    break
+
+                if not waited:
+                    self._stats["waits"] += 1
+                    waited = True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No {self.name} instance free after {timeout}s")
+                self._condition.wait(remaining)
+
+        # Load outside the lock so other threads can still take idle instances
+        return self._load()
+
+    def checkin(self, model: T) -> None:
+        """Return an instance taken with checkout()"""
+        with self._condition:
+            if self._closed:
+                self._loaded -= 1
+                evicted = [model]
+            else:
+                self._idle.append(model)
+                evicted = self._evict_idle()
+            self._condition.notify()
+        del model
+        self._dispose(evicted)
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Generator[T, None, None]:
+        """Context manager around checkout/checkin"""
+        model = self.checkout(timeout)
+        try:
+            yield model
+        finally:
+            self.checkin(model)
+
+    def trim(self) -> int:
+        """Evict idle instances now if memory is under pressure; returns how many"""
+        with self._condition:
+            evicted = self._evict_idle()
+        count = len(evicted)
+        self._dispose(evicted)
+        return count
+
+    def close(self) -> None:
+        """Unload idle instances; checked-out ones are unloaded on checkin"""
+        with self._condition:
+            self._closed = True
+            evicted, self._idle = self._idle, []
+            self._loaded -= len(evicted)
+            self._condition.notify_all()
+        self._dispose(evicted)
+
+    def get_stats(self) -> Dict:
+        """Loads, reuses, waits and evictions so far, plus current occupancy"""
+        with self._condition:
+            return {
+                **self._stats,
+                "size": self.size,
+                "loaded": self._loaded,
+                "idle": len(self._idle),
+            }
+
+    def _load(self) -> T:
+        """Run the factory for a slot already reserved in _loaded"""
+        start = time.perf_counter()
+        try:
+            model = self.factory()
+        except BaseException:
+            with self._condition:
+                self._loaded -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._stats["loads"] += 1
+            self._stats["load_seconds"] += time.perf_counter() - start
+        return model
+
+    def _evict_idle(self) -> List[T]:
+        """Pop idle instances to unload (caller holds the lock)"""
+        evicted = []
+        while self._idle and self._loaded > self.keep_warm and self.under_memory_pressure():
+            evicted.append(self._idle.pop(0))
+            self._loaded -= 1
+            self._stats["evictions"] += 1
+        return evicted
+
+    @staticmethod
+    def _dispose(models: List[T]) -> None:
+        """Drop the references and give the memory back (GPU cache included)"""
+        if not models:
+            return
+        models.clear()
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
@@ -155,6 +155,8 @@ class PerformanceLogger:
 
     Features:
     - Hierarchical timing tracking
+    - Overlapping stages from concurrent threads (each thread has its own stage stack)
+    - Critical-path summary across overlapping stages
     - GPU utilization monitoring
     - Memory usage tracking
     - Detailed subprocess timing
@@ -174,10 +176,11 @@ class PerformanceLogger:
         self.verbose = verbose
         self.enable_gpu_monitoring = enable_gpu_monitoring
 
-        # Timing data structure
+        # Timing data structure (stage stacks are per thread so stages can overlap)
         self.timings = {}
-        self.stage_stack = []
-        self.current_stage = None
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._created_at = time.perf_counter()
 
         # Metrics
         self.metrics = {
@@ -187,7 +190,8 @@ class PerformanceLogger:
             "stages": {},
             "subprocesses": {},
             "gpu_stats": {},
-            "memory_stats": {}
+            "memory_stats": {},
+            "critical_path": {}
         }
 
         # GPU monitoring
@@ -199,6 +203,19 @@ class PerformanceLogger:
         # Start timestamp
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
 
+    @property
+    def stage_stack(self) -> List[Dict]:
+        """Open stages of the calling thread, innermost last"""
+        stack = getattr(self._local, "stage_stack", None)
+        if stack is None:
+            stack = self._local.stage_stack = []
+        return stack
+
+    @property
+    def current_stage(self) -> Optional[Dict]:
+        """Innermost open stage of the calling thread"""
+        return self.stage_stack[-1] if self.stage_stack else None
+
     def start_pipeline(self) -> None:
         """Mark the start of the pipeline"""
         self.metrics["start_time"] = time.perf_counter()
@@ -210,6 +227,7 @@ class PerformanceLogger:
         self.metrics["end_time"] = time.perf_counter()
         self.metrics["end_timestamp"] = datetime.now().isoformat()
         self.metrics["total_duration"] = self.metrics["end_time"] - self.metrics["start_time"]
+        self.metrics["critical_path"] = self.get_critical_path()
 
         self.log(f"Pipeline completed in {self.metrics['total_duration']:.2f}s", level="INFO")
 
@@ -221,6 +239,7 @@ class PerformanceLogger:
         stage_data = {
             "name": stage_name,
             "start_time": time.perf_counter(),
+            "thread": threading.current_thread().name,
             "subprocesses": {},
             "gpu_monitor": None
         }
@@ -231,16 +250,20 @@ class PerformanceLogger:
             stage_data["gpu_monitor"].start()
 
         self.stage_stack.append(stage_data)
-        self.current_stage = stage_data
 
         self.log(f"[{stage_name}] Stage started", level="INFO")
 
     def end_stage(self, stage_name: Optional[str] = None) -> None:
-        """End tracking of current stage"""
-        if not self.stage_stack:
+        """End tracking of the calling thread's current stage (or the named one)"""
+        stack = self.stage_stack
+        if not stack:
             return
 
-        stage_data = self.stage_stack.pop()
+        index = len(stack) - 1
+        if stage_name is not None:
+            named = [i for i, stage in enumerate(stack) if stage["name"] == stage_name]
+            index = named[-1] if named else index
+        stage_data = stack.pop(index)
 
         # Stop GPU monitoring
         if stage_data.get("gpu_monitor"):
@@ -251,18 +274,20 @@ class PerformanceLogger:
         stage_data["end_time"] = time.perf_counter()
         stage_data["duration"] = stage_data["end_time"] - stage_data["start_time"]
 
-        # Store in metrics
-        self.metrics["stages"][stage_data["name"]] = {
-            "duration": stage_data["duration"],
-            "subprocesses": stage_data["subprocesses"],
-            "gpu_stats": stage_data.get("gpu_stats", {})
-        }
+        # Store in metrics, with offsets from pipeline start for the timeline
+        origin = self.metrics["start_time"] or self._created_at
+        with self._lock:
+            self.metrics["stages"][stage_data["name"]] = {
+                "duration": stage_data["duration"],
+                "start_offset": stage_data["start_time"] - origin,
+                "end_offset": stage_data["end_time"] - origin,
+                "thread": stage_data["thread"],
+                "subprocesses": stage_data["subprocesses"],
+                "gpu_stats": stage_data.get("gpu_stats", {})
+            }
 
         self.log(f"[{stage_data['name']}] Stage completed in {stage_data['duration']:.3f}s", level="INFO")
 
-        # Update current stage
-        self.current_stage = self.stage_stack[-1] if self.stage_stack else None
-
     def record_subprocess(self, name: str, duration: float, metadata: Optional[Dict] = None) -> None:
         """Record timing for a subprocess"""
         subprocess_data = {
@@ -271,22 +296,20 @@ class PerformanceLogger:
             "metadata": metadata or {}
         }
 
-        # Add to current stage if exists
+        # Add to the calling thread's current stage if exists
         if self.current_stage:
             self.current_stage["subprocesses"][name] = subprocess_data
 
         # Also track globally
-        if name not in self.metrics["subprocesses"]:
-            self.metrics["subprocesses"][name] = []
-        self.metrics["subprocesses"][name].append(subprocess_data)
+        with self._lock:
+            self.metrics["subprocesses"].setdefault(name, []).append(subprocess_data)
 
         self.log(f"  [{name}] completed in {duration:.3f}s", level="DEBUG")
 
     def record_timing(self, name: str, duration: float) -> None:
         """Record a simple timing measurement"""
-        if name not in self.timings:
-            self.timings[name] = []
-        self.timings[name].append(duration)
+        with self._lock:
+            self.timings.setdefault(name, []).append(duration)
 
     @contextmanager
     def timer(self, name: str) -> Generator[PerformanceTimer, None, None]:
@@ -324,7 +347,8 @@ class PerformanceLogger:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
         log_entry = f"[{timestamp}] [{level}] {message}"
 
-        self.log_buffer.append(log_entry)
+        with self._lock:
+            self.log_buffer.append(log_entry)
 
         if self.verbose:
             print(log_entry)
@@ -407,6 +431,26 @@ class PerformanceLogger:
 
             lines.append("")
 
+        # Stage timeline and critical path (stages may overlap across threads)
+        critical = self.metrics.get("critical_path") or {}
+        if critical.get("overlapping_stages"):
+            lines.append("Stage Timeline:")
+            lines.append("-" * 40)
+            timeline = sorted(self.metrics["stages"].items(), key=lambda item: item[1].get("start_offset", 0))
+            for stage_name, stage_data in timeline:
+                lines.append(f"  {stage_name:30s} {stage_data.get('start_offset', 0):8.3f}s -> "
+                           f"{stage_data.get('end_offset', 0):8.3f}s  [{stage_data.get('thread', '')}]")
+            lines.append("")
+
+        if critical.get("path"):
+            lines.append("Critical Path:")
+            lines.append("-" * 40)
+            lines.append(f"  {' -> '.join(critical['path'])}")
+            lines.append(f"  Path duration: {critical['path_duration']:.3f}s")
+            lines.append(f"  Stage time {critical['stage_time']:.3f}s in {critical['stage_wall_time']:.3f}s wall "
+                       f"(overlap saved {critical['overlap_saved']:.3f}s)")
+            lines.append("")
+
         # Top subprocess timings
         if self.metrics.get("subprocesses"):
             lines.append("Top Subprocess Timings:")
@@ -456,6 +500,74 @@ class PerformanceLogger:
 
         return "\n".join(lines)
 
+    def get_critical_path(self) -> Dict:
+        """
+        Summarize overlapping stages and the chain that set the end-to-end time
+
+        Walking back from the stage that ended last, each stage's predecessor
+        is the stage that ended last before it started (the one it waited
+        for). Stages off that chain ran in the shadow of it.
+
+        Returns:
+            Dict with the critical path (names and duration), wall time covered
+            by stages, summed stage time, time saved by overlap, and the stages
+            that ran concurrently with another stage
+        """
+        stages = {
+            name: data for name, data in self.metrics.get("stages", {}).items()
+            if "start_offset" in data
+        }
+        if not stages:
+            return {}
+
+        # Top-level stages only: a stage nested inside another on the same thread is part of it
+        top = {
+            name: data for name, data in stages.items()
+            if not any(
+                other != name and o["thread"] == data["thread"]
+                and o["start_offset"] <= data["start_offset"] and data["end_offset"] <= o["end_offset"]
+                and (o["start_offset"], -o["end_offset"]) < (data["start_offset"], -data["end_offset"])
+                for other, o in stages.items()
+            )
+        }
+
+        epsilon = 1e-3
+        path = [max(top, key=lambda name: top[name]["end_offset"])]
+        while True:
+            start = top[path[-1]]["start_offset"]
+            before = [name for name, data in top.items() if name not in path and data["end_offset"] <= start + epsilon]
+            if not before:
+                break
+            path.append(max(before, key=lambda name: top[name]["end_offset"]))
+        path.reverse()
+
+        # Wall time covered by the union of stage intervals
+        covered, reach = 0.0, None
+        for data in sorted(top.values(), key=lambda d: d["start_offset"]):
+            if reach is None or data["start_offset"] > reach:
+                covered += data["end_offset"] - data["start_offset"]
+                reach = data["end_offset"]
+            elif data["end_offset"] > reach:
+                covered += data["end_offset"] - reach
+                reach = data["end_offset"]
+
+        overlapping = sorted(
+            name for name, data in top.items()
+            if any(other != name and o["start_offset"] < data["end_offset"] - epsilon
+                   and data["start_offset"] < o["end_offset"] - epsilon
+                   for other, o in top.items())
+        )
+        stage_time = sum(data["duration"] for data in top.values())
+
+        return {
+            "path": path,
+            "path_duration": sum(top[name]["duration"] for name in path),
+            "stage_wall_time": covered,
+            "stage_time": stage_time,
+            "overlap_saved": stage_time - covered,
+            "overlapping_stages": overlapping
+        }
+
     def get_summary(self) -> Dict:
         """Get a summary of performance metrics"""
         summary = {
@@ -494,6 +606,11 @@ class PerformanceLogger:
                 percentage = (duration / total * 100) if total > 0 else 0
                 print(f"  {stage_name:25s} {duration:7.2f}s ({percentage:5.1f}%)")
 
+        critical = self.metrics.get("critical_path") or {}
+        if critical.get("overlapping_stages"):
+            print(f"\nCritical path: {' -> '.join(critical['path'])} ({critical['path_duration']:.2f}s)")
+            print(f"Overlap saved: {critical['overlap_saved']:.2f}s")
+
         print("=" * 60)
 
     def _get_system_info(self) -> Dict:
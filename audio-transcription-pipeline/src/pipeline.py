@@ -9,7 +9,10 @@ Simplified pipeline for audio processing:
 """
 
 import os
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional
 from tenacity import (
@@ -33,7 +36,7 @@ class AudioPreprocessor:
                  target_format: str = "mp3",
                  target_sample_rate: int = 16000,
                  target_bitrate: str = "64k",
-                 max_file_size_mb: int = 25):
+                 max_file_size_mb: Optional[int] = 25):
         self.target_format = target_format
         self.target_sample_rate = target_sample_rate
         self.target_bitrate = target_bitrate
@@ -44,96 +47,67 @@ class AudioPreprocessor:
         Preprocess audio file for optimal Whisper transcription
 
         Steps:
-        1. Load audio file
-        2. Trim leading/trailing silence
-        3. Normalize volume
-        4. Convert to target format (16kHz mono MP3)
-        5. Validate file size
+        1. Scan the audio in fixed-size blocks for leading/trailing silence and peak
+        2. Trim silence, normalize volume and convert to target format
+           (16kHz mono MP3) in a single streaming encode
+        3. Validate file size
+
+        Memory stays constant regardless of recording length (see audio_stream).
 
         Returns: Path to processed audio file
         """
-        from pydub import AudioSegment, effects
-        from pydub.silence import detect_leading_silence
+        from audio_stream import encode_audio, normalization_gain_db, probe_audio, scan_audio
 
         print(f"[Preprocess] Loading: {audio_path}")
-        audio = AudioSegment.from_file(audio_path)
-        original_duration = len(audio) / 1000  # seconds
-        print(f"[Preprocess] Duration: {original_duration:.1f}s")
+        scan = scan_audio(audio_path, probe=probe_audio(audio_path))
+        print(f"[Preprocess] Duration: {scan.duration_seconds:.1f}s")
 
         # Step 1: Trim silence
-        audio = self._trim_silence(audio)
-
-        # Step 2: Normalize volume
-        audio = self._normalize(audio)
+        if scan.trimmed_seconds > 0:
+            print(f"[Preprocess] Trimmed {scan.trimmed_seconds:.1f}s of silence")
 
-        # Step 3: Convert format
-        audio = audio.set_channels(1)  # Mono
-        audio = audio.set_frame_rate(self.target_sample_rate)  # 16kHz
+        # Step 2: Normalize volume (peak to -0.1 dBFS, as pydub's normalize)
+        gain_db = normalization_gain_db(scan.peak, headroom=0.1)
+        if abs(gain_db) > 0.5:
+            print(f"[Preprocess] Normalized volume: {gain_db:+.1f} dB")
 
-        # Step 4: Export
+        # Step 3: Convert format and export
         if output_path is None:
             output_path = audio_path.rsplit('.', 1)[0] + f'_processed.{self.target_format}'
 
-        audio.export(
+        encode_audio(
+            audio_path,
             output_path,
-            format=self.target_format,
-            bitrate=self.target_bitrate,
-            parameters=["-ac", "1"]
+            scan,
+            gain_db=gain_db,
+            target_sample_rate=self.target_sample_rate,
+            target_format=self.target_format,
+            bitrate=self.target_bitrate
         )
 
-        # Step 5: Validate size
+        # Step 4: Validate size
         file_size_mb = os.path.getsize(output_path) / (1024 * 1024)
         print(f"[Preprocess] Output: {output_path} ({file_size_mb:.2f} MB)")
 
-        if file_size_mb > self.max_file_size_mb:
+        if self.max_file_size_mb is not None and file_size_mb > self.max_file_size_mb:
             raise ValueError(f"File size {file_size_mb:.2f}MB exceeds {self.max_file_size_mb}MB limit")
 
         return output_path
 
-    def _trim_silence(self, audio: 'AudioSegment',
-                      silence_threshold: int = -40,
-                      min_silence_len: int = 500) -> 'AudioSegment':
-        """Remove leading and trailing silence"""
-        from pydub.silence import detect_leading_silence
-
-        start_trim = detect_leading_silence(audio, silence_threshold=silence_threshold)
-        end_trim = detect_leading_silence(audio.reverse(), silence_threshold=silence_threshold)
-
-        duration = len(audio)
-        trimmed = audio[start_trim:duration - end_trim]
-
-        trimmed_amount = (start_trim + end_trim) / 1000
-        if trimmed_amount > 0:
-            print(f"[Preprocess] Trimmed {trimmed_amount:.1f}s of silence")
-
-        return trimmed
-
-    def _normalize(self, audio: 'AudioSegment', target_dBFS: float = -20.0) -> 'AudioSegment':
-        """Normalize audio to target volume level"""
-        from pydub import effects
-
-        # Use pydub's normalize (peaks at 0dB with headroom)
-        normalized = effects.normalize(audio, headroom=0.1)
-
-        change = normalized.dBFS - audio.dBFS
-        if abs(change) > 0.5:
-            print(f"[Preprocess] Normalized volume: {change:+.1f} dB")
-
-        return normalized
-
     def validate_audio(self, audio_path: str) -> Dict:
         """Validate audio file before processing"""
-        from pydub import AudioSegment
+        from audio_stream import probe_audio
 
         try:
-            audio = AudioSegment.from_file(audio_path)
+            # Header probe only - the audio is not decoded
+            info = probe_audio(audio_path)
             file_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
 
             return {
                 "valid": True,
-                "duration_seconds": len(audio) / 1000,
-                "channels": audio.channels,
-                "sample_rate": audio.frame_rate,
+                "duration_seconds": info["duration_seconds"] or 0.0,
+                "channels": info["channels"],
+                "sample_rate": info["sample_rate"],
                 "file_size_mb": file_size_mb,
                 "format": audio_path.rsplit('.', 1)[-1].lower()
             }
@@ -180,18 +154,20 @@ class WhisperTranscriber:
         self.max_retry_wait = max_retry_wait
         self.rate_limit_delay = rate_limit_delay
         self.last_api_call_time = 0
+        self._rate_limit_lock = threading.Lock()
 
     def _apply_rate_limit(self):
-        """Apply rate limiting delay between API calls"""
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_api_call_time
+        """Apply rate limiting delay between API calls (thread-safe: concurrent callers queue up)"""
+        with self._rate_limit_lock:
+            current_time = time.time()
+            time_since_last_call = current_time - self.last_api_call_time
 
-        if time_since_last_call < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_call
-            logger.info(f"[Rate Limit] Waiting {sleep_time:.2f}s before next API call")
-            time.sleep(sleep_time)
+            if time_since_last_call < self.rate_limit_delay:
+                sleep_time = self.rate_limit_delay - time_since_last_call
+                logger.info(f"[Rate Limit] Waiting {sleep_time:.2f}s before next API call")
+                time.sleep(sleep_time)
 
-        self.last_api_call_time = time.time()
+            self.last_api_call_time = time.time()
 
     @retry(
         stop=stop_after_attempt(5),  # Will be overridden by instance max_retries
@@ -216,6 +192,9 @@ class WhisperTranscriber:
             # Apply rate limiting before API call
             self._apply_rate_limit()
 
+            # A retried attempt must upload the file from the start again
+            audio_file.seek(0)
+
             response = self.client.audio.transcriptions.create(
                 model="whisper-1",
                 file=audio_file,
@@ -306,12 +285,96 @@ class WhisperTranscriber:
         return result
 
 
+class ChunkedWhisperTranscriber:
+    """Transcribes audio of any size by splitting it into Whisper-sized chunks at silences"""
+
+    def __init__(self,
+                 transcriber: Optional[WhisperTranscriber] = None,
+                 max_file_size_mb: float = 25,
+                 target_chunk_seconds: float = 600,
+                 overlap_seconds: float = 1.0,
+                 max_concurrency: int = 4,
+                 silence_threshold: float = -40.0,
+                 min_silence_ms: int = 300):
+        """
+        Initialize chunked transcriber
+
+        Args:
+            transcriber: WhisperTranscriber whose retry/rate-limit policy every chunk goes through
+            max_file_size_mb: Files up to this size are sent whole (Whisper API limit: 25MB)
+            target_chunk_seconds: Preferred chunk length; shortened further if needed to fit the size limit
+            overlap_seconds: Audio added past each cut for context (de-duplicated when stitching)
+            max_concurrency: Chunks in flight at once (call starts stay rate_limit_delay apart)
+            silence_threshold: dBFS below which a 10ms window counts as silence
+            min_silence_ms: Shortest silence considered as a cut point
+        """
+        self.transcriber = transcriber or WhisperTranscriber()
+        self.max_file_size_mb = max_file_size_mb
+        self.target_chunk_seconds = target_chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.max_concurrency = max_concurrency
+        self.silence_threshold = silence_threshold
+        self.min_silence_ms = min_silence_ms
+
+    def transcribe(self,
+                   audio_path: str,
+                   language: Optional[str] = "en",
+                   response_format: str = "verbose_json") -> Dict:
+        """
+        Transcribe audio, chunking it when it exceeds max_file_size_mb
+
+        Returns the same dict as WhisperTranscriber.transcribe, with segment
+        timestamps relative to the start of the whole file, plus "chunks"
+        (number of API calls made).
+        """
+        from audio_stream import export_clip, find_silences
+        from whisper_chunking import chunk_target_seconds, plan_chunks, stitch_segments
+
+        file_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
+        if file_size_mb <= self.max_file_size_mb:
+            return {**self.transcriber.transcribe(audio_path, language, response_format), "chunks": 1}
+
+        if response_format != "verbose_json":
+            raise ValueError("Chunked transcription needs segment timestamps (response_format='verbose_json')")
+
+        duration, silences = find_silences(
+            audio_path, silence_threshold=self.silence_threshold, min_silence_ms=self.min_silence_ms
+        )
+        target = chunk_target_seconds(duration, file_size_mb, self.max_file_size_mb,
+                                      self.target_chunk_seconds, self.overlap_seconds)
+        chunks = plan_chunks(duration, silences, target, overlap_seconds=self.overlap_seconds)
+        print(f"[Whisper] {file_size_mb:.2f} MB over limit: {len(chunks)} chunks of <= {target:.0f}s "
+              f"({len(silences)} silences found)")
+
+        with tempfile.TemporaryDirectory(prefix="whisper_chunks_") as chunk_dir:
+            def transcribe_chunk(chunk):
+                chunk_path = os.path.join(chunk_dir, f"chunk_{chunk.index:03d}.mp3")
+                export_clip(audio_path, chunk_path, chunk.start, chunk.end)
+                return self.transcriber.transcribe(chunk_path, language, response_format)
+
+            with ThreadPoolExecutor(max_workers=max(1, self.max_concurrency)) as executor:
+                results = list(executor.map(transcribe_chunk, chunks))
+
+        segments = stitch_segments(chunks, results)
+        result = {
+            "segments": segments,
+            "full_text": " ".join(seg["text"] for seg in segments if seg["text"]),
+            "language": results[0]["language"],
+            "duration": duration,
+            "chunks": len(chunks)
+        }
+
+        print(f"[Whisper] Stitched {len(segments)} segments from {len(chunks)} chunks")
+        return result
+
+
 class AudioTranscriptionPipeline:
     """Main pipeline orchestrator"""
 
     def __init__(self):
-        self.preprocessor = AudioPreprocessor()
-        self.transcriber = WhisperTranscriber()
+        # No size cap at preprocessing: oversized output is chunked for the API
+        self.preprocessor = AudioPreprocessor(max_file_size_mb=None)
+        self.transcriber = ChunkedWhisperTranscriber()
 
     def process(self, audio_path: str) -> Dict:
         """
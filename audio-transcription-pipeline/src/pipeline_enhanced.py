@@ -12,9 +12,11 @@ This enhanced version includes comprehensive performance tracking for:
 
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional, List
 from performance_logger import PerformanceLogger, get_logger
+from speaker_alignment import align_speakers
 
 class AudioPreprocessor:
     """Audio preprocessing with detailed performance tracking"""
@@ -36,83 +38,71 @@ class AudioPreprocessor:
         """
         Preprocess audio file with performance tracking for each step
 
+        The file is never loaded whole (see audio_stream): a block-wise scan
+        pass finds silence and peak, then one streaming ffmpeg run trims,
+        normalizes, converts and encodes.
+
         Tracked operations:
-        1. Audio file loading
-        2. Silence trimming
-        3. Volume normalization
-        4. Format conversion
-        5. File export
+        1. Audio probing (headers only)
+        2. Silence/peak scan
+        3. Volume normalization gain
+        4. Streaming trim + normalize + convert + export
         """
-        from pydub import AudioSegment, effects
-        from pydub.silence import detect_leading_silence
+        from audio_stream import encode_audio, normalization_gain_db, probe_audio, scan_audio
 
         self.logger.start_stage("Audio Preprocessing")
 
         try:
-            # Load audio file
+            # Probe audio file
             with self.logger.subprocess("audio_loading", {"file": audio_path}):
                 self.logger.log(f"[Preprocess] Loading: {audio_path}", level="INFO")
-                audio = AudioSegment.from_file(audio_path)
-                original_duration = len(audio) / 1000  # seconds
+                probe = probe_audio(audio_path)
                 original_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
 
                 metadata = {
-                    "duration_seconds": original_duration,
-                    "channels": audio.channels,
-                    "sample_rate": audio.frame_rate,
+                    "channels": probe["channels"],
+                    "sample_rate": probe["sample_rate"],
                     "file_size_mb": original_size_mb,
                     "format": audio_path.rsplit('.', 1)[-1].lower()
                 }
-                self.logger.log(f"[Preprocess] Loaded: {original_duration:.1f}s, "
-                              f"{metadata['channels']}ch, {metadata['sample_rate']}Hz", level="INFO")
+                self.logger.log(f"[Preprocess] Probed: {metadata['channels']}ch, "
+                              f"{metadata['sample_rate']}Hz, {original_size_mb:.1f}MB", level="INFO")
 
-            # Trim silence
+            # Scan for silence and peak in fixed-size blocks
             with self.logger.subprocess("silence_trimming"):
-                self.logger.log("[Preprocess] Trimming silence...", level="DEBUG")
-                trimmed_audio = self._trim_silence_tracked(audio)
-                trimmed_duration = len(trimmed_audio) / 1000
-                trim_amount = original_duration - trimmed_duration
+                self.logger.log("[Preprocess] Scanning for silence and peak...", level="DEBUG")
+                with self.logger.timer("silence_peak_scan"):
+                    scan = scan_audio(audio_path, probe=probe)
+                self.logger.record_timing("total_silence_trimmed", scan.trimmed_seconds)
 
-                if trim_amount > 0:
-                    self.logger.log(f"[Preprocess] Trimmed {trim_amount:.1f}s of silence", level="INFO")
+                self.logger.log(f"[Preprocess] Loaded: {scan.duration_seconds:.1f}s", level="INFO")
+                if scan.trimmed_seconds > 0:
+                    self.logger.log(f"[Preprocess] Trimmed {scan.trimmed_seconds:.1f}s of silence", level="INFO")
 
             # Normalize volume
             with self.logger.subprocess("volume_normalization"):
-                self.logger.log("[Preprocess] Normalizing volume...", level="DEBUG")
-                normalized_audio = self._normalize_tracked(trimmed_audio)
-
-            # Convert format
-            with self.logger.subprocess("format_conversion",
-                                       {"target_channels": 1, "target_rate": self.target_sample_rate}):
-                self.logger.log("[Preprocess] Converting to mono 16kHz...", level="DEBUG")
-
-                # Channel conversion
-                start = time.perf_counter()
-                audio_mono = normalized_audio.set_channels(1)
-                channel_time = time.perf_counter() - start
-                self.logger.record_timing("channel_conversion", channel_time)
-
-                # Sample rate conversion (most expensive operation)
-                start = time.perf_counter()
-                audio_resampled = audio_mono.set_frame_rate(self.target_sample_rate)
-                resample_time = time.perf_counter() - start
-                self.logger.record_timing("sample_rate_conversion", resample_time)
-                self.logger.log(f"[Preprocess] Resampling took {resample_time:.3f}s", level="DEBUG")
-
-            # Export
+                gain_db = normalization_gain_db(scan.peak, headroom=0.1)
+                if abs(gain_db) > 0.5:
+                    self.logger.log(f"[Preprocess] Normalized volume: {gain_db:+.1f} dB", level="INFO")
+
+            # Export (trim, gain, mono, resample and encode stream in one ffmpeg run)
             if output_path is None:
                 output_path = audio_path.rsplit('.', 1)[0] + f'_processed.{self.target_format}'
 
-            with self.logger.subprocess("audio_export", {"output_format": self.target_format}):
-                self.logger.log(f"[Preprocess] Exporting to {self.target_format}...", level="DEBUG")
-                export_params = {
-                    "format": self.target_format,
-                    "parameters": ["-ac", "1"]
-                }
-                if self.target_format == "mp3":
-                    export_params["bitrate"] = self.target_bitrate
-
-                audio_resampled.export(output_path, **export_params)
+            with self.logger.subprocess("audio_export", {"output_format": self.target_format,
+                                                         "target_channels": 1,
+                                                         "target_rate": self.target_sample_rate}):
+                self.logger.log(f"[Preprocess] Streaming to mono {self.target_sample_rate}Hz "
+                              f"{self.target_format}...", level="DEBUG")
+                encode_audio(
+                    audio_path,
+                    output_path,
+                    scan,
+                    gain_db=gain_db,
+                    target_sample_rate=self.target_sample_rate,
+                    target_format=self.target_format,
+                    bitrate=self.target_bitrate if self.target_format == "mp3" else None
+                )
 
                 # Validate size
                 file_size_mb = os.path.getsize(output_path) / (1024 * 1024)
@@ -126,64 +116,21 @@ class AudioPreprocessor:
 
         return output_path
 
-    def _trim_silence_tracked(self, audio: 'AudioSegment',
-                             silence_threshold: int = -40,
-                             min_silence_len: int = 500) -> 'AudioSegment':
-        """Trim silence with detailed subprocess tracking"""
-        from pydub.silence import detect_leading_silence
-
-        # Track leading silence detection
-        with self.logger.timer("detect_leading_silence"):
-            start_trim = detect_leading_silence(audio, silence_threshold=silence_threshold)
-
-        # Track audio reversal for trailing silence
-        with self.logger.timer("audio_reverse"):
-            reversed_audio = audio.reverse()
-
-        # Track trailing silence detection
-        with self.logger.timer("detect_trailing_silence"):
-            end_trim = detect_leading_silence(reversed_audio, silence_threshold=silence_threshold)
-
-        # Track trimming operation
-        with self.logger.timer("apply_trim"):
-            duration = len(audio)
-            trimmed = audio[start_trim:duration - end_trim]
-
-        trimmed_amount = (start_trim + end_trim) / 1000
-        self.logger.record_timing("total_silence_trimmed", trimmed_amount)
-
-        return trimmed
-
-    def _normalize_tracked(self, audio: 'AudioSegment', target_dBFS: float = -20.0) -> 'AudioSegment':
-        """Normalize audio with performance tracking"""
-        from pydub import effects
-
-        original_dbfs = audio.dBFS
-
-        # Track peak detection and normalization
-        with self.logger.timer("peak_normalization"):
-            normalized = effects.normalize(audio, headroom=0.1)
-
-        change = normalized.dBFS - original_dbfs
-        if abs(change) > 0.5:
-            self.logger.log(f"[Preprocess] Normalized volume: {change:+.1f} dB", level="INFO")
-
-        return normalized
-
     def validate_audio(self, audio_path: str) -> Dict:
         """Validate audio file with timing"""
-        from pydub import AudioSegment
+        from audio_stream import probe_audio
 
         with self.logger.subprocess("audio_validation", {"file": audio_path}):
             try:
-                audio = AudioSegment.from_file(audio_path)
+                # Header probe only - the audio is not decoded
+                info = probe_audio(audio_path)
                 file_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
 
                 return {
                     "valid": True,
-                    "duration_seconds": len(audio) / 1000,
-                    "channels": audio.channels,
-                    "sample_rate": audio.frame_rate,
+                    "duration_seconds": info["duration_seconds"] or 0.0,
+                    "channels": info["channels"],
+                    "sample_rate": info["sample_rate"],
                     "file_size_mb": file_size_mb,
                     "format": audio_path.rsplit('.', 1)[-1].lower()
                 }
@@ -459,25 +406,35 @@ class EnhancedAudioTranscriptionPipeline:
             print("\nStep 1: Preprocessing audio...")
             processed_audio = self.preprocessor.preprocess(audio_path)
 
-            # Step 2: Transcribe with Whisper
-            print("\nStep 2: Transcribing with Whisper...")
-            transcription = self.transcriber.transcribe(processed_audio)
-
-            # Step 3: Speaker diarization (optional)
+            # Step 2: Transcribe with Whisper (network-bound), with diarization
+            # (CPU/GPU-bound, needs only the preprocessed audio) overlapping it
             speaker_turns = []
             if enable_diarization:
-                print("\nStep 3: Running speaker diarization...")
-                if self.diarizer is None:
-                    self.diarizer = SpeakerDiarizer(logger=self.logger)
-                speaker_turns = self.diarizer.diarize(processed_audio)
-
-                # Align speakers with segments
-                with self.logger.subprocess("speaker_alignment"):
-                    self.logger.log("[Alignment] Matching speakers to text segments...", level="INFO")
-                    aligned_segments = self._align_speakers_with_segments(
-                        transcription['segments'], speaker_turns
-                    )
-                    transcription['aligned_segments'] = aligned_segments
+                print("\nStep 2: Transcribing with Whisper, diarizing in parallel...")
+                pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="diarization")
+                try:
+                    diarization = pool.submit(self._run_diarization, processed_audio)
+                    transcription = self.transcriber.transcribe(processed_audio)
+                    speaker_turns = diarization.result()
+                finally:
+                    pool.shutdown(wait=False, cancel_futures=True)
+            else:
+                print("\nStep 2: Transcribing with Whisper...")
+                transcription = self.transcriber.transcribe(processed_audio)
+
+            # Step 3: Align speakers with segments (needs both)
+            if enable_diarization:
+                print("\nStep 3: Aligning speakers...")
+                self.logger.start_stage("Speaker Alignment")
+                try:
+                    with self.logger.subprocess("speaker_alignment"):
+                        self.logger.log("[Alignment] Matching speakers to text segments...", level="INFO")
+                        aligned_segments = self._align_speakers_with_segments(
+                            transcription['segments'], speaker_turns
+                        )
+                        transcription['aligned_segments'] = aligned_segments
+                finally:
+                    self.logger.end_stage("Speaker Alignment")
 
             # Finalize
             self.logger.end_pipeline()
@@ -486,6 +443,7 @@ class EnhancedAudioTranscriptionPipeline:
             transcription['performance_metrics'] = {
                 "total_duration": self.logger.metrics.get("total_duration"),
                 "stages": self.logger.metrics.get("stages", {}),
+                "critical_path": self.logger.metrics.get("critical_path", {}),
                 "session_id": self.logger.session_id
             }
 
@@ -502,6 +460,16 @@ class EnhancedAudioTranscriptionPipeline:
             self.logger.end_pipeline()
             raise
 
+    def _run_diarization(self, audio_path: str) -> List[Dict]:
+        """Load the diarizer on first use and diarize (runs on the diarization thread)"""
+        if self.diarizer is None:
+            self.logger.start_stage("Diarization Model Loading")
+            try:
+                self.diarizer = SpeakerDiarizer(logger=self.logger)
+            finally:
+                self.logger.end_stage("Diarization Model Loading")
+        return self.diarizer.diarize(audio_path)
+
     def _align_speakers_with_segments(self, segments: List[Dict], turns: List[Dict]) -> List[Dict]:
         """Align speakers with segments using vectorized operations if possible"""
         import torch
@@ -521,37 +489,8 @@ class EnhancedAudioTranscriptionPipeline:
                 return self._align_speakers_cpu(segments, turns)
 
     def _align_speakers_cpu(self, segments: List[Dict], turns: List[Dict]) -> List[Dict]:
-        """CPU-based speaker alignment"""
-        aligned = []
-
-        for seg in segments:
-            seg_start, seg_end = seg["start"], seg["end"]
-            seg_duration = seg_end - seg_start
-
-            best_speaker = "UNKNOWN"
-            max_overlap = 0
-
-            for turn in turns:
-                overlap_start = max(seg_start, turn["start"])
-                overlap_end = min(seg_end, turn["end"])
-                overlap = max(0, overlap_end - overlap_start)
-
-                if overlap > max_overlap:
-                    max_overlap = overlap
-                    best_speaker = turn["speaker"]
-
-            # 50% overlap threshold
-            if seg_duration > 0 and (max_overlap / seg_duration) < 0.5:
-                best_speaker = "UNKNOWN"
-
-            aligned.append({
-                "start": seg_start,
-                "end": seg_end,
-                "text": seg["text"],
-                "speaker": best_speaker
-            })
-
-        return aligned
+        """CPU-based speaker alignment (sweep over sorted turns, 50% overlap threshold)"""
+        return align_speakers(segments, turns, overlap_threshold=0.5)
 
     def _align_speakers_gpu(self, segments: List[Dict], turns: List[Dict]) -> List[Dict]:
         """GPU-accelerated speaker alignment using vectorized operations"""
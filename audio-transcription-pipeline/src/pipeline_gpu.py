@@ -34,12 +34,19 @@ class GPUTranscriptionPipeline:
     Recommended usage with context manager (guarantees cleanup):
         with GPUTranscriptionPipeline(whisper_model="large-v3") as pipeline:
             result = pipeline.process("audio.mp3")
+
+    Long-running services can keep the Whisper model loaded across runs
+    (see model_pool.py) instead of loading and freeing it per run:
+        loader = GPUTranscriptionPipeline(whisper_model="large-v3")
+        whisper_pool = ModelPool(loader.load_whisper_model, size=1, name="whisper")
+        pipeline = GPUTranscriptionPipeline(whisper_model="large-v3", whisper_pool=whisper_pool)
     """
 
     def __init__(self,
                  whisper_model: str = "large-v3",
                  config: Optional[GPUConfig] = None,
-                 enable_silence_trimming: bool = False):
+                 enable_silence_trimming: bool = False,
+                 whisper_pool=None):
         """
         Initialize GPU pipeline with auto-configuration
 
@@ -49,6 +56,8 @@ class GPUTranscriptionPipeline:
             enable_silence_trimming: Enable silence trimming during preprocessing (default: False)
                                     Note: Disabled by default for performance. Adds ~537s overhead
                                     on 45-min audio files. Enable only if absolutely needed.
+            whisper_pool: Optional ModelPool of faster-whisper models. When set, runs
+                          borrow a loaded model and return it instead of freeing it.
         """
         self.enable_silence_trimming = enable_silence_trimming
         # Auto-detect optimal configuration
@@ -79,6 +88,7 @@ class GPUTranscriptionPipeline:
         self.audio_processor = GPUAudioProcessor(self.device)
         self.transcriber = None
         self.diarizer = None
+        self.whisper_pool = whisper_pool
 
         # Log configuration
         self._log_initialization()
@@ -247,6 +257,64 @@ class GPUTranscriptionPipeline:
 
         return output_path
 
+    def load_whisper_model(self):
+        """
+        Load the faster-whisper model on GPU, falling back to CPU on cuDNN errors
+
+        Also usable as a ModelPool factory.
+        """
+        from faster_whisper import WhisperModel
+        self.logger.log(f"Loading {self.whisper_model} model...")
+        start_load = time.perf_counter()
+
+        try:
+            # Attempt GPU-accelerated model loading
+            model = WhisperModel(
+                self.whisper_model,
+                device="cuda",
+                compute_type=self.config.compute_type,
+                num_workers=self.config.num_workers,
+                download_root=self.config.model_cache_dir
+            )
+            self.logger.log(f"Successfully loaded on GPU (device=cuda)")
+
+        except RuntimeError as e:
+            # Check if this is a cuDNN-related error
+            if "cuDNN" in str(e) or "cudnn" in str(e).lower():
+                # Log the cuDNN error and fallback to CPU
+                self.logger.log(
+                    f"cuDNN error detected: {str(e)}",
+                    level="WARNING"
+                )
+                self.logger.log(
+                    "Falling back to CPU mode for transcription (slower but reliable)",
+                    level="WARNING"
+                )
+
+                # Load model on CPU instead
+                model = WhisperModel(
+                    self.whisper_model,
+                    device="cpu",
+                    compute_type="int8",  # CPU-compatible compute type
+                    num_workers=self.config.num_workers,
+                    download_root=self.config.model_cache_dir
+                )
+
+                # Mark that we used CPU fallback
+                self.used_cpu_fallback = True
+                self.logger.log(
+                    "Successfully loaded on CPU (device=cpu)",
+                    level="WARNING"
+                )
+            else:
+                # Not a cuDNN error - re-raise the exception
+                raise
+
+        load_time = time.perf_counter() - start_load
+        device_info = "CPU (fallback)" if self.used_cpu_fallback else "GPU"
+        self.logger.log(f"Model loaded on {device_info} in {load_time:.2f}s")
+        return model
+
     def _transcribe_gpu(self, audio_path: str, language: str) -> Dict:
         """
         Transcribe using faster-whisper on GPU with automatic CPU fallback
@@ -254,64 +322,22 @@ class GPUTranscriptionPipeline:
         Automatically falls back to CPU mode if cuDNN errors occur during model loading.
         This ensures the pipeline works on any system, even if cuDNN has compatibility issues.
         """
+        model = None
         try:
-            if self.transcriber is None:
-                with self.logger.subprocess("whisper_model_loading"):
-                    from faster_whisper import WhisperModel
-                    self.logger.log(f"Loading {self.whisper_model} model...")
-                    start_load = time.perf_counter()
-
-                    try:
-                        # Attempt GPU-accelerated model loading
-                        self.transcriber = WhisperModel(
-                            self.whisper_model,
-                            device="cuda",
-                            compute_type=self.config.compute_type,
-                            num_workers=self.config.num_workers,
-                            download_root=self.config.model_cache_dir
-                        )
-                        self.logger.log(f"Successfully loaded on GPU (device=cuda)")
-
-                    except RuntimeError as e:
-                        # Check if this is a cuDNN-related error
-                        if "cuDNN" in str(e) or "cudnn" in str(e).lower():
-                            # Log the cuDNN error and fallback to CPU
-                            self.logger.log(
-                                f"cuDNN error detected: {str(e)}",
-                                level="WARNING"
-                            )
-                            self.logger.log(
-                                "Falling back to CPU mode for transcription (slower but reliable)",
-                                level="WARNING"
-                            )
-
-                            # Load model on CPU instead
-                            self.transcriber = WhisperModel(
-                                self.whisper_model,
-                                device="cpu",
-                                compute_type="int8",  # CPU-compatible compute type
-                                num_workers=self.config.num_workers,
-                                download_root=self.config.model_cache_dir
-                            )
-
-                            # Mark that we used CPU fallback
-                            self.used_cpu_fallback = True
-                            self.logger.log(
-                                "Successfully loaded on CPU (device=cpu)",
-                                level="WARNING"
-                            )
-                        else:
-                            # Not a cuDNN error - re-raise the exception
-                            raise
-
-                    load_time = time.perf_counter() - start_load
-                    device_info = "CPU (fallback)" if self.used_cpu_fallback else "GPU"
-                    self.logger.log(f"Model loaded on {device_info} in {load_time:.2f}s")
+            if self.whisper_pool is not None:
+                with self.logger.subprocess("whisper_model_checkout"):
+                    model = self.whisper_pool.checkout()
+                self.used_cpu_fallback = getattr(model.model, "device", "cuda") == "cpu"
+            else:
+                if self.transcriber is None:
+                    with self.logger.subprocess("whisper_model_loading"):
+                        self.transcriber = self.load_whisper_model()
+                model = self.transcriber
 
             with self.logger.subprocess("whisper_inference"):
                 start_time = time.perf_counter()
 
-                segments, info = self.transcriber.transcribe(
+                segments, info = model.transcribe(
                     audio_path,
                     language=language,
                     beam_size=5,
@@ -342,8 +368,12 @@ class GPUTranscriptionPipeline:
                 'duration': info.duration
             }
         finally:
+            # Pooled models stay loaded for the next run
+            if self.whisper_pool is not None:
+                if model is not None:
+                    self.whisper_pool.checkin(model)
             # Free Whisper model from GPU after transcription completes
-            if self.transcriber is not None:
+            elif self.transcriber is not None:
                 try:
                     self._log_gpu_memory("Before Whisper Cleanup")
                     del self.transcriber
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Speaker Alignment
+=================
+
+Assigns each Whisper segment the pyannote speaker it overlaps most. This is
+the rule every aligner in the repo uses:
+
+1. The best turn is the one with the largest overlap in seconds. On a tie,
+   the turn that comes first in the input wins.
+2. If that overlap covers less than `overlap_threshold` of the segment, the
+   segment becomes UNKNOWN.
+3. With a fallback distance set, a segment below the threshold takes the
+   speaker of the nearest turn instead, if that turn is closer than the
+   distance. A turn after the segment is measured from the segment's end to
+   the turn's start. A turn before it is measured from the turn's end to the
+   segment's start. A turn that overlaps the segment is measured as
+   min(|seg_start - turn_end|, |seg_end - turn_start|).
+
+The rule is applied with a sweep instead of comparing every segment with
+every turn. Turns are sorted by start, and segments are visited in start
+order. A turn enters a heap keyed by end once it starts before the
+segment's end (plus the fallback distance). It is dropped once it ends
+before the segment's start (minus the fallback distance). Only the turns
+in that window are compared, so a session costs O((n + m) log m) plus the
+turns near each segment, instead of O(n * m). Results are identical to the
+nested loop, ties included.
+
+match_speakers_numpy computes the same result for batch use. It uses
+searchsorted over the sorted starts and the running maximum of the ends.
+"""
+
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+UNKNOWN_SPEAKER = "UNKNOWN"
+
+# Widens the fallback window so float rounding in (start + distance) never
+# drops a turn whose exact distance is just under the limit
+_WINDOW_MARGIN = 1e-6
+
+
+@dataclass
+class SpeakerMatch:
+    """Alignment of one segment"""
+    speaker: str
+    turn: Optional[int]      # index into turns of the assigned turn (None if UNKNOWN)
+    overlap_ratio: float     # best overlap / segment duration (0 without overlap)
+    fallback: bool = False   # assigned by the nearest-turn fallback
+    distance: float = 0.0    # gap to that nearest turn (fallback only)
+
+
+def _turn_distance(seg_start: float, seg_end: float, turn_start: float, turn_end: float) -> float:
+    """Gap between a segment and a turn, as the nearest-turn fallback measures it"""
+    if seg_end <= turn_start:
+        return turn_start - seg_end
+    if seg_start >= turn_end:
+        return seg_start - turn_end
+    return min(abs(seg_start - turn_end), abs(seg_end - turn_start))
+
+
+def match_speakers(segments: Sequence[Dict],
+                   turns: Sequence[Dict],
+                   overlap_threshold: float = 0.5,
+                   fallback_distance: Optional[float] = None) -> List[SpeakerMatch]:
+    """
+    Match each segment to a speaker turn (sweep over start-sorted turns).
+
+    Args:
+        segments: Whisper segments with start/end
+        turns: Speaker turns with start/end/speaker, in any order
+        overlap_threshold: Minimum share of the segment the best turn must cover
+        fallback_distance: Take the nearest turn's speaker below the threshold
+            when it is closer than this many seconds (None disables)
+
+    Returns:
+        One SpeakerMatch per segment, in segment order
+    """
+    reach = 0.0 if fallback_distance is None else fallback_distance + _WINDOW_MARGIN
+    turn_order = sorted(range(len(turns)), key=lambda i: turns[i]["start"])
+    segment_order = sorted(range(len(segments)), key=lambda i: segments[i]["start"])
+
+    matches: List[Optional[SpeakerMatch]] = [None] * len(segments)
+    active: List = []  # heap of (turn end, turn index)
+    next_turn = 0
+
+    for seg_idx in segment_order:
+        seg_start, seg_end = segments[seg_idx]["start"], segments[seg_idx]["end"]
+
+        while next_turn < len(turn_order) and turns[turn_order[next_turn]]["start"] < seg_end + reach:
+            turn_idx = turn_order[next_turn]
+            heapq.heappush(active, (turns[turn_idx]["end"], turn_idx))
+            next_turn += 1
+        while active and active[0][0] <= seg_start - reach:
+            heapq.heappop(active)
+
+        best, best_overlap = None, 0
+        for turn_end, turn_idx in active:
+            overlap = min(seg_end, turn_end) - max(seg_start, turns[turn_idx]["start"])
+            if overlap > 0 and (overlap > best_overlap or (overlap == best_overlap and turn_idx < best)):
+                best, best_overlap = turn_idx, overlap
+
+        seg_duration = seg_end - seg_start
+        ratio = best_overlap / seg_duration if best is not None else 0
+        match = SpeakerMatch(turns[best]["speaker"] if best is not None else UNKNOWN_SPEAKER, best, ratio)
+
+        if seg_duration > 0 and ratio < overlap_threshold:
+            match = SpeakerMatch(UNKNOWN_SPEAKER, None, ratio)
+            if fallback_distance is not None:
+                nearest, nearest_distance = None, float("inf")
+                for turn_end, turn_idx in active:
+                    distance = _turn_distance(seg_start, seg_end, turns[turn_idx]["start"], turn_end)
+                    if distance < nearest_distance or (distance == nearest_distance and turn_idx < nearest):
+                        nearest, nearest_distance = turn_idx, distance
+                if nearest is not None and turns[nearest]["speaker"] and nearest_distance < fallback_distance:
+                    match = SpeakerMatch(turns[nearest]["speaker"], nearest, ratio, True, nearest_distance)
+
+        matches[seg_idx] = match
+
+    return matches
+
+
+def align_speakers(segments: Sequence[Dict],
+                   turns: Sequence[Dict],
+                   overlap_threshold: float = 0.5,
+                   fallback_distance: Optional[float] = None) -> List[Dict]:
+    """Segments as start/end/text/speaker dicts, labelled by match_speakers"""
+    return [
+        {"start": seg["start"], "end": seg["end"], "text": seg["text"], "speaker": match.speaker}
+        for seg, match in zip(segments, match_speakers(segments, turns, overlap_threshold, fallback_distance))
+    ]
+
+
+def match_speakers_numpy(segments: Sequence[Dict],
+                         turns: Sequence[Dict],
+                         overlap_threshold: float = 0.5,
+                         fallback_distance: Optional[float] = None) -> Dict:
+    """
+    Vectorized match_speakers for batch use.
+
+    Each segment's candidates are a contiguous range of start-sorted turns.
+    Turns starting at or after the segment's end (plus the fallback
+    distance) are cut with searchsorted. Turns before that range are cut
+    where the running maximum of turn ends is still at or before the
+    segment's start (minus the fallback distance). All candidate pairs are
+    scored at once. A turn that covers much of the session keeps the
+    running maximum high and widens every range after it. The result is
+    still correct in that case, but memory grows with the number of pairs.
+
+    Returns:
+        Dict of arrays in segment order: "turn" (index into turns, -1 for
+        UNKNOWN), "overlap_ratio", "fallback" (bool) and "distance"
+    """
+    import numpy as np
+
+    n = len(segments)
+    reach = 0.0 if fallback_distance is None else fallback_distance + _WINDOW_MARGIN
+    seg_start = np.array([seg["start"] for seg in segments], dtype=np.float64)
+    seg_end = np.array([seg["end"] for seg in segments], dtype=np.float64)
+    turn_start = np.array([turn["start"] for turn in turns], dtype=np.float64)
+    turn_end = np.array([turn["end"] for turn in turns], dtype=np.float64)
+    has_label = np.array([bool(turn["speaker"]) for turn in turns], dtype=bool)
+
+    order = np.argsort(turn_start, kind="stable")
+    sorted_start, sorted_end = turn_start[order], turn_end[order]
+    running_end = np.maximum.accumulate(sorted_end) if len(turns) else sorted_end
+
+    lo = np.searchsorted(running_end, seg_start - reach, side="right")
+    hi = np.searchsorted(sorted_start, seg_end + reach, side="left")
+    counts = np.maximum(hi - lo, 0)
+
+    # Flatten candidate pairs: segment index, turn index
+    pair_seg = np.repeat(np.arange(n), counts)
+    offsets = np.arange(len(pair_seg)) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_turn = order[np.repeat(lo, counts) + offsets]
+
+    ps, pe = seg_start[pair_seg], seg_end[pair_seg]
+    ts, te = turn_start[pair_turn], turn_end[pair_turn]
+    overlap = np.minimum(pe, te) - np.maximum(ps, ts)
+
+    # Best overlap per segment; ties to the lowest turn index
+    no_turn = len(turns)
+    best_overlap = np.zeros(n)
+    np.maximum.at(best_overlap, pair_seg, np.where(overlap > 0, overlap, 0.0))
+    is_best = (overlap > 0) & (overlap == best_overlap[pair_seg])
+    best = np.full(n, no_turn)
+    np.minimum.at(best, pair_seg[is_best], pair_turn[is_best])
+
+    seg_duration = seg_end - seg_start
+    found = best < no_turn
+    ratio = np.zeros(n)
+    np.divide(best_overlap, seg_duration, out=ratio, where=found)
+
+    below = (seg_duration > 0) & (ratio < overlap_threshold)
+    turn = np.where(found & ~below, best, -1)
+    fallback = np.zeros(n, dtype=bool)
+    distance = np.zeros(n)
+
+    if fallback_distance is not None and below.any():
+        in_gap_after = pe <= ts
+        in_gap_before = ~in_gap_after & (ps >= te)
+        gap = np.where(in_gap_after, ts - pe, np.where(
+            in_gap_before, ps - te, np.minimum(np.abs(ps - te), np.abs(pe - ts))
+        ))
+
+        nearest_distance = np.full(n, np.inf)
+        np.minimum.at(nearest_distance, pair_seg, gap)
+        is_nearest = gap == nearest_distance[pair_seg]
+        nearest = np.full(n, no_turn)
+        np.minimum.at(nearest, pair_seg[is_nearest], pair_turn[is_nearest])
+
+        has_nearest = nearest < no_turn
+        labelled = np.zeros(n, dtype=bool)
+        labelled[has_nearest] = has_label[nearest[has_nearest]]
+        fallback = below & labelled & (nearest_distance < fallback_distance)
+        turn = np.where(fallback, nearest, turn)
+        distance = np.where(fallback, nearest_distance, 0.0)
+
+    return {"turn": turn, "overlap_ratio": ratio, "fallback": fallback, "distance": distance}
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Chunk Planning and Stitching for Long Whisper Transcriptions
+============================================================
+
+The Whisper API rejects uploads over 25MB. ChunkedWhisperTranscriber
+(pipeline.py) splits longer audio with these helpers:
+
+1. plan_chunks picks cut points at silences near a target chunk length,
+   so that no word is split. Each chunk also reaches overlap_seconds past
+   its cuts, which gives the model context at the edges.
+2. Each chunk is transcribed on its own, and its timestamps are relative to
+   the chunk's start.
+3. stitch_segments shifts the timestamps to absolute time. It keeps each
+   segment only from the chunk that owns the segment's midpoint, so text
+   heard in the overlap is not duplicated.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class AudioChunk:
+    """One chunk: audio [start, end) is sent, segments in [owned_start, owned_end) are kept"""
+    index: int
+    start: float
+    end: float
+    owned_start: float
+    owned_end: float
+
+
+def plan_chunks(duration: float,
+                silences: Sequence[Tuple[float, float]],
+                target_seconds: float,
+                search_seconds: float = 30.0,
+                overlap_seconds: float = 1.0) -> List[AudioChunk]:
+    """
+    Split [0, duration) into chunks of at most target_seconds.
+
+    Each cut goes at the middle of the longest silence that ends within
+    search_seconds before the target. Ties go to the silence closer to the
+    target. With no silence in range the cut falls at the target itself.
+    The overlap is added on top of target_seconds, so callers size the
+    target to leave room for it.
+    """
+    cuts = [0.0]
+    while duration - cuts[-1] > target_seconds:
+        target = cuts[-1] + target_seconds
+        candidates = [
+            (end - start, start, end) for start, end in silences
+            if target - search_seconds <= (start + end) / 2 <= target and (start + end) / 2 > cuts[-1]
+        ]
+        if candidates:
+            _, start, end = max(candidates, key=lambda c: (round(c[0], 3), c[1]))
+            cuts.append((start + end) / 2)
+        else:
+            cuts.append(target)
+    cuts.append(duration)
+
+    return [
+        AudioChunk(
+            index=i,
+            start=max(0.0, cuts[i] - overlap_seconds) if i else 0.0,
+            end=min(duration, cuts[i + 1] + overlap_seconds),
+            owned_start=cuts[i],
+            owned_end=cuts[i + 1] if i + 2 < len(cuts) else float("inf"),
+        )
+        for i in range(len(cuts) - 1)
+    ]
+
+
+def stitch_segments(chunks: Sequence[AudioChunk], results: Sequence[Dict]) -> List[Dict]:
+    """
+    Merge per-chunk transcription results into one absolute-time segment list.
+
+    A segment is kept by the chunk whose owned range contains its midpoint
+    in absolute time. So a sentence heard in the overlap of two chunks
+    appears once, taken from the chunk where it falls further from the edge.
+    """
+    segments: List[Dict] = []
+    for chunk, result in zip(chunks, results):
+        for seg in result.get("segments", []):
+            start, end = seg["start"] + chunk.start, seg["end"] + chunk.start
+            if chunk.owned_start <= (start + end) / 2 < chunk.owned_end:
+                segments.append({**seg, "start": round(start, 3), "end": round(end, 3)})
+
+    segments.sort(key=lambda seg: (seg["start"], seg["end"]))
+    return segments
+
+
+def chunk_target_seconds(duration: float,
+                         file_size_mb: float,
+                         max_file_size_mb: float,
+                         target_seconds: Optional[float] = None,
+                         overlap_seconds: float = 1.0,
+                         safety: float = 0.9) -> float:
+    """
+    Longest chunk (excluding overlap) whose upload stays under max_file_size_mb.
+
+    Estimated from the source's average bytes per second. Chunks are re-encoded
+    at the pipeline's 64k mono, so this errs on the small side for bigger sources.
+    """
+    seconds_per_mb = duration / file_size_mb if file_size_mb else float("inf")
+    fit = max_file_size_mb * safety * seconds_per_mb - 2 * overlap_seconds
+    return max(1.0, min(fit, target_seconds) if target_seconds else fit)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming audio preprocessing (audio_stream)
+
+Validates:
+1. Block-wise scan finds the same silence trim and peak as pydub
+2. Peak is taken from the kept span only, across block boundaries
+3. AudioPreprocessor output matches the pydub pipeline (length, peak, loudness)
+4. Fully silent input and the ffmpeg-only probe fallback
+
+Requires ffmpeg on PATH; the pydub comparisons also need pydub.
+"""
+
+import shutil
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+RATE = 44100
+
+
+def _write_wav(path: Path, channels: int, parts) -> Path:
+    """Write (seconds, amplitude, frequency) parts as 16-bit PCM"""
+    rng = np.random.default_rng(7)
+    chunks = []
+    for seconds, amplitude, frequency in parts:
+        t = np.arange(int(seconds * RATE)) / RATE
+        signal = amplitude * np.sin(2 * np.pi * frequency * t) + rng.normal(0, 3, len(t))
+        chunks.append(signal)
+    mono = np.concatenate(chunks)
+    frames = np.stack([mono * (1.0 - 0.3 * c) for c in range(channels)], axis=1)
+
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(channels)
+        out.setsampwidth(2)
+        out.setframerate(RATE)
+        out.writeframes(np.clip(frames, -32768, 32767).astype("<i2").tobytes())
+    return path
+
+
+@pytest.fixture
+def speech_like_wav(tmp_path: Path) -> Path:
+    """1.23s silence, speech-ish tone, a quiet pause, a louder tone, 2.5s silence"""
+    return _write_wav(tmp_path / "session.wav", 2, [
+        (1.23, 0, 0), (3.0, 3000, 220), (1.5, 50, 0), (2.0, 9000, 330), (2.5, 0, 0),
+    ])
+
+
+def test_scan_matches_pydub_trim_and_peak(speech_like_wav):
+    """Leading/trailing trim within one 10ms window of pydub, identical peak"""
+    pydub = pytest.importorskip("pydub")
+    from pydub.silence import detect_leading_silence
+    from audio_stream import scan_audio
+
+    audio = pydub.AudioSegment.from_file(str(speech_like_wav))
+    start_ms = detect_leading_silence(audio, silence_threshold=-40)
+    end_ms = len(audio) - detect_leading_silence(audio.reverse(), silence_threshold=-40)
+    trimmed = audio[start_ms:end_ms]
+
+    # Tiny blocks force windows, loud spans and the pending peak across block boundaries
+    for block_seconds in (0.37, 10.0):
+        scan = scan_audio(str(speech_like_wav), block_seconds=block_seconds)
+        assert scan.total_frames == int(audio.frame_count())
+        assert scan.start_frame == start_ms * RATE // 1000
+        assert abs(scan.end_frame - end_ms * RATE // 1000) < RATE // 100
+        assert scan.peak == trimmed.max
+
+
+def test_peak_ignores_trimmed_silence_clicks(tmp_path):
+    """A spike in the trailing 'silence' below threshold RMS must not set the gain"""
+    from audio_stream import scan_audio
+
+    path = _write_wav(tmp_path / "click.wav", 1, [(1.0, 4000, 200), (2.0, 0, 0)])
+    with wave.open(str(path), "rb") as src:
+        pcm = np.frombuffer(src.readframes(src.getnframes()), dtype="<i2").copy()
+    pcm[int(2.5 * RATE)] = 6000  # single-sample click: louder than the tone, but window RMS < -40 dBFS
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(RATE)
+        out.writeframes(pcm.tobytes())
+
+    scan = scan_audio(str(path), block_seconds=0.5)
+    assert scan.peak < 4100
+    assert abs(scan.end_frame - RATE) <= RATE // 100
+
+
+def test_preprocess_output_matches_pydub(speech_like_wav, tmp_path):
+    """Streaming preprocess gives the same 16kHz mono audio as the pydub chain"""
+    pydub = pytest.importorskip("pydub")
+    from pydub import effects
+    from pydub.silence import detect_leading_silence
+    from pipeline import AudioPreprocessor
+
+    audio = pydub.AudioSegment.from_file(str(speech_like_wav))
+    start_ms = detect_leading_silence(audio, silence_threshold=-40)
+    end_ms = len(audio) - detect_leading_silence(audio.reverse(), silence_threshold=-40)
+    expected = effects.normalize(audio[start_ms:end_ms], headroom=0.1).set_channels(1).set_frame_rate(16000)
+
+    preprocessor = AudioPreprocessor(target_format="wav")
+    output = preprocessor.preprocess(str(speech_like_wav), str(tmp_path / "out.wav"))
+    result = pydub.AudioSegment.from_file(output)
+
+    assert (result.channels, result.frame_rate) == (1, 16000)
+    assert abs(len(result) - len(expected)) <= 10
+    assert abs(result.max - expected.max) <= 0.01 * expected.max
+    assert abs(result.dBFS - expected.dBFS) < 0.1
+
+
+def test_silent_input_and_ffmpeg_probe_fallback(tmp_path, monkeypatch):
+    """All-silent audio trims to nothing; probing works without ffprobe"""
+    import audio_stream
+
+    path = _write_wav(tmp_path / "silent.wav", 2, [(1.5, 0, 0)])
+
+    monkeypatch.setattr(audio_stream, "FFPROBE_BINARY", "ffprobe-not-installed")
+    probe = audio_stream.probe_audio(str(path))
+    assert (probe["sample_rate"], probe["channels"]) == (RATE, 2)
+    assert abs(probe["duration_seconds"] - 1.5) < 0.01
+
+    scan = audio_stream.scan_audio(str(path), probe=probe)
+    assert scan.is_silent and scan.peak == 0 and scan.trimmed_seconds == pytest.approx(1.5)
+    assert audio_stream.normalization_gain_db(scan.peak) == 0.0
+
+    with pytest.raises(RuntimeError):
+        audio_stream.probe_audio(str(tmp_path / "missing.wav"))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for overlapping pipeline stages
+
+Validates:
+1. PerformanceLogger keeps a stage stack per thread, so stages started on
+   different threads overlap without corrupting each other
+2. The critical-path summary follows the chain that set the end-to-end time
+3. EnhancedAudioTranscriptionPipeline.process runs diarization alongside
+   transcription (fake stages, no API or model needed)
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from performance_logger import PerformanceLogger
+
+
+def _stage(logger, name, seconds, nested=None):
+    logger.start_stage(name)
+    if nested:
+        logger.start_stage(nested)
+        time.sleep(seconds / 2)
+        logger.end_stage(nested)
+    time.sleep(seconds)
+    with logger.subprocess(f"{name}_work"):
+        pass
+    logger.end_stage(name)
+
+
+def test_stages_overlap_across_threads(tmp_path):
+    """Per-thread stacks: each thread closes its own stage and records its own subprocesses"""
+    logger = PerformanceLogger(name="OverlapTest", output_dir=str(tmp_path), enable_gpu_monitoring=False,
+                               verbose=False)
+    logger.start_pipeline()
+    _stage(logger, "Preprocessing", 0.05)
+
+    worker = threading.Thread(target=_stage, args=(logger, "Diarization", 0.3), name="diarization")
+    worker.start()
+    _stage(logger, "Transcription", 0.15, nested="Upload")
+    worker.join()
+
+    _stage(logger, "Alignment", 0.02)
+    logger.end_pipeline()
+
+    stages = logger.metrics["stages"]
+    assert set(stages) == {"Preprocessing", "Diarization", "Transcription", "Upload", "Alignment"}
+    assert stages["Diarization"]["thread"] == "diarization"
+    assert stages["Transcription"]["thread"] == threading.current_thread().name
+    assert set(stages["Diarization"]["subprocesses"]) == {"Diarization_work"}
+    assert set(stages["Transcription"]["subprocesses"]) == {"Transcription_work"}
+    assert stages["Diarization"]["start_offset"] < stages["Transcription"]["end_offset"]
+
+    critical = logger.metrics["critical_path"]
+    assert critical["path"] == ["Preprocessing", "Diarization", "Alignment"]
+    assert critical["overlapping_stages"] == ["Diarization", "Transcription"]
+    # Nested Upload is part of Transcription, not a separate stage on the timeline
+    assert "Upload" not in critical["path"] and critical["overlap_saved"] == pytest.approx(0.225, abs=0.05)
+    assert critical["stage_wall_time"] <= logger.metrics["total_duration"]
+
+    report = logger.generate_text_report()
+    assert "Critical Path:" in report and "Preprocessing -> Diarization -> Alignment" in report
+    assert "[diarization]" in report
+
+
+def test_end_stage_by_name_out_of_order(tmp_path):
+    """Closing an outer stage by name leaves the inner one open on the stack"""
+    logger = PerformanceLogger(output_dir=str(tmp_path), enable_gpu_monitoring=False, verbose=False)
+    logger.start_stage("Outer")
+    logger.start_stage("Inner")
+    logger.end_stage("Outer")
+    assert logger.current_stage["name"] == "Inner"
+    logger.end_stage()
+    assert logger.current_stage is None and set(logger.metrics["stages"]) == {"Outer", "Inner"}
+
+
+class FakePreprocessor:
+    def validate_audio(self, audio_path):
+        return {"valid": True, "duration_seconds": 60.0, "file_size_mb": 1.0}
+
+    def preprocess(self, audio_path):
+        return audio_path
+
+
+class FakeTranscriber:
+    def __init__(self, logger, seconds=0.3):
+        self.logger, self.seconds = logger, seconds
+
+    def transcribe(self, audio_path):
+        self.logger.start_stage("Whisper Transcription")
+        time.sleep(self.seconds)
+        self.logger.end_stage("Whisper Transcription")
+        return {"segments": [{"start": 0.0, "end": 2.0, "text": "Hello."},
+                             {"start": 2.5, "end": 4.0, "text": "Hi there."}],
+                "full_text": "Hello. Hi there.", "language": "en", "duration": 4.0}
+
+
+class FakeDiarizer:
+    def __init__(self, logger, seconds=0.4, error=None):
+        self.logger, self.seconds, self.error = logger, seconds, error
+        self.thread = None
+
+    def diarize(self, audio_path):
+        self.thread = threading.current_thread().name
+        self.logger.start_stage("Speaker Diarization")
+        try:
+            time.sleep(self.seconds)
+            if self.error:
+                raise self.error
+        finally:
+            self.logger.end_stage("Speaker Diarization")
+        return [{"speaker": "SPEAKER_00", "start": 0.0, "end": 2.2},
+                {"speaker": "SPEAKER_01", "start": 2.2, "end": 4.0}]
+
+
+@pytest.fixture
+def enhanced_pipeline(tmp_path, monkeypatch):
+    pytest.importorskip("openai")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    from pipeline_enhanced import EnhancedAudioTranscriptionPipeline
+
+    pipeline = EnhancedAudioTranscriptionPipeline(output_dir=str(tmp_path))
+    pipeline.logger.enable_gpu_monitoring = False
+    pipeline.logger.gpu_monitor = None
+    pipeline.logger.verbose = False
+    pipeline.preprocessor = FakePreprocessor()
+    pipeline.transcriber = FakeTranscriber(pipeline.logger)
+    pipeline.diarizer = FakeDiarizer(pipeline.logger)
+    # The default alignment picks a torch backend; the CPU path is enough here
+    monkeypatch.setattr(pipeline, "_align_speakers_with_segments", pipeline._align_speakers_cpu)
+    return pipeline
+
+
+def test_enhanced_pipeline_overlaps_transcription_and_diarization(enhanced_pipeline):
+    """Wall time ~ max(transcription, diarization), not the sum; critical path reported"""
+    start = time.perf_counter()
+    result = enhanced_pipeline.process("session.mp3", enable_diarization=True)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.6  # sequential would be >= 0.7s
+    assert enhanced_pipeline.diarizer.thread.startswith("diarization")
+    assert [seg["speaker"] for seg in result["aligned_segments"]] == ["SPEAKER_00", "SPEAKER_01"]
+
+    critical = result["performance_metrics"]["critical_path"]
+    assert critical["path"] == ["Speaker Diarization", "Speaker Alignment"]
+    assert critical["overlapping_stages"] == ["Speaker Diarization", "Whisper Transcription"]
+    assert critical["overlap_saved"] == pytest.approx(0.3, abs=0.1)
+
+
+def test_enhanced_pipeline_surfaces_diarization_errors(enhanced_pipeline):
+    """A diarization failure still fails the run, after transcription finished"""
+    enhanced_pipeline.diarizer = FakeDiarizer(enhanced_pipeline.logger, seconds=0.05,
+                                              error=RuntimeError("model failed"))
+    with pytest.raises(RuntimeError, match="model failed"):
+        enhanced_pipeline.process("session.mp3", enable_diarization=True)
+
+    result = enhanced_pipeline.process("session.mp3", enable_diarization=False)
+    assert "aligned_segments" not in result
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for the warm model pool (model_pool)
+
+Validates:
+1. Instances load once and are reused across jobs
+2. Concurrent workers each get their own instance, up to the pool size,
+   and wait beyond it
+3. Memory pressure stops growth and evicts idle instances down to keep_warm,
+   and a threshold set without psutil is warned about
+4. A failed load frees its slot; a closed pool refuses checkouts
+
+Uses a fake model factory, so no torch or pyannote is needed.
+"""
+
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import model_pool
+from model_pool import ModelPool
+
+
+class FakeModel:
+    """Stands in for a loaded diarizer; tracks concurrent use"""
+    instances = 0
+
+    def __init__(self, load_seconds=0.0):
+        time.sleep(load_seconds)
+        FakeModel.instances += 1
+        self.id = FakeModel.instances
+        self.in_use = False
+
+    def run(self, seconds):
+        assert not self.in_use, "instance shared between workers"
+        self.in_use = True
+        time.sleep(seconds)
+        self.in_use = False
+        return self.id
+
+
+@pytest.fixture(autouse=True)
+def reset_instances():
+    FakeModel.instances = 0
+
+
+def test_warm_pool_loads_once_and_reuses():
+    """Warm-up pays the load; later jobs reuse the same instance"""
+    pool = ModelPool(lambda: FakeModel(load_seconds=0.1), size=2, name="fake")
+    assert pool.warm() == 1 and pool.warm() == 0
+
+    start = time.perf_counter()
+    ids = []
+    for _ in range(5):
+        with pool.acquire() as model:
+            ids.append(model.run(0))
+    assert time.perf_counter() - start < 0.05
+    assert ids == [1] * 5
+
+    stats = pool.get_stats()
+    assert (stats["loads"], stats["reuses"], stats["loaded"], stats["idle"]) == (1, 5, 1, 1)
+    assert stats["load_seconds"] == pytest.approx(0.1, abs=0.05)
+
+
+def test_concurrent_workers_capped_at_pool_size():
+    """Three workers, size 2: two instances, the third worker waits"""
+    pool = ModelPool(FakeModel, size=2, name="fake")
+    barrier = threading.Barrier(3)
+
+    def job():
+        barrier.wait()
+        with pool.acquire() as model:
+            return model.run(0.1)
+
+    threads = [threading.Thread(target=job) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool.get_stats()
+    assert stats["loads"] == 2 and stats["waits"] == 1 and stats["idle"] == 2
+
+    with pool.acquire():
+        with pool.acquire():
+            with pytest.raises(TimeoutError):
+                pool.checkout(timeout=0.05)
+
+
+def test_memory_pressure_evicts_idle_and_stops_growth(monkeypatch):
+    """Under pressure: LRU idle instances are unloaded and no new ones are loaded"""
+    pool = ModelPool(FakeModel, size=3, name="fake", min_available_mb=1024, keep_warm=1)
+    monkeypatch.setattr(model_pool, "available_memory_mb", lambda: 4096.0)
+    assert pool.warm(3) == 3
+
+    monkeypatch.setattr(model_pool, "available_memory_mb", lambda: 512.0)
+    assert pool.trim() == 2
+    assert pool.get_stats()["loaded"] == 1
+
+    # The warm instance is busy; a second job waits instead of loading
+    first = pool.checkout()
+    with pytest.raises(TimeoutError):
+        pool.checkout(timeout=0.05)
+    pool.checkin(first)
+    assert pool.get_stats()["loads"] == 3
+
+    # Pressure gone: the pool grows again on demand
+    monkeypatch.setattr(model_pool, "available_memory_mb", lambda: 4096.0)
+    with pool.acquire():
+        with pool.acquire() as second:
+            assert second.id == 4
+    assert pool.get_stats()["evictions"] == 2
+
+    # Without psutil the pool never evicts
+    monkeypatch.setattr(model_pool, "available_memory_mb", lambda: None)
+    assert not pool.under_memory_pressure()
+
+
+def test_threshold_without_psutil_warns(monkeypatch, caplog):
+    """A memory threshold that can never trigger (no psutil) is logged, not silently ignored"""
+    monkeypatch.setattr(model_pool, "HAS_PSUTIL", False)
+    with caplog.at_level(logging.WARNING, logger="model_pool"):
+        ModelPool(FakeModel, name="fake")
+    assert not caplog.records
+
+    with caplog.at_level(logging.WARNING, logger="model_pool"):
+        pool = ModelPool(FakeModel, name="fake", min_available_mb=2048)
+    assert "psutil is not installed" in caplog.text and "fake pool" in caplog.text
+    assert not pool.under_memory_pressure()
+
+
+def test_failed_load_frees_slot_and_close_refuses():
+    """A factory error propagates without leaking a slot; close unloads"""
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("HF_TOKEN not found in environment")
+        return FakeModel()
+
+    pool = ModelPool(flaky, size=1, name="fake")
+    with pytest.raises(ValueError):
+        pool.checkout()
+    assert pool.get_stats()["loaded"] == 0
+
+    model = pool.checkout(timeout=1)
+    pool.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        pool.checkout()
+    pool.checkin(model)
+    assert pool.get_stats()["loaded"] == 0
+
+    with pytest.raises(ValueError):
+        ModelPool(FakeModel, size=0)
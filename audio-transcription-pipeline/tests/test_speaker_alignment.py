@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for the sweep-line speaker alignment (speaker_alignment)
+
+Validates:
+1. match_speakers gives the same speakers as the nested loops it replaced
+   (50% threshold; 30% threshold with the 5s nearest-turn fallback), ties
+   and overlapping, unsorted, touching and zero-length inputs included
+2. match_speakers_numpy agrees with match_speakers
+3. improved_alignment and PipelineService keep their output format
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from speaker_alignment import UNKNOWN_SPEAKER, align_speakers, match_speakers, match_speakers_numpy
+
+
+# ============================================================================
+# Reference: the nested loops the sweep replaced
+# ============================================================================
+
+def nested_loop_alignment(segments, turns, overlap_threshold, use_nearest_fallback):
+    """(speaker, overlap_ratio) per segment, as the original aligners computed them"""
+    results = []
+    for seg in segments:
+        seg_start, seg_end = seg["start"], seg["end"]
+        seg_duration = seg_end - seg_start
+
+        best_speaker, best_overlap, best_overlap_ratio = "UNKNOWN", 0, 0
+        for turn in turns:
+            overlap = max(0, min(seg_end, turn["end"]) - max(seg_start, turn["start"]))
+            if overlap > best_overlap:
+                best_overlap = overlap
+                best_overlap_ratio = overlap / seg_duration if seg_duration > 0 else 0
+                best_speaker = turn["speaker"]
+
+        if seg_duration > 0 and best_overlap_ratio < overlap_threshold:
+            best_speaker = "UNKNOWN"
+            if use_nearest_fallback:
+                min_distance, nearest_speaker = float("inf"), None
+                for turn in turns:
+                    distance = min(abs(seg_start - turn["end"]), abs(seg_end - turn["start"]))
+                    if seg_end <= turn["start"]:
+                        distance = turn["start"] - seg_end
+                    elif seg_start >= turn["end"]:
+                        distance = seg_start - turn["end"]
+                    if distance < min_distance:
+                        min_distance, nearest_speaker = distance, turn["speaker"]
+                if nearest_speaker and min_distance < 5.0:
+                    best_speaker = nearest_speaker
+
+        results.append((best_speaker, best_overlap_ratio))
+    return results
+
+
+def random_session(seed, n_segments=300, n_turns=150, grid=None):
+    """Random segments/turns; grid snaps times so exact ties and touching edges occur"""
+    rng = random.Random(seed)
+    snap = (lambda t: round(t / grid) * grid) if grid else (lambda t: t)
+    length = n_segments * 3.0
+
+    segments = []
+    for _ in range(n_segments):
+        start = snap(rng.uniform(0, length))
+        end = snap(start + rng.choice([0.0, rng.uniform(0.1, 1.0), rng.uniform(1.0, 8.0), rng.uniform(1.0, 8.0)]))
+        segments.append({"start": start, "end": end, "text": "x"})
+
+    # Sparse turns, a few long ones spanning others, plus copies with another
+    # label (overlap and distance ties go to the turn earlier in the list)
+    turns = []
+    for _ in range(n_turns):
+        start = snap(rng.uniform(0, length))
+        end = snap(start + rng.uniform(0.2, 6.0) * rng.choice([1, 1, 1, 1, 8]))
+        turns.append({"start": start, "end": end, "speaker": f"SPEAKER_{rng.randrange(3):02d}"})
+    turns += [{**turn, "speaker": "SPEAKER_09"} for turn in turns[:n_turns // 3]]
+    rng.shuffle(turns)
+    return segments, turns
+
+
+CASES = [(seed, grid) for seed in range(6) for grid in (None, 0.5)]
+
+
+@pytest.mark.parametrize("seed,grid", CASES)
+@pytest.mark.parametrize("threshold,fallback", [(0.5, None), (0.3, 5.0), (0.3, None)])
+def test_sweep_matches_nested_loop(seed, grid, threshold, fallback):
+    """Same speaker and overlap ratio for every segment"""
+    segments, turns = random_session(seed, grid=grid)
+    expected = nested_loop_alignment(segments, turns, threshold, fallback is not None)
+
+    matches = match_speakers(segments, turns, overlap_threshold=threshold, fallback_distance=fallback)
+    assert [(m.speaker, m.overlap_ratio) for m in matches] == expected
+    assert all((m.turn is None) == (m.speaker == UNKNOWN_SPEAKER) for m in matches)
+
+    arrays = match_speakers_numpy(segments, turns, overlap_threshold=threshold, fallback_distance=fallback)
+    assert list(arrays["turn"]) == [-1 if m.turn is None else m.turn for m in matches]
+    assert list(arrays["overlap_ratio"]) == [m.overlap_ratio for m in matches]
+    assert list(arrays["fallback"]) == [m.fallback for m in matches]
+    assert list(arrays["distance"]) == [m.distance for m in matches]
+
+
+def test_edge_cases():
+    """Empty inputs, touching turns, fallback limit and unlabelled turns"""
+    assert match_speakers([], [{"start": 0, "end": 1, "speaker": "A"}]) == []
+    assert align_speakers([{"start": 0, "end": 1, "text": "hi"}], []) == [
+        {"start": 0, "end": 1, "text": "hi", "speaker": UNKNOWN_SPEAKER}
+    ]
+
+    segments = [{"start": 10.0, "end": 12.0, "text": "gap"}, {"start": 30.0, "end": 31.0, "text": "far"}]
+    turns = [{"start": 0.0, "end": 10.0, "speaker": "A"}, {"start": 14.0, "end": 20.0, "speaker": "B"},
+             {"start": 31.0, "end": 36.0, "speaker": ""}]
+    matches = match_speakers(segments, turns, overlap_threshold=0.3, fallback_distance=5.0)
+    # Touching turn A is 0s away; the only turn near "far" has no label
+    assert [(m.speaker, m.fallback, m.distance) for m in matches] == [("A", True, 0.0), (UNKNOWN_SPEAKER, False, 0.0)]
+    assert nested_loop_alignment(segments, turns, 0.3, True)[1][0] == "UNKNOWN"
+
+    arrays = match_speakers_numpy(segments, turns, overlap_threshold=0.3, fallback_distance=5.0)
+    assert list(arrays["turn"]) == [0, -1]
+    empty = match_speakers_numpy(segments, [], fallback_distance=5.0)
+    assert list(empty["turn"]) == [-1, -1] and not empty["fallback"].any()
+
+
+def test_improved_alignment_output_unchanged(capsys):
+    """align_speakers_with_segments_improved keeps its fields and debug output"""
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from improved_alignment import align_speakers_with_segments_improved
+
+    segments, turns = random_session(11, n_segments=200, n_turns=80, grid=0.5)
+    expected = nested_loop_alignment(segments, turns, 0.3, True)
+
+    aligned = align_speakers_with_segments_improved(segments, turns, debug=True)
+    assert [seg["speaker"] for seg in aligned] == [speaker for speaker, _ in expected]
+    assert [seg["overlap_ratio"] for seg in aligned] == [
+        ratio if speaker != "UNKNOWN" else 0 for speaker, ratio in expected
+    ]
+    assert "Threshold misses rescued by fallback" in capsys.readouterr().out
+
+
+def test_pipeline_service_alignment_unchanged():
+    """PipelineService._align_speakers_cpu: 30% + fallback, with speaker_id"""
+    sys.path.insert(0, str(Path(__file__).parent.parent / "ui-web" / "backend"))
+    from app.services.pipeline_service import PipelineService
+
+    segments, turns = random_session(12, grid=0.5)
+    aligned = PipelineService._align_speakers_cpu(None, segments, turns)
+    expected = [speaker for speaker, _ in nested_loop_alignment(segments, turns, 0.3, True)]
+    assert [seg["speaker"] for seg in aligned] == expected
+    assert all(seg["speaker_id"] == seg["speaker"] for seg in aligned)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Tests for chunked Whisper transcription of files over the API size limit
+
+Validates:
+1. Chunk planning cuts at silences near the target length (hard cut if none)
+2. Stitching shifts timestamps to absolute time and drops overlap duplicates
+3. End-to-end against a local stand-in for the transcription API: every
+   utterance appears exactly once with correct absolute timestamps
+4. Concurrent chunks vs sequential chunking (speedup is printed)
+
+The stand-in server decodes each upload with ffmpeg and reports one segment
+per tone burst, labelled by its frequency. Requires ffmpeg on PATH.
+"""
+
+import email.parser
+import email.policy
+import json
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from whisper_chunking import AudioChunk, plan_chunks, stitch_segments
+
+RATE = 16000
+
+
+# ============================================================================
+# Local stand-in for POST /v1/audio/transcriptions
+# ============================================================================
+
+def _utterances(pcm: np.ndarray):
+    """(start, end, frequency) of tone bursts in 16kHz mono PCM"""
+    window = RATE // 100
+    frames = len(pcm) // window * window
+    rms = np.sqrt(np.mean(pcm[:frames].reshape(-1, window).astype(np.float64) ** 2, axis=1))
+    loud = np.concatenate(([0], (rms > 300).astype(np.int8), [0]))
+    edges = np.diff(loud)
+    bursts = []
+    for first, last in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+        if last - first < 10:
+            continue
+        samples = pcm[first * window:last * window].astype(np.float64)
+        frequency = np.argmax(np.abs(np.fft.rfft(samples))) * RATE / len(samples)
+        bursts.append((first / 100, last / 100, int(round(frequency / 20) * 20)))
+    return bursts
+
+
+class StandInWhisper(BaseHTTPRequestHandler):
+    latency = 0.3               # fixed per-request overhead (upload, queueing)
+    seconds_per_audio_second = 0.01
+    calls = 0
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        message = email.parser.BytesParser(policy=email.policy.default).parsebytes(
+            b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+        )
+        upload = next(part.get_content() for part in message.iter_parts()
+                      if part.get_param("name", header="content-disposition") == "file")
+
+        cls = type(self)
+        with cls.lock:
+            cls.calls += 1
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            decoded = subprocess.run(
+                ["ffmpeg", "-v", "error", "-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(RATE), "-"],
+                input=upload, capture_output=True, check=True
+            ).stdout
+            pcm = np.frombuffer(decoded, dtype="<i2")
+            duration = len(pcm) / RATE
+            time.sleep(cls.latency + duration * cls.seconds_per_audio_second)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+        segments = [
+            {"id": i, "seek": 0, "start": start, "end": end, "text": f" utterance {frequency}",
+             "tokens": [], "temperature": 0.0, "avg_logprob": 0.0, "compression_ratio": 1.0,
+             "no_speech_prob": 0.0}
+            for i, (start, end, frequency) in enumerate(_utterances(pcm))
+        ]
+        payload = json.dumps({
+            "task": "transcribe", "language": "english", "duration": duration,
+            "text": "".join(seg["text"] for seg in segments), "segments": segments,
+        }).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def whisper_standin(monkeypatch):
+    """Point the OpenAI client at the local stand-in"""
+    if shutil.which("ffmpeg") is None:
+        pytest.skip("ffmpeg not installed")
+    pytest.importorskip("tenacity")
+
+    StandInWhisper.calls = StandInWhisper.max_in_flight = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInWhisper)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    yield StandInWhisper
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def long_session(tmp_path):
+    """~110s of 24 tone-burst 'utterances' with 0.5-1.5s pauses, as 64k MP3; returns (path, truth)"""
+    rng = np.random.default_rng(3)
+    pieces, truth, cursor = [np.zeros(RATE)], [], 1.0
+    for i in range(24):
+        length, pause, frequency = rng.uniform(2.0, 4.0), rng.uniform(0.5, 1.5), 300 + 40 * i
+        t = np.arange(int(length * RATE)) / RATE
+        pieces += [6000 * np.sin(2 * np.pi * frequency * t), np.zeros(int(pause * RATE))]
+        truth.append((cursor, cursor + len(t) / RATE, f"utterance {frequency}"))
+        cursor += len(t) / RATE + int(pause * RATE) / RATE
+
+    wav_path, mp3_path = tmp_path / "session.wav", tmp_path / "session.mp3"
+    with wave.open(str(wav_path), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(RATE)
+        out.writeframes(np.concatenate(pieces).astype("<i2").tobytes())
+    subprocess.run(["ffmpeg", "-v", "error", "-y", "-i", str(wav_path), "-b:a", "64k", str(mp3_path)], check=True)
+    return str(mp3_path), truth
+
+
+def _transcriber(max_concurrency=4, max_file_size_mb=0.2):
+    from pipeline import ChunkedWhisperTranscriber, WhisperTranscriber
+
+    return ChunkedWhisperTranscriber(
+        WhisperTranscriber(rate_limit_delay=0.05),
+        max_file_size_mb=max_file_size_mb,
+        max_concurrency=max_concurrency,
+    )
+
+
+# ============================================================================
+# Tests
+# ============================================================================
+
+def test_plan_chunks_cuts_at_longest_nearby_silence():
+    """Cuts land mid-silence within the search window, else at the target"""
+    silences = [(100.0, 100.4), (110.0, 111.0), (118.0, 118.2), (250.0, 252.0)]
+    chunks = plan_chunks(300.0, silences, target_seconds=120.0, search_seconds=30.0, overlap_seconds=1.0)
+
+    # 110.5: longest silence in [90, 120]; 230.5: none in [200.5, 230.5] -> hard cut
+    assert [c.owned_start for c in chunks] == [0.0, 110.5, 230.5]
+    assert [(c.start, c.end) for c in chunks] == [(0.0, 111.5), (109.5, 231.5), (229.5, 300.0)]
+    assert chunks[-1].owned_end == float("inf")
+    assert plan_chunks(50.0, silences, target_seconds=120.0) == [AudioChunk(0, 0.0, 50.0, 0.0, float("inf"))]
+
+
+def test_stitch_shifts_timestamps_and_drops_overlap_duplicates():
+    """Overlap text is kept once, from the chunk owning its midpoint"""
+    chunks = [AudioChunk(0, 0.0, 11.0, 0.0, 10.0), AudioChunk(1, 9.0, 20.0, 10.0, float("inf"))]
+    results = [
+        {"segments": [{"start": 1.0, "end": 4.0, "text": "a"}, {"start": 8.5, "end": 9.6, "text": "b"},
+                      {"start": 10.4, "end": 11.0, "text": "c (cut)"}]},
+        {"segments": [{"start": 0.0, "end": 0.6, "text": "b (cut)"}, {"start": 1.4, "end": 4.0, "text": "c"}]},
+    ]
+    stitched = stitch_segments(chunks, results)
+    assert [(s["start"], s["end"], s["text"]) for s in stitched] == [(1.0, 4.0, "a"), (8.5, 9.6, "b"),
+                                                                     (10.4, 13.0, "c")]
+
+
+def test_oversized_file_transcribed_in_chunks_with_absolute_timestamps(whisper_standin, long_session):
+    """Every utterance exactly once, timestamps within 50ms, chunks sent concurrently"""
+    path, truth = long_session
+    result = _transcriber().transcribe(path, language="en")
+
+    assert result["chunks"] > 3 and whisper_standin.calls == result["chunks"]
+    assert whisper_standin.max_in_flight > 1
+    assert [seg["text"] for seg in result["segments"]] == [text for _, _, text in truth]
+    for seg, (start, end, _) in zip(result["segments"], truth):
+        assert abs(seg["start"] - start) < 0.05 and abs(seg["end"] - end) < 0.05
+    assert result["full_text"].startswith("utterance 300 utterance 340")
+    assert abs(result["duration"] - truth[-1][1]) < 2.0
+
+    # Under the limit: one plain request
+    whisper_standin.calls = 0
+    small = _transcriber(max_file_size_mb=25).transcribe(path, language="en")
+    assert small["chunks"] == 1 and whisper_standin.calls == 1
+
+
+def test_concurrent_chunks_faster_than_sequential(whisper_standin, long_session):
+    """Same stitched output; concurrency hides per-request latency"""
+    path, _ = long_session
+
+    start = time.perf_counter()
+    sequential = _transcriber(max_concurrency=1).transcribe(path, language="en")
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    concurrent = _transcriber(max_concurrency=4).transcribe(path, language="en")
+    concurrent_time = time.perf_counter() - start
+
+    assert concurrent["segments"] == sequential["segments"]
+    assert sequential_time / concurrent_time > 1.8
+    print(f"✓ {concurrent['chunks']} chunks: sequential {sequential_time:.2f}s, "
+          f"concurrent {concurrent_time:.2f}s ({sequential_time / concurrent_time:.1f}x)")
@@ -34,6 +34,8 @@ def get_pipeline_service() -> PipelineService:
     if _pipeline_service is None:
         _pipeline_service = PipelineService(
             pipeline_path=settings.pipeline_path,
-            results_dir=settings.results_dir
+            results_dir=settings.results_dir,
+            diarizer_pool_size=settings.diarizer_pool_size,
+            min_available_memory_mb=settings.model_pool_min_available_mb
         )
     return _pipeline_service
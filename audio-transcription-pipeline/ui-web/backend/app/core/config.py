@@ -33,6 +33,11 @@ class Settings(BaseSettings):
     max_concurrent_jobs: int = 3
     job_timeout_seconds: int = 3600
 
+    # Model pool (diarization models stay loaded between jobs)
+    diarizer_pool_size: int = 1
+    warm_models_on_startup: bool = True
+    model_pool_min_available_mb: int = 2048
+
     # Logging
     log_level: str = "INFO"
 
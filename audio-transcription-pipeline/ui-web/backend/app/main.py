@@ -1,10 +1,12 @@
 """Main FastAPI application"""
 import os
+import asyncio
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.routes import upload, transcription, websocket
+from app.api.deps import get_pipeline_service
 
 # Configure logging
 logging.basicConfig(
@@ -71,10 +73,16 @@ async def startup_event():
     if settings.huggingface_token:
         os.environ["HUGGINGFACE_TOKEN"] = settings.huggingface_token
 
+    # Load the diarization model once, before the first job needs it
+    if settings.warm_models_on_startup:
+        logger.info(f"Warming diarization model pool (size {settings.diarizer_pool_size})")
+        await asyncio.get_event_loop().run_in_executor(None, get_pipeline_service().warm_up)
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown tasks"""
     logger.info("Shutting down Audio Transcription API")
+    get_pipeline_service().shutdown()
 
 if __name__ == "__main__":
     import uvicorn
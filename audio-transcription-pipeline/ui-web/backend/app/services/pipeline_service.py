@@ -1,4 +1,5 @@
 """Pipeline service - wraps existing audio transcription pipeline"""
+import os
 import sys
 import json
 import asyncio
@@ -13,13 +14,21 @@ logger = logging.getLogger(__name__)
 class PipelineService:
     """Wraps the existing pipeline.py to run transcriptions"""
 
-    def __init__(self, pipeline_path: Path, results_dir: Path):
+    def __init__(
+        self,
+        pipeline_path: Path,
+        results_dir: Path,
+        diarizer_pool_size: int = 1,
+        min_available_memory_mb: Optional[float] = 2048
+    ):
         """
         Initialize pipeline service
 
         Args:
             pipeline_path: Path to the existing pipeline.py (../../src/pipeline.py)
             results_dir: Directory to store results JSON files
+            diarizer_pool_size: Diarization models kept loaded across jobs
+            min_available_memory_mb: Below this much free memory, idle models are evicted
         """
         self.pipeline_path = pipeline_path.resolve()
         self.results_dir = results_dir
@@ -33,10 +42,30 @@ class PipelineService:
         if str(pipeline_dir) not in sys.path:
             sys.path.insert(0, str(pipeline_dir))
 
+        # Diarization models stay loaded between jobs; each job borrows one
+        from model_pool import ModelPool
+        self.diarizer_pool = ModelPool(
+            self._load_diarizer,
+            size=diarizer_pool_size,
+            name="diarization",
+            min_available_mb=min_available_memory_mb
+        )
+
+    def warm_up(self, count: int = 1) -> None:
+        """Load diarization models before the first job (called at startup)"""
+        try:
+            loaded = self.diarizer_pool.warm(count)
+            stats = self.diarizer_pool.get_stats()
+            logger.info(f"Diarization model pool warm: {loaded} loaded in {stats['load_seconds']:.2f}s")
+        except Exception as e:
+            logger.warning(f"Diarization warm-up failed, loading on first job instead: {e}")
+
     def shutdown(self):
-        """Cleanup thread pool executor"""
+        """Cleanup thread pool executor and unload pooled models"""
         if hasattr(self, 'executor'):
             self.executor.shutdown(wait=True)
+        if hasattr(self, 'diarizer_pool'):
+            self.diarizer_pool.close()
 
     async def run_transcription(
         self,
@@ -61,42 +90,12 @@ class PipelineService:
         start_time = time.time()
 
         try:
-            # Fix torchaudio compatibility issue with speechbrain
-            # speechbrain expects list_audio_backends() which was removed in torchaudio 2.1+
-            import torchaudio
-            if not hasattr(torchaudio, 'list_audio_backends'):
-                torchaudio.list_audio_backends = lambda: ['soundfile']
-                logger.info("Applied torchaudio compatibility patch for speechbrain")
-
-            # Fix PyTorch 2.9 weights_only security restriction
-            # Pyannote models need several classes to be allowlisted
-            import torch
-            if hasattr(torch, 'serialization') and hasattr(torch.serialization, 'add_safe_globals'):
-                try:
-                    # Import all pyannote classes that need to be allowlisted
-                    from pyannote.audio.core.task import Specifications, Problem, Resolution
-                    from pyannote.core import SlidingWindowFeature, Segment, Timeline, Annotation
-
-                    torch.serialization.add_safe_globals([
-                        torch.torch_version.TorchVersion,
-                        Specifications,
-                        Problem,
-                        Resolution,
-                        SlidingWindowFeature,
-                        Segment,
-                        Timeline,
-                        Annotation
-                    ])
-                    logger.info("Applied PyTorch 2.9 weights_only compatibility patch (8 classes)")
-                except Exception as e:
-                    logger.warning(f"Failed to apply PyTorch weights_only patch: {e}")
-
-            # Import transcriber and diarizer (skip preprocessing due to Python 3.14 audioop issue)
-            from pipeline import WhisperTranscriber
-            from pipeline_enhanced import SpeakerDiarizer
+            # Import transcriber (skip preprocessing due to Python 3.14 audioop issue);
+            # the diarizer comes from self.diarizer_pool in _diarize
+            from pipeline import ChunkedWhisperTranscriber
             from performance_logger import PerformanceLogger
 
-            # Initialize logger for diarization
+            # Initialize logger for diarization and the overlapping stage timeline
             perf_logger = PerformanceLogger()
 
             # Step 1: Preprocessing (file validation and loading)
@@ -109,7 +108,6 @@ class PipelineService:
                 await progress_callback("preprocessing", 0.05)
 
             # Validate audio file exists
-            import os
             if not os.path.exists(audio_file_path):
                 raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
 
@@ -118,32 +116,51 @@ class PipelineService:
 
             logger.info(f"[Job {job_id}] Preprocessing complete")
 
-            # Step 2: Transcription
+            # Step 2: Transcription and speaker diarization, overlapped.
+            # Transcription is network-bound, diarization CPU-bound, and
+            # diarization needs only the audio file, not the transcript.
             if progress_callback:
                 await progress_callback("transcription", 0.10)
 
-            logger.info(f"[Job {job_id}] Starting transcription")
-            transcription_start = time.time()
-            transcriber = WhisperTranscriber()
+            logger.info(f"[Job {job_id}] Starting transcription and speaker diarization")
+            perf_logger.start_pipeline()
+            # Uploads over the 25MB API limit are split at silences and sent as concurrent chunks
+            transcriber = ChunkedWhisperTranscriber()
 
             # Progress update during transcription initialization
             if progress_callback:
                 await progress_callback("transcription", 0.15)
 
-            # Run transcription in thread pool (API calls may block)
+            # Both run in the thread pool (API calls and model inference block)
             loop = asyncio.get_event_loop()
-            transcription = await loop.run_in_executor(
+            transcription_future = loop.run_in_executor(
                 self.executor,
+                self._run_stage,
+                perf_logger,
+                "Whisper Transcription",
                 transcriber.transcribe,
                 audio_file_path,
                 language
             )
+            diarization_future = loop.run_in_executor(
+                self.executor,
+                self._diarize,
+                audio_file_path,
+                perf_logger
+            )
+
+            try:
+                transcription = await transcription_future
+            except Exception:
+                diarization_future.cancel()
+                raise
 
             # Transcription complete
             if progress_callback:
                 await progress_callback("transcription", 0.40)
 
-            transcription_time = time.time() - transcription_start
+            stages = perf_logger.metrics["stages"]
+            transcription_time = stages["Whisper Transcription"]["duration"]
             logger.info(f"[Job {job_id}] Transcription completed in {transcription_time:.2f}s")
 
             # Step 3: Speaker Diarization (optional - skip if incompatible)
@@ -152,40 +169,19 @@ class PipelineService:
             diarization_turns = []
 
             try:
-                if progress_callback:
-                    await progress_callback("diarization", 0.40)
-
-                logger.info(f"[Job {job_id}] Starting speaker diarization")
-                diarization_start = time.time()
-
-                # Ensure HF_TOKEN is set (SpeakerDiarizer expects HF_TOKEN)
-                import os
-                if "HF_TOKEN" not in os.environ and "HUGGINGFACE_TOKEN" in os.environ:
-                    os.environ["HF_TOKEN"] = os.environ["HUGGINGFACE_TOKEN"]
-
-                # Progress update - loading model
-                if progress_callback:
-                    await progress_callback("diarization", 0.50)
-
-                diarizer = SpeakerDiarizer(num_speakers=2, logger=perf_logger)
-
-                # Progress update - running inference
                 if progress_callback:
                     await progress_callback("diarization", 0.60)
 
-                # Run CPU-intensive diarization in thread pool to avoid blocking event loop
-                loop = asyncio.get_event_loop()
-                diarization_turns = await loop.run_in_executor(
-                    self.executor,
-                    diarizer.diarize,
-                    audio_file_path
-                )
+                diarization_turns = await diarization_future
 
                 # Diarization complete
                 if progress_callback:
                     await progress_callback("diarization", 0.80)
 
-                diarization_time = time.time() - diarization_start
+                diarization_time = sum(
+                    stages[name]["duration"] for name in ("Diarization Model Loading", "Speaker Diarization")
+                    if name in stages
+                )
                 logger.info(f"[Job {job_id}] Diarization completed in {diarization_time:.2f}s - {len(diarization_turns)} turns")
 
                 # Step 4: Align speakers with transcript segments
@@ -199,7 +195,10 @@ class PipelineService:
                 if progress_callback:
                     await progress_callback("alignment", 0.85)
 
-                aligned_segments = self._align_speakers_cpu(
+                aligned_segments = self._run_stage(
+                    perf_logger,
+                    "Speaker Alignment",
+                    self._align_speakers_cpu,
                     transcription.get("segments", []),
                     diarization_turns
                 )
@@ -248,7 +247,8 @@ class PipelineService:
                 transcription_time=transcription_time,
                 diarization_time=diarization_time,
                 alignment_time=alignment_time,
-                diarization_turns=diarization_turns
+                diarization_turns=diarization_turns,
+                critical_path=perf_logger.get_critical_path()
             )
 
             # Save result to file
@@ -263,6 +263,69 @@ class PipelineService:
             logger.error(f"[Job {job_id}] Pipeline error: {str(e)}", exc_info=True)
             raise
 
+    @staticmethod
+    def _run_stage(perf_logger, stage_name: str, fn: Callable, *args) -> Any:
+        """Run fn(*args) as a PerformanceLogger stage (stage stacks are per thread)"""
+        perf_logger.start_stage(stage_name)
+        try:
+            return fn(*args)
+        finally:
+            perf_logger.end_stage(stage_name)
+
+    def _diarize(self, audio_file_path: str, perf_logger) -> list:
+        """Borrow a diarization model from the pool and diarize (runs on an executor thread)"""
+        # Near zero when a warm model is idle; a load or a wait for another job otherwise
+        diarizer = self._run_stage(perf_logger, "Diarization Model Loading", self.diarizer_pool.checkout)
+        try:
+            diarizer.logger = perf_logger
+            return diarizer.diarize(audio_file_path)
+        finally:
+            self.diarizer_pool.checkin(diarizer)
+
+    def _load_diarizer(self):
+        """Pool factory: one pyannote diarization model"""
+        self._apply_torch_patches()
+
+        # Ensure HF_TOKEN is set (SpeakerDiarizer expects HF_TOKEN)
+        if "HF_TOKEN" not in os.environ and "HUGGINGFACE_TOKEN" in os.environ:
+            os.environ["HF_TOKEN"] = os.environ["HUGGINGFACE_TOKEN"]
+
+        from pipeline_enhanced import SpeakerDiarizer
+        return SpeakerDiarizer(num_speakers=2)
+
+    @staticmethod
+    def _apply_torch_patches() -> None:
+        """Compatibility patches pyannote needs, applied per model load rather than per job"""
+        # Fix torchaudio compatibility issue with speechbrain
+        # speechbrain expects list_audio_backends() which was removed in torchaudio 2.1+
+        import torchaudio
+        if not hasattr(torchaudio, 'list_audio_backends'):
+            torchaudio.list_audio_backends = lambda: ['soundfile']
+            logger.info("Applied torchaudio compatibility patch for speechbrain")
+
+        # Fix PyTorch 2.9 weights_only security restriction
+        # Pyannote models need several classes to be allowlisted
+        import torch
+        if hasattr(torch, 'serialization') and hasattr(torch.serialization, 'add_safe_globals'):
+            try:
+                # Import all pyannote classes that need to be allowlisted
+                from pyannote.audio.core.task import Specifications, Problem, Resolution
+                from pyannote.core import SlidingWindowFeature, Segment, Timeline, Annotation
+
+                torch.serialization.add_safe_globals([
+                    torch.torch_version.TorchVersion,
+                    Specifications,
+                    Problem,
+                    Resolution,
+                    SlidingWindowFeature,
+                    Segment,
+                    Timeline,
+                    Annotation
+                ])
+                logger.info("Applied PyTorch 2.9 weights_only compatibility patch (8 classes)")
+            except Exception as e:
+                logger.warning(f"Failed to apply PyTorch weights_only patch: {e}")
+
     def _build_result(
         self,
         job_id: str,
@@ -273,7 +336,8 @@ class PipelineService:
         transcription_time: float = 0,
         diarization_time: float = 0,
         alignment_time: float = 0,
-        diarization_turns: list = None
+        diarization_turns: list = None,
+        critical_path: Optional[Dict] = None
     ) -> Dict[str, Any]:
         """Build standardized result structure"""
         import os
@@ -303,7 +367,10 @@ class PipelineService:
             "preprocessing_time_seconds": 0,  # Skipped due to Python 3.14
             "transcription_time_seconds": transcription_time,
             "diarization_time_seconds": diarization_time,
-            "alignment_time_seconds": alignment_time
+            "alignment_time_seconds": alignment_time,
+            # Transcription and diarization overlap, so the stage times can sum past the total
+            "critical_path": critical_path or {},
+            "diarizer_pool": self.diarizer_pool.get_stats()
         }
 
         # Quality metrics - calculate speaker distribution
@@ -343,68 +410,24 @@ class PipelineService:
         Improved speaker alignment algorithm with lower threshold and fallback strategies.
         Reduces "Unknown" speaker labels from 8.4% to <2%.
 
-        Based on improved_alignment.py - uses 30% threshold + nearest neighbor fallback
+        Same rule as improved_alignment.py - 30% threshold + nearest neighbor fallback
+        within 5 seconds - computed by the shared sweep in speaker_alignment.py
         """
-        aligned = []
-        overlap_threshold = 0.3  # 30% instead of 50%
-        fallback_assignments = 0
+        from speaker_alignment import match_speakers
 
-        for seg in segments:
-            seg_start, seg_end = seg["start"], seg["end"]
-            seg_duration = seg_end - seg_start
-
-            # Find speaker with maximum overlap
-            best_speaker = "UNKNOWN"
-            best_overlap = 0
-            best_overlap_ratio = 0
-
-            for turn in turns:
-                overlap_start = max(seg_start, turn["start"])
-                overlap_end = min(seg_end, turn["end"])
-                overlap = max(0, overlap_end - overlap_start)
-
-                if overlap > best_overlap:
-                    best_overlap = overlap
-                    best_overlap_ratio = overlap / seg_duration if seg_duration > 0 else 0
-                    best_speaker = turn["speaker"]
-
-            # Check if best overlap meets threshold
-            if seg_duration > 0 and best_overlap_ratio < overlap_threshold:
-                # Fallback: Find nearest speaker turn
-                min_distance = float('inf')
-                nearest_speaker = None
-
-                for turn in turns:
-                    # Distance to nearest edge of turn
-                    dist_to_start = abs(seg_start - turn["end"])
-                    dist_to_end = abs(seg_end - turn["start"])
-                    distance = min(dist_to_start, dist_to_end)
-
-                    # Check if segment is in a gap before/after turn
-                    if seg_end <= turn["start"]:
-                        distance = turn["start"] - seg_end
-                    elif seg_start >= turn["end"]:
-                        distance = seg_start - turn["end"]
-
-                    if distance < min_distance:
-                        min_distance = distance
-                        nearest_speaker = turn["speaker"]
-
-                # Use nearest speaker if within 5 seconds
-                if nearest_speaker and min_distance < 5.0:
-                    best_speaker = nearest_speaker
-                    fallback_assignments += 1
-                else:
-                    best_speaker = "UNKNOWN"
-
-            aligned.append({
-                "start": seg_start,
-                "end": seg_end,
+        matches = match_speakers(segments, turns, overlap_threshold=0.3, fallback_distance=5.0)
+        aligned = [
+            {
+                "start": seg["start"],
+                "end": seg["end"],
                 "text": seg["text"],
-                "speaker": best_speaker,
-                "speaker_id": best_speaker  # Frontend expects speaker_id
-            })
+                "speaker": match.speaker,
+                "speaker_id": match.speaker  # Frontend expects speaker_id
+            }
+            for seg, match in zip(segments, matches)
+        ]
 
+        fallback_assignments = sum(match.fallback for match in matches)
         logger.info(f"Alignment: {fallback_assignments} segments assigned via nearest-neighbor fallback")
         return aligned
 
@@ -20,6 +20,45 @@ class Settings(BaseSettings):
     # OpenAI Configuration
     openai_api_key: str = ""
 
+    # OpenAI HTTP connection pool (shared by all AI generators in the process)
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_keepalive_expiry_seconds: float = 30.0
+
+    # LLM response cache ("memory" | "sqlite" | "none")
+    llm_cache_backend: str = "memory"
+    llm_cache_path: str = ".cache/llm_responses.sqlite3"  # Relative to backend/
+    llm_cache_max_entries: int = 2000
+    llm_cache_ttl_seconds: float = 7 * 24 * 3600
+
+    # Generation cost sink (batched background writes to generation_costs)
+    cost_sink_batch_size: int = 50
+    cost_sink_flush_interval_seconds: float = 2.0
+    cost_sink_max_queue_size: int = 10_000
+
+    # Pipeline event bus for SSE ("auto" | "postgres" | "local")
+    event_bus_transport: str = "auto"
+    event_bus_ack_flush_seconds: float = 1.0
+    sse_keepalive_seconds: float = 15.0
+
+    # Versioned GET response cache with ETags (dashboard session/status/roadmap reads)
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 2000
+    response_cache_ttl_seconds: float = 300.0
+
+    # LLM rate limits (per-model RPM/TPM from MODEL_REGISTRY, scaled) and 429 retries
+    llm_rate_limit_scale: float = 1.0
+    llm_background_headroom: float = 0.2  # Share of each budget kept free for interactive calls
+    llm_max_retries: int = 4
+    llm_retry_base_seconds: float = 1.0
+    llm_retry_max_seconds: float = 30.0
+
+    # Max tokens of transcript embedded in an analysis prompt (longer ones are windowed)
+    llm_transcript_token_budget: int = 12_000
+
+    # Wave 1 batch runner (max LLM calls in flight across all sessions)
+    wave1_batch_max_concurrency: int = 6
+
     # JWT Configuration
     jwt_secret: str = "your-secret-key-change-in-production"
     jwt_algorithm: str = "HS256"
@@ -40,6 +79,21 @@ class Settings(BaseSettings):
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/0"
 
+    # Durable analysis job queue ("sqlite" | "redis"; redis uses CELERY_BROKER_URL)
+    job_queue_backend: str = "sqlite"
+    job_queue_path: str = ".cache/job_queue.sqlite3"  # Relative to backend/
+    job_queue_visibility_timeout_seconds: float = 120.0
+    job_queue_max_attempts: int = 3
+    # Run a worker inside the API process (on its own thread and event loop). Turn it
+    # off only once scripts/run_job_worker.py runs against a shared (redis) queue
+    job_worker_embedded: bool = True
+    job_worker_concurrency: int = 4
+    # Job workers queue an aggregates check for every patient once per interval (0 disables)
+    aggregates_check_interval_hours: float = 24.0
+
+    # Demo seeding pool (in-process transcript/Wave 1/Wave 2 pipelines running at once)
+    demo_seeding_max_pipelines: int = 4
+
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=False,
@@ -160,11 +160,14 @@ class ModelConfig:
     context_window: int        # Maximum context window size
     complexity_tier: TaskComplexity
     description: str
+    rpm_limit: int = 500       # Requests per minute (OpenAI usage tier 1)
+    tpm_limit: int = 200_000   # Tokens per minute (OpenAI usage tier 1)
 
 
 # GPT-5 Series Model Registry
 # All models have 400K context windows
 # Pricing as of December 2025
+# Rate limits are OpenAI usage tier 1 defaults; scale with LLM_RATE_LIMIT_SCALE
 MODEL_REGISTRY = {
     "gpt-5.2": ModelConfig(
         model_name="gpt-5.2",
@@ -172,7 +175,9 @@ MODEL_REGISTRY = {
         cost_per_1m_output=14.00,
         context_window=400_000,
         complexity_tier=TaskComplexity.VERY_HIGH,
-        description="Best model for coding and agentic tasks requiring deep synthesis"
+        description="Best model for coding and agentic tasks requiring deep synthesis",
+        rpm_limit=500,
+        tpm_limit=500_000,
     ),
     "gpt-5": ModelConfig(
         model_name="gpt-5",
@@ -180,7 +185,9 @@ MODEL_REGISTRY = {
         cost_per_1m_output=10.00,
         context_window=400_000,
         complexity_tier=TaskComplexity.HIGH,
-        description="Strong reasoning model for complex therapeutic analysis"
+        description="Strong reasoning model for complex therapeutic analysis",
+        rpm_limit=500,
+        tpm_limit=500_000,
     ),
     "gpt-5-mini": ModelConfig(
         model_name="gpt-5-mini",
@@ -188,7 +195,9 @@ MODEL_REGISTRY = {
         cost_per_1m_output=2.00,
         context_window=400_000,
         complexity_tier=TaskComplexity.MEDIUM,
-        description="Cost-efficient for well-defined structured extraction tasks"
+        description="Cost-efficient for well-defined structured extraction tasks",
+        rpm_limit=500,
+        tpm_limit=500_000,
     ),
     "gpt-5-nano": ModelConfig(
         model_name="gpt-5-nano",
@@ -196,7 +205,9 @@ MODEL_REGISTRY = {
         cost_per_1m_output=0.40,
         context_window=400_000,
         complexity_tier=TaskComplexity.VERY_LOW,
-        description="Fastest, most cost-efficient for simple classification/scoring"
+        description="Fastest, most cost-efficient for simple classification/scoring",
+        rpm_limit=500,
+        tpm_limit=200_000,
     ),
     "gpt-5.2-pro": ModelConfig(
         model_name="gpt-5.2-pro",
@@ -204,7 +215,9 @@ MODEL_REGISTRY = {
         cost_per_1m_output=168.00,
         context_window=400_000,
         complexity_tier=TaskComplexity.VERY_HIGH,
-        description="Premium model for maximum precision (typically not needed)"
+        description="Premium model for maximum precision (typically not needed)",
+        rpm_limit=500,
+        tpm_limit=30_000,
     ),
 }
 
@@ -230,6 +243,7 @@ TASK_MODEL_ASSIGNMENTS = {
 ESTIMATED_TOKEN_USAGE = {
     "mood_analysis": {"input": 2000, "output": 200},       # ~$0.0005 per session
     "topic_extraction": {"input": 3000, "output": 300},    # ~$0.0013 per session
+    "action_summary": {"input": 300, "output": 50},        # ~$0.00004 per session
     "breakthrough_detection": {"input": 3500, "output": 400}, # ~$0.0084 per session
     "deep_analysis": {"input": 5000, "output": 800},       # ~$0.0200 per session
     "prose_generation": {"input": 2000, "output": 600},    # ~$0.0118 per session
@@ -383,6 +397,7 @@ class GenerationCost:
         timestamp: When the generation occurred
         session_id: Optional session ID for tracking
         metadata: Optional additional metadata
+        cache_hit: True if the response was served from the LLM response cache
     """
     task: str
     model: str
@@ -393,6 +408,7 @@ class GenerationCost:
     timestamp: datetime = field(default_factory=datetime.utcnow)
     session_id: Optional[str] = None
     metadata: Optional[dict] = None
+    cache_hit: bool = False
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization or database storage."""
@@ -405,7 +421,8 @@ class GenerationCost:
             "duration_ms": self.duration_ms,
             "timestamp": self.timestamp.isoformat(),
             "session_id": self.session_id,
-            "metadata": self.metadata
+            "metadata": self.metadata,
+            "cache_hit": self.cache_hit
         }
 
 
@@ -443,7 +460,8 @@ def store_generation_cost_sync(
     """
     Synchronous version of store_generation_cost for non-async contexts.
 
-    Uses a direct database connection without async/await.
+    Uses a direct database connection without async/await. Opens a connection
+    per call - prefer enqueue_generation_cost() on hot paths.
 
     Args:
         cost_info: GenerationCost object from track_generation_cost()
@@ -490,6 +508,29 @@ def store_generation_cost_sync(
         # Don't raise - cost tracking failure shouldn't break the main flow
 
 
+def enqueue_generation_cost(
+    cost_info: 'GenerationCost',
+    patient_id: Optional[str] = None
+) -> bool:
+    """
+    Queue a GenerationCost for batched, background persistence.
+
+    Never blocks and never touches the database on the caller's thread; rows are
+    written by the cost sink worker (see app/utils/cost_sink.py).
+
+    Args:
+        cost_info: GenerationCost object from track_generation_cost()
+        patient_id: Optional patient UUID string for association
+
+    Returns:
+        True if queued, False if dropped (sink disabled or queue full)
+    """
+    # Import here to avoid circular imports
+    from app.utils.cost_sink import get_cost_sink
+
+    return get_cost_sink().enqueue(cost_info, patient_id=patient_id)
+
+
 def track_generation_cost(
     response: Any,
     task: str,
@@ -502,7 +543,11 @@ def track_generation_cost(
 ) -> GenerationCost:
     """
     Extract cost information from an OpenAI API response and create a GenerationCost record.
-    Automatically persists to database by default.
+    Automatically persists to database by default (queued to the background cost
+    sink, so the caller never waits on a database round-trip).
+
+    Responses replayed from the LLM response cache (``response.cache_hit is True``)
+    are recorded as zero-cost hits; the tokens they saved go into metadata.
 
     Args:
         response: The OpenAI API response object (ChatCompletion)
@@ -529,6 +574,16 @@ def track_generation_cost(
     input_tokens = response.usage.prompt_tokens if response.usage else 0
     output_tokens = response.usage.completion_tokens if response.usage else 0
 
+    # Cache hits are free - keep the tokens they saved for reporting
+    cache_hit = getattr(response, "cache_hit", False) is True
+    if cache_hit:
+        metadata = {
+            **(metadata or {}),
+            "cache_hit": True,
+            "cached_input_tokens": response.prompt_tokens,
+            "cached_output_tokens": response.completion_tokens,
+        }
+
     # Calculate actual cost
     cost = calculate_cost(model, input_tokens, output_tokens)
 
@@ -540,21 +595,23 @@ def track_generation_cost(
         cost=cost,
         duration_ms=duration_ms,
         session_id=session_id,
-        metadata=metadata
+        metadata=metadata,
+        cache_hit=cache_hit
     )
 
     # Log for visibility
+    cache_info = " [cache hit]" if cache_hit else ""
     logger.info(
-        f"[Cost] {task}: {input_tokens} in / {output_tokens} out = ${cost:.6f} ({duration_ms}ms)"
+        f"[Cost] {task}: {input_tokens} in / {output_tokens} out = ${cost:.6f} ({duration_ms}ms){cache_info}"
     )
     print(
-        f"[Cost] {task}: {input_tokens} in / {output_tokens} out = ${cost:.6f} ({duration_ms}ms)",
+        f"[Cost] {task}: {input_tokens} in / {output_tokens} out = ${cost:.6f} ({duration_ms}ms){cache_info}",
         flush=True
     )
 
-    # Persist to database (sync, non-blocking failure)
+    # Persist to database (queued, batched by the cost sink worker)
     if persist:
-        store_generation_cost_sync(generation_cost, patient_id=patient_id)
+        enqueue_generation_cost(generation_cost, patient_id=patient_id)
 
     return generation_cost
 
@@ -1,8 +1,24 @@
 """
 Database Connection - Supabase PostgreSQL
+
+Two clients share the same PostgREST query surface:
+- get_supabase() / get_db():             synchronous Client (scripts, threads)
+- get_async_supabase() / get_async_db(): AsyncClient for async routes and the
+  AnalysisOrchestrator, so queries are awaited instead of blocking the event
+  loop. Requests are multiplexed over a pooled httpx.AsyncClient, so
+  concurrent requests each get their own in-flight query.
+- get_supabase_admin() / get_async_supabase_admin(): the same with the service
+  role key (bypasses RLS), for seed scripts and administrative jobs only.
+
+Usage:
+    @router.get("/sessions")
+    async def get_sessions(db: AsyncClient = Depends(get_async_db)):
+        response = await db.table("therapy_sessions").select("id").execute()
 """
 
-from supabase import create_client, Client
+import asyncio
+import weakref
+from supabase import create_client, acreate_client, Client, AsyncClient
 from app.config import settings
 import logging
 
@@ -55,6 +71,76 @@ def get_supabase_admin() -> Client:
         raise
 
 
+# Async clients, one per running event loop (httpx async connections can't be
+# shared across loops, e.g. scripts that call asyncio.run() repeatedly)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = weakref.WeakKeyDictionary()
+_async_admin_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+async def get_async_supabase() -> AsyncClient:
+    """
+    Get async Supabase client for the running event loop (singleton per loop)
+
+    Returns:
+        AsyncClient: Supabase async client
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+
+    if client is None:
+        try:
+            client = await acreate_client(
+                settings.supabase_url,
+                settings.supabase_key
+            )
+            # Another coroutine may have won the race while we awaited
+            client = _async_clients.setdefault(loop, client)
+            logger.info("✓ Supabase async client initialized")
+        except Exception as e:
+            logger.error(f"Failed to initialize Supabase async client: {e}")
+            raise
+
+    return client
+
+
+async def get_async_supabase_admin() -> AsyncClient:
+    """
+    Get async Supabase client with service role key (bypasses RLS), one per loop
+    Use for administrative operations only
+
+    Returns:
+        AsyncClient: Supabase async admin client
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_admin_clients.get(loop)
+
+    if client is None:
+        try:
+            client = await acreate_client(
+                settings.supabase_url,
+                settings.supabase_service_key
+            )
+            client = _async_admin_clients.setdefault(loop, client)
+            logger.info("✓ Supabase async admin client initialized")
+        except Exception as e:
+            logger.error(f"Failed to initialize Supabase async admin client: {e}")
+            raise
+
+    return client
+
+
+async def close_async_supabase() -> None:
+    """Close the async clients for the running loop (call on shutdown)"""
+    loop = asyncio.get_running_loop()
+    for clients in (_async_clients, _async_admin_clients):
+        client = clients.pop(loop, None)
+        if client is not None:
+            try:
+                await client.postgrest.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing Supabase async client: {e}")
+
+
 # Dependency for FastAPI
 async def get_db() -> Client:
     """
@@ -68,6 +154,18 @@ async def get_db() -> Client:
     return get_supabase()
 
 
+async def get_async_db() -> AsyncClient:
+    """
+    FastAPI dependency for non-blocking database access
+
+    Usage:
+        @router.get("/sessions")
+        async def get_sessions(db: AsyncClient = Depends(get_async_db)):
+            response = await db.table("therapy_sessions").select("*").execute()
+    """
+    return await get_async_supabase()
+
+
 # Helper functions for common operations
 def execute_query(query_builder, handle_error=True):
     """
@@ -95,15 +193,15 @@ def execute_query(query_builder, handle_error=True):
 
 async def get_user_by_email(email: str) -> dict:
     """Get user by email"""
-    db = get_supabase()
-    response = db.table("users").select("*").eq("email", email).execute()
+    db = await get_async_supabase()
+    response = await db.table("users").select("*").eq("email", email).execute()
     return response.data[0] if response.data else None
 
 
 async def get_patient_sessions(patient_id: str, limit: int = 50) -> list:
     """Get therapy sessions for a patient"""
-    db = get_supabase()
-    response = (
+    db = await get_async_supabase()
+    response = await (
         db.table("therapy_sessions")
         .select("*")
         .eq("patient_id", patient_id)
@@ -114,14 +212,14 @@ async def get_patient_sessions(patient_id: str, limit: int = 50) -> list:
     return response.data
 
 
-async def get_session_with_breakthrough(session_id: str) -> dict:
-    """Get session with breakthrough details"""
-    db = get_supabase()
+async def get_session_with_breakthrough(session_id: str, columns: str = "*") -> dict:
+    """Get session with breakthrough details (columns: select() projection)"""
+    db = await get_async_supabase()
 
     # Get session
-    session_response = (
+    session_response = await (
         db.table("therapy_sessions")
-        .select("*")
+        .select(columns)
         .eq("id", session_id)
         .single()
         .execute()
@@ -163,7 +261,7 @@ async def store_breakthrough_analysis(
         primary_breakthrough: Primary breakthrough dict
         all_breakthroughs: List of all breakthrough candidates
     """
-    db = get_supabase()
+    db = await get_async_supabase()
 
     # Update session
     update_data = {
@@ -174,7 +272,7 @@ async def store_breakthrough_analysis(
     if primary_breakthrough:
         update_data["breakthrough_data"] = primary_breakthrough
 
-    session_update = (
+    session_update = await (
         db.table("therapy_sessions")
         .update(update_data)
         .eq("id", session_id)
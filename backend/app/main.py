@@ -5,12 +5,22 @@ FastAPI application with Supabase + Breakthrough Detection
 
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
+from typing import Optional
 
 from app.config import settings
 from app.routers import sessions, demo, debug, sse
-from app.database import get_db
-from supabase import Client
+from app.database import get_async_db, close_async_supabase
+from app.middleware.response_cache import ResponseCacheMiddleware, invalidate_on_event
+from app.services.analysis_jobs import ANALYSIS_HANDLERS, ANALYSIS_SCHEDULES
+from app.services.demo_seeding import get_demo_seeding_pool
+from app.services.job_worker import JobWorker
+from app.services.openai_client_registry import get_client_registry
+from app.utils.cost_sink import shutdown_cost_sink
+from app.utils.pipeline_logger import shutdown_event_writer
+from app.utils.event_bus import get_event_bus
+from supabase import AsyncClient
 
 # Configure logging
 logging.basicConfig(
@@ -28,6 +38,9 @@ app = FastAPI(
     debug=settings.debug
 )
 
+# Cached GET responses with ETags (added first so CORS wraps cached responses too)
+app.add_middleware(ResponseCacheMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -67,7 +80,7 @@ async def health_check():
 @app.get("/api/patients/{patient_id}/roadmap")
 async def get_patient_roadmap(
     patient_id: str,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Get patient's latest roadmap data (PR #3: Your Journey Dynamic Roadmap)
@@ -77,7 +90,7 @@ async def get_patient_roadmap(
     """
     try:
         # Query patient_roadmap table
-        result = db.table("patient_roadmap") \
+        result = await db.table("patient_roadmap") \
             .select("roadmap_data, metadata") \
             .eq("patient_id", patient_id) \
             .execute()
@@ -105,6 +118,10 @@ async def get_patient_roadmap(
         )
 
 
+# Embedded job worker (JOB_WORKER_EMBEDDED=true; runs on its own thread and event loop)
+_job_worker: Optional[JobWorker] = None
+
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -114,6 +131,20 @@ async def startup_event():
     logger.info(f"   Debug mode: {settings.debug}")
     logger.info(f"   Supabase URL: {settings.supabase_url}")
     logger.info(f"   Breakthrough detection: {'✓ Enabled' if settings.openai_api_key else '✗ Disabled'}")
+    get_event_bus().ensure_started()
+    logger.info(f"   Event bus: {get_event_bus().transport.name} transport")
+    # Pipeline events from any process invalidate the patient's cached responses
+    get_event_bus().add_listener(invalidate_on_event)
+    if settings.job_worker_embedded:
+        global _job_worker
+        _job_worker = JobWorker(ANALYSIS_HANDLERS, schedules=ANALYSIS_SCHEDULES)
+        _job_worker.start_thread()
+        logger.info(f"   Job worker: embedded in a background thread ({_job_worker.queue.name} queue)")
+    else:
+        logger.info("   Job worker: external (scripts/run_job_worker.py)")
+    # Import the seeding scripts now so the first /api/demo/initialize does not pay for it
+    await asyncio.to_thread(get_demo_seeding_pool().warm)
+    logger.info(f"   Demo seeding: in-process ({get_demo_seeding_pool().max_pipelines} pipelines)")
 
 
 # Shutdown event
@@ -121,6 +152,18 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("👋 Shutting down TherapyBridge API")
+    # Finish in-flight jobs; anything cut off is redelivered when its lease expires
+    if _job_worker is not None:
+        await _job_worker.stop_thread()
+    await get_demo_seeding_pool().shutdown()
+    await get_client_registry().aclose()
+    await close_async_supabase()
+    # Write queued pipeline events (they publish on the bus) before stopping it
+    await asyncio.to_thread(shutdown_event_writer)
+    # Flush pending SSE acknowledgements and stop the LISTEN thread
+    await get_event_bus().stop()
+    # Flush queued generation costs off the event loop
+    await asyncio.to_thread(shutdown_cost_sink)
 
 
 if __name__ == "__main__":
@@ -4,37 +4,44 @@ Handles demo token extraction from headers and user lookup
 """
 
 from fastapi import Request, HTTPException
-from typing import Optional
+from typing import Mapping, Optional
 import logging
-from supabase import Client
+from supabase import AsyncClient
 
-from app.database import get_supabase
+from app.database import get_async_supabase
 
 logger = logging.getLogger(__name__)
 
 
-async def get_demo_user(request: Request) -> Optional[dict]:
+def extract_demo_token(headers: Mapping[str, str]) -> Optional[str]:
     """
-    Extract demo token from request headers and fetch demo user
+    Extract the demo token from request headers (no validation or lookup)
 
     Headers checked (in order):
     1. X-Demo-Token: <uuid>
     2. Authorization: Demo <uuid>
-
-    Returns:
-        Demo user dict if valid token, None otherwise
     """
-    demo_token = None
-
     # Check X-Demo-Token header
-    if "x-demo-token" in request.headers:
-        demo_token = request.headers["x-demo-token"]
+    if "x-demo-token" in headers:
+        return headers["x-demo-token"]
 
     # Check Authorization header (format: "Demo <uuid>")
-    elif "authorization" in request.headers:
-        auth_header = request.headers["authorization"]
+    if "authorization" in headers:
+        auth_header = headers["authorization"]
         if auth_header.startswith("Demo "):
-            demo_token = auth_header[5:]  # Strip "Demo " prefix
+            return auth_header[5:]  # Strip "Demo " prefix
+
+    return None
+
+
+async def get_demo_user(request: Request) -> Optional[dict]:
+    """
+    Extract demo token from request headers and fetch demo user
+
+    Returns:
+        Demo user dict if valid token, None otherwise
+    """
+    demo_token = extract_demo_token(request.headers)
 
     if not demo_token:
         return None
@@ -48,9 +55,9 @@ async def get_demo_user(request: Request) -> Optional[dict]:
         return None
 
     # Lookup demo user
-    db: Client = get_supabase()
+    db: AsyncClient = await get_async_supabase()
     try:
-        response = db.table("users").select("*").eq("demo_token", demo_token).eq("is_demo", True).single().execute()
+        response = await db.table("users").select("*").eq("demo_token", demo_token).eq("is_demo", True).single().execute()
 
         if not response.data:
             logger.warning(f"Demo token not found: {demo_token}")
@@ -73,13 +80,12 @@ async def get_demo_user(request: Request) -> Optional[dict]:
         return None
 
 
-def require_demo_auth(request: Request) -> dict:
+async def require_demo_auth(request: Request) -> dict:
     """
     Dependency that requires valid demo token
     Raises 401 if token missing or invalid
     """
-    import asyncio
-    demo_user = asyncio.run(get_demo_user(request))
+    demo_user = await get_demo_user(request)
 
     if not demo_user:
         raise HTTPException(
@@ -0,0 +1,458 @@
+"""
+Response Cache - Versioned GET responses with strong ETags
+
+The dashboard repeatedly polls GET /api/sessions/, /api/sessions/patient/{id}/mood-history,
+/api/patients/{id}/roadmap and /api/demo/status, and every request went to
+Supabase and rebuilt the same JSON. Those responses are now cached in-process:
+
+    GET ──▶ ResponseCacheMiddleware ──valid entry──▶ 200 (cached body) / 304
+                    │ miss
+                    ▼
+            route handler (auth + Supabase) ──▶ body stored under the patient's version
+
+Entries are keyed by (route, path + query, demo token for token-scoped
+routes) and stamped with the patient's version at the time the handler read
+the database. An entry is served only while that version is current and it
+is younger than RESPONSE_CACHE_TTL_SECONDS.
+
+Versions are per patient and bumped by writes:
+- session and demo routers call invalidate_patient() / invalidate_rows()
+  after writing
+- the orchestrator invalidates after flushing a session's results
+- every pipeline event received over the event bus bumps its patient, which
+  covers seeding, the job worker and other processes (Wave 1, Wave 2,
+  roadmap progress)
+The TTL bounds staleness from writes that bypass all of these.
+
+Every cached response carries a strong ETag (hash of the body). A request
+whose If-None-Match matches a valid entry gets 304 without running the route:
+no demo-token lookup and no database call.
+
+Token-scoped routes (the demo user's session list and status) only learn
+their patient inside the handler, which calls cache_scope(request, patient_id,
+expires_at) before reading sessions; the version is captured there, so a write
+racing the read leaves the stored entry already invalid. Hits are served
+before the token is validated, so their entries also carry the token's expiry
+(never served past it), and invalidate_token() drops a token's entries when
+the demo is reset.
+
+Usage:
+    app.add_middleware(ResponseCacheMiddleware)   # added before CORSMiddleware
+
+    cache_scope(request, patient_id, demo_user["demo_expires_at"])  # token-scoped handler
+    invalidate_patient(patient_id)                # after a write
+    invalidate_token(demo_token)                  # demo reset
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.middleware.demo_auth import extract_demo_token
+
+logger = logging.getLogger(__name__)
+
+# Clients may keep the body but must revalidate it (If-None-Match) before use
+CACHE_CONTROL = "private, no-cache"
+
+# request.state attribute holding (patient_id, version, expires_at) for the response being built
+_SCOPE_ATTR = "response_cache_scope"
+
+CacheKey = Tuple[str, str, str, str]
+
+
+@dataclass
+class CachedRoute:
+    """A GET route whose responses are cached."""
+    name: str
+    path: str
+    by_token: bool = False  # Response depends on the demo token (patient resolved in the handler)
+    pattern: Pattern = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.pattern = compile_path(self.path)[0]
+
+
+CACHED_ROUTES = (
+    CachedRoute("sessions", "/api/sessions/", by_token=True),
+    CachedRoute("mood_history", "/api/sessions/patient/{patient_id}/mood-history"),
+    CachedRoute("roadmap", "/api/patients/{patient_id}/roadmap"),
+    CachedRoute("demo_status", "/api/demo/status", by_token=True),
+)
+
+
+@dataclass
+class CachedResponse:
+    """A stored 200 response and the patient version it was built from."""
+    patient_id: str
+    version: int
+    etag: str
+    body: bytes
+    content_type: str
+    stored_at: float
+    expires_at: Optional[float] = None  # Demo token expiry (token-scoped routes)
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 specifies for this header)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+class ResponseCache:
+    """
+    LRU of cached responses plus per-patient versions. Thread-safe.
+
+    Invalidation is lazy: bumping a version makes the patient's entries
+    unservable, and they are dropped when next looked up or evicted.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        ttl_seconds: float = 300.0,
+        routes: Iterable[CachedRoute] = CACHED_ROUTES,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.routes = tuple(routes)
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.stores = 0
+        self.invalidations = 0
+        self._route_stats: Dict[str, Dict[str, int]] = {
+            route.name: {"hits": 0, "misses": 0, "not_modified": 0} for route in self.routes
+        }
+
+    def match(self, path: str) -> Optional[Tuple[CachedRoute, Dict[str, str]]]:
+        """The cached route for a request path and its path params (None if not cached)."""
+        for route in self.routes:
+            matched = route.pattern.match(path)
+            if matched:
+                return route, matched.groupdict()
+        return None
+
+    def version(self, patient_id: str) -> int:
+        with self._lock:
+            return self._versions.get(patient_id, 0)
+
+    def invalidate(self, patient_id: str) -> None:
+        """Bump a patient's version; every response built before now stops being served."""
+        with self._lock:
+            self._versions[patient_id] = self._versions.get(patient_id, 0) + 1
+            self.invalidations += 1
+
+    def invalidate_token(self, token: str) -> None:
+        """Drop every entry cached for a demo token (token-scoped routes)."""
+        with self._lock:
+            for key in [key for key in self._entries if key[3] == token]:
+                del self._entries[key]
+            self.invalidations += 1
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        """A servable entry for the key, counting the lookup as a hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.time()
+            if entry is not None and (
+                entry.version != self._versions.get(entry.patient_id, 0)
+                or (self.ttl_seconds and now - entry.stored_at > self.ttl_seconds)
+                or (entry.expires_at is not None and now >= entry.expires_at)
+            ):
+                del self._entries[key]
+                entry = None
+
+            stats = self._route_stats.setdefault(key[0], {"hits": 0, "misses": 0, "not_modified": 0})
+            if entry is None:
+                self.misses += 1
+                stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            stats["hits"] += 1
+            return entry
+
+    def set(self, key: CacheKey, entry: CachedResponse) -> bool:
+        """Store an entry unless its patient was invalidated while it was built."""
+        with self._lock:
+            if entry.version != self._versions.get(entry.patient_id, 0):
+                return False
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stores += 1
+            return True
+
+    def record_not_modified(self, route_name: str) -> None:
+        with self._lock:
+            self.not_modified += 1
+            self._route_stats.setdefault(route_name, {"hits": 0, "misses": 0, "not_modified": 0})[
+                "not_modified"
+            ] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/304 counters overall and per route."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "stores": self.stores,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "routes": {name: dict(stats) for name, stats in self._route_stats.items()},
+            }
+
+
+# =============================================================================
+# Middleware
+# =============================================================================
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware serving cached GET responses ahead of routing.
+
+    Runs outside route dependencies, so a hit skips demo-token lookup and
+    database access entirely. Add it before CORSMiddleware so CORS headers are
+    still applied to cached responses.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        cache = get_response_cache() if scope["type"] == "http" and scope["method"] == "GET" else None
+        matched = cache.match(scope["path"]) if cache is not None else None
+        if matched is None:
+            await self.app(scope, receive, send)
+            return
+
+        route, params = matched
+        headers = Headers(scope=scope)
+        token = (extract_demo_token(headers) or "") if route.by_token else ""
+        key = (route.name, scope["path"], scope.get("query_string", b"").decode("latin-1"), token)
+        if_none_match = headers.get("if-none-match")
+
+        entry = cache.get(key)
+        if entry is not None:
+            if etag_matches(if_none_match, entry.etag):
+                cache.record_not_modified(route.name)
+                await _send_not_modified(send, entry.etag)
+            else:
+                await _send_body(send, 200, entry.body, [
+                    (b"content-type", entry.content_type.encode("latin-1")),
+                    (b"etag", entry.etag.encode("latin-1")),
+                    (b"cache-control", CACHE_CONTROL.encode("latin-1")),
+                ])
+            return
+
+        state = scope.setdefault("state", {})
+        if params.get("patient_id"):
+            state[_SCOPE_ATTR] = (params["patient_id"], cache.version(params["patient_id"]), None)
+
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+
+        async def buffer(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                await self._finish(cache, route, key, state.get(_SCOPE_ATTR), if_none_match, start, b"".join(chunks), send)
+
+        await self.app(scope, receive, buffer)
+
+    async def _finish(
+        self,
+        cache: ResponseCache,
+        route: CachedRoute,
+        key: CacheKey,
+        cache_scope: Optional[Tuple[str, int, Optional[float]]],
+        if_none_match: Optional[str],
+        start: Message,
+        body: bytes,
+        send: Send,
+    ) -> None:
+        if start["status"] != 200 or cache_scope is None:
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        etag = make_etag(body)
+        response_headers = MutableHeaders(raw=list(start["headers"]))
+        patient_id, version, expires_at = cache_scope
+        cache.set(key, CachedResponse(
+            patient_id=patient_id,
+            version=version,
+            etag=etag,
+            body=body,
+            content_type=response_headers.get("content-type", "application/json"),
+            stored_at=time.time(),
+            expires_at=expires_at,
+        ))
+
+        if etag_matches(if_none_match, etag):
+            cache.record_not_modified(route.name)
+            await _send_not_modified(send, etag)
+            return
+
+        response_headers["etag"] = etag
+        response_headers["cache-control"] = CACHE_CONTROL
+        await send({**start, "headers": response_headers.raw})
+        await send({"type": "http.response.body", "body": body})
+
+
+async def _send_body(send: Send, status: int, body: bytes, headers: List[Tuple[bytes, bytes]]) -> None:
+    headers.append((b"content-length", str(len(body)).encode("latin-1")))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_not_modified(send: Send, etag: str) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": 304,
+        "headers": [(b"etag", etag.encode("latin-1")), (b"cache-control", CACHE_CONTROL.encode("latin-1"))],
+    })
+    await send({"type": "http.response.body", "body": b""})
+
+
+# =============================================================================
+# Handler and Writer Hooks
+# =============================================================================
+
+def cache_scope(request: Optional[Request], patient_id: str, expires_at: Optional[str] = None) -> None:
+    """
+    Tie the response being built to a patient (token-scoped routes).
+
+    Call before reading the patient's data: the version captured here is the
+    one the response is stored under. No-op outside a request (handler
+    called directly).
+
+    Args:
+        request: Current request
+        patient_id: Patient the response is built from
+        expires_at: The demo token's expiry (users.demo_expires_at, ISO); the
+            entry is never served past it
+    """
+    cache = get_response_cache()
+    if cache is not None and request is not None and patient_id:
+        expiry = None
+        if expires_at:
+            expiry = datetime.fromisoformat(str(expires_at).replace("Z", "+00:00")).timestamp()
+        setattr(request.state, _SCOPE_ATTR, (str(patient_id), cache.version(str(patient_id)), expiry))
+
+
+def invalidate_patient(patient_id: Optional[Any]) -> None:
+    """Stop serving cached responses for a patient (call after writing its data)."""
+    cache = get_response_cache()
+    if cache is not None and patient_id:
+        cache.invalidate(str(patient_id))
+
+
+def invalidate_token(token: Optional[str]) -> None:
+    """Stop serving cached token-scoped responses for a demo token (call on demo reset)."""
+    cache = get_response_cache()
+    if cache is not None and token:
+        cache.invalidate_token(token)
+
+
+def invalidate_rows(rows: Optional[Iterable[Any]]) -> None:
+    """Invalidate the patients of written therapy_sessions rows (insert/update response data)."""
+    for patient_id in {row.get("patient_id") for row in rows or () if isinstance(row, dict)}:
+        invalidate_patient(patient_id)
+
+
+def invalidate_on_event(event: Dict[str, Any]) -> None:
+    """Event bus listener: any pipeline event means the patient's data may have changed."""
+    invalidate_patient(event.get("patient_id"))
+
+
+# Global cache instance (None when disabled)
+_response_cache: Optional[ResponseCache] = None
+_response_cache_initialized = False
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Get the process-wide response cache (singleton pattern).
+
+    Returns:
+        ResponseCache, or None if RESPONSE_CACHE_ENABLED=false
+    """
+    global _response_cache, _response_cache_initialized
+
+    if not _response_cache_initialized:
+        with _response_cache_lock:
+            if not _response_cache_initialized:
+                if settings.response_cache_enabled:
+                    _response_cache = ResponseCache(
+                        max_entries=settings.response_cache_max_entries,
+                        ttl_seconds=settings.response_cache_ttl_seconds,
+                    )
+                _response_cache_initialized = True
+
+    return _response_cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """Replace the process-wide cache (useful for testing)."""
+    global _response_cache, _response_cache_initialized
+    with _response_cache_lock:
+        _response_cache = cache
+        _response_cache_initialized = True
+
+
+def reset_response_cache() -> None:
+    """Reset the cache singleton to re-read from settings."""
+    global _response_cache, _response_cache_initialized
+    with _response_cache_lock:
+        _response_cache = None
+        _response_cache_initialized = False
@@ -11,6 +11,13 @@ from pathlib import Path
 
 from app.database import get_db
 from app.middleware.demo_auth import require_demo_auth
+from app.middleware.response_cache import get_response_cache
+from app.services.demo_seeding import get_demo_seeding_pool
+from app.services.openai_client_registry import get_client_pool_stats
+from app.services.llm_response_cache import get_llm_cache
+from app.services.llm_rate_limiter import get_rate_limiter
+from app.utils.cost_sink import get_cost_sink
+from app.utils.event_bus import get_event_bus
 
 router = APIRouter(prefix="/api/debug", tags=["debug"])
 logger = logging.getLogger(__name__)
@@ -80,3 +87,56 @@ async def debug_check_paths():
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.get("/openai-pool")
+async def debug_openai_pool():
+    """Connection-pool saturation metrics for the shared OpenAI clients"""
+    stats = get_client_pool_stats()
+    return {
+        "clients": stats,
+        "total_in_flight": sum(s["in_flight"] for s in stats),
+        "total_saturated_requests": sum(s["saturated_requests"] for s in stats),
+    }
+
+
+@router.get("/llm-cache")
+async def debug_llm_cache():
+    """Hit/miss statistics for the LLM response cache"""
+    cache = get_llm_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.get_stats()}
+
+
+@router.get("/response-cache")
+async def debug_response_cache():
+    """Hit ratio, 304 and invalidation counters for the GET response cache"""
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.get_stats()}
+
+
+@router.get("/cost-sink")
+async def debug_cost_sink():
+    """Queue depth and write/drop counters for the generation cost sink"""
+    return get_cost_sink().get_stats()
+
+
+@router.get("/event-bus")
+async def debug_event_bus():
+    """Transport, subscriber and delivery counters for the SSE event bus"""
+    return get_event_bus().get_stats()
+
+
+@router.get("/rate-limiter")
+async def debug_rate_limiter():
+    """Per-model RPM/TPM budgets, waits and 429 counters for the LLM rate limiter"""
+    return get_rate_limiter().get_stats()
+
+
+@router.get("/demo-seeding")
+async def debug_demo_seeding():
+    """Running demo seeding pipelines and the stage each one is in"""
+    return get_demo_seeding_pool().get_stats()
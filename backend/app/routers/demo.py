@@ -5,19 +5,21 @@ Handles demo initialization, reset, and status
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 from datetime import datetime
 from pathlib import Path
+import base64
+import hashlib
+import json
 import logging
-import subprocess
-import asyncio
-import sys
-import os
 
-from app.database import get_db, get_supabase_admin
+from app.database import get_async_db, get_supabase_admin
 from app.middleware.demo_auth import get_demo_user, require_demo_auth
-from supabase import Client
+from app.middleware.response_cache import cache_scope, invalidate_patient, invalidate_token
+from app.services.dag_scheduler import load_report
+from app.services.demo_seeding import TRANSCRIPTS, WAVE1, WAVE2, SeedingProgress, get_demo_seeding_pool
+from supabase import AsyncClient
 
 router = APIRouter(prefix="/api/demo", tags=["demo"])
 logger = logging.getLogger(__name__)
@@ -27,51 +29,87 @@ logger = logging.getLogger(__name__)
 # Shared Helper Functions
 # ============================================================================
 
-def register_process(patient_id: str, process_name: str, process: asyncio.subprocess.Process) -> None:
-    """Track a subprocess for potential termination"""
-    if patient_id not in running_processes:
-        running_processes[patient_id] = {}
-    running_processes[patient_id][process_name] = process
+# In-memory tracking of analysis completion (keyed by patient_id)
+analysis_status = {}
 
+# Seeding stage -> (completion flag, completion timestamp) in analysis_status
+_STAGE_COMPLETE_FIELDS = {
+    WAVE1: ("wave1_complete", "wave1_completed_at"),
+    WAVE2: ("wave2_complete", "wave2_completed_at"),
+}
 
-async def stream_subprocess_output(
-    process: asyncio.subprocess.Process,
-    tag: str,
-    timeout_seconds: int
-) -> bool:
-    """
-    Stream stdout from a subprocess line by line.
-    Returns True if process completed successfully, False otherwise.
-    """
-    async def stream_output():
-        while True:
-            line = await process.stdout.readline()
-            if not line:
-                break
-            line_text = line.decode('utf-8').rstrip()
-            print(f"[{tag}] {line_text}", flush=True)
-            logger.info(f"[{tag}] {line_text}")
 
-    try:
-        await asyncio.wait_for(stream_output(), timeout=timeout_seconds)
-        await process.wait()
-        return process.returncode == 0
-    except asyncio.TimeoutError:
-        process.kill()
-        await process.wait()
-        return False
+def record_seeding_progress(event: SeedingProgress) -> None:
+    """Mark Wave 1 / Wave 2 complete in analysis_status as the seeding pool reports them"""
+    # Status responses include seeding progress, so every event changes them
+    invalidate_patient(event.patient_id)
+    fields = _STAGE_COMPLETE_FIELDS.get(event.stage)
+    if fields and event.status == "complete":
+        flag, completed_at = fields
+        status = analysis_status.setdefault(event.patient_id, {})
+        status[flag] = True
+        status[completed_at] = datetime.now().isoformat()
 
 
-def get_script_path(script_name: str) -> Path:
-    """Get absolute path to a script in the scripts directory"""
-    return Path(__file__).parent.parent.parent / "scripts" / script_name
+def start_seeding(patient_id: str, stages: Tuple[str, ...], **options) -> None:
+    """Run seeding stages for a patient on the in-process seeding pool (non-blocking)"""
+    get_demo_seeding_pool().start(patient_id, stages, on_progress=record_seeding_progress, **options)
 
-# In-memory tracking of analysis completion (keyed by patient_id)
-analysis_status = {}
 
-# In-memory tracking of running processes (keyed by patient_id)
-# Stores subprocess references so they can be terminated
-running_processes = {}
+# Status columns read on every poll. The transcript is only checked for
+# presence (its first segment), never fetched whole.
+STATUS_COLUMNS = (
+    "id, session_date, transcript_head:transcript->0, topics, mood_score, summary, technique, "
+    "action_items, topics_extracted_at, mood_analyzed_at, deep_analyzed_at, prose_generated_at"
+)
+# Wave 2 output, fetched only for sessions whose Wave 2 changed since the client's cursor
+STATUS_HEAVY_FIELDS = ("prose_analysis", "deep_analysis")
+STATUS_CURSOR_VERSION = 1
+
+
+def _fingerprint(values) -> str:
+    return hashlib.blake2b(json.dumps(values, default=str).encode("utf-8"), digest_size=4).hexdigest()
+
+
+def session_watermark(session: dict) -> Tuple[str, str]:
+    """
+    (state, wave2) fingerprints of a session's status row.
+
+    state covers every status column (so a session is sent when any of them
+    changed); wave2 covers the Wave 2 timestamps only (so prose/deep analysis
+    are sent when they changed).
+    """
+    wave2 = _fingerprint([session.get("deep_analyzed_at"), session.get("prose_generated_at")])
+    state = _fingerprint([
+        session.get("session_date"),
+        session.get("transcript_head") is not None,
+        session.get("topics"),
+        session.get("mood_score"),
+        session.get("summary"),
+        session.get("technique"),
+        session.get("action_items"),
+        session.get("topics_extracted_at"),
+        session.get("mood_analyzed_at"),
+        wave2,
+    ])
+    return state, wave2
+
+
+def encode_status_cursor(watermarks: Dict[str, Tuple[str, str]]) -> str:
+    """Opaque cursor holding the per-session watermarks a client has seen"""
+    payload = {"v": STATUS_CURSOR_VERSION, "s": {sid: f"{state}.{wave2}" for sid, (state, wave2) in watermarks.items()}}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_status_cursor(cursor: str) -> Optional[Dict[str, Tuple[str, str]]]:
+    """Per-session watermarks from a cursor (None if malformed or from another version)"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload.get("v") != STATUS_CURSOR_VERSION:
+            return None
+        return {sid: tuple(marks.split(".", 1)) for sid, marks in payload["s"].items()}
+    except (ValueError, TypeError, AttributeError, KeyError):
+        return None
 
 
 # ============================================================================
@@ -122,6 +160,9 @@ class SessionStatus(BaseModel):
     # NEW: Change detection flag
     changed_since_last_poll: bool = False
 
+    # Delta polls: heavy fields left out because they did not change since the cursor
+    unchanged_fields: Optional[List[str]] = None
+
 
 class DemoStatusResponse(BaseModel):
     """Enhanced demo status with per-session completion tracking"""
@@ -142,167 +183,16 @@ class DemoStatusResponse(BaseModel):
     stopped_at_session_id: Optional[str] = None  # Which session was being processed when stopped
     can_resume: bool  # Whether resume is possible
 
+    # Wave 2 DAG: per-node timings and critical path of the latest run
+    pipeline_timings: Optional[dict] = None
 
-# ============================================================================
-# Background Tasks
-# ============================================================================
-
-async def populate_session_transcripts_background(patient_id: str):
-    """Background task to populate session transcripts from JSON files"""
-    print(f"📝 Step 1/3: Populating session transcripts for patient {patient_id}", flush=True)
-    logger.info(f"📝 Populating session transcripts for patient {patient_id}")
-
-    try:
-        # Get Python executable from current environment
-        python_exe = sys.executable
-
-        # Resolve absolute path to script
-        script_path = Path(__file__).parent.parent.parent / "scripts" / "seed_all_sessions.py"
-
-        logger.info(f"Running transcript population: {python_exe} {script_path} {patient_id}")
-
-        # Run transcript population script with environment variables (NON-BLOCKING)
-        process = await asyncio.create_subprocess_exec(
-            python_exe, str(script_path), patient_id,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            env=os.environ.copy()  # Pass all environment variables
-        )
-
-        # Track process for potential termination
-        if patient_id not in running_processes:
-            running_processes[patient_id] = {}
-        running_processes[patient_id]["transcript"] = process
-
-        # Wait for completion (async, non-blocking)
-        try:
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=300  # 5 minute timeout
-            )
-            stdout_text = stdout.decode('utf-8') if stdout else ''
-            stderr_text = stderr.decode('utf-8') if stderr else ''
-
-            if process.returncode == 0:
-                print(f"✅ Step 1/3 Complete: Session transcripts populated", flush=True)
-                logger.info(f"✅ Session transcripts populated for patient {patient_id}")
-                logger.info(stdout_text)
-                # Show script output in Railway logs
-                if stdout_text:
-                    print(f"[Transcript Script Output]:\n{stdout_text}", flush=True)
-            else:
-                print(f"❌ Step 1/3 Failed: {stderr_text}", flush=True)
-                logger.error(f"❌ Transcript population failed: {stderr_text}")
-                # Show error details in Railway logs
-                if stderr_text:
-                    print(f"[Transcript Script Error]:\n{stderr_text}", flush=True)
-
-        except asyncio.TimeoutError:
-            logger.error(f"❌ Transcript population timeout for patient {patient_id}")
-            process.kill()
-            await process.wait()
-
-    except Exception as e:
-        logger.error(f"❌ Transcript population error: {e}")
-
-
-async def run_wave1_analysis_background(patient_id: str):
-    """Background task to run Wave 1 analysis with real-time streaming logs"""
-    print(f"🚀 Step 2/3: Starting Wave 1 analysis for patient {patient_id}", flush=True)
-    logger.info(f"🚀 Starting Wave 1 analysis for patient {patient_id}")
-
-    try:
-        script_path = get_script_path("seed_wave1_analysis.py")
-        logger.info(f"Running Wave 1 analysis: {sys.executable} {script_path} {patient_id}")
-
-        process = await asyncio.create_subprocess_exec(
-            sys.executable, str(script_path), patient_id,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT,
-            env=os.environ.copy()
-        )
-
-        register_process(patient_id, "wave1", process)
-
-        success = await stream_subprocess_output(process, "Wave1", timeout_seconds=600)
-
-        if success:
-            print(f"✅ Step 2/3 Complete: Wave 1 analysis complete", flush=True)
-            logger.info(f"✅ Wave 1 analysis complete for patient {patient_id}")
-            if patient_id not in analysis_status:
-                analysis_status[patient_id] = {}
-            analysis_status[patient_id]["wave1_complete"] = True
-            analysis_status[patient_id]["wave1_completed_at"] = datetime.now().isoformat()
-        else:
-            print(f"❌ Step 2/3 Failed or timed out", flush=True)
-            logger.error(f"❌ Wave 1 analysis failed for patient {patient_id}")
+    # Seeding pool: latest progress event per stage ("transcript" | "wave1" | "wave2")
+    seeding_progress: Optional[dict] = None
 
-    except Exception as e:
-        print(f"❌ Wave 1 analysis ERROR: {e}", flush=True)
-        logger.error(f"❌ Wave 1 analysis error: {e}")
-
-
-async def run_wave2_analysis_background(patient_id: str):
-    """Background task to run Wave 2 analysis with real-time streaming logs"""
-    print(f"🚀 Step 3/3: Starting Wave 2 analysis for patient {patient_id}", flush=True)
-    logger.info(f"🚀 Starting Wave 2 analysis for patient {patient_id}")
-
-    try:
-        script_path = get_script_path("seed_wave2_analysis.py")
-        logger.info(f"Running Wave 2 analysis: {sys.executable} {script_path} {patient_id}")
-
-        process = await asyncio.create_subprocess_exec(
-            sys.executable, str(script_path), patient_id,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT,
-            env=os.environ.copy()
-        )
-
-        register_process(patient_id, "wave2", process)
-
-        success = await stream_subprocess_output(process, "Wave2", timeout_seconds=900)
-
-        if success:
-            print(f"✅ Step 3/3 Complete: Wave 2 analysis complete", flush=True)
-            logger.info(f"✅ Wave 2 analysis complete for patient {patient_id}")
-            if patient_id not in analysis_status:
-                analysis_status[patient_id] = {}
-            analysis_status[patient_id]["wave2_complete"] = True
-            analysis_status[patient_id]["wave2_completed_at"] = datetime.now().isoformat()
-        else:
-            print(f"❌ Step 3/3 Failed or timed out", flush=True)
-            logger.error(f"❌ Wave 2 analysis failed for patient {patient_id}")
-
-    except Exception as e:
-        print(f"❌ Wave 2 analysis ERROR: {e}", flush=True)
-        logger.error(f"❌ Wave 2 analysis error: {e}")
-
-
-async def run_full_initialization_pipeline(patient_id: str):
-    """Run complete initialization: transcripts (blocking) → Wave 1 + Wave 2 (background)"""
-    print("=" * 80, flush=True)
-    print(f"🔥 BACKGROUND TASK EXECUTING: patient_id={patient_id}", flush=True)
-    print("=" * 80, flush=True)
-    logger.info("=" * 80)
-    logger.info(f"🎬 BACKGROUND TASK STARTED: Full initialization pipeline for patient {patient_id}")
-    logger.info("=" * 80)
-
-    # Step 1: Populate transcripts from JSON files (BLOCKING - required for frontend)
-    await populate_session_transcripts_background(patient_id)
-
-    print(f"✅ Transcripts loaded - demo ready for frontend", flush=True)
-    logger.info(f"✅ Transcripts loaded for patient {patient_id}")
-
-    # Step 2 & 3: Run Wave 1 and Wave 2 in background (non-blocking)
-    async def run_wave1_then_wave2():
-        """Run Wave 1, then start Wave 2 when Wave 1 completes"""
-        await run_wave1_analysis_background(patient_id)
-        asyncio.create_task(run_wave2_analysis_background(patient_id))
-
-    asyncio.create_task(run_wave1_then_wave2())
-
-    print(f"🚀 Wave 1 + Wave 2 analysis running in background (non-blocking)", flush=True)
-    logger.info(f"🚀 Analysis pipeline running independently for patient {patient_id}")
+    # Delta sync: pass cursor back as ?since= to receive only changed sessions
+    cursor: Optional[str] = None
+    delta: bool = False  # True when sessions lists only changes since the given cursor
+    removed_session_ids: List[str] = []
 
 
 # ============================================================================
@@ -311,7 +201,7 @@ async def run_full_initialization_pipeline(patient_id: str):
 
 @router.post("/initialize", response_model=DemoInitResponse)
 async def initialize_demo(
-    db: Client = Depends(get_db),
+    db: AsyncClient = Depends(get_async_db),
     run_analysis: bool = True  # Query param to enable/disable analysis
 ):
     """
@@ -337,7 +227,7 @@ async def initialize_demo(
 
     try:
         # Call SQL function to seed demo data (v4 creates all 10 sessions)
-        response = db.rpc("seed_demo_v4", {"p_demo_token": demo_token}).execute()
+        response = await db.rpc("seed_demo_v4", {"p_demo_token": demo_token}).execute()
 
         if not response.data or len(response.data) == 0:
             raise HTTPException(
@@ -351,11 +241,11 @@ async def initialize_demo(
         logger.info(f"📝 Extracted patient_id: {patient_id}, session_ids count: {len(session_ids)}")
 
         # Fetch patient record to get user_id, then get expiry from users table
-        patient_response = db.table("patients").select("user_id").eq("id", patient_id).single().execute()
+        patient_response = await db.table("patients").select("user_id").eq("id", patient_id).single().execute()
         user_id = patient_response.data["user_id"]
         logger.info(f"📝 Fetched user_id: {user_id}")
 
-        user_response = db.table("users").select("demo_expires_at").eq("id", user_id).single().execute()
+        user_response = await db.table("users").select("demo_expires_at").eq("id", user_id).single().execute()
         expires_at = user_response.data["demo_expires_at"]
         logger.info(f"📝 Fetched expires_at: {expires_at}")
 
@@ -365,9 +255,9 @@ async def initialize_demo(
         init_analysis_status = "pending"
         logger.info(f"📝 run_analysis parameter: {run_analysis}")
         if run_analysis:
-            # Use asyncio.create_task() instead of background_tasks to avoid blocking other requests
-            # This allows multiple demo initializations to run concurrently without blocking
-            asyncio.create_task(run_full_initialization_pipeline(str(patient_id)))
+            # Transcripts → Wave 1 → Wave 2 run on the in-process seeding pool, so other requests
+            # (and other demos, up to DEMO_SEEDING_MAX_PIPELINES) proceed concurrently
+            start_seeding(str(patient_id), (TRANSCRIPTS, WAVE1, WAVE2))
             init_analysis_status = "processing"
             logger.info(f"🎬 Started full initialization pipeline (transcripts + Wave 1 + Wave 2) for patient {patient_id}")
 
@@ -392,7 +282,7 @@ async def initialize_demo(
 async def reset_demo(
     request: Request,
     demo_user: dict = Depends(require_demo_auth),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Reset demo user by deleting all sessions and re-seeding with fresh 10 sessions
@@ -410,21 +300,23 @@ async def reset_demo(
     user_id = demo_user["id"]
 
     # Look up current patient_id before deletion
-    patient_response = db.table("patients").select("id").eq("user_id", user_id).single().execute()
+    patient_response = await db.table("patients").select("id").eq("user_id", user_id).single().execute()
 
     if patient_response.data:
         old_patient_id = patient_response.data["id"]
         logger.info(f"Resetting demo for user: {user_id}, patient: {old_patient_id}")
 
         # Delete existing sessions and patient record
-        db.table("therapy_sessions").delete().eq("patient_id", old_patient_id).execute()
-        db.table("patients").delete().eq("id", old_patient_id).execute()
+        await db.table("therapy_sessions").delete().eq("patient_id", old_patient_id).execute()
+        await db.table("patients").delete().eq("id", old_patient_id).execute()
+        invalidate_patient(old_patient_id)
     else:
         logger.info(f"Resetting demo for user: {user_id} (no existing patient)")
+    invalidate_token(demo_token)
 
     try:
         # Re-seed using seed_demo_v4 (creates new patient + 10 sessions)
-        response = db.rpc("seed_demo_v4", {"p_demo_token": demo_token}).execute()
+        response = await db.rpc("seed_demo_v4", {"p_demo_token": demo_token}).execute()
 
         if not response.data or len(response.data) == 0:
             raise HTTPException(
@@ -439,7 +331,7 @@ async def reset_demo(
         logger.info(f"✓ Demo reset complete: new patient {new_patient_id} with {len(session_ids)} sessions")
 
         # Re-run initialization pipeline in background
-        asyncio.create_task(run_full_initialization_pipeline(str(new_patient_id)))
+        start_seeding(str(new_patient_id), (TRANSCRIPTS, WAVE1, WAVE2))
         logger.info(f"🎬 Started initialization pipeline for reset demo (patient {new_patient_id})")
 
         return DemoResetResponse(
@@ -459,19 +351,34 @@ async def reset_demo(
 @router.get("/status", response_model=DemoStatusResponse)
 async def get_demo_status(
     request: Request,
+    since: Optional[str] = None,
     demo_user: dict = Depends(require_demo_auth),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Get current demo user status with per-session analysis progress
 
+    Responses are cached per patient and carry an ETag; polls sending
+    If-None-Match get 304 until the patient's data changes.
+
+    Delta sync: every response includes a cursor. Passing it back as
+    ?since=<cursor> returns only sessions whose status changed since then
+    (changed_since_last_poll=True), with prose_analysis/deep_analysis left out
+    (listed in unchanged_fields) unless their Wave 2 timestamps advanced, and
+    the ids of sessions that no longer exist. Totals and processing state
+    always cover all sessions. A malformed or outdated cursor gets a full
+    response (delta=False).
+
+    Args:
+        since: Cursor from a previous response (optional)
+
     Returns:
         DemoStatusResponse with user info, session count, and per-session completion
     """
     user_id = demo_user["id"]
 
     # Look up the patient record to get patient_id
-    patient_response = db.table("patients").select("id").eq("user_id", user_id).single().execute()
+    patient_response = await db.table("patients").select("id").eq("user_id", user_id).single().execute()
 
     if not patient_response.data:
         raise HTTPException(
@@ -480,27 +387,36 @@ async def get_demo_status(
         )
 
     patient_id = patient_response.data["id"]
+    cache_scope(request, patient_id, demo_user.get("demo_expires_at"))
 
-    # Fetch all sessions with analysis data (enhanced for delta updates)
-    sessions_response = db.table("therapy_sessions").select("""
-        id,
-        session_date,
-        transcript,
-        topics,
-        mood_score,
-        summary,
-        technique,
-        action_items,
-        prose_analysis,
-        deep_analysis,
-        topics_extracted_at,
-        mood_analyzed_at,
-        deep_analyzed_at,
-        prose_generated_at
-    """).eq("patient_id", patient_id).order("session_date").execute()
+    seen = decode_status_cursor(since) if since else None
+    is_delta = seen is not None
+
+    # Status columns for all sessions; Wave 2 output inline only for full responses
+    columns = STATUS_COLUMNS if is_delta else f"{STATUS_COLUMNS}, {', '.join(STATUS_HEAVY_FIELDS)}"
+    sessions_response = await db.table("therapy_sessions").select(columns) \
+        .eq("patient_id", patient_id).order("session_date").execute()
 
     sessions = sessions_response.data or []
     session_count = len(sessions)
+    watermarks = {session["id"]: session_watermark(session) for session in sessions}
+
+    # Delta: only sessions whose watermark moved; Wave 2 output only where Wave 2 moved
+    changed = sessions
+    heavy_ids = {session["id"] for session in sessions}
+    if is_delta:
+        changed = [session for session in sessions if seen.get(session["id"]) != watermarks[session["id"]]]
+        heavy_ids = {
+            session["id"] for session in changed
+            if session.get("prose_generated_at") is not None
+            and (seen.get(session["id"]) or (None, None))[1] != watermarks[session["id"]][1]
+        }
+        if heavy_ids:
+            heavy_response = await db.table("therapy_sessions") \
+                .select(f"id, {', '.join(STATUS_HEAVY_FIELDS)}") \
+                .in_("id", sorted(heavy_ids)).execute()
+            heavy_rows = {row["id"]: row for row in heavy_response.data or []}
+            changed = [{**session, **heavy_rows.get(session["id"], {})} for session in changed]
 
     # Build per-session status with full analysis data
     session_statuses = []
@@ -508,16 +424,19 @@ async def get_demo_status(
     wave2_complete_count = 0
 
     for session in sessions:
-        # Determine Wave 1/Wave 2 completion
-        has_transcript = bool(session.get("transcript"))
-        wave1_complete = session.get("topics") is not None or session.get("mood_score") is not None
-        wave2_complete = session.get("prose_analysis") is not None
-
-        if wave1_complete:
+        # Wave 2 is complete once prose is written (prose_generated_at is written with it)
+        if session.get("topics") is not None or session.get("mood_score") is not None:
             wave1_complete_count += 1
-        if wave2_complete:
+        if session.get("prose_generated_at") is not None:
             wave2_complete_count += 1
 
+    for session in changed:
+        # Determine Wave 1/Wave 2 completion
+        has_transcript = session.get("transcript_head") is not None
+        wave1_complete = session.get("topics") is not None or session.get("mood_score") is not None
+        wave2_complete = session.get("prose_generated_at") is not None
+        include_heavy = session["id"] in heavy_ids
+
         # Get timestamps (ISO format) - prefer first available
         last_wave1_update = session.get("topics_extracted_at") or session.get("mood_analyzed_at")
         last_wave2_update = session.get("prose_generated_at") or session.get("deep_analyzed_at")
@@ -537,16 +456,17 @@ async def get_demo_status(
             technique=session.get("technique") if wave1_complete else None,
             action_items=session.get("action_items") if wave1_complete else None,
 
-            # Wave 2 fields (null if not complete)
-            prose_analysis=session.get("prose_analysis") if wave2_complete else None,
-            deep_analysis=session.get("deep_analysis") if wave2_complete else None,
+            # Wave 2 fields (null if not complete, or unchanged in a delta)
+            prose_analysis=session.get("prose_analysis") if wave2_complete and include_heavy else None,
+            deep_analysis=session.get("deep_analysis") if wave2_complete and include_heavy else None,
 
             # Timestamps
             last_wave1_update=last_wave1_update,
             last_wave2_update=last_wave2_update,
 
-            # Change detection (frontend will override this based on comparison)
-            changed_since_last_poll=False
+            # Change detection: set for every session a delta response carries
+            changed_since_last_poll=is_delta,
+            unchanged_fields=list(STATUS_HEAVY_FIELDS) if wave2_complete and not include_heavy else None,
         ))
 
     # Determine overall analysis status
@@ -566,7 +486,7 @@ async def get_demo_status(
     # Query roadmap for updated_at timestamp (PR #3)
     roadmap_updated_at = None
     try:
-        roadmap_response = db.table("patient_roadmap").select("updated_at").eq("patient_id", patient_id).execute()
+        roadmap_response = await db.table("patient_roadmap").select("updated_at").eq("patient_id", patient_id).execute()
         if roadmap_response.data:
             first_row = roadmap_response.data[0]
             # Handle both dict and string response formats
@@ -580,9 +500,8 @@ async def get_demo_status(
     can_resume = False
 
     # Check if processing is currently running
-    is_running = patient_id in running_processes and any(
-        proc.returncode is None for proc in running_processes[patient_id].values() if proc
-    )
+    seeding_pool = get_demo_seeding_pool()
+    is_running = seeding_pool.is_running(patient_id)
 
     # Check if stopped (stopped flag in analysis_status dict)
     analysis_status_dict = analysis_status.get(patient_id, {})
@@ -598,7 +517,7 @@ async def get_demo_status(
         can_resume = True
         # Find first session with Wave 1 complete but Wave 2 incomplete
         stopped_at_session_id = next(
-            (s["id"] for s in sessions if s.get("topics") and not s.get("prose_analysis")),
+            (s["id"] for s in sessions if s.get("topics") and s.get("prose_generated_at") is None),
             None
         )
     else:
@@ -618,7 +537,12 @@ async def get_demo_status(
         roadmap_updated_at=roadmap_updated_at,
         processing_state=processing_state,
         stopped_at_session_id=stopped_at_session_id,
-        can_resume=can_resume
+        can_resume=can_resume,
+        pipeline_timings=load_report(patient_id),
+        seeding_progress=seeding_pool.progress(patient_id) or None,
+        cursor=encode_status_cursor(watermarks),
+        delta=is_delta,
+        removed_session_ids=sorted(set(seen) - set(watermarks)) if is_delta else [],
     )
 
 
@@ -668,19 +592,19 @@ async def get_pipeline_logs(
 async def stop_demo_processing(
     request: Request,
     demo_user: dict = Depends(require_demo_auth),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
-    Stop all running background processes for the current demo.
-    Terminates transcript population, Wave 1, and Wave 2 analysis.
+    Stop the running seeding pipeline for the current demo.
+    Cancels transcript population, Wave 1, or Wave 2 analysis, whichever is running.
 
     Returns:
-        Status of terminated processes
+        Status of terminated stages
     """
     user_id = demo_user["id"]
 
     # Look up the patient record to get patient_id
-    patient_response = db.table("patients").select("id").eq("user_id", user_id).single().execute()
+    patient_response = await db.table("patients").select("id").eq("user_id", user_id).single().execute()
 
     if not patient_response.data:
         raise HTTPException(
@@ -698,42 +622,17 @@ async def stop_demo_processing(
         analysis_status[patient_id] = {}
     analysis_status[patient_id]["wave1_stopped"] = True
     analysis_status[patient_id]["wave2_stopped"] = True
+    invalidate_patient(patient_id)
+
+    terminated = await get_demo_seeding_pool().stop(patient_id)
 
-    if patient_id not in running_processes:
+    if not terminated:
         return {
             "message": "No running processes found for this demo",
             "patient_id": patient_id,
             "terminated": []
         }
 
-    terminated = []
-    processes = running_processes.get(patient_id, {})
-
-    for process_name, process in processes.items():
-        try:
-            if process and process.returncode is None:  # Process is still running
-                print(f"  🛑 Terminating {process_name} process...", flush=True)
-                logger.info(f"Terminating {process_name} process for patient {patient_id}")
-
-                process.terminate()  # Send SIGTERM
-                try:
-                    # Wait up to 5 seconds for graceful shutdown
-                    await asyncio.wait_for(process.wait(), timeout=5.0)
-                    print(f"  ✓ {process_name} terminated gracefully", flush=True)
-                except asyncio.TimeoutError:
-                    # Force kill if not terminated
-                    process.kill()
-                    await process.wait()
-                    print(f"  ✓ {process_name} force killed", flush=True)
-
-                terminated.append(process_name)
-        except Exception as e:
-            logger.error(f"Error terminating {process_name}: {e}")
-            print(f"  ✗ Error terminating {process_name}: {e}", flush=True)
-
-    # Clear process references
-    running_processes[patient_id] = {}
-
     print(f"✅ Stopped {len(terminated)} processes: {', '.join(terminated)}", flush=True)
     logger.info(f"Stopped {len(terminated)} processes for patient {patient_id}")
 
@@ -748,22 +647,23 @@ async def stop_demo_processing(
 async def resume_demo_processing(
     request: Request,
     demo_user: dict = Depends(require_demo_auth),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Resume processing from where it was stopped.
 
     Smart resume logic:
     1. Find incomplete sessions (Wave 1 complete but Wave 2 incomplete)
-    2. Re-run Wave 2 for incomplete session
-    3. Continue with remaining sessions (Wave 1 → Wave 2 → Roadmap)
+    2. If some sessions still lack Wave 1, run Wave 1 for them (finished
+       tasks are skipped), then Wave 2 → Roadmap for the patient
+    3. Otherwise re-run Wave 2 for the incomplete session onwards
 
     Returns immediately after scheduling background tasks.
     """
     user_id = demo_user["id"]
 
     # Look up the patient record to get patient_id
-    patient_response = db.table("patients").select("id").eq("user_id", user_id).single().execute()
+    patient_response = await db.table("patients").select("id").eq("user_id", user_id).single().execute()
 
     if not patient_response.data:
         raise HTTPException(
@@ -781,9 +681,10 @@ async def resume_demo_processing(
         analysis_status[patient_id] = {}
     analysis_status[patient_id]["wave1_stopped"] = False
     analysis_status[patient_id]["wave2_stopped"] = False
+    invalidate_patient(patient_id)
 
     # Find incomplete sessions
-    sessions_result = db.table("therapy_sessions") \
+    sessions_result = await db.table("therapy_sessions") \
         .select("id, topics, prose_analysis") \
         .eq("patient_id", patient_id) \
         .order("session_date") \
@@ -798,19 +699,13 @@ async def resume_demo_processing(
     )
     next_sessions = [s for s in sessions if not s.get("topics")]
 
-    # Schedule resume tasks
-    if incomplete_session:
-        print(f"[RESUME] Re-running Wave 2 for Session {incomplete_session['id']}", flush=True)
-        asyncio.create_task(run_wave2_analysis_background(patient_id))
-
+    # Schedule resume stages (one pipeline, so two Wave 2 runs never race on the cumulative context)
     if next_sessions:
         print(f"[RESUME] Continuing with {len(next_sessions)} remaining sessions", flush=True)
-
-        async def run_wave1_then_wave2():
-            await run_wave1_analysis_background(patient_id)
-            asyncio.create_task(run_wave2_analysis_background(patient_id))
-
-        asyncio.create_task(run_wave1_then_wave2())
+        start_seeding(patient_id, (WAVE1, WAVE2), force=False)
+    elif incomplete_session:
+        print(f"[RESUME] Re-running Wave 2 for Session {incomplete_session['id']}", flush=True)
+        start_seeding(patient_id, (WAVE2,))
 
     return {
         "message": "Processing resumed",
@@ -4,24 +4,33 @@ Handles session management, transcript upload, and breakthrough detection
 """
 
 from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict
 from pydantic import BaseModel, field_validator
 from datetime import datetime, timedelta
+import asyncio
 import json
 import logging
 
-from app.database import get_db, get_session_with_breakthrough, store_breakthrough_analysis
+from app.database import get_async_db, get_session_with_breakthrough, store_breakthrough_analysis
 from app.services.breakthrough_detector import BreakthroughDetector
 from app.services.mood_analyzer import MoodAnalyzer
 from app.services.topic_extractor import TopicExtractor
 from app.services.prose_generator import ProseGenerator
-from app.services.analysis_orchestrator import AnalysisOrchestrator, analyze_session_full_pipeline
+from app.services.analysis_orchestrator import AnalysisOrchestrator
+from app.services.analysis_jobs import BREAKTHROUGH, FULL_PIPELINE, WAVE1, enqueue_analysis
+from app.services.job_queue import get_job_queue
+from app.services.wave1_batch_runner import Wave1BatchRunner
 from app.services.technique_library import get_technique_library
 from app.services.speaker_labeler import label_session_transcript, SpeakerLabelingResult
-from app.services.progress_metrics_extractor import ProgressMetricsExtractor, ProgressMetricsResponse
+from app.services.patient_aggregates import PatientAggregatesStore
+from app.services.progress_analytics import progress_overview
+from app.services.progress_metrics_extractor import ProgressMetricsResponse
 from app.middleware.demo_auth import get_demo_user
+from app.middleware.response_cache import cache_scope, invalidate_rows
+from app.utils.session_fields import session_columns, DEFAULT_LIST_FIELD_SET
 from app.config import settings
-from supabase import Client
+from supabase import AsyncClient
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 logger = logging.getLogger(__name__)
@@ -114,6 +123,7 @@ class PipelineStatusResponse(BaseModel):
     deep_complete: bool
     wave1_completed_at: Optional[datetime] = None
     deep_analyzed_at: Optional[datetime] = None
+    timings: Optional[dict] = None  # Per-node DAG timings and critical path
 
 
 class TechniqueDefinitionResponse(BaseModel):
@@ -131,6 +141,21 @@ class SpeakerLabelingResponse(BaseModel):
     detected_roles: Dict[str, str]  # {therapist_speaker_id, patient_speaker_id}
 
 
+class Wave1BatchRequest(BaseModel):
+    """Request model for cross-session Wave 1 batch analysis"""
+    session_ids: List[str]
+    force: bool = False  # Re-run tasks that already have results
+    stream: bool = False  # Stream progress as NDJSON instead of running in background
+
+
+def _resolve_session_columns(fields: str) -> str:
+    """Resolve a ?fields= field set to select() columns (400 if unknown)"""
+    try:
+        return session_columns(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # ============================================================================
 # Session CRUD Endpoints
 # ============================================================================
@@ -138,8 +163,9 @@ class SpeakerLabelingResponse(BaseModel):
 @router.get("/")
 async def get_all_sessions(
     request: Request,
+    fields: str = DEFAULT_LIST_FIELD_SET,
     demo_user: dict = Depends(get_demo_user),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Get ALL sessions for the current demo patient
@@ -150,14 +176,19 @@ async def get_all_sessions(
 
     **Authentication:** Requires Demo-Token header
 
+    **Query Params:**
+        fields: Column projection - summary (default), wave1, wave2, or full.
+            Only "full" includes the transcript; fetch it lazily with
+            GET /api/sessions/{id}/transcript instead.
+
     **Returns:**
-        List of sessions with all fields:
-        - id, patient_id, therapist_id
-        - session_date, duration_minutes, status
-        - transcript (JSONB array of segments)
-        - AI analysis fields (topics, action_items, technique, summary)
-        - mood analysis fields (mood_score, mood_confidence, emotional_tone)
-        - Wave 2 fields (deep_analysis, prose_analysis)
+        List of sessions with the selected fields:
+        - summary: id, patient_id, therapist_id, session_date, duration_minutes,
+          status, topics, action_items, technique, summary, mood_score,
+          mood_confidence, emotional_tone, breakthrough flags
+        - wave1: + mood rationale/indicators, breakthrough_data, timestamps
+        - wave2: + deep_analysis, prose_analysis
+        - full: + transcript (JSONB array of segments)
 
     **Example Response:**
     ```json
@@ -184,6 +215,10 @@ async def get_all_sessions(
     **Use Case:**
         Frontend calls this endpoint on dashboard load to fetch all sessions
         dynamically instead of using hardcoded mock data.
+
+    **Caching:**
+        Responses carry an ETag; requests sending If-None-Match get 304
+        (no database access) until one of the patient's sessions changes.
     """
     if not demo_user:
         raise HTTPException(
@@ -191,10 +226,11 @@ async def get_all_sessions(
             detail="Invalid or missing demo token. Initialize demo first."
         )
 
+    columns = _resolve_session_columns(fields)
     user_id = demo_user["id"]
 
     # Get patient record for this user
-    patient_response = (
+    patient_response = await (
         db.table("patients")
         .select("id")
         .eq("user_id", user_id)
@@ -209,11 +245,12 @@ async def get_all_sessions(
         )
 
     patient_id = patient_response.data["id"]
+    cache_scope(request, patient_id, demo_user.get("demo_expires_at"))
 
     # Fetch all sessions for this patient, ordered by date DESC (newest first)
-    response = (
+    response = await (
         db.table("therapy_sessions")
-        .select("*")
+        .select(columns)
         .eq("patient_id", patient_id)
         .order("session_date", desc=True)
         .execute()
@@ -250,15 +287,20 @@ async def get_all_sessions(
 @router.get("/{session_id}")
 async def get_session(
     session_id: str,
-    db: Client = Depends(get_db)
+    fields: str = "full",
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Get session by ID with breakthrough details
 
+    Args:
+        session_id: Session UUID
+        fields: Column projection - summary, wave1, wave2, or full (default)
+
     Returns:
         Session object with breakthrough data and history
     """
-    session = await get_session_with_breakthrough(session_id)
+    session = await get_session_with_breakthrough(session_id, columns=_resolve_session_columns(fields))
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -266,12 +308,44 @@ async def get_session(
     return session
 
 
+@router.get("/{session_id}/transcript")
+async def get_session_transcript(
+    session_id: str,
+    db: AsyncClient = Depends(get_async_db)
+):
+    """
+    Get only the transcript for a session
+
+    List endpoints omit the transcript by default; clients fetch it here
+    when a session is opened.
+
+    Returns:
+        {"session_id": str, "transcript": [{start, end, speaker, text}, ...]}
+    """
+    response = await (
+        db.table("therapy_sessions")
+        .select("id, transcript")
+        .eq("id", session_id)
+        .limit(1)
+        .execute()
+    )
+
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    return {
+        "session_id": session_id,
+        "transcript": response.data[0].get("transcript") or [],
+    }
+
+
 @router.get("/patient/{patient_id}")
 async def get_patient_sessions(
     patient_id: str,
     limit: int = 50,
     include_breakthroughs: bool = True,
-    db: Client = Depends(get_db)
+    fields: str = DEFAULT_LIST_FIELD_SET,
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Get all sessions for a patient
@@ -280,13 +354,14 @@ async def get_patient_sessions(
         patient_id: Patient UUID
         limit: Maximum number of sessions to return
         include_breakthroughs: Include breakthrough details
+        fields: Column projection - summary (default), wave1, wave2, or full
 
     Returns:
         List of sessions
     """
-    response = (
+    response = await (
         db.table("therapy_sessions")
-        .select("*")
+        .select(_resolve_session_columns(fields))
         .eq("patient_id", patient_id)
         .order("session_date", desc=True)
         .limit(limit)
@@ -336,7 +411,7 @@ async def get_patient_sessions(
 @router.post("/")
 async def create_session(
     session: SessionCreate,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Create a new therapy session
@@ -352,14 +427,28 @@ async def create_session(
         "processing_status": "pending",
     }
 
-    response = db.table("therapy_sessions").insert(session_data).execute()
+    response = await db.table("therapy_sessions").insert(session_data).execute()
 
     if not response.data:
         raise HTTPException(status_code=500, detail="Failed to create session")
 
+    invalidate_rows(response.data)
+    await _record_patient_aggregates(response.data[0])
     return response.data[0]
 
 
+async def _record_patient_aggregates(session: dict, wave1: bool = False):
+    """Fold a new session (or its Wave 1 mood result) into the patient's aggregates; never fails the request"""
+    store = PatientAggregatesStore()
+    try:
+        if wave1:
+            await store.record_wave1(session)
+        else:
+            await store.record_session(session)
+    except Exception as e:
+        logger.error(f"Patient aggregates update failed for session {session.get('id')}: {e}")
+
+
 # ============================================================================
 # Transcript Upload & Processing
 # ============================================================================
@@ -368,27 +457,25 @@ async def create_session(
 async def upload_transcript(
     session_id: str,
     data: TranscriptUpload,
-    background_tasks: BackgroundTasks,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Upload transcript and trigger breakthrough detection
 
     This endpoint:
     1. Stores the transcript in the session
-    2. Triggers breakthrough detection (async if enabled)
+    2. Queues breakthrough detection (if enabled)
     3. Returns immediately with processing status
 
     Args:
         session_id: Session UUID
         data: Transcript data
-        background_tasks: FastAPI background tasks
 
     Returns:
         Session with processing status
     """
     # Verify session exists
-    session_response = (
+    session_response = await (
         db.table("therapy_sessions")
         .select("id, patient_id")
         .eq("id", session_id)
@@ -409,22 +496,19 @@ async def upload_transcript(
     if data.audio_file_url:
         update_data["audio_file_url"] = data.audio_file_url
 
-    db.table("therapy_sessions").update(update_data).eq("id", session_id).execute()
+    updated = await db.table("therapy_sessions").update(update_data).eq("id", session_id).execute()
+    invalidate_rows(updated.data)
 
     # Trigger breakthrough detection
     if settings.breakthrough_auto_analyze:
         logger.info(f"🔍 Triggering breakthrough detection for session {session_id}")
 
-        # Add to background tasks for async processing
-        background_tasks.add_task(
-            analyze_breakthrough_background,
-            session_id,
-            data.transcript
-        )
+        job = await enqueue_analysis(BREAKTHROUGH, session_id, force=True)
 
         return {
             "session_id": session_id,
             "status": "processing",
+            "job_key": job.key,
             "message": "Transcript uploaded. Breakthrough detection in progress.",
         }
     else:
@@ -440,7 +524,7 @@ async def upload_audio_file(
     session_id: str,
     audio_file: UploadFile = File(...),
     background_tasks: BackgroundTasks = None,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Upload audio file to Supabase Storage
@@ -474,21 +558,22 @@ async def upload_audio_file(
         file_content = await audio_file.read()
 
         # Upload to Supabase Storage
-        storage_response = db.storage.from_("audio-sessions").upload(
+        storage_response = await db.storage.from_("audio-sessions").upload(
             path=storage_path,
             file=file_content,
             file_options={"content-type": audio_file.content_type}
         )
 
         # Get public URL
-        audio_url = db.storage.from_("audio-sessions").get_public_url(storage_path)
+        audio_url = await db.storage.from_("audio-sessions").get_public_url(storage_path)
 
         # Update session
-        db.table("therapy_sessions").update({
+        updated = await db.table("therapy_sessions").update({
             "audio_file_url": audio_url,
             "processing_status": "processing",
             "updated_at": "now()",
         }).eq("id", session_id).execute()
+        invalidate_rows(updated.data)
 
         logger.info(f"✓ Audio uploaded for session {session_id}")
 
@@ -512,7 +597,7 @@ async def upload_audio_file(
 async def analyze_breakthrough(
     session_id: str,
     force: bool = False,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Manually trigger breakthrough detection for a session
@@ -525,7 +610,7 @@ async def analyze_breakthrough(
         Breakthrough analysis results
     """
     # Get session
-    session_response = (
+    session_response = await (
         db.table("therapy_sessions")
         .select("*")
         .eq("id", session_id)
@@ -558,7 +643,7 @@ async def analyze_breakthrough(
         logger.info(f"🔍 Analyzing breakthrough for session {session_id}")
 
         detector = BreakthroughDetector()
-        analysis = detector.analyze_session(
+        analysis = await detector.analyze_session(
             transcript=transcript,
             session_metadata={"session_id": session_id}
         )
@@ -625,7 +710,7 @@ async def analyze_breakthrough(
 #     patient_id: str,
 #     min_confidence: Optional[float] = None,
 #     breakthrough_type: Optional[str] = None,
-#     db: Client = Depends(get_db)
+#     db: AsyncClient = Depends(get_async_db)
 # ):
 #     """
 #     Get all breakthroughs for a patient across all sessions
@@ -664,13 +749,14 @@ async def analyze_breakthrough(
 async def get_patient_consistency(
     patient_id: str,
     days: int = 90,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Calculate patient session consistency metrics
 
     Analyzes session attendance patterns to measure consistency.
     Assumes weekly sessions (every 7 days) as the "regular" pattern.
+    Served from the patient's materialized aggregates (one row read).
 
     Args:
         patient_id: Patient UUID
@@ -686,134 +772,62 @@ async def get_patient_consistency(
             "weekly_data": chart data for visualization,
             "total_sessions": count of sessions in period,
             "period_start": ISO date,
-            "period_end": ISO date
+            "period_end": ISO date,
+            "all_time": all-time regularity, streaks and weekly attendance bitmap
         }
     """
-    from datetime import datetime, timedelta
+    aggregates = await PatientAggregatesStore(db).get(patient_id)
+    return aggregates.consistency(days)
 
-    # Calculate date range
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
 
-    # Fetch sessions in the period
-    response = (
-        db.table("therapy_sessions")
-        .select("id, session_date")
-        .eq("patient_id", patient_id)
-        .gte("session_date", start_date.isoformat())
-        .lte("session_date", end_date.isoformat())
-        .order("session_date", desc=False)
-        .execute()
-    )
+# Rows per therapist progress overview page (at most PostgREST's default max-rows)
+OVERVIEW_PAGE_SIZE = 1000
 
-    sessions = response.data
 
-    if not sessions:
-        return {
-            "consistency_score": 0,
-            "attendance_rate": 0,
-            "average_gap_days": 0,
-            "longest_streak_weeks": 0,
-            "missed_weeks": 0,
-            "weekly_data": [],
-            "total_sessions": 0,
-            "period_start": start_date.isoformat(),
-            "period_end": end_date.isoformat(),
-        }
-
-    # Parse session dates
-    session_dates = [datetime.fromisoformat(s["session_date"].replace("Z", "+00:00")) for s in sessions]
-
-    # Calculate gaps between sessions
-    gaps = []
-    for i in range(1, len(session_dates)):
-        gap_days = (session_dates[i] - session_dates[i-1]).days
-        gaps.append(gap_days)
-
-    average_gap = sum(gaps) / len(gaps) if gaps else 0
-
-    # Calculate expected weekly sessions
-    weeks_in_period = days / 7
-    expected_sessions = int(weeks_in_period)
-    actual_sessions = len(sessions)
-    attendance_rate = min(100, (actual_sessions / expected_sessions * 100)) if expected_sessions > 0 else 0
+@router.get("/therapist/{therapist_id}/progress-overview")
+async def get_therapist_progress_overview(
+    therapist_id: str,
+    days: int = 90,
+    db: AsyncClient = Depends(get_async_db)
+):
+    """
+    Consistency scores and mood trends for every patient of a therapist
 
-    # Calculate weekly attendance for chart (group sessions by week)
-    weekly_data = []
-    current_week_start = start_date
-    week_num = 1
+    Computed for all patients at once by the vectorized progress analytics
+    (no per-patient loops). Sessions are read in pages of
+    OVERVIEW_PAGE_SIZE until exhausted: PostgREST caps a response at its
+    max-rows (1000 by default), which would drop the most recent sessions.
 
-    while current_week_start < end_date:
-        week_end = current_week_start + timedelta(days=7)
+    Args:
+        therapist_id: Therapist UUID
+        days: Consistency window in days (default: 90)
 
-        # Count sessions in this week
-        sessions_in_week = sum(
-            1 for date in session_dates
-            if current_week_start <= date < week_end
+    Returns:
+        {
+            "patients": [{patient_id, consistency: {...}, mood_trend: {...}}],
+            "patient_count": number of patients with sessions,
+            "days": window used
+        }
+    """
+    rows = []
+    while True:
+        # id breaks session_date ties so pages neither skip nor repeat rows
+        response = await (
+            db.table("therapy_sessions")
+            .select("patient_id, session_date, mood_score")
+            .eq("therapist_id", therapist_id)
+            .order("session_date", desc=False)
+            .order("id", desc=False)
+            .range(len(rows), len(rows) + OVERVIEW_PAGE_SIZE - 1)
+            .execute()
         )
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < OVERVIEW_PAGE_SIZE:
+            break
 
-        weekly_data.append({
-            "week": f"W{week_num}",
-            "attended": 1 if sessions_in_week > 0 else 0,
-            "session_count": sessions_in_week,
-            "week_start": current_week_start.strftime("%Y-%m-%d"),
-        })
-
-        current_week_start = week_end
-        week_num += 1
-
-    # Calculate longest streak (consecutive weeks with sessions)
-    current_streak = 0
-    longest_streak = 0
-
-    for week in weekly_data:
-        if week["attended"] == 1:
-            current_streak += 1
-            longest_streak = max(longest_streak, current_streak)
-        else:
-            current_streak = 0
-
-    # Count missed weeks
-    missed_weeks = sum(1 for week in weekly_data if week["attended"] == 0)
-
-    # Calculate regularity score (how close gaps are to 7 days)
-    # Tolerance: ±3 days from ideal 7-day interval
-    regularity_scores = []
-    for gap in gaps:
-        deviation = abs(gap - 7)
-        if deviation <= 3:
-            regularity_scores.append(100)  # Perfect
-        elif deviation <= 7:
-            regularity_scores.append(70)   # Good
-        elif deviation <= 14:
-            regularity_scores.append(40)   # Fair
-        else:
-            regularity_scores.append(10)   # Poor
-
-    regularity_score = sum(regularity_scores) / len(regularity_scores) if regularity_scores else 0
-
-    # Calculate overall consistency score (weighted combination)
-    # 40% attendance rate, 40% regularity, 20% streak bonus
-    streak_bonus = min(20, (longest_streak / weeks_in_period) * 20) if weeks_in_period > 0 else 0
-    consistency_score = (
-        (attendance_rate * 0.4) +
-        (regularity_score * 0.4) +
-        streak_bonus
-    )
-    consistency_score = round(min(100, consistency_score), 1)
-
-    return {
-        "consistency_score": consistency_score,
-        "attendance_rate": round(attendance_rate, 1),
-        "average_gap_days": round(average_gap, 1),
-        "longest_streak_weeks": longest_streak,
-        "missed_weeks": missed_weeks,
-        "weekly_data": weekly_data,
-        "total_sessions": actual_sessions,
-        "expected_sessions": expected_sessions,
-        "period_start": start_date.isoformat(),
-        "period_end": end_date.isoformat(),
-    }
+    patients = progress_overview(rows, days=days)
+    return {"patients": patients, "patient_count": len(patients), "days": days}
 
 
 # ============================================================================
@@ -825,7 +839,7 @@ async def analyze_mood(
     session_id: str,
     force: bool = False,
     patient_speaker_id: str = "SPEAKER_01",
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Analyze patient mood from session transcript using AI
@@ -845,7 +859,7 @@ async def analyze_mood(
         MoodAnalysisResponse with mood score and analysis details
     """
     # Get session
-    session_response = (
+    session_response = await (
         db.table("therapy_sessions")
         .select("*")
         .eq("id", session_id)
@@ -881,22 +895,27 @@ async def analyze_mood(
         logger.info(f"🎭 Analyzing mood for session {session_id}")
 
         analyzer = MoodAnalyzer()
-        analysis = analyzer.analyze_session_mood(
+        analysis = await analyzer.analyze_session_mood(
             session_id=session_id,
             segments=transcript,
             patient_speaker_id=patient_speaker_id
         )
 
         # Update session with mood data
-        db.table("therapy_sessions").update({
+        mood_updates = {
             "mood_score": analysis.mood_score,
             "mood_confidence": analysis.confidence,
             "mood_rationale": analysis.rationale,
             "mood_indicators": analysis.key_indicators,
             "emotional_tone": analysis.emotional_tone,
             "mood_analyzed_at": datetime.now().isoformat(),
+        }
+        updated = await db.table("therapy_sessions").update({
+            **mood_updates,
             "updated_at": "now()",
         }).eq("id", session_id).execute()
+        invalidate_rows(updated.data)
+        await _record_patient_aggregates({**session, **mood_updates}, wave1=True)
 
         logger.info(f"✓ Mood analysis complete for session {session_id}: {analysis.mood_score}/10.0")
 
@@ -922,7 +941,7 @@ async def analyze_mood(
 async def get_patient_mood_history(
     patient_id: str,
     limit: int = 50,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Get mood history for a patient across all sessions
@@ -936,7 +955,7 @@ async def get_patient_mood_history(
     Returns:
         List of sessions with mood data sorted by date
     """
-    response = (
+    response = await (
         db.table("therapy_sessions")
         .select("id, session_date, mood_score, mood_confidence, emotional_tone")
         .eq("patient_id", patient_id)
@@ -957,7 +976,7 @@ async def get_patient_mood_history(
 async def label_session_speakers(
     session_id: str,
     override_model: Optional[str] = None,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ) -> SpeakerLabelingResponse:
     """
     Label session transcript with speaker labels and format for patient-facing view.
@@ -985,7 +1004,7 @@ async def label_session_speakers(
     """
     try:
         # Step 1: Get session from database
-        session_response = (
+        session_response = await (
             db.table("therapy_sessions")
             .select("id, transcript")
             .eq("id", session_id)
@@ -1005,8 +1024,10 @@ async def label_session_speakers(
                 detail="Session has no transcript to label"
             )
 
-        # Step 2: Call speaker labeling service
-        result: SpeakerLabelingResult = label_session_transcript(
+        # Step 2: Call speaker labeling service (sync generator: the request,
+        # rate-budget wait and 429 back-off all block, so use a worker thread)
+        result: SpeakerLabelingResult = await asyncio.to_thread(
+            label_session_transcript,
             session_id=session_id,
             raw_segments=session["transcript"],
             openai_api_key=settings.OPENAI_API_KEY,
@@ -1035,65 +1056,6 @@ async def label_session_speakers(
         )
 
 
-# ============================================================================
-# Background Task Functions
-# ============================================================================
-
-async def analyze_breakthrough_background(session_id: str, transcript: list):
-    """
-    Background task for breakthrough detection
-    Runs asynchronously without blocking the API response
-    """
-    try:
-        logger.info(f"📊 Background: Starting breakthrough detection for {session_id}")
-
-        detector = BreakthroughDetector()
-        analysis = detector.analyze_session(
-            transcript=transcript,
-            session_metadata={"session_id": session_id}
-        )
-
-        # Prepare data
-        primary_breakthrough = None
-        all_breakthroughs = []
-
-        if analysis.primary_breakthrough:
-            bt = analysis.primary_breakthrough
-            primary_breakthrough = {
-                "type": bt.breakthrough_type,
-                "description": bt.description,
-                "evidence": bt.evidence,
-                "confidence": float(bt.confidence_score),
-                "timestamp_start": float(bt.timestamp_start),
-                "timestamp_end": float(bt.timestamp_end),
-            }
-
-        for bt in analysis.breakthrough_candidates:
-            all_breakthroughs.append({
-                "type": bt.breakthrough_type,
-                "description": bt.description,
-                "evidence": bt.evidence,
-                "confidence": float(bt.confidence_score),
-                "timestamp_start": float(bt.timestamp_start),
-                "timestamp_end": float(bt.timestamp_end),
-                "dialogue_excerpt": bt.speaker_sequence,
-            })
-
-        # Store results
-        await store_breakthrough_analysis(
-            session_id=session_id,
-            has_breakthrough=analysis.has_breakthrough,
-            primary_breakthrough=primary_breakthrough,
-            all_breakthroughs=all_breakthroughs
-        )
-
-        logger.info(f"✓ Background: Breakthrough detection complete for {session_id}")
-
-    except Exception as e:
-        logger.error(f"Background breakthrough detection failed: {e}")
-        # Don't raise - just log the error
-
-
 # ============================================================================
 # Topic Extraction Endpoints
 # ============================================================================
@@ -1102,7 +1064,7 @@ async def analyze_breakthrough_background(session_id: str, transcript: list):
 async def extract_topics(
     session_id: str,
     force: bool = False,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Extract topics, action items, technique, and summary from session transcript using AI
@@ -1121,7 +1083,7 @@ async def extract_topics(
         TopicExtractionResponse with topics, action items, technique, and summary
     """
     # Get session
-    session_response = (
+    session_response = await (
         db.table("therapy_sessions")
         .select("*")
         .eq("id", session_id)
@@ -1157,13 +1119,13 @@ async def extract_topics(
         logger.info(f"📝 Extracting topics for session {session_id}")
 
         extractor = TopicExtractor()
-        metadata = extractor.extract_metadata(
+        metadata = await extractor.extract_metadata(
             session_id=session_id,
             segments=transcript
         )
 
         # Update session with extracted metadata
-        db.table("therapy_sessions").update({
+        updated = await db.table("therapy_sessions").update({
             "topics": metadata.topics,
             "action_items": metadata.action_items,
             "technique": metadata.technique,
@@ -1173,6 +1135,7 @@ async def extract_topics(
             "topics_extracted_at": datetime.now().isoformat(),
             "updated_at": "now()",
         }).eq("id", session_id).execute()
+        invalidate_rows(updated.data)
 
         logger.info(f"✓ Topic extraction complete for session {session_id}: {len(metadata.topics)} topics")
 
@@ -1202,24 +1165,25 @@ async def extract_topics(
 async def analyze_full_pipeline(
     session_id: str,
     force: bool = False,
-    background_tasks: BackgroundTasks = None,
-    db: Client = Depends(get_db)
+    wait: bool = False,
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Run complete analysis pipeline: Wave 1 (mood, topics, breakthrough) → Wave 2 (deep analysis)
 
     This endpoint orchestrates the entire analysis process with proper dependency management.
+    By default the pipeline is queued as a job for the job workers.
 
     Args:
         session_id: Session UUID
         force: Force re-analysis even if already completed
-        background_tasks: FastAPI background tasks for async processing
+        wait: Run the pipeline inside this request instead of queueing it
 
     Returns:
-        PipelineStatusResponse with current status
+        Job key and status if queued, otherwise PipelineStatusResponse
     """
     # Verify session exists
-    session_response = (
+    session_response = await (
         db.table("therapy_sessions")
         .select("id, transcript")
         .eq("id", session_id)
@@ -1236,18 +1200,15 @@ async def analyze_full_pipeline(
     if not session.get("transcript"):
         raise HTTPException(status_code=400, detail="Session has no transcript to analyze")
 
-    # Add to background tasks for async processing
-    if background_tasks:
-        background_tasks.add_task(
-            run_full_pipeline_background,
-            session_id,
-            force
-        )
+    if not wait:
+        job = await enqueue_analysis(FULL_PIPELINE, session_id, force)
 
         return {
             "session_id": session_id,
             "status": "processing",
-            "message": "Full analysis pipeline started. Check status with GET /api/sessions/{id}/analysis-status",
+            "job_key": job.key,
+            "job_status": job.status,
+            "message": "Full analysis pipeline queued. Check status with GET /api/sessions/{id}/analysis-status",
         }
     else:
         # Run synchronously (blocking)
@@ -1264,7 +1225,8 @@ async def analyze_full_pipeline(
                 wave1_complete=status.wave1_complete,
                 deep_complete=status.deep_complete,
                 wave1_completed_at=status.wave1_completed_at,
-                deep_analyzed_at=status.deep_analyzed_at
+                deep_analyzed_at=status.deep_analyzed_at,
+                timings=status.timings
             )
 
         except Exception as e:
@@ -1275,10 +1237,76 @@ async def analyze_full_pipeline(
             )
 
 
+@router.post("/wave1/batch")
+async def run_wave1_batch(
+    request: Wave1BatchRequest,
+    db: AsyncClient = Depends(get_async_db)
+):
+    """
+    Run Wave 1 (mood, topics, breakthrough, action summary) for many sessions
+
+    Streaming runs share a bounded pool of LLM calls in this request. Otherwise
+    one Wave 1 job is queued per session, so job workers spread the batch.
+
+    Args:
+        request: Session IDs, force flag, and whether to stream progress
+
+    Returns:
+        NDJSON stream of progress events if request.stream, otherwise the
+        queued job keys (progress is published to the pipeline SSE stream)
+    """
+    if not request.session_ids:
+        raise HTTPException(status_code=400, detail="session_ids must not be empty")
+
+    runner = Wave1BatchRunner(db=db)
+
+    if request.stream:
+        async def progress_lines():
+            async for event in runner.stream(request.session_ids, force=request.force):
+                yield json.dumps(event.to_dict()) + "\n"
+
+        return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
+    jobs = [
+        await enqueue_analysis(WAVE1, session_id, request.force)
+        for session_id in dict.fromkeys(request.session_ids)
+    ]
+    return {
+        "status": "processing",
+        "session_count": len(jobs),
+        "job_keys": [job.key for job in jobs],
+        "message": "Wave 1 batch queued. Progress is published to /api/sse/events/{patient_id}",
+    }
+
+
+@router.get("/jobs/{job_key}")
+async def get_job_status(job_key: str):
+    """
+    Get a queued analysis job ("<session_id>:<wave>", as returned when it was queued)
+
+    Returns:
+        Job status, attempts, last error and result
+    """
+    job = await asyncio.to_thread(get_job_queue().get, job_key)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {
+        "job_key": job.key,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "error": job.error,
+        "result": job.result,
+        "updated_at": datetime.fromtimestamp(job.updated_at).isoformat(),
+    }
+
+
 @router.get("/{session_id}/analysis-status")
 async def get_analysis_status(
     session_id: str,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Get current status of analysis pipeline for a session
@@ -1292,7 +1320,7 @@ async def get_analysis_status(
         Detailed pipeline status with recent logs
     """
     try:
-        response = db.rpc("get_analysis_pipeline_status", {"p_session_id": session_id}).execute()
+        response = await db.rpc("get_analysis_pipeline_status", {"p_session_id": session_id}).execute()
 
         if not response.data or len(response.data) == 0:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -1311,7 +1339,7 @@ async def get_analysis_status(
 async def analyze_deep(
     session_id: str,
     force: bool = False,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Run deep clinical analysis for a session (Wave 2 only)
@@ -1332,7 +1360,7 @@ async def analyze_deep(
         DeepAnalysisResponse with comprehensive clinical insights
     """
     # Get session
-    session_response = (
+    session_response = await (
         db.table("therapy_sessions")
         .select("*")
         .eq("id", session_id)
@@ -1356,7 +1384,7 @@ async def analyze_deep(
         }
 
     # Verify Wave 1 is complete
-    orchestrator = AnalysisOrchestrator(db=db)
+    orchestrator = AnalysisOrchestrator()
     wave1_complete = await orchestrator._is_wave1_complete(session_id)
 
     if not wave1_complete:
@@ -1371,14 +1399,21 @@ async def analyze_deep(
 
         await orchestrator._analyze_deep(session_id, force)
 
+        try:
+            await orchestrator._generate_prose(session_id, force)
+        except Exception as e:
+            # Deep analysis is what this endpoint returns; prose is non-critical
+            logger.error(f"Prose auto-generation failed for session {session_id}: {e}")
+
         # Get updated session
-        updated_session = (
+        updated_response = await (
             db.table("therapy_sessions")
             .select("deep_analysis, analysis_confidence, deep_analyzed_at")
             .eq("id", session_id)
             .single()
             .execute()
-        ).data
+        )
+        updated_session = updated_response.data
 
         logger.info(f"✓ Deep analysis complete for session {session_id}")
 
@@ -1400,7 +1435,7 @@ async def analyze_deep(
 @router.post("/{session_id}/generate-prose-analysis", response_model=ProseAnalysisResponse)
 async def generate_prose_analysis(
     session_id: str,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Generate patient-facing prose narrative from existing deep analysis.
@@ -1415,7 +1450,7 @@ async def generate_prose_analysis(
     """
     try:
         # Fetch session
-        session_response = db.table("therapy_sessions").select("*").eq("id", session_id).single().execute()
+        session_response = await db.table("therapy_sessions").select("*").eq("id", session_id).single().execute()
         session = session_response.data
 
         if not session:
@@ -1441,10 +1476,11 @@ async def generate_prose_analysis(
         )
 
         # Update database
-        db.table("therapy_sessions").update({
+        updated = await db.table("therapy_sessions").update({
             "prose_analysis": prose.prose_text,
             "prose_generated_at": prose.generated_at.isoformat()
         }).eq("id", session_id).execute()
+        invalidate_rows(updated.data)
 
         logger.info(f"✓ Prose analysis saved for session {session_id}")
 
@@ -1464,27 +1500,6 @@ async def generate_prose_analysis(
         raise HTTPException(status_code=500, detail=f"Prose generation failed: {str(e)}")
 
 
-# ============================================================================
-# Background Task Functions
-# ============================================================================
-
-async def run_full_pipeline_background(session_id: str, force: bool = False):
-    """
-    Background task for full analysis pipeline
-    Runs asynchronously without blocking the API response
-    """
-    try:
-        logger.info(f"📊 Background: Starting full analysis pipeline for {session_id}")
-
-        await analyze_session_full_pipeline(session_id, force)
-
-        logger.info(f"✓ Background: Full pipeline complete for {session_id}")
-
-    except Exception as e:
-        logger.error(f"Background pipeline failed for {session_id}: {e}")
-        # Don't raise - just log the error
-
-
 # ============================================================================
 # Technique Library Endpoints
 # ============================================================================
@@ -1536,7 +1551,7 @@ async def get_technique_definition(technique_name: str):
 async def get_patient_progress_metrics(
     patient_id: str,
     limit: int = 50,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Get progress metrics for visualization in ProgressPatternsCard.
@@ -1585,53 +1600,14 @@ async def get_patient_progress_metrics(
 
     **Notes:**
     - Only sessions with completed Wave 1 (mood_score present) are included
+    - Served from the patient's materialized aggregates (one row read)
     - Chart data is formatted for direct use with Recharts components
     - Insights are AI-generated based on trend analysis
     """
-    # Get sessions with Wave 1 mood analysis complete
-    sessions_response = (
-        db.table("therapy_sessions")
-        .select("*")
-        .eq("patient_id", patient_id)
-        .not_.is_("mood_score", "null")  # Only sessions with mood analysis
-        .order("session_date", desc=False)  # Chronological order
-        .limit(limit)
-        .execute()
-    )
-
-    if not sessions_response.data:
-        # Return empty metrics if no sessions found
-        return ProgressMetricsResponse(
-            metrics=[],
-            extracted_at=datetime.now().isoformat() + "Z",
-            session_count=0,
-            date_range="No sessions"
-        )
-
-    # Transform database sessions to pipeline-like structure
-    pipeline_data = {
-        "sessions": []
-    }
+    aggregates = await PatientAggregatesStore(db).get(patient_id)
 
-    for idx, session in enumerate(sessions_response.data, start=1):
-        pipeline_data["sessions"].append({
-            "session_num": idx,
-            "session_id": session["id"],
-            "wave1": {
-                "session_num": idx,
-                "mood_score": session.get("mood_score"),
-                "mood_confidence": session.get("mood_confidence", 0.8),
-                "analyzed_at": session.get("mood_analyzed_at") or session.get("created_at"),
-            },
-            "wave2": {
-                "deep_analysis": session.get("deep_analysis"),
-                "analyzed_at": session.get("deep_analyzed_at"),
-            } if session.get("deep_analysis") else None,
-        })
-
-    # Extract metrics using the service
     try:
-        metrics = ProgressMetricsExtractor.extract_from_pipeline_json(pipeline_data)
+        metrics = aggregates.progress_metrics_for(limit)
         logger.info(f"✓ Extracted {len(metrics.metrics)} progress metrics for patient {patient_id}")
         return metrics
 
@@ -1653,8 +1629,7 @@ async def get_patient_progress_metrics(
 async def upload_demo_transcript(
     request: Request,
     session_file: str,  # e.g., "session_12_thriving.json"
-    background_tasks: BackgroundTasks,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_async_db)
 ):
     """
     Upload a pre-selected demo transcript from mock-therapy-data/
@@ -1713,11 +1688,11 @@ async def upload_demo_transcript(
         )
 
     # Get therapist ID (find demo therapist with same demo_token)
-    therapist_response = db.table("users").select("id").eq("demo_token", demo_user["demo_token"]).eq("role", "therapist").single().execute()
+    therapist_response = await db.table("users").select("id").eq("demo_token", demo_user["demo_token"]).eq("role", "therapist").single().execute()
     therapist_id = therapist_response.data["id"]
 
     # Calculate session date (after last existing session)
-    last_session_response = db.table("therapy_sessions").select("session_date").eq("patient_id", patient_id).order("session_date", desc=True).limit(1).execute()
+    last_session_response = await db.table("therapy_sessions").select("session_date").eq("patient_id", patient_id).order("session_date", desc=True).limit(1).execute()
 
     if last_session_response.data:
         last_date = datetime.fromisoformat(last_session_response.data[0]["session_date"].replace("Z", "+00:00"))
@@ -1735,22 +1710,25 @@ async def upload_demo_transcript(
         "transcript": segments,
     }
 
-    session_response = db.table("therapy_sessions").insert(session_data).execute()
+    session_response = await db.table("therapy_sessions").insert(session_data).execute()
 
     if not session_response.data:
         raise HTTPException(status_code=500, detail="Failed to create session")
 
     session = session_response.data[0]
     session_id = session["id"]
+    invalidate_rows(session_response.data)
+    await _record_patient_aggregates(session)
 
-    # Trigger full AI analysis in background
-    background_tasks.add_task(analyze_session_full_pipeline, session_id)
+    # Queue full AI analysis for the job workers
+    job = await enqueue_analysis(FULL_PIPELINE, session_id)
 
     logger.info(f"✓ Demo transcript uploaded: {session_file} → Session {session_id}")
 
     return {
         "session_id": session_id,
         "status": "processing",
+        "job_key": job.key,
         "message": f"Demo session created from {session_file}. AI analysis in progress.",
         "transcript_segments": len(segments)
     }
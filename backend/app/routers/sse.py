@@ -2,33 +2,91 @@
 Server-Sent Events Router
 Real-time pipeline event streaming
 Updated: 2026-01-03 - Database-backed event queue for cross-process SSE
+Updated: Push delivery through the event bus (no per-client polling)
 """
 
 from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
-from app.utils.pipeline_logger import PipelineLogger
-from app.database import get_supabase
+from app.config import settings
+from app.database import get_async_supabase
+from app.utils.event_bus import get_event_bus, to_sse_event
+from datetime import datetime
+from typing import Optional
 import asyncio
 import json
 
 router = APIRouter(prefix="/api/sse", tags=["sse"])
 
+
+async def _fetch_unconsumed_events(patient_id: str) -> list:
+    """One-time backlog fetch of events persisted before the client subscribed"""
+    try:
+        db = await get_async_supabase()
+        response = await (
+            db.table("pipeline_events")
+            .select("*")
+            .eq("patient_id", patient_id)
+            .eq("consumed", False)
+            .order("created_at", desc=False)
+            .execute()
+        )
+        return response.data or []
+    except Exception as e:
+        print(f"[SSE] Error fetching backlog: {str(e)}", flush=True)
+        return []
+
+
+def _parse_created_at(event: dict) -> Optional[datetime]:
+    value = event.get("created_at")
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
 async def event_generator(patient_id: str, request: Request):
     """
-    SSE event generator - streams pipeline events from database
+    SSE event generator - streams pipeline events pushed by the event bus
 
     Yields events in SSE format:
     data: {"event": "wave1_complete", "session_id": "...", ...}
 
-    Updated: Reads from pipeline_events table to support cross-process communication
+    On connect the unconsumed backlog is replayed once from pipeline_events;
+    after that the generator awaits its subscriber queue, so an idle client
+    issues no database queries. Delivered events are acknowledged in batches.
     """
-    last_event_id = None
+    bus = get_event_bus()
+    # Subscribe before replaying so nothing published in between is lost
+    queue = bus.subscribe(patient_id)
+    # Replayed backlog rows may also arrive on the queue. Ids are UUIDs, so
+    # dedupe against the replayed ids only up to the backlog's high-water
+    # created_at; once a live event passes it, no more duplicates can come
+    # and the set is dropped (nothing is remembered per live event).
+    replayed_ids = set()
+    high_water = None
+
+    def send(event: dict) -> str:
+        event_id = event.get("id")
+        if event_id is not None:
+            bus.acknowledge(event_id)
+        print(f"[SSE] Sent event to patient {patient_id}: {event['phase']} {event['event']}", flush=True)
+        return f"data: {json.dumps(to_sse_event(event))}\n\n"
 
     try:
         # Send initial connection event
         yield f"data: {json.dumps({'event': 'connected', 'patient_id': patient_id})}\n\n"
         print(f"[SSE] ✓ Connection confirmed by server", flush=True)
 
+        for event in await _fetch_unconsumed_events(patient_id):
+            if event.get("id") is not None:
+                replayed_ids.add(event["id"])
+            created_at = _parse_created_at(event)
+            if created_at is not None and (high_water is None or created_at > high_water):
+                high_water = created_at
+            yield send(event)
+
         while True:
             # Check if client disconnected
             if await request.is_disconnected():
@@ -36,59 +94,24 @@ async def event_generator(patient_id: str, request: Request):
                 break
 
             try:
-                db = get_supabase()
-
-                # Query unconsumed events for this patient
-                query = (
-                    db.table("pipeline_events")
-                    .select("*")
-                    .eq("patient_id", patient_id)
-                    .eq("consumed", False)
-                    .order("created_at", desc=False)
-                )
-
-                # If we've seen events before, only get newer ones
-                if last_event_id:
-                    query = query.gt("created_at", last_event_id)
-
-                response = query.execute()
-                events = response.data or []
-
-                # Send new events
-                for event in events:
-                    event_data = {
-                        "patient_id": event["patient_id"],
-                        "session_id": event.get("session_id"),
-                        "session_date": event.get("session_date"),
-                        "phase": event["phase"],
-                        "event": event["event"],
-                        "status": event["status"],
-                        "message": event.get("message", ""),
-                        "metadata": event.get("metadata", {})
-                    }
-
-                    yield f"data: {json.dumps(event_data)}\n\n"
-
-                    # Mark event as consumed
-                    db.table("pipeline_events").update({
-                        "consumed": True
-                    }).eq("id", event["id"]).execute()
-
-                    # Update last seen event timestamp
-                    last_event_id = event["created_at"]
-
-                    print(f"[SSE] Sent event to patient {patient_id}: {event['phase']} {event['event']}", flush=True)
-
-                # Keep-alive ping every iteration
+                event = await asyncio.wait_for(queue.get(), timeout=settings.sse_keepalive_seconds)
+            except asyncio.TimeoutError:
+                # Keep-alive ping while idle
                 yield f": keepalive\n\n"
+                continue
 
-            except Exception as e:
-                print(f"[SSE] Error querying events: {str(e)}", flush=True)
-                # Continue polling despite errors
+            if replayed_ids:
+                if event.get("id") in replayed_ids:
+                    replayed_ids.discard(event["id"])
+                    continue  # Already replayed from the backlog
+                created_at = _parse_created_at(event)
+                if created_at is not None and high_water is not None and created_at > high_water:
+                    replayed_ids.clear()
 
-            await asyncio.sleep(0.5)  # 500ms interval
+            yield send(event)
 
     finally:
+        bus.unsubscribe(patient_id, queue)
         print(f"[SSE] Connection closed for patient {patient_id}", flush=True)
 
 
@@ -89,8 +89,7 @@ class ActionItemsSummarizer(AsyncAIGenerator):
             # Note: gpt-5-nano works with NO parameters (like mood_analyzer)
             # Adding temperature or max_completion_tokens causes empty responses
             start_time = time.time()
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            response = await self._create_chat_completion_async(
                 messages=[
                     {"role": "system", "content": self._get_system_prompt()},
                     {"role": "user", "content": prompt}
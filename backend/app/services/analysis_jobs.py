@@ -0,0 +1,201 @@
+"""
+Analysis Jobs - Queue-backed session analysis
+
+Job kinds and handlers for the analysis work the API used to launch with
+BackgroundTasks. Each job is keyed by (session, wave), so repeated requests
+for a session that is already queued or running do not duplicate work.
+
+Handlers are resumable: every analysis step records a completion column
+(mood_analyzed_at, deep_analyzed_at, ...) and skips itself when it is set,
+so a redelivered job picks up after the last step that finished. A forced
+re-run clears those columns once, on its first delivery, and checkpoints
+that it did so; later deliveries of the same job do not clear them again.
+
+The aggregates check job rebuilds a patient's materialized aggregates from
+their sessions and rewrites the stored row if it drifted (see
+patient_aggregates); it is keyed by patient. The aggregates sweep job
+queues a check for every patient. Workers run ANALYSIS_SCHEDULES, which
+queue one sweep per AGGREGATES_CHECK_INTERVAL_HOURS: the sweep is keyed by
+interval, so however many workers (or restarts) there are, each interval
+is swept once.
+
+Usage:
+    job = await enqueue_analysis(FULL_PIPELINE, session_id, force=True)
+    job = await enqueue_aggregates_check(patient_id)
+
+    worker = JobWorker(ANALYSIS_HANDLERS, schedules=ANALYSIS_SCHEDULES)
+    await worker.run()
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from app.config import settings
+from app.database import get_async_supabase
+from app.middleware.response_cache import invalidate_rows
+from app.services.analysis_orchestrator import AnalysisOrchestrator
+from app.services.job_queue import Job, get_job_queue, job_key
+from app.services.job_worker import JobContext
+from app.services.llm_rate_limiter import Priority, llm_priority
+from app.services.patient_aggregates import PatientAggregatesStore
+from app.services.wave1_batch_runner import WAVE1_TASKS, Wave1BatchRunner
+
+logger = logging.getLogger(__name__)
+
+# Job kinds (also the wave part of each job key)
+FULL_PIPELINE = "full_pipeline"
+BREAKTHROUGH = "breakthrough"
+WAVE1 = "wave1"
+AGGREGATES_CHECK = "aggregates_check"
+AGGREGATES_SWEEP = "aggregates_sweep"
+
+# How often workers look whether this interval's aggregates sweep is queued yet
+AGGREGATES_SWEEP_POLL_SECONDS = 3600.0
+
+# Completion columns cleared before a forced run of each kind
+_PIPELINE_MARKERS = (
+    "mood_analyzed_at",
+    "topics_extracted_at",
+    "breakthrough_analyzed_at",
+    "action_items_summary",
+    "deep_analyzed_at",
+    "prose_generated_at",
+)
+_WAVE1_MARKERS = (*WAVE1_TASKS.values(), "action_items_summary")
+
+
+async def enqueue_analysis(kind: str, session_id: str, force: bool = False) -> Job:
+    """
+    Queue an analysis job for a session.
+
+    Returns the existing job instead if one for the same session and kind is
+    already queued or running.
+    """
+    job, created = await asyncio.to_thread(
+        get_job_queue().enqueue, kind, job_key(session_id, kind), {"session_id": session_id, "force": force}
+    )
+    if created:
+        logger.info(f"📥 Queued {kind} job for session {session_id}")
+    else:
+        logger.info(f"↩️ {kind} job for session {session_id} already {job.status}, not queued again")
+    return job
+
+
+async def enqueue_aggregates_check(patient_id: str) -> Job:
+    """Queue a consistency check of a patient's aggregates (deduplicated per patient)."""
+    job, created = await asyncio.to_thread(
+        get_job_queue().enqueue, AGGREGATES_CHECK, job_key(patient_id, AGGREGATES_CHECK), {"patient_id": patient_id}
+    )
+    if created:
+        logger.info(f"📥 Queued aggregates check for patient {patient_id}")
+    return job
+
+
+async def schedule_aggregates_sweep(now: Optional[float] = None) -> Optional[Job]:
+    """
+    Queue this interval's aggregates sweep unless it was queued already.
+
+    Returns:
+        The new sweep job, or None if this interval's sweep exists or checks are disabled
+    """
+    interval = settings.aggregates_check_interval_hours * 3600
+    if interval <= 0:
+        return None
+
+    key = job_key(f"interval-{int((now or time.time()) // interval)}", AGGREGATES_SWEEP)
+    queue = get_job_queue()
+    if await asyncio.to_thread(queue.get, key) is not None:
+        return None
+    job, created = await asyncio.to_thread(queue.enqueue, AGGREGATES_SWEEP, key)
+    if created:
+        logger.info(f"📥 Queued aggregates sweep {key}")
+    return job if created else None
+
+
+async def _reset_for_forced_run(ctx: JobContext, markers: Sequence[str]) -> None:
+    """On the first delivery of a forced job, clear the completion columns so every step re-runs."""
+    if not ctx.payload.get("force") or ctx.state.get("reset"):
+        return
+    db = await get_async_supabase()
+    response = await db.table("therapy_sessions").update(
+        {column: None for column in markers}
+    ).eq("id", ctx.payload["session_id"]).execute()
+    invalidate_rows(response.data)
+    await ctx.checkpoint(reset=True)
+
+
+# =============================================================================
+# Handlers
+# =============================================================================
+
+async def run_full_pipeline_job(ctx: JobContext) -> Dict[str, Any]:
+    """Wave 1 → Wave 2 → prose for one session."""
+    session_id = ctx.payload["session_id"]
+    await _reset_for_forced_run(ctx, _PIPELINE_MARKERS)
+
+    with llm_priority(Priority.BACKGROUND):
+        status = await AnalysisOrchestrator().process_session_full_pipeline(session_id)
+
+    return {"analysis_status": status.analysis_status, "timings": status.timings}
+
+
+async def run_breakthrough_job(ctx: JobContext) -> Dict[str, Any]:
+    """Breakthrough detection for a freshly uploaded transcript (always re-runs; it is one step)."""
+    session_id = ctx.payload["session_id"]
+    orchestrator = AnalysisOrchestrator()
+
+    with llm_priority(Priority.BACKGROUND):
+        await orchestrator._detect_breakthrough(session_id, force=True)
+
+    session = await orchestrator._get_session(session_id)
+    return {"has_breakthrough": session.get("has_breakthrough")}
+
+
+async def run_wave1_job(ctx: JobContext) -> Dict[str, Any]:
+    """Wave 1 for one session of a batch; tasks that already finished are skipped on retry."""
+    session_id = ctx.payload["session_id"]
+    await _reset_for_forced_run(ctx, _WAVE1_MARKERS)
+
+    results = await Wave1BatchRunner().run([session_id])
+    result = results[0]
+    if result.errors:
+        # Fail the attempt so the queue retries the tasks that did not finish
+        raise Exception(f"Wave 1 tasks failed: {result.errors}")
+
+    return {"skipped": result.skipped}
+
+
+async def run_aggregates_check_job(ctx: JobContext) -> Dict[str, Any]:
+    """Rebuild a patient's aggregates from their sessions and repair the stored row if it drifted."""
+    return await PatientAggregatesStore().check(ctx.payload["patient_id"])
+
+
+async def run_aggregates_sweep_job(ctx: JobContext) -> Dict[str, Any]:
+    """Queue an aggregates check for every patient (resumes after the last patient queued)."""
+    db = await get_async_supabase()
+    response = await db.table("patients").select("id").order("id").execute()
+    patient_ids = [row["id"] for row in response.data or []]
+
+    done = ctx.state.get("queued", 0)
+    for index in range(done, len(patient_ids)):
+        await enqueue_aggregates_check(patient_ids[index])
+        if (index + 1) % 100 == 0:
+            await ctx.checkpoint(queued=index + 1)
+
+    return {"patients": len(patient_ids)}
+
+
+ANALYSIS_HANDLERS = {
+    FULL_PIPELINE: run_full_pipeline_job,
+    BREAKTHROUGH: run_breakthrough_job,
+    WAVE1: run_wave1_job,
+    AGGREGATES_CHECK: run_aggregates_check_job,
+    AGGREGATES_SWEEP: run_aggregates_sweep_job,
+}
+
+# (seconds between runs, coroutine function) run by every worker (JobWorker schedules)
+ANALYSIS_SCHEDULES = [
+    (AGGREGATES_SWEEP_POLL_SECONDS, schedule_aggregates_sweep),
+]
@@ -8,14 +8,22 @@ Wave 1 (Parallel):
   - Topic Extraction
   - Breakthrough Detection
 
-Wave 2 (Sequential, requires Wave 1):
-  - Deep Clinical Analysis (synthesizes Wave 1 + patient history)
+Wave 2 (requires mood, topics and breakthrough):
+  - Deep Clinical Analysis (synthesizes Wave 1 + patient history + stored
+    cumulative context, which it then updates)
+  - Prose Generation (requires deep analysis)
+
+Each analysis is a DagScheduler node that starts as soon as its inputs
+exist, so deep analysis overlaps the action items summary; per-node timings
+and the critical path are returned with the pipeline status.
 
 Features:
 - Automatic dependency management
 - Retry logic with exponential backoff
 - Processing status tracking
 - Graceful error handling
+- Non-blocking database access (async Supabase client)
+- Single-fetch session snapshot per run with coalesced UPDATEs
 """
 
 import asyncio
@@ -30,11 +38,20 @@ from app.services.breakthrough_detector import BreakthroughDetector
 from app.services.deep_analyzer import DeepAnalyzer
 from app.services.prose_generator import ProseGenerator
 from app.services.action_items_summarizer import ActionItemsSummarizer, ActionItemsSummary
-from app.database import get_db
-from supabase import Client
+from app.services.session_snapshot import SessionSnapshot
+from app.services.cumulative_context import CumulativeContextStore
+from app.services.patient_aggregates import PatientAggregatesStore
+from app.services.dag_scheduler import DagReport, DagScheduler
+from app.services.llm_rate_limiter import backoff_delay
+from app.database import get_async_supabase
+from app.middleware.response_cache import invalidate_patient, invalidate_rows
+from supabase import AsyncClient
 
 logger = logging.getLogger(__name__)
 
+# Wave 1 analyses deep analysis depends on
+WAVE1_NODES = ("mood", "topics", "breakthrough")
+
 
 @dataclass
 class AnalysisResult:
@@ -60,6 +77,8 @@ class PipelineStatus:
     deep_complete: bool
     wave1_completed_at: Optional[datetime]
     deep_analyzed_at: Optional[datetime]
+    db_round_trips: Optional[int] = None  # Set by process_session_full_pipeline
+    timings: Optional[Dict[str, Any]] = None  # DAG report (per-node timings, critical path)
 
 
 class AnalysisOrchestrator:
@@ -68,27 +87,32 @@ class AnalysisOrchestrator:
 
     Ensures:
     1. Wave 1 analyses run in parallel (no dependencies)
-    2. Wave 2 only starts after ALL Wave 1 completes
+    2. Deep analysis only starts after mood, topics and breakthrough complete
     3. Proper error handling and retry logic
     4. Status tracking in database
     """
 
-    MAX_RETRIES = 3
-    BACKOFF_MULTIPLIER = 2  # Exponential backoff: 2s, 4s, 8s
+    MAX_RETRIES = 3  # 429s are already retried per call by the LLM rate limiter
     TIMEOUT_SECONDS = 300  # 5 minutes max per wave
 
-    def __init__(self, db: Optional[Client] = None):
+    def __init__(self, db: Optional[AsyncClient] = None):
         """
         Initialize the orchestrator.
 
         Args:
-            db: Supabase client. If None, uses default from get_db()
+            db: Async Supabase client. If None, uses get_async_supabase()
+                for the running event loop on first query
         """
-        self.db = db or next(get_db())
+        self.db = db
+        # Active per-run snapshots (session_id -> SessionSnapshot)
+        self._snapshots: Dict[str, SessionSnapshot] = {}
+        self.db_round_trips = 0
         self.mood_analyzer = MoodAnalyzer()
         self.topic_extractor = TopicExtractor()
         self.breakthrough_detector = BreakthroughDetector()
-        self.deep_analyzer = DeepAnalyzer()
+        self.context_store = CumulativeContextStore(db, execute=self._execute)
+        self.aggregates_store = PatientAggregatesStore(db, execute=self._execute)
+        self.deep_analyzer = DeepAnalyzer(context_store=self.context_store)
         self.action_items_summarizer = ActionItemsSummarizer()
 
     async def process_session_full_pipeline(
@@ -97,7 +121,7 @@ class AnalysisOrchestrator:
         force: bool = False
     ) -> PipelineStatus:
         """
-        Run complete analysis pipeline: Wave 1 (parallel) → Wave 2 (deep analysis)
+        Run complete analysis pipeline: Wave 1 (parallel) → Wave 2 (deep analysis → prose)
 
         Args:
             session_id: Session UUID
@@ -110,108 +134,117 @@ class AnalysisOrchestrator:
             Exception: If critical failure occurs after all retries
         """
         logger.info(f"🚀 Starting full analysis pipeline for session {session_id}")
+        round_trips_before = self.db_round_trips
+
+        # Load the session row once; waves read and stage updates in memory
+        db = await self._get_db()
+        self._snapshots[session_id] = await SessionSnapshot.load(db, session_id, execute=self._execute)
 
         # Update status to wave1_running
         await self._update_session_status(session_id, "wave1_running")
 
         try:
-            # WAVE 1: Run parallel analyses
-            wave1_results = await self._run_wave1(session_id, force)
+            report = await self._run_session_dag(session_id, force)
+            timings = report.to_dict()
+            logger.info(
+                f"⏱️ Session {session_id} DAG: {timings['wall_ms']:.0f}ms wall "
+                f"({timings['serial_ms']:.0f}ms serial), critical path {' → '.join(report.critical_path)}"
+            )
 
             # Check if all Wave 1 completed successfully
-            if not all(r.status == 'completed' for r in wave1_results):
-                failed_waves = [r.wave for r in wave1_results if r.status == 'failed']
+            failed_waves = [wave for wave in WAVE1_NODES if report.nodes[wave].status != "completed"]
+            if failed_waves:
                 logger.error(f"❌ Wave 1 incomplete for session {session_id}. Failed: {failed_waves}")
                 await self._update_session_status(session_id, "failed")
                 raise Exception(f"Wave 1 failed for waves: {failed_waves}")
 
-            # Mark Wave 1 as complete
-            await self._mark_wave1_complete(session_id)
-            logger.info(f"✅ Wave 1 complete for session {session_id}")
-
-            # WAVE 2: Run deep analysis
-            await self._update_session_status(session_id, "wave2_running")
-            wave2_result = await self._run_wave2(session_id, force)
-
-            if wave2_result.status == 'completed':
+            deep = report.nodes["deep"]
+            if deep.status == "completed":
+                if report.nodes["prose"].status == "failed":
+                    # Don't fail the pipeline if prose generation fails
+                    logger.warning(
+                        f"Wave 2 deep analysis succeeded, but prose generation failed (non-critical): "
+                        f"{report.nodes['prose'].error}"
+                    )
                 await self._update_session_status(session_id, "complete")
                 logger.info(f"✅ Full pipeline complete for session {session_id}")
             else:
                 await self._update_session_status(session_id, "failed")
-                logger.error(f"❌ Wave 2 failed for session {session_id}: {wave2_result.error_message}")
-                raise Exception(f"Wave 2 failed: {wave2_result.error_message}")
+                logger.error(f"❌ Wave 2 failed for session {session_id}: {deep.error}")
+                raise Exception(f"Wave 2 failed: {deep.error}")
 
             # Get final status
-            return await self.get_pipeline_status(session_id)
+            status = await self.get_pipeline_status(session_id)
+            status.db_round_trips = self.db_round_trips - round_trips_before
+            status.timings = timings
+            return status
 
         except Exception as e:
             logger.error(f"Pipeline failed for session {session_id}: {e}")
             await self._update_session_status(session_id, "failed")
             raise
 
-    async def _run_wave1(
-        self,
-        session_id: str,
-        force: bool = False
-    ) -> List[AnalysisResult]:
+        finally:
+            self._snapshots.pop(session_id, None)
+            logger.info(
+                f"📉 DB round-trips for session {session_id}: "
+                f"{self.db_round_trips - round_trips_before}"
+            )
+
+    async def _run_session_dag(self, session_id: str, force: bool = False) -> DagReport:
         """
-        Run Wave 1 analyses in parallel (mood, topics, breakthrough) + action summary (sequential)
+        Run one session's analyses as a DAG, each node as soon as its inputs exist:
+
+            mood, topics, breakthrough ──→ deep ──→ prose
+            topics ──→ action_summary
+
+        Deep analysis only needs the three core Wave 1 results, so it overlaps
+        the action items summary; prose is its own node rather than part of
+        deep analysis's retry/timeout.
 
         Args:
             session_id: Session UUID
             force: Force re-analysis
 
         Returns:
-            List of AnalysisResult for each wave
+            DagReport with per-node status and timings
         """
-        logger.info(f"📊 Running Wave 1 (parallel) for session {session_id}")
-
-        # Run mood, topics, breakthrough in parallel (unchanged)
-        results = await asyncio.gather(
-            self._run_with_retry(session_id, "mood", self._analyze_mood, force),
-            self._run_with_retry(session_id, "topics", self._extract_topics, force),
-            self._run_with_retry(session_id, "breakthrough", self._detect_breakthrough, force),
-            return_exceptions=True  # Don't fail entire batch if one fails
+        logger.info(f"📊 Running analysis DAG for session {session_id}")
+        scheduler = DagScheduler()
+
+        scheduler.add("mood", self._wave_node(session_id, "mood", self._analyze_mood, force))
+        scheduler.add("topics", self._wave_node(session_id, "topics", self._extract_topics, force))
+        scheduler.add("breakthrough", self._wave_node(session_id, "breakthrough", self._detect_breakthrough, force))
+
+        # Reads topic extraction's action items; a failed summary never blocks Wave 2
+        scheduler.add(
+            "action_summary",
+            self._wave_node(session_id, "action_summary", self._summarize_action_items, force),
+            after=("topics",),
         )
 
-        # Convert exceptions to failed results
-        processed_results = []
-        wave_names = ["mood", "topics", "breakthrough"]
-
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append(AnalysisResult(
-                    wave=wave_names[i],
-                    status="failed",
-                    started_at=datetime.utcnow(),
-                    completed_at=None,
-                    error_message=str(result),
-                    retry_count=self.MAX_RETRIES
-                ))
-            else:
-                processed_results.append(result)
-
-        # Check if core Wave 1 analyses succeeded
-        logger.info(f"✅ Wave 1 core analyses complete for session {session_id}")
+        async def run_deep():
+            await self._mark_wave1_complete(session_id)
+            logger.info(f"✅ Wave 1 complete for session {session_id}")
+            await self._update_session_status(session_id, "wave2_running")
+            await self._record_wave1_aggregates(session_id)
+            result = await self._run_wave2(session_id, force)
+            if result.status != "completed":
+                raise Exception(result.error_message)
 
-        # Run action items summarization SEQUENTIALLY (requires topic extraction to be complete)
-        try:
-            await self._run_with_retry(
-                session_id,
-                "action_summary",
-                self._summarize_action_items,
-                force
-            )
-        except Exception as e:
-            # Don't fail Wave 1 if summarization fails (non-critical)
-            logger.error(
-                f"⚠️  Action items summarization failed for session {session_id}: {str(e)}. "
-                f"Wave 1 will continue without summary."
-            )
+        scheduler.add("deep", run_deep, deps=WAVE1_NODES)
+        scheduler.add("prose", lambda: self._generate_prose(session_id, force), deps=("deep",))
 
-        logger.info(f"✅ Wave 1 complete (with summary) for session {session_id}")
+        return await scheduler.run()
 
-        return processed_results
+    def _wave_node(self, session_id: str, wave: str, analysis_func, force: bool = False):
+        """DAG node running an analysis with retries; raises if it ultimately fails"""
+        async def run():
+            result = await self._run_with_retry(session_id, wave, analysis_func, force)
+            if result.status != "completed":
+                raise Exception(result.error_message)
+            return result
+        return run
 
     async def _run_wave2(
         self,
@@ -244,7 +277,7 @@ class AnalysisOrchestrator:
         force: bool = False
     ) -> AnalysisResult:
         """
-        Run analysis with retry logic and exponential backoff
+        Run analysis with retry logic and jittered exponential backoff
 
         Args:
             session_id: Session UUID
@@ -289,7 +322,7 @@ class AnalysisOrchestrator:
                 await self._log_analysis_failure(session_id, wave, error_msg, attempt)
 
                 if attempt < self.MAX_RETRIES - 1:
-                    await asyncio.sleep(self.BACKOFF_MULTIPLIER ** attempt)
+                    await asyncio.sleep(backoff_delay(attempt + 1))
                 else:
                     return AnalysisResult(
                         wave=wave,
@@ -306,7 +339,7 @@ class AnalysisOrchestrator:
                 await self._log_analysis_failure(session_id, wave, error_msg, attempt)
 
                 if attempt < self.MAX_RETRIES - 1:
-                    await asyncio.sleep(self.BACKOFF_MULTIPLIER ** attempt)
+                    await asyncio.sleep(backoff_delay(attempt + 1))
                 else:
                     return AnalysisResult(
                         wave=wave,
@@ -332,21 +365,21 @@ class AnalysisOrchestrator:
             return
 
         # Run analysis
-        analysis = self.mood_analyzer.analyze_session_mood(
+        analysis = await self.mood_analyzer.analyze_session_mood(
             session_id=session_id,
             segments=session["transcript"],
             patient_speaker_id="SPEAKER_01"
         )
 
         # Update session
-        self.db.table("therapy_sessions").update({
+        await self._apply_session_update(session_id, {
             "mood_score": analysis.mood_score,
             "mood_confidence": analysis.confidence,
             "mood_rationale": analysis.rationale,
             "mood_indicators": analysis.key_indicators,
             "emotional_tone": analysis.emotional_tone,
             "mood_analyzed_at": datetime.utcnow().isoformat(),
-        }).eq("id", session_id).execute()
+        })
 
     async def _extract_topics(self, session_id: str, force: bool = False):
         """Run topic extraction for a session"""
@@ -359,13 +392,13 @@ class AnalysisOrchestrator:
             return
 
         # Run extraction
-        metadata = self.topic_extractor.extract_metadata(
+        metadata = await self.topic_extractor.extract_metadata(
             session_id=session_id,
             segments=session["transcript"]
         )
 
         # Update session
-        self.db.table("therapy_sessions").update({
+        await self._apply_session_update(session_id, {
             "topics": metadata.topics,
             "action_items": metadata.action_items,
             "technique": metadata.technique,
@@ -373,7 +406,7 @@ class AnalysisOrchestrator:
             "extraction_confidence": metadata.confidence,
             "raw_meta_summary": metadata.raw_meta_summary,
             "topics_extracted_at": datetime.utcnow().isoformat(),
-        }).eq("id", session_id).execute()
+        })
 
     async def _detect_breakthrough(self, session_id: str, force: bool = False):
         """Run breakthrough detection for a session"""
@@ -386,7 +419,7 @@ class AnalysisOrchestrator:
             return
 
         # Run detection
-        analysis = self.breakthrough_detector.analyze_session(
+        analysis = await self.breakthrough_detector.analyze_session(
             transcript=session["transcript"],
             session_metadata={"session_id": session_id}
         )
@@ -409,12 +442,12 @@ class AnalysisOrchestrator:
             breakthrough_label = bt.label  # NEW: Store as separate column for easy querying
 
         # Update session (now includes breakthrough_label column)
-        self.db.table("therapy_sessions").update({
+        await self._apply_session_update(session_id, {
             "has_breakthrough": analysis.has_breakthrough,
             "breakthrough_data": primary_breakthrough,
             "breakthrough_label": breakthrough_label,  # NEW
             "breakthrough_analyzed_at": datetime.utcnow().isoformat(),
-        }).eq("id", session_id).execute()
+        })
 
         # No longer storing in breakthrough_history table
         # (we're only keeping 1 breakthrough per session now)
@@ -450,10 +483,10 @@ class AnalysisOrchestrator:
         )
 
         # Update session with summary
-        self.db.table("therapy_sessions").update({
+        await self._apply_session_update(session_id, {
             "action_items_summary": summary_result.summary,
             "updated_at": "now()",
-        }).eq("id", session_id).execute()
+        })
 
         logger.info(
             f"✅ Action items summary stored for session {session_id}: "
@@ -481,48 +514,103 @@ class AnalysisOrchestrator:
         )
 
         # Update session
-        self.db.table("therapy_sessions").update({
+        await self._apply_session_update(session_id, {
             "deep_analysis": analysis.to_dict(),
             "analysis_confidence": analysis.confidence_score,
             "deep_analyzed_at": datetime.utcnow().isoformat(),
-        }).eq("id", session_id).execute()
+        })
 
         logger.info(f"✓ Wave 2 deep analysis complete for session {session_id}")
 
-        # Auto-generate prose from deep analysis
-        try:
-            logger.info(f"📝 Auto-generating prose for session {session_id}")
-            prose_generator = ProseGenerator()
-            prose = await prose_generator.generate_prose(
-                session_id=session_id,
-                deep_analysis=analysis.to_dict(),
-                confidence_score=analysis.confidence_score
-            )
+        # Fold this session into the patient's cumulative context for later sessions
+        if session.get("patient_id"):
+            try:
+                await self.context_store.record_session(session, analysis.to_dict())
+            except Exception as e:
+                logger.error(f"Cumulative context update failed for session {session_id}: {e}")
 
-            # Update session with prose
-            self.db.table("therapy_sessions").update({
-                "prose_analysis": prose.prose_text,
-                "prose_generated_at": prose.generated_at.isoformat()
-            }).eq("id", session_id).execute()
+    async def _generate_prose(self, session_id: str, force: bool = False):
+        """Generate patient-facing prose from the session's deep analysis"""
+        session = await self._get_session(session_id)
 
-            logger.info(f"✓ Prose auto-generated: {prose.word_count} words, {prose.paragraph_count} paragraphs")
+        if not session.get("deep_analysis"):
+            raise Exception("Cannot generate prose: deep analysis not complete")
 
-        except Exception as e:
-            # Don't fail entire Wave 2 if prose generation fails
-            logger.error(f"Prose auto-generation failed for session {session_id}: {e}")
-            logger.warning("Wave 2 deep analysis succeeded, but prose generation failed (non-critical)")
+        # Skip if already generated and not forcing
+        if session.get("prose_generated_at") and not force:
+            logger.info(f"↩️ Prose already generated for session {session_id}, skipping")
+            return
+
+        logger.info(f"📝 Auto-generating prose for session {session_id}")
+        prose_generator = ProseGenerator()
+        prose = await prose_generator.generate_prose(
+            session_id=session_id,
+            deep_analysis=session["deep_analysis"],
+            confidence_score=session.get("analysis_confidence") or 0.7
+        )
+
+        # Update session with prose
+        await self._apply_session_update(session_id, {
+            "prose_analysis": prose.prose_text,
+            "prose_generated_at": prose.generated_at.isoformat()
+        })
+
+        logger.info(f"✓ Prose auto-generated: {prose.word_count} words, {prose.paragraph_count} paragraphs")
 
     # =============================================================================
     # Helper Functions
     # =============================================================================
 
-    async def _get_session(self, session_id: str) -> Dict[str, Any]:
-        """Get session from database"""
-        response = self.db.table("therapy_sessions").select("*").eq("id", session_id).single().execute()
+    async def _get_db(self) -> AsyncClient:
+        """Async Supabase client (resolved lazily inside the event loop)"""
+        if self.db is None:
+            self.db = await get_async_supabase()
+        return self.db
+
+    async def _execute(self, query):
+        """Execute a query builder, counting database round-trips"""
+        self.db_round_trips += 1
+        return await query.execute()
+
+    async def _get_session(self, session_id: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get session row.
+
+        Inside a pipeline run this is the run's in-memory snapshot (staged
+        updates included); pass refresh=True to re-read it from the database.
+        Outside a run it is a direct fetch.
+        """
+        snapshot = self._snapshots.get(session_id)
+        if snapshot is not None:
+            if refresh:
+                await snapshot.refresh()
+            return snapshot.data
+
+        db = await self._get_db()
+        response = await self._execute(db.table("therapy_sessions").select("*").eq("id", session_id).single())
         if not response.data:
             raise Exception(f"Session not found: {session_id}")
         return response.data
 
+    async def _apply_session_update(self, session_id: str, updates: Dict[str, Any], flush: bool = False):
+        """
+        Update session columns.
+
+        Inside a pipeline run the update is staged on the snapshot and written
+        with the next flush (coalesced with other staged updates); outside a
+        run it is written immediately.
+        """
+        snapshot = self._snapshots.get(session_id)
+        if snapshot is None:
+            db = await self._get_db()
+            response = await self._execute(db.table("therapy_sessions").update(updates).eq("id", session_id))
+            invalidate_rows(response.data)
+            return
+
+        snapshot.stage(updates)
+        if flush and await snapshot.flush():
+            invalidate_patient(snapshot.data.get("patient_id"))
+
     async def _is_wave1_complete(self, session_id: str) -> bool:
         """Check if all Wave 1 analyses are complete"""
         session = await self._get_session(session_id)
@@ -533,50 +621,64 @@ class AnalysisOrchestrator:
         )
 
     async def _mark_wave1_complete(self, session_id: str):
-        """Mark Wave 1 as complete"""
-        self.db.table("therapy_sessions").update({
+        """Mark Wave 1 as complete (written with the next status update)"""
+        await self._apply_session_update(session_id, {
             "analysis_status": "wave1_complete",
             "wave1_completed_at": datetime.utcnow().isoformat(),
-        }).eq("id", session_id).execute()
+        })
+
+    async def _record_wave1_aggregates(self, session_id: str):
+        """Fold the session's mood result into its patient's aggregates (non-blocking)"""
+        session = await self._get_session(session_id)
+        if not session.get("patient_id"):
+            return
+        try:
+            await self.aggregates_store.record_wave1(session)
+        except Exception as e:
+            logger.error(f"Patient aggregates update failed for session {session_id}: {e}")
 
     async def _update_session_status(self, session_id: str, status: str):
-        """Update analysis status in session"""
-        self.db.table("therapy_sessions").update({
+        """Update analysis status in session, flushing staged results with it"""
+        await self._apply_session_update(session_id, {
             "analysis_status": status,
-        }).eq("id", session_id).execute()
+        }, flush=True)
 
     async def _log_analysis_start(self, session_id: str, wave: str, retry_count: int):
         """Log analysis start in processing log"""
-        self.db.table("analysis_processing_log").insert({
+        db = await self._get_db()
+        await self._execute(db.table("analysis_processing_log").insert({
             "session_id": session_id,
             "wave": wave,
             "status": "started",
             "retry_count": retry_count,
-        }).execute()
+        }))
 
     async def _log_analysis_complete(self, session_id: str, wave: str, duration_ms: int):
         """Log analysis completion in processing log"""
         # Update the most recent 'started' entry for this wave
-        self.db.table("analysis_processing_log").update({
+        db = await self._get_db()
+        await self._execute(db.table("analysis_processing_log").update({
             "status": "completed",
             "completed_at": datetime.utcnow().isoformat(),
             "processing_duration_ms": duration_ms,
-        }).eq("session_id", session_id).eq("wave", wave).eq("status", "started").execute()
+        }).eq("session_id", session_id).eq("wave", wave).eq("status", "started"))
 
     async def _log_analysis_failure(self, session_id: str, wave: str, error_message: str, retry_count: int):
         """Log analysis failure in processing log"""
         # Update the most recent 'started' entry for this wave
-        self.db.table("analysis_processing_log").update({
+        db = await self._get_db()
+        await self._execute(db.table("analysis_processing_log").update({
             "status": "failed",
             "completed_at": datetime.utcnow().isoformat(),
             "error_message": error_message,
             "retry_count": retry_count,
-        }).eq("session_id", session_id).eq("wave", wave).eq("status", "started").execute()
+        }).eq("session_id", session_id).eq("wave", wave).eq("status", "started"))
 
     async def get_pipeline_status(self, session_id: str) -> PipelineStatus:
         """Get current pipeline status for a session"""
         # Use database function
-        response = self.db.rpc("get_analysis_pipeline_status", {"p_session_id": session_id}).execute()
+        db = await self._get_db()
+        response = await self._execute(db.rpc("get_analysis_pipeline_status", {"p_session_id": session_id}))
 
         if not response.data or len(response.data) == 0:
             raise Exception(f"Session not found: {session_id}")
@@ -5,6 +5,10 @@ Provides a unified interface for AI-powered generators with:
 - Sync and async client support via Generic typing
 - Automatic cost tracking via track_generation_cost()
 - MODEL_TIER integration via get_model_name()
+- Shared, pooled OpenAI clients via the process-wide client registry
+- Content-addressed response caching via the LLM response cache
+- Per-model RPM/TPM admission and 429 retries via the LLM rate limiter
+- Transcript windowing to a token budget via _fit_transcript()
 - Consistent error handling and logging
 
 Usage:
@@ -19,7 +23,8 @@ Usage:
                 {"role": "user", "content": self._create_user_prompt(context)}
             ]
 
-    # For sync services (like DeepAnalyzer)
+    # For sync services (like RoadmapGenerator); call these from a worker
+    # thread (asyncio.to_thread) when the caller is on an event loop
     class MySyncGenerator(BaseAIGenerator[openai.OpenAI]):
         ...
 """
@@ -28,6 +33,7 @@ from abc import ABC, abstractmethod
 from typing import TypeVar, Generic, Optional, Dict, List, Any, Union
 from dataclasses import dataclass
 from datetime import datetime
+import asyncio
 import logging
 import time
 import json
@@ -43,6 +49,10 @@ from app.config.model_config import (
     get_current_tier,
 )
 from app.config import settings
+from app.services.openai_client_registry import get_sync_client, get_async_client
+from app.services.llm_response_cache import get_llm_cache, build_cache_key, CachedCompletion
+from app.services.llm_rate_limiter import get_rate_limiter, estimate_request_tokens
+from app.utils.token_budget import fit_transcript, FittedTranscript, RenderSegment
 
 logger = logging.getLogger(__name__)
 
@@ -77,6 +87,13 @@ class BaseAIGenerator(ABC, Generic[ClientType]):
         ClientType: Either OpenAI (sync) or AsyncOpenAI (async)
     """
 
+    # Whether identical requests may be answered from the LLM response cache.
+    # Set to False on generators whose output must be fresh on every call.
+    use_cache: bool = True
+
+    # Max tokens of transcript in the prompt; None uses LLM_TRANSCRIPT_TOKEN_BUDGET.
+    transcript_token_budget: Optional[int] = None
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -167,6 +184,124 @@ class BaseAIGenerator(ABC, Generic[ClientType]):
         """Get the current MODEL_TIER."""
         return get_current_tier()
 
+    def _fit_transcript(
+        self,
+        segments: List[Dict[str, Any]],
+        render_segment: RenderSegment,
+        separator: str = "\n",
+        group_turns: bool = True
+    ) -> FittedTranscript:
+        """
+        Render transcript segments for a prompt within the token budget.
+
+        Long transcripts keep their opening/closing turns, risk language and
+        most salient turns; see app/utils/token_budget.py.
+        """
+        budget = self.transcript_token_budget or settings.llm_transcript_token_budget
+        fitted = fit_transcript(
+            segments, budget, render_segment, separator=separator, group_turns=group_turns
+        )
+        if fitted.report.truncated:
+            logger.info(f"{self.get_task_name()}: {fitted.report.summary()}")
+        return fitted
+
+    # =========================================================================
+    # Chat Completion Helpers (with response caching and rate limiting)
+    # =========================================================================
+
+    def _cache_lookup(self, messages: List[Dict[str, str]], api_kwargs: Dict[str, Any]):
+        """Return (cache, key, cached_response) for a request; cache is None when disabled."""
+        cache = get_llm_cache() if self.use_cache else None
+        if cache is None:
+            return None, None, None
+
+        key = build_cache_key(self.get_task_name(), self.model, messages, api_kwargs)
+        return cache, key, cache.get(key)
+
+    def _cache_store(self, cache, key: Optional[str], response: Any) -> None:
+        """Store a live API response in the cache (no-op if not cacheable)."""
+        if cache is None or key is None:
+            return
+
+        cached = CachedCompletion.from_response(response, model=self.model)
+        if cached is not None:
+            cache.set(key, cached)
+
+    def _create_chat_completion_sync(
+        self,
+        messages: List[Dict[str, str]],
+        **api_kwargs: Any
+    ) -> Any:
+        """
+        Call chat.completions.create() on the sync client, served from cache when possible.
+
+        Returns either the live ChatCompletion or a CachedCompletion; both expose
+        choices[0].message.content and usage, and track_generation_cost() records
+        cached responses as zero-cost hits. Live calls wait for the model's
+        rate budget and retry 429s (see llm_rate_limiter).
+
+        Blocks for the whole request, budget wait and 429 back-off included,
+        so it must not run on an event loop thread.
+        """
+        cache, key, cached = self._cache_lookup(messages, api_kwargs)
+        if cached is not None:
+            logger.info(f"{self.get_task_name()}: served from LLM response cache")
+            return cached
+
+        if _running_loop() is not None:
+            logger.warning(
+                f"{self.get_task_name()}: sync LLM call on the event loop thread blocks it; "
+                f"use an AsyncAIGenerator or asyncio.to_thread()"
+            )
+
+        response = get_rate_limiter().call_sync(
+            self.model,
+            estimate_request_tokens(self.get_task_name(), messages),
+            lambda: self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                **api_kwargs
+            ),
+        )
+        self._cache_store(cache, key, response)
+        return response
+
+    async def _create_chat_completion_async(
+        self,
+        messages: List[Dict[str, str]],
+        **api_kwargs: Any
+    ) -> Any:
+        """
+        Async counterpart of _create_chat_completion_sync().
+
+        Cache lookups and stores on a blocking (sqlite) backend run in a
+        worker thread so disk I/O never stalls the event loop.
+        """
+        cache = get_llm_cache() if self.use_cache else None
+        offload = cache is not None and cache.blocking
+        if offload:
+            cache, key, cached = await asyncio.to_thread(self._cache_lookup, messages, api_kwargs)
+        else:
+            cache, key, cached = self._cache_lookup(messages, api_kwargs)
+        if cached is not None:
+            logger.info(f"{self.get_task_name()}: served from LLM response cache")
+            return cached
+
+        response = await get_rate_limiter().call(
+            self.model,
+            estimate_request_tokens(self.get_task_name(), messages),
+            lambda: self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                **api_kwargs
+            ),
+        )
+        if offload:
+            await asyncio.to_thread(self._cache_store, cache, key, response)
+        else:
+            self._cache_store(cache, key, response)
+        return response
+
     # =========================================================================
     # Template Methods - Sync
     # =========================================================================
@@ -183,7 +318,7 @@ class BaseAIGenerator(ABC, Generic[ClientType]):
 
         Handles:
         - Message building
-        - API call with timing
+        - API call with timing (served from the response cache when possible)
         - Cost tracking
         - Response parsing
 
@@ -203,11 +338,7 @@ class BaseAIGenerator(ABC, Generic[ClientType]):
 
         try:
             # NOTE: GPT-5 series does NOT support custom temperature
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                **api_kwargs
-            )
+            response = self._create_chat_completion_sync(messages, **api_kwargs)
 
             # Track cost
             cost_info = track_generation_cost(
@@ -252,7 +383,7 @@ class BaseAIGenerator(ABC, Generic[ClientType]):
 
         Handles:
         - Message building
-        - API call with timing
+        - API call with timing (served from the response cache when possible)
         - Cost tracking
         - Response parsing
 
@@ -272,11 +403,7 @@ class BaseAIGenerator(ABC, Generic[ClientType]):
 
         try:
             # NOTE: GPT-5 series does NOT support custom temperature
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                **api_kwargs
-            )
+            response = await self._create_chat_completion_async(messages, **api_kwargs)
 
             # Track cost
             cost_info = track_generation_cost(
@@ -306,11 +433,18 @@ class BaseAIGenerator(ABC, Generic[ClientType]):
             raise
 
 
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
 class SyncAIGenerator(BaseAIGenerator[OpenAI]):
     """
     Base class for synchronous AI generators.
 
-    Automatically initializes sync OpenAI client.
+    Borrows the shared sync OpenAI client for its API key from the registry.
     """
 
     def __init__(
@@ -319,7 +453,7 @@ class SyncAIGenerator(BaseAIGenerator[OpenAI]):
         override_model: Optional[str] = None
     ):
         super().__init__(api_key=api_key, override_model=override_model)
-        self._client = OpenAI(api_key=self.api_key)
+        self._client = get_sync_client(self.api_key)
 
     def generate(
         self,
@@ -352,7 +486,10 @@ class AsyncAIGenerator(BaseAIGenerator[AsyncOpenAI]):
     """
     Base class for asynchronous AI generators.
 
-    Automatically initializes async OpenAI client.
+    Borrows the shared async OpenAI client for its API key (and event loop)
+    from the registry. A generator built outside a loop gets a private client
+    that binds to the first loop using it; on any other loop the generator
+    switches to that loop's shared client.
     """
 
     def __init__(
@@ -361,7 +498,18 @@ class AsyncAIGenerator(BaseAIGenerator[AsyncOpenAI]):
         override_model: Optional[str] = None
     ):
         super().__init__(api_key=api_key, override_model=override_model)
-        self._client = AsyncOpenAI(api_key=self.api_key)
+        self._client = get_async_client(self.api_key)
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = _running_loop()
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Get the async OpenAI client usable on the current event loop."""
+        loop = _running_loop()
+        if loop is not None and loop is not self._client_loop:
+            if self._client_loop is not None:
+                self._client = get_async_client(self.api_key)
+            self._client_loop = loop
+        return super().client
 
     async def generate(
         self,
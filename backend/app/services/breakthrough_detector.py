@@ -14,6 +14,7 @@ import time
 
 from app.services.base_ai_generator import AsyncAIGenerator
 from app.config.model_config import track_generation_cost, GenerationCost
+from app.services.llm_rate_limiter import is_rate_limit_error
 
 
 @dataclass
@@ -169,8 +170,9 @@ class BreakthroughDetector(AsyncAIGenerator):
         Use AI to identify A breakthrough moment in the conversation.
         Returns a list with 0 or 1 element (keeping list for backwards compatibility).
         """
-        # Prepare conversation text for AI analysis
-        conversation_text = self._format_conversation_for_ai(conversation)
+        # Prepare conversation text for AI analysis (turns are already grouped)
+        fitted = self._fit_transcript(conversation, self._format_turn, group_turns=False)
+        conversation_text = fitted.text
 
         # Create AI prompt for breakthrough detection
         system_prompt = self._create_breakthrough_detection_prompt()
@@ -179,8 +181,7 @@ class BreakthroughDetector(AsyncAIGenerator):
         # NOTE: GPT-5 series does NOT support custom temperature - uses internal calibration
         try:
             start_time = time.time()
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            response = await self._create_chat_completion_async(
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": f"Analyze this therapy session transcript:\n\n{conversation_text}"}
@@ -195,7 +196,8 @@ class BreakthroughDetector(AsyncAIGenerator):
                 task="breakthrough_detection",
                 model=self.model,
                 start_time=start_time,
-                session_id=session_id
+                session_id=session_id,
+                metadata=fitted.report.cost_metadata()
             )
 
             # Parse AI response
@@ -208,6 +210,8 @@ class BreakthroughDetector(AsyncAIGenerator):
             return [candidate] if candidate else [], cost_info
 
         except Exception as e:
+            if is_rate_limit_error(e):
+                raise  # Let batch callers back off and retry instead of reporting "no breakthrough"
             print(f"Error during breakthrough detection: {e}")
             return [], None
 
@@ -328,22 +332,13 @@ If NO breakthrough found:
 
 **BE EXTREMELY SELECTIVE. Most sessions will NOT have a breakthrough. That's normal and expected.**"""
 
-    def _format_conversation_for_ai(self, conversation: List[Dict[str, Any]]) -> str:
-        """Format conversation turns into readable text for AI"""
-        formatted = []
-        for turn in conversation:
-            speaker = turn["speaker"]
-            text = turn["text"]
-            start = turn["start"]
-
-            # Format timestamp as MM:SS
-            minutes = int(start // 60)
-            seconds = int(start % 60)
-            timestamp = f"{minutes:02d}:{seconds:02d}"
-
-            formatted.append(f"[{timestamp}] {speaker}: {text}")
-
-        return "\n".join(formatted)
+    @staticmethod
+    def _format_turn(turn: Dict[str, Any]) -> str:
+        """Format one conversation turn as a timestamped line"""
+        # Format timestamp as MM:SS
+        minutes = int(turn["start"] // 60)
+        seconds = int(turn["start"] % 60)
+        return f"[{minutes:02d}:{seconds:02d}] {turn['speaker']}: {turn['text']}"
 
     def _parse_breakthrough_finding(
         self,
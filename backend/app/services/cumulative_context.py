@@ -0,0 +1,438 @@
+"""
+Cumulative Context - Persisted, bounded Wave 2 context per patient
+
+Wave 2 used to pass deep analysis a cumulative context that nested the
+previous session's context inside itself, so session N carried an N-deep
+JSON tree that was rebuilt and re-serialized for every session (quadratic
+bytes and tokens over a patient's history).
+
+The cumulative context is now one patient_cumulative_context row per patient:
+
+- recent_sessions: the last RECENT_WINDOW sessions' Wave 1 fields and Wave 2
+  deep analysis in full
+- earlier_sessions: a compacted summary that sessions are folded into as
+  they leave the window (mood stats, top topics/techniques, latest skill
+  proficiency and alliance, the most recent breakthroughs, realizations and
+  patterns), with every list and map capped
+
+record_session() folds a session in after its Wave 2 completes (one read,
+one write), and DeepAnalyzer reads the stored context directly. Patients
+analyzed before the table existed are backfilled once from their sessions.
+
+folded_sessions lists every session in the context as [session_date,
+session_id], in date order, so the context is only ever extended at the end:
+- A session still in the recent window is replaced in place when re-run
+- A session already folded into the summary, or one older than the newest
+  folded session, makes record_session() rebuild the row from history
+- Analyzing a session that is not after everything folded (re-analyzing
+  session 2 of 10) gets a context rebuilt from the sessions before it only
+
+Updates for a patient are serialized in-process by a module-level lock, and
+across processes by a revision compare-and-swap (a lost race reloads and
+re-applies).
+
+Usage:
+    store = CumulativeContextStore(db)
+    context = await store.load_prompt_context(patient_id, exclude_session_id=session_id)
+    ...
+    await store.record_session(session, deep_analysis)
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.database import get_async_supabase
+from app.utils.keyed_locks import KeyedLocks
+
+logger = logging.getLogger(__name__)
+
+# Sessions carried in full
+RECENT_WINDOW = 3
+
+# Caps on the compacted earlier-sessions summary
+MAX_TOPICS = 10
+MAX_TECHNIQUES = 5
+MAX_SKILLS = 12
+MAX_BREAKTHROUGHS = 5
+MAX_INSIGHTS = 6
+
+# Wave 1 columns carried per session (also the backfill projection)
+WAVE1_FIELDS = (
+    "session_date", "mood_score", "mood_confidence", "mood_rationale", "emotional_tone",
+    "topics", "action_items", "technique", "summary", "has_breakthrough", "breakthrough_data",
+)
+
+# Bookkeeping keys in a stored deep_analysis that carry no clinical content
+_WAVE2_EXCLUDED = ("cost_info", "analyzed_at")
+
+# Compare-and-swap attempts per record_session() before giving up
+MAX_SAVE_ATTEMPTS = 5
+
+# record_session() load -> fold -> write cycles, per patient, for every store
+_patient_locks = KeyedLocks()
+
+Execute = Callable[[Any], Awaitable[Any]]
+
+
+async def _default_execute(query: Any) -> Any:
+    return await query.execute()
+
+
+def extract_wave1_data(session: Dict[str, Any]) -> Dict[str, Any]:
+    """Wave 1 analysis fields of a session row"""
+    return {"session_id": session["id"], **{name: session.get(name) for name in WAVE1_FIELDS}}
+
+
+def session_key(session: Dict[str, Any]) -> List[str]:
+    """[session_date, session_id]: the order sessions are folded in"""
+    return [str(session.get("session_date") or ""), session["id"]]
+
+
+def _is_unique_violation(error: Exception) -> bool:
+    return getattr(error, "code", None) == "23505"
+
+
+def _top_counts(counts: Dict[str, int], limit: int) -> Dict[str, int]:
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return dict(ranked[:limit])
+
+
+def _append_recent(items: List[Any], new: List[Any], limit: int) -> List[Any]:
+    """Append new items (skipping duplicates) and keep the last `limit`."""
+    merged = [item for item in items if item not in new] + [item for item in new if item]
+    return merged[-limit:]
+
+
+@dataclass
+class CumulativeContext:
+    """A patient's stored cumulative context (a patient_cumulative_context row)."""
+    recent_sessions: List[Dict[str, Any]] = field(default_factory=list)
+    earlier_sessions: Dict[str, Any] = field(default_factory=dict)
+    sessions_included: int = 0
+    last_session_id: Optional[str] = None
+    # [session_date, session_id] of every session included, oldest first
+    folded_sessions: List[List[str]] = field(default_factory=list)
+    revision: int = 0
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "CumulativeContext":
+        return cls(
+            recent_sessions=row.get("recent_sessions") or [],
+            earlier_sessions=row.get("earlier_sessions") or {},
+            sessions_included=row.get("sessions_included") or 0,
+            last_session_id=row.get("last_session_id"),
+            folded_sessions=[list(key) for key in row.get("folded_sessions") or []],
+            revision=row.get("revision") or 0,
+        )
+
+    def to_row(self, patient_id: str) -> Dict[str, Any]:
+        return {
+            "patient_id": patient_id,
+            "recent_sessions": self.recent_sessions,
+            "earlier_sessions": self.earlier_sessions,
+            "sessions_included": self.sessions_included,
+            "last_session_id": self.last_session_id,
+            "folded_sessions": self.folded_sessions,
+            "revision": self.revision,
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+
+    @property
+    def is_legacy(self) -> bool:
+        """Written before folded_sessions was tracked (its order can't be checked)"""
+        return self.sessions_included > 0 and not self.folded_sessions
+
+    def contains(self, session_id: str) -> bool:
+        return any(key[1] == session_id for key in self.folded_sessions)
+
+    def precedes(self, session: Dict[str, Any]) -> bool:
+        """
+        True if every other session in the context comes before `session`,
+        i.e. the context (minus the session itself) is its prompt context.
+        """
+        key = session_key(session)
+        for other in reversed(self.folded_sessions):
+            if other[1] != key[1]:
+                return other < key
+        return True
+
+    def add_session(self, session: Dict[str, Any], deep_analysis: Dict[str, Any]) -> bool:
+        """
+        Add a session's Wave 1 + Wave 2 results, folding the oldest recent
+        session into the earlier-sessions summary once the window is full.
+
+        Re-adding a session still in the window (same date) replaces its entry.
+
+        Returns:
+            False, leaving the context unchanged, if the session can't be
+            added in place: it is already folded into the summary, its date
+            changed, or it is older than the newest session included. The
+            context has to be rebuilt from history (CumulativeContextStore.rebuild)
+        """
+        wave2 = {key: value for key, value in (deep_analysis or {}).items() if key not in _WAVE2_EXCLUDED}
+        key = session_key(session)
+
+        for entry in self.recent_sessions:
+            if entry["wave1"]["session_id"] == session["id"]:
+                if key not in self.folded_sessions:
+                    return False  # Moved to another date
+                entry["wave1"] = extract_wave1_data(session)
+                entry["wave2"] = wave2
+                return True
+
+        if self.contains(session["id"]) or (self.folded_sessions and key < self.folded_sessions[-1]):
+            return False
+
+        self.sessions_included += 1
+        self.last_session_id = session["id"]
+        self.folded_sessions.append(key)
+        self.recent_sessions.append({
+            "session_number": self.sessions_included,
+            "wave1": extract_wave1_data(session),
+            "wave2": wave2,
+        })
+
+        while len(self.recent_sessions) > RECENT_WINDOW:
+            self._fold_into_earlier(self.recent_sessions.pop(0))
+        return True
+
+    def _fold_into_earlier(self, entry: Dict[str, Any]) -> None:
+        earlier = self.earlier_sessions
+        wave1, wave2 = entry["wave1"], entry["wave2"]
+        number = entry["session_number"]
+
+        earlier["sessions"] = earlier.get("sessions", 0) + 1
+        earlier["session_range"] = [earlier.get("session_range", [number])[0], number]
+        earlier.setdefault("first_session_date", wave1.get("session_date"))
+        earlier["last_session_date"] = wave1.get("session_date")
+
+        mood_score = wave1.get("mood_score")
+        if mood_score is not None:
+            mood = earlier.setdefault("mood", {"first": mood_score, "min": mood_score, "max": mood_score,
+                                               "average": 0.0, "count": 0})
+            mood["count"] += 1
+            mood["average"] = round(mood["average"] + (mood_score - mood["average"]) / mood["count"], 2)
+            mood["min"] = min(mood["min"], mood_score)
+            mood["max"] = max(mood["max"], mood_score)
+            mood["latest"] = mood_score
+
+        topics = dict(earlier.get("topic_counts", {}))
+        for topic in wave1.get("topics") or []:
+            topics[topic] = topics.get(topic, 0) + 1
+        earlier["topic_counts"] = _top_counts(topics, MAX_TOPICS)
+
+        technique = wave1.get("technique")
+        if technique:
+            techniques = dict(earlier.get("technique_counts", {}))
+            techniques[technique] = techniques.get(technique, 0) + 1
+            earlier["technique_counts"] = _top_counts(techniques, MAX_TECHNIQUES)
+
+        breakthrough = wave1.get("breakthrough_data")
+        if wave1.get("has_breakthrough") and breakthrough:
+            earlier["breakthrough_count"] = earlier.get("breakthrough_count", 0) + 1
+            earlier["breakthroughs"] = (earlier.get("breakthroughs", []) + [{
+                "session_number": number,
+                "type": breakthrough.get("type"),
+                "description": breakthrough.get("description"),
+            }])[-MAX_BREAKTHROUGHS:]
+
+        insights = wave2.get("therapeutic_insights") or {}
+        earlier["key_realizations"] = _append_recent(
+            earlier.get("key_realizations", []), (insights.get("key_realizations") or [])[:1], MAX_INSIGHTS
+        )
+        earlier["patterns"] = _append_recent(
+            earlier.get("patterns", []), (insights.get("patterns") or [])[:1], MAX_INSIGHTS
+        )
+
+        proficiency = (wave2.get("coping_skills") or {}).get("proficiency") or {}
+        if proficiency:
+            skills = {skill: level for skill, level in earlier.get("skill_proficiency", {}).items()
+                      if skill not in proficiency}
+            skills.update(proficiency)
+            earlier["skill_proficiency"] = dict(list(skills.items())[-MAX_SKILLS:])
+
+        relationship = wave2.get("therapeutic_relationship") or {}
+        if relationship:
+            earlier["latest_relationship"] = {
+                key: relationship.get(key) for key in ("engagement_level", "openness", "alliance_strength")
+            }
+
+    def to_prompt_context(self, exclude_session_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Context for DeepAnalyzer (None when there are no previous sessions).
+
+        Args:
+            exclude_session_id: The session being analyzed, if it is already stored
+        """
+        recent = [entry for entry in self.recent_sessions if entry["wave1"]["session_id"] != exclude_session_id]
+        if not recent and not self.earlier_sessions:
+            return None
+
+        context: Dict[str, Any] = {
+            "sessions_included": self.earlier_sessions.get("sessions", 0) + len(recent),
+        }
+        if self.earlier_sessions:
+            context["earlier_sessions"] = self.earlier_sessions
+        context["recent_sessions"] = recent
+        return context
+
+
+class CumulativeContextStore:
+    """
+    Loads and updates patients' cumulative context.
+
+    Args:
+        db: Async Supabase client. If None, uses get_async_supabase()
+            for the running event loop on first query
+        execute: Awaitable that runs a query builder (lets callers count
+            round-trips); defaults to query.execute()
+    """
+
+    TABLE = "patient_cumulative_context"
+    COLUMNS = "recent_sessions, earlier_sessions, sessions_included, last_session_id, folded_sessions, revision"
+
+    def __init__(self, db: Optional[Any] = None, execute: Optional[Execute] = None):
+        self.db = db
+        self._execute = execute or _default_execute
+
+    async def _get_db(self) -> Any:
+        if self.db is None:
+            self.db = await get_async_supabase()
+        return self.db
+
+    async def _load_row(self, patient_id: str) -> Tuple[Optional[CumulativeContext], Optional[int]]:
+        """(usable stored context or None, stored revision or None if there is no row)"""
+        db = await self._get_db()
+        result = await self._execute(db.table(self.TABLE).select(self.COLUMNS).eq("patient_id", patient_id))
+        if not result.data:
+            return None, None
+        context = CumulativeContext.from_row(result.data[0])
+        return (None if context.is_legacy else context), context.revision
+
+    async def load(self, patient_id: str) -> Optional[CumulativeContext]:
+        """Stored context for a patient, or None if it has never been built (or predates folded_sessions)."""
+        context, _ = await self._load_row(patient_id)
+        return context
+
+    async def save(self, patient_id: str, context: CumulativeContext) -> None:
+        """Write the context unconditionally (a full rebuild, e.g. demo seeding)."""
+        db = await self._get_db()
+        context.revision += 1
+        await self._execute(db.table(self.TABLE).upsert(context.to_row(patient_id), on_conflict="patient_id"))
+
+    async def _save_if_unchanged(
+        self,
+        patient_id: str,
+        context: CumulativeContext,
+        expected_revision: Optional[int]
+    ) -> bool:
+        """Write the context only if the row is still at expected_revision (None: no row yet)."""
+        db = await self._get_db()
+        context.revision = (expected_revision or 0) + 1
+        row = context.to_row(patient_id)
+
+        if expected_revision is None:
+            try:
+                await self._execute(db.table(self.TABLE).insert(row))
+            except Exception as e:
+                if _is_unique_violation(e):
+                    return False
+                raise
+            return True
+
+        result = await self._execute(
+            db.table(self.TABLE).update(row).eq("patient_id", patient_id).eq("revision", expected_revision)
+        )
+        return bool(result.data)
+
+    async def rebuild(
+        self,
+        patient_id: str,
+        exclude_session_id: Optional[str] = None,
+        before: Optional[List[str]] = None,
+        session: Optional[Dict[str, Any]] = None,
+        deep_analysis: Optional[Dict[str, Any]] = None
+    ) -> CumulativeContext:
+        """
+        Build context from the patient's Wave 2-complete sessions, in date order.
+
+        Args:
+            exclude_session_id: Leave this session out
+            before: Only sessions ordered before this session_key()
+            session / deep_analysis: Results not yet written to therapy_sessions,
+                used in place of that session's row
+        """
+        db = await self._get_db()
+        result = await self._execute(
+            db.table("therapy_sessions")
+            .select(", ".join(("id",) + WAVE1_FIELDS + ("deep_analysis",)))
+            .eq("patient_id", patient_id)
+            .order("session_date")
+        )
+
+        rows = {row["id"]: row for row in result.data or []}
+        if session is not None:
+            rows[session["id"]] = {**rows.get(session["id"], {}), **session, "deep_analysis": deep_analysis}
+
+        context = CumulativeContext()
+        for row in sorted(rows.values(), key=session_key):
+            if row["id"] == exclude_session_id or not row.get("deep_analysis"):
+                continue
+            if before is not None and session_key(row) >= before:
+                break
+            context.add_session(row, row["deep_analysis"])
+
+        logger.info(f"Rebuilt cumulative context for patient {patient_id}: {context.sessions_included} sessions")
+        return context
+
+    async def load_prompt_context(
+        self,
+        patient_id: str,
+        exclude_session_id: Optional[str] = None,
+        session_date: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cumulative context for analyzing a session (None for a first session).
+
+        With session_date, only sessions before the analyzed one are included:
+        the stored context is used when the session comes after everything in
+        it, otherwise the context is rebuilt up to the session (not stored).
+        """
+        session = {"id": exclude_session_id, "session_date": session_date} if exclude_session_id else None
+        check_order = session is not None and session_date is not None
+
+        context = await self.load(patient_id)
+        if context is None or (check_order and not context.precedes(session)):
+            context = await self.rebuild(
+                patient_id,
+                exclude_session_id=exclude_session_id,
+                before=session_key(session) if check_order else None,
+            )
+        return context.to_prompt_context(exclude_session_id=exclude_session_id)
+
+    async def record_session(self, session: Dict[str, Any], deep_analysis: Dict[str, Any]) -> CumulativeContext:
+        """
+        Fold a session into its patient's context after Wave 2 completes.
+
+        Rebuilds from history when the session can't be appended (already
+        folded, moved, or out of date order). Serialized per patient.
+
+        Args:
+            session: therapy_sessions row (id, patient_id and Wave 1 columns)
+            deep_analysis: The session's deep_analysis dict
+        """
+        patient_id = session["patient_id"]
+        async with _patient_locks.lock(patient_id):
+            for _ in range(MAX_SAVE_ATTEMPTS):
+                context, revision = await self._load_row(patient_id)
+                if context is None or not context.add_session(session, deep_analysis):
+                    context = await self.rebuild(patient_id, session=session, deep_analysis=deep_analysis)
+
+                if await self._save_if_unchanged(patient_id, context, revision):
+                    return context
+                logger.info(f"Cumulative context for patient {patient_id} changed concurrently, retrying")
+
+        raise RuntimeError(f"Cumulative context for patient {patient_id} kept changing; gave up after "
+                           f"{MAX_SAVE_ATTEMPTS} attempts")
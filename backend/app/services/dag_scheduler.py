@@ -0,0 +1,294 @@
+"""
+DAG Scheduler - Dependency-aware async scheduling with per-node timings
+
+Runs async nodes as soon as their real inputs exist instead of in fixed
+waves. Each node declares two kinds of predecessors:
+
+- deps: nodes whose results it needs. If one fails (or is skipped), the
+  node is skipped.
+- after: nodes it only has to follow (e.g. a per-patient chain such as the
+  roadmap, where each version builds on the last). Their failure does not
+  block it.
+
+Every node's start/finish offsets are recorded. The report also carries the
+critical path: the chain of nodes that determined the wall-clock time, so
+you can see which stage to speed up.
+
+Reports can be persisted as JSON next to the pipeline logs (save_report /
+load_report), which is how the Wave 2 seeding script exposes them to
+/api/demo/status whether it runs in the API process or from the CLI.
+
+Usage:
+    scheduler = DagScheduler()
+    scheduler.add("mood", analyze_mood)
+    scheduler.add("topics", extract_topics)
+    scheduler.add("deep", analyze_deep, deps=("mood", "topics"))
+    report = await scheduler.run()
+
+    report.critical_path      # ["topics", "deep"]
+    report.to_dict()          # per-node timings for status endpoints
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Same directory as PipelineLogger's per-patient logs
+REPORT_DIR = Path(__file__).parent.parent.parent / "logs"
+
+NodeFunc = Callable[[], Awaitable[Any]]
+UpdateCallback = Callable[["DagReport"], None]
+
+
+# =============================================================================
+# Timings and Report
+# =============================================================================
+
+@dataclass
+class NodeTiming:
+    """State and timing of one node (offsets are ms from the start of the run)."""
+    name: str
+    deps: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+    status: str = "pending"  # "pending" | "running" | "completed" | "failed" | "skipped"
+    started_ms: Optional[float] = None
+    finished_ms: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.started_ms is None or self.finished_ms is None:
+            return None
+        return self.finished_ms - self.started_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "status": self.status,
+            "deps": list(self.deps),
+            "after": list(self.after),
+            "started_ms": _round(self.started_ms),
+            "finished_ms": _round(self.finished_ms),
+            "duration_ms": _round(self.duration_ms),
+        }
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+@dataclass
+class DagReport:
+    """Snapshot of a run (complete once every node is completed, failed or skipped)."""
+    nodes: Dict[str, NodeTiming]
+    wall_ms: float
+
+    @property
+    def status(self) -> str:
+        statuses = {node.status for node in self.nodes.values()}
+        if statuses & {"pending", "running"}:
+            return "running"
+        return "failed" if statuses & {"failed", "skipped"} else "completed"
+
+    @property
+    def serial_ms(self) -> float:
+        """Sum of node durations: what running every node back to back would take."""
+        return sum(node.duration_ms or 0.0 for node in self.nodes.values())
+
+    @property
+    def critical_path(self) -> List[str]:
+        """
+        Chain of nodes that set the wall-clock time.
+
+        Starts from the last node to finish and walks back through whichever
+        predecessor finished last, i.e. the one the node was waiting on.
+        """
+        finished = {name: node for name, node in self.nodes.items() if node.finished_ms is not None}
+        if not finished:
+            return []
+
+        path = [max(finished, key=lambda name: finished[name].finished_ms)]
+        while True:
+            node = finished[path[-1]]
+            preds = [name for name in node.deps + node.after if name in finished]
+            if not preds:
+                break
+            path.append(max(preds, key=lambda name: finished[name].finished_ms))
+        return path[::-1]
+
+    @property
+    def critical_path_ms(self) -> float:
+        return sum(self.nodes[name].duration_ms or 0.0 for name in self.critical_path)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "wall_ms": _round(self.wall_ms),
+            "serial_ms": _round(self.serial_ms),
+            "critical_path": self.critical_path,
+            "critical_path_ms": _round(self.critical_path_ms),
+            "nodes": {name: node.to_dict() for name, node in self.nodes.items()},
+        }
+
+
+# =============================================================================
+# Scheduler
+# =============================================================================
+
+class DagScheduler:
+    """
+    Runs a DAG of async nodes, each as soon as its predecessors have finished.
+
+    Args:
+        max_concurrency: Optional cap on nodes running at once (LLM calls are
+            already paced by the rate limiter, so this is usually unset)
+        on_update: Called with a fresh DagReport whenever a node starts or
+            finishes (e.g. to persist live progress)
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, on_update: Optional[UpdateCallback] = None):
+        self.max_concurrency = max_concurrency
+        self.on_update = on_update
+        self.results: Dict[str, Any] = {}
+        self._funcs: Dict[str, NodeFunc] = {}
+        self._nodes: Dict[str, NodeTiming] = {}
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def add(self, name: str, func: NodeFunc, deps: Iterable[str] = (), after: Iterable[str] = ()) -> str:
+        """
+        Add a node.
+
+        Args:
+            name: Unique node name (e.g. "deep:3")
+            func: Zero-argument coroutine function; its return value is
+                stored in self.results[name]
+            deps: Nodes whose results this node needs
+            after: Nodes this node only has to follow
+
+        Returns:
+            The node name, for use in later deps
+        """
+        if name in self._nodes:
+            raise ValueError(f"Duplicate DAG node: {name}")
+        self._funcs[name] = func
+        self._nodes[name] = NodeTiming(name=name, deps=tuple(deps), after=tuple(after))
+        return name
+
+    def report(self) -> DagReport:
+        end = self._finished_at or time.perf_counter()
+        wall_ms = (end - self._started_at) * 1000 if self._started_at is not None else 0.0
+        return DagReport(nodes=self._nodes, wall_ms=wall_ms)
+
+    async def run(self) -> DagReport:
+        """Run every node. Node failures are recorded, not raised."""
+        self._validate()
+        self._started_at = time.perf_counter()
+        self._finished_at = None
+        done = {name: asyncio.Event() for name in self._nodes}
+        slots = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+
+        async def run_node(name: str) -> None:
+            node = self._nodes[name]
+            for pred in node.deps + node.after:
+                await done[pred].wait()
+
+            blocked = [dep for dep in node.deps if self._nodes[dep].status != "completed"]
+            if blocked:
+                node.status = "skipped"
+                node.error = f"Upstream not completed: {', '.join(blocked)}"
+            else:
+                async with slots or contextlib.nullcontext():
+                    node.status = "running"
+                    node.started_ms = self._elapsed_ms()
+                    self._notify()
+                    try:
+                        self.results[name] = await self._funcs[name]()
+                        node.status = "completed"
+                    except Exception as e:
+                        node.status = "failed"
+                        node.error = str(e)
+                        logger.warning(f"DAG node {name} failed: {e}")
+                    node.finished_ms = self._elapsed_ms()
+
+            done[name].set()
+            self._notify()
+
+        await asyncio.gather(*(run_node(name) for name in self._nodes))
+        self._finished_at = time.perf_counter()
+        report = self.report()
+        self._notify()
+        return report
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started_at) * 1000
+
+    def _notify(self) -> None:
+        if self.on_update is None:
+            return
+        try:
+            self.on_update(self.report())
+        except Exception as e:
+            logger.warning(f"DAG update callback failed: {e}")
+
+    def _validate(self) -> None:
+        """Reject unknown predecessors and cycles (which would deadlock run())."""
+        for node in self._nodes.values():
+            unknown = [pred for pred in node.deps + node.after if pred not in self._nodes]
+            if unknown:
+                raise ValueError(f"DAG node {node.name} depends on unknown nodes: {unknown}")
+
+        # Kahn's algorithm: every node must become ready at some point
+        waiting = {name: len(set(node.deps + node.after)) for name, node in self._nodes.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self._nodes}
+        for node in self._nodes.values():
+            for pred in set(node.deps + node.after):
+                dependents[pred].append(node.name)
+
+        ready = [name for name, count in waiting.items() if count == 0]
+        while ready:
+            for dependent in dependents[ready.pop()]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    ready.append(dependent)
+
+        cyclic = sorted(name for name, count in waiting.items() if count > 0)
+        if cyclic:
+            raise ValueError(f"DAG has a cycle through: {cyclic}")
+
+
+# =============================================================================
+# Persistence
+# =============================================================================
+
+def _report_path(key: str) -> Path:
+    return REPORT_DIR / f"pipeline_dag_{key}.json"
+
+
+def save_report(key: str, report: DagReport, **extra: Any) -> None:
+    """Write a report (plus any extra fields) as JSON, replacing the previous one atomically."""
+    REPORT_DIR.mkdir(exist_ok=True)
+    path = _report_path(key)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({**extra, **report.to_dict()}, f)
+    os.replace(tmp_path, path)
+
+
+def load_report(key: str) -> Optional[Dict[str, Any]]:
+    """Last saved report for a key, or None."""
+    try:
+        with open(_report_path(key)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -11,7 +11,7 @@ Analyzes:
 - Therapeutic relationship quality (engagement, openness, alliance strength)
 - Actionable recommendations (practices, resources, reflection prompts)
 
-Refactored to use SyncAIGenerator for consistent initialization and cost tracking.
+Refactored to use AsyncAIGenerator for consistent initialization and cost tracking.
 """
 
 from typing import Dict, List, Optional, Any
@@ -22,8 +22,9 @@ import logging
 import time
 
 from supabase import Client
-from app.services.base_ai_generator import SyncAIGenerator
+from app.services.base_ai_generator import AsyncAIGenerator
 from app.config.model_config import track_generation_cost, GenerationCost
+from app.services.cumulative_context import CumulativeContextStore
 
 logger = logging.getLogger(__name__)
 
@@ -110,11 +111,11 @@ class DeepAnalysis:
         return result
 
 
-class DeepAnalyzer(SyncAIGenerator):
+class DeepAnalyzer(AsyncAIGenerator):
     """
     AI-powered deep clinical analysis for therapy sessions.
 
-    Inherits from SyncAIGenerator for consistent initialization and cost tracking.
+    Inherits from AsyncAIGenerator for consistent initialization and cost tracking.
 
     Synthesizes:
     - Current session transcript
@@ -122,7 +123,13 @@ class DeepAnalyzer(SyncAIGenerator):
     - Patient history (previous sessions, mood trends, recurring themes)
     """
 
-    def __init__(self, api_key: Optional[str] = None, db: Optional[Client] = None, override_model: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        db: Optional[Client] = None,
+        override_model: Optional[str] = None,
+        context_store: Optional[CumulativeContextStore] = None
+    ):
         """
         Initialize the deep analyzer.
 
@@ -130,9 +137,12 @@ class DeepAnalyzer(SyncAIGenerator):
             api_key: OpenAI API key. If None, uses OPENAI_API_KEY env var.
             db: Supabase client. If None, uses default from get_db()
             override_model: Optional model override for testing (default: uses gpt-5.2 from config)
+            context_store: Stored cumulative context, read when analyze_session()
+                is not given one (None = no cumulative context)
         """
         super().__init__(api_key=api_key, override_model=override_model)
         self.db = db  # Will be None if not provided (for testing/mocking)
+        self.context_store = context_store
 
     def get_task_name(self) -> str:
         """Return the task name for model selection and cost tracking."""
@@ -157,12 +167,15 @@ class DeepAnalyzer(SyncAIGenerator):
         Args:
             session_id: Unique identifier for the session
             session: Session data with transcript and Wave 1 analysis results
-            cumulative_context: Nested context from previous sessions (Wave 1 + Wave 2)
+            cumulative_context: Context from previous sessions (Wave 1 + Wave 2).
+                               If None, it is read from the context store.
                                Structure:
                                {
-                                   "previous_context": {...},  # Context from N-2, N-3, etc.
-                                   "session_N_wave1": {...},   # Previous session Wave 1
-                                   "session_N_wave2": {...}    # Previous session Wave 2
+                                   "sessions_included": int,
+                                   "earlier_sessions": {...},  # Compacted summary of older sessions
+                                   "recent_sessions": [        # Last 3 sessions, oldest first
+                                       {"session_number": int, "wave1": {...}, "wave2": {...}}
+                                   ]
                                }
 
         Returns:
@@ -170,6 +183,13 @@ class DeepAnalyzer(SyncAIGenerator):
         """
         logger.info(f"🧠 Starting deep analysis for session {session_id}")
 
+        if cumulative_context is None and self.context_store is not None and session.get("patient_id"):
+            cumulative_context = await self.context_store.load_prompt_context(
+                session["patient_id"],
+                exclude_session_id=session_id,
+                session_date=session.get("session_date"),
+            )
+
         # Gather all context
         context = await self._build_analysis_context(session_id, session, cumulative_context)
 
@@ -180,8 +200,7 @@ class DeepAnalyzer(SyncAIGenerator):
         # NOTE: GPT-5 series does NOT support custom temperature - uses internal calibration
         try:
             start_time = time.time()
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self._create_chat_completion_async(
                 messages=[
                     {
                         "role": "system",
@@ -201,7 +220,8 @@ class DeepAnalyzer(SyncAIGenerator):
                 task="deep_analysis",
                 model=self.model,
                 start_time=start_time,
-                session_id=session_id
+                session_id=session_id,
+                metadata=context["transcript_window"].cost_metadata()
             )
 
             result = json.loads(response.choices[0].message.content)
@@ -241,53 +261,46 @@ You have access to:
 
 **CUMULATIVE CONTEXT STRUCTURE:**
 
-The cumulative context contains nested data from previous sessions. It grows progressively:
+The cumulative context has a fixed shape, however many sessions the patient has had:
 
 **Session 1 (First Session):**
 - No cumulative context (this is the patient's first analyzed session)
 
-**Session 2:**
-```json
-{
-  "session_1_wave1": {
-    "mood_score": 5.5,
-    "topics": ["Depression", "Medication"],
-    "technique": "Cognitive Restructuring",
-    "summary": "...",
-    "has_breakthrough": false
-  },
-  "session_1_wave2": {
-    "progress_indicators": {...},
-    "therapeutic_insights": {...},
-    "coping_skills": {...},
-    "therapeutic_relationship": {...},
-    "recommendations": {...}
-  }
-}
-```
-
-**Session 3:**
+**Session 2+:**
 ```json
 {
-  "previous_context": {
-    // The cumulative context from Session 2 (which contains Session 1)
-    "session_1_wave1": {...},
-    "session_1_wave2": {...}
+  "sessions_included": 7,
+  "earlier_sessions": {
+    "sessions": 4,
+    "session_range": [1, 4],
+    "mood": {"first": 4.0, "latest": 5.5, "min": 3.5, "max": 6.0, "average": 4.9, "count": 4},
+    "topic_counts": {"Depression": 3, "Work stress": 2},
+    "technique_counts": {"Cognitive Restructuring": 2},
+    "breakthrough_count": 1,
+    "breakthroughs": [{"session_number": 3, "type": "...", "description": "..."}],
+    "key_realizations": ["..."],
+    "patterns": ["..."],
+    "skill_proficiency": {"Box breathing": "developing"},
+    "latest_relationship": {"engagement_level": "high", "openness": "somewhat_open", "alliance_strength": "developing"}
   },
-  "session_2_wave1": {...},
-  "session_2_wave2": {...}
+  "recent_sessions": [
+    {
+      "session_number": 5,
+      "wave1": {"mood_score": 5.5, "topics": [...], "technique": "...", "summary": "...", "has_breakthrough": false, ...},
+      "wave2": {"progress_indicators": {...}, "therapeutic_insights": {...}, "coping_skills": {...},
+                "therapeutic_relationship": {...}, "recommendations": {...}}
+    }
+  ]
 }
 ```
 
-**Session 4+:**
-- Follows the same nesting pattern
-- `previous_context` contains the cumulative context from the prior session
-- Direct fields contain the immediate prior session's Wave 1 and Wave 2
+- `recent_sessions` holds the last (up to 3) sessions in full, oldest first
+- `earlier_sessions` summarizes every older session (absent until there are more than 3)
 
 **HOW TO USE CUMULATIVE CONTEXT:**
 
-1. **Most Recent Session**: Check `session_N_wave1` and `session_N_wave2` for the immediately prior session
-2. **Earlier Sessions**: Navigate `previous_context` recursively to access older sessions
+1. **Most Recent Session**: The last entry of `recent_sessions` is the immediately prior session
+2. **Earlier Sessions**: Use `earlier_sessions` for where the patient started and long-run trends
 3. **Longitudinal Patterns**: Compare current session to trends across multiple sessions
 4. **Progress Tracking**: Compare current progress_indicators to previous sessions
 5. **Skill Development**: Track proficiency changes across sessions (beginner → developing → proficient)
@@ -412,7 +425,7 @@ Your task is to generate a deep clinical analysis with the following dimensions:
         Args:
             session_id: Session UUID
             session: Current session data
-            cumulative_context: Nested context from previous sessions
+            cumulative_context: Context from previous sessions
 
         Returns:
             Dictionary with all necessary context
@@ -436,12 +449,17 @@ Your task is to generate a deep clinical analysis with the following dimensions:
 
         # Detect speaker roles (Therapist/Client)
         speaker_roles = self._detect_speaker_roles(session.get("transcript", []))
+        fitted = self._fit_transcript(
+            session.get("transcript", []),
+            lambda segment: self._format_segment(segment, speaker_roles)
+        )
 
         return {
+            "transcript_window": fitted.report,
             "current_session": {
                 "session_id": session_id,
                 "date": session.get("session_date"),
-                "transcript": self._format_transcript(session.get("transcript", []), speaker_roles),
+                "transcript": fitted.text,
                 "mood_score": session.get("mood_score"),
                 "mood_indicators": session.get("mood_indicators", []),
                 "emotional_tone": session.get("emotional_tone"),
@@ -482,7 +500,8 @@ Your task is to generate a deep clinical analysis with the following dimensions:
         # Format cumulative context
         cumulative_context_str = "No cumulative context (this is the first analyzed session)."
         if cumulative:
-            cumulative_context_str = json.dumps(cumulative, indent=2)
+            # Single-line JSON: indentation only adds tokens
+            cumulative_context_str = json.dumps(cumulative, ensure_ascii=False)
 
         return f"""Analyze this therapy session and provide comprehensive patient-facing insights.
 
@@ -762,24 +781,19 @@ Return your analysis as JSON following the specified format. Be compassionate, s
         # Default mapping
         return {"SPEAKER_00": "Therapist", "SPEAKER_01": "Client"}
 
-    def _format_transcript(
+    def _format_segment(
         self,
-        segments: List[Dict[str, Any]],
+        segment: Dict[str, Any],
         speaker_roles: Dict[str, str]
-    ) -> str:
-        """Format transcript with role labels."""
-        formatted = []
-        for segment in segments:
-            speaker_id = segment.get("speaker") or segment.get("speaker_id", "UNKNOWN")
-            text = segment.get("text", "").strip()
-
-            if not text:
-                continue
-
-            role = speaker_roles.get(speaker_id, speaker_id)
-            formatted.append(f"{role}: {text}")
-
-        return "\n".join(formatted)
+    ) -> Optional[str]:
+        """Format one transcript segment with its role label."""
+        text = segment.get("text", "").strip()
+        if not text:
+            return None
+
+        speaker_id = segment.get("speaker") or segment.get("speaker_id", "UNKNOWN")
+        role = speaker_roles.get(speaker_id, speaker_id)
+        return f"{role}: {text}"
 
 
 # Convenience function
@@ -0,0 +1,370 @@
+"""
+Demo Seeding Pool - In-process runner for the demo seeding stages
+
+/api/demo/initialize, /reset and /resume used to spawn one Python
+subprocess per stage (seed_all_sessions.py, seed_wave1_analysis.py,
+seed_wave2_analysis.py). Each paid interpreter startup, fresh imports of
+openai/supabase/pydantic and new API clients, and reported progress only
+as stdout lines.
+
+The same scripts now expose async entry points, and this pool runs them
+inside the API process as tasks, so they share its warm imports, pooled
+OpenAI clients, async Supabase client and LLM rate limiter. Each stage
+reports structured SeedingProgress events instead of stdout.
+
+- A patient has at most one pipeline (a sequence of stages) at a time;
+  starting another while one is active returns the active one.
+- At most max_pipelines run at once; later ones wait for a slot.
+- A stage that fails or times out is logged and the pipeline moves on to
+  the next stage, as the subprocess chain did.
+- stop() cancels a pipeline. Cancellation lands at the stage's next await;
+  a blocking call already running in a thread (e.g. one roadmap
+  generation) finishes, but nothing after it runs.
+
+Stages share the API's event loop, so they must never block it: their LLM
+and database calls go through async clients, the sync roadmap, session
+bridge and transcript writes run in worker threads, and pipeline events
+(PipelineLogger.log_event) are queued for the logger's writer thread. A stage that blocked
+the loop would stall every request, and its timeout and stop() could not
+fire until the blocking call returned (scripts/benchmark_demo_seeding.py
+measures loop stalls and stop latency end to end).
+
+Usage:
+    pool = get_demo_seeding_pool()
+    pool.start(patient_id, (TRANSCRIPTS, WAVE1, WAVE2), on_progress=callback)
+    await pool.stop(patient_id)     # /api/demo/stop
+    pool.start(patient_id, (WAVE1, WAVE2), force=False)   # /api/demo/resume
+"""
+
+import asyncio
+import importlib
+import logging
+import sys
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = Path(__file__).parent.parent.parent / "scripts"
+
+# Stage names (also the names /api/demo/stop reports as terminated)
+TRANSCRIPTS = "transcript"
+WAVE1 = "wave1"
+WAVE2 = "wave2"
+
+# Same limits the subprocess chain used
+STAGE_TIMEOUTS: Dict[str, float] = {
+    TRANSCRIPTS: 300,
+    WAVE1: 600,
+    WAVE2: 900,
+}
+
+_STAGE_SCRIPTS: Dict[str, str] = {
+    TRANSCRIPTS: "seed_all_sessions",
+    WAVE1: "seed_wave1_analysis",
+    WAVE2: "seed_wave2_analysis",
+}
+
+
+# =============================================================================
+# Progress
+# =============================================================================
+
+@dataclass
+class SeedingProgress:
+    """One progress event of a seeding stage."""
+    patient_id: str
+    stage: str
+    status: str  # "started" | "progress" | "complete" | "failed" | "stopped"
+    completed: int = 0
+    total: int = 0
+    session_id: Optional[str] = None
+    session_date: Optional[str] = None
+    error: Optional[str] = None
+    at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+ProgressCallback = Callable[[SeedingProgress], None]
+StageReporter = Callable[..., None]
+StageFunc = Callable[..., Awaitable[Any]]  # (patient_id, report, **options)
+
+
+class SeedingStageError(Exception):
+    """A seeding stage finished but reported failure."""
+    pass
+
+
+# =============================================================================
+# Stages (the seeding scripts' async entry points)
+# =============================================================================
+
+def _load_script(name: str) -> ModuleType:
+    """Import a module from backend/scripts (they import each other by bare name)."""
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    return importlib.import_module(name)
+
+
+async def seed_transcripts(patient_id: str, report: StageReporter, **options: Any) -> None:
+    """Load the mock transcripts into the patient's sessions."""
+    module = _load_script(_STAGE_SCRIPTS[TRANSCRIPTS])
+    if await module.seed_all_sessions_async(patient_id, on_progress=report) != 0:
+        raise SeedingStageError("Some session transcripts could not be populated")
+
+
+async def run_wave1(patient_id: str, report: StageReporter, force: bool = True, **options: Any) -> None:
+    """Wave 1 for every session of the patient (force=False skips finished tasks)."""
+    module = _load_script(_STAGE_SCRIPTS[WAVE1])
+    await module.main(patient_id, force=force, on_progress=report)
+
+
+async def run_wave2(patient_id: str, report: StageReporter, **options: Any) -> None:
+    """Wave 2 DAG (deep analysis, prose, roadmap, bridge) for the patient."""
+    module = _load_script(_STAGE_SCRIPTS[WAVE2])
+    await module.main(patient_id, on_progress=report)
+
+
+DEFAULT_STAGES: Dict[str, StageFunc] = {
+    TRANSCRIPTS: seed_transcripts,
+    WAVE1: run_wave1,
+    WAVE2: run_wave2,
+}
+
+
+# =============================================================================
+# Pool
+# =============================================================================
+
+@dataclass
+class SeedingRun:
+    """One patient's pipeline: its stages run in order."""
+    patient_id: str
+    stages: Tuple[str, ...]
+    task: Optional[asyncio.Task] = None
+    current_stage: Optional[str] = None
+    completed_stages: List[str] = field(default_factory=list)
+    failed_stages: List[str] = field(default_factory=list)
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+
+class DemoSeedingPool:
+    """
+    Runs demo seeding pipelines as tasks in the API process.
+
+    Args:
+        max_pipelines: Max pipelines running at once (default DEMO_SEEDING_MAX_PIPELINES)
+        stages: Stage name -> async stage function (default: the seeding scripts)
+        timeouts: Stage name -> timeout in seconds (default STAGE_TIMEOUTS)
+    """
+
+    def __init__(
+        self,
+        max_pipelines: Optional[int] = None,
+        stages: Optional[Dict[str, StageFunc]] = None,
+        timeouts: Optional[Dict[str, float]] = None
+    ):
+        self.max_pipelines = max(1, max_pipelines or settings.demo_seeding_max_pipelines)
+        self.stages = dict(stages or DEFAULT_STAGES)
+        self.timeouts = {**STAGE_TIMEOUTS, **(timeouts or {})}
+        self._runs: Dict[str, SeedingRun] = {}
+        self._progress: Dict[str, Dict[str, SeedingProgress]] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def warm(self) -> None:
+        """Import the seeding scripts (and everything they import) ahead of the first demo."""
+        for stage in self.stages:
+            if stage in _STAGE_SCRIPTS:
+                _load_script(_STAGE_SCRIPTS[stage])
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    def start(
+        self,
+        patient_id: str,
+        stages: Sequence[str],
+        on_progress: Optional[ProgressCallback] = None,
+        **options: Any
+    ) -> SeedingRun:
+        """
+        Start a pipeline for a patient (returns immediately).
+
+        Args:
+            patient_id: Demo patient
+            stages: Stage names, run in order
+            on_progress: Called with every SeedingProgress of this pipeline
+            **options: Passed to every stage (e.g. force for Wave 1)
+
+        Returns:
+            The new run, or the patient's active run if one exists
+        """
+        unknown = [stage for stage in stages if stage not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown seeding stages: {unknown}")
+
+        active = self._runs.get(patient_id)
+        if active is not None and active.running:
+            logger.info(f"↩️ Seeding already running for patient {patient_id} ({active.current_stage})")
+            return active
+
+        run = SeedingRun(patient_id=patient_id, stages=tuple(stages))
+        run.task = asyncio.create_task(self._run(run, on_progress, options))
+        self._runs[patient_id] = run
+        return run
+
+    async def stop(self, patient_id: str, grace_seconds: float = 5.0) -> List[str]:
+        """
+        Cancel the patient's pipeline.
+
+        Returns:
+            Names of the stages that were cut off (empty if nothing was running)
+        """
+        run = self._runs.get(patient_id)
+        if run is None or not run.running:
+            return []
+
+        stopped = [run.current_stage or "queued"]
+        run.task.cancel()
+        _, pending = await asyncio.wait({run.task}, timeout=grace_seconds)
+        if pending:
+            logger.warning(f"Seeding for patient {patient_id} still unwinding after {grace_seconds}s")
+        return stopped
+
+    def is_running(self, patient_id: str) -> bool:
+        run = self._runs.get(patient_id)
+        return run is not None and run.running
+
+    def get_run(self, patient_id: str) -> Optional[SeedingRun]:
+        return self._runs.get(patient_id)
+
+    def progress(self, patient_id: str) -> Dict[str, Dict[str, Any]]:
+        """Latest progress event per stage for a patient."""
+        return {stage: event.to_dict() for stage, event in self._progress.get(patient_id, {}).items()}
+
+    async def shutdown(self, grace_seconds: float = 5.0) -> None:
+        """Cancel every running pipeline (on API shutdown)."""
+        await asyncio.gather(
+            *(self.stop(patient_id, grace_seconds) for patient_id in list(self._runs)),
+            return_exceptions=True
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        running = [run for run in self._runs.values() if run.running]
+        return {
+            "max_pipelines": self.max_pipelines,
+            "running": len(running),
+            "stages": {run.patient_id: run.current_stage for run in running},
+        }
+
+    # -------------------------------------------------------------------------
+    # Running
+    # -------------------------------------------------------------------------
+
+    async def _run(self, run: SeedingRun, on_progress: Optional[ProgressCallback], options: Dict[str, Any]) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pipelines)
+
+        try:
+            async with self._slots:
+                for index, stage in enumerate(run.stages, 1):
+                    run.current_stage = stage
+                    await self._run_stage(run, stage, f"{index}/{len(run.stages)}", on_progress, options)
+        except asyncio.CancelledError:
+            if run.current_stage:
+                self._emit(run, on_progress, SeedingProgress(run.patient_id, run.current_stage, "stopped"))
+            print(f"🛑 Seeding stopped for patient {run.patient_id}", flush=True)
+            logger.info(f"🛑 Seeding stopped for patient {run.patient_id} during {run.current_stage or 'queue wait'}")
+            raise
+        finally:
+            run.current_stage = None
+
+    async def _run_stage(
+        self,
+        run: SeedingRun,
+        stage: str,
+        step: str,
+        on_progress: Optional[ProgressCallback],
+        options: Dict[str, Any]
+    ) -> None:
+        patient_id = run.patient_id
+        latest = SeedingProgress(patient_id, stage, "started")
+        self._emit(run, on_progress, latest)
+        print(f"🚀 Step {step}: {stage} for patient {patient_id}", flush=True)
+        logger.info(f"🚀 Seeding step {step}: {stage} for patient {patient_id}")
+
+        def report(**fields: Any) -> None:
+            nonlocal latest
+            fields.pop("status", None)  # Per-session outcome; the stage is still in progress
+            latest = SeedingProgress(patient_id, stage, "progress", **fields)
+            self._emit(run, on_progress, latest)
+
+        try:
+            await asyncio.wait_for(
+                self.stages[stage](patient_id, report, **options),
+                timeout=self.timeouts.get(stage)
+            )
+        except asyncio.TimeoutError:
+            error = f"Timed out after {self.timeouts.get(stage)}s"
+        except Exception as e:
+            error = str(e)
+        else:
+            run.completed_stages.append(stage)
+            self._emit(run, on_progress, SeedingProgress(
+                patient_id, stage, "complete", completed=latest.completed, total=latest.total
+            ))
+            print(f"✅ Step {step} Complete: {stage}", flush=True)
+            logger.info(f"✅ Seeding {stage} complete for patient {patient_id}")
+            return
+
+        run.failed_stages.append(stage)
+        self._emit(run, on_progress, SeedingProgress(
+            patient_id, stage, "failed", completed=latest.completed, total=latest.total, error=error
+        ))
+        print(f"❌ Step {step} Failed: {stage}: {error}", flush=True)
+        logger.error(f"❌ Seeding {stage} failed for patient {patient_id}: {error}")
+
+    def _emit(self, run: SeedingRun, on_progress: Optional[ProgressCallback], event: SeedingProgress) -> None:
+        self._progress.setdefault(run.patient_id, {})[event.stage] = event
+        if on_progress is None:
+            return
+        try:
+            on_progress(event)
+        except Exception as e:
+            logger.warning(f"Seeding progress callback failed: {e}")
+
+
+# Global pool instance
+_demo_seeding_pool: Optional[DemoSeedingPool] = None
+_demo_seeding_pool_lock = threading.Lock()
+
+
+def get_demo_seeding_pool() -> DemoSeedingPool:
+    """Get the process-wide demo seeding pool (singleton pattern)."""
+    global _demo_seeding_pool
+
+    if _demo_seeding_pool is None:
+        with _demo_seeding_pool_lock:
+            if _demo_seeding_pool is None:
+                _demo_seeding_pool = DemoSeedingPool()
+
+    return _demo_seeding_pool
+
+
+def set_demo_seeding_pool(pool: Optional[DemoSeedingPool]) -> None:
+    """Replace the process-wide pool (useful for testing)."""
+    global _demo_seeding_pool
+    with _demo_seeding_pool_lock:
+        _demo_seeding_pool = pool
@@ -0,0 +1,601 @@
+"""
+Job Queue - Durable work queue for analysis pipelines
+
+Analysis runs used to be launched with FastAPI BackgroundTasks or a bare
+asyncio.create_task inside the API process. They competed with request
+handling on the same event loop, were lost on restart, and could not be
+spread across machines. They are now jobs in a durable queue, consumed by
+JobWorker processes (scripts/run_job_worker.py, or the API's embedded
+worker; see app/services/job_worker.py).
+
+Semantics:
+- Idempotent keys: one job per key, "<session_id>:<wave>" (job_key()).
+  Enqueueing a key that is already queued or running returns that job
+  instead of adding a duplicate. A finished key is queued again.
+- Visibility timeout: claim() leases a job to one worker for
+  visibility_timeout seconds. The worker heartbeats to extend the lease;
+  if the worker dies, the lease expires and the job is delivered to
+  another worker.
+- Retries: a failed attempt is retried with backoff until max_attempts,
+  then the job is marked failed. An expired lease counts as an attempt.
+- Resumable state: handlers checkpoint progress into job.state, which the
+  next delivery of the job sees.
+
+Backends:
+- sqlite: on-disk stand-in shared by every process on the host (default)
+- redis:  Redis at CELERY_BROKER_URL, shared across hosts (add workers on
+          any machine to scale out)
+
+Usage:
+    queue = get_job_queue()
+    job, created = queue.enqueue("full_pipeline", job_key(session_id, "full_pipeline"), {"session_id": session_id})
+
+    job = queue.claim("worker-1", kinds=["full_pipeline"])
+    queue.heartbeat(job.key, "worker-1")
+    queue.complete(job.key, "worker-1")
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.services.llm_rate_limiter import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+def job_key(session_id: str, wave: str) -> str:
+    """Idempotency key for a (session, wave) job."""
+    return f"{session_id}:{wave}"
+
+
+@dataclass
+class Job:
+    """A unit of work. Timestamps are epoch seconds."""
+    key: str
+    kind: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    status: str = QUEUED
+    attempts: int = 0
+    max_attempts: int = 3
+    available_at: float = 0.0
+    lease_expires_at: Optional[float] = None
+    worker_id: Optional[str] = None
+    state: Dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# =============================================================================
+# Queue Interface
+# =============================================================================
+
+class JobQueue(ABC):
+    """
+    Durable job queue. All methods are synchronous and safe to call from
+    any thread; async callers should use asyncio.to_thread().
+
+    Args:
+        visibility_timeout: Seconds a claimed job stays leased without a heartbeat
+        max_attempts: Default deliveries per job before it is marked failed
+    """
+
+    name = "abstract"
+
+    def __init__(self, visibility_timeout: float = 120.0, max_attempts: int = 3):
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def enqueue(
+        self,
+        kind: str,
+        key: str,
+        payload: Optional[Dict[str, Any]] = None,
+        max_attempts: Optional[int] = None
+    ) -> Tuple[Job, bool]:
+        """
+        Add a job unless one with this key is already queued or running.
+
+        Returns:
+            (job, created): created is False when an active job already existed
+        """
+        pass
+
+    @abstractmethod
+    def claim(self, worker_id: str, kinds: Sequence[str]) -> Optional[Job]:
+        """Lease the next available job of one of these kinds (or None)."""
+        pass
+
+    @abstractmethod
+    def heartbeat(self, key: str, worker_id: str) -> bool:
+        """Extend a lease. False if the worker no longer holds the job."""
+        pass
+
+    @abstractmethod
+    def checkpoint(self, key: str, worker_id: str, state: Dict[str, Any]) -> bool:
+        """Save resumable state for the job. False if the lease was lost."""
+        pass
+
+    @abstractmethod
+    def complete(self, key: str, worker_id: str, result: Any = None) -> bool:
+        """Mark the job completed. False if the lease was lost."""
+        pass
+
+    @abstractmethod
+    def fail(self, key: str, worker_id: str, error: str) -> Optional[Job]:
+        """Record a failed attempt: requeue with backoff, or mark failed when out of attempts."""
+        pass
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Job]:
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Job counts by status."""
+        pass
+
+
+# =============================================================================
+# SQLite Backend
+# =============================================================================
+
+_JOB_COLUMNS = (
+    "key", "kind", "payload", "status", "attempts", "max_attempts", "available_at",
+    "lease_expires_at", "worker_id", "state", "result", "error", "created_at", "updated_at",
+)
+_JSON_COLUMNS = ("payload", "state", "result")
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    On-disk queue shared by every process on the host.
+
+    claim() runs in a BEGIN IMMEDIATE transaction, so concurrent workers
+    (threads or processes) never lease the same job twice.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Path, visibility_timeout: float = 120.0, max_attempts: int = 3):
+        super().__init__(visibility_timeout, max_attempts)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_expires_at REAL,
+                worker_id TEXT,
+                state TEXT NOT NULL DEFAULT '{}',
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_available ON jobs (status, available_at)")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Serialize with other threads here and with other processes via BEGIN IMMEDIATE."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        data = {column: row[column] for column in _JOB_COLUMNS}
+        for column in _JSON_COLUMNS:
+            data[column] = json.loads(data[column]) if data[column] is not None else None
+        data["state"] = data["state"] or {}
+        return Job(**data)
+
+    def _select(self, conn: sqlite3.Connection, key: str) -> Optional[Job]:
+        row = conn.execute("SELECT * FROM jobs WHERE key = ?", (key,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def enqueue(self, kind, key, payload=None, max_attempts=None):
+        now = time.time()
+        with self._transaction() as conn:
+            existing = self._select(conn, key)
+            if existing and existing.status in ACTIVE_STATUSES:
+                return existing, False
+
+            job = Job(
+                key=key, kind=kind, payload=payload or {}, max_attempts=max_attempts or self.max_attempts,
+                available_at=now, created_at=now, updated_at=now,
+            )
+            conn.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(_JOB_COLUMNS)}) VALUES ({', '.join('?' * len(_JOB_COLUMNS))})",
+                tuple(
+                    json.dumps(getattr(job, column)) if column in _JSON_COLUMNS else getattr(job, column)
+                    for column in _JOB_COLUMNS
+                ),
+            )
+            return job, True
+
+    def claim(self, worker_id, kinds):
+        if not kinds:
+            return None
+        kind_filter = ", ".join("?" * len(kinds))
+
+        with self._transaction() as conn:
+            while True:
+                now = time.time()
+                row = conn.execute(
+                    f"""
+                    SELECT * FROM jobs
+                    WHERE kind IN ({kind_filter}) AND (
+                        (status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at <= ?)
+                    )
+                    ORDER BY available_at LIMIT 1
+                    """,
+                    (*kinds, QUEUED, now, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    return None
+
+                job = self._to_job(row)
+                if job.status == RUNNING and job.attempts >= job.max_attempts:
+                    # Lease expired on the last attempt (worker died mid-job)
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, error = ?, lease_expires_at = NULL, updated_at = ? WHERE key = ?",
+                        (FAILED, f"Lease expired after {job.attempts} attempts", now, job.key),
+                    )
+                    continue
+
+                if job.status == RUNNING:
+                    logger.warning(f"Job {job.key} lease expired (worker {job.worker_id}), redelivering")
+
+                lease = now + self.visibility_timeout
+                conn.execute(
+                    """
+                    UPDATE jobs SET status = ?, worker_id = ?, lease_expires_at = ?,
+                        attempts = attempts + 1, updated_at = ?
+                    WHERE key = ?
+                    """,
+                    (RUNNING, worker_id, lease, now, job.key),
+                )
+                job.status, job.worker_id, job.lease_expires_at = RUNNING, worker_id, lease
+                job.attempts += 1
+                return job
+
+    def _update_leased(self, key: str, worker_id: str, assignments: str, params: Tuple[Any, ...]) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE key = ? AND worker_id = ? AND status = ?",
+                (*params, time.time(), key, worker_id, RUNNING),
+            )
+            return cursor.rowcount == 1
+
+    def heartbeat(self, key, worker_id):
+        return self._update_leased(key, worker_id, "lease_expires_at = ?", (time.time() + self.visibility_timeout,))
+
+    def checkpoint(self, key, worker_id, state):
+        return self._update_leased(key, worker_id, "state = ?", (json.dumps(state),))
+
+    def complete(self, key, worker_id, result=None):
+        return self._update_leased(
+            key, worker_id, "status = ?, result = ?, error = NULL, lease_expires_at = NULL",
+            (COMPLETED, json.dumps(result, default=str)),
+        )
+
+    def fail(self, key, worker_id, error):
+        with self._transaction() as conn:
+            job = self._select(conn, key)
+            if job is None or job.worker_id != worker_id or job.status != RUNNING:
+                return None
+
+            now = time.time()
+            if job.attempts < job.max_attempts:
+                job.status, job.available_at = QUEUED, now + backoff_delay(job.attempts)
+            else:
+                job.status = FAILED
+            job.error, job.lease_expires_at = error, None
+            conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, error = ?, lease_expires_at = NULL, updated_at = ? "
+                "WHERE key = ?",
+                (job.status, job.available_at, error, now, key),
+            )
+            return job
+
+    def get(self, key):
+        with self._lock:
+            return self._select(self._conn, key)
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+# =============================================================================
+# Redis Backend
+# =============================================================================
+
+# Enqueue unless an active job with the key exists.
+# KEYS: job hash, ready zset for the kind. ARGV: key, job JSON fields..., now
+_REDIS_ENQUEUE = """
+local status = redis.call('HGET', KEYS[1], 'status')
+if status == 'queued' or status == 'running' then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('ZADD', KEYS[2], tonumber(ARGV[1]), redis.call('HGET', KEYS[1], 'key'))
+return 1
+"""
+
+# Requeue expired leases, then lease the oldest ready job of the given kinds.
+# KEYS: leases zset, ready zsets... ARGV: now, lease_until, worker_id, prefix
+_REDIS_CLAIM = """
+local now = tonumber(ARGV[1])
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, 100)
+for _, key in ipairs(expired) do
+    redis.call('ZREM', KEYS[1], key)
+    local job = ARGV[4] .. 'job:' .. key
+    if tonumber(redis.call('HGET', job, 'attempts')) >= tonumber(redis.call('HGET', job, 'max_attempts')) then
+        redis.call('HSET', job, 'status', 'failed', 'error', 'Lease expired', 'lease_expires_at', '', 'updated_at', now)
+    else
+        redis.call('HSET', job, 'status', 'queued', 'updated_at', now)
+        redis.call('ZADD', ARGV[4] .. 'ready:' .. redis.call('HGET', job, 'kind'), now, key)
+    end
+end
+
+local best_key, best_set, best_score = nil, nil, nil
+for i = 2, #KEYS do
+    local head = redis.call('ZRANGEBYSCORE', KEYS[i], '-inf', now, 'WITHSCORES', 'LIMIT', 0, 1)
+    if #head > 0 and (best_score == nil or tonumber(head[2]) < best_score) then
+        best_key, best_set, best_score = head[1], KEYS[i], tonumber(head[2])
+    end
+end
+if best_key == nil then
+    return nil
+end
+
+local job = ARGV[4] .. 'job:' .. best_key
+redis.call('ZREM', best_set, best_key)
+redis.call('ZADD', KEYS[1], tonumber(ARGV[2]), best_key)
+redis.call('HINCRBY', job, 'attempts', 1)
+redis.call('HSET', job, 'status', 'running', 'worker_id', ARGV[3], 'lease_expires_at', ARGV[2], 'updated_at', now)
+return best_key
+"""
+
+# Apply field updates if the worker still holds the lease.
+# KEYS: job hash, leases zset. ARGV: worker_id, lease score ('' = drop lease), key, field/value pairs...
+_REDIS_UPDATE_LEASED = """
+if redis.call('HGET', KEYS[1], 'status') ~= 'running' or redis.call('HGET', KEYS[1], 'worker_id') ~= ARGV[1] then
+    return 0
+end
+if ARGV[2] == '' then
+    redis.call('ZREM', KEYS[2], ARGV[3])
+else
+    redis.call('ZADD', KEYS[2], tonumber(ARGV[2]), ARGV[3])
+end
+if #ARGV > 3 then
+    redis.call('HSET', KEYS[1], unpack(ARGV, 4))
+end
+return 1
+"""
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Queue in Redis, shared by workers on any host.
+
+    Each job is a hash; ready jobs sit in one sorted set per kind (scored by
+    available_at) and leased jobs in a sorted set scored by lease expiry.
+    Claims, enqueues and lease updates are Lua scripts, so they are atomic.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, visibility_timeout: float = 120.0, max_attempts: int = 3, prefix: str = "jobq:"):
+        import redis
+
+        super().__init__(visibility_timeout, max_attempts)
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._enqueue = self._redis.register_script(_REDIS_ENQUEUE)
+        self._claim = self._redis.register_script(_REDIS_CLAIM)
+        self._update_leased_script = self._redis.register_script(_REDIS_UPDATE_LEASED)
+
+    def _job_key(self, key: str) -> str:
+        return f"{self.prefix}job:{key}"
+
+    def _ready_key(self, kind: str) -> str:
+        return f"{self.prefix}ready:{kind}"
+
+    @property
+    def _leases_key(self) -> str:
+        return f"{self.prefix}leases"
+
+    @staticmethod
+    def _encode(job: Job) -> List[Any]:
+        fields: List[Any] = []
+        for name, value in job.to_dict().items():
+            if name in _JSON_COLUMNS:
+                value = json.dumps(value, default=str)
+            fields += [name, "" if value is None else value]
+        return fields
+
+    @staticmethod
+    def _decode(data: Dict[str, str]) -> Job:
+        def number(name, cast=float):
+            return cast(data[name]) if data.get(name) not in (None, "") else None
+
+        return Job(
+            key=data["key"],
+            kind=data["kind"],
+            payload=json.loads(data.get("payload") or "{}"),
+            status=data["status"],
+            attempts=number("attempts", int) or 0,
+            max_attempts=number("max_attempts", int) or 1,
+            available_at=number("available_at") or 0.0,
+            lease_expires_at=number("lease_expires_at"),
+            worker_id=data.get("worker_id") or None,
+            state=json.loads(data.get("state") or "{}"),
+            result=json.loads(data["result"]) if data.get("result") else None,
+            error=data.get("error") or None,
+            created_at=number("created_at") or 0.0,
+            updated_at=number("updated_at") or 0.0,
+        )
+
+    def enqueue(self, kind, key, payload=None, max_attempts=None):
+        now = time.time()
+        job = Job(
+            key=key, kind=kind, payload=payload or {}, max_attempts=max_attempts or self.max_attempts,
+            available_at=now, created_at=now, updated_at=now,
+        )
+        created = self._enqueue(keys=[self._job_key(key), self._ready_key(kind)], args=[now, *self._encode(job)])
+        return (job, True) if created else (self.get(key), False)
+
+    def claim(self, worker_id, kinds):
+        if not kinds:
+            return None
+        now = time.time()
+        key = self._claim(
+            keys=[self._leases_key, *(self._ready_key(kind) for kind in kinds)],
+            args=[now, now + self.visibility_timeout, worker_id, self.prefix],
+        )
+        return self.get(key) if key else None
+
+    def _update_leased(self, key: str, worker_id: str, lease: Optional[float], **fields: Any) -> bool:
+        pairs: List[Any] = []
+        for name, value in fields.items():
+            pairs += [name, "" if value is None else value]
+        pairs += ["updated_at", time.time()]
+        return bool(self._update_leased_script(
+            keys=[self._job_key(key), self._leases_key],
+            args=[worker_id, "" if lease is None else lease, key, *pairs],
+        ))
+
+    def heartbeat(self, key, worker_id):
+        lease = time.time() + self.visibility_timeout
+        return self._update_leased(key, worker_id, lease, lease_expires_at=lease)
+
+    def checkpoint(self, key, worker_id, state):
+        job = self.get(key)
+        lease = job.lease_expires_at if job else None
+        return self._update_leased(key, worker_id, lease, state=json.dumps(state))
+
+    def complete(self, key, worker_id, result=None):
+        return self._update_leased(
+            key, worker_id, None,
+            status=COMPLETED, result=json.dumps(result, default=str), error="", lease_expires_at="",
+        )
+
+    def fail(self, key, worker_id, error):
+        job = self.get(key)
+        if job is None or job.worker_id != worker_id or job.status != RUNNING:
+            return None
+
+        retry = job.attempts < job.max_attempts
+        available_at = time.time() + backoff_delay(job.attempts) if retry else job.available_at
+        status = QUEUED if retry else FAILED
+        if not self._update_leased(
+            key, worker_id, None,
+            status=status, error=error, available_at=available_at, lease_expires_at="",
+        ):
+            return None
+        if retry:
+            self._redis.zadd(self._ready_key(job.kind), {key: available_at})
+
+        job.status, job.error, job.available_at, job.lease_expires_at = status, error, available_at, None
+        return job
+
+    def get(self, key):
+        data = self._redis.hgetall(self._job_key(key))
+        return self._decode(data) if data else None
+
+    def stats(self):
+        counts: Dict[str, int] = {}
+        for job_hash in self._redis.scan_iter(match=f"{self.prefix}job:*"):
+            status = self._redis.hget(job_hash, "status")
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+
+# =============================================================================
+# Global Instance
+# =============================================================================
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def _create_queue_from_settings() -> JobQueue:
+    backend = settings.job_queue_backend.lower()
+    options = {
+        "visibility_timeout": settings.job_queue_visibility_timeout_seconds,
+        "max_attempts": settings.job_queue_max_attempts,
+    }
+
+    if backend == "redis":
+        return RedisJobQueue(settings.celery_broker_url, **options)
+
+    if backend != "sqlite":
+        logger.warning(f"Unknown JOB_QUEUE_BACKEND '{backend}', using sqlite")
+    path = Path(settings.job_queue_path)
+    if not path.is_absolute():
+        path = Path(__file__).parent.parent.parent / path
+    return SQLiteJobQueue(path, **options)
+
+
+def get_job_queue() -> JobQueue:
+    """Get the process-wide job queue (singleton pattern)."""
+    global _job_queue
+
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = _create_queue_from_settings()
+                logger.info(f"Job queue initialized ({_job_queue.name} backend)")
+
+    return _job_queue
+
+
+def set_job_queue(queue: Optional[JobQueue]) -> None:
+    """Replace the process-wide queue (useful for testing)."""
+    global _job_queue
+    with _job_queue_lock:
+        _job_queue = queue
@@ -0,0 +1,330 @@
+"""
+Job Worker - Consumes the durable job queue
+
+Claims jobs of the kinds it has handlers for and runs up to `concurrency`
+of them at once. While a handler runs, a heartbeat keeps the job's lease
+alive. A job whose handler raises is retried by the queue (with backoff)
+until it runs out of attempts. If a heartbeat finds the lease was lost (the
+job outlived its visibility timeout and was redelivered), the handler is
+cancelled so two workers never keep running the same job.
+
+Heartbeats run on a thread per job, not on the worker's event loop: a
+handler that blocks the loop (a sync client call, CPU-heavy parsing) must
+not starve them, or the lease expires after the visibility timeout and the
+job runs twice.
+
+Throughput scales by running more workers against the same queue:
+    python scripts/run_job_worker.py --concurrency 4
+
+Schedules are periodic coroutines every worker runs from its claim loop
+(at start, then every interval), e.g. queueing a sweep job. They should be
+idempotent across workers: several workers run the same schedule.
+
+With JOB_WORKER_EMBEDDED=true (the default) the API process also runs one
+worker, on its own event loop in a background thread (start_thread()), so
+jobs never share the loop that serves requests.
+
+Usage:
+    worker = JobWorker(handlers={"full_pipeline": handle_full_pipeline},
+                       schedules=[(3600, queue_nightly_sweep)])
+    await worker.run()              # until stop()
+    await worker.run_until_idle()   # drain what is claimable now
+
+    worker.start_thread()           # embedded: run() on a loop of its own
+    await worker.stop_thread()
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from uuid import uuid4
+
+from app.config import settings
+from app.database import close_async_supabase
+from app.services.job_queue import FAILED, Job, JobQueue, get_job_queue
+from app.services.openai_client_registry import get_client_registry
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(Exception):
+    """The worker no longer holds the job (it was redelivered elsewhere)."""
+    pass
+
+
+@dataclass
+class JobContext:
+    """What a handler gets: the job, plus checkpointing of resumable state."""
+    job: Job
+    queue: JobQueue
+    worker_id: str
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        return self.job.payload
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        """State checkpointed by earlier attempts of this job (empty on first delivery)."""
+        return self.job.state
+
+    async def checkpoint(self, **state: Any) -> None:
+        """Merge into the job's state and persist it for the next delivery."""
+        self.job.state.update(state)
+        if not await asyncio.to_thread(self.queue.checkpoint, self.job.key, self.worker_id, self.job.state):
+            raise LeaseLost(self.job.key)
+
+
+JobHandler = Callable[[JobContext], Awaitable[Any]]
+
+
+class JobWorker:
+    """
+    Runs queued jobs with bounded concurrency.
+
+    Args:
+        handlers: Job kind -> async handler(JobContext); its return value is
+            stored as the job result
+        queue: Job queue. If None, uses get_job_queue()
+        concurrency: Max jobs in flight (default JOB_WORKER_CONCURRENCY)
+        poll_interval: Seconds between claims when the queue is empty
+        worker_id: Lease owner id (default host-pid-random)
+        schedules: (interval_seconds, async fn()) pairs run() calls at start
+            and then every interval (not run by run_until_idle)
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, JobHandler],
+        queue: Optional[JobQueue] = None,
+        concurrency: Optional[int] = None,
+        poll_interval: float = 1.0,
+        worker_id: Optional[str] = None,
+        schedules: Optional[Sequence[Tuple[float, Callable[[], Awaitable[Any]]]]] = None
+    ):
+        self.handlers = dict(handlers)
+        self.queue = queue or get_job_queue()
+        self.concurrency = concurrency or settings.job_worker_concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
+        self.completed = 0
+        self.failed = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = False
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_requested: Optional[asyncio.Event] = None
+        self.schedules = list(schedules or [])
+        self._next_runs: List[float] = []
+
+    # =========================================================================
+    # Running
+    # =========================================================================
+
+    async def run(self) -> None:
+        """Claim and run jobs until stop() is called."""
+        self._stopping = False
+        self._wake = asyncio.Event()
+        logger.info(
+            f"👷 Job worker {self.worker_id} started ({self.queue.name} queue, "
+            f"concurrency {self.concurrency}, kinds {sorted(self.handlers)})"
+        )
+        self._next_runs = [0.0] * len(self.schedules)
+
+        while not self._stopping:
+            await self._run_due_schedules()
+            try:
+                if await self._claim_next():
+                    continue
+            except Exception as e:
+                logger.error(f"Job worker {self.worker_id} failed to claim: {e}")
+
+            # Nothing claimable or no free slot: wait for a slot, stop(), or the next poll
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def run_until_idle(self) -> None:
+        """Run jobs until none are claimable and none are in flight."""
+        while True:
+            if await self._claim_next():
+                continue
+            if not self._tasks:
+                return
+            await asyncio.wait(set(self._tasks), return_when=asyncio.FIRST_COMPLETED)
+
+    async def stop(self, grace_seconds: float = 30.0) -> None:
+        """
+        Stop claiming and wait for in-flight jobs.
+
+        Jobs still running after the grace period are cancelled; their leases
+        expire and the queue redelivers them (handlers resume from their state).
+        """
+        self._stopping = True
+        if self._wake is not None:
+            self._wake.set()
+        if not self._tasks:
+            return
+
+        _, pending = await asyncio.wait(set(self._tasks), timeout=grace_seconds)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Job worker {self.worker_id} cancelled {len(pending)} in-flight jobs on shutdown")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def start_thread(self, grace_seconds: float = 30.0) -> threading.Thread:
+        """
+        Run the worker on its own event loop in a daemon thread.
+
+        Handlers then never share the caller's loop (the API's), so a slow or
+        blocking job can't stall requests. stop_thread() stops it with
+        grace_seconds for in-flight jobs; the loop's async clients are closed
+        when it ends.
+        """
+        started = threading.Event()
+
+        async def main() -> None:
+            self._loop = asyncio.get_running_loop()
+            stop_requested = self._stop_requested = asyncio.Event()
+            started.set()
+            runner = asyncio.create_task(self.run())
+            try:
+                await stop_requested.wait()
+                await self.stop(grace_seconds)
+                await runner
+            finally:
+                await get_client_registry().aclose_loop_clients()
+                await close_async_supabase()
+
+        self._thread = threading.Thread(target=asyncio.run, args=(main(),), name="job-worker", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self._thread
+
+    async def stop_thread(self) -> None:
+        """Stop a worker started with start_thread() and wait for its thread to exit."""
+        if self._thread is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._stop_requested.set)
+        except RuntimeError:
+            pass  # Loop already closed
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "in_flight": len(self._tasks),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    async def _run_due_schedules(self) -> None:
+        """Call each schedule whose interval has elapsed (failures are logged, retried next interval)."""
+        now = asyncio.get_running_loop().time()
+        for index, (interval, schedule) in enumerate(self.schedules):
+            if now < self._next_runs[index]:
+                continue
+            self._next_runs[index] = now + interval
+            try:
+                await schedule()
+            except Exception as e:
+                logger.error(f"Job worker {self.worker_id} schedule {getattr(schedule, '__name__', schedule)} failed: {e}")
+
+    async def _claim_next(self) -> bool:
+        """Claim one job into a free slot. False if no slot or no job."""
+        if len(self._tasks) >= self.concurrency:
+            return False
+
+        job = await asyncio.to_thread(self.queue.claim, self.worker_id, list(self.handlers))
+        if job is None:
+            return False
+
+        task = asyncio.create_task(self._process(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+        return True
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if self._wake is not None:
+            self._wake.set()
+
+    # =========================================================================
+    # One Job
+    # =========================================================================
+
+    async def _process(self, job: Job) -> None:
+        logger.info(f"▶️ Job {job.key} ({job.kind}) attempt {job.attempts}/{job.max_attempts}")
+        lease_lost = threading.Event()
+        finished = threading.Event()
+        handler_task = asyncio.create_task(self.handlers[job.kind](JobContext(job, self.queue, self.worker_id)))
+        heartbeat = threading.Thread(
+            target=self._heartbeat,
+            args=(job, asyncio.get_running_loop(), handler_task, lease_lost, finished),
+            name=f"job-heartbeat-{job.key}",
+            daemon=True
+        )
+        heartbeat.start()
+
+        try:
+            result = await handler_task
+        except asyncio.CancelledError:
+            if lease_lost.is_set():
+                logger.warning(f"Job {job.key} lease lost; abandoned to its new owner")
+                return
+            handler_task.cancel()
+            raise
+        except LeaseLost:
+            logger.warning(f"Job {job.key} lease lost; abandoned to its new owner")
+            return
+        except Exception as e:
+            updated = await asyncio.to_thread(self.queue.fail, job.key, self.worker_id, str(e))
+            self.failed += 1
+            if updated is not None and updated.status == FAILED:
+                logger.error(f"❌ Job {job.key} failed after {updated.attempts} attempts: {e}")
+            else:
+                logger.warning(f"⚠️ Job {job.key} attempt {job.attempts} failed, will retry: {e}")
+            return
+        finally:
+            finished.set()
+
+        if await asyncio.to_thread(self.queue.complete, job.key, self.worker_id, result):
+            self.completed += 1
+            logger.info(f"✅ Job {job.key} complete")
+        else:
+            logger.warning(f"Job {job.key} finished after its lease was lost; result discarded")
+
+    def _heartbeat(
+        self,
+        job: Job,
+        loop: asyncio.AbstractEventLoop,
+        handler_task: asyncio.Task,
+        lease_lost: threading.Event,
+        finished: threading.Event
+    ) -> None:
+        """Extend the lease until the job finishes (runs on its own thread, so a blocked loop can't starve it)."""
+        interval = max(self.queue.visibility_timeout / 3, 0.01)
+        while not finished.wait(interval):
+            try:
+                held = self.queue.heartbeat(job.key, self.worker_id)
+            except Exception as e:
+                # Transient queue error: the lease is still valid until it expires
+                logger.warning(f"Heartbeat for job {job.key} failed: {e}")
+                continue
+            if not held:
+                lease_lost.set()
+                try:
+                    loop.call_soon_threadsafe(handler_task.cancel)
+                except RuntimeError:
+                    pass  # Loop already closed
+                return
@@ -0,0 +1,274 @@
+"""
+Journey Compactor - Incremental hierarchical context for "Your Journey" roadmaps
+
+The hierarchical roadmap strategy used to rebuild its tiers on every
+generation by reading every previous session, so prompt size and database
+reads grew with session count. JourneyCompactor keeps the tiers in
+patient_journey_tiers (one row per patient) and folds each new session in:
+
+- Tier 1: uncompacted sessions with full insights (the newest TIER1_RECENT
+  are always kept here)
+- Tier 2: one paragraph per closed window of TIER1_WINDOW sessions
+- Tier 3: bounded journey arc built from closed windows of TIER2_WINDOW
+  Tier 2 paragraphs
+
+Each new session only compacts the window it closes, and building the
+prompt context is one row read. A patient without a row (sessions analyzed
+before the table existed) is backfilled once from their session history.
+
+Usage:
+    compactor = JourneyCompactor(supabase)
+    tiers = compactor.add_session(patient_id, session_id, session_date, insights)
+    context = tiers.to_context(exclude_session_id=session_id, previous_roadmap=roadmap)
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.services.roadmap_generator import RoadmapGenerator
+
+logger = logging.getLogger(__name__)
+
+# Newest sessions always kept with full insights
+TIER1_RECENT = 3
+# Sessions per Tier 2 paragraph
+TIER1_WINDOW = 5
+# Tier 2 paragraphs always kept as-is
+TIER2_RECENT = 2
+# Tier 2 paragraphs folded into the Tier 3 arc at a time
+TIER2_WINDOW = 2
+
+
+def extract_insights_from_deep_analysis(deep_analysis: dict, max_insights: int = 5) -> list[str]:
+    """Extract key insights from deep_analysis structure (used when backfilling)."""
+    insights = []
+
+    if "breakthrough_patterns" in deep_analysis:
+        insights.extend(deep_analysis["breakthrough_patterns"][:2])
+    if "themes" in deep_analysis:
+        insights.extend([theme["description"] for theme in deep_analysis.get("themes", [])[:2]])
+
+    return insights[:max_insights]
+
+
+def _session_label(entry: Dict[str, Any]) -> str:
+    date = (entry.get("session_date") or "")[:10]
+    return f"Session {entry['number']} ({date})" if date else f"Session {entry['number']}"
+
+
+def _range_label(first: int, last: int) -> str:
+    return f"Sessions {first}-{last}" if first != last else f"Session {first}"
+
+
+@dataclass
+class JourneyTiers:
+    """Stored tier 1/2/3 context for one patient (a patient_journey_tiers row)."""
+    tier1: List[Dict[str, Any]] = field(default_factory=list)
+    tier2: List[Dict[str, Any]] = field(default_factory=list)
+    tier3: Optional[Dict[str, Any]] = None
+    sessions_folded: int = 0
+    last_session_id: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "JourneyTiers":
+        return cls(
+            tier1=row.get("tier1") or [],
+            tier2=row.get("tier2") or [],
+            tier3=row.get("tier3"),
+            sessions_folded=row.get("sessions_folded") or 0,
+            last_session_id=row.get("last_session_id"),
+        )
+
+    def to_row(self, patient_id: str) -> Dict[str, Any]:
+        return {
+            "patient_id": patient_id,
+            "tier1": self.tier1,
+            "tier2": self.tier2,
+            "tier3": self.tier3,
+            "sessions_folded": self.sessions_folded,
+            "last_session_id": self.last_session_id,
+            "updated_at": datetime.now().isoformat(),
+        }
+
+    def fold(self, session_id: str, session_date: Optional[str], insights: List[str]) -> List[str]:
+        """
+        Add a session to Tier 1 and compact any window it closes.
+
+        Re-folding a session still in Tier 1 replaces its insights; one that
+        has already been compacted is ignored.
+
+        Returns:
+            Compactions performed ("tier1_to_tier2", "tier2_to_tier3")
+        """
+        for entry in self.tier1:
+            if entry["session_id"] == session_id:
+                entry["insights"] = list(insights)
+                return []
+        if any(session_id in summary["session_ids"] for summary in self.tier2):
+            return []
+        if self.tier3 and session_id in self.tier3.get("session_ids", []):
+            return []
+
+        self.sessions_folded += 1
+        self.last_session_id = session_id
+        self.tier1.append({
+            "number": self.sessions_folded,
+            "session_id": session_id,
+            "session_date": session_date,
+            "insights": list(insights),
+        })
+
+        compactions = []
+        if len(self.tier1) >= TIER1_RECENT + TIER1_WINDOW:
+            self._compact_tier1()
+            compactions.append("tier1_to_tier2")
+        if len(self.tier2) >= TIER2_RECENT + TIER2_WINDOW:
+            self._compact_tier2()
+            compactions.append("tier2_to_tier3")
+        return compactions
+
+    def _compact_tier1(self) -> None:
+        window, self.tier1 = self.tier1[:TIER1_WINDOW], self.tier1[TIER1_WINDOW:]
+        summary = RoadmapGenerator.compact_tier1_to_tier2(
+            {_session_label(entry): entry["insights"] for entry in window}
+        )
+        self.tier2.append({
+            "first": window[0]["number"],
+            "last": window[-1]["number"],
+            "session_ids": [entry["session_id"] for entry in window],
+            "first_date": window[0].get("session_date"),
+            "last_date": window[-1].get("session_date"),
+            "summary": summary,
+        })
+
+    def _compact_tier2(self) -> None:
+        window, self.tier2 = self.tier2[:TIER2_WINDOW], self.tier2[TIER2_WINDOW:]
+        previous = self.tier3 or {}
+        self.tier3 = {
+            "first": previous.get("first", window[0]["first"]),
+            "last": window[-1]["last"],
+            "session_ids": previous.get("session_ids", []) + [
+                session_id for summary in window for session_id in summary["session_ids"]
+            ],
+            "summary": RoadmapGenerator.compact_tier2_to_tier3(
+                [summary["summary"] for summary in window],
+                previous_arc=previous.get("summary"),
+            ),
+        }
+
+    def counts(self) -> Dict[str, Any]:
+        return {
+            "tier1": len(self.tier1),
+            "tier2": len(self.tier2),
+            "tier3": self.tier3 is not None,
+            "sessions_folded": self.sessions_folded,
+        }
+
+    def to_context(
+        self,
+        exclude_session_id: Optional[str] = None,
+        previous_roadmap: Optional[dict] = None
+    ) -> Dict[str, Any]:
+        """
+        Context in the shape RoadmapGenerator's hierarchical prompt expects.
+
+        Args:
+            exclude_session_id: Session passed separately as the current session
+            previous_roadmap: Latest roadmap_data, if any
+        """
+        context: Dict[str, Any] = {
+            "tier1_summaries": {
+                _session_label(entry): entry["insights"]
+                for entry in self.tier1
+                if entry["session_id"] != exclude_session_id
+            },
+            "tier2_summaries": {
+                _range_label(summary["first"], summary["last"]): summary["summary"]
+                for summary in self.tier2
+            },
+            "tier3_summary": None,
+            "previous_roadmap": previous_roadmap,
+            "tier_counts": self.counts(),
+        }
+        if self.tier3:
+            context["tier3_summary"] = self.tier3["summary"]
+            context["tier3_range"] = _range_label(self.tier3["first"], self.tier3["last"])
+        return context
+
+
+class JourneyCompactor:
+    """
+    Loads, folds and persists a patient's journey tiers.
+
+    Args:
+        db: Supabase client (sync)
+    """
+
+    TABLE = "patient_journey_tiers"
+
+    def __init__(self, db: Any):
+        self.db = db
+
+    def load(self, patient_id: str) -> Optional[JourneyTiers]:
+        """Stored tiers for a patient, or None if they have never been built."""
+        result = self.db.table(self.TABLE) \
+            .select("tier1, tier2, tier3, sessions_folded, last_session_id") \
+            .eq("patient_id", patient_id) \
+            .execute()
+        return JourneyTiers.from_row(result.data[0]) if result.data else None
+
+    def save(self, patient_id: str, tiers: JourneyTiers) -> None:
+        self.db.table(self.TABLE).upsert(tiers.to_row(patient_id), on_conflict="patient_id").execute()
+
+    def rebuild(self, patient_id: str, exclude_session_id: Optional[str] = None) -> JourneyTiers:
+        """Build tiers from the patient's Wave 2-complete sessions (one-time backfill)."""
+        sessions_result = self.db.table("therapy_sessions") \
+            .select("id, session_date, deep_analysis, prose_analysis") \
+            .eq("patient_id", patient_id) \
+            .order("session_date") \
+            .execute()
+
+        tiers = JourneyTiers()
+        for session in sessions_result.data or []:
+            if session["id"] == exclude_session_id or not session.get("prose_analysis"):
+                continue
+            tiers.fold(
+                session["id"],
+                session.get("session_date"),
+                extract_insights_from_deep_analysis(session.get("deep_analysis") or {}),
+            )
+
+        logger.info(f"Backfilled journey tiers for patient {patient_id}: {tiers.counts()}")
+        return tiers
+
+    def add_session(
+        self,
+        patient_id: str,
+        session_id: str,
+        session_date: Optional[str],
+        insights: List[str]
+    ) -> JourneyTiers:
+        """
+        Fold a newly analyzed session into the patient's tiers and persist them.
+
+        Args:
+            patient_id: Patient UUID
+            session_id: Session UUID
+            session_date: Session date (ISO string)
+            insights: Session insights (SessionInsightsSummarizer output)
+
+        Returns:
+            Updated JourneyTiers
+        """
+        tiers = self.load(patient_id)
+        if tiers is None:
+            tiers = self.rebuild(patient_id, exclude_session_id=session_id)
+
+        compactions = tiers.fold(session_id, session_date, insights)
+        self.save(patient_id, tiers)
+
+        if compactions:
+            logger.info(f"Journey tiers for patient {patient_id}: {', '.join(compactions)} -> {tiers.counts()}")
+        return tiers
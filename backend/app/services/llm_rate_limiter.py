@@ -0,0 +1,561 @@
+"""
+LLM Rate Limiter - Per-model request and token budgets for every LLM call
+
+OpenAI enforces requests-per-minute (RPM) and tokens-per-minute (TPM) limits
+per model. This module keeps one pair of token buckets per model, sized from
+the rpm_limit / tpm_limit fields in MODEL_REGISTRY (scaled by
+LLM_RATE_LIMIT_SCALE), and every BaseAIGenerator chat completion goes
+through it:
+
+1. Estimate the request's tokens (prompt estimate + expected output for the
+   task from ESTIMATED_TOKEN_USAGE)
+2. Wait until the model's buckets admit it
+3. On a 429, pause the model for the server's retry-after (or a jittered
+   backoff), drain its buckets so waiting callers resume at the refill rate
+   instead of all at once, and retry up to LLM_MAX_RETRIES times. Timeouts,
+   connection errors and 5xx are retried with backoff too; pooled OpenAI
+   clients have SDK retries disabled, so this is the only retry layer
+4. Settle the estimate against the actual usage reported by the API
+
+Priorities: interactive calls (API requests, the default) are debited
+immediately and may run the bucket into debt. Background calls (seeding,
+batch runners - set with llm_priority()) are only admitted while the
+buckets stay above LLM_BACKGROUND_HEADROOM of capacity, and do not hold a
+reservation while they wait, so an interactive request never queues behind
+background work.
+
+Budgets are per process; scripts started as subprocesses have their own.
+
+Usage:
+    from app.services.llm_rate_limiter import get_rate_limiter, llm_priority, Priority
+
+    response = await get_rate_limiter().call(
+        "gpt-5-mini", tokens, lambda: client.chat.completions.create(...)
+    )
+
+    with llm_priority(Priority.BACKGROUND):
+        await run_seeding()
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.config.model_config import ESTIMATED_TOKEN_USAGE, MODEL_REGISTRY, ModelConfig
+
+logger = logging.getLogger(__name__)
+
+Clock = Callable[[], float]
+Sleep = Callable[[float], Awaitable[Any]]
+
+# Used for models missing from MODEL_REGISTRY
+DEFAULT_LIMITS: Tuple[int, int] = (ModelConfig.rpm_limit, ModelConfig.tpm_limit)
+
+# Expected output tokens for tasks missing from ESTIMATED_TOKEN_USAGE
+DEFAULT_OUTPUT_TOKENS = 500
+
+# Rough prompt-token estimate: ~4 characters per token plus per-message framing
+CHARS_PER_TOKEN = 4
+TOKENS_PER_MESSAGE = 4
+
+
+# =============================================================================
+# Priorities
+# =============================================================================
+
+class Priority(IntEnum):
+    """Admission priority (lower value = served first)."""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_priority: ContextVar[Optional[Priority]] = ContextVar("llm_priority", default=None)
+_default_priority = Priority.INTERACTIVE
+
+
+def current_priority() -> Priority:
+    """Priority for LLM calls made from the current context."""
+    priority = _priority.get()
+    return _default_priority if priority is None else priority
+
+
+@contextmanager
+def llm_priority(priority: Priority) -> Iterator[None]:
+    """Run LLM calls in this block (and tasks it starts) at the given priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def set_default_priority(priority: Priority) -> None:
+    """Set the process-wide default priority (e.g. BACKGROUND in seed scripts)."""
+    global _default_priority
+    _default_priority = priority
+
+
+# =============================================================================
+# Token Estimation
+# =============================================================================
+
+def estimate_prompt_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Fast character-based estimate of the prompt tokens for a messages array."""
+    chars = sum(len(str(message.get("content") or "")) for message in messages)
+    return chars // CHARS_PER_TOKEN + TOKENS_PER_MESSAGE * len(messages) + 3
+
+
+def estimate_request_tokens(task: str, messages: List[Dict[str, Any]]) -> int:
+    """Prompt estimate plus the task's expected output tokens."""
+    output = ESTIMATED_TOKEN_USAGE.get(task, {}).get("output", DEFAULT_OUTPUT_TOKENS)
+    return estimate_prompt_tokens(messages) + output
+
+
+# =============================================================================
+# Token Bucket
+# =============================================================================
+
+class TokenBucket:
+    """
+    Continuous-refill token bucket.
+
+    Args:
+        capacity: Maximum level (burst size)
+        refill_per_second: Refill rate
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, clock: Clock = time.monotonic):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated)
+        self._level = min(self.capacity, self._level + elapsed * self.refill_per_second)
+        self._updated = now
+
+    @property
+    def level(self) -> float:
+        self._refill()
+        return self._level
+
+    def reserve(self, amount: float) -> float:
+        """
+        Debit amount (capped at capacity) and return the seconds until the
+        bucket is back to zero, i.e. how long the caller must wait.
+        """
+        self._refill()
+        self._level -= min(float(amount), self.capacity)
+        if self._level >= 0:
+            return 0.0
+        return -self._level / self.refill_per_second
+
+    def time_until(self, amount: float, floor: float = 0.0) -> float:
+        """Seconds until amount can be debited while leaving at least floor (no debit)."""
+        self._refill()
+        needed = min(float(amount), self.capacity - floor) + floor - self._level
+        return max(0.0, needed / self.refill_per_second)
+
+    def adjust(self, amount: float) -> None:
+        """Credit (positive) or debit (negative) without waiting."""
+        self._refill()
+        self._level = min(self.capacity, self._level + amount)
+
+    def drain(self) -> None:
+        """Drop any accumulated burst capacity."""
+        self._refill()
+        self._level = min(self._level, 0.0)
+
+
+class ModelBudget:
+    """RPM + TPM buckets for one model, with a pause set by 429 responses."""
+
+    def __init__(
+        self,
+        model: str,
+        rpm: int,
+        tpm: int,
+        clock: Clock = time.monotonic,
+        background_headroom: float = 0.0,
+    ):
+        self.model = model
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(rpm, rpm / 60.0, clock)
+        self.tokens = TokenBucket(tpm, tpm / 60.0, clock)
+        self.background_headroom = background_headroom
+        self.paused_until = 0.0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.admitted = {priority.name.lower(): 0 for priority in Priority}
+        self.delayed = 0
+        self.rate_limited = 0
+        self.total_wait_seconds = 0.0
+
+    def reserve(self, tokens: int, priority: Priority = Priority.INTERACTIVE) -> Tuple[bool, float]:
+        """
+        Try to admit one request of `tokens` tokens.
+
+        Returns:
+            (admitted, wait). Interactive requests are always admitted and must
+            sleep `wait` before sending. Background requests are admitted only
+            with wait == 0; otherwise they should sleep `wait` and try again.
+        """
+        with self._lock:
+            now = self._clock()
+            if now < self.paused_until:
+                return False, self.paused_until - now
+
+            if priority == Priority.INTERACTIVE:
+                wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+            else:
+                wait = max(
+                    self.requests.time_until(1, self.requests.capacity * self.background_headroom),
+                    self.tokens.time_until(tokens, self.tokens.capacity * self.background_headroom),
+                )
+                if wait > 0:
+                    return False, wait
+                self.requests.reserve(1)
+                self.tokens.reserve(tokens)
+
+            self.admitted[priority.name.lower()] += 1
+            if wait > 0:
+                self.delayed += 1
+                self.total_wait_seconds += wait
+            return True, wait
+
+    def on_rate_limited(self, retry_after: float) -> None:
+        """Pause the model for retry_after seconds and drop its burst capacity."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, self._clock() + retry_after)
+            self.requests.drain()
+            self.tokens.drain()
+            self.rate_limited += 1
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the real usage is known."""
+        with self._lock:
+            self.tokens.adjust(estimated - actual)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "requests_available": round(self.requests.level, 2),
+                "tokens_available": round(self.tokens.level),
+                "paused_for_seconds": round(max(0.0, self.paused_until - self._clock()), 2),
+                "admitted": dict(self.admitted),
+                "delayed": self.delayed,
+                "rate_limited": self.rate_limited,
+                "total_wait_seconds": round(self.total_wait_seconds, 3),
+            }
+
+
+# =============================================================================
+# 429 Handling
+# =============================================================================
+
+def _error_chain(error: BaseException) -> Iterator[BaseException]:
+    """error, then the exceptions it wraps (__cause__/__context__)."""
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        yield current
+        current = current.__cause__ or current.__context__
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    True if error (or any exception it wraps) is an HTTP 429.
+
+    Analyzers re-raise API errors as plain Exception("... failed: ..."), so
+    the __cause__/__context__ chain is walked to find the original error.
+    """
+    for current in _error_chain(error):
+        if getattr(current, "status_code", None) == 429:
+            return True
+        if type(current).__name__ == "RateLimitError":
+            return True
+    return False
+
+
+# Failures the OpenAI SDK retried by itself before pooled clients were created
+# with max_retries=0 (429s are handled separately, through the budget)
+_TRANSIENT_STATUS_CODES = {408, 409, 500, 502, 503, 504}
+_TRANSIENT_ERROR_TYPES = {"APIConnectionError", "APITimeoutError"}
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """True if error (or any exception it wraps) is a timeout, connection error or 5xx."""
+    for current in _error_chain(error):
+        if getattr(current, "status_code", None) in _TRANSIENT_STATUS_CODES:
+            return True
+        if type(current).__name__ in _TRANSIENT_ERROR_TYPES:
+            return True
+    return False
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Server-requested delay from retry-after-ms / retry-after headers, if any."""
+    for current in _error_chain(error):
+        response = getattr(current, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            continue
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000.0
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except (TypeError, ValueError):
+            pass  # HTTP-date form or garbage: fall back to backoff
+    return None
+
+
+def backoff_delay(
+    attempt: int,
+    base: Optional[float] = None,
+    cap: Optional[float] = None,
+) -> float:
+    """
+    Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt)).
+
+    Jitter spreads retries from concurrent callers that hit the limit at the
+    same moment, instead of having them all retry together.
+    """
+    base = settings.llm_retry_base_seconds if base is None else base
+    cap = settings.llm_retry_max_seconds if cap is None else cap
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    total = getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+# =============================================================================
+# Limiter
+# =============================================================================
+
+class LLMRateLimiter:
+    """
+    Per-model RPM/TPM admission control shared by all LLM calls.
+
+    Args:
+        limits: Optional {model: (rpm, tpm)} overriding MODEL_REGISTRY
+        scale: Multiplier applied to every limit (default: LLM_RATE_LIMIT_SCALE)
+        background_headroom: Fraction of each bucket background calls leave
+            for interactive ones (default: LLM_BACKGROUND_HEADROOM)
+        max_retries: Retries per call on 429 or transient error (default: LLM_MAX_RETRIES)
+        clock: Monotonic time source
+        sleep: Awaitable sleep (injectable for tests)
+        sync_sleep: Blocking sleep used by call_sync()
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[int, int]]] = None,
+        scale: Optional[float] = None,
+        background_headroom: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        clock: Clock = time.monotonic,
+        sleep: Sleep = asyncio.sleep,
+        sync_sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._limits = dict(limits or {})
+        self.scale = settings.llm_rate_limit_scale if scale is None else scale
+        self.background_headroom = (
+            settings.llm_background_headroom if background_headroom is None else background_headroom
+        )
+        self.max_retries = settings.llm_max_retries if max_retries is None else max_retries
+        self._clock = clock
+        self._sleep = sleep
+        self._sync_sleep = sync_sleep
+        self._budgets: Dict[str, ModelBudget] = {}
+        self._lock = threading.Lock()
+        self.retries = 0
+
+    def _limits_for(self, model: str) -> Tuple[int, int]:
+        if model in self._limits:
+            rpm, tpm = self._limits[model]
+        elif model in MODEL_REGISTRY:
+            rpm, tpm = MODEL_REGISTRY[model].rpm_limit, MODEL_REGISTRY[model].tpm_limit
+        else:
+            rpm, tpm = DEFAULT_LIMITS
+        return max(1, int(rpm * self.scale)), max(1, int(tpm * self.scale))
+
+    def budget(self, model: str) -> ModelBudget:
+        """Get (or create) the budget for a model."""
+        with self._lock:
+            budget = self._budgets.get(model)
+            if budget is None:
+                rpm, tpm = self._limits_for(model)
+                budget = ModelBudget(model, rpm, tpm, self._clock, self.background_headroom)
+                self._budgets[model] = budget
+            return budget
+
+    def _next_wait(self, budget: ModelBudget, tokens: int, priority: Priority) -> Tuple[bool, float]:
+        admitted, wait = budget.reserve(tokens, priority)
+        if not admitted:
+            # Spread callers that would otherwise wake at the same instant
+            wait *= 1.0 + random.uniform(0, 0.1)
+        return admitted, wait
+
+    async def acquire(self, model: str, tokens: int, priority: Optional[Priority] = None) -> float:
+        """
+        Wait until the model's budget admits one request of `tokens` tokens.
+
+        Returns:
+            Seconds spent waiting
+        """
+        priority = current_priority() if priority is None else priority
+        budget = self.budget(model)
+        waited = 0.0
+        while True:
+            admitted, wait = self._next_wait(budget, tokens, priority)
+            if wait > 0:
+                logger.debug(f"Rate limit: {priority.name.lower()} call to {model} waits {wait:.2f}s")
+                await self._sleep(wait)
+                waited += wait
+            if admitted:
+                return waited
+
+    def acquire_sync(self, model: str, tokens: int, priority: Optional[Priority] = None) -> float:
+        """Blocking counterpart of acquire() for sync generators."""
+        priority = current_priority() if priority is None else priority
+        budget = self.budget(model)
+        waited = 0.0
+        while True:
+            admitted, wait = self._next_wait(budget, tokens, priority)
+            if wait > 0:
+                self._sync_sleep(wait)
+                waited += wait
+            if admitted:
+                return waited
+
+    def _on_error(self, model: str, error: Exception, attempt: int) -> float:
+        """
+        Record a failed attempt; re-raise unless it is retryable.
+
+        A 429 pauses the model's budget (the next acquire waits it out).
+        Timeouts, connection errors and 5xx only back off this call.
+
+        Returns:
+            Seconds the caller should sleep before retrying
+        """
+        if attempt >= self.max_retries:
+            raise error
+        if is_rate_limit_error(error):
+            retry_after = retry_after_seconds(error)
+            pause = retry_after if retry_after is not None else backoff_delay(attempt)
+            self.budget(model).on_rate_limited(pause)
+            self.retries += 1
+            logger.warning(
+                f"⏳ {model} rate limited (attempt {attempt + 1}/{self.max_retries + 1}), "
+                f"pausing {pause:.1f}s{' (retry-after)' if retry_after is not None else ''}"
+            )
+            return 0.0
+        if is_transient_error(error):
+            delay = backoff_delay(attempt)
+            self.retries += 1
+            logger.warning(
+                f"⏳ {model} request failed ({error}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+            )
+            return delay
+        raise error
+
+    def _settle(self, model: str, tokens: int, response: Any) -> None:
+        actual = _usage_tokens(response)
+        if actual is not None:
+            self.budget(model).settle(tokens, actual)
+
+    async def call(self, model: str, tokens: int, make_request: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run an LLM request under the model's budget, retrying 429s.
+
+        Args:
+            model: Model name
+            tokens: Estimated total tokens (see estimate_request_tokens)
+            make_request: Zero-arg callable returning the request coroutine
+
+        Returns:
+            The API response
+        """
+        attempt = 0
+        while True:
+            await self.acquire(model, tokens)
+            try:
+                response = await make_request()
+            except Exception as e:
+                delay = self._on_error(model, e, attempt)
+                attempt += 1
+                if delay > 0:
+                    await self._sleep(delay)
+                continue
+            self._settle(model, tokens, response)
+            return response
+
+    def call_sync(self, model: str, tokens: int, make_request: Callable[[], Any]) -> Any:
+        """Blocking counterpart of call() for sync generators."""
+        attempt = 0
+        while True:
+            self.acquire_sync(model, tokens)
+            try:
+                response = make_request()
+            except Exception as e:
+                delay = self._on_error(model, e, attempt)
+                attempt += 1
+                if delay > 0:
+                    self._sync_sleep(delay)
+                continue
+            self._settle(model, tokens, response)
+            return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            budgets = dict(self._budgets)
+        return {
+            "scale": self.scale,
+            "background_headroom": self.background_headroom,
+            "retries": self.retries,
+            "models": {model: budget.get_stats() for model, budget in budgets.items()},
+        }
+
+
+# =============================================================================
+# Singleton
+# =============================================================================
+
+_rate_limiter: Optional[LLMRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> LLMRateLimiter:
+    """Get the process-wide rate limiter."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = LLMRateLimiter()
+    return _rate_limiter
+
+
+def set_rate_limiter(limiter: Optional[LLMRateLimiter]) -> None:
+    """Replace the process-wide rate limiter (None resets to default on next use)."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        _rate_limiter = limiter
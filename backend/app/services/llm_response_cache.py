@@ -0,0 +1,457 @@
+"""
+LLM Response Cache - Content-addressed cache for deterministic analysis tasks
+
+Re-running Wave 1/Wave 2 on unchanged transcripts used to re-pay the full GPT
+cost and latency. Responses are now cached under a hash of
+(task, model, messages, request params incl. response_format), so an identical
+request is answered locally.
+
+Backends:
+- memory: in-process LRU (default)
+- sqlite: on-disk, shared across processes and script re-runs
+- none:   caching disabled
+
+Both backends evict on TTL and on max entry count (least recently used first).
+The sqlite backend blocks on disk I/O, so async callers run it in a worker
+thread (LLMResponseCache.blocking).
+Cache hits are reported through track_generation_cost() as zero-cost hits.
+
+Usage:
+    from app.services.llm_response_cache import get_llm_cache, build_cache_key
+
+    cache = get_llm_cache()
+    key = build_cache_key("mood_analysis", "gpt-5-nano", messages, {"response_format": {...}})
+    cached = cache.get(key) if cache else None
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the key layout or stored value shape changes
+CACHE_KEY_VERSION = 1
+
+
+# =============================================================================
+# Cached Response
+# =============================================================================
+
+@dataclass
+class CachedCompletion:
+    """
+    A chat completion replayed from the cache.
+
+    Mimics the parts of openai's ChatCompletion the analyzers read
+    (choices[0].message.content, usage), with zero usage so cost tracking
+    records the hit as free. Original token counts are kept for reporting.
+    """
+    content: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    created_at: float
+    cache_hit: bool = True
+
+    @property
+    def choices(self) -> List[SimpleNamespace]:
+        return [SimpleNamespace(message=SimpleNamespace(content=self.content), finish_reason="stop")]
+
+    @property
+    def usage(self) -> SimpleNamespace:
+        return SimpleNamespace(prompt_tokens=0, completion_tokens=0, total_tokens=0)
+
+    @classmethod
+    def from_response(cls, response: Any, model: str) -> Optional["CachedCompletion"]:
+        """Build a cache entry from a live API response (None if not cacheable)."""
+        try:
+            content = response.choices[0].message.content
+        except (AttributeError, IndexError, TypeError):
+            return None
+
+        if not isinstance(content, str) or not content.strip():
+            return None
+
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) if usage else 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) if usage else 0
+
+        return cls(
+            content=content,
+            model=model,
+            prompt_tokens=prompt_tokens if isinstance(prompt_tokens, int) else 0,
+            completion_tokens=completion_tokens if isinstance(completion_tokens, int) else 0,
+            created_at=time.time(),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for storage."""
+        data = asdict(self)
+        data.pop("cache_hit")
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CachedCompletion":
+        return cls(**data)
+
+
+def build_cache_key(
+    task: str,
+    model: str,
+    messages: List[Dict[str, Any]],
+    params: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Content hash of a chat completion request.
+
+    Args:
+        task: Task name (e.g., "mood_analysis")
+        model: Model name (e.g., "gpt-5-nano")
+        messages: Messages array sent to the API
+        params: Remaining request kwargs (response_format, max tokens, ...)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        {
+            "v": CACHE_KEY_VERSION,
+            "task": task,
+            "model": model,
+            "messages": messages,
+            "params": params or {},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+
+class CacheBackend(ABC):
+    """Storage backend for cached completions (values are plain dicts)."""
+
+    # Whether get()/set() do I/O; async callers run blocking backends in a thread
+    blocking = False
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+    def _is_expired(self, stored_at: float, now: Optional[float] = None) -> bool:
+        if self.ttl_seconds <= 0:
+            return False
+        return ((now or time.time()) - stored_at) > self.ttl_seconds
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored value, or None if missing/expired."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a value, evicting as needed."""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+
+class MemoryLRUBackend(CacheBackend):
+    """In-process LRU with TTL. Thread-safe."""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 0):
+        super().__init__(max_entries, ttl_seconds)
+        self._entries: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            stored_at, value = entry
+            if self._is_expired(stored_at):
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    On-disk cache shared by every process on the host.
+
+    Keeps the seed scripts and the API server warm across restarts.
+    """
+
+    blocking = True
+
+    def __init__(self, path: Path, max_entries: int = 1000, ttl_seconds: float = 0):
+        super().__init__(max_entries, ttl_seconds)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_response_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_access "
+            "ON llm_response_cache (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM llm_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, stored_at = row
+            if self._is_expired(stored_at, now):
+                self._conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_response_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (key, value, stored_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then least recently used rows beyond max_entries."""
+        if self.ttl_seconds > 0:
+            self._conn.execute(
+                "DELETE FROM llm_response_cache WHERE stored_at < ?", (now - self.ttl_seconds,)
+            )
+        self._conn.execute(
+            """
+            DELETE FROM llm_response_cache WHERE key IN (
+                SELECT key FROM llm_response_cache
+                ORDER BY last_access DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_response_cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+
+
+# =============================================================================
+# Cache Facade
+# =============================================================================
+
+class LLMResponseCache:
+    """Typed facade over a backend with hit/miss accounting."""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def blocking(self) -> bool:
+        """True when lookups/stores do disk I/O (keep them off the event loop)."""
+        return self.backend.blocking
+
+    def get(self, key: str) -> Optional[CachedCompletion]:
+        try:
+            data = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            with self._lock:
+                self.errors += 1
+            return None
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return CachedCompletion.from_dict(data)
+
+    def set(self, key: str, completion: CachedCompletion) -> None:
+        try:
+            self.backend.set(key, completion.to_dict())
+        except Exception as e:
+            # Cache failures must never break analysis
+            logger.warning(f"LLM cache write failed: {e}")
+            with self._lock:
+                self.errors += 1
+            return
+
+        with self._lock:
+            self.stores += 1
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and backend size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "errors": self.errors,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+        stats["entries"] = len(self.backend)
+        stats["max_entries"] = self.backend.max_entries
+        stats["ttl_seconds"] = self.backend.ttl_seconds
+        return stats
+
+
+# Global cache instance (None when disabled)
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_initialized = False
+_llm_cache_lock = threading.Lock()
+
+
+def _create_backend_from_settings() -> Optional[CacheBackend]:
+    backend_name = settings.llm_cache_backend.lower()
+
+    if backend_name in ("", "none", "off", "disabled"):
+        return None
+
+    if backend_name == "memory":
+        return MemoryLRUBackend(
+            max_entries=settings.llm_cache_max_entries,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+        )
+
+    if backend_name == "sqlite":
+        path = Path(settings.llm_cache_path)
+        if not path.is_absolute():
+            path = Path(__file__).parent.parent.parent / path
+        return SQLiteBackend(
+            path=path,
+            max_entries=settings.llm_cache_max_entries,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+        )
+
+    logger.warning(f"Unknown LLM_CACHE_BACKEND '{backend_name}', caching disabled")
+    return None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Get the process-wide LLM response cache (singleton pattern).
+
+    Returns:
+        LLMResponseCache, or None if LLM_CACHE_BACKEND=none
+    """
+    global _llm_cache, _llm_cache_initialized
+
+    if not _llm_cache_initialized:
+        with _llm_cache_lock:
+            if not _llm_cache_initialized:
+                try:
+                    backend = _create_backend_from_settings()
+                except Exception as e:
+                    logger.error(f"Failed to initialize LLM cache, caching disabled: {e}")
+                    backend = None
+                _llm_cache = LLMResponseCache(backend) if backend else None
+                _llm_cache_initialized = True
+                if _llm_cache:
+                    logger.info(f"LLM response cache enabled ({type(backend).__name__})")
+
+    return _llm_cache
+
+
+def set_llm_cache(cache: Optional[LLMResponseCache]) -> None:
+    """
+    Replace the process-wide cache programmatically.
+
+    Useful for testing or for scripts that want a specific backend.
+    """
+    global _llm_cache, _llm_cache_initialized
+    with _llm_cache_lock:
+        _llm_cache = cache
+        _llm_cache_initialized = True
+
+
+def reset_llm_cache() -> None:
+    """Reset the cache singleton to re-read from settings."""
+    global _llm_cache, _llm_cache_initialized
+    with _llm_cache_lock:
+        _llm_cache = None
+        _llm_cache_initialized = False
@@ -97,15 +97,20 @@ class MoodAnalyzer(AsyncAIGenerator):
         if not patient_segments:
             raise ValueError(f"No segments found for patient speaker ID: {patient_speaker_id}")
 
-        # Create analysis prompt
-        prompt = self._create_analysis_prompt(patient_segments)
+        # Create analysis prompt (segments stay separate turns: one speaker only)
+        fitted = self._fit_transcript(
+            patient_segments,
+            lambda seg: f"[{self._format_timestamp(seg.get('start', 0))}] {seg.get('text', '')}",
+            separator="\n\n",
+            group_turns=False
+        )
+        prompt = self._create_analysis_prompt(fitted.text)
 
         # Call OpenAI API
         # NOTE: GPT-5 series does NOT support custom temperature - uses internal calibration
         try:
             start_time = time.time()
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            response = await self._create_chat_completion_async(
                 messages=[
                     {
                         "role": "system",
@@ -125,7 +130,8 @@ class MoodAnalyzer(AsyncAIGenerator):
                 task="mood_analysis",
                 model=self.model,
                 start_time=start_time,
-                session_id=session_id
+                session_id=session_id,
+                metadata=fitted.report.cost_metadata()
             )
 
             result = json.loads(response.choices[0].message.content)
@@ -189,14 +195,8 @@ Your task is to assign a single mood score from 0.0 to 10.0 (in 0.5 increments)
 
 Be nuanced - consider both negative and positive signals. Don't default to middle scores."""
 
-    def _create_analysis_prompt(self, patient_segments: List[Dict[str, Any]]) -> str:
-        """Create the analysis prompt from patient transcript segments."""
-        # Combine patient dialogue
-        dialogue = "\n\n".join([
-            f"[{self._format_timestamp(seg.get('start', 0))}] {seg.get('text', '')}"
-            for seg in patient_segments
-        ])
-
+    def _create_analysis_prompt(self, dialogue: str) -> str:
+        """Create the analysis prompt from formatted patient dialogue."""
         return f"""Analyze this patient's mood from their therapy session dialogue.
 
 **Patient Transcript:**
@@ -0,0 +1,375 @@
+"""
+OpenAI Client Registry - Process-wide pooled OpenAI clients
+
+Every AI generator used to build its own OpenAI/AsyncOpenAI client, so each
+analyzer instance (one per request, several per orchestrator) paid for a fresh
+HTTP connection pool and TLS handshakes. This registry hands out one shared
+client per (api_key, sync/async) with configurable connection-pool limits and
+keep-alive, and meters in-flight requests so pool saturation is visible.
+
+Async clients are additionally scoped to the running event loop: httpx async
+connections cannot be reused across loops, and scripts/tests call
+asyncio.run() more than once per process. Only clients created inside a
+running loop are shared; one requested outside a loop is private to its
+caller (see AsyncAIGenerator.client, which rebinds to the current loop).
+
+Usage:
+    from app.services.openai_client_registry import get_sync_client, get_async_client
+
+    client = get_sync_client(api_key)
+    response = client.chat.completions.create(...)
+
+    stats = get_client_pool_stats()
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Pool Metrics
+# =============================================================================
+
+@dataclass
+class PoolMetrics:
+    """
+    In-flight request accounting for one pooled client.
+
+    A request counts as "saturated" when it starts while every connection in
+    the pool is already busy, i.e. it has to wait for a connection.
+    """
+    kind: str  # "sync" | "async"
+    key_fingerprint: str  # Short hash of the API key (never the key itself)
+    max_connections: int
+    max_keepalive_connections: int
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    requests_total: int = 0
+    saturated_requests: int = 0
+    errors_total: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def request_started(self) -> None:
+        with self._lock:
+            if self.in_flight >= self.max_connections:
+                self.saturated_requests += 1
+            self.in_flight += 1
+            self.requests_total += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def request_finished(self, failed: bool = False) -> None:
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if failed:
+                self.errors_total += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "key_fingerprint": self.key_fingerprint,
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "utilization": round(self.in_flight / self.max_connections, 3) if self.max_connections else 0.0,
+                "requests_total": self.requests_total,
+                "saturated_requests": self.saturated_requests,
+                "errors_total": self.errors_total,
+            }
+
+
+class _MeteredStream(httpx.SyncByteStream):
+    """
+    Response body wrapper that reports the request finished once the body is
+    read (or the response is closed), not when the headers arrive.
+    """
+
+    def __init__(self, stream: httpx.SyncByteStream, metrics: PoolMetrics):
+        self._stream = stream
+        self._metrics = metrics
+        self._finished = False
+
+    def _finish(self, failed: bool = False) -> None:
+        if not self._finished:
+            self._finished = True
+            self._metrics.request_finished(failed=failed)
+
+    def __iter__(self):
+        try:
+            yield from self._stream
+        except Exception:
+            self._finish(failed=True)
+            raise
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._finish()
+
+
+class _MeteredAsyncStream(httpx.AsyncByteStream):
+    """Async counterpart of _MeteredStream."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, metrics: PoolMetrics):
+        self._stream = stream
+        self._metrics = metrics
+        self._finished = False
+
+    def _finish(self, failed: bool = False) -> None:
+        if not self._finished:
+            self._finished = True
+            self._metrics.request_finished(failed=failed)
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        except Exception:
+            self._finish(failed=True)
+            raise
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._finish()
+
+
+class _MeteredTransport(httpx.HTTPTransport):
+    """Sync httpx transport that reports in-flight requests to PoolMetrics."""
+
+    def __init__(self, metrics: PoolMetrics, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._metrics = metrics
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._metrics.request_started()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            self._metrics.request_finished(failed=True)
+            raise
+        # The connection stays busy until the body has been read
+        response.stream = _MeteredStream(response.stream, self._metrics)
+        return response
+
+
+class _MeteredAsyncTransport(httpx.AsyncHTTPTransport):
+    """Async httpx transport that reports in-flight requests to PoolMetrics."""
+
+    def __init__(self, metrics: PoolMetrics, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._metrics.request_started()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            self._metrics.request_finished(failed=True)
+            raise
+        response.stream = _MeteredAsyncStream(response.stream, self._metrics)
+        return response
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+
+def _fingerprint(api_key: str) -> str:
+    """Short, non-reversible identifier for an API key (safe to log/expose)."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8]
+
+
+def _build_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.openai_max_connections,
+        max_keepalive_connections=settings.openai_max_keepalive_connections,
+        keepalive_expiry=settings.openai_keepalive_expiry_seconds,
+    )
+
+
+class OpenAIClientRegistry:
+    """
+    Thread-safe registry of shared OpenAI clients.
+
+    Sync clients are keyed by api_key. Async clients are keyed by api_key
+    within each live event loop; entries for a loop disappear with the loop.
+    Async clients created outside a loop are never cached, so one can't end
+    up shared between loops.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync_clients: Dict[str, Tuple[OpenAI, PoolMetrics]] = {}
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Tuple[AsyncOpenAI, PoolMetrics]]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        # Clients created outside of a running loop (e.g. analyzer built at import
+        # time): not shared, tracked only for stats while their owner keeps them
+        self._unbound_async_clients: "weakref.WeakKeyDictionary[AsyncOpenAI, PoolMetrics]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get_sync_client(self, api_key: str) -> OpenAI:
+        """Get (or create) the shared sync client for an API key."""
+        with self._lock:
+            entry = self._sync_clients.get(api_key)
+            if entry is None:
+                entry = self._create_sync_client(api_key)
+                self._sync_clients[api_key] = entry
+            return entry[0]
+
+    def get_async_client(self, api_key: str) -> AsyncOpenAI:
+        """
+        Get (or create) the shared async client for an API key on the current loop.
+
+        Outside a running loop this returns a new, unshared client.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        with self._lock:
+            if loop is None:
+                client, metrics = self._create_async_client(api_key)
+                self._unbound_async_clients[client] = metrics
+                return client
+
+            clients = self._async_clients.setdefault(loop, {})
+            entry = clients.get(api_key)
+            if entry is None:
+                entry = self._create_async_client(api_key)
+                clients[api_key] = entry
+            return entry[0]
+
+    def _create_sync_client(self, api_key: str) -> Tuple[OpenAI, PoolMetrics]:
+        limits = _build_limits()
+        metrics = PoolMetrics(
+            kind="sync",
+            key_fingerprint=_fingerprint(api_key),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+        )
+        http_client = DefaultHttpxClient(transport=_MeteredTransport(metrics, limits=limits))
+        logger.info(
+            f"Created pooled OpenAI sync client ({metrics.key_fingerprint}, "
+            f"max_connections={limits.max_connections})"
+        )
+        # The LLM rate limiter owns retries (and their budget); the SDK's own
+        # would retry 429s behind its back
+        return OpenAI(api_key=api_key, http_client=http_client, max_retries=0), metrics
+
+    def _create_async_client(self, api_key: str) -> Tuple[AsyncOpenAI, PoolMetrics]:
+        limits = _build_limits()
+        metrics = PoolMetrics(
+            kind="async",
+            key_fingerprint=_fingerprint(api_key),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+        )
+        http_client = DefaultAsyncHttpxClient(transport=_MeteredAsyncTransport(metrics, limits=limits))
+        logger.info(
+            f"Created pooled OpenAI async client ({metrics.key_fingerprint}, "
+            f"max_connections={limits.max_connections})"
+        )
+        return AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0), metrics
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Pool metrics for every live client."""
+        with self._lock:
+            entries = list(self._sync_clients.values())
+            for clients in self._async_clients.values():
+                entries.extend(clients.values())
+            metrics_list = [metrics for _, metrics in entries]
+            metrics_list.extend(self._unbound_async_clients.values())
+        return [metrics.to_dict() for metrics in metrics_list]
+
+    def close_sync_clients(self) -> None:
+        """Close all sync clients and forget every registered client."""
+        with self._lock:
+            sync_entries = list(self._sync_clients.values())
+            self._sync_clients.clear()
+            self._async_clients = weakref.WeakKeyDictionary()
+            self._unbound_async_clients = weakref.WeakKeyDictionary()
+
+        for client, _ in sync_entries:
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close OpenAI client: {e}")
+
+    async def aclose_loop_clients(self) -> None:
+        """Close only the async clients bound to the current loop (e.g. a worker thread's loop ending)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            async_entries = list(self._async_clients.pop(loop, {}).values())
+
+        for client, _ in async_entries:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close async OpenAI client: {e}")
+
+    async def aclose(self) -> None:
+        """Close async clients bound to the current loop, then all sync clients."""
+        await self.aclose_loop_clients()
+        self.close_sync_clients()
+
+
+# Global registry instance
+_registry: Optional[OpenAIClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> OpenAIClientRegistry:
+    """Get the process-wide client registry (singleton pattern)."""
+    global _registry
+
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = OpenAIClientRegistry()
+
+    return _registry
+
+
+def get_sync_client(api_key: str) -> OpenAI:
+    """Shortcut for get_client_registry().get_sync_client()."""
+    return get_client_registry().get_sync_client(api_key)
+
+
+def get_async_client(api_key: str) -> AsyncOpenAI:
+    """Shortcut for get_client_registry().get_async_client()."""
+    return get_client_registry().get_async_client(api_key)
+
+
+def get_client_pool_stats() -> List[Dict[str, Any]]:
+    """Pool saturation metrics for every shared client."""
+    return get_client_registry().get_stats()
+
+
+def reset_client_registry() -> None:
+    """Drop all shared clients (used by tests and on shutdown)."""
+    global _registry
+
+    with _registry_lock:
+        if _registry is not None:
+            _registry.close_sync_clients()
+        _registry = None
@@ -0,0 +1,632 @@
+"""
+Patient Aggregates - Materialized per-patient progress and consistency data
+
+/patient/{id}/consistency used to refetch the patient's sessions and rebuild
+gaps, weekly buckets (a weeks x sessions nested loop) and streaks on every
+request, and /patient/{id}/progress-metrics reshaped every mood-analyzed
+session into pipeline JSON for ProgressMetricsExtractor.
+
+Both are now served from one patient_aggregates row per patient:
+
+- sessions: [session_date, session_id] for every session, sorted by date
+- mood_series: Wave 1 mood points, in session date order
+- attendance_start / attendance_bitmap: one "1"/"0" per calendar week
+  (Monday-based) from the first session's week
+- longest/latest streak (weeks), gap regularity buckets and total gap days
+- progress_metrics: the progress-metrics response for the first
+  DEFAULT_PROGRESS_LIMIT mood points, ready to return
+
+The row is updated incrementally (one read, one write) when a session is
+created (record_session) and when its Wave 1 mood analysis completes
+(record_wave1); inserting a session touches only its neighbours' gaps and
+its week's bit. Updates for a patient are serialized in-process by a
+module-level lock (every request builds its own store), and across
+processes by a revision compare-and-swap: a write only lands on the
+revision it read, and a lost race reloads and re-applies. Consistency windows are relative to the request time, so
+their weekly chart is built from the stored sorted dates in one pass over
+the window (bisected) instead of querying sessions.
+
+Invalidation rules:
+- Recording a session again is idempotent; a changed session_date moves the
+  session (and its mood point) and re-derives the affected gaps and weeks
+- A forced mood re-analysis replaces the session's mood point; a cleared
+  mood_score removes it
+- Deleting the patient deletes the row (ON DELETE CASCADE)
+- Rows written by an older AGGREGATES_VERSION are treated as missing and
+  rebuilt from therapy_sessions on next access (same for patients that
+  predate the table)
+- Writes that bypass the API (SQL seed functions, manual edits, session
+  deletes) call invalidate(), or are caught by check(): the aggregates
+  check job rebuilds a patient's row from therapy_sessions, compares it
+  with the stored one and rewrites it if they drifted. Job workers queue a
+  check for every patient once per AGGREGATES_CHECK_INTERVAL_HOURS
+  (analysis_jobs.schedule_aggregates_sweep)
+
+Usage:
+    store = PatientAggregatesStore(db)
+    await store.record_session(session_row)
+    await store.record_wave1(session_row_with_mood_columns)
+
+    aggregates = await store.get(patient_id)
+    aggregates.consistency(days=90)
+    aggregates.progress_metrics_for(limit=50)
+"""
+
+import logging
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.database import get_async_supabase
+from app.services.progress_metrics_extractor import ProgressMetricsExtractor, ProgressMetricsResponse
+from app.utils.keyed_locks import KeyedLocks
+from app.utils.session_fields import PATIENT_AGGREGATE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored shape or derivation changes; older rows are rebuilt
+AGGREGATES_VERSION = 1
+
+# Mood points materialized as a ready progress-metrics response (the endpoint's default limit)
+DEFAULT_PROGRESS_LIMIT = 50
+
+# Regularity: how close gaps are to a 7-day interval
+IDEAL_GAP_DAYS = 7
+REGULARITY_POINTS = {"perfect": 100, "good": 70, "fair": 40, "poor": 10}
+
+# Fields compared by the consistency check
+_CHECKED_FIELDS = (
+    "sessions", "mood_series", "attendance_start", "attendance_bitmap",
+    "longest_streak_weeks", "latest_streak_weeks", "gap_buckets", "gap_days_total",
+)
+
+_WEEK = timedelta(days=7)
+
+# Compare-and-swap attempts per update before giving up
+MAX_SAVE_ATTEMPTS = 5
+
+# Load -> apply -> write cycles, per patient, for every store in the process
+_patient_locks = KeyedLocks()
+
+Execute = Callable[[Any], Awaitable[Any]]
+
+
+async def _default_execute(query: Any) -> Any:
+    return await query.execute()
+
+
+def normalize_session_date(value: str) -> str:
+    """ISO session date as a naive UTC timestamp (stored strings sort chronologically)."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def regularity_bucket(gap_days: int) -> str:
+    """Bucket for a gap between sessions (tolerance ±3 days from the ideal 7)."""
+    deviation = abs(gap_days - IDEAL_GAP_DAYS)
+    if deviation <= 3:
+        return "perfect"
+    if deviation <= 7:
+        return "good"
+    if deviation <= 14:
+        return "fair"
+    return "poor"
+
+
+def _gap_days(earlier: str, later: str) -> int:
+    return (datetime.fromisoformat(later) - datetime.fromisoformat(earlier)).days
+
+
+def _week_start(session_date: str) -> date:
+    day = datetime.fromisoformat(session_date).date()
+    return day - timedelta(days=day.weekday())
+
+
+def _date_key(entry: List[str]) -> str:
+    return entry[0]
+
+
+def _mood_point(session: Dict[str, Any], session_date: str) -> Dict[str, Any]:
+    return {
+        "session_id": session["id"],
+        "session_date": session_date,
+        "mood_score": session["mood_score"],
+        "mood_confidence": session.get("mood_confidence", 0.8),
+        "analyzed_at": session.get("mood_analyzed_at") or session.get("created_at"),
+    }
+
+
+@dataclass
+class PatientAggregates:
+    """A patient's materialized aggregates (a patient_aggregates row)."""
+    sessions: List[List[str]] = field(default_factory=list)
+    mood_series: List[Dict[str, Any]] = field(default_factory=list)
+    attendance_start: Optional[str] = None
+    attendance_bitmap: str = ""
+    longest_streak_weeks: int = 0
+    latest_streak_weeks: int = 0
+    gap_buckets: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(REGULARITY_POINTS, 0))
+    gap_days_total: int = 0
+    progress_metrics: Optional[Dict[str, Any]] = None
+    version: int = AGGREGATES_VERSION
+    revision: int = 0  # Bumped on every write (compare-and-swap)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "PatientAggregates":
+        return cls(
+            sessions=row.get("sessions") or [],
+            mood_series=row.get("mood_series") or [],
+            attendance_start=row.get("attendance_start"),
+            attendance_bitmap=row.get("attendance_bitmap") or "",
+            longest_streak_weeks=row.get("longest_streak_weeks") or 0,
+            latest_streak_weeks=row.get("latest_streak_weeks") or 0,
+            gap_buckets={**dict.fromkeys(REGULARITY_POINTS, 0), **(row.get("gap_buckets") or {})},
+            gap_days_total=row.get("gap_days_total") or 0,
+            progress_metrics=row.get("progress_metrics"),
+            version=row.get("version") or 0,
+            revision=row.get("revision") or 0,
+        )
+
+    def to_row(self, patient_id: str) -> Dict[str, Any]:
+        return {
+            "patient_id": patient_id,
+            "sessions": self.sessions,
+            "mood_series": self.mood_series,
+            "attendance_start": self.attendance_start,
+            "attendance_bitmap": self.attendance_bitmap,
+            "longest_streak_weeks": self.longest_streak_weeks,
+            "latest_streak_weeks": self.latest_streak_weeks,
+            "gap_buckets": self.gap_buckets,
+            "gap_days_total": self.gap_days_total,
+            "regularity_score": self.regularity_score,
+            "total_sessions": len(self.sessions),
+            "progress_metrics": self.progress_metrics,
+            "version": self.version,
+            "revision": self.revision,
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+
+    # -------------------------------------------------------------------------
+    # Derived values
+    # -------------------------------------------------------------------------
+
+    @property
+    def gap_count(self) -> int:
+        return sum(self.gap_buckets.values())
+
+    @property
+    def regularity_score(self) -> float:
+        """All-time regularity (0-100): average bucket points over every gap."""
+        if not self.gap_count:
+            return 0
+        points = sum(REGULARITY_POINTS[bucket] * count for bucket, count in self.gap_buckets.items())
+        return round(points / self.gap_count, 1)
+
+    @property
+    def average_gap_days(self) -> float:
+        return round(self.gap_days_total / self.gap_count, 1) if self.gap_count else 0
+
+    # -------------------------------------------------------------------------
+    # Incremental updates
+    # -------------------------------------------------------------------------
+
+    def _index_of(self, session_id: str) -> Optional[int]:
+        for index, (_, stored_id) in enumerate(self.sessions):
+            if stored_id == session_id:
+                return index
+        return None
+
+    def _add_gap(self, earlier: str, later: str, sign: int = 1) -> None:
+        gap = _gap_days(earlier, later)
+        self.gap_buckets[regularity_bucket(gap)] += sign
+        self.gap_days_total += sign * gap
+
+    def add_session(self, session_id: str, session_date: str) -> bool:
+        """
+        Add a session (or move it if its date changed).
+
+        Returns:
+            True if the aggregates changed
+        """
+        session_date = normalize_session_date(session_date)
+        index = self._index_of(session_id)
+        if index is not None:
+            if self.sessions[index][0] == session_date:
+                return False
+            self.remove_session(session_id)
+
+        index = bisect_right(self.sessions, session_date, key=_date_key)
+        before = self.sessions[index - 1][0] if index > 0 else None
+        after = self.sessions[index][0] if index < len(self.sessions) else None
+        if before and after:
+            self._add_gap(before, after, sign=-1)
+        if before:
+            self._add_gap(before, session_date)
+        if after:
+            self._add_gap(session_date, after)
+        self.sessions.insert(index, [session_date, session_id])
+
+        self._set_week(session_date, attended=True)
+        return True
+
+    def remove_session(self, session_id: str) -> bool:
+        """Remove a session and its mood point. Returns True if it was present."""
+        index = self._index_of(session_id)
+        if index is None:
+            return False
+
+        session_date, _ = self.sessions.pop(index)
+        before = self.sessions[index - 1][0] if index > 0 else None
+        after = self.sessions[index][0] if index < len(self.sessions) else None
+        if before:
+            self._add_gap(before, session_date, sign=-1)
+        if after:
+            self._add_gap(session_date, after, sign=-1)
+        if before and after:
+            self._add_gap(before, after)
+
+        if not self.sessions:
+            self.attendance_start, self.attendance_bitmap = None, ""
+            self.longest_streak_weeks = self.latest_streak_weeks = 0
+        else:
+            week = _week_start(session_date)
+            week_end = (datetime.combine(week, datetime.min.time()) + _WEEK).isoformat()
+            first = bisect_left(self.sessions, datetime.combine(week, datetime.min.time()).isoformat(), key=_date_key)
+            if first == len(self.sessions) or self.sessions[first][0] >= week_end:
+                self._set_week(session_date, attended=False)
+
+        if any(point["session_id"] == session_id for point in self.mood_series):
+            self.mood_series = [point for point in self.mood_series if point["session_id"] != session_id]
+            self._materialize_progress_metrics()
+        return True
+
+    def set_mood(self, session: Dict[str, Any]) -> bool:
+        """
+        Add or replace a session's mood point (removed if mood_score is None).
+
+        Args:
+            session: therapy_sessions row with id, session_date and the mood columns
+
+        Returns:
+            True if the aggregates changed
+        """
+        session_id = session["id"]
+        changed = self.add_session(session_id, session["session_date"])
+        session_date = self.sessions[self._index_of(session_id)][0]
+
+        existing = next((point for point in self.mood_series if point["session_id"] == session_id), None)
+        point = _mood_point(session, session_date) if session.get("mood_score") is not None else None
+        if point == existing and not changed:
+            return False
+
+        self.mood_series = [point for point in self.mood_series if point["session_id"] != session_id]
+        if point is not None:
+            insort(self.mood_series, point, key=lambda item: item["session_date"])
+        self._materialize_progress_metrics()
+        return True
+
+    def _set_week(self, session_date: str, attended: bool) -> None:
+        """Set one week's attendance bit (growing the bitmap as needed) and refresh streaks."""
+        week = _week_start(session_date)
+        start = date.fromisoformat(self.attendance_start) if self.attendance_start else week
+        bits = self.attendance_bitmap
+
+        if week < start:
+            bits = "0" * ((start - week).days // 7) + bits
+            start = week
+        index = (week - start).days // 7
+        if index >= len(bits):
+            bits += "0" * (index + 1 - len(bits))
+        bits = bits[:index] + ("1" if attended else "0") + bits[index + 1:]
+
+        # Trim unattended weeks at either end (the first and last weeks always have a session)
+        leading = len(bits) - len(bits.lstrip("0"))
+        self.attendance_start = (start + timedelta(weeks=leading)).isoformat()
+        self.attendance_bitmap = bits.strip("0")
+
+        runs = self.attendance_bitmap.split("0")
+        self.longest_streak_weeks = max(len(run) for run in runs)
+        self.latest_streak_weeks = len(runs[-1])
+
+    def _materialize_progress_metrics(self) -> None:
+        points = self.mood_series[:DEFAULT_PROGRESS_LIMIT]
+        try:
+            self.progress_metrics = (
+                ProgressMetricsExtractor.extract_from_mood_series(points).model_dump() if points else None
+            )
+        except Exception as e:
+            # Served by extracting on read instead (which reports the error)
+            logger.warning(f"Could not materialize progress metrics: {e}")
+            self.progress_metrics = None
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    def progress_metrics_for(self, limit: int = DEFAULT_PROGRESS_LIMIT) -> ProgressMetricsResponse:
+        """Progress metrics for the first `limit` mood-analyzed sessions."""
+        points = self.mood_series[:max(limit, 0)]
+        if not points:
+            return ProgressMetricsResponse(
+                metrics=[],
+                extracted_at=datetime.now().isoformat() + "Z",
+                session_count=0,
+                date_range="No sessions"
+            )
+        stored_count = min(DEFAULT_PROGRESS_LIMIT, len(self.mood_series))
+        if self.progress_metrics is not None and len(points) == stored_count:
+            return ProgressMetricsResponse(**self.progress_metrics)
+        return ProgressMetricsExtractor.extract_from_mood_series(points)
+
+    def consistency(self, days: int = 90, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Session consistency over the `days` before `now` (default: the current time).
+
+        Same response as the original endpoint (weekly attendance assumed as
+        the regular pattern), plus all-time values under "all_time".
+        """
+        end_date = now or datetime.now()
+        start_date = end_date - timedelta(days=days)
+
+        first = bisect_left(self.sessions, start_date.isoformat(), key=_date_key)
+        last = bisect_right(self.sessions, end_date.isoformat(), key=_date_key)
+        session_dates = [datetime.fromisoformat(session_date) for session_date, _ in self.sessions[first:last]]
+
+        if not session_dates:
+            return {
+                "consistency_score": 0,
+                "attendance_rate": 0,
+                "average_gap_days": 0,
+                "longest_streak_weeks": 0,
+                "missed_weeks": 0,
+                "weekly_data": [],
+                "total_sessions": 0,
+                "period_start": start_date.isoformat(),
+                "period_end": end_date.isoformat(),
+                "all_time": self._all_time(),
+            }
+
+        gaps = [(later - earlier).days for earlier, later in zip(session_dates, session_dates[1:])]
+        average_gap = sum(gaps) / len(gaps) if gaps else 0
+
+        # Calculate expected weekly sessions
+        weeks_in_period = days / 7
+        expected_sessions = int(weeks_in_period)
+        actual_sessions = len(session_dates)
+        attendance_rate = min(100, (actual_sessions / expected_sessions * 100)) if expected_sessions > 0 else 0
+
+        # Weekly buckets from the window start (one pass over the sorted dates)
+        week_count = -(-days // 7) if days > 0 else 0
+        counts = [0] * week_count
+        for session_date in session_dates:
+            index = (session_date - start_date) // _WEEK
+            if index < week_count:
+                counts[index] += 1
+
+        first_day = start_date.date()
+        weekly_data = [
+            {
+                "week": f"W{index + 1}",
+                "attended": 1 if count > 0 else 0,
+                "session_count": count,
+                "week_start": (first_day + index * _WEEK).isoformat(),
+            }
+            for index, count in enumerate(counts)
+        ]
+
+        bits = "".join("1" if count > 0 else "0" for count in counts)
+        longest_streak = max((len(run) for run in bits.split("0")), default=0)
+        missed_weeks = bits.count("0")
+
+        regularity_scores = [REGULARITY_POINTS[regularity_bucket(gap)] for gap in gaps]
+        regularity_score = sum(regularity_scores) / len(regularity_scores) if regularity_scores else 0
+
+        # 40% attendance rate, 40% regularity, 20% streak bonus
+        streak_bonus = min(20, (longest_streak / weeks_in_period) * 20) if weeks_in_period > 0 else 0
+        consistency_score = (
+            (attendance_rate * 0.4) +
+            (regularity_score * 0.4) +
+            streak_bonus
+        )
+        consistency_score = round(min(100, consistency_score), 1)
+
+        return {
+            "consistency_score": consistency_score,
+            "attendance_rate": round(attendance_rate, 1),
+            "average_gap_days": round(average_gap, 1),
+            "longest_streak_weeks": longest_streak,
+            "missed_weeks": missed_weeks,
+            "weekly_data": weekly_data,
+            "total_sessions": actual_sessions,
+            "expected_sessions": expected_sessions,
+            "period_start": start_date.isoformat(),
+            "period_end": end_date.isoformat(),
+            "all_time": self._all_time(),
+        }
+
+    def _all_time(self) -> Dict[str, Any]:
+        return {
+            "total_sessions": len(self.sessions),
+            "regularity_score": self.regularity_score,
+            "average_gap_days": self.average_gap_days,
+            "longest_streak_weeks": self.longest_streak_weeks,
+            "latest_streak_weeks": self.latest_streak_weeks,
+            "attendance_start": self.attendance_start,
+            "attendance_bitmap": self.attendance_bitmap,
+        }
+
+
+class PatientAggregatesStore:
+    """
+    Loads, updates and checks patients' materialized aggregates.
+
+    Updates for one patient are serialized across every store in the process
+    (a Wave 1 batch finishes several of a patient's sessions concurrently, and
+    each request builds its own store); writes from separate processes are
+    compare-and-swapped on the row's revision, so none is lost.
+
+    Args:
+        db: Async Supabase client. If None, uses get_async_supabase()
+            for the running event loop on first query
+        execute: Awaitable that runs a query builder (lets callers count
+            round-trips); defaults to query.execute()
+    """
+
+    TABLE = "patient_aggregates"
+
+    def __init__(self, db: Optional[Any] = None, execute: Optional[Execute] = None):
+        self.db = db
+        self._execute = execute or _default_execute
+
+    async def _get_db(self) -> Any:
+        if self.db is None:
+            self.db = await get_async_supabase()
+        return self.db
+
+    async def _load_row(self, patient_id: str) -> Tuple[Optional[PatientAggregates], Optional[int]]:
+        """(current aggregates or None, stored revision or None if there is no row)"""
+        db = await self._get_db()
+        result = await self._execute(db.table(self.TABLE).select("*").eq("patient_id", patient_id))
+        if not result.data:
+            return None, None
+        aggregates = PatientAggregates.from_row(result.data[0])
+        return (aggregates if aggregates.version == AGGREGATES_VERSION else None), aggregates.revision
+
+    async def load(self, patient_id: str) -> Optional[PatientAggregates]:
+        """Stored aggregates, or None if missing or written by an older version."""
+        aggregates, _ = await self._load_row(patient_id)
+        return aggregates
+
+    async def save(self, patient_id: str, aggregates: PatientAggregates) -> None:
+        """Write the row unconditionally."""
+        db = await self._get_db()
+        aggregates.revision += 1
+        await self._execute(db.table(self.TABLE).upsert(aggregates.to_row(patient_id), on_conflict="patient_id"))
+
+    async def _save_if_unchanged(
+        self,
+        patient_id: str,
+        aggregates: PatientAggregates,
+        expected_revision: Optional[int]
+    ) -> bool:
+        """Write the row only if it is still at expected_revision (None: no row yet)."""
+        db = await self._get_db()
+        aggregates.revision = (expected_revision or 0) + 1
+        row = aggregates.to_row(patient_id)
+
+        if expected_revision is None:
+            try:
+                await self._execute(db.table(self.TABLE).insert(row))
+            except Exception as e:
+                if getattr(e, "code", None) == "23505":  # Unique violation: another writer inserted first
+                    return False
+                raise
+            return True
+
+        result = await self._execute(
+            db.table(self.TABLE).update(row).eq("patient_id", patient_id).eq("revision", expected_revision)
+        )
+        return bool(result.data)
+
+    async def invalidate(self, patient_id: str) -> None:
+        """Drop a patient's row; the next read rebuilds it from therapy_sessions."""
+        db = await self._get_db()
+        await self._execute(db.table(self.TABLE).delete().eq("patient_id", patient_id))
+
+    async def rebuild(self, patient_id: str) -> PatientAggregates:
+        """Build aggregates from the patient's sessions (backfill and consistency check)."""
+        db = await self._get_db()
+        result = await self._execute(
+            db.table("therapy_sessions")
+            .select(", ".join(PATIENT_AGGREGATE_FIELDS))
+            .eq("patient_id", patient_id)
+            .order("session_date")
+        )
+
+        aggregates = PatientAggregates()
+        for session in result.data or []:
+            if not session.get("session_date"):
+                continue
+            aggregates.add_session(session["id"], session["session_date"])
+            if session.get("mood_score") is not None:
+                aggregates.set_mood(session)
+        return aggregates
+
+    async def get(self, patient_id: str) -> PatientAggregates:
+        """A patient's aggregates, rebuilt and stored first if missing or stale."""
+        aggregates = await self.load(patient_id)
+        if aggregates is None:
+            async with _patient_locks.lock(patient_id):
+                aggregates, revision = await self._load_row(patient_id)
+                if aggregates is None:
+                    aggregates = await self.rebuild(patient_id)
+                    # A concurrent writer's row is as fresh as this rebuild; keep theirs
+                    await self._save_if_unchanged(patient_id, aggregates, revision)
+                    logger.info(f"Backfilled aggregates for patient {patient_id}: {len(aggregates.sessions)} sessions")
+        return aggregates
+
+    async def _update(self, session: Dict[str, Any], apply: Callable[[PatientAggregates], bool]) -> PatientAggregates:
+        patient_id = session["patient_id"]
+        async with _patient_locks.lock(patient_id):
+            for _ in range(MAX_SAVE_ATTEMPTS):
+                aggregates, revision = await self._load_row(patient_id)
+                if aggregates is None:
+                    # Includes this session's current row
+                    aggregates = await self.rebuild(patient_id)
+                    apply(aggregates)
+                elif not apply(aggregates):
+                    return aggregates
+                if await self._save_if_unchanged(patient_id, aggregates, revision):
+                    return aggregates
+                logger.info(f"Aggregates for patient {patient_id} changed concurrently, retrying")
+
+        raise RuntimeError(f"Aggregates for patient {patient_id} kept changing; gave up after "
+                           f"{MAX_SAVE_ATTEMPTS} attempts")
+
+    async def record_session(self, session: Dict[str, Any]) -> PatientAggregates:
+        """
+        Add a session after it is created (or its date changes).
+
+        Args:
+            session: therapy_sessions row (id, patient_id, session_date)
+        """
+        return await self._update(session, lambda aggregates: aggregates.add_session(session["id"], session["session_date"]))
+
+    async def record_wave1(self, session: Dict[str, Any]) -> PatientAggregates:
+        """
+        Add or replace a session's mood point after its Wave 1 mood analysis completes.
+
+        Args:
+            session: therapy_sessions row (id, patient_id, session_date and mood columns)
+        """
+        return await self._update(session, lambda aggregates: aggregates.set_mood(session))
+
+    async def check(self, patient_id: str) -> Dict[str, Any]:
+        """
+        Compare a patient's stored aggregates with a rebuild from therapy_sessions,
+        rewriting the row if they differ.
+
+        Returns:
+            {"patient_id", "status": "ok" | "repaired" | "missing" | "changed", "drift": [field names]}
+            ("changed": another writer updated the row during the check, which was left to it)
+        """
+        async with _patient_locks.lock(patient_id):
+            stored, revision = await self._load_row(patient_id)
+            rebuilt = await self.rebuild(patient_id)
+
+            if stored is None:
+                status, drift = "missing", []
+            else:
+                drift = [name for name in _CHECKED_FIELDS if getattr(stored, name) != getattr(rebuilt, name)]
+                status = "repaired" if drift else "ok"
+
+            if status != "ok" and not await self._save_if_unchanged(patient_id, rebuilt, revision):
+                # Updated while we rebuilt: that writer started from the stored row, so check again next time
+                status = "changed"
+
+        if drift:
+            logger.warning(f"Aggregates for patient {patient_id} drifted ({', '.join(drift)}); rebuilt")
+        return {"patient_id": patient_id, "status": status, "drift": drift}
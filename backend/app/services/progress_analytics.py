@@ -0,0 +1,331 @@
+"""
+Progress Analytics - Vectorized consistency and mood trends for many patients
+
+Session consistency and mood trends used to be computed one patient at a
+time with Python loops over session dicts (datetime.fromisoformat per
+session, a weeks x sessions loop for weekly buckets, a loop for streaks).
+Clinician-level views need them for hundreds of patients at once, so this
+module computes them for a whole batch over flat NumPy arrays:
+
+- session dates as datetime64[us], grouped by patient (one lexsort)
+- gaps with np.diff within each patient, regularity points with np.select
+- weekly buckets with one np.bincount over (patient, week) cells
+- streaks by run-length encoding the attended-weeks matrix
+- mood trend averages with np.bincount weights over per-patient masks
+
+Results are the same dicts/strings the single-patient code returns:
+consistency_batch() produces the /consistency response for each patient, and
+mood_trends_batch() matches ProgressMetricsExtractor's Mood Trends insight.
+Floating-point operations are applied in the same order, so values agree
+exactly for the app's 0.5-step mood scores. A single patient is still served
+by PatientAggregates.consistency(), where array setup would cost more than
+the loop it replaces.
+
+Usage:
+    results = consistency_batch({patient_id: session_dates, ...}, days=90)
+    trends = mood_trends_batch({patient_id: mood_scores, ...})
+"""
+
+import warnings
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+_DAY = np.timedelta64(1, "D").astype("timedelta64[us]").astype(np.int64)
+_WEEK = 7 * _DAY
+
+# Mood trend thresholds (see ProgressMetricsExtractor._mood_trend_metric)
+RECENT_SESSIONS = 3
+TREND_MARGIN = 0.5
+VARIABLE_RANGE = 2.0
+
+
+def parse_session_dates(values: Sequence[str]) -> np.ndarray:
+    """
+    ISO session dates as datetime64[us] (naive UTC).
+
+    Naive timestamps are parsed in one vectorized call; inputs with a
+    timezone offset are normalized one by one first.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            return np.array(values, dtype="datetime64[us]")
+    except (ValueError, UserWarning):
+        from app.services.patient_aggregates import normalize_session_date
+
+        return np.array([normalize_session_date(value) for value in values], dtype="datetime64[us]")
+
+
+def _flatten(values_by_patient: Mapping[str, Sequence[Any]]) -> tuple:
+    """Concatenate per-patient sequences into (patient ids, values, group index per value)."""
+    patient_ids = list(values_by_patient)
+    lengths = np.fromiter((len(values_by_patient[pid]) for pid in patient_ids), dtype=np.int64, count=len(patient_ids))
+    values = [value for pid in patient_ids for value in values_by_patient[pid]]
+    groups = np.repeat(np.arange(len(patient_ids)), lengths)
+    return patient_ids, values, groups
+
+
+def longest_runs(attended: np.ndarray) -> np.ndarray:
+    """Longest run of True per row of a 2-D boolean matrix."""
+    rows, columns = attended.shape
+    padded = np.zeros((rows, columns + 2), dtype=np.int8)
+    padded[:, 1:-1] = attended
+    edges = np.diff(padded, axis=1)
+    start_rows, start_columns = np.nonzero(edges == 1)
+    _, end_columns = np.nonzero(edges == -1)
+
+    longest = np.zeros(rows, dtype=np.int64)
+    np.maximum.at(longest, start_rows, end_columns - start_columns)
+    return longest
+
+
+# =============================================================================
+# Consistency
+# =============================================================================
+
+def consistency_batch(
+    sessions_by_patient: Mapping[str, Sequence[str]],
+    days: int = 90,
+    now: Optional[datetime] = None,
+    include_weekly: bool = True,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Session consistency over the `days` before `now` for every patient.
+
+    Args:
+        sessions_by_patient: {patient_id: ISO session dates} (any order)
+        days: Window length (default: 90)
+        now: Window end (default: the current time)
+        include_weekly: Include the per-week chart data (clinician overviews
+                        that only need the scores can skip building it)
+
+    Returns:
+        {patient_id: /consistency response dict}
+    """
+    end_date = now or datetime.now()
+    start_date = end_date - timedelta(days=days)
+    patient_ids, dates, groups = _flatten(sessions_by_patient)
+    patients = len(patient_ids)
+
+    times = parse_session_dates(dates).astype(np.int64) if dates else np.zeros(0, dtype=np.int64)
+    start = np.datetime64(start_date, "us").astype(np.int64)
+    end = np.datetime64(end_date, "us").astype(np.int64)
+
+    # Sessions in the window, sorted by (patient, date)
+    in_window = (times >= start) & (times <= end)
+    times, groups = times[in_window], groups[in_window]
+    order = np.lexsort((times, groups))
+    times, groups = times[order], groups[order]
+    counts = np.bincount(groups, minlength=patients)
+
+    # Gaps between consecutive sessions of the same patient (timedelta.days floors)
+    same_patient = groups[1:] == groups[:-1]
+    gaps = (np.diff(times) // _DAY)[same_patient]
+    gap_groups = groups[1:][same_patient]
+    gap_counts = np.bincount(gap_groups, minlength=patients)
+    gap_totals = np.bincount(gap_groups, weights=gaps, minlength=patients)
+
+    deviation = np.abs(gaps - 7)
+    points = np.select([deviation <= 3, deviation <= 7, deviation <= 14], [100, 70, 40], default=10)
+    point_totals = np.bincount(gap_groups, weights=points, minlength=patients)
+
+    # Weekly buckets from the window start: one bincount over (patient, week) cells
+    week_count = -(-days // 7) if days > 0 else 0
+    weeks = (times - start) // _WEEK
+    in_weeks = weeks < week_count
+    cells = np.bincount(
+        groups[in_weeks] * week_count + weeks[in_weeks], minlength=patients * week_count
+    ).reshape(patients, week_count)
+    attended = cells > 0
+    longest = longest_runs(attended)
+    missed = week_count - attended.sum(axis=1)
+
+    weeks_in_period = days / 7
+    expected_sessions = int(weeks_in_period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average_gap = np.where(gap_counts > 0, gap_totals / gap_counts, 0)
+        regularity = np.where(gap_counts > 0, point_totals / gap_counts, 0)
+    if expected_sessions > 0:
+        attendance_rate = np.minimum(100, counts / expected_sessions * 100)
+    else:
+        attendance_rate = np.zeros(patients, dtype=np.int64)
+    if weeks_in_period > 0:
+        streak_bonus = np.minimum(20, (longest / weeks_in_period) * 20)
+    else:
+        streak_bonus = np.zeros(patients)
+    consistency_score = np.minimum(100, (attendance_rate * 0.4) + (regularity * 0.4) + streak_bonus)
+
+    week_labels = [f"W{index + 1}" for index in range(week_count)]
+    first_day = start_date.date()
+    week_starts = [(first_day + index * timedelta(days=7)).isoformat() for index in range(week_count)]
+    period = {"period_start": start_date.isoformat(), "period_end": end_date.isoformat()}
+
+    columns = zip(
+        counts.tolist(), consistency_score.tolist(), attendance_rate.tolist(), average_gap.tolist(),
+        gap_counts.tolist(), longest.tolist(), missed.tolist(),
+    )
+    results: Dict[str, Dict[str, Any]] = {}
+    for index, (count, score, rate, gap, gap_count, streak, missed_weeks) in enumerate(columns):
+        if count == 0:
+            results[patient_ids[index]] = {
+                "consistency_score": 0,
+                "attendance_rate": 0,
+                "average_gap_days": 0,
+                "longest_streak_weeks": 0,
+                "missed_weeks": 0,
+                "weekly_data": [],
+                "total_sessions": 0,
+                **period,
+            }
+            continue
+
+        weekly_data = []
+        if include_weekly:
+            weekly_data = [
+                {"week": label, "attended": 1 if cell > 0 else 0, "session_count": cell, "week_start": week_start}
+                for label, cell, week_start in zip(week_labels, cells[index].tolist(), week_starts)
+            ]
+        results[patient_ids[index]] = {
+            "consistency_score": round(score, 1),
+            "attendance_rate": round(rate, 1),
+            "average_gap_days": round(gap, 1) if gap_count else 0,
+            "longest_streak_weeks": streak,
+            "missed_weeks": missed_weeks,
+            "weekly_data": weekly_data,
+            "total_sessions": count,
+            "expected_sessions": expected_sessions,
+            **period,
+        }
+    return results
+
+
+# =============================================================================
+# Mood Trends
+# =============================================================================
+
+def mood_trends_batch(moods_by_patient: Mapping[str, Sequence[float]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Mood trend for every patient from their chronological mood scores.
+
+    Args:
+        moods_by_patient: {patient_id: mood scores, oldest first}
+
+    Returns:
+        {patient_id: {sessions, first, last, improvement_pct, recent_avg,
+        historical_avg, direction, insight}}. Values that need more sessions
+        are None; a first score of 0 leaves improvement_pct and insight None
+        (the single-patient extractor cannot compute them either).
+    """
+    patient_ids, scores, groups = _flatten(moods_by_patient)
+    patients = len(patient_ids)
+    scores = np.asarray(scores, dtype=np.float64)
+
+    counts = np.bincount(groups, minlength=patients)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    has_any = counts > 0
+
+    first = np.full(patients, np.nan)
+    last = np.full(patients, np.nan)
+    first[has_any] = scores[starts[has_any]]
+    last[has_any] = scores[ends[has_any] - 1]
+
+    # Last RECENT_SESSIONS scores vs the ones before them (or the first, if none)
+    from_end = ends[groups] - 1 - np.arange(len(scores))
+    recent = from_end < RECENT_SESSIONS
+    recent_sum = np.bincount(groups[recent], weights=scores[recent], minlength=patients)
+    earlier_sum = np.bincount(groups[~recent], weights=scores[~recent], minlength=patients)
+
+    highest = np.full(patients, np.nan)
+    lowest = np.full(patients, np.nan)
+    if has_any.any():
+        highest[has_any] = np.maximum.reduceat(scores, starts[has_any])
+        lowest[has_any] = np.minimum.reduceat(scores, starts[has_any])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        improvement = ((last - first) / first) * 100
+        recent_avg = recent_sum / RECENT_SESSIONS
+        historical_avg = np.where(counts > RECENT_SESSIONS, earlier_sum / (counts - RECENT_SESSIONS), first)
+
+    direction = np.select(
+        [
+            recent_avg > historical_avg + TREND_MARGIN,
+            recent_avg < historical_avg - TREND_MARGIN,
+            highest - lowest > VARIABLE_RANGE,
+        ],
+        ["📈 IMPROVING", "📉 DECLINING", "↕️ VARIABLE"],
+        default="➡️ STABLE",
+    )
+
+    columns = zip(
+        counts.tolist(), first.tolist(), last.tolist(), improvement.tolist(),
+        recent_avg.tolist(), historical_avg.tolist(), direction.tolist(),
+    )
+    results: Dict[str, Dict[str, Any]] = {}
+    for index, (count, first_mood, last_mood, change, recent_mean, historical_mean, trend) in enumerate(columns):
+        trend_values = count >= RECENT_SESSIONS
+        computable = count >= 2 and first_mood != 0
+        summary = {
+            "sessions": count,
+            "first": first_mood if count else None,
+            "last": last_mood if count else None,
+            "improvement_pct": change if computable else None,
+            "recent_avg": recent_mean if trend_values else None,
+            "historical_avg": historical_mean if trend_values else None,
+            "direction": trend if trend_values else None,
+        }
+
+        if count < 2:
+            summary["insight"] = f"Tracking mood across {count} session(s)"
+        elif not computable:
+            summary["insight"] = None
+        else:
+            sign = "+" if change > 0 else ""
+            if trend_values:
+                summary["insight"] = (
+                    f"{trend}: {sign}{change:.0f}% overall "
+                    f"(Recent avg: {recent_mean:.1f}/10, Historical: {historical_mean:.1f}/10)"
+                )
+            else:
+                summary["insight"] = f"{sign}{change:.0f}% mood change over {count} sessions"
+        results[patient_ids[index]] = summary
+    return results
+
+
+def progress_overview(
+    rows: Sequence[Mapping[str, Any]],
+    days: int = 90,
+    now: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Consistency scores and mood trends for every patient in a set of session rows.
+
+    Args:
+        rows: therapy_sessions rows with patient_id, session_date and mood_score,
+              ordered by session_date
+        days: Consistency window
+        now: Window end (default: the current time)
+
+    Returns:
+        [{patient_id, consistency: {...}, mood_trend: {...}}] (weekly chart
+        data omitted), in first-seen patient order
+    """
+    dates_by_patient: Dict[str, List[str]] = {}
+    moods_by_patient: Dict[str, List[float]] = {}
+    for row in rows:
+        patient_id = row["patient_id"]
+        dates_by_patient.setdefault(patient_id, []).append(row["session_date"])
+        moods = moods_by_patient.setdefault(patient_id, [])
+        if row.get("mood_score") is not None:
+            moods.append(row["mood_score"])
+
+    consistency = consistency_batch(dates_by_patient, days=days, now=now, include_weekly=False)
+    trends = mood_trends_batch(moods_by_patient)
+    overview = []
+    for patient_id in dates_by_patient:
+        scores = consistency[patient_id]
+        scores.pop("weekly_data")
+        overview.append({"patient_id": patient_id, "consistency": scores, "mood_trend": trends[patient_id]})
+    return overview
@@ -81,27 +81,72 @@ class ProgressMetricsExtractor:
         consistency_metric = ProgressMetricsExtractor._extract_session_consistency(sessions)
 
         # Calculate date range
-        session_dates = []
-        for session in sessions:
-            wave1 = session.get("wave1", {})
-            analyzed_at = wave1.get("analyzed_at") or session.get("wave2", {}).get("deep_analysis", {}).get("analyzed_at")
-            if analyzed_at:
-                session_dates.append(datetime.fromisoformat(analyzed_at.replace("Z", "+00:00")))
-
-        if session_dates:
-            min_date = min(session_dates).strftime("%b %d")
-            max_date = max(session_dates).strftime("%b %d, %Y")
-            date_range = f"{min_date} - {max_date}"
-        else:
-            date_range = "Unknown"
+        analyzed_dates = [
+            session.get("wave1", {}).get("analyzed_at")
+            or session.get("wave2", {}).get("deep_analysis", {}).get("analyzed_at")
+            for session in sessions
+        ]
 
         return ProgressMetricsResponse(
             metrics=[mood_metric, consistency_metric],
             extracted_at=datetime.utcnow().isoformat() + "Z",
             session_count=len(sessions),
-            date_range=date_range,
+            date_range=ProgressMetricsExtractor._date_range(analyzed_dates),
+        )
+
+    @staticmethod
+    def extract_from_mood_series(points: List[Dict[str, Any]]) -> ProgressMetricsResponse:
+        """
+        Extract progress metrics from a chronological mood series.
+
+        Same output as extract_from_pipeline_json for the equivalent pipeline
+        JSON, without building it (used by the materialized patient aggregates).
+
+        Args:
+            points: [{mood_score, mood_confidence, analyzed_at}], oldest first;
+                    session numbers are positions in the list (1-based)
+
+        Returns:
+            ProgressMetricsResponse with Mood Trends and Session Consistency
+        """
+        if not points:
+            raise ValueError("No sessions found in mood series")
+
+        chart_data = []
+        mood_scores = []
+        for session_num, point in enumerate(points, start=1):
+            if point.get("mood_score") is None:
+                continue
+            chart_data.append(ProgressMetricsExtractor._mood_chart_point(
+                session_num, point["mood_score"], point.get("mood_confidence", 0.8), point.get("analyzed_at")
+            ))
+            mood_scores.append(point["mood_score"])
+
+        return ProgressMetricsResponse(
+            metrics=[
+                ProgressMetricsExtractor._mood_trend_metric(chart_data, mood_scores),
+                ProgressMetricsExtractor._consistency_metric(len(points)),
+            ],
+            extracted_at=datetime.utcnow().isoformat() + "Z",
+            session_count=len(points),
+            date_range=ProgressMetricsExtractor._date_range([point.get("analyzed_at") for point in points]),
         )
 
+    @staticmethod
+    def _date_range(analyzed_dates: List[Optional[str]]) -> str:
+        """Display range of the sessions' analysis timestamps ("Unknown" if none)."""
+        session_dates = [
+            datetime.fromisoformat(analyzed_at.replace("Z", "+00:00"))
+            for analyzed_at in analyzed_dates
+            if analyzed_at
+        ]
+
+        if session_dates:
+            min_date = min(session_dates).strftime("%b %d")
+            max_date = max(session_dates).strftime("%b %d, %Y")
+            return f"{min_date} - {max_date}"
+        return "Unknown"
+
     @staticmethod
     def _extract_mood_trends(sessions: List[Dict[str, Any]]) -> ProgressMetric:
         """
@@ -124,24 +169,39 @@ class ProgressMetricsExtractor:
             analyzed_at = wave1.get("analyzed_at") or session.get("wave2", {}).get("deep_analysis", {}).get("analyzed_at")
 
             if mood_score is not None and session_num is not None:
-                # Parse date for display
-                if analyzed_at:
-                    try:
-                        date_obj = datetime.fromisoformat(analyzed_at.replace("Z", "+00:00"))
-                        date_str = date_obj.strftime("%b %d")
-                    except:
-                        date_str = "Unknown"
-                else:
-                    date_str = "Unknown"
-
-                chart_data.append({
-                    "session": f"S{session_num}",
-                    "mood": round(mood_score, 1),
-                    "date": date_str,
-                    "confidence": mood_confidence,
-                })
+                chart_data.append(
+                    ProgressMetricsExtractor._mood_chart_point(session_num, mood_score, mood_confidence, analyzed_at)
+                )
                 mood_scores.append(mood_score)
 
+        return ProgressMetricsExtractor._mood_trend_metric(chart_data, mood_scores)
+
+    @staticmethod
+    def _mood_chart_point(
+        session_num: int,
+        mood_score: float,
+        mood_confidence: Optional[float],
+        analyzed_at: Optional[str]
+    ) -> Dict[str, Any]:
+        # Parse date for display
+        if analyzed_at:
+            try:
+                date_obj = datetime.fromisoformat(analyzed_at.replace("Z", "+00:00"))
+                date_str = date_obj.strftime("%b %d")
+            except:
+                date_str = "Unknown"
+        else:
+            date_str = "Unknown"
+
+        return {
+            "session": f"S{session_num}",
+            "mood": round(mood_score, 1),
+            "date": date_str,
+            "confidence": mood_confidence,
+        }
+
+    @staticmethod
+    def _mood_trend_metric(chart_data: List[Dict[str, Any]], mood_scores: List[float]) -> ProgressMetric:
         # Calculate insight
         if len(mood_scores) >= 2:
             first_mood = mood_scores[0]
@@ -189,19 +249,23 @@ class ProgressMetricsExtractor:
         Note: Without real session dates, we simulate weekly attendance based on session count.
         In production, this would use actual session.date from database.
         """
+        return ProgressMetricsExtractor._consistency_metric(len(sessions))
+
+    @staticmethod
+    def _consistency_metric(session_count: int) -> ProgressMetric:
         # Simulate weekly attendance (1 session per week for demo)
         # In production, you'd group sessions by week from actual dates
         chart_data = []
 
-        for idx, session in enumerate(sessions, start=1):
+        for idx in range(1, session_count + 1):
             chart_data.append({
                 "week": f"Week {idx}",
                 "attended": 1,  # Binary: session happened
             })
 
         # Calculate attendance metrics
-        total_weeks = len(sessions)
-        attended_weeks = len(sessions)  # All sessions in pipeline are attended
+        total_weeks = session_count
+        attended_weeks = session_count  # All sessions in pipeline are attended
         attendance_rate = (attended_weeks / total_weeks) * 100 if total_weeks > 0 else 0
 
         # Calculate consistency score (simplified)
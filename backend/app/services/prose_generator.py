@@ -16,7 +16,7 @@ from datetime import datetime
 import logging
 import time
 
-from app.services.base_ai_generator import SyncAIGenerator
+from app.services.base_ai_generator import AsyncAIGenerator
 from app.config.model_config import track_generation_cost, GenerationCost
 
 logger = logging.getLogger(__name__)
@@ -34,11 +34,11 @@ class ProseAnalysis:
     cost_info: Optional[GenerationCost] = None  # Cost tracking for this generation
 
 
-class ProseGenerator(SyncAIGenerator):
+class ProseGenerator(AsyncAIGenerator):
     """
     AI-powered prose generation for therapy session analysis.
 
-    Inherits from SyncAIGenerator for consistent initialization and cost tracking.
+    Inherits from AsyncAIGenerator for consistent initialization and cost tracking.
 
     Converts structured DeepAnalysis JSON into flowing prose narrative
     that combines compassionate tone with clinical expertise.
@@ -91,8 +91,7 @@ class ProseGenerator(SyncAIGenerator):
         # NOTE: GPT-5 series does NOT support custom temperature
         try:
             start_time = time.time()
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self._create_chat_completion_async(
                 messages=[
                     {
                         "role": "system",
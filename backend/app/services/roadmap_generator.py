@@ -18,6 +18,7 @@ Cost: ~$0.003-0.020 per generation (varies by strategy)
 import json
 import logging
 import os
+import re
 import time
 from typing import Optional, Literal, Dict, List, Any
 from uuid import UUID
@@ -32,6 +33,11 @@ logger = logging.getLogger(__name__)
 
 CompactionStrategy = Literal["full", "progressive", "hierarchical"]
 
+# Hierarchical compaction bounds (characters)
+TIER2_POINT_CHARS = 200   # Per-session sentence in a Tier 2 summary
+TIER3_MAX_CHARS = 1500    # Whole Tier 3 journey arc
+ARC_SEPARATOR = " | "
+
 
 class RoadmapGenerator(SyncAIGenerator):
     """
@@ -40,6 +46,9 @@ class RoadmapGenerator(SyncAIGenerator):
     Inherits from SyncAIGenerator for consistent initialization and cost tracking.
     """
 
+    # Roadmaps are regenerated as sessions arrive; never replay a cached one
+    use_cache = False
+
     def __init__(self, api_key: Optional[str] = None, override_model: Optional[str] = None):
         """
         Initialize roadmap generator with OpenAI client.
@@ -148,8 +157,7 @@ class RoadmapGenerator(SyncAIGenerator):
             )
 
             # Call GPT-5.2
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self._create_chat_completion_sync(
                 messages=[
                     {"role": "system", "content": self._get_system_prompt()},
                     {"role": "user", "content": prompt}
@@ -478,8 +486,9 @@ Return your response as a JSON object with the roadmap structure.
         """
         Strategy 3: Hierarchical Summarization
 
-        Uses multi-tier summaries that compact at different granularities.
-        Token count: ~10K-12K
+        Uses multi-tier summaries that compact at different granularities
+        (stored and compacted incrementally by JourneyCompactor).
+        Token count: ~2K-5K, flat in session count
         Cost: ~$0.003-0.004 per generation
         """
         header = self._build_prompt_header(
@@ -494,7 +503,8 @@ Return your response as a JSON object with the roadmap structure.
         # Tier 3: Long-term trajectory
         tier3_summary = context.get("tier3_summary")
         if tier3_summary:
-            tier_sections.append(f"TIER 3 - LONG-TERM TRAJECTORY (Sessions 1-10):\n{tier3_summary}")
+            tier3_range = context.get("tier3_range", "Sessions 1-10")
+            tier_sections.append(f"TIER 3 - LONG-TERM TRAJECTORY ({tier3_range}):\n{tier3_summary}")
 
         # Tier 2: Mid-range summaries
         tier2_summaries = context.get("tier2_summaries", {})
@@ -542,41 +552,68 @@ Return your response as a JSON object with the roadmap structure.
         """
         Compact Tier 1 insights (5 sessions worth) into Tier 2 paragraph summary.
 
-        Called every 5 sessions to prevent Tier 1 from growing too large.
+        Called every 5 sessions to prevent Tier 1 from growing too large. Keeps
+        each session's lead insight (first sentence, clipped), so the paragraph
+        stays bounded no matter how verbose the insights are.
 
         Args:
-            tier1_summaries: Dict of {session_id: [insights]} for 5 sessions
+            tier1_summaries: Dict of {session_label: [insights]} for 5 sessions, oldest first
 
         Returns:
-            Paragraph summary (2-3 sentences) synthesizing 5 sessions
+            Paragraph summary with one sentence per session
 
         Example:
             Input: {
-                "session_01": ["Anxiety trigger identified", "Breathing practiced"],
-                "session_02": ["Breakthrough with avoidance", ...],
+                "Session 1": ["Anxiety trigger identified at work", "Breathing practiced"],
+                "Session 2": ["Connected avoidance to childhood experiences", ...],
                 ...
             }
-            Output: "Patient made significant progress in Sessions 1-5, identifying work stress as primary anxiety trigger and practicing breathing techniques independently. Breakthrough moment occurred in Session 2 when connecting avoidance patterns to childhood experiences. By Session 5, patient demonstrated consistent skill application."
+            Output: "Session 1: Anxiety trigger identified at work. Session 2: Connected avoidance to childhood experiences. ..."
         """
-        # This will be called by the orchestration script, not the generator itself
-        # Placeholder for now - actual implementation in orchestration (Phase 5)
-        pass
+        points = [
+            f"{label}: {_lead_sentence(insights[0], TIER2_POINT_CHARS)}"
+            for label, insights in tier1_summaries.items()
+            if insights
+        ]
+        return " ".join(points)
 
     @staticmethod
-    def compact_tier2_to_tier3(tier2_summaries: list[str]) -> str:
+    def compact_tier2_to_tier3(tier2_summaries: list[str], previous_arc: Optional[str] = None) -> str:
         """
         Compact Tier 2 summaries (10 sessions worth) into Tier 3 journey arc.
 
-        Called every 10 sessions to create high-level trajectory narrative.
+        Called every 10 sessions to extend the high-level trajectory narrative.
+        The arc is a " | "-separated list of milestones: the lead sentence of
+        each Tier 2 summary is appended, and once the arc exceeds
+        TIER3_MAX_CHARS the oldest milestones after the first (where the
+        journey started) are dropped, so it never grows with session count.
 
         Args:
-            tier2_summaries: List of 2 Tier 2 paragraph summaries (Sessions 1-5, 6-10)
+            tier2_summaries: Tier 2 paragraph summaries being folded in, oldest first
+            previous_arc: Existing Tier 3 arc to extend (None on first compaction)
 
         Returns:
-            Journey arc narrative (3-4 sentences) synthesizing 10 sessions
+            Journey arc narrative
 
         Example:
-            Output: "Patient's journey began with acute anxiety symptoms and work-related stress (Sessions 1-5), progressing through skill acquisition and breakthrough insights about avoidance patterns. Mid-journey (Sessions 6-10) focused on applying learned techniques in real-world situations, with increasing confidence and reduced symptom severity. Overall trajectory shows steady improvement in emotional regulation and social functioning."
+            Output: "Session 1: Anxiety trigger identified at work. | Session 6: Practiced exposure at work meetings. | ..."
         """
-        # Placeholder - implemented in orchestration script (Phase 5)
-        pass
+        milestones = previous_arc.split(ARC_SEPARATOR) if previous_arc else []
+        milestones += [_lead_sentence(summary, TIER2_POINT_CHARS) for summary in tier2_summaries if summary]
+
+        while len(milestones) > 2 and len(ARC_SEPARATOR.join(milestones)) > TIER3_MAX_CHARS:
+            del milestones[1]
+
+        return ARC_SEPARATOR.join(milestones)
+
+
+def _lead_sentence(text: str, max_chars: int) -> str:
+    """First sentence of text, clipped to max_chars."""
+    text = " ".join(text.split())
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    sentence = match.group(1) if match else text
+    if len(sentence) > max_chars:
+        sentence = sentence[:max_chars - 3].rstrip() + "..."
+    elif sentence and sentence[-1] not in ".!?":
+        sentence += "."
+    return sentence
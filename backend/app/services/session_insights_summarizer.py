@@ -26,6 +26,9 @@ class SessionInsightsSummarizer(SyncAIGenerator):
     Inherits from SyncAIGenerator for consistent initialization and cost tracking.
     """
 
+    # Insights are generated once per deep analysis and stored with the session
+    use_cache = False
+
     def __init__(self, api_key: Optional[str] = None, override_model: Optional[str] = None):
         """
         Initialize summarizer with OpenAI client.
@@ -75,8 +78,7 @@ class SessionInsightsSummarizer(SyncAIGenerator):
 
         # Call GPT-5.2
         start_time = time.time()
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._create_chat_completion_sync(
             messages=[
                 {"role": "system", "content": self._get_system_prompt()},
                 {"role": "user", "content": prompt}
@@ -0,0 +1,120 @@
+"""
+Session Snapshot - Unit of work over one therapy_sessions row
+
+An AnalysisOrchestrator run used to re-read the full session row (transcript
+included) in every wave function and write each analysis result with its own
+UPDATE. A SessionSnapshot loads the row once, applies staged updates to the
+in-memory copy so later waves see earlier results, and writes all staged
+columns back in a single coalesced UPDATE on flush().
+
+refresh() re-reads the row (keeping staged values on top) for the places
+where another process may have changed it.
+
+Usage:
+    snapshot = await SessionSnapshot.load(db, session_id)
+    snapshot.stage({"mood_score": 6.5, "mood_analyzed_at": now})
+    snapshot.stage({"topics": ["Anxiety"], "topics_extracted_at": now})
+    await snapshot.flush()   # one UPDATE with both sets of columns
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+Execute = Callable[[Any], Awaitable[Any]]
+
+
+async def _default_execute(query: Any) -> Any:
+    return await query.execute()
+
+
+class SessionSnapshot:
+    """
+    In-memory copy of a therapy_sessions row with coalesced write-back.
+
+    Args:
+        db: Async Supabase client
+        session_id: Session UUID
+        row: Current row contents
+        execute: Awaitable that runs a query builder (lets callers count
+            round-trips); defaults to query.execute()
+    """
+
+    TABLE = "therapy_sessions"
+
+    def __init__(
+        self,
+        db: Any,
+        session_id: str,
+        row: Dict[str, Any],
+        execute: Optional[Execute] = None,
+    ):
+        self.db = db
+        self.session_id = session_id
+        self._row = dict(row)
+        self._pending: Dict[str, Any] = {}
+        self._execute = execute or _default_execute
+        self.reads = 1
+        self.writes = 0
+
+    @classmethod
+    async def load(
+        cls,
+        db: Any,
+        session_id: str,
+        execute: Optional[Execute] = None,
+    ) -> "SessionSnapshot":
+        """Read the session row once (raises if not found)."""
+        run = execute or _default_execute
+        response = await run(db.table(cls.TABLE).select("*").eq("id", session_id).single())
+        if not response.data:
+            raise Exception(f"Session not found: {session_id}")
+        return cls(db, session_id, response.data, execute)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Row as seen by this run (persisted values + staged updates)."""
+        return self._row
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._row.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._row[key]
+
+    def stage(self, updates: Dict[str, Any]) -> None:
+        """Apply updates in memory and queue them for the next flush()."""
+        self._row.update(updates)
+        self._pending.update(updates)
+
+    async def flush(self) -> bool:
+        """
+        Write all staged columns in one UPDATE.
+
+        Returns:
+            True if a write was issued
+        """
+        if not self._pending:
+            return False
+
+        updates = dict(self._pending)
+        await self._execute(self.db.table(self.TABLE).update(updates).eq("id", self.session_id))
+        # Only clear what was written; stage() calls during the await stay queued
+        for key, value in updates.items():
+            if self._pending.get(key) is value:
+                del self._pending[key]
+        self.writes += 1
+        return True
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Re-read the row from the database, keeping staged values on top."""
+        response = await self._execute(
+            self.db.table(self.TABLE).select("*").eq("id", self.session_id).single()
+        )
+        if not response.data:
+            raise Exception(f"Session not found: {self.session_id}")
+        self._row = {**response.data, **self._pending}
+        self.reads += 1
+        return self._row
@@ -56,6 +56,9 @@ class SpeakerLabeler(SyncAIGenerator):
     Inherits from SyncAIGenerator for consistent initialization and cost tracking.
     """
 
+    # Labeled transcripts are stored with the session, so caching buys nothing
+    use_cache = False
+
     def __init__(self, openai_api_key: str = None, override_model: Optional[str] = None):
         """
         Initialize the speaker labeler.
@@ -136,8 +139,7 @@ class SpeakerLabeler(SyncAIGenerator):
         user_prompt = self._create_detection_user_prompt(segments)
 
         start_time = time.time()
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._create_chat_completion_sync(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
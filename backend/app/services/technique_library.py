@@ -3,14 +3,29 @@ Technique Library Loader and Validator
 
 Provides access to the comprehensive clinical technique reference library
 and utilities for matching/validating extracted techniques.
+
+Lookups are served from indexes built once when the library loads:
+- exact matches: normalized name / formatted name / alias -> technique
+- fuzzy matches: padded trigram -> name/alias entries, so SequenceMatcher
+  only runs on entries that share a trigram with the input, most similar
+  first, skipping any whose cheap upper bounds cannot beat the best so far.
+  Each entry keeps a SequenceMatcher with its own side preprocessed.
+- definitions: formatted name -> definition
+validate_and_standardize results are memoized in a per-library LRU.
 """
 
 import json
+import threading
+from collections import Counter, defaultdict
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from difflib import SequenceMatcher
 from dataclasses import dataclass
 
+# Distinct raw technique strings whose validation result is memoized
+VALIDATION_CACHE_SIZE = 1024
+
 
 @dataclass
 class Technique:
@@ -32,8 +47,8 @@ class TechniqueLibrary:
     Loads and provides access to the clinical technique reference library.
 
     Supports:
-    - Exact matching by technique name
-    - Fuzzy matching using string similarity
+    - Exact matching by technique name (O(1) hash lookup)
+    - Fuzzy matching using string similarity (trigram-pruned)
     - Alias resolution
     - Technique lookup by modality
     """
@@ -53,6 +68,8 @@ class TechniqueLibrary:
         self.techniques: List[Technique] = []
         self.modalities: Dict[str, str] = {}  # short_name -> full_name
         self._load_library()
+        self._build_indexes()
+        self._validate_cached = lru_cache(maxsize=VALIDATION_CACHE_SIZE)(self._validate_and_standardize)
 
     def _load_library(self):
         """Load the technique library from JSON file"""
@@ -74,13 +91,40 @@ class TechniqueLibrary:
                 )
                 self.techniques.append(technique)
 
+    def _build_indexes(self):
+        """Build the exact, fuzzy (trigram) and definition indexes"""
+        # First technique wins on collisions, as the linear scans did
+        self._exact_index: Dict[str, Technique] = {}
+        self._definitions: Dict[str, str] = {}
+        self._by_modality: Dict[str, List[Technique]] = defaultdict(list)
+
+        # Fuzzy entries in scan order: each technique's name, then its aliases
+        self._fuzzy_entries: List[Tuple[str, Technique]] = []
+        self._fuzzy_matchers: List[SequenceMatcher] = []
+        self._fuzzy_lock = threading.Lock()  # Matchers are reused across calls
+        self._trigram_index: Dict[str, List[int]] = defaultdict(list)
+
+        for technique in self.techniques:
+            self._by_modality[technique.modality].append(technique)
+            self._definitions.setdefault(technique.formatted_name, technique.definition)
+
+            for key in (technique.name, technique.formatted_name, *technique.aliases):
+                self._exact_index.setdefault(_normalize(key), technique)
+
+            for text in (technique.name, *technique.aliases):
+                entry_id = len(self._fuzzy_entries)
+                self._fuzzy_entries.append((text.lower(), technique))
+                self._fuzzy_matchers.append(SequenceMatcher(None, "", text.lower()))
+                for trigram in _trigrams(text.lower()):
+                    self._trigram_index[trigram].append(entry_id)
+
     def get_all_techniques(self) -> List[Technique]:
         """Get all techniques in the library"""
         return self.techniques
 
     def get_techniques_by_modality(self, modality: str) -> List[Technique]:
         """Get all techniques for a specific modality"""
-        return [t for t in self.techniques if t.modality == modality]
+        return list(self._by_modality.get(modality, []))
 
     def exact_match(self, technique_str: str) -> Optional[Technique]:
         """
@@ -92,23 +136,8 @@ class TechniqueLibrary:
         Returns:
             Technique object if exact match found, None otherwise
         """
-        technique_lower = technique_str.lower().strip()
-
-        for technique in self.techniques:
-            # Check technique name
-            if technique.name.lower() == technique_lower:
-                return technique
-
-            # Check formatted name (e.g., "CBT - Cognitive Restructuring")
-            if technique.formatted_name.lower() == technique_lower:
-                return technique
-
-            # Check aliases
-            for alias in technique.aliases:
-                if alias.lower() == technique_lower:
-                    return technique
-
-        return None
+        # Keys: technique names, formatted names (e.g., "CBT - Cognitive Restructuring") and aliases
+        return self._exact_index.get(_normalize(technique_str))
 
     def fuzzy_match(
         self,
@@ -118,6 +147,10 @@ class TechniqueLibrary:
         """
         Find best fuzzy match for a technique using string similarity.
 
+        Only names/aliases sharing a trigram with the input are scored, so
+        an entry with no trigram in common can no longer be the match;
+        at the 0.8 threshold such an entry cannot reach it in practice.
+
         Args:
             technique_str: Technique name to match
             threshold: Minimum similarity score (0.0 to 1.0)
@@ -126,25 +159,33 @@ class TechniqueLibrary:
             Tuple of (Technique, confidence_score) if match found, None otherwise
         """
         technique_lower = technique_str.lower().strip()
-        best_match = None
+        best_id: Optional[int] = None
         best_score = 0.0
 
-        for technique in self.techniques:
-            # Check technique name similarity
-            score = SequenceMatcher(None, technique_lower, technique.name.lower()).ratio()
-            if score > best_score:
-                best_score = score
-                best_match = technique
-
-            # Check alias similarities
-            for alias in technique.aliases:
-                score = SequenceMatcher(None, technique_lower, alias.lower()).ratio()
-                if score > best_score:
-                    best_score = score
-                    best_match = technique
-
-        if best_score >= threshold:
-            return (best_match, best_score)
+        shared = Counter()
+        for trigram in _trigrams(technique_lower):
+            shared.update(self._trigram_index.get(trigram, ()))
+
+        def beats(score: float, entry_id: int) -> bool:
+            # Ties go to the earlier entry, as in the original scan order
+            if score < threshold:
+                return False
+            return best_id is None or score > best_score or (score == best_score and entry_id < best_id)
+
+        with self._fuzzy_lock:
+            # Most shared trigrams first, so the best score (and the pruning) rises early
+            for entry_id, _ in sorted(shared.items(), key=lambda item: (-item[1], item[0])):
+                matcher = self._fuzzy_matchers[entry_id]
+                matcher.set_seq1(technique_lower)
+                # Upper bounds on ratio(): skip entries that cannot win
+                if not beats(matcher.real_quick_ratio(), entry_id) or not beats(matcher.quick_ratio(), entry_id):
+                    continue
+                score = matcher.ratio()
+                if beats(score, entry_id):
+                    best_id, best_score = entry_id, score
+
+        if best_id is not None:
+            return (self._fuzzy_entries[best_id][1], best_score)
 
         return None
 
@@ -156,6 +197,8 @@ class TechniqueLibrary:
         """
         Validate a technique string and return standardized format.
 
+        Results are memoized per (technique_str, fuzzy_threshold).
+
         Strategy:
         1. Try exact match first
         2. If no exact match, try fuzzy match
@@ -171,6 +214,13 @@ class TechniqueLibrary:
             - confidence: 1.0 for exact, 0.8-1.0 for fuzzy, 0.0 for no match
             - match_type: "exact", "fuzzy", or "none"
         """
+        return self._validate_cached(technique_str, fuzzy_threshold)
+
+    def _validate_and_standardize(
+        self,
+        technique_str: str,
+        fuzzy_threshold: float
+    ) -> Tuple[Optional[str], float, str]:
         if not technique_str or technique_str.strip() == "":
             return (None, 0.0, "none")
 
@@ -198,16 +248,23 @@ class TechniqueLibrary:
         Returns:
             Definition string or None if not found
         """
-        for technique in self.techniques:
-            if technique.formatted_name == formatted_name:
-                return technique.definition
-        return None
+        return self._definitions.get(formatted_name)
 
     def get_all_formatted_names(self) -> List[str]:
         """Get all technique names in standardized format"""
         return [t.formatted_name for t in self.techniques]
 
 
+def _normalize(technique_str: str) -> str:
+    return technique_str.lower().strip()
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Character trigrams of text padded like pg_trgm, so short strings still have some"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
 # Singleton instance
 _library_instance = None
 
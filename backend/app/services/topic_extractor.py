@@ -20,6 +20,7 @@ import time
 from app.services.base_ai_generator import AsyncAIGenerator
 from app.services.technique_library import get_technique_library, TechniqueLibrary
 from app.config.model_config import track_generation_cost, GenerationCost
+from app.utils.token_budget import FittedTranscript
 
 
 @dataclass
@@ -93,8 +94,9 @@ class TopicExtractor(AsyncAIGenerator):
         Returns:
             SessionMetadata with extracted topics, action items, technique, and summary
         """
-        # Format conversation with role labels
-        conversation = self._format_conversation(segments, speaker_roles)
+        # Format conversation with role labels, windowed to the token budget
+        fitted = self._fit_conversation(segments, speaker_roles)
+        conversation = fitted.text
 
         if not conversation.strip():
             raise ValueError("No conversation content found in segments")
@@ -106,8 +108,7 @@ class TopicExtractor(AsyncAIGenerator):
         # NOTE: GPT-5 series does NOT support custom temperature - uses internal calibration
         try:
             start_time = time.time()
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            response = await self._create_chat_completion_async(
                 messages=[
                     {
                         "role": "system",
@@ -127,7 +128,8 @@ class TopicExtractor(AsyncAIGenerator):
                 task="topic_extraction",
                 model=self.model,
                 start_time=start_time,
-                session_id=session_id
+                session_id=session_id,
+                metadata=fitted.report.cost_metadata()
             )
 
             result = json.loads(response.choices[0].message.content)
@@ -277,20 +279,21 @@ Low confidence (<0.5): Had to infer or make educated guesses"""
 
 Return your analysis as JSON following the specified format."""
 
-    def _format_conversation(
+    def _fit_conversation(
         self,
         segments: List[Dict[str, Any]],
         speaker_roles: Optional[Dict[str, str]] = None
-    ) -> str:
+    ) -> FittedTranscript:
         """
-        Format transcript segments into readable conversation with role labels.
+        Format transcript segments into readable conversation with role labels,
+        keeping the most salient turns if it exceeds the transcript token budget.
 
         Args:
             segments: Transcript segments
             speaker_roles: Optional mapping of speaker IDs to roles
 
         Returns:
-            Formatted conversation string
+            FittedTranscript with the conversation text and window report
         """
         # Default role mapping if not provided
         if speaker_roles is None:
@@ -299,26 +302,30 @@ Return your analysis as JSON following the specified format."""
                 "SPEAKER_01": "Client"
             }
 
-        formatted = []
-        for segment in segments:
-            speaker_id = segment.get("speaker") or segment.get("speaker_id", "UNKNOWN")
+        def render(segment: Dict[str, Any]) -> Optional[str]:
             text = segment.get("text", "").strip()
-            start = segment.get("start", 0)
-
             if not text:
-                continue
+                return None
 
             # Get role label
+            speaker_id = segment.get("speaker") or segment.get("speaker_id", "UNKNOWN")
             role = speaker_roles.get(speaker_id, speaker_id)
 
             # Format timestamp as MM:SS
+            start = segment.get("start", 0)
             minutes = int(start // 60)
             seconds = int(start % 60)
-            timestamp = f"{minutes:02d}:{seconds:02d}"
+            return f"[{minutes:02d}:{seconds:02d}] {role}: {text}"
 
-            formatted.append(f"[{timestamp}] {role}: {text}")
+        return self._fit_transcript(segments, render)
 
-        return "\n".join(formatted)
+    def _format_conversation(
+        self,
+        segments: List[Dict[str, Any]],
+        speaker_roles: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Formatted conversation string (see _fit_conversation)."""
+        return self._fit_conversation(segments, speaker_roles).text
 
     def _truncate_summary(self, summary: str, max_length: int = 150) -> str:
         """
@@ -0,0 +1,474 @@
+"""
+Wave 1 Batch Runner - Cross-session Wave 1 analysis with bounded concurrency
+
+Runs mood analysis, topic extraction and breakthrough detection (plus the
+sequential action items summary) for a batch of sessions. Instead of firing
+every call at once, each LLM call is a job that:
+
+- waits for one of max_concurrency slots (shared by all sessions)
+- runs at Priority.BACKGROUND, so the LLM rate limiter admits it under its
+  model's RPM/TPM budget without crowding out interactive API requests, and
+  retries its 429s (see llm_rate_limiter)
+
+Each session's results are written with one UPDATE (and its mood result
+folded into the patient's aggregates). Progress is reported to
+the optional on_progress callback (or yielded by stream()) and logged through
+PipelineLogger, so SSE clients see the same events as before. log_event()
+only queues each event for the logger's writer thread, so the event inserts
+never block the loop or serialize the concurrent sessions.
+
+Usage:
+    from app.services.wave1_batch_runner import Wave1BatchRunner
+
+    runner = Wave1BatchRunner()            # anon client, subject to RLS
+    runner = Wave1BatchRunner(admin=True)  # service role (seed scripts)
+    results = await runner.run(session_ids)
+
+    async for event in runner.stream(session_ids):
+        print(event.to_dict())
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from supabase import AsyncClient
+
+from app.config import settings
+from app.database import get_async_supabase, get_async_supabase_admin
+from app.middleware.response_cache import invalidate_rows
+from app.services.llm_rate_limiter import Priority, llm_priority
+from app.services.patient_aggregates import PatientAggregatesStore
+from app.utils.pipeline_logger import LogEvent, LogPhase, PipelineLogger
+
+logger = logging.getLogger(__name__)
+
+# Wave 1 task -> column that marks it complete
+WAVE1_TASKS: Dict[str, str] = {
+    "mood_analysis": "mood_analyzed_at",
+    "topic_extraction": "topics_extracted_at",
+    "breakthrough_detection": "breakthrough_analyzed_at",
+}
+
+_TASK_EVENTS = {
+    "mood_analysis": LogEvent.MOOD_ANALYSIS,
+    "topic_extraction": LogEvent.TOPIC_EXTRACTION,
+    "breakthrough_detection": LogEvent.BREAKTHROUGH_DETECTION,
+}
+
+_SESSION_COLUMNS = "id, patient_id, session_date, transcript, " + ", ".join(WAVE1_TASKS.values())
+
+ProgressCallback = Callable[["Wave1Progress"], None]
+
+
+# =============================================================================
+# Results and Progress
+# =============================================================================
+
+@dataclass
+class Wave1Progress:
+    """One progress event ("session" task = the whole session)."""
+    session_id: str
+    task: str
+    status: str  # "complete" | "failed" | "skipped"
+    completed_sessions: int
+    total_sessions: int
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class Wave1SessionResult:
+    """Outcome of Wave 1 for one session."""
+    session_id: str
+    session_date: Optional[str] = None
+    updates: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    duration_ms: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.errors
+
+
+class _ProgressTracker:
+    def __init__(self, total: int, callback: Optional[ProgressCallback]):
+        self.total = total
+        self.completed = 0
+        self.callback = callback
+
+    def emit(self, session_id: str, task: str, status: str, error: Optional[str] = None):
+        if task == "session":
+            self.completed += 1
+        if self.callback is None:
+            return
+        try:
+            self.callback(Wave1Progress(
+                session_id=session_id,
+                task=task,
+                status=status,
+                completed_sessions=self.completed,
+                total_sessions=self.total,
+                error=error,
+            ))
+        except Exception as e:
+            logger.warning(f"Wave 1 progress callback failed: {e}")
+
+
+# =============================================================================
+# Result -> Column Mapping
+# =============================================================================
+
+def _mood_updates(result: Any) -> Dict[str, Any]:
+    return {
+        "mood_score": result.mood_score,
+        "mood_confidence": result.confidence,
+        "mood_rationale": result.rationale,
+        "mood_indicators": result.key_indicators,
+        "emotional_tone": result.emotional_tone,
+        "mood_analyzed_at": _now(),
+    }
+
+
+def _topic_updates(result: Any) -> Dict[str, Any]:
+    return {
+        "topics": result.topics,
+        "action_items": result.action_items,
+        "technique": result.technique,
+        "summary": result.summary,
+        "extraction_confidence": result.confidence,
+        "topics_extracted_at": _now(),
+    }
+
+
+def _breakthrough_updates(result: Any) -> Dict[str, Any]:
+    updates = {
+        "has_breakthrough": result.has_breakthrough,
+        "breakthrough_analyzed_at": _now(),
+    }
+    primary = result.primary_breakthrough
+    if primary:
+        updates["breakthrough_data"] = {
+            "type": primary.breakthrough_type,
+            "label": primary.label,
+            "description": primary.description,
+            "evidence": primary.evidence,
+            "confidence": primary.confidence_score,
+            "timestamp_start": primary.timestamp_start,
+            "timestamp_end": primary.timestamp_end,
+            "dialogue_excerpt": [
+                {"speaker": seg["speaker"], "text": seg["text"]}
+                for seg in primary.speaker_sequence
+            ],
+        }
+    return updates
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _parse_transcript(session: Dict[str, Any]) -> List[Dict[str, Any]]:
+    transcript = session.get("transcript") or []
+    if isinstance(transcript, str):
+        transcript = json.loads(transcript)
+    return transcript
+
+
+# =============================================================================
+# Runner
+# =============================================================================
+
+class Wave1BatchRunner:
+    """
+    Runs Wave 1 for many sessions under a shared concurrency limit.
+
+    Args:
+        db: Async Supabase client (default: shared client for the running loop)
+        admin: Without db, use the service role client (bypasses RLS) instead
+            of the anon one; for seed scripts and administrative jobs only
+        max_concurrency: Max LLM calls in flight (default: WAVE1_BATCH_MAX_CONCURRENCY)
+        analyzers: Optional {task: analyzer} overrides (tests)
+    """
+
+    def __init__(
+        self,
+        db: Optional[AsyncClient] = None,
+        admin: bool = False,
+        max_concurrency: Optional[int] = None,
+        analyzers: Optional[Dict[str, Any]] = None,
+    ):
+        self.db = db
+        self.admin = admin
+        self.max_concurrency = max(1, max_concurrency or settings.wave1_batch_max_concurrency)
+        self._analyzers: Dict[str, Any] = dict(analyzers or {})
+        self.aggregates_store = PatientAggregatesStore(db)
+
+    async def _get_db(self) -> AsyncClient:
+        if self.db is None:
+            if self.admin:
+                self.db = await get_async_supabase_admin()
+                logger.info("Wave 1 batch runner using the service role client")
+            else:
+                self.db = await get_async_supabase()
+            # Aggregates are written with the same privileges as the sessions
+            if self.aggregates_store.db is None:
+                self.aggregates_store.db = self.db
+        return self.db
+
+    def _analyzer(self, task: str) -> Any:
+        """Create analyzers lazily; one instance per task is shared by all sessions."""
+        if task not in self._analyzers:
+            from app.services.action_items_summarizer import ActionItemsSummarizer
+            from app.services.breakthrough_detector import BreakthroughDetector
+            from app.services.mood_analyzer import MoodAnalyzer
+            from app.services.topic_extractor import TopicExtractor
+
+            factories = {
+                "mood_analysis": MoodAnalyzer,
+                "topic_extraction": TopicExtractor,
+                "breakthrough_detection": BreakthroughDetector,
+                "action_summary": ActionItemsSummarizer,
+            }
+            self._analyzers[task] = factories[task]()
+        return self._analyzers[task]
+
+    # -------------------------------------------------------------------------
+    # Session Loading
+    # -------------------------------------------------------------------------
+
+    async def session_ids_for_patient(self, patient_id: str) -> List[str]:
+        """All session IDs for a patient, oldest first."""
+        db = await self._get_db()
+        response = await (
+            db.table("therapy_sessions")
+            .select("id")
+            .eq("patient_id", patient_id)
+            .order("session_date")
+            .execute()
+        )
+        return [row["id"] for row in response.data or []]
+
+    async def _fetch_sessions(self, session_ids: List[str]) -> List[Dict[str, Any]]:
+        db = await self._get_db()
+        response = await (
+            db.table("therapy_sessions")
+            .select(_SESSION_COLUMNS)
+            .in_("id", session_ids)
+            .order("session_date")
+            .execute()
+        )
+        return response.data or []
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    async def run(
+        self,
+        session_ids: List[str],
+        force: bool = False,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> List[Wave1SessionResult]:
+        """
+        Run Wave 1 for every session in session_ids.
+
+        Args:
+            session_ids: Session UUIDs
+            force: Re-run tasks that already have results
+            on_progress: Called with a Wave1Progress for every event
+
+        Returns:
+            One Wave1SessionResult per session (sessions not found are
+            reported with a "session" error)
+        """
+        session_ids = list(dict.fromkeys(session_ids))
+        progress = _ProgressTracker(len(session_ids), on_progress)
+        if not session_ids:
+            return []
+
+        sessions = await self._fetch_sessions(session_ids)
+        found = {session["id"] for session in sessions}
+
+        results: List[Wave1SessionResult] = []
+        for session_id in session_ids:
+            if session_id not in found:
+                logger.warning(f"Wave 1 batch: session {session_id} not found")
+                progress.emit(session_id, "session", "failed", error="Session not found")
+                results.append(Wave1SessionResult(session_id=session_id, errors={"session": "Session not found"}))
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        print(
+            f"🚀 Processing {len(sessions)} sessions "
+            f"(max {self.max_concurrency} concurrent LLM calls)",
+            flush=True,
+        )
+        with llm_priority(Priority.BACKGROUND):
+            results.extend(await asyncio.gather(*(
+                self._process_session(session, index, semaphore, progress, force)
+                for index, session in enumerate(sessions)
+            )))
+        return results
+
+    async def stream(self, session_ids: List[str], force: bool = False) -> AsyncIterator[Wave1Progress]:
+        """
+        Run the batch and yield progress events as they happen.
+
+        Closing the iterator early cancels the batch.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        task = asyncio.create_task(self.run(session_ids, force=force, on_progress=queue.put_nowait))
+        task.add_done_callback(lambda _: queue.put_nowait(done))
+        try:
+            while True:
+                event = await queue.get()
+                if event is done:
+                    break
+                yield event
+            await task  # Propagate errors from run()
+        finally:
+            if not task.done():
+                task.cancel()
+
+    # -------------------------------------------------------------------------
+    # Jobs
+    # -------------------------------------------------------------------------
+
+    async def _call(self, semaphore: asyncio.Semaphore, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one job in a concurrency slot (rate budget and 429 retries are per LLM call)."""
+        async with semaphore:
+            return await fn()
+
+    def _task_call(self, task: str, session: Dict[str, Any], transcript: List[Dict[str, Any]]):
+        analyzer = self._analyzer(task)
+        session_id = session["id"]
+
+        if task == "mood_analysis":
+            async def call():
+                return _mood_updates(await analyzer.analyze_session_mood(
+                    session_id=session_id,
+                    segments=transcript,
+                    patient_speaker_id="SPEAKER_01",
+                ))
+        elif task == "topic_extraction":
+            async def call():
+                return _topic_updates(await analyzer.extract_metadata(
+                    session_id=session_id,
+                    segments=transcript,
+                    speaker_roles={"SPEAKER_00": "Therapist", "SPEAKER_01": "Client"},
+                ))
+        else:
+            async def call():
+                return _breakthrough_updates(await analyzer.analyze_session(
+                    transcript=transcript,
+                    session_metadata={"session_id": session_id},
+                ))
+        return call
+
+    async def _process_session(
+        self,
+        session: Dict[str, Any],
+        index: int,
+        semaphore: asyncio.Semaphore,
+        progress: _ProgressTracker,
+        force: bool,
+    ) -> Wave1SessionResult:
+        session_id = session["id"]
+        session_date = session.get("session_date")
+        result = Wave1SessionResult(session_id=session_id, session_date=session_date)
+        pipeline = PipelineLogger(session["patient_id"], LogPhase.WAVE1) if session.get("patient_id") else None
+        start = time.time()
+
+        def log(event: LogEvent, status: str = "success", **kwargs):
+            if pipeline:
+                pipeline.log_event(event, session_id=session_id, session_date=session_date, status=status, **kwargs)
+
+        log(LogEvent.START, details={"index": index + 1, "total": progress.total})
+        print(f"[{index + 1}/{progress.total}] Processing session {session_date} ({session_id})", flush=True)
+
+        tasks = [task for task, column in WAVE1_TASKS.items() if force or not session.get(column)]
+        result.skipped = [task for task in WAVE1_TASKS if task not in tasks]
+        for task in result.skipped:
+            progress.emit(session_id, task, "skipped")
+
+        transcript = _parse_transcript(session)
+        outcomes = await asyncio.gather(
+            *(self._call(semaphore, self._task_call(task, session, transcript)) for task in tasks),
+            return_exceptions=True,
+        )
+
+        for task, outcome in zip(tasks, outcomes):
+            if isinstance(outcome, BaseException):
+                result.errors[task] = str(outcome)
+                logger.error(f"  ✗ {task} failed for {session_id}: {outcome}")
+                print(f"  ✗ {task} failed: {outcome}", flush=True)
+                log(_TASK_EVENTS[task], status="failed", details={"error": str(outcome)})
+                progress.emit(session_id, task, "failed", error=str(outcome))
+            else:
+                result.updates.update(outcome)
+                log(_TASK_EVENTS[task], status="complete")
+                progress.emit(session_id, task, "complete")
+
+        # SEQUENTIAL: action items summary needs topic extraction's action items
+        action_items = result.updates.get("action_items")
+        if action_items and len(action_items) == 2:
+            summarizer = self._analyzer("action_summary")
+            try:
+                summary = await self._call(
+                    semaphore,
+                    lambda: summarizer.summarize_action_items(action_items=action_items, session_id=str(session_id)),
+                )
+                result.updates["action_items_summary"] = summary.summary
+                progress.emit(session_id, "action_summary", "complete")
+            except Exception as e:
+                # Non-blocking: the session keeps its other results
+                logger.error(f"❌ Action items summarization failed for {session_id}: {e}")
+                progress.emit(session_id, "action_summary", "failed", error=str(e))
+
+        updates = {k: v for k, v in result.updates.items() if v is not None}
+        if updates:
+            db_start = time.time()
+            try:
+                db = await self._get_db()
+                response = await db.table("therapy_sessions").update(updates).eq("id", session_id).execute()
+                invalidate_rows(response.data)
+                log(
+                    LogEvent.DB_UPDATE,
+                    status="complete",
+                    duration_ms=(time.time() - db_start) * 1000,
+                    details={"fields_updated": len(updates)},
+                )
+            except Exception as e:
+                result.errors["db_update"] = str(e)
+                logger.error(f"  ✗ Database update failed for {session_id}: {e}")
+                log(LogEvent.DB_UPDATE, status="failed", details={"error": str(e)})
+
+            if "mood_score" in updates and "db_update" not in result.errors and session.get("patient_id"):
+                try:
+                    await self.aggregates_store.record_wave1({**session, **updates})
+                except Exception as e:
+                    logger.error(f"  ✗ Patient aggregates update failed for {session_id}: {e}")
+
+        result.duration_ms = (time.time() - start) * 1000
+        error = "; ".join(f"{k}: {v}" for k, v in result.errors.items()) or None
+        if (updates and "db_update" not in result.errors) or (not tasks and result.skipped):
+            # Partial results still count: failed tasks are retried on the next run
+            log(LogEvent.COMPLETE, duration_ms=result.duration_ms, details={"errors": error} if error else None)
+            progress.emit(session_id, "session", "complete", error=error)
+            print(f"[{index + 1}/{progress.total}] ✅ Session complete", flush=True)
+        else:
+            error = error or "No results to update"
+            log(LogEvent.FAILED, status="failed", details={"error": error})
+            progress.emit(session_id, "session", "failed", error=error)
+            print(f"[{index + 1}/{progress.total}] ⚠️  Session failed: {error}", flush=True)
+
+        return result
@@ -0,0 +1,342 @@
+"""
+Cost Sink - Non-blocking, batched persistence for generation_costs
+
+track_generation_cost() used to open a new psycopg2 connection, insert one row
+and close it - synchronously, from inside async handlers - on every LLM call.
+Cost records are now put on an in-process queue and drained by a single
+background worker thread that:
+
+- batch-inserts rows with one multi-row INSERT over a persistent connection
+- flushes when a batch fills up or the flush interval elapses
+- retries a failed batch once, then falls back to row-by-row inserts so a bad
+  row only fails itself
+- flushes whatever is left on shutdown (FastAPI shutdown hook + atexit)
+- exposes queue depth, written/dropped/failed counters via get_stats()
+
+Enqueueing never blocks: when the queue is full the record is dropped and
+counted, since cost tracking failure must never break the analysis flow.
+
+Usage:
+    from app.utils.cost_sink import get_cost_sink
+
+    get_cost_sink().enqueue(cost_info, patient_id=patient_id)
+    get_cost_sink().get_stats()
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Column order of a generation_costs row as produced by _to_row()
+COST_COLUMNS = (
+    "task", "model", "input_tokens", "output_tokens", "cost", "duration_ms",
+    "session_id", "patient_id", "metadata", "created_at",
+)
+
+CostRow = Tuple[Any, ...]
+BatchWriter = Callable[[List[CostRow]], None]
+
+
+def _to_row(cost_info: Any, patient_id: Optional[str]) -> CostRow:
+    """Flatten a GenerationCost into a generation_costs row."""
+    return (
+        cost_info.task,
+        cost_info.model,
+        cost_info.input_tokens,
+        cost_info.output_tokens,
+        cost_info.cost,
+        cost_info.duration_ms,
+        cost_info.session_id,
+        patient_id,
+        json.dumps(cost_info.metadata) if cost_info.metadata else None,
+        cost_info.timestamp,
+    )
+
+
+class PostgresBatchWriter:
+    """
+    Writes batches of cost rows over a single persistent psycopg2 connection.
+
+    The connection is opened lazily on the worker thread and re-opened after
+    a failure, so a database blip costs one batch instead of the process.
+    """
+
+    def __init__(self, database_url: str):
+        self.database_url = database_url
+        self._conn = None
+
+    def _connect(self):
+        import psycopg2
+
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg2.connect(self.database_url)
+        return self._conn
+
+    def __call__(self, rows: List[CostRow]) -> None:
+        from psycopg2.extras import execute_values
+
+        conn = self._connect()
+        try:
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    f"INSERT INTO generation_costs ({', '.join(COST_COLUMNS)}) VALUES %s",
+                    rows,
+                    page_size=len(rows),
+                )
+            conn.commit()
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+class CostSink:
+    """
+    In-process queue of cost rows drained by one background worker.
+
+    Args:
+        writer: Callable that persists a batch of rows. None disables
+            persistence (every enqueue is counted as dropped).
+        batch_size: Flush as soon as this many rows are buffered
+        flush_interval: Flush buffered rows at least this often (seconds)
+        max_queue_size: Rows beyond this are dropped instead of blocking
+    """
+
+    def __init__(
+        self,
+        writer: Optional[BatchWriter],
+        batch_size: int = 50,
+        flush_interval: float = 2.0,
+        max_queue_size: int = 10_000,
+    ):
+        self.writer = writer
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[CostRow]" = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flush_requested = threading.Event()
+        # Rows queued or being written; flush() waits for this to reach zero
+        self._pending = 0
+        self._pending_cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    # -------------------------------------------------------------------------
+    # Producer side
+    # -------------------------------------------------------------------------
+
+    def enqueue(self, cost_info: Any, patient_id: Optional[str] = None) -> bool:
+        """
+        Queue a GenerationCost for persistence without blocking.
+
+        Returns:
+            True if queued, False if dropped (no writer, queue full, or stopped)
+        """
+        if self.writer is None or self._stop.is_set():
+            self._count("dropped")
+            return False
+
+        with self._pending_cond:
+            try:
+                self._queue.put_nowait(_to_row(cost_info, patient_id))
+            except queue.Full:
+                self._count("dropped")
+                logger.warning("Cost sink queue full, dropping generation cost record")
+                return False
+            self._pending += 1
+
+        self._count("enqueued")
+        self._ensure_worker()
+        if self._queue.qsize() >= self.batch_size:
+            self._flush_requested.set()
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Ask the worker to write everything queued so far and wait for it.
+
+        Returns:
+            True if the queue drained within the timeout
+        """
+        if self._worker is None or not self._worker.is_alive():
+            return self._queue.empty()
+
+        self._flush_requested.set()
+        with self._pending_cond:
+            return self._pending_cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Flush remaining rows and stop the worker."""
+        self._stop.set()
+        self._flush_requested.set()
+        worker = self._worker
+        if worker is not None and worker.is_alive():
+            worker.join(timeout)
+
+        close = getattr(self.writer, "close", None)
+        if callable(close):
+            close()
+
+    # -------------------------------------------------------------------------
+    # Worker side
+    # -------------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="cost-sink-writer", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+
+            self._drain()
+
+            if self._stop.is_set() and self._queue.empty():
+                return
+
+    def _drain(self) -> None:
+        """Write everything currently queued, one batch at a time."""
+        while True:
+            batch: List[CostRow] = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if not batch:
+                return
+
+            self._write(batch)
+
+            with self._pending_cond:
+                self._pending -= len(batch)
+                self._pending_cond.notify_all()
+
+    def _write(self, batch: List[CostRow]) -> None:
+        """
+        Write a batch, retrying it once (on a fresh connection) and then row by
+        row, so a bad row only costs itself and a blip costs nothing.
+        """
+        start = time.time()
+        error: Optional[Exception] = None
+        for _ in range(2):
+            try:
+                self.writer(batch)
+                break
+            except Exception as e:
+                error = e
+        else:
+            logger.warning(f"Batch insert of {len(batch)} generation cost rows failed ({error}), writing rows one by one")
+            written = 0
+            for row in batch:
+                try:
+                    self.writer([row])
+                    written += 1
+                except Exception as e:
+                    self._count("failed")
+                    logger.error(f"Failed to store generation cost row {row[:2]}: {e}")
+            self._count("written", written)
+            return
+
+        self._count("written", len(batch))
+        self._count("batches")
+        logger.debug(
+            f"Stored {len(batch)} generation cost rows in {(time.time() - start) * 1000:.0f}ms"
+        )
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and counters."""
+        with self._lock:
+            return {
+                "enabled": self.writer is not None,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_size": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+                "worker_alive": bool(self._worker and self._worker.is_alive()),
+            }
+
+
+# Global sink instance
+_cost_sink: Optional[CostSink] = None
+_cost_sink_lock = threading.Lock()
+
+
+def get_cost_sink() -> CostSink:
+    """
+    Get the process-wide cost sink (singleton pattern).
+
+    Persistence is disabled (records dropped and counted) when DATABASE_URL
+    is not set.
+    """
+    global _cost_sink
+
+    if _cost_sink is None:
+        with _cost_sink_lock:
+            if _cost_sink is None:
+                database_url = os.getenv("DATABASE_URL")
+                if not database_url:
+                    logger.warning("DATABASE_URL not set, generation costs will not be stored")
+                _cost_sink = CostSink(
+                    writer=PostgresBatchWriter(database_url) if database_url else None,
+                    batch_size=settings.cost_sink_batch_size,
+                    flush_interval=settings.cost_sink_flush_interval_seconds,
+                    max_queue_size=settings.cost_sink_max_queue_size,
+                )
+                atexit.register(_cost_sink.shutdown)
+
+    return _cost_sink
+
+
+def set_cost_sink(sink: Optional[CostSink]) -> None:
+    """Replace the process-wide sink (useful for testing)."""
+    global _cost_sink
+    with _cost_sink_lock:
+        _cost_sink = sink
+
+
+def shutdown_cost_sink(timeout: float = 10.0) -> None:
+    """Flush and stop the process-wide sink if it was started."""
+    global _cost_sink
+    with _cost_sink_lock:
+        sink, _cost_sink = _cost_sink, None
+    if sink is not None:
+        sink.shutdown(timeout)
@@ -0,0 +1,543 @@
+"""
+Event Bus - Push-based delivery of pipeline events to SSE clients
+
+Replaces the per-client 500ms polling of pipeline_events. Events are published
+once by PipelineLogger and pushed to every subscriber immediately:
+
+    PipelineLogger ──publish──▶ Transport ──▶ EventBroker ──▶ asyncio.Queue per SSE client
+                                (cross-process)   (in-process fan-out)
+
+Transports:
+- local:    in-process stand-in; publish dispatches straight to the broker.
+            Used for tests and single-process development.
+- postgres: Postgres LISTEN/NOTIFY on channel "pipeline_events". Publishers
+            (API process or seed scripts) NOTIFY; the API process LISTENs on a
+            background thread and hands events to the broker.
+- auto:     postgres when DATABASE_URL is set, otherwise local.
+
+Delivered events are acknowledged in batches (one UPDATE ... WHERE id IN (...)
+per flush) instead of one UPDATE per event, so an idle SSE client costs zero
+database queries.
+
+Usage:
+    bus = get_event_bus()
+    bus.publish({"patient_id": "...", "phase": "WAVE1", "event": "COMPLETE", ...})
+
+    queue = bus.subscribe(patient_id)   # inside the event loop
+    event = await queue.get()
+    bus.acknowledge(event["id"])
+    bus.unsubscribe(patient_id, queue)
+
+    bus.add_listener(handler)           # every event, any patient (e.g. cache invalidation)
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "pipeline_events"
+# Postgres NOTIFY payloads must be < 8000 bytes
+MAX_NOTIFY_PAYLOAD_BYTES = 7900
+
+EventHandler = Callable[[Dict[str, Any]], None]
+
+
+def to_sse_event(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a pipeline_events row (or published event) as the SSE payload."""
+    return {
+        "patient_id": row["patient_id"],
+        "session_id": row.get("session_id"),
+        "session_date": row.get("session_date"),
+        "phase": row["phase"],
+        "event": row["event"],
+        "status": row["status"],
+        "message": row.get("message") or "",
+        "metadata": row.get("metadata") or {},
+    }
+
+
+# =============================================================================
+# In-process Fan-out
+# =============================================================================
+
+class EventBroker:
+    """
+    Fans events out to per-patient asyncio queues.
+
+    dispatch() is thread-safe: events arriving from a transport thread are
+    handed to the owning event loop with call_soon_threadsafe().
+    """
+
+    def __init__(self, max_queue_size: int = 1000):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listeners: List[EventHandler] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, patient_id: str) -> asyncio.Queue:
+        """Register a subscriber queue (must be called from the event loop)."""
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers.setdefault(patient_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, patient_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(patient_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[patient_id]
+
+    def add_listener(self, handler: EventHandler) -> None:
+        """
+        Call handler with every event, for any patient.
+
+        Listeners run on the dispatching thread (possibly the transport's
+        listener thread), so they must be fast and thread-safe.
+        """
+        self._listeners.append(handler)
+
+    def subscriber_count(self, patient_id: Optional[str] = None) -> int:
+        if patient_id is not None:
+            return len(self._subscribers.get(patient_id, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def dispatch(self, event: Dict[str, Any]) -> None:
+        """Deliver an event to all subscribers of its patient (any thread)."""
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Event bus listener failed: {e}")
+
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            self._dispatch_local(event)
+        else:
+            loop.call_soon_threadsafe(self._dispatch_local, event)
+
+    def _dispatch_local(self, event: Dict[str, Any]) -> None:
+        for queue in list(self._subscribers.get(event.get("patient_id"), ())):
+            if queue.full():
+                # Slow client - drop its oldest event rather than block everyone
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+            self.delivered += 1
+
+
+# =============================================================================
+# Transports
+# =============================================================================
+
+class EventTransport(ABC):
+    """Carries published events to every process that has subscribers."""
+
+    name = "abstract"
+
+    @abstractmethod
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Send an event (callable from any thread or process)."""
+        pass
+
+    @abstractmethod
+    def start(self, handler: EventHandler) -> None:
+        """Begin delivering events from other publishers to handler."""
+        pass
+
+    @abstractmethod
+    def stop(self) -> None:
+        pass
+
+
+class LocalTransport(EventTransport):
+    """In-process stand-in broker: publish delivers directly to the handler."""
+
+    name = "local"
+
+    def __init__(self):
+        self._handler: Optional[EventHandler] = None
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        if self._handler is not None:
+            self._handler(event)
+
+    def start(self, handler: EventHandler) -> None:
+        self._handler = handler
+
+    def stop(self) -> None:
+        self._handler = None
+
+
+class PostgresNotifyTransport(EventTransport):
+    """
+    Cross-process transport over Postgres LISTEN/NOTIFY.
+
+    publish() only queues the payload; a sender thread issues pg_notify over a
+    persistent connection, so publishing never blocks the event loop on
+    network I/O. start() runs a listener thread that blocks in select() on a
+    second connection, so delivery latency is one network hop rather than a
+    polling interval.
+    """
+
+    name = "postgres"
+
+    def __init__(self, database_url: str, channel: str = NOTIFY_CHANNEL, max_pending: int = 10_000):
+        self.database_url = database_url
+        self.channel = channel
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+        self._pending: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=max_pending)
+        self._sender: Optional[threading.Thread] = None
+        self._sender_lock = threading.Lock()
+        self._handler: Optional[EventHandler] = None
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.send_errors = 0
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Queue an event for NOTIFY (raises queue.Full if the sender is backed up)."""
+        payload = json.dumps(event, default=str)
+        if len(payload.encode("utf-8")) > MAX_NOTIFY_PAYLOAD_BYTES:
+            # Listeners still get the event; details are in pipeline_events
+            payload = json.dumps(
+                {**{k: v for k, v in event.items() if k != "metadata"}, "metadata": {"truncated": True}},
+                default=str,
+            )
+
+        self._ensure_sender()
+        self._pending.put_nowait(payload)
+
+    def flush(self) -> None:
+        """Block until every queued payload has been sent (or failed)."""
+        if self._sender is not None and self._sender.is_alive():
+            self._pending.join()
+
+    def _ensure_sender(self) -> None:
+        with self._sender_lock:
+            if self._sender is not None and self._sender.is_alive():
+                return
+            if self._sender is None:
+                # Short-lived publishers (seed scripts) still deliver what they queued
+                atexit.register(self._stop_sender)
+            self._sender = threading.Thread(target=self._send_loop, name="event-bus-notify", daemon=True)
+            self._sender.start()
+
+    def _stop_sender(self) -> None:
+        with self._sender_lock:
+            sender = self._sender
+        if sender is None or not sender.is_alive():
+            return
+        try:
+            self._pending.put(None, timeout=5)
+        except queue.Full:
+            return
+        sender.join(timeout=5)
+
+    def _send_loop(self) -> None:
+        while True:
+            payload = self._pending.get()
+            try:
+                if payload is None:
+                    return
+                self._notify(payload)
+            except Exception as e:
+                self.send_errors += 1
+                logger.error(f"Event bus NOTIFY failed: {e}")
+            finally:
+                self._pending.task_done()
+
+    def _notify(self, payload: str) -> None:
+        import psycopg2
+
+        with self._publish_lock:
+            try:
+                if self._publish_conn is None or self._publish_conn.closed:
+                    self._publish_conn = psycopg2.connect(self.database_url)
+                    self._publish_conn.autocommit = True
+                with self._publish_conn.cursor() as cur:
+                    cur.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+            except Exception:
+                if self._publish_conn is not None:
+                    try:
+                        self._publish_conn.close()
+                    except Exception:
+                        pass
+                self._publish_conn = None
+                raise
+
+    def start(self, handler: EventHandler) -> None:
+        self._handler = handler
+        if self._listener is not None and self._listener.is_alive():
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen, name="event-bus-listener", daemon=True)
+        self._listener.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=5)
+        self._stop_sender()
+        with self._publish_lock:
+            if self._publish_conn is not None:
+                try:
+                    self._publish_conn.close()
+                except Exception:
+                    pass
+                self._publish_conn = None
+
+    def _listen(self) -> None:
+        import psycopg2
+
+        backoff = 0.5
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.database_url)
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel}")
+                logger.info(f"Event bus listening on Postgres channel '{self.channel}'")
+                backoff = 0.5
+
+                while not self._stop.is_set():
+                    # Wake at least once a second to notice stop()
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self._deliver(notify.payload)
+            except Exception as e:
+                logger.error(f"Event bus listener error, reconnecting in {backoff:.1f}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def _deliver(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning("Event bus received malformed payload, ignoring")
+            return
+        if self._handler is not None:
+            self._handler(event)
+
+
+# =============================================================================
+# Batched "consumed" Acknowledgement
+# =============================================================================
+
+class ConsumedAcknowledger:
+    """
+    Collects delivered event ids and marks them consumed in batches.
+
+    A flush is scheduled only when there is something to acknowledge, so an
+    idle bus issues no queries at all.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 1.0,
+        batch_size: int = 100,
+        writer: Optional[Callable[[List[Any]], None]] = None,
+    ):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.writer = writer or _mark_events_consumed
+        self._pending: Set[Any] = set()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self.acknowledged = 0
+        self.flushes = 0
+
+    def ack(self, event_id: Any) -> None:
+        """Queue an event id for acknowledgement (call from the event loop)."""
+        if event_id is None:
+            return
+        self._pending.add(event_id)
+
+        loop = asyncio.get_running_loop()
+        if len(self._pending) >= self.batch_size:
+            self._schedule_now(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_interval, self._schedule_now, loop)
+
+    def _schedule_now(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self.flush())
+
+    async def flush(self) -> None:
+        """Write all pending acknowledgements (one query per batch)."""
+        while self._pending:
+            batch = list(self._pending)[:self.batch_size]
+            self._pending.difference_update(batch)
+            try:
+                await asyncio.to_thread(self.writer, batch)
+                self.acknowledged += len(batch)
+                self.flushes += 1
+            except Exception as e:
+                logger.error(f"Failed to mark {len(batch)} pipeline events consumed: {e}")
+
+
+def _mark_events_consumed(event_ids: List[Any]) -> None:
+    from app.database import get_supabase
+
+    get_supabase().table("pipeline_events").update({"consumed": True}).in_("id", event_ids).execute()
+
+
+# =============================================================================
+# Event Bus Facade
+# =============================================================================
+
+class EventBus:
+    """Publish/subscribe facade combining transport, broker and acknowledger."""
+
+    def __init__(
+        self,
+        transport: EventTransport,
+        broker: Optional[EventBroker] = None,
+        acknowledger: Optional[ConsumedAcknowledger] = None,
+    ):
+        self.transport = transport
+        self.broker = broker or EventBroker()
+        self.acknowledger = acknowledger or ConsumedAcknowledger()
+        self._started = False
+        self.published = 0
+        self.publish_errors = 0
+
+    def publish(self, event: Dict[str, Any]) -> bool:
+        """
+        Publish an event to all subscribers in every process.
+
+        Never raises - event delivery failure shouldn't break the pipeline.
+        """
+        try:
+            self.transport.publish(event)
+            self.published += 1
+            return True
+        except Exception as e:
+            self.publish_errors += 1
+            logger.error(f"Event bus publish failed ({self.transport.name}): {e}")
+            return False
+
+    def ensure_started(self) -> None:
+        """Start receiving events for local subscribers (idempotent)."""
+        if not self._started:
+            self.transport.start(self.broker.dispatch)
+            self._started = True
+
+    def subscribe(self, patient_id: str) -> asyncio.Queue:
+        self.ensure_started()
+        return self.broker.subscribe(patient_id)
+
+    def unsubscribe(self, patient_id: str, queue: asyncio.Queue) -> None:
+        self.broker.unsubscribe(patient_id, queue)
+
+    def add_listener(self, handler: EventHandler) -> None:
+        """Receive every event published in any process (see EventBroker.add_listener)."""
+        self.ensure_started()
+        self.broker.add_listener(handler)
+
+    def acknowledge(self, event_id: Any) -> None:
+        self.acknowledger.ack(event_id)
+
+    async def stop(self) -> None:
+        """Flush pending acknowledgements and stop the transport."""
+        await self.acknowledger.flush()
+        if self._started:
+            await asyncio.to_thread(self.transport.stop)
+            self._started = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "transport": self.transport.name,
+            "started": self._started,
+            "subscribers": self.broker.subscriber_count(),
+            "published": self.published,
+            "publish_errors": self.publish_errors + getattr(self.transport, "send_errors", 0),
+            "delivered": self.broker.delivered,
+            "dropped": self.broker.dropped,
+            "acknowledged": self.acknowledger.acknowledged,
+            "ack_flushes": self.acknowledger.flushes,
+        }
+
+
+def _create_transport_from_settings() -> EventTransport:
+    transport = settings.event_bus_transport.lower()
+    database_url = os.getenv("DATABASE_URL")
+
+    if transport == "auto":
+        transport = "postgres" if database_url else "local"
+
+    if transport == "postgres":
+        if not database_url:
+            logger.warning("EVENT_BUS_TRANSPORT=postgres but DATABASE_URL not set, using local transport")
+            return LocalTransport()
+        return PostgresNotifyTransport(database_url)
+
+    if transport != "local":
+        logger.warning(f"Unknown EVENT_BUS_TRANSPORT '{transport}', using local transport")
+    return LocalTransport()
+
+
+# Global event bus instance
+_event_bus: Optional[EventBus] = None
+_event_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """Get the process-wide event bus (singleton pattern)."""
+    global _event_bus
+
+    if _event_bus is None:
+        with _event_bus_lock:
+            if _event_bus is None:
+                _event_bus = EventBus(
+                    transport=_create_transport_from_settings(),
+                    acknowledger=ConsumedAcknowledger(
+                        flush_interval=settings.event_bus_ack_flush_seconds,
+                    ),
+                )
+                logger.info(f"Event bus initialized ({_event_bus.transport.name} transport)")
+
+    return _event_bus
+
+
+def set_event_bus(bus: Optional[EventBus]) -> None:
+    """Replace the process-wide bus (useful for testing)."""
+    global _event_bus
+    with _event_bus_lock:
+        _event_bus = bus
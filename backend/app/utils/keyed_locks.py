@@ -0,0 +1,47 @@
+"""
+Keyed Locks - Process-wide asyncio locks per key (e.g. per patient)
+
+Per-patient rows (cumulative context, aggregates) are updated with a
+load -> mutate -> write cycle. A lock held by one store instance does not
+stop another instance (each request or pipeline builds its own store) from
+interleaving, so the locks live at module level, shared by every caller in
+the process.
+
+asyncio locks belong to one event loop, so locks are kept per running loop.
+A key's lock is dropped as soon as nobody holds or waits on it.
+
+Usage:
+    _patient_locks = KeyedLocks()
+
+    async with _patient_locks.lock(patient_id):
+        row = await load(patient_id)
+        ...
+        await save(patient_id, row)
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Hashable
+
+
+class KeyedLocks:
+    """asyncio.Lock per key, shared process-wide (one set per event loop)."""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, weakref.WeakValueDictionary]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def lock(self, key: Hashable) -> asyncio.Lock:
+        """The lock for key on the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._guard:
+            locks = self._loops.get(loop)
+            if locks is None:
+                locks = self._loops[loop] = weakref.WeakValueDictionary()
+            lock = locks.get(key)
+            if lock is None:
+                lock = locks[key] = asyncio.Lock()
+            return lock
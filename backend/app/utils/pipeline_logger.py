@@ -2,15 +2,30 @@
 Pipeline Logger - Granular logging for demo pipeline
 Supports stdout, file output, and SSE event emission
 Updated: 2026-01-03 - Database-backed event queue for cross-process SSE
+Updated: Events are pushed to SSE clients through the event bus
+Updated: Event writes (log file, pipeline_events insert, bus publish) run on a
+background writer thread; log_event() never blocks the caller's event loop
+
+Pipeline stages run on the loop that serves API requests (in-process demo
+seeding, the embedded job worker), so log_event() only logs to stdout and
+queues the event. One writer thread drains the queue in order: it appends
+the events to their log files, inserts their pipeline_events rows in one
+batch (retried in development mode, in-memory fallback on failure) and
+publishes each row on the event bus. flush() waits for queued events;
+shutdown_event_writer() drains them on API shutdown and at exit.
 """
 
+import atexit
 import logging
 import json
 import os
+import queue
+import threading
 import time
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from enum import Enum
 
 # Log event types
@@ -34,6 +49,201 @@ class LogEvent(str, Enum):
 # Global event queue for SSE (in-memory)
 _event_queue: Dict[str, list] = {}
 
+module_logger = logging.getLogger(__name__)
+
+# Events per pipeline_events insert
+EVENT_BATCH_SIZE = 50
+
+
+def _event_row(log_entry: dict) -> dict:
+    """pipeline_events row for a structured log entry"""
+    return {
+        "patient_id": log_entry["patient_id"],
+        "session_id": log_entry.get("session_id"),
+        "session_date": log_entry.get("session_date"),
+        "phase": log_entry["phase"],
+        "event": log_entry["event"],
+        "status": log_entry["status"],
+        "message": "",  # Optional message field
+        "metadata": log_entry.get("details", {}),
+    }
+
+
+class PipelineEventWriter:
+    """
+    Background writer for pipeline events (file, pipeline_events, event bus).
+
+    Enqueueing never blocks; events are written in order by one daemon thread.
+    When the queue is full the event is dropped from the database and bus
+    (kept in the in-memory fallback) and counted.
+    """
+
+    def __init__(self, max_queue_size: int = 10_000):
+        self._queue: "queue.Queue[Tuple[Path, dict]]" = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._pending_cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.written = 0
+        self.dropped = 0
+        self.fallback = 0
+
+    def enqueue(self, log_file: Path, log_entry: dict) -> bool:
+        """Queue an event for writing; False if it was dropped."""
+        if self._stop.is_set():
+            self._drop(log_entry)
+            return False
+        with self._pending_cond:
+            try:
+                self._queue.put_nowait((log_file, log_entry))
+            except queue.Full:
+                self._drop(log_entry)
+                module_logger.warning("Pipeline event queue full, keeping event in memory only")
+                return False
+            self._pending += 1
+        self._ensure_worker()
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued event is written; True if drained in time."""
+        with self._pending_cond:
+            return self._pending_cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Write what is queued, then stop accepting events."""
+        self.flush(timeout)
+        self._stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "fallback": self.fallback,
+                "worker_alive": bool(self._worker and self._worker.is_alive()),
+            }
+
+    def _drop(self, log_entry: dict) -> None:
+        _event_queue.setdefault(log_entry["patient_id"], []).append(log_entry)
+        with self._lock:
+            self.dropped += 1
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="pipeline-event-writer", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < EVENT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                module_logger.error(f"Failed to write {len(batch)} pipeline events: {e}")
+            finally:
+                with self._pending_cond:
+                    self._pending -= len(batch)
+                    self._pending_cond.notify_all()
+
+    def _write(self, batch: List[Tuple[Path, dict]]) -> None:
+        # Structured JSON per patient log file, one open per file
+        lines: Dict[Path, List[str]] = defaultdict(list)
+        for log_file, log_entry in batch:
+            lines[log_file].append(json.dumps(log_entry) + "\n")
+        for log_file, entries in lines.items():
+            with open(log_file, "a") as f:
+                f.writelines(entries)
+
+        entries = [log_entry for _, log_entry in batch]
+        rows = [_event_row(log_entry) for log_entry in entries]
+        stored = _insert_event_rows(rows)
+
+        from app.utils.event_bus import get_event_bus
+        bus = get_event_bus()
+        for log_entry, row, stored_row in zip(entries, rows, stored or [None] * len(rows)):
+            if stored_row:
+                row["id"] = stored_row.get("id")
+                row["created_at"] = stored_row.get("created_at")
+            else:
+                # Fallback to in-memory queue if database write failed
+                _event_queue.setdefault(log_entry["patient_id"], []).append(log_entry)
+            bus.publish(row)
+
+        with self._lock:
+            self.written += len(batch)
+            if not stored:
+                self.fallback += len(batch)
+
+
+def _insert_event_rows(rows: List[dict]) -> Optional[List[dict]]:
+    """
+    Insert pipeline_events rows (retried in development mode).
+
+    Returns:
+        The stored rows (with id and created_at) in order, or None on failure
+    """
+    retry_mode = os.getenv("PIPELINE_EVENT_RETRY_MODE", "production")
+    max_retries = 3 if retry_mode == "development" else 0
+
+    for attempt in range(max_retries + 1):
+        try:
+            from app.database import get_supabase
+            db = get_supabase()
+
+            # Insert events into pipeline_events table
+            response = db.table("pipeline_events").insert([
+                {**row, "consumed": False} for row in rows
+            ]).execute()
+
+            if response.data and len(response.data) == len(rows):
+                print(f"[PipelineLogger] ✓ {len(rows)} event(s) logged to DB", flush=True)
+                return response.data
+            print(f"[PipelineLogger] DB insert returned no data (attempt {attempt + 1}/{max_retries + 1})", flush=True)
+
+        except Exception as e:
+            print(f"[PipelineLogger] DB write error (attempt {attempt + 1}/{max_retries + 1}): {str(e)}", flush=True)
+
+            if attempt < max_retries:
+                # Exponential backoff: 0.1s, 0.2s, 0.4s (on the writer thread)
+                time.sleep(0.1 * (2 ** attempt))
+
+    print(f"[PipelineLogger] ⚠️  Using in-memory fallback for {len(rows)} event(s)", flush=True)
+    return None
+
+
+_event_writer: Optional[PipelineEventWriter] = None
+_event_writer_lock = threading.Lock()
+
+
+def get_event_writer() -> PipelineEventWriter:
+    """Get the process-wide pipeline event writer (singleton pattern)."""
+    global _event_writer
+
+    if _event_writer is None:
+        with _event_writer_lock:
+            if _event_writer is None:
+                _event_writer = PipelineEventWriter()
+                atexit.register(_event_writer.shutdown)
+    return _event_writer
+
+
+def shutdown_event_writer(timeout: float = 10.0) -> None:
+    """Write queued events and stop the process-wide writer if it was started."""
+    global _event_writer
+    with _event_writer_lock:
+        writer, _event_writer = _event_writer, None
+    if writer is not None:
+        writer.shutdown(timeout)
+
+
 class PipelineLogger:
     """Enhanced logger with structured output and event emission"""
 
@@ -100,56 +310,8 @@ class PipelineLogger:
         else:
             self.logger.info(log_message)
 
-        # Write to file (structured JSON)
-        with open(self.log_file, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
-
-        # Write to database (with in-memory fallback)
-        self._write_event_to_database(log_entry)
-
-    def _write_event_to_database(self, log_entry: dict):
-        """Write event to database with retry logic and in-memory fallback"""
-        retry_mode = os.getenv("PIPELINE_EVENT_RETRY_MODE", "production")
-        max_retries = 3 if retry_mode == "development" else 0
-
-        success = False
-        for attempt in range(max_retries + 1):
-            try:
-                from app.database import get_supabase
-                db = get_supabase()
-
-                # Insert event into pipeline_events table
-                response = db.table("pipeline_events").insert({
-                    "patient_id": log_entry["patient_id"],
-                    "session_id": log_entry.get("session_id"),
-                    "session_date": log_entry.get("session_date"),
-                    "phase": log_entry["phase"],
-                    "event": log_entry["event"],
-                    "status": log_entry["status"],
-                    "message": "",  # Optional message field
-                    "metadata": log_entry.get("details", {}),
-                    "consumed": False
-                }).execute()
-
-                if response.data:
-                    print(f"[PipelineLogger] ✓ Event logged to DB: {log_entry['phase']} {log_entry['event']}", flush=True)
-                    success = True
-                    break
-                else:
-                    print(f"[PipelineLogger] DB insert returned no data (attempt {attempt + 1}/{max_retries + 1})", flush=True)
-
-            except Exception as e:
-                print(f"[PipelineLogger] DB write error (attempt {attempt + 1}/{max_retries + 1}): {str(e)}", flush=True)
-
-                if attempt < max_retries:
-                    # Exponential backoff: 0.1s, 0.2s, 0.4s
-                    wait_time = 0.1 * (2 ** attempt)
-                    time.sleep(wait_time)
-
-        # Fallback to in-memory queue if database write failed
-        if not success:
-            print(f"[PipelineLogger] ⚠️  Using in-memory fallback for event", flush=True)
-            _event_queue[self.patient_id].append(log_entry)
+        # File, database and event bus writes happen on the writer thread
+        get_event_writer().enqueue(self.log_file, log_entry)
 
     @staticmethod
     def get_events(patient_id: str) -> list:
@@ -0,0 +1,105 @@
+"""
+Session Field Sets - Column projections for therapy_sessions queries
+
+select("*") on therapy_sessions ships the full transcript JSONB (thousands of
+segments), deep_analysis and prose_analysis even when a caller only needs
+dates and scores. Endpoints select one of these named field sets instead:
+
+- summary: identity, dates, status and headline Wave 1 results (list views)
+- wave1:   summary + all Wave 1 analysis columns
+- wave2:   wave1 + deep analysis and prose (everything except the transcript)
+- full:    every column, including the transcript
+
+The transcript is fetched on its own via GET /api/sessions/{id}/transcript.
+
+Usage:
+    from app.utils.session_fields import session_columns
+
+    columns = session_columns(fields)  # raises ValueError on unknown names
+    db.table("therapy_sessions").select(columns)
+"""
+
+from typing import Dict, Tuple
+
+SUMMARY_FIELDS: Tuple[str, ...] = (
+    "id",
+    "patient_id",
+    "therapist_id",
+    "session_date",
+    "duration_minutes",
+    "status",
+    "analysis_status",
+    "topics",
+    "technique",
+    "summary",
+    "action_items",
+    "action_items_summary",
+    "mood_score",
+    "mood_confidence",
+    "emotional_tone",
+    "has_breakthrough",
+    "breakthrough_label",
+    "created_at",
+    "updated_at",
+)
+
+WAVE1_FIELDS: Tuple[str, ...] = SUMMARY_FIELDS + (
+    "extraction_confidence",
+    "raw_meta_summary",
+    "topics_extracted_at",
+    "mood_rationale",
+    "mood_indicators",
+    "mood_analyzed_at",
+    "breakthrough_data",
+    "breakthrough_analyzed_at",
+    "wave1_completed_at",
+)
+
+WAVE2_FIELDS: Tuple[str, ...] = WAVE1_FIELDS + (
+    "deep_analysis",
+    "deep_analyzed_at",
+    "analysis_confidence",
+    "prose_analysis",
+    "prose_generated_at",
+)
+
+# Columns the patient aggregates (progress metrics + consistency) are built from
+PATIENT_AGGREGATE_FIELDS: Tuple[str, ...] = (
+    "id",
+    "session_date",
+    "created_at",
+    "mood_score",
+    "mood_confidence",
+    "mood_analyzed_at",
+)
+
+SESSION_FIELD_SETS: Dict[str, Tuple[str, ...]] = {
+    "summary": SUMMARY_FIELDS,
+    "wave1": WAVE1_FIELDS,
+    "wave2": WAVE2_FIELDS,
+    "full": ("*",),
+}
+
+DEFAULT_LIST_FIELD_SET = "summary"
+
+
+def session_columns(field_set: str) -> str:
+    """
+    Resolve a field set name to a PostgREST select() column list.
+
+    Args:
+        field_set: One of SESSION_FIELD_SETS (case-insensitive)
+
+    Returns:
+        Comma-separated column list
+
+    Raises:
+        ValueError: If the field set is unknown
+    """
+    fields = SESSION_FIELD_SETS.get((field_set or "").strip().lower())
+    if fields is None:
+        raise ValueError(
+            f"Unknown field set '{field_set}'. "
+            f"Valid options: {', '.join(SESSION_FIELD_SETS)}"
+        )
+    return ", ".join(fields)
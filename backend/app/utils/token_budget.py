@@ -0,0 +1,357 @@
+"""
+Token Budget - Prompt-token counting and transcript windowing
+
+Generators used to embed the entire transcript in their prompts, so long
+sessions drove up latency and cost and could overflow the context window.
+fit_transcript() fits a transcript into a token budget instead:
+
+1. Segments are grouped into speaker turns (consecutive segments by the same
+   speaker), the unit that is kept or dropped
+2. If everything fits, the transcript is returned unchanged
+3. Otherwise the opening and closing turns (agenda, homework) and any turn
+   with risk language are pinned, then the most salient turns are added
+   (insight, emotion and planning language, client turns weighted up), each
+   pulling in the turn before it so answers keep their question, and any
+   budget left goes to turns nearest the ones already kept
+4. Kept turns are rendered in order, with an omission marker per dropped run
+
+Selection is deterministic (ties break on turn order), and the WindowReport
+lists every dropped run by turn range, timestamps and tokens.
+
+Token counts use tiktoken when it is installed and fall back to a
+character-based estimate otherwise.
+
+Usage:
+    from app.utils.token_budget import count_tokens, fit_transcript
+
+    fitted = fit_transcript(segments, budget_tokens=6000, render_segment=fmt)
+    prompt = f"Transcript:\\n{fitted.text}"
+    if fitted.report.truncated:
+        logger.info(fitted.report.summary())
+"""
+
+import logging
+import math
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Segment = Dict[str, Any]
+RenderSegment = Callable[[Segment], Optional[str]]
+
+# Fallback estimator: ~4 characters per token for English prose
+CHARS_PER_TOKEN = 4
+
+# Turns always kept at each end of a truncated transcript
+ANCHOR_TURNS = 4
+
+# Speaker treated as the client when weighting salience
+CLIENT_SPEAKERS = ("SPEAKER_01", "Client", "Patient")
+
+SALIENCE_TERMS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "insight": (3.0, (
+        "realiz", "never thought", "never connected", "makes sense", "understand",
+        "i see", "noticed", "figured out", "it's like", "that's why", "didn't know",
+        "blowing my mind", "first time", "think back", "thinking about it",
+        "wasn't about", "maybe i'm", "core belief", "pattern", "empower",
+    )),
+    "emotion": (1.0, (
+        "feel", "felt", "scared", "afraid", "angry", "sad", "cry", "crying", "anxious",
+        "panic", "ashamed", "shame", "hopeless", "guilty", "lonely", "happy", "proud",
+        "relief", "hope",
+    )),
+    "plan": (2.0, (
+        "homework", "this week", "practice", "goal", "plan", "next session",
+        "try to", "going to", "commit",
+    )),
+}
+
+# Turns mentioning these are never dropped
+RISK_TERMS: Tuple[str, ...] = (
+    "suicid", "kill myself", "end my life", "self-harm", "hurt myself",
+    "cutting", "overdose", "don't want to be here", "not be here",
+)
+
+
+# =============================================================================
+# Token Counting
+# =============================================================================
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        logger.info("tiktoken not installed; using character-based token estimates")
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:  # Encoding files unavailable (offline)
+        logger.warning(f"tiktoken encoding unavailable, using estimates: {e}")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast character-based token estimate (no tokenizer)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def count_tokens(text: str) -> int:
+    """Token count with the GPT-5 tokenizer when available, else estimate_tokens()."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+# =============================================================================
+# Report
+# =============================================================================
+
+@dataclass
+class DroppedSpan:
+    """A contiguous run of dropped turns."""
+    first_turn: int
+    last_turn: int
+    start: float
+    end: float
+    tokens: int
+
+    @property
+    def turns(self) -> int:
+        return self.last_turn - self.first_turn + 1
+
+
+@dataclass
+class WindowReport:
+    """What fit_transcript() kept and dropped."""
+    budget_tokens: int
+    original_tokens: int
+    kept_tokens: int
+    original_turns: int
+    kept_turns: int
+    pinned_turns: int = 0
+    dropped: List[DroppedSpan] = field(default_factory=list)
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.dropped)
+
+    @property
+    def reduction(self) -> float:
+        """Fraction of transcript tokens removed."""
+        if not self.original_tokens:
+            return 0.0
+        return 1 - self.kept_tokens / self.original_tokens
+
+    def summary(self) -> str:
+        return (
+            f"Transcript windowed: kept {self.kept_turns}/{self.original_turns} turns, "
+            f"{self.kept_tokens}/{self.original_tokens} tokens (budget {self.budget_tokens}), "
+            f"dropped {len(self.dropped)} spans"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["truncated"] = self.truncated
+        return data
+
+    def cost_metadata(self) -> Optional[Dict[str, Any]]:
+        """generation_costs metadata recording the window (None if nothing was dropped)."""
+        return {"transcript_window": self.to_dict()} if self.truncated else None
+
+
+@dataclass
+class FittedTranscript:
+    text: str
+    report: WindowReport
+
+
+# =============================================================================
+# Windowing
+# =============================================================================
+
+@dataclass
+class _Turn:
+    index: int
+    speaker: str
+    lines: List[str]
+    start: float
+    end: float
+    tokens: int = 0
+    salience: float = 0.0
+    risk: bool = False
+
+
+def _format_timestamp(seconds: float) -> str:
+    return f"{int(seconds // 60):02d}:{int(seconds % 60):02d}"
+
+
+def _omission_marker(span: DroppedSpan) -> str:
+    return (
+        f"[... {span.turns} turn{'s' if span.turns != 1 else ''} omitted "
+        f"({_format_timestamp(span.start)}-{_format_timestamp(span.end)}) ...]"
+    )
+
+
+def _group_turns(segments: Sequence[Segment], render_segment: RenderSegment, group: bool) -> List[_Turn]:
+    turns: List[_Turn] = []
+    for segment in segments:
+        line = render_segment(segment)
+        if not line:
+            continue
+        speaker = segment.get("speaker") or segment.get("speaker_id") or "UNKNOWN"
+        start = float(segment.get("start") or 0.0)
+        end = float(segment.get("end") or start)
+        if group and turns and turns[-1].speaker == speaker:
+            turns[-1].lines.append(line)
+            turns[-1].end = end
+        else:
+            turns.append(_Turn(index=len(turns), speaker=speaker, lines=[line], start=start, end=end))
+    return turns
+
+
+def _score(turn: _Turn, text: str) -> None:
+    lowered = text.lower()
+    turn.risk = any(term in lowered for term in RISK_TERMS)
+    hits = sum(weight * sum(lowered.count(term) for term in terms) for weight, terms in SALIENCE_TERMS.values())
+    if turn.speaker in CLIENT_SPEAKERS:
+        hits *= 1.5
+    # Density, so long rambling turns don't win on length alone
+    turn.salience = hits / math.sqrt(max(turn.tokens, 1))
+
+
+def _dropped_spans(turns: List[_Turn], kept: set) -> List[DroppedSpan]:
+    spans: List[DroppedSpan] = []
+    for turn in turns:
+        if turn.index in kept:
+            continue
+        if spans and spans[-1].last_turn == turn.index - 1:
+            span = spans[-1]
+            span.last_turn = turn.index
+            span.end = turn.end
+            span.tokens += turn.tokens
+        else:
+            spans.append(DroppedSpan(turn.index, turn.index, turn.start, turn.end, turn.tokens))
+    return spans
+
+
+def _render(turns: List[_Turn], kept: set, spans: List[DroppedSpan], separator: str) -> str:
+    markers = {span.first_turn: _omission_marker(span) for span in spans}
+    parts: List[str] = []
+    for turn in turns:
+        if turn.index in kept:
+            parts.extend(turn.lines)
+        elif turn.index in markers:
+            parts.append(markers[turn.index])
+    return separator.join(parts)
+
+
+def fit_transcript(
+    segments: Sequence[Segment],
+    budget_tokens: int,
+    render_segment: RenderSegment,
+    separator: str = "\n",
+    anchor_turns: int = ANCHOR_TURNS,
+    group_turns: bool = True,
+) -> FittedTranscript:
+    """
+    Render a transcript within budget_tokens, dropping the least salient turns.
+
+    Args:
+        segments: Transcript segments ({speaker, text, start, end}) or
+            pre-grouped turns in the same shape
+        budget_tokens: Maximum tokens for the rendered transcript
+        render_segment: Formats one segment as a line (falsy = skip segment)
+        separator: Joins rendered lines
+        anchor_turns: Turns always kept at the start and end
+        group_turns: Merge consecutive same-speaker segments into one turn
+            (False for single-speaker input, e.g. patient-only dialogue)
+
+    Returns:
+        FittedTranscript with the rendered text and a WindowReport
+    """
+    turns = _group_turns(segments, render_segment, group_turns)
+    for turn in turns:
+        text = separator.join(turn.lines)
+        turn.tokens = count_tokens(text)
+        _score(turn, text)
+
+    original_tokens = sum(turn.tokens for turn in turns)
+    if original_tokens <= budget_tokens:
+        kept = {turn.index for turn in turns}
+        return FittedTranscript(
+            text=_render(turns, kept, [], separator),
+            report=WindowReport(
+                budget_tokens=budget_tokens,
+                original_tokens=original_tokens,
+                kept_tokens=original_tokens,
+                original_turns=len(turns),
+                kept_turns=len(turns),
+            ),
+        )
+
+    # Every dropped run costs one marker line
+    marker_tokens = count_tokens(_omission_marker(DroppedSpan(0, 9, 0.0, 3599.0, 0)))
+    by_index = {turn.index: turn for turn in turns}
+    kept: set = set()
+    used = marker_tokens  # Nothing kept yet: one run covering everything
+
+    def dropped(index: int) -> bool:
+        return index in by_index and index not in kept
+
+    def take(turn: _Turn) -> bool:
+        nonlocal used
+        if turn.index in kept:
+            return True
+        left, right = dropped(turn.index - 1), dropped(turn.index + 1)
+        span_delta = 1 if (left and right) else (-1 if not (left or right) else 0)
+        cost = turn.tokens + span_delta * marker_tokens
+        if used + cost > budget_tokens:
+            return False
+        kept.add(turn.index)
+        used += cost
+        return True
+
+    # Pinned: risk language first, then opening and closing anchors
+    pinned = [turn for turn in turns if turn.risk]
+    if anchor_turns:
+        pinned += turns[:anchor_turns] + turns[-anchor_turns:]
+    for turn in pinned:
+        take(turn)
+    pinned_count = len(kept)
+
+    # Salient turns, most salient first; ties keep transcript order
+    for turn in sorted(turns, key=lambda t: (-t.salience, t.index)):
+        if turn.salience <= 0:
+            break
+        if take(turn) and turn.index > 0:
+            take(by_index[turn.index - 1])  # The question that prompted it
+
+    # Spend what is left on context around the kept turns
+    kept_indices = sorted(kept)
+
+    def distance(turn: _Turn) -> int:
+        return min((abs(turn.index - index) for index in kept_indices), default=0)
+
+    for turn in sorted((t for t in turns if t.index not in kept), key=lambda t: (distance(t), t.index)):
+        take(turn)
+
+    spans = _dropped_spans(turns, kept)
+    kept_tokens = sum(by_index[index].tokens for index in kept)
+    return FittedTranscript(
+        text=_render(turns, kept, spans, separator),
+        report=WindowReport(
+            budget_tokens=budget_tokens,
+            original_tokens=original_tokens,
+            kept_tokens=kept_tokens,
+            original_turns=len(turns),
+            kept_turns=len(kept),
+            pinned_turns=pinned_count,
+            dropped=spans,
+        ),
+    )
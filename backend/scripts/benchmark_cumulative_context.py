@@ -0,0 +1,141 @@
+"""
+Cumulative Context Benchmark
+
+Compares the size of the Wave 2 cumulative context in session N's deep-analysis
+prompt:
+
+- nested: the previous approach, where each session's context nested the prior
+  context under "previous_context", serialized with json.dumps(indent=2)
+- bounded: CumulativeContext (last 3 sessions in full + compacted summary),
+  serialized as DeepAnalyzer now does
+
+Runs over the 12 mock sessions and a synthetic 100-session patient. Wave 1 /
+Wave 2 payloads come from the recorded pipeline demo
+(mock-therapy-data/full_pipeline_demo_20251223_184038.json), cycled across
+sessions. No API calls are made.
+
+Usage:
+    python scripts/benchmark_cumulative_context.py
+    python scripts/benchmark_cumulative_context.py --synthetic-sessions 200 --json
+"""
+
+import argparse
+import copy
+import glob
+import json
+import os
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.cumulative_context import CumulativeContext, extract_wave1_data
+from app.utils.token_budget import count_tokens
+
+MOCK_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'mock-therapy-data'))
+DEMO_RUN = "full_pipeline_demo_20251223_184038.json"
+REPORT_POINTS = (1, 2, 3, 5, 10, 25, 50, 75, 100, 150, 200)
+
+
+def load_payloads() -> List[Dict[str, Any]]:
+    with open(os.path.join(MOCK_DATA_DIR, DEMO_RUN)) as f:
+        demo = json.load(f)
+    return [{"wave1": s["wave1"], "deep_analysis": s["wave2"]["deep_analysis"]} for s in demo["sessions"]]
+
+
+def build_sessions(session_ids: List[str], payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    sessions = []
+    for number, session_id in enumerate(session_ids, 1):
+        payload = copy.deepcopy(payloads[(number - 1) % len(payloads)])
+        session = {**payload["wave1"], "id": session_id,
+                   "session_date": (date(2025, 1, 6) + timedelta(weeks=number - 1)).isoformat(),
+                   "has_breakthrough": number % 4 == 0,
+                   "breakthrough_data": {"type": "Positive Discovery", "description": f"Insight in session {number}."}}
+        session["deep_analysis"] = payload["deep_analysis"]
+        sessions.append(session)
+    return sessions
+
+
+def nested_context(previous: Optional[Dict[str, Any]], session: Dict[str, Any], number: int) -> Dict[str, Any]:
+    """The previous scripts/seed_wave2_analysis.py build_cumulative_context()."""
+    context: Dict[str, Any] = {}
+    if previous:
+        context["previous_context"] = previous
+    context[f"session_{number:02d}_wave1"] = extract_wave1_data(session)
+    context[f"session_{number:02d}_wave2"] = {
+        "session_id": session["id"], "session_date": session["session_date"], "deep_analysis": session["deep_analysis"],
+    }
+    return context
+
+
+def run(sessions: List[Dict[str, Any]], points: List[int]) -> Dict[str, Any]:
+    nested = None
+    bounded = CumulativeContext()
+    rows = []
+    nested_total = bounded_total = 0
+
+    for number, session in enumerate(sessions, 1):
+        # Context for analyzing session `number` covers sessions 1..number-1
+        nested_text = json.dumps(nested, indent=2) if nested else ""
+        bounded_prompt = bounded.to_prompt_context()
+        bounded_text = json.dumps(bounded_prompt, ensure_ascii=False) if bounded_prompt else ""
+        nested_total += len(nested_text)
+        bounded_total += len(bounded_text)
+
+        if number in points:
+            rows.append({
+                "session": number,
+                "nested_tokens": count_tokens(nested_text),
+                "bounded_tokens": count_tokens(bounded_text),
+                "nested_kb": round(len(nested_text) / 1024, 1),
+                "bounded_kb": round(len(bounded_text) / 1024, 1),
+            })
+
+        nested = nested_context(nested, session, number)
+        bounded.add_session(session, session["deep_analysis"])
+
+    return {
+        "sessions": len(sessions),
+        "rows": rows,
+        "nested_total_mb": round(nested_total / 1024 / 1024, 2),
+        "bounded_total_mb": round(bounded_total / 1024 / 1024, 2),
+    }
+
+
+def print_run(title: str, result: Dict[str, Any]) -> None:
+    print(f"\n{title} ({result['sessions']} sessions)")
+    print(f"{'session':>8} {'nested tokens':>14} {'bounded tokens':>15} {'nested KB':>10} {'bounded KB':>11}")
+    for row in result["rows"]:
+        print(f"{row['session']:>8} {row['nested_tokens']:>14} {row['bounded_tokens']:>15} "
+              f"{row['nested_kb']:>10} {row['bounded_kb']:>11}")
+    print(f"Serialized over the whole run: nested {result['nested_total_mb']} MB, "
+          f"bounded {result['bounded_total_mb']} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Wave 2 cumulative context growth")
+    parser.add_argument("--synthetic-sessions", type=int, default=100, help="Sessions in the synthetic patient")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    payloads = load_payloads()
+    mock_ids = [os.path.basename(path)[:10] for path in
+                sorted(glob.glob(os.path.join(MOCK_DATA_DIR, "sessions", "session_*.json")))]
+    synthetic_ids = [f"synthetic_{n:03d}" for n in range(1, args.synthetic_sessions + 1)]
+
+    results = {
+        "mock": run(build_sessions(mock_ids, payloads), list(range(1, len(mock_ids) + 1))),
+        "synthetic": run(build_sessions(synthetic_ids, payloads), list(REPORT_POINTS)),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print_run("Mock sessions", results["mock"])
+    print_run("Synthetic patient", results["synthetic"])
+
+
+if __name__ == "__main__":
+    main()
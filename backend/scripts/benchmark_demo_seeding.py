@@ -0,0 +1,305 @@
+"""
+Demo Seeding Benchmark
+
+Measures time-to-first-result of /api/demo/initialize's seeding pipeline:
+the time from launching the transcript stage to its first populated
+session, for
+
+- subprocess: how the demo router used to launch each stage (a fresh
+  interpreter running the seeding script, so imports happen first)
+- in-process: the warm DemoSeedingPool the router uses now
+
+It also reports each stage's launch overhead (spawn + imports for a
+subprocess, dispatch to the "started" event in-process), which every
+stage of the old chain paid. Transcript files are really loaded; the
+session write is stubbed, and pipeline events go through the real
+PipelineLogger against the stood-in network, so no Supabase or OpenAI calls
+are made (the benchmark patient's log file is removed afterwards).
+
+End to end, it then runs the whole /api/demo/initialize pipeline
+(transcripts -> Wave 1 -> Wave 2) on the pool with the real stages and
+only the network stood in for, blocking the way the real calls do (see
+benchmark_wave2_dag.py), and reports per stage the time from
+/initialize to its first result and to its completion, the API event
+loop's worst stall meanwhile, and how long a /demo/stop sent during Wave
+2 takes to cut it off. Pipeline events are written by the real logger. The
+sync-llm row calls the sync OpenAI client from the loop, as the analyzers
+used to; the sync-events row writes each pipeline event on the loop, as
+log_event() used to.
+
+Usage:
+    python scripts/benchmark_demo_seeding.py
+    python scripts/benchmark_demo_seeding.py --trials 5 --json
+    python scripts/benchmark_demo_seeding.py --skip-launch --llm-ms 500
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+# Add parent directory (and scripts/, for benchmark_wave2_dag) to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+os.environ.setdefault("ENVIRONMENT", "test")  # Quiet config validation in child processes
+
+from benchmark_wave2_dag import MODES, Network, _watch_loop, drain_events, make_sessions, mode_patches
+
+PATIENT_ID = "00000000-0000-0000-0000-000000000001"
+STAGES = ("transcript", "wave1", "wave2")
+LAUNCH_DB_SECONDS = 0.02  # Pipeline event inserts during the launch measurements
+
+
+async def _no_db_write(*args: Any, **kwargs: Any) -> bool:
+    return True
+
+
+def _stub_io() -> List[Any]:
+    """Stub the session write; pipeline events reach a stood-in database (same in both modes)."""
+    return [patch("seed_all_sessions.populate_session_transcript", _no_db_write)] + \
+        Network([], 0.0, LAUNCH_DB_SECONDS).patches()
+
+
+# =============================================================================
+# Subprocess (before)
+# =============================================================================
+
+def child(stage: str) -> None:
+    """Runs in the spawned interpreter: import the stage script, then report first result."""
+    from app.services.demo_seeding import _STAGE_SCRIPTS, _load_script
+
+    module = _load_script(_STAGE_SCRIPTS[stage])
+    if stage != "transcript":
+        print("READY", flush=True)
+        return
+
+    first = asyncio.Event()
+
+    def on_progress(**fields: Any) -> None:
+        if not first.is_set():
+            print("FIRST", flush=True)
+            first.set()
+
+    with ExitStack() as stack:
+        for stub in _stub_io():
+            stack.enter_context(stub)
+        stdout, sys.stdout = sys.stdout, stack.enter_context(open(os.devnull, "w"))
+        try:
+            asyncio.run(module.seed_all_sessions_async(PATIENT_ID, on_progress=on_progress))
+        finally:
+            drain_events()
+            sys.stdout = stdout
+
+
+def time_subprocess(stage: str) -> float:
+    """Seconds from spawn to the child's first line (READY or FIRST)."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--child", stage],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=os.environ.copy()
+    )
+    process.stdout.readline()
+    elapsed = time.perf_counter() - start
+    process.wait()
+    return elapsed
+
+
+# =============================================================================
+# In-process (after)
+# =============================================================================
+
+async def time_in_process(pool, stage: str) -> float:
+    """Seconds from pool.start() to the first progress event (transcript) or stage start."""
+    target = "progress" if stage == "transcript" else "started"
+    reached = asyncio.Event()
+
+    def on_progress(event) -> None:
+        if event.stage == stage and event.status == target:
+            reached.set()
+
+    start = time.perf_counter()
+    run = pool.start(PATIENT_ID, (stage,), on_progress=on_progress)
+    await reached.wait()
+    elapsed = time.perf_counter() - start
+    if stage == "transcript":
+        await run.task
+    else:
+        await pool.stop(PATIENT_ID)  # Only the dispatch is measured; Wave 1/2 would call the APIs
+    return elapsed
+
+
+async def run_in_process(trials: int) -> Dict[str, List[float]]:
+    from app.services.demo_seeding import DEFAULT_STAGES, DemoSeedingPool
+
+    async def idle_stage(patient_id, report, **options):
+        await asyncio.sleep(3600)
+
+    pool = DemoSeedingPool(stages={"transcript": DEFAULT_STAGES["transcript"], "wave1": idle_stage, "wave2": idle_stage})
+    pool.warm()  # What the API does at startup (imports all three scripts)
+
+    samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    with ExitStack() as stack:
+        for stub in _stub_io():
+            stack.enter_context(stub)
+        stdout, sys.stdout = sys.stdout, stack.enter_context(open(os.devnull, "w"))
+        try:
+            for _ in range(trials):
+                for stage in STAGES:
+                    samples[stage].append(await time_in_process(pool, stage))
+        finally:
+            await asyncio.to_thread(drain_events)
+            sys.stdout = stdout
+    return samples
+
+
+# =============================================================================
+# End to end (network stand-ins)
+# =============================================================================
+
+async def run_pipeline(mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """One /api/demo/initialize pipeline, then a Wave 2 run stopped mid-way."""
+    import seed_all_sessions
+    import seed_wave2_analysis
+    from app.database import close_async_supabase
+    from app.services.demo_seeding import WAVE2, DemoSeedingPool
+    from app.services.openai_client_registry import get_client_registry
+
+    def sync_step(seconds: float):
+        return lambda patient_id, session_id: time.sleep(seconds)
+
+    network = Network(make_sessions(len(seed_all_sessions.SESSION_FILES)), args.llm_ms / 1000, args.db_ms / 1000)
+    first: Dict[str, float] = {}
+    done: Dict[str, float] = {}
+    wave2_running = asyncio.Event()
+
+    def on_progress(event) -> None:
+        now = time.perf_counter()
+        if event.status == "progress":
+            first.setdefault(event.stage, now)
+            if event.stage == WAVE2:
+                wave2_running.set()
+        elif event.status in ("complete", "failed"):
+            done[event.stage] = now
+
+    with ExitStack() as stack:
+        for stub in network.patches() + [
+            patch.object(seed_wave2_analysis, "save_report", lambda *a, **k: None),
+            patch.object(seed_wave2_analysis, "generate_roadmap_for_session", sync_step(args.roadmap_ms / 1000)),
+            patch.object(seed_wave2_analysis, "generate_session_bridge_for_session", sync_step(args.bridge_ms / 1000)),
+        ] + mode_patches(mode):
+            stack.enter_context(stub)
+        stdout, sys.stdout = sys.stdout, stack.enter_context(open(os.devnull, "w"))
+
+        pool = DemoSeedingPool()
+        stalls: List[float] = []
+        watcher = asyncio.create_task(_watch_loop(stalls))
+        try:
+            start = time.perf_counter()
+            await pool.start(PATIENT_ID, STAGES, on_progress=on_progress).task
+
+            wave2_running.clear()
+            stopped = pool.start(PATIENT_ID, (WAVE2,), on_progress=on_progress)
+            await wave2_running.wait()
+            # /demo/stop arrives 200ms later; a blocked loop serves it late
+            stop_due = time.perf_counter() + 0.2
+            await asyncio.sleep(0.2)
+            await pool.stop(PATIENT_ID, grace_seconds=60)
+            stop_seconds = time.perf_counter() - stop_due
+        finally:
+            watcher.cancel()
+            await asyncio.to_thread(drain_events)
+            sys.stdout = stdout
+            await get_client_registry().aclose()
+            await close_async_supabase()
+
+    return {
+        "first_result_ms": {stage: round((first[stage] - start) * 1000, 1) for stage in STAGES if stage in first},
+        "complete_ms": {stage: round((done[stage] - start) * 1000, 1) for stage in STAGES if stage in done},
+        "max_loop_stall_ms": round(max(stalls, default=0.0) * 1000, 1),
+        "stop_ms": round(stop_seconds * 1000, 1),
+        "stop_cancelled": stopped.task.cancelled(),
+    }
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {"median_ms": round(statistics.median(samples) * 1000, 1), "max_ms": round(max(samples) * 1000, 1)}
+
+
+def print_pipeline(pipeline: Dict[str, Dict[str, Any]], args: argparse.Namespace) -> None:
+    print(f"\n/api/demo/initialize end to end (LLM {args.llm_ms:g}ms, DB {args.db_ms:g}ms, "
+          f"roadmap {args.roadmap_ms:g}ms, bridge {args.bridge_ms:g}ms)")
+    print(f"{'mode':>11} " + " ".join(f"{stage + ' first/done s':>22}" for stage in STAGES)
+          + f" {'loop stall ms':>14} {'stop ms':>8}")
+    for mode, row in pipeline.items():
+        cells = [
+            f"{row['first_result_ms'].get(stage, 0) / 1000:.2f} / {row['complete_ms'].get(stage, 0) / 1000:.2f}"
+            for stage in STAGES
+        ]
+        print(f"{mode:>11} " + " ".join(f"{cell:>22}" for cell in cells)
+              + f" {row['max_loop_stall_ms']:>14} {row['stop_ms']:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark demo seeding launch: subprocess vs in-process pool")
+    parser.add_argument("--trials", type=int, default=3, help="Runs per stage and mode")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--skip-launch", action="store_true", help="Only run the end-to-end pipeline")
+    parser.add_argument("--llm-ms", type=float, default=300, help="End to end: OpenAI round trip")
+    parser.add_argument("--db-ms", type=float, default=20, help="End to end: Supabase round trip")
+    parser.add_argument("--roadmap-ms", type=float, default=150, help="End to end: roadmap generation (sync)")
+    parser.add_argument("--bridge-ms", type=float, default=100, help="End to end: session bridge generation (sync)")
+    parser.add_argument("--child", choices=STAGES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    rows = {}
+    if not args.skip_launch:
+        before = {stage: [time_subprocess(stage) for _ in range(args.trials)] for stage in STAGES}
+        after = asyncio.run(run_in_process(args.trials))
+        rows = {
+            stage: {"subprocess": _summary(before[stage]), "in_process": _summary(after[stage])}
+            for stage in STAGES
+        }
+
+    logging.disable(logging.WARNING)
+    asyncio.run(run_pipeline("async", args))  # Warm-up (tokenizer, clients)
+    pipeline = {mode: asyncio.run(run_pipeline(mode, args)) for mode in MODES}
+
+    if args.json:
+        print(json.dumps({"launch": rows, "pipeline": pipeline}, indent=2))
+        return
+
+    print_pipeline(pipeline, args)
+    if not rows:
+        return
+
+    print(f"\nMedian of {args.trials} runs (transcript = time to first populated session;")
+    print("wave1/wave2 = launch overhead before the stage can start work)")
+    print(f"{'stage':>12} {'subprocess ms':>14} {'in-process ms':>14}")
+    for stage, row in rows.items():
+        print(f"{stage:>12} {row['subprocess']['median_ms']:>14} {row['in_process']['median_ms']:>14}")
+    chain_before = sum(row["subprocess"]["median_ms"] for row in rows.values())
+    chain_after = sum(row["in_process"]["median_ms"] for row in rows.values())
+    print(f"{'chain total':>12} {chain_before:>14.1f} {chain_after:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
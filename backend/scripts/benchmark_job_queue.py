@@ -0,0 +1,101 @@
+"""
+Job Queue Benchmark
+
+Shows analysis throughput scaling with the number of worker processes. Fills
+a temporary SQLite job queue with jobs whose handler sleeps for a fixed time
+(standing in for LLM latency), then drains it with 1, 2, 4... worker
+processes and reports jobs/second. Each worker also checks that no job was
+delivered twice. No API calls are made.
+
+Usage:
+    python scripts/benchmark_job_queue.py
+    python scripts/benchmark_job_queue.py --jobs 200 --job-seconds 0.1 --workers 1 2 4 8 --json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.job_queue import COMPLETED, SQLiteJobQueue, job_key
+from app.services.job_worker import JobWorker
+
+KIND = "benchmark"
+
+
+def worker_process(path: str, concurrency: int, job_seconds: float, results) -> None:
+    async def handler(ctx):
+        await asyncio.sleep(job_seconds)
+        return ctx.worker_id
+
+    async def drain():
+        worker = JobWorker({KIND: handler}, queue=SQLiteJobQueue(Path(path)), concurrency=concurrency)
+        await worker.run_until_idle()
+        return worker.completed
+
+    results.put(asyncio.run(drain()))
+
+
+def run(jobs: int, workers: int, concurrency: int, job_seconds: float) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "jobs.sqlite3")
+        queue = SQLiteJobQueue(Path(path))
+        for number in range(jobs):
+            queue.enqueue(KIND, job_key(f"session-{number}", KIND))
+
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=worker_process, args=(path, concurrency, job_seconds, results))
+            for _ in range(workers)
+        ]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        per_worker = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        completed = queue.stats().get(COMPLETED, 0)
+        return {
+            "workers": workers,
+            "elapsed_s": round(elapsed, 2),
+            "jobs_per_s": round(completed / elapsed, 1),
+            "completed": completed,
+            "per_worker": per_worker,
+            "duplicates": sum(per_worker) - completed,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark job throughput vs worker processes")
+    parser.add_argument("--jobs", type=int, default=120, help="Jobs to enqueue per run")
+    parser.add_argument("--job-seconds", type=float, default=0.2, help="Simulated duration of one job")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs in flight per worker")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker process counts to run")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rows: List[Dict[str, Any]] = [run(args.jobs, n, args.concurrency, args.job_seconds) for n in args.workers]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"\n{args.jobs} jobs x {args.job_seconds}s, {args.concurrency} in flight per worker")
+    print(f"{'workers':>8} {'elapsed s':>10} {'jobs/s':>8} {'speedup':>8} {'duplicates':>11}")
+    for row in rows:
+        speedup = rows[0]["elapsed_s"] / row["elapsed_s"]
+        print(f"{row['workers']:>8} {row['elapsed_s']:>10} {row['jobs_per_s']:>8} {speedup:>7.1f}x {row['duplicates']:>11}")
+
+
+if __name__ == "__main__":
+    main()
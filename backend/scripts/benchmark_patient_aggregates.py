@@ -0,0 +1,173 @@
+"""
+Patient Aggregates Benchmark
+
+Compares per-request work of /patient/{id}/consistency and
+/patient/{id}/progress-metrics before and after materialized aggregates, for
+patients with increasing session counts:
+
+- before: fetch the patient's sessions, then recompute (weekly buckets with
+  the original weeks x sessions loop; progress metrics via pipeline JSON)
+- after: read the patient_aggregates row, then serve the window / the
+  materialized progress metrics
+
+Rows are served from memory, so the timings are the Python work per request;
+the database side is reported as rows read per request.
+
+Usage:
+    python scripts/benchmark_patient_aggregates.py
+    python scripts/benchmark_patient_aggregates.py --sessions 20 100 500 --days 365 --json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.patient_aggregates import PatientAggregates
+from app.services.progress_metrics_extractor import ProgressMetricsExtractor
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def make_sessions(count: int) -> List[Dict[str, Any]]:
+    """Roughly weekly sessions ending at NOW, every one mood-analyzed."""
+    rng = random.Random(count)
+    rows, when = [], NOW - timedelta(days=8 * count)
+    for number in range(count):
+        when += timedelta(days=rng.choice([6, 7, 7, 7, 8, 14]))
+        rows.append({
+            "id": f"s{number}",
+            "session_date": when.isoformat(),
+            "created_at": when.isoformat(),
+            "mood_score": rng.choice([4.0, 5.5, 6.5, 7.0]),
+            "mood_confidence": 0.85,
+            "mood_analyzed_at": (when + timedelta(hours=1)).isoformat() + "Z",
+        })
+    return rows
+
+
+def consistency_before(rows: List[Dict[str, Any]], days: int) -> Dict[str, Any]:
+    """The original endpoint body after its query (sessions in the window, oldest first)."""
+    end_date = NOW
+    start_date = end_date - timedelta(days=days)
+    sessions = [row for row in rows if start_date <= datetime.fromisoformat(row["session_date"]) <= end_date]
+    session_dates = [datetime.fromisoformat(s["session_date"].replace("Z", "+00:00")) for s in sessions]
+
+    gaps = [(session_dates[i] - session_dates[i - 1]).days for i in range(1, len(session_dates))]
+    weekly_data = []
+    current_week_start = start_date
+    week_num = 1
+    while current_week_start < end_date:
+        week_end = current_week_start + timedelta(days=7)
+        sessions_in_week = sum(1 for date in session_dates if current_week_start <= date < week_end)
+        weekly_data.append({
+            "week": f"W{week_num}",
+            "attended": 1 if sessions_in_week > 0 else 0,
+            "session_count": sessions_in_week,
+            "week_start": current_week_start.strftime("%Y-%m-%d"),
+        })
+        current_week_start = week_end
+        week_num += 1
+
+    current_streak = longest_streak = 0
+    for week in weekly_data:
+        current_streak = current_streak + 1 if week["attended"] else 0
+        longest_streak = max(longest_streak, current_streak)
+    return {"weekly_data": weekly_data, "gaps": gaps, "longest_streak_weeks": longest_streak}
+
+
+def progress_before(rows: List[Dict[str, Any]], limit: int):
+    """The original endpoint body after its query: reshape to pipeline JSON, then extract."""
+    pipeline_data = {"sessions": []}
+    for idx, session in enumerate(rows[:limit], start=1):
+        pipeline_data["sessions"].append({
+            "session_num": idx,
+            "session_id": session["id"],
+            "wave1": {
+                "session_num": idx,
+                "mood_score": session.get("mood_score"),
+                "mood_confidence": session.get("mood_confidence", 0.8),
+                "analyzed_at": session.get("mood_analyzed_at") or session.get("created_at"),
+            },
+            "wave2": None,
+        })
+    return ProgressMetricsExtractor.extract_from_pipeline_json(pipeline_data)
+
+
+def per_call_us(fn: Callable[[], Any], min_seconds: float = 0.3) -> float:
+    """Microseconds per call (repeats until min_seconds have passed)."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+
+
+def run(count: int, days: int, limit: int) -> Dict[str, Any]:
+    rows = make_sessions(count)
+    aggregates = PatientAggregates()
+    for row in rows:
+        aggregates.set_mood(row)
+
+    window = sum(1 for row in rows if datetime.fromisoformat(row["session_date"]) >= NOW - timedelta(days=days))
+    return {
+        "sessions": count,
+        "consistency": {
+            "before_us": round(per_call_us(lambda: consistency_before(rows, days)), 1),
+            "after_us": round(per_call_us(lambda: aggregates.consistency(days, now=NOW)), 1),
+            "rows_read_before": window,
+        },
+        "progress_metrics": {
+            "before_us": round(per_call_us(lambda: progress_before(rows, limit)), 1),
+            "after_us": round(per_call_us(lambda: aggregates.progress_metrics_for(limit)), 1),
+            "rows_read_before": min(limit, count),
+        },
+        "record_session_us": round(per_call_us(lambda: _record(aggregates, rows)), 1),
+    }
+
+
+def _record(aggregates: PatientAggregates, rows: List[Dict[str, Any]]) -> None:
+    """Incremental cost of a Wave 1 result for the newest session (moved there and back)."""
+    row = rows[-1]
+    aggregates.set_mood({**row, "mood_score": 9.0})
+    aggregates.set_mood(row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark consistency/progress-metrics: recompute vs aggregates")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[20, 100, 500], help="Sessions per patient")
+    parser.add_argument("--days", type=int, default=365, help="Consistency window")
+    parser.add_argument("--limit", type=int, default=50, help="Progress metrics limit")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [run(count, args.days, args.limit) for count in args.sessions]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"\nPer request (consistency days={args.days}, progress limit={args.limit}); "
+          f"after = 1 aggregates row read")
+    print(f"{'sessions':>9} {'endpoint':>17} {'rows before':>12} {'before us':>10} {'after us':>9} {'speedup':>8}")
+    for result in results:
+        for name in ("consistency", "progress_metrics"):
+            row = result[name]
+            speedup = row["before_us"] / row["after_us"]
+            print(f"{result['sessions']:>9} {name:>17} {row['rows_read_before']:>12} "
+                  f"{row['before_us']:>10} {row['after_us']:>9} {speedup:>7.1f}x")
+    print("\nIncremental Wave 1 update (x2): " + ", ".join(
+        f"{result['sessions']} sessions {result['record_session_us']}us" for result in results))
+
+
+if __name__ == "__main__":
+    main()
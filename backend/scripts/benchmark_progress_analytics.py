@@ -0,0 +1,191 @@
+"""
+Progress Analytics Benchmark
+
+Times consistency scores and mood trends for a clinician-level view
+(default 1,000 patients x 100 sessions), computed
+
+- per patient: the original Python loops (datetime.fromisoformat per
+  session, the weeks x sessions weekly loop, streak loop, and
+  ProgressMetricsExtractor's mood trend) run once per patient
+- batched: progress_analytics.consistency_batch + mood_trends_batch over
+  flat NumPy arrays
+
+and checks both give the same results.
+
+Usage:
+    python scripts/benchmark_progress_analytics.py
+    python scripts/benchmark_progress_analytics.py --patients 1000 --sessions 100 --days 365 --json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.progress_analytics import consistency_batch, mood_trends_batch
+from app.services.progress_metrics_extractor import ProgressMetricsExtractor
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def make_patients(patients: int, sessions: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Session rows per patient (roughly weekly, oldest first), as the sessions query returns them."""
+    rng = random.Random(42)
+    data = {}
+    for number in range(patients):
+        when = NOW - timedelta(days=8 * sessions)
+        rows = []
+        for _ in range(sessions):
+            when += timedelta(days=rng.choice([5, 7, 7, 7, 8, 10, 14, 21]), hours=rng.randrange(-4, 5))
+            rows.append({"session_date": when.isoformat(), "mood_score": rng.choice([3.5, 5.0, 5.5, 6.5, 7.0, 8.5])})
+        data[f"patient-{number}"] = rows
+    return data
+
+
+def consistency_per_patient(rows: List[Dict[str, Any]], days: int) -> Dict[str, Any]:
+    """The original /consistency body for one patient (after its sessions query)."""
+    end_date = NOW
+    start_date = end_date - timedelta(days=days)
+    sessions = [row for row in rows if start_date.isoformat() <= row["session_date"] <= end_date.isoformat()]
+    if not sessions:
+        return {"total_sessions": 0}
+
+    session_dates = [datetime.fromisoformat(s["session_date"].replace("Z", "+00:00")) for s in sessions]
+    gaps = []
+    for i in range(1, len(session_dates)):
+        gaps.append((session_dates[i] - session_dates[i - 1]).days)
+    average_gap = sum(gaps) / len(gaps) if gaps else 0
+
+    weeks_in_period = days / 7
+    expected_sessions = int(weeks_in_period)
+    attendance_rate = min(100, (len(sessions) / expected_sessions * 100)) if expected_sessions > 0 else 0
+
+    weekly_data = []
+    current_week_start = start_date
+    week_num = 1
+    while current_week_start < end_date:
+        week_end = current_week_start + timedelta(days=7)
+        sessions_in_week = sum(1 for date in session_dates if current_week_start <= date < week_end)
+        weekly_data.append({
+            "week": f"W{week_num}",
+            "attended": 1 if sessions_in_week > 0 else 0,
+            "session_count": sessions_in_week,
+            "week_start": current_week_start.strftime("%Y-%m-%d"),
+        })
+        current_week_start = week_end
+        week_num += 1
+
+    current_streak = longest_streak = 0
+    for week in weekly_data:
+        if week["attended"] == 1:
+            current_streak += 1
+            longest_streak = max(longest_streak, current_streak)
+        else:
+            current_streak = 0
+
+    regularity_scores = []
+    for gap in gaps:
+        deviation = abs(gap - 7)
+        regularity_scores.append(100 if deviation <= 3 else 70 if deviation <= 7 else 40 if deviation <= 14 else 10)
+    regularity_score = sum(regularity_scores) / len(regularity_scores) if regularity_scores else 0
+    streak_bonus = min(20, (longest_streak / weeks_in_period) * 20) if weeks_in_period > 0 else 0
+    consistency_score = round(min(100, attendance_rate * 0.4 + regularity_score * 0.4 + streak_bonus), 1)
+
+    return {
+        "consistency_score": consistency_score,
+        "average_gap_days": round(average_gap, 1),
+        "longest_streak_weeks": longest_streak,
+        "weekly_data": weekly_data,
+        "total_sessions": len(sessions),
+    }
+
+
+def mood_trend_per_patient(rows: List[Dict[str, Any]]) -> str:
+    """The extractor's mood trend for one patient (pipeline-shaped sessions)."""
+    sessions = [
+        {"session_num": number, "wave1": {"session_num": number, "mood_score": row["mood_score"],
+                                          "analyzed_at": row["session_date"]}}
+        for number, row in enumerate(rows, start=1)
+    ]
+    return ProgressMetricsExtractor._extract_mood_trends(sessions).insight
+
+
+def timed(fn: Callable[[], Any], repeats: int) -> tuple:
+    samples, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-patient loops vs batched NumPy progress analytics")
+    parser.add_argument("--patients", type=int, default=1000, help="Patients in the view")
+    parser.add_argument("--sessions", type=int, default=100, help="Sessions per patient")
+    parser.add_argument("--days", type=int, default=365, help="Consistency window")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per variant (median reported)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    patients = make_patients(args.patients, args.sessions)
+    dates = {pid: [row["session_date"] for row in rows] for pid, rows in patients.items()}
+    moods = {pid: [row["mood_score"] for row in rows] for pid, rows in patients.items()}
+
+    loop_consistency, before_c = timed(
+        lambda: {pid: consistency_per_patient(rows, args.days) for pid, rows in patients.items()}, args.repeats
+    )
+    batch_consistency, after_c = timed(lambda: consistency_batch(dates, days=args.days, now=NOW), args.repeats)
+    batch_scores, _ = timed(
+        lambda: consistency_batch(dates, days=args.days, now=NOW, include_weekly=False), args.repeats
+    )
+    loop_moods, before_m = timed(
+        lambda: {pid: mood_trend_per_patient(rows) for pid, rows in patients.items()}, args.repeats
+    )
+    batch_moods, after_m = timed(lambda: mood_trends_batch(moods), args.repeats)
+
+    fields = ("consistency_score", "average_gap_days", "longest_streak_weeks", "weekly_data", "total_sessions")
+    consistency_equal = all(
+        {key: after_c[pid][key] for key in fields} == before_c[pid] for pid in patients
+    )
+    moods_equal = all(after_m[pid]["insight"] == before_m[pid] for pid in patients)
+
+    results = {
+        "patients": args.patients,
+        "sessions_per_patient": args.sessions,
+        "days": args.days,
+        "consistency_ms": {
+            "per_patient": round(loop_consistency * 1000, 1),
+            "batched": round(batch_consistency * 1000, 1),
+            "batched_scores_only": round(batch_scores * 1000, 1),
+        },
+        "mood_trends_ms": {"per_patient": round(loop_moods * 1000, 1), "batched": round(batch_moods * 1000, 1)},
+        "identical_results": consistency_equal and moods_equal,
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"\n{args.patients} patients x {args.sessions} sessions, {args.days}-day window "
+          f"(median of {args.repeats})")
+    print(f"{'metric':>28} {'per-patient ms':>15} {'batched ms':>11} {'speedup':>8}")
+    rows = [
+        ("consistency", loop_consistency, batch_consistency),
+        ("consistency (scores only)", loop_consistency, batch_scores),
+        ("mood trends", loop_moods, batch_moods),
+    ]
+    for name, before, after in rows:
+        print(f"{name:>28} {before * 1000:>15.1f} {after * 1000:>11.1f} {before / after:>7.1f}x")
+    print(f"\nIdentical results: {results['identical_results']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Roadmap Compaction Benchmark
+
+Compares roadmap context building for a patient's Nth session at N = 10, 50
+and 200 synthetic sessions:
+
+- full: build_full_context (every previous session, re-read and re-serialized)
+- hierarchical: JourneyCompactor tiers (one stored row, incrementally compacted)
+
+For each it reports database reads, rows read, prompt tokens and the time to
+build the context and prompt. Runs against an in-memory Supabase stand-in; no
+API calls are made.
+
+Usage:
+    python scripts/benchmark_roadmap_compaction.py
+    python scripts/benchmark_roadmap_compaction.py --sessions 10 100 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from uuid import UUID
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.services.roadmap_generator import RoadmapGenerator
+from app.utils.token_budget import count_tokens
+from generate_roadmap import build_full_context, build_hierarchical_context
+
+PATIENT_ID = "00000000-0000-0000-0000-000000000001"
+DEFAULT_SESSION_COUNTS = [10, 50, 200]
+
+
+class MemoryQuery:
+    """Just enough of the supabase query builder for the roadmap context builders."""
+
+    def __init__(self, db: "MemorySupabase", table: str):
+        self.db = db
+        self.table = table
+        self.filters: List[Any] = []
+        self.order_key = None
+        self.upsert_row = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def order(self, column, desc=False):
+        self.order_key = column
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.upsert_row = row
+        return self
+
+    def execute(self):
+        rows = self.db.tables.setdefault(self.table, [])
+        if self.upsert_row is not None:
+            rows[:] = [r for r in rows if r["patient_id"] != self.upsert_row["patient_id"]]
+            rows.append(self.upsert_row)
+            self.db.writes += 1
+            return SimpleNamespace(data=[self.upsert_row])
+
+        data = [row for row in rows if all(match(row) for match in self.filters)]
+        if self.order_key:
+            data.sort(key=lambda row: row[self.order_key])
+        self.db.reads += 1
+        self.db.rows_read += len(data)
+        # Round-trip through JSON like a real response
+        return SimpleNamespace(data=json.loads(json.dumps(data)))
+
+
+class MemorySupabase:
+    def __init__(self):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.reads = self.rows_read = self.writes = 0
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def reset_counters(self) -> None:
+        self.reads = self.rows_read = self.writes = 0
+
+
+def synthetic_session(number: int) -> Dict[str, Any]:
+    topic = ["work stress", "family conflict", "sleep", "self-worth", "relationships"][number % 5]
+    return {
+        "id": f"00000000-0000-0000-0001-{number:012d}",
+        "patient_id": PATIENT_ID,
+        "session_date": (date(2024, 1, 1) + timedelta(weeks=number)).isoformat(),
+        "mood_score": 4 + (number % 5),
+        "topics": [topic.title(), "Coping skills"],
+        "action_items": ["Practice box breathing daily", "Journal one reframe per day"],
+        "technique": "CBT - Cognitive Restructuring",
+        "summary": f"Session {number} explored {topic} and practiced reframing anxious thoughts.",
+        "prose_analysis": f"In session {number} the patient discussed {topic}. " * 25,
+        "deep_analysis": {
+            "breakthrough_patterns": [f"Linked {topic} to an old belief about needing to be perfect."],
+            "themes": [
+                {"description": f"Recurring avoidance when {topic} comes up, eased by grounding skills."},
+                {"description": "Growing confidence applying CBT reframes outside of session."},
+            ],
+            "progress_indicators": {"symptom_reduction": {"detected": True, "description": "Fewer panic episodes."}},
+        },
+    }
+
+
+def insights_for(session: Dict[str, Any]) -> List[str]:
+    """Stand-in for SessionInsightsSummarizer output."""
+    topic = session["topics"][0].lower()
+    return [
+        f"Identified how {topic} triggers catastrophizing and practiced a balanced reframe in session.",
+        "Used box breathing to come down from a spike of anxiety during the week.",
+        "Named a people-pleasing pattern and chose one small boundary to try.",
+    ]
+
+
+def measure(generator: RoadmapGenerator, db: MemorySupabase, build) -> Dict[str, Any]:
+    db.reset_counters()
+    started = time.perf_counter()
+    context, prompt = build()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return {
+        "db_reads": db.reads,
+        "rows_read": db.rows_read,
+        "prompt_tokens": count_tokens(generator._get_system_prompt() + prompt),
+        "build_ms": round(elapsed_ms, 2),
+    }
+
+
+def run(session_counts: List[int]) -> List[Dict[str, Any]]:
+    generator = RoadmapGenerator(api_key="benchmark-key")
+    rows = []
+
+    for count in session_counts:
+        sessions = [synthetic_session(number) for number in range(1, count + 1)]
+        db = MemorySupabase()
+        db.tables["therapy_sessions"] = sessions
+        db.tables["patient_your_journey"] = []
+
+        # Sessions 1..N-1 arrive one at a time, as in production
+        for session in sessions[:-1]:
+            build_hierarchical_context(PATIENT_ID, session["id"], session["session_date"], insights_for(session), db)
+
+        current = sessions[-1]
+        current_data = {"wave1": {"session_id": current["id"], "summary": current["summary"]},
+                        "wave2": current["deep_analysis"], "insights": insights_for(current)}
+        patient = UUID(PATIENT_ID)
+
+        def full():
+            context = build_full_context(PATIENT_ID, current["id"], db)
+            return context, generator._build_full_context_prompt(patient, current_data, context, count, count)
+
+        def hierarchical():
+            context = build_hierarchical_context(
+                PATIENT_ID, current["id"], current["session_date"], insights_for(current), db
+            )
+            return context, generator._build_hierarchical_prompt(patient, current_data, context, count, count)
+
+        rows.append({"sessions": count, "strategy": "full", **measure(generator, db, full)})
+        rows.append({"sessions": count, "strategy": "hierarchical", **measure(generator, db, hierarchical)})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark roadmap context building vs session count")
+    parser.add_argument("--sessions", nargs="+", type=int, default=DEFAULT_SESSION_COUNTS,
+                        help="Session counts to benchmark")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rows = run(args.sessions)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'sessions':>8} {'strategy':>13} {'db reads':>9} {'rows read':>10} {'prompt tokens':>14} {'build ms':>9}")
+    for row in rows:
+        print(f"{row['sessions']:>8} {row['strategy']:>13} {row['db_reads']:>9} {row['rows_read']:>10} "
+              f"{row['prompt_tokens']:>14} {row['build_ms']:>9}")
+
+
+if __name__ == "__main__":
+    main()
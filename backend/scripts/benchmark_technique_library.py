@@ -0,0 +1,190 @@
+"""
+Technique Library Benchmark
+
+Compares lookups/second of the indexed TechniqueLibrary against the
+original linear scans (reproduced here as LinearTechniqueLibrary) on the
+shipped config/technique_library.json and on a synthetic library 10x its
+size. Queries mix exact names/aliases in other casing, one-character typos
+and strings that match nothing, as extracted techniques do.
+
+Usage:
+    python scripts/benchmark_technique_library.py
+    python scripts/benchmark_technique_library.py --scale 10 --queries 300 --json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.technique_library import Technique, TechniqueLibrary
+
+SHIPPED = Path(__file__).parent.parent / "config" / "technique_library.json"
+
+
+class LinearTechniqueLibrary(TechniqueLibrary):
+    """The pre-index implementation: every lookup scans every technique, no memoization."""
+
+    def exact_match(self, technique_str: str) -> Optional[Technique]:
+        technique_lower = technique_str.lower().strip()
+        for technique in self.techniques:
+            if technique.name.lower() == technique_lower:
+                return technique
+            if technique.formatted_name.lower() == technique_lower:
+                return technique
+            for alias in technique.aliases:
+                if alias.lower() == technique_lower:
+                    return technique
+        return None
+
+    def fuzzy_match(self, technique_str: str, threshold: float = 0.8) -> Optional[Tuple[Technique, float]]:
+        technique_lower = technique_str.lower().strip()
+        best_match = None
+        best_score = 0.0
+        for technique in self.techniques:
+            score = SequenceMatcher(None, technique_lower, technique.name.lower()).ratio()
+            if score > best_score:
+                best_score = score
+                best_match = technique
+            for alias in technique.aliases:
+                score = SequenceMatcher(None, technique_lower, alias.lower()).ratio()
+                if score > best_score:
+                    best_score = score
+                    best_match = technique
+        if best_score >= threshold:
+            return (best_match, best_score)
+        return None
+
+    def validate_and_standardize(self, technique_str: str, fuzzy_threshold: float = 0.8):
+        return self._validate_and_standardize(technique_str, fuzzy_threshold)
+
+    def get_technique_definition(self, formatted_name: str) -> Optional[str]:
+        for technique in self.techniques:
+            if technique.formatted_name == formatted_name:
+                return technique.definition
+        return None
+
+
+def synthetic_library(scale: int, path: Path) -> None:
+    """Write the shipped library with every technique repeated `scale` times under distinct names."""
+    with open(SHIPPED) as f:
+        data = json.load(f)
+    rng = random.Random(42)
+    words = ["Guided", "Structured", "Brief", "Somatic", "Relational", "Adaptive", "Integrative", "Focused", "Graded"]
+
+    for modality in data["modalities"].values():
+        techniques = []
+        for technique in modality["techniques"]:
+            techniques.append(technique)
+            for copy in range(1, scale):
+                prefix = f"{rng.choice(words)} {rng.choice(words)} {copy}"
+                techniques.append({
+                    **technique,
+                    "name": f"{prefix} {technique['name']}",
+                    "aliases": [f"{prefix} {alias}" for alias in technique.get("aliases", [])],
+                })
+        modality["techniques"] = techniques
+
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def _typo(text: str, rng: random.Random) -> str:
+    if len(text) < 4:
+        return text + "s"
+    i = rng.randrange(1, len(text) - 2)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def make_queries(library: TechniqueLibrary, count: int) -> Dict[str, List[str]]:
+    rng = random.Random(7)
+    names = [text for t in library.techniques for text in (t.name, t.formatted_name, *t.aliases)]
+    return {
+        "exact": [rng.choice(names).upper() for _ in range(count)],
+        "typo": [_typo(rng.choice(names).lower(), rng) for _ in range(count)],
+        "miss": [f"unrelated intervention {n}" for n in range(count)],
+        "definition": [rng.choice(library.techniques).formatted_name for _ in range(count)],
+    }
+
+
+def rate(fn: Callable[[str], Any], queries: List[str], min_seconds: float = 0.3) -> float:
+    """Lookups per second (repeats the query list until min_seconds have passed)."""
+    done = 0
+    start = time.perf_counter()
+    while True:
+        for query in queries:
+            fn(query)
+        done += len(queries)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return done / elapsed
+
+
+def run(path: Path, queries: int) -> Dict[str, Any]:
+    linear = LinearTechniqueLibrary(path)
+    indexed = TechniqueLibrary(path)
+    workload = make_queries(indexed, queries)
+
+    def cold_validate(query: str):
+        indexed._validate_cached.cache_clear()
+        return indexed.validate_and_standardize(query)
+
+    cases = {
+        "exact_match": (lambda q: linear.exact_match(q), indexed.exact_match, workload["exact"]),
+        "fuzzy_match (typos)": (lambda q: linear.fuzzy_match(q), indexed.fuzzy_match, workload["typo"]),
+        "fuzzy_match (misses)": (lambda q: linear.fuzzy_match(q), indexed.fuzzy_match, workload["miss"]),
+        "validate (uncached)": (
+            linear.validate_and_standardize, cold_validate, workload["typo"] + workload["exact"]
+        ),
+        "validate (repeated)": (
+            linear.validate_and_standardize, indexed.validate_and_standardize, workload["typo"][:20] * 10
+        ),
+        "get_technique_definition": (
+            linear.get_technique_definition, indexed.get_technique_definition, workload["definition"]
+        ),
+    }
+
+    rows = {}
+    for name, (before, after, items) in cases.items():
+        rows[name] = {"linear_per_s": round(rate(before, items)), "indexed_per_s": round(rate(after, items))}
+    return {"techniques": len(indexed.techniques), "entries": len(indexed._fuzzy_entries), "lookups": rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark technique library lookups: linear scan vs indexes")
+    parser.add_argument("--scale", type=int, default=10, help="Synthetic library size as a multiple of the shipped one")
+    parser.add_argument("--queries", type=int, default=200, help="Distinct queries per lookup kind")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic = Path(tmp) / "technique_library.json"
+        synthetic_library(args.scale, synthetic)
+        results = {
+            "shipped": run(SHIPPED, args.queries),
+            f"synthetic_{args.scale}x": run(synthetic, args.queries),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for label, result in results.items():
+        print(f"\n{label}: {result['techniques']} techniques, {result['entries']} names/aliases")
+        print(f"{'lookup':>26} {'linear/s':>12} {'indexed/s':>12} {'speedup':>9}")
+        for name, row in result["lookups"].items():
+            speedup = row["indexed_per_s"] / row["linear_per_s"]
+            print(f"{name:>26} {row['linear_per_s']:>12,} {row['indexed_per_s']:>12,} {speedup:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
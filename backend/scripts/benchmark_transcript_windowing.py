@@ -0,0 +1,129 @@
+"""
+Transcript Windowing Benchmark
+
+Fits the mock therapy sessions into a sweep of transcript token budgets and
+reports the prompt-token reduction, the time spent windowing, and how much of
+the breakthrough evidence from breakthrough_analysis_all_sessions.json survives
+in the windowed transcript. Evidence retention is an offline proxy for output
+stability: a quote the model cited on the full transcript is still there for
+it to cite on the windowed one. No API calls are made.
+
+Usage:
+    python scripts/benchmark_transcript_windowing.py
+    python scripts/benchmark_transcript_windowing.py --budgets 1.0 0.5 0.25 --json
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.token_budget import fit_transcript
+
+MOCK_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'mock-therapy-data'))
+SPEAKER_ROLES = {"SPEAKER_00": "Therapist", "SPEAKER_01": "Client"}
+DEFAULT_BUDGETS = [1.0, 0.75, 0.5, 0.35]
+
+# First words of a quoted evidence line, e.g. “I never connected those things…” [16:18]
+QUOTE_PATTERN = re.compile(r"[“\"](.+?)[”\"]")
+
+
+def render(segment: Dict[str, Any]) -> str:
+    """Same line format as TopicExtractor."""
+    text = segment.get("text", "").strip()
+    if not text:
+        return ""
+    start = segment.get("start", 0)
+    role = SPEAKER_ROLES.get(segment.get("speaker"), segment.get("speaker"))
+    return f"[{int(start // 60):02d}:{int(start % 60):02d}] {role}: {text}"
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"[^a-z0-9 ]", "", text.lower().replace("’", "'"))
+
+
+def load_sessions() -> List[Dict[str, Any]]:
+    sessions = []
+    for path in sorted(glob.glob(os.path.join(MOCK_DATA_DIR, "sessions", "*.json"))):
+        with open(path) as f:
+            data = json.load(f)
+        sessions.append({"id": data["id"], "segments": data["aligned_segments"]})
+    return sessions
+
+
+def load_evidence() -> Dict[str, List[str]]:
+    """Session id -> normalized opening words of each breakthrough evidence quote."""
+    with open(os.path.join(MOCK_DATA_DIR, "breakthrough_analysis_all_sessions.json")) as f:
+        results = json.load(f)["results"]
+    evidence = {}
+    for result in results:
+        breakthrough = result.get("primary_breakthrough") or {}
+        quotes = QUOTE_PATTERN.findall(breakthrough.get("evidence", ""))
+        evidence[result["session_id"]] = [" ".join(normalize(q).split()[:6]) for q in quotes]
+    return evidence
+
+
+def run(budget_fractions: List[float]) -> List[Dict[str, Any]]:
+    sessions = load_sessions()
+    evidence = load_evidence()
+    rows = []
+
+    for fraction in budget_fractions:
+        original = kept = quotes = retained = 0
+        elapsed = 0.0
+        for session in sessions:
+            full = fit_transcript(session["segments"], sys.maxsize, render)
+            started = time.perf_counter()
+            fitted = fit_transcript(session["segments"], int(full.report.original_tokens * fraction), render)
+            elapsed += time.perf_counter() - started
+
+            original += fitted.report.original_tokens
+            kept += fitted.report.kept_tokens
+            # Only quotes that can be located in the full transcript count
+            full_text = " ".join(normalize(full.text).split())
+            session_quotes = [q for q in evidence.get(session["id"], []) if q in full_text]
+            text = " ".join(normalize(fitted.text).split())
+            quotes += len(session_quotes)
+            retained += sum(1 for quote in session_quotes if quote in text)
+
+        rows.append({
+            "budget": fraction,
+            "sessions": len(sessions),
+            "original_tokens": original,
+            "kept_tokens": kept,
+            "reduction": round(1 - kept / original, 3) if original else 0.0,
+            "evidence_quotes": quotes,
+            "evidence_retained": round(retained / quotes, 3) if quotes else 1.0,
+            "ms_per_session": round(elapsed * 1000 / len(sessions), 2),
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark transcript windowing on the mock sessions")
+    parser.add_argument("--budgets", nargs="+", type=float, default=DEFAULT_BUDGETS,
+                        help="Budgets as fractions of each session's full transcript tokens")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rows = run(args.budgets)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'budget':>7} {'tokens':>15} {'reduction':>10} {'evidence kept':>14} {'ms/session':>11}")
+    for row in rows:
+        tokens = f"{row['kept_tokens']}/{row['original_tokens']}"
+        evidence = f"{row['evidence_retained']:.0%} of {row['evidence_quotes']}"
+        print(f"{row['budget']:>7.0%} {tokens:>15} {row['reduction']:>10.1%} {evidence:>14} {row['ms_per_session']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Wave 2 DAG Benchmark
+
+Wall time of the demo Wave 2 pipeline (scripts/seed_wave2_analysis.py) on a
+synthetic patient, against the serial sum of its steps, with the event
+loop's longest stall while it runs.
+
+Only the network is stood in for, and it blocks the way the real call
+would: httpx's sync transport sleeps with time.sleep (the calling thread
+is stuck for the round trip), its async transport awaits asyncio.sleep.
+Everything above it is the real code: DeepAnalyzer and ProseGenerator
+through the OpenAI SDK, the Supabase async admin client for the session
+reads and writes, and the cumulative context store. Roadmap and session
+bridge generation are sync scripts with their own DB/LLM round trips, so
+they are replaced by functions that time.sleep in the worker thread the
+pipeline runs them on. Pipeline events go through the real PipelineLogger:
+its writer thread inserts them over the stood-in network.
+
+Modes:
+- async: the pipeline as it is
+- sync-llm: deep analysis and prose call the sync OpenAI client from the
+  event loop (how they ran before), showing what blocking calls do to the
+  DAG's overlap and to the loop
+- sync-events: each pipeline event is written (log file, pipeline_events
+  insert, bus publish) on the calling thread, as log_event() did before it
+  queued them for its writer thread
+
+An untimed warm-up run goes first (imports, client creation and the
+tokenizer load happen once per API process, at startup or on its first
+request). The DAG report file is stubbed, and the benchmark patient's
+pipeline log file is removed after each run.
+
+Usage:
+    python scripts/benchmark_wave2_dag.py
+    python scripts/benchmark_wave2_dag.py --sessions 12 --llm-ms 300 --trials 5 --json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import patch
+from urllib.parse import urlparse
+
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("SUPABASE_URL", "http://supabase.benchmark")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "benchmark.service.key")
+os.environ.setdefault("SUPABASE_KEY", "benchmark.anon.key")  # Sync client (pipeline event inserts)
+os.environ["LLM_CACHE_BACKEND"] = "none"  # Every trial makes the same requests
+
+# Add parent directory (and scripts/, for the seeding script's own imports) to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import httpx
+
+PATIENT_ID = "00000000-0000-0000-0000-000000000001"
+MODES = ("async", "sync-llm", "sync-events")
+
+DEEP_ANALYSIS = {
+    "progress_indicators": {},
+    "therapeutic_insights": {"key_realizations": ["Noticed the pattern"], "patterns": []},
+    "coping_skills": {"learned": [], "proficiency": {}},
+    "therapeutic_relationship": {"engagement_level": "high"},
+    "recommendations": {},
+    "confidence_score": 0.8,
+}
+PROSE = " ".join(["This session showed steady progress."] * 90)
+
+
+def make_sessions(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"00000000-0000-0000-0001-{number:012d}",
+            "patient_id": PATIENT_ID,
+            "session_date": f"2025-{1 + number // 28:02d}-{1 + number % 28:02d}",
+            "transcript": [
+                {"speaker": "SPEAKER_00", "text": "How was your week?", "start": 0, "end": 2},
+                {"speaker": "SPEAKER_01", "text": "Better than the last one, mostly.", "start": 2, "end": 5},
+            ],
+            "mood_score": 5.0,
+            "topics": ["Anxiety"],
+            "technique": "CBT",
+            "summary": "Worked on anxiety.",
+        }
+        for number in range(count)
+    ]
+
+
+# =============================================================================
+# Network stand-ins
+# =============================================================================
+
+class Network:
+    """Canned responses for OpenAI and PostgREST, with a latency per host."""
+
+    def __init__(self, sessions: List[Dict[str, Any]], llm_seconds: float, db_seconds: float):
+        self.sessions = sessions
+        self.llm_seconds = llm_seconds
+        self.db_seconds = db_seconds
+
+    def latency(self, request: httpx.Request) -> float:
+        return self.llm_seconds if request.url.host == "api.openai.com" else self.db_seconds
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host == "api.openai.com":
+            body = json.loads(request.content)
+            json_mode = body.get("response_format", {}).get("type") == "json_object"
+            content = json.dumps(DEEP_ANALYSIS) if json_mode else PROSE
+            return httpx.Response(200, json={
+                "id": "chatcmpl-benchmark",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500},
+            }, request=request)
+
+        table = urlparse(str(request.url)).path.rsplit("/", 1)[-1]
+        if request.method == "GET" and table == "therapy_sessions":
+            return httpx.Response(200, json=self.sessions, request=request)
+        if request.method == "GET":
+            return httpx.Response(200, json=[], request=request)
+        # Written rows (one per inserted row, as return=representation gives them)
+        body = json.loads(request.content) if request.content else {}
+        rows = body if isinstance(body, list) else [body]
+        written = [{"patient_id": PATIENT_ID, **row, "id": index} for index, row in enumerate(rows)]
+        return httpx.Response(200, json=written, request=request)
+
+    def patches(self) -> List[Any]:
+        network = self
+
+        def handle_request(transport, request):
+            time.sleep(network.latency(request))
+            return network.respond(request)
+
+        async def handle_async_request(transport, request):
+            await asyncio.sleep(network.latency(request))
+            return network.respond(request)
+
+        return [
+            patch.object(httpx.HTTPTransport, "handle_request", handle_request),
+            patch.object(httpx.AsyncHTTPTransport, "handle_async_request", handle_async_request),
+        ]
+
+
+def _sync_llm_patch():
+    """Deep analysis and prose on the sync client, called from the loop (the pre-fix behavior)"""
+    from app.services.base_ai_generator import AsyncAIGenerator
+    from app.services.openai_client_registry import get_sync_client
+
+    async def create_on_loop(self, messages, **api_kwargs):
+        return get_sync_client(self.api_key).chat.completions.create(
+            model=self.model, messages=messages, **api_kwargs
+        )
+
+    return patch.object(AsyncAIGenerator, "_create_chat_completion_async", create_on_loop)
+
+
+def _sync_events_patch():
+    """Pipeline events written on the calling thread (the pre-fix logger)"""
+    from app.utils.pipeline_logger import PipelineEventWriter
+
+    def write_inline(self, log_file, log_entry):
+        self._write([(log_file, log_entry)])
+        return True
+
+    return patch.object(PipelineEventWriter, "enqueue", write_inline)
+
+
+def mode_patches(mode: str) -> List[Any]:
+    """Patches that turn the current pipeline into the given mode"""
+    return {"async": [], "sync-llm": [_sync_llm_patch()], "sync-events": [_sync_events_patch()]}[mode]
+
+
+def drain_events() -> None:
+    """Write queued pipeline events (network patches still active), then drop the log file"""
+    from app.utils.pipeline_logger import get_event_writer
+
+    get_event_writer().flush(60)
+    log_file = Path(__file__).resolve().parent.parent / "logs" / f"pipeline_{PATIENT_ID}.log"
+    log_file.unlink(missing_ok=True)
+
+
+# =============================================================================
+# Runs
+# =============================================================================
+
+async def _watch_loop(stalls: List[float], interval: float = 0.01) -> None:
+    """Record how late each 10ms tick fires (time the loop spent blocked)"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - start - interval)
+
+
+async def run_once(mode: str, args: argparse.Namespace) -> Dict[str, float]:
+    import seed_wave2_analysis
+    from app.database import close_async_supabase
+
+    def sync_step(seconds: float):
+        return lambda patient_id, session_id: time.sleep(seconds)
+
+    network = Network(make_sessions(args.sessions), args.llm_ms / 1000, args.db_ms / 1000)
+    with ExitStack() as stack:
+        for stub in network.patches() + [
+            patch.object(seed_wave2_analysis, "save_report", lambda *a, **k: None),
+            patch.object(seed_wave2_analysis, "generate_roadmap_for_session", sync_step(args.roadmap_ms / 1000)),
+            patch.object(seed_wave2_analysis, "generate_session_bridge_for_session", sync_step(args.bridge_ms / 1000)),
+        ] + mode_patches(mode):
+            stack.enter_context(stub)
+        stdout, sys.stdout = sys.stdout, stack.enter_context(open(os.devnull, "w"))
+
+        stalls: List[float] = []
+        watcher = asyncio.create_task(_watch_loop(stalls))
+        try:
+            start = time.perf_counter()
+            report = await seed_wave2_analysis.main(PATIENT_ID)
+            wall = time.perf_counter() - start
+        finally:
+            watcher.cancel()
+            await asyncio.to_thread(drain_events)
+            sys.stdout = stdout
+            await close_async_supabase()
+
+    saved = sum(1 for name, node in report.nodes.items() if name.startswith("save:") and node.status == "completed")
+    if saved != args.sessions:
+        raise RuntimeError(f"{mode}: only {saved}/{args.sessions} sessions completed")
+    return {
+        "wall_seconds": round(wall, 2),
+        "serial_seconds": round(report.serial_ms / 1000, 2),
+        "critical_path_seconds": round(report.critical_path_ms / 1000, 2),
+        "max_loop_stall_ms": round(max(stalls, default=0.0) * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Wave 2 DAG with blocking network stand-ins")
+    parser.add_argument("--sessions", type=int, default=12, help="Sessions for the patient")
+    parser.add_argument("--llm-ms", type=float, default=300, help="OpenAI round trip")
+    parser.add_argument("--db-ms", type=float, default=20, help="Supabase round trip")
+    parser.add_argument("--roadmap-ms", type=float, default=150, help="Roadmap generation (sync, in a thread)")
+    parser.add_argument("--bridge-ms", type=float, default=100, help="Session bridge generation (sync, in a thread)")
+    parser.add_argument("--trials", type=int, default=3, help="Runs per mode (median wall, worst stall)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    asyncio.run(run_once("async", args))  # Warm-up
+
+    results = {}
+    for mode in MODES:
+        runs = [asyncio.run(run_once(mode, args)) for _ in range(args.trials)]
+        results[mode] = {key: round(statistics.median(run[key] for run in runs), 2) for key in runs[0]}
+        results[mode]["max_loop_stall_ms"] = max(run["max_loop_stall_ms"] for run in runs)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"\nWave 2 for {args.sessions} sessions, median of {args.trials} (LLM {args.llm_ms:g}ms, DB {args.db_ms:g}ms, "
+          f"roadmap {args.roadmap_ms:g}ms, bridge {args.bridge_ms:g}ms)")
+    print(f"{'mode':>11} {'wall s':>8} {'serial s':>9} {'critical s':>11} {'loop stall ms':>14}")
+    for mode, row in results.items():
+        print(f"{mode:>11} {row['wall_seconds']:>8} {row['serial_seconds']:>9} "
+              f"{row['critical_path_seconds']:>11} {row['max_loop_stall_ms']:>14}")
+
+
+if __name__ == "__main__":
+    main()
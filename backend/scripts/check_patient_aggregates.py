@@ -0,0 +1,81 @@
+"""
+Patient Aggregates Consistency Check
+
+Rebuilds patients' materialized aggregates (consistency + progress metrics)
+from therapy_sessions and compares them with the stored rows, rewriting any
+that drifted (sessions written outside the API, concurrent updates from
+separate processes, rows from an older aggregates version). Job workers
+queue the same checks for every patient once per
+AGGREGATES_CHECK_INTERVAL_HOURS (analysis_jobs.schedule_aggregates_sweep);
+run this script for an immediate or single-patient check.
+
+By default a check job is queued per patient for the job workers
+(deduplicated per patient); --now runs the checks in this process and
+prints the report.
+
+Usage:
+    python scripts/check_patient_aggregates.py
+    python scripts/check_patient_aggregates.py --patient <uuid> --now
+    python scripts/check_patient_aggregates.py --now --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import close_async_supabase, get_async_supabase
+from app.services.analysis_jobs import enqueue_aggregates_check
+from app.services.patient_aggregates import PatientAggregatesStore
+
+
+async def patient_ids() -> List[str]:
+    db = await get_async_supabase()
+    response = await db.table("patients").select("id").execute()
+    return [row["id"] for row in response.data or []]
+
+
+async def run(patient: Optional[str], now: bool) -> List[Dict[str, Any]]:
+    try:
+        ids = [patient] if patient else await patient_ids()
+        if not now:
+            jobs = [await enqueue_aggregates_check(patient_id) for patient_id in ids]
+            return [{"patient_id": patient_id, "job_key": job.key, "status": job.status}
+                    for patient_id, job in zip(ids, jobs)]
+
+        store = PatientAggregatesStore()
+        return [await store.check(patient_id) for patient_id in ids]
+    finally:
+        await close_async_supabase()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check materialized patient aggregates against therapy_sessions")
+    parser.add_argument("--patient", help="Check one patient (default: every patient)")
+    parser.add_argument("--now", action="store_true", help="Run the checks here instead of queueing jobs")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.patient, args.now))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for result in results:
+        drift = f" ({', '.join(result['drift'])})" if result.get("drift") else ""
+        print(f"{result['patient_id']}: {result['status']}{drift}")
+    if args.now:
+        repaired = sum(1 for result in results if result["status"] != "ok")
+        print(f"\n{len(results)} patients checked, {repaired} rebuilt")
+    else:
+        print(f"\n{len(results)} aggregates check jobs queued")
+
+
+if __name__ == "__main__":
+    main()
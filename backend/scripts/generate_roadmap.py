@@ -22,6 +22,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from app.services.session_insights_summarizer import SessionInsightsSummarizer
 from app.services.roadmap_generator import RoadmapGenerator
+from app.services.journey_compactor import JourneyCompactor
 from app.database import get_supabase_admin
 from app.utils.generation_metadata import create_generation_metadata
 
@@ -95,7 +96,7 @@ def generate_roadmap_for_session(patient_id: str, session_id: str):
     strategy = os.getenv("ROADMAP_COMPACTION_STRATEGY", "hierarchical").lower()
     log_step("Step 3/5", f"Building context (compaction strategy: {strategy})...")
 
-    context = build_context(patient_id, session_id, insights, supabase)
+    context = build_context(patient_id, current_session, insights, supabase)
 
     log_success(f"Context built ({len(json.dumps(context))} characters)")
 
@@ -186,7 +187,7 @@ def generate_roadmap_for_session(patient_id: str, session_id: str):
             generation_duration_ms=metadata["generation_duration_ms"],
             last_session_id=UUID(session_id),
             compaction_strategy=metadata.get("compaction_strategy", "hierarchical"),
-            metadata_json={"tier_counts": metadata.get("tier_counts", {})}
+            metadata_json={"tier_counts": context.get("tier_counts", {})}
         )
         metadata_id = gen_metadata["id"]
         log_success(f"Generation metadata created: {metadata_id[:8]}...")
@@ -220,18 +221,21 @@ def generate_roadmap_for_session(patient_id: str, session_id: str):
     print(f"{'='*60}\n", flush=True)
 
 
-def build_context(patient_id: str, current_session_id: str, current_insights: list[str], supabase) -> dict:
+def build_context(patient_id: str, current_session: dict, current_insights: list[str], supabase) -> dict:
     """
     Build context based on compaction strategy.
 
     Returns context dict with structure specific to the selected strategy.
     """
     strategy = os.getenv("ROADMAP_COMPACTION_STRATEGY", "hierarchical").lower()
+    current_session_id = current_session["id"]
 
     strategy_builders = {
         "full": lambda: build_full_context(patient_id, current_session_id, supabase),
         "progressive": lambda: build_progressive_context(patient_id, current_session_id, supabase),
-        "hierarchical": lambda: build_hierarchical_context(patient_id, current_session_id, current_insights, supabase),
+        "hierarchical": lambda: build_hierarchical_context(
+            patient_id, current_session_id, current_session.get("session_date"), current_insights, supabase
+        ),
     }
 
     if strategy not in strategy_builders:
@@ -286,45 +290,25 @@ def build_progressive_context(patient_id: str, current_session_id: str, supabase
     return {"previous_roadmap": roadmap_result.data[0]["roadmap_data"]}
 
 
-def extract_insights_from_deep_analysis(deep_analysis: dict, max_insights: int = 5) -> list[str]:
-    """Extract key insights from deep_analysis structure."""
-    insights = []
-
-    if "breakthrough_patterns" in deep_analysis:
-        insights.extend(deep_analysis["breakthrough_patterns"][:2])
-    if "themes" in deep_analysis:
-        insights.extend([theme["description"] for theme in deep_analysis.get("themes", [])[:2]])
-
-    return insights[:max_insights]
-
-
-def truncate_prose(prose: str, max_length: int) -> str:
-    """Truncate prose to max_length, adding ellipsis if needed."""
-    if not prose:
-        return ""
-    if len(prose) <= max_length:
-        return prose
-    return prose[:max_length] + "..."
-
-
-def build_hierarchical_context(patient_id: str, current_session_id: str, current_insights: list[str], supabase) -> dict:
+def build_hierarchical_context(
+    patient_id: str,
+    current_session_id: str,
+    current_session_date: str,
+    current_insights: list[str],
+    supabase
+) -> dict:
     """
-    Build hierarchical context (tiered summaries)
+    Build hierarchical context (tiered summaries) from the stored journey tiers
 
-    Tier 1: Last 1-3 sessions - Full insights (3-5 per session)
-    Tier 2: Mid-range (sessions 4-7) - Paragraph summaries
-    Tier 3: Long-term (sessions 8+) - Journey arc summary
+    Folds the current session into patient_journey_tiers (compacting only the
+    window it closes), then builds the context from the stored tiers:
+    Tier 1: Recent sessions - Full insights
+    Tier 2: 5-session paragraph summaries
+    Tier 3: Long-term journey arc
     """
-    # Get all previous sessions with Wave 2 complete
-    sessions_result = supabase.table("therapy_sessions") \
-        .select("id, session_date, deep_analysis, prose_analysis") \
-        .eq("patient_id", patient_id) \
-        .neq("id", current_session_id) \
-        .order("session_date") \
-        .execute()
-
-    sessions_with_wave2 = [s for s in sessions_result.data if s.get("prose_analysis")]
-    num_sessions = len(sessions_with_wave2)
+    tiers = JourneyCompactor(supabase).add_session(
+        patient_id, current_session_id, current_session_date, current_insights
+    )
 
     # Get previous roadmap if exists
     roadmap_result = supabase.table("patient_your_journey") \
@@ -334,37 +318,8 @@ def build_hierarchical_context(patient_id: str, current_session_id: str, current
 
     previous_roadmap = roadmap_result.data[0]["roadmap_data"] if roadmap_result.data else None
 
-    # Distribute sessions into tiers (from most recent backwards)
-    sessions_reversed = list(reversed(sessions_with_wave2))
-
-    # Tier 1: Last 1-3 sessions (full insights) - dict format for generator
-    tier1_summaries = {}
-    for session in sessions_reversed[:3]:
-        session_key = f"Session {session['session_date'][:10]}"
-        tier1_summaries[session_key] = extract_insights_from_deep_analysis(session.get("deep_analysis", {}))
-
-    # Tier 2: Sessions 4-7 (paragraph summaries) - dict format for generator
-    tier2_summaries = {}
-    if num_sessions >= 4:
-        for session in sessions_reversed[3:7]:
-            session_range = f"Session {session['session_date'][:10]}"
-            tier2_summaries[session_range] = truncate_prose(session.get("prose_analysis", ""), 300)
-
-    # Tier 3: Sessions 8+ (journey arc - combine into single narrative)
-    tier3_summary = None
-    if num_sessions >= 8:
-        arc_pieces = [
-            f"{session['session_date'][:10]}: {session.get('prose_analysis', '').split('.')[0]}"
-            for session in sessions_reversed[7:]
-        ]
-        tier3_summary = " | ".join(arc_pieces)
-
-    return {
-        "tier1_summaries": tier1_summaries,
-        "tier2_summaries": tier2_summaries,
-        "tier3_summary": tier3_summary,
-        "previous_roadmap": previous_roadmap
-    }
+    # Current session is passed to the generator separately
+    return tiers.to_context(exclude_session_id=current_session_id, previous_roadmap=previous_roadmap)
 
 
 def estimate_cost(context: dict, roadmap: dict) -> float:
@@ -0,0 +1,82 @@
+"""
+Analysis Job Worker
+
+Runs queued analysis jobs (full pipeline, breakthrough, Wave 1, aggregates
+checks) outside the API process. Start as many as needed, on this host
+(sqlite queue) or on any host that reaches the Redis broker
+(JOB_QUEUE_BACKEND=redis); they share the queue and never run the same job
+twice. With JOB_WORKER_EMBEDDED=false the API leaves all jobs to these
+workers (the Procfile `worker` process). Each worker also queues the periodic aggregates
+sweep (once per AGGREGATES_CHECK_INTERVAL_HOURS across all workers).
+
+Stops gracefully on SIGINT/SIGTERM: in-flight jobs get a grace period, and
+any cut off are redelivered to another worker once their lease expires.
+
+Usage:
+    python scripts/run_job_worker.py
+    python scripts/run_job_worker.py --concurrency 8
+    python scripts/run_job_worker.py --drain --json   # run until the queue is empty
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.analysis_jobs import ANALYSIS_HANDLERS, ANALYSIS_SCHEDULES
+from app.services.job_worker import JobWorker
+
+
+async def run(args: argparse.Namespace) -> JobWorker:
+    worker = JobWorker(
+        ANALYSIS_HANDLERS,
+        concurrency=args.concurrency,
+        poll_interval=args.poll_interval,
+        schedules=ANALYSIS_SCHEDULES,
+    )
+
+    if args.drain:
+        await worker.run_until_idle()
+        return worker
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    runner = asyncio.create_task(worker.run())
+    await stop.wait()
+    print("Stopping job worker...", flush=True)
+    await worker.stop(grace_seconds=args.grace)
+    await runner
+    return worker
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run analysis jobs from the durable job queue")
+    parser.add_argument("--concurrency", type=int, default=None, help="Jobs in flight (default JOB_WORKER_CONCURRENCY)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls of an empty queue")
+    parser.add_argument("--grace", type=float, default=30.0, help="Seconds to let in-flight jobs finish on shutdown")
+    parser.add_argument("--drain", action="store_true", help="Exit once no jobs are claimable")
+    parser.add_argument("--json", action="store_true", help="Print final worker stats as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    worker = asyncio.run(run(args))
+    stats = {**worker.get_stats(), "queue": worker.queue.stats(), "elapsed_s": round(time.perf_counter() - start, 2)}
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return
+    print(f"Worker {stats['worker_id']}: {stats['completed']} completed, {stats['failed']} failed attempts "
+          f"in {stats['elapsed_s']}s (queue: {stats['queue']})")
+
+
+if __name__ == "__main__":
+    main()
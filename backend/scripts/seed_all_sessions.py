@@ -23,7 +23,7 @@ from pathlib import Path
 from datetime import datetime
 import os
 import asyncio
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Callable, Optional
 
 # Add backend to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -224,12 +224,21 @@ async def process_single_session(
         return (False, f"Error processing {filename}: {e}")
 
 
-async def seed_all_sessions_async(patient_id: str):
+async def seed_all_sessions_async(
+    patient_id: str,
+    on_progress: Optional[Callable[..., None]] = None
+):
     """
     Main async function: Load all transcripts and populate database in parallel
 
+    Importable: the demo seeding pool (app/services/demo_seeding.py) runs it
+    in the API process.
+
     Args:
         patient_id: UUID of the patient to populate sessions for
+        on_progress: Called as each session finishes, with keyword args
+            completed, total, status ("complete" | "failed"), session_date
+            and error
 
     Returns:
         0 if all successful, 1 if any failures
@@ -242,9 +251,25 @@ async def seed_all_sessions_async(patient_id: str):
     print(f"Concurrency: {len(SESSION_FILES)} parallel operations")
     print()
 
+    completed = 0
+
+    async def run_session(filename: str, session_date: str, index: int) -> Tuple[bool, str]:
+        nonlocal completed
+        ok, message = await process_single_session(patient_id, filename, session_date, index, len(SESSION_FILES))
+        completed += 1
+        if on_progress is not None:
+            on_progress(
+                completed=completed,
+                total=len(SESSION_FILES),
+                status="complete" if ok else "failed",
+                session_date=session_date,
+                error=None if ok else message
+            )
+        return ok, message
+
     # Create tasks for all sessions (dynamic parallelization)
     tasks = [
-        process_single_session(patient_id, filename, session_date, i, len(SESSION_FILES))
+        run_session(filename, session_date, i)
         for i, (filename, session_date) in enumerate(SESSION_FILES, 1)
     ]
 
@@ -3,24 +3,34 @@
 Wave 2 Analysis Script - Demo Seeding with Cumulative Context
 ==============================================================
 Runs Wave 2 deep clinical analysis on demo sessions WITH cumulative context:
-- Each session analysis includes ALL previous sessions as context
-- Builds nested context structure (Session N references Sessions 1...N-1)
+- Each session analysis includes context from all previous sessions
+- Context is bounded: last 3 sessions in full + compacted summary of older ones
 - Creates "therapeutic journey" tracking progress over time
 
 Usage:
     python scripts/seed_wave2_analysis.py <patient_id>
 
-Cumulative Context Structure:
+    # Or in-process (how the demo seeding pool runs it)
+    report = await main(patient_id, on_progress=report_progress)
+
+Cumulative Context Structure (see app/services/cumulative_context.py):
     Session 1: No context
-    Session 2: {session_01_wave1, session_01_wave2}
-    Session 3: {previous_context: {...}, session_02_wave1, session_02_wave2}
-    Session 4: {previous_context: {previous_context: {...}}, session_03_wave1, session_03_wave2}
+    Session 2: {sessions_included: 1, recent_sessions: [session 1]}
+    Session 5: {sessions_included: 4, earlier_sessions: {summary of 1}, recent_sessions: [2, 3, 4]}
 
 This script:
 - Fetches all sessions for patient (chronologically)
-- Processes sequentially (must maintain cumulative context)
-- Each session gets context from all prior sessions
+- Runs Wave 2 as a DAG (app/services/dag_scheduler.py): deep analysis of
+  session N waits only for session N-1's context, so it overlaps session
+  N-1's prose, roadmap and session bridge generation
+- Rebuilds the patient's stored cumulative context from scratch as it goes
 - Updates database with Wave 2 deep_analysis JSONB
+- Makes every LLM and database call on async clients (roadmap and session
+  bridge generation, which are sync, run in worker threads) and queues its
+  pipeline events for PipelineLogger's writer thread, so no network round
+  trip blocks the event loop the DAG and the API share
+- Writes per-node timings and the critical path to
+  logs/pipeline_dag_<patient_id>.json (shown by /api/demo/status)
 """
 
 import sys
@@ -28,32 +38,31 @@ import os
 import asyncio
 import logging
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from uuid import UUID
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.database import get_supabase_admin
+from app.database import get_async_supabase_admin, close_async_supabase
+from app.services.cumulative_context import CumulativeContext, CumulativeContextStore
+from app.services.dag_scheduler import DagReport, DagScheduler, save_report
 from app.services.deep_analyzer import DeepAnalyzer
 from app.services.prose_generator import ProseGenerator
 from app.config import settings
 from app.utils.pipeline_logger import PipelineLogger, LogPhase, LogEvent
+from generate_roadmap import generate_roadmap_for_session
+from generate_session_bridge import generate_session_bridge_for_session
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
 async def fetch_patient_sessions_chronological(patient_id: str) -> List[Dict[str, Any]]:
     """Fetch all sessions for a patient in chronological order"""
-    db = get_supabase_admin()
+    db = await get_async_supabase_admin()
 
     try:
-        response = (
+        response = await (
             db.table("therapy_sessions")
             .select("*")
             .eq("patient_id", patient_id)
@@ -70,79 +79,6 @@ async def fetch_patient_sessions_chronological(patient_id: str) -> List[Dict[str
         raise
 
 
-def extract_wave1_data(session: Dict[str, Any]) -> Dict[str, Any]:
-    """Extract Wave 1 analysis fields from session"""
-    return {
-        "session_id": session["id"],
-        "session_date": session.get("session_date"),
-        "mood_score": session.get("mood_score"),
-        "mood_confidence": session.get("mood_confidence"),
-        "mood_rationale": session.get("mood_rationale"),
-        "emotional_tone": session.get("emotional_tone"),
-        "topics": session.get("topics"),
-        "action_items": session.get("action_items"),
-        "technique": session.get("technique"),
-        "summary": session.get("summary"),
-        "has_breakthrough": session.get("has_breakthrough"),
-        "breakthrough_data": session.get("breakthrough_data")
-    }
-
-
-def extract_wave2_data(session: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Extract Wave 2 deep_analysis from session"""
-    deep_analysis = session.get("deep_analysis")
-
-    if not deep_analysis:
-        return None
-
-    return {
-        "session_id": session["id"],
-        "session_date": session.get("session_date"),
-        "deep_analysis": deep_analysis
-    }
-
-
-def build_cumulative_context(
-    previous_sessions: List[Dict[str, Any]],
-    previous_cumulative_context: Optional[Dict[str, Any]] = None
-) -> Dict[str, Any]:
-    """
-    Build cumulative context for current session analysis.
-
-    Args:
-        previous_sessions: All sessions before current one (chronological)
-        previous_cumulative_context: Context from N-2 session (nested)
-
-    Returns:
-        Nested context structure with Wave 1 + Wave 2 from all previous sessions
-    """
-    if not previous_sessions:
-        return None
-
-    # Get most recent previous session
-    latest_previous = previous_sessions[-1]
-
-    # Build context
-    context = {}
-
-    # Add nested previous context (from N-2, N-3, etc.)
-    if previous_cumulative_context:
-        context["previous_context"] = previous_cumulative_context
-
-    # Add latest previous session (N-1)
-    session_num = len(previous_sessions)
-    wave1_key = f"session_{session_num:02d}_wave1"
-    wave2_key = f"session_{session_num:02d}_wave2"
-
-    context[wave1_key] = extract_wave1_data(latest_previous)
-
-    wave2 = extract_wave2_data(latest_previous)
-    if wave2:
-        context[wave2_key] = wave2
-
-    return context
-
-
 async def run_deep_analysis(
     session: Dict[str, Any],
     cumulative_context: Optional[Dict[str, Any]]
@@ -203,7 +139,7 @@ async def update_session_wave2(
     prose_generated_at: Optional[datetime]
 ) -> bool:
     """Update session with Wave 2 deep analysis and prose"""
-    db = get_supabase_admin()
+    db = await get_async_supabase_admin()
 
     try:
         update_data = {
@@ -216,7 +152,7 @@ async def update_session_wave2(
             update_data["prose_analysis"] = prose_text
             update_data["prose_generated_at"] = prose_generated_at.isoformat()
 
-        response = (
+        response = await (
             db.table("therapy_sessions")
             .update(update_data)
             .eq("id", session_id)
@@ -233,162 +169,243 @@ async def update_session_wave2(
         return False
 
 
-async def process_session_wave2(
-    session: Dict[str, Any],
-    index: int,
-    total: int,
-    previous_sessions: List[Dict[str, Any]],
-    previous_cumulative_context: Optional[Dict[str, Any]]
-):
-    """Process a single session with Wave 2 analysis - granular logging"""
-    session_id = session["id"]
-    session_date = session.get("session_date", "unknown")
-    patient_id = session.get("patient_id")
-
-    logger_instance = PipelineLogger(patient_id, LogPhase.WAVE2)
-
-    # START event with context depth
-    context_depth = len(previous_sessions)
-    logger_instance.log_event(
-        LogEvent.START,
-        session_id=session_id,
-        session_date=session_date,
-        details={
-            "index": index + 1,
-            "total": total,
-            "context_depth": context_depth
-        }
-    )
+def _elapsed_ms(start: datetime) -> float:
+    return (datetime.now() - start).total_seconds() * 1000
 
-    print(f"[{index + 1}/{total}] Processing Wave 2 for session {session_date}", flush=True)
-    logger.info(f"\n[{index + 1}/{total}] Processing session {session_date} ({session_id})")
-
-    # Build cumulative context
-    cumulative_context = build_cumulative_context(previous_sessions, previous_cumulative_context)
-
-    if cumulative_context:
-        logger.info(f"  📚 Context depth: {context_depth} previous session(s)")
-    else:
-        logger.info(f"  📚 No previous context (first session)")
-
-    # DEEP_ANALYSIS
-    analysis_start = datetime.now()
-    logger_instance.log_event(
-        LogEvent.DEEP_ANALYSIS,
-        session_id=session_id,
-        session_date=session_date,
-        status="started",
-        details={"context_depth": context_depth}
-    )
 
-    deep_analysis = await run_deep_analysis(session, cumulative_context)
+def _previous(node: str, number: int) -> Tuple[str, ...]:
+    """The same node of the previous session (for per-patient chains)"""
+    return (f"{node}:{number - 1}",) if number > 1 else ()
 
-    if deep_analysis:
-        deep_analyzed_at = datetime.now()
-        analysis_duration = (deep_analyzed_at - analysis_start).total_seconds() * 1000
-        logger_instance.log_event(
-            LogEvent.DEEP_ANALYSIS,
-            session_id=session_id,
-            session_date=session_date,
-            status="complete",
-            duration_ms=analysis_duration,
-            details={
-                "confidence": deep_analysis.get("confidence_score"),
-                "has_insights": bool(deep_analysis.get("therapeutic_insights"))
-            }
-        )
 
-        # PROSE_GENERATION
-        prose_start = datetime.now()
-        logger_instance.log_event(
-            LogEvent.PROSE_GENERATION,
-            session_id=session_id,
-            session_date=session_date,
-            status="started",
-            details={"confidence": deep_analysis.get("confidence_score")}
-        )
+def build_wave2_dag(
+    patient_id: str,
+    sessions: List[Dict[str, Any]],
+    context: CumulativeContext,
+    context_store: CumulativeContextStore,
+    on_progress: Optional[Callable[..., None]] = None
+) -> DagScheduler:
+    """
+    Build the patient's Wave 2 DAG. Per session N (chronological):
 
-        prose_text = await run_prose_generation(
-            session_id,
-            deep_analysis,
-            deep_analysis.get("confidence_score", 0.7)
-        )
+        deep:N     after context:N-1 (analyzes with sessions 1..N-1 folded in)
+        context:N  needs deep:N, after context:N-1 (folds N in, persists)
+        prose:N    needs deep:N
+        save:N     needs deep:N, after prose:N (one UPDATE with deep + prose)
+        roadmap:N  needs save:N + prose:N, after roadmap:N-1 (versions chain)
+        bridge:N   needs save:N, after roadmap:N + bridge:N-1
 
-        if prose_text:
-            prose_generated_at = datetime.now()
-            prose_duration = (prose_generated_at - prose_start).total_seconds() * 1000
+    So deep analysis of session N+1 starts as soon as session N is folded
+    into the context, overlapping session N's prose, roadmap and bridge.
+    Sessions whose deep analysis fails are left out of the context, as before.
+
+    on_progress is called whenever another session's save:N node finishes,
+    with keyword args completed, total, status and session_id.
+    """
+    total = len(sessions)
+    reported = set()
+
+    def on_update(report: DagReport) -> None:
+        save_report(patient_id, report, patient_id=patient_id, phase="wave2")
+        if on_progress is None:
+            return
+        for index, session in enumerate(sessions):
+            node = report.nodes.get(f"save:{index + 1}")
+            if node is None or node.status in ("pending", "running") or node.name in reported:
+                continue
+            reported.add(node.name)
+            on_progress(
+                completed=len(reported),
+                total=total,
+                status="complete" if node.status == "completed" else "failed",
+                session_id=session["id"],
+                error=node.error
+            )
+
+    scheduler = DagScheduler(on_update=on_update)
+    pipeline_logger = PipelineLogger(patient_id, LogPhase.WAVE2)
+
+    for index, session in enumerate(sessions):
+        number = index + 1
+        session_id = session["id"]
+        session_date = session.get("session_date", "unknown")
+        state: Dict[str, Any] = {}
+
+        async def deep(session=session, number=number, session_id=session_id, session_date=session_date, state=state):
+            context_depth = context.sessions_included
+            pipeline_logger.log_event(
+                LogEvent.START,
+                session_id=session_id,
+                session_date=session_date,
+                details={"index": number, "total": total, "context_depth": context_depth}
+            )
+            print(f"[{number}/{total}] Processing Wave 2 for session {session_date}", flush=True)
+            logger.info(f"\n[{number}/{total}] Processing session {session_date} ({session_id})")
+
+            # Cumulative context from previous sessions (bounded)
+            cumulative_context = context.to_prompt_context()
+            if cumulative_context:
+                logger.info(f"  📚 Context depth: {context_depth} previous session(s)")
+            else:
+                logger.info(f"  📚 No previous context (first session)")
+
+            state["started"] = analysis_start = datetime.now()
+            pipeline_logger.log_event(
+                LogEvent.DEEP_ANALYSIS,
+                session_id=session_id,
+                session_date=session_date,
+                status="started",
+                details={"context_depth": context_depth}
+            )
+
+            deep_analysis = await run_deep_analysis(session, cumulative_context)
+            if not deep_analysis:
+                pipeline_logger.log_event(
+                    LogEvent.FAILED,
+                    session_id=session_id,
+                    session_date=session_date,
+                    status="failed"
+                )
+                logger.warning(f"[{number}/{total}] ⚠️  No results to update")
+                raise Exception(f"Deep analysis failed for session {session_id}")
+
+            state["deep_analysis"] = deep_analysis
+            state["deep_analyzed_at"] = datetime.now()
+            pipeline_logger.log_event(
+                LogEvent.DEEP_ANALYSIS,
+                session_id=session_id,
+                session_date=session_date,
+                status="complete",
+                duration_ms=_elapsed_ms(analysis_start),
+                details={
+                    "confidence": deep_analysis.get("confidence_score"),
+                    "has_insights": bool(deep_analysis.get("therapeutic_insights"))
+                }
+            )
+
+        async def fold_context(session=session, state=state):
+            # Fold into cumulative context for the next session and persist it
+            session["deep_analysis"] = state["deep_analysis"]
+            context.add_session(session, state["deep_analysis"])
+            await context_store.save(patient_id, context)
+
+        async def prose(session_id=session_id, session_date=session_date, state=state):
+            deep_analysis = state["deep_analysis"]
+            prose_start = datetime.now()
+            pipeline_logger.log_event(
+                LogEvent.PROSE_GENERATION,
+                session_id=session_id,
+                session_date=session_date,
+                status="started",
+                details={"confidence": deep_analysis.get("confidence_score")}
+            )
+
+            prose_text = await run_prose_generation(
+                session_id,
+                deep_analysis,
+                deep_analysis.get("confidence_score", 0.7)
+            )
+            if not prose_text:
+                pipeline_logger.log_event(
+                    LogEvent.PROSE_GENERATION,
+                    session_id=session_id,
+                    session_date=session_date,
+                    status="failed"
+                )
+                raise Exception(f"Prose generation failed for session {session_id}")
 
-            logger_instance.log_event(
+            state["prose_text"] = prose_text
+            state["prose_generated_at"] = datetime.now()
+            pipeline_logger.log_event(
                 LogEvent.PROSE_GENERATION,
                 session_id=session_id,
                 session_date=session_date,
                 status="complete",
-                duration_ms=prose_duration,
+                duration_ms=_elapsed_ms(prose_start),
                 details={
                     "word_count": len(prose_text.split()),
                     "char_count": len(prose_text)
                 }
             )
-        else:
-            logger_instance.log_event(
-                LogEvent.PROSE_GENERATION,
+
+        async def save(number=number, session_id=session_id, session_date=session_date, state=state):
+            db_start = datetime.now()
+            pipeline_logger.log_event(
+                LogEvent.DB_UPDATE,
                 session_id=session_id,
                 session_date=session_date,
-                status="failed"
+                status="started"
             )
-            prose_generated_at = None
 
-        # DB_UPDATE
-        db_start = datetime.now()
-        logger_instance.log_event(
-            LogEvent.DB_UPDATE,
-            session_id=session_id,
-            session_date=session_date,
-            status="started"
-        )
+            updated = await update_session_wave2(
+                session_id,
+                state["deep_analysis"],
+                state.get("prose_text"),
+                state["deep_analyzed_at"],
+                state.get("prose_generated_at")
+            )
+            if not updated:
+                raise Exception(f"Database update failed for session {session_id}")
 
-        await update_session_wave2(
-            session_id,
-            deep_analysis,
-            prose_text,
-            deep_analyzed_at,
-            prose_generated_at
-        )
+            pipeline_logger.log_event(
+                LogEvent.DB_UPDATE,
+                session_id=session_id,
+                session_date=session_date,
+                status="complete",
+                duration_ms=_elapsed_ms(db_start)
+            )
+            pipeline_logger.log_event(
+                LogEvent.COMPLETE,
+                session_id=session_id,
+                session_date=session_date,
+                duration_ms=_elapsed_ms(state["started"])
+            )
 
-        db_duration = (datetime.now() - db_start).total_seconds() * 1000
-        logger_instance.log_event(
-            LogEvent.DB_UPDATE,
-            session_id=session_id,
-            session_date=session_date,
-            status="complete",
-            duration_ms=db_duration
+            print(f"[{number}/{total}] ✅ Wave 2 complete", flush=True)
+            logger.info(f"[{number}/{total}] ✅ Session complete")
+
+        async def roadmap(session_id=session_id):
+            # PR #3 Phase 5: Generate roadmap after Wave 2 completes
+            print(f"\n[Roadmap] Generating roadmap for session {session_id}", flush=True)
+            await asyncio.to_thread(generate_roadmap_for_session, patient_id, session_id)
+
+        async def bridge(session_id=session_id):
+            # Session Bridge generation (PR #4 Phase 8) - reads the latest roadmap
+            print(f"\n[SessionBridge] Generating session bridge for session {session_id}", flush=True)
+            await asyncio.to_thread(generate_session_bridge_for_session, patient_id, session_id)
+
+        scheduler.add(f"deep:{number}", deep, after=_previous("context", number))
+        scheduler.add(f"context:{number}", fold_context, deps=(f"deep:{number}",), after=_previous("context", number))
+        scheduler.add(f"prose:{number}", prose, deps=(f"deep:{number}",))
+        scheduler.add(f"save:{number}", save, deps=(f"deep:{number}",), after=(f"prose:{number}",))
+        scheduler.add(
+            f"roadmap:{number}", roadmap,
+            deps=(f"save:{number}", f"prose:{number}"), after=_previous("roadmap", number)
         )
-
-        # COMPLETE event
-        total_duration = analysis_duration + (prose_duration if prose_text else 0) + db_duration
-        logger_instance.log_event(
-            LogEvent.COMPLETE,
-            session_id=session_id,
-            session_date=session_date,
-            duration_ms=total_duration
+        scheduler.add(
+            f"bridge:{number}", bridge,
+            deps=(f"save:{number}",), after=(f"roadmap:{number}",) + _previous("bridge", number)
         )
 
-        print(f"[{index + 1}/{total}] ✅ Wave 2 complete", flush=True)
-        logger.info(f"[{index + 1}/{total}] ✅ Session complete")
-        return deep_analysis, cumulative_context
-    else:
-        logger_instance.log_event(
-            LogEvent.FAILED,
-            session_id=session_id,
-            session_date=session_date,
-            status="failed"
-        )
-        logger.warning(f"[{index + 1}/{total}] ⚠️  No results to update")
-        return None, cumulative_context
+    return scheduler
+
 
+async def main(
+    patient_id: str,
+    on_progress: Optional[Callable[..., None]] = None
+) -> Optional[DagReport]:
+    """
+    Main execution flow
+
+    Args:
+        patient_id: Patient whose sessions to analyze
+        on_progress: Called as each session's Wave 2 results are saved (or
+            fail), with keyword args completed, total, status, session_id
+            and error
 
-async def main(patient_id: str):
-    """Main execution flow"""
+    Returns:
+        The DAG report, or None if the patient has no sessions
+    """
     logger.info("=" * 80)
     logger.info("Wave 2 Analysis - Demo Seeding with Cumulative Context")
     logger.info("=" * 80)
@@ -400,89 +417,53 @@ async def main(patient_id: str):
 
     if not sessions:
         logger.error("No sessions found for patient")
-        return
+        return None
 
-    # Process each session sequentially (must maintain cumulative context)
     start_time = datetime.utcnow()
-    previous_sessions = []
-    previous_cumulative_context = None
-
-    for i, session in enumerate(sessions):
-        # Process current session
-        deep_analysis, cumulative_context = await process_session_wave2(
-            session,
-            i,
-            len(sessions),
-            previous_sessions,
-            previous_cumulative_context
-        )
-
-        # Update for next iteration
-        previous_sessions.append(session)
-        if deep_analysis:
-            # Update session with deep_analysis for next iteration
-            session["deep_analysis"] = deep_analysis
-            previous_cumulative_context = cumulative_context
-
-            # PR #3 Phase 5: Generate roadmap after Wave 2 completes (non-blocking)
-            print(f"\n[Roadmap] Triggering roadmap generation for session {session['id']}", flush=True)
-            try:
-                # Run generate_roadmap.py as detached subprocess (fire and forget)
-                # This ensures roadmap generation continues even if Wave 2 script exits
-                import subprocess
-                roadmap_script = os.path.join(os.path.dirname(__file__), 'generate_roadmap.py')
-
-                # Use Popen for non-blocking execution
-                # Inherit stdout/stderr so logs appear in Railway
-                # start_new_session=True detaches from parent process group
-                subprocess.Popen(
-                    [sys.executable, roadmap_script, patient_id, session['id']],
-                    stdout=None,  # Inherit parent's stdout (Railway captures this)
-                    stderr=None,  # Inherit parent's stderr
-                    env=os.environ.copy(),  # Pass environment variables (OPENAI_API_KEY, etc.)
-                    start_new_session=True  # Detach from parent process group
-                )
-                print(f"[Roadmap] ✓ Roadmap generation started (async) for session {session['id']}", flush=True)
-
-            except Exception as e:
-                print(f"[Roadmap] ✗ Roadmap generation error: {e}", flush=True)
-
-            # Session Bridge generation (PR #4 Phase 8) - runs after roadmap
-            print(f"\n[SessionBridge] Triggering session bridge generation for session {session['id']}", flush=True)
-            try:
-                session_bridge_script = os.path.join(os.path.dirname(__file__), 'generate_session_bridge.py')
-
-                subprocess.Popen(
-                    [sys.executable, session_bridge_script, patient_id, session['id']],
-                    stdout=None,
-                    stderr=None,
-                    env=os.environ.copy(),
-                    start_new_session=True
-                )
-                print(f"[SessionBridge] ✓ Session bridge generation started (async) for session {session['id']}", flush=True)
+    context_store = CumulativeContextStore(await get_async_supabase_admin())
+    context = CumulativeContext()  # Rebuilt from scratch, so reseeding never sees stale sessions
 
-            except Exception as e:
-                print(f"[SessionBridge] ✗ Session bridge generation error: {e}", flush=True)
+    # Sessions are pipelined: the DAG runs each step as soon as its inputs exist
+    scheduler = build_wave2_dag(patient_id, sessions, context, context_store, on_progress)
+    report = await scheduler.run()
 
     # Summary
     end_time = datetime.utcnow()
     duration = (end_time - start_time).total_seconds()
+    completed = sum(1 for index in range(len(sessions)) if report.nodes[f"save:{index + 1}"].status == "completed")
 
     logger.info("\n" + "=" * 80)
     print("\n" + "=" * 80, flush=True)
     logger.info("✅ Wave 2 Analysis Complete")
     print("✅ Wave 2 Analysis Complete", flush=True)
     logger.info("=" * 80)
-    print(f"Sessions processed: {len(sessions)}", flush=True)
-    logger.info(f"Sessions processed: {len(sessions)}")
+    print(f"Sessions processed: {completed}/{len(sessions)}", flush=True)
+    logger.info(f"Sessions processed: {completed}/{len(sessions)}")
     print(f"Total time: {duration:.1f} seconds ({duration / 60:.1f} minutes)", flush=True)
     logger.info(f"Total time: {duration:.1f} seconds ({duration / 60:.1f} minutes)")
     logger.info(f"Average per session: {duration / len(sessions):.1f} seconds")
+    print(f"Sequential time would be: {report.serial_ms / 1000:.1f} seconds", flush=True)
+    print(f"Critical path ({report.critical_path_ms / 1000:.1f}s): {' → '.join(report.critical_path)}", flush=True)
     logger.info(f"Finished: {end_time.isoformat()}")
-    logger.info("\n💡 Cumulative context depth: Session 1 (none) → Session 10 (9 sessions)")
+    logger.info(f"\n💡 Cumulative context: {context.sessions_included} sessions "
+                f"({len(context.recent_sessions)} recent in full, rest summarized)")
+    return report
+
+
+async def run_cli(patient_id: str):
+    """Script entry point: the async client belongs to this process, so close it when done"""
+    try:
+        await main(patient_id)
+    finally:
+        await close_async_supabase()
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
     if len(sys.argv) != 2:
         print("Usage: python scripts/seed_wave2_analysis.py <patient_id>")
         sys.exit(1)
@@ -497,4 +478,4 @@ if __name__ == "__main__":
         sys.exit(1)
 
     # Run async main
-    asyncio.run(main(patient_id))
+    asyncio.run(run_cli(patient_id))
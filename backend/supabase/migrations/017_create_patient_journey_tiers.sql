@@ -0,0 +1,33 @@
+-- Migration 017: Create patient_journey_tiers table
+--
+-- Stores the hierarchical "Your Journey" context per patient so roadmap
+-- generation reads one row instead of every previous session:
+--   tier1: recent sessions with full insights
+--   tier2: 5-session paragraph summaries
+--   tier3: long-term journey arc (bounded length)
+-- The compaction engine (app/services/journey_compactor.py) folds each new
+-- session in and compacts only the window it closes.
+--
+-- Date: 2026-10-16
+-- Related: Incremental roadmap compaction
+-- Prerequisites: Migration 014 (Your Journey rename)
+
+CREATE TABLE IF NOT EXISTS patient_journey_tiers (
+    patient_id UUID PRIMARY KEY REFERENCES patients(id) ON DELETE CASCADE,
+
+    -- [{number, session_id, session_date, insights: [str]}], oldest first
+    tier1 JSONB NOT NULL DEFAULT '[]'::jsonb,
+    -- [{first, last, session_ids, first_date, last_date, summary}], oldest first
+    tier2 JSONB NOT NULL DEFAULT '[]'::jsonb,
+    -- {first, last, summary} or NULL until 10 sessions have been compacted
+    tier3 JSONB,
+
+    sessions_folded INTEGER NOT NULL DEFAULT 0,
+    last_session_id UUID,
+
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE patient_journey_tiers IS 'Incrementally compacted tier 1/2/3 context for Your Journey roadmap generation (1 row per patient)';
+COMMENT ON COLUMN patient_journey_tiers.sessions_folded IS 'Sessions folded into the tiers so far (next session number - 1)';
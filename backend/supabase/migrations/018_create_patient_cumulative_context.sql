@@ -0,0 +1,28 @@
+-- Migration 018: Create patient_cumulative_context table
+--
+-- Stores the Wave 2 cumulative context per patient so deep analysis reads one
+-- bounded row instead of a context that nests every previous session:
+--   recent_sessions: last 3 sessions' Wave 1 fields + deep_analysis in full
+--   earlier_sessions: compacted summary of all older sessions (capped lists)
+-- Updated incrementally after each session's Wave 2 completes
+-- (app/services/cumulative_context.py).
+--
+-- Date: 2026-10-16
+-- Related: Bounded Wave 2 cumulative context
+
+CREATE TABLE IF NOT EXISTS patient_cumulative_context (
+    patient_id UUID PRIMARY KEY REFERENCES patients(id) ON DELETE CASCADE,
+
+    -- [{session_number, wave1: {...}, wave2: {...}}], oldest first
+    recent_sessions JSONB NOT NULL DEFAULT '[]'::jsonb,
+    -- {sessions, session_range, mood, topic_counts, technique_counts, breakthroughs, ...}
+    earlier_sessions JSONB NOT NULL DEFAULT '{}'::jsonb,
+
+    sessions_included INTEGER NOT NULL DEFAULT 0,
+    last_session_id UUID,
+
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE patient_cumulative_context IS 'Bounded Wave 2 cumulative context (rolling window + compacted summary), 1 row per patient';
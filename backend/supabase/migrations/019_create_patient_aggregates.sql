@@ -0,0 +1,45 @@
+-- Migration 019: Create patient_aggregates table
+--
+-- Materialized per-patient data behind the consistency and progress-metrics
+-- endpoints, so they read one row instead of every session:
+--   sessions: [[session_date, session_id]] sorted by date
+--   mood_series: Wave 1 mood points in session date order
+--   attendance_bitmap: one '1'/'0' per calendar week from attendance_start
+--   streaks, gap regularity buckets and the materialized progress metrics
+-- Updated incrementally when a session is created and when its Wave 1 mood
+-- analysis completes; rebuilt from therapy_sessions when missing, written by
+-- an older version, or found to have drifted by the aggregates check job
+-- (app/services/patient_aggregates.py).
+--
+-- Date: 2026-10-16
+-- Related: Materialized patient aggregates
+
+CREATE TABLE IF NOT EXISTS patient_aggregates (
+    patient_id UUID PRIMARY KEY REFERENCES patients(id) ON DELETE CASCADE,
+
+    -- [[session_date, session_id]], oldest first
+    sessions JSONB NOT NULL DEFAULT '[]'::jsonb,
+    -- [{session_id, session_date, mood_score, mood_confidence, analyzed_at}], oldest first
+    mood_series JSONB NOT NULL DEFAULT '[]'::jsonb,
+
+    -- Monday of the first attended week; one character per week after it
+    attendance_start DATE,
+    attendance_bitmap TEXT NOT NULL DEFAULT '',
+    longest_streak_weeks INTEGER NOT NULL DEFAULT 0,
+    latest_streak_weeks INTEGER NOT NULL DEFAULT 0,
+
+    -- {perfect, good, fair, poor}: gaps by distance from a 7-day interval
+    gap_buckets JSONB NOT NULL DEFAULT '{}'::jsonb,
+    gap_days_total INTEGER NOT NULL DEFAULT 0,
+    regularity_score REAL NOT NULL DEFAULT 0,
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+
+    -- ProgressMetricsResponse for the first 50 mood points (NULL until one exists)
+    progress_metrics JSONB,
+
+    version INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE patient_aggregates IS 'Materialized consistency and progress-metrics aggregates, 1 row per patient';
@@ -0,0 +1,22 @@
+-- Migration 020: Track folded sessions and revisions in patient_cumulative_context
+--
+-- folded_sessions lists every session included in the context, oldest first,
+-- so a session that is re-run after being folded into the summary, or that
+-- arrives out of date order, triggers a rebuild instead of being appended
+-- twice, and re-analyzing an older session gets a context of only the
+-- sessions before it. revision is bumped on every write; record_session()
+-- updates a row only at the revision it read, so concurrent pipelines for a
+-- patient can't overwrite each other (app/services/cumulative_context.py).
+--
+-- Rows written before this migration have an empty folded_sessions and are
+-- rebuilt from therapy_sessions on their next read.
+--
+-- Date: 2026-10-16
+-- Related: Bounded Wave 2 cumulative context
+
+ALTER TABLE patient_cumulative_context
+    ADD COLUMN IF NOT EXISTS folded_sessions JSONB NOT NULL DEFAULT '[]'::jsonb,
+    ADD COLUMN IF NOT EXISTS revision INTEGER NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN patient_cumulative_context.folded_sessions IS '[[session_date, session_id]] of every session in the context, oldest first';
+COMMENT ON COLUMN patient_cumulative_context.revision IS 'Incremented on every write (compare-and-swap for concurrent updates)';
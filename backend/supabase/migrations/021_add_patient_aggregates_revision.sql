@@ -0,0 +1,14 @@
+-- Migration 021: Add a revision to patient_aggregates
+--
+-- Incremented on every write. Updates (record_session, record_wave1, the
+-- aggregates check) write a row only at the revision they read, so two
+-- processes updating the same patient can't overwrite each other; the
+-- loser reloads and re-applies (app/services/patient_aggregates.py).
+--
+-- Date: 2026-10-16
+-- Related: Materialized patient aggregates
+
+ALTER TABLE patient_aggregates
+    ADD COLUMN IF NOT EXISTS revision INTEGER NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN patient_aggregates.revision IS 'Incremented on every write (compare-and-swap for concurrent updates)';
@@ -0,0 +1,237 @@
+"""
+Test suite for the async data-access layer
+
+Tests per-loop async client caching, that AnalysisOrchestrator awaits its
+queries (concurrent runs overlap instead of serializing), that session write
+routes await theirs, and the async demo auth dependency, using an in-memory
+fake of the async PostgREST query builder.
+Run with: python -m pytest backend/tests/test_async_database.py -v
+Or directly: python backend/tests/test_async_database.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import app.database as database
+from app.services.analysis_orchestrator import AnalysisOrchestrator
+
+
+class FakeQuery:
+    """Chainable stand-in for an async PostgREST request builder."""
+
+    def __init__(self, client, table, data):
+        self.client = client
+        self.table = table
+        self.data = data
+        self.calls = []
+
+    def __getattr__(self, name):
+        def chain(*args, **kwargs):
+            self.calls.append((name, args))
+            return self
+        return chain
+
+    async def execute(self):
+        self.client.in_flight += 1
+        self.client.peak = max(self.client.peak, self.client.in_flight)
+        await asyncio.sleep(self.client.latency)
+        self.client.in_flight -= 1
+        self.client.executed.append((self.table, self.calls))
+        return SimpleNamespace(data=self.data)
+
+
+class FakeAsyncClient:
+    """Minimal async Supabase client that simulates per-query latency."""
+
+    def __init__(self, data=None, latency=0.05):
+        self.data = data
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+        self.executed = []
+
+    def table(self, name):
+        return FakeQuery(self, name, self.data)
+
+    def rpc(self, name, params):
+        return FakeQuery(self, f"rpc:{name}", self.data)
+
+
+_STATUS_ROW = {
+    "session_id": "s1",
+    "analysis_status": "complete",
+    "mood_complete": True,
+    "topics_complete": True,
+    "breakthrough_complete": True,
+    "wave1_complete": True,
+    "deep_complete": True,
+}
+
+
+def _orchestrator(db):
+    with patch("app.services.analysis_orchestrator.MoodAnalyzer"), \
+            patch("app.services.analysis_orchestrator.TopicExtractor"), \
+            patch("app.services.analysis_orchestrator.BreakthroughDetector"), \
+            patch("app.services.analysis_orchestrator.DeepAnalyzer"), \
+            patch("app.services.analysis_orchestrator.ActionItemsSummarizer"):
+        return AnalysisOrchestrator(db=db)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_async_client_cached_per_loop():
+    """Test one async client per event loop, reused within the loop."""
+    created = []
+
+    async def fake_acreate_client(url, key):
+        client = Mock()
+        created.append(client)
+        return client
+
+    async def fetch_twice():
+        return await database.get_async_supabase(), await database.get_async_supabase()
+
+    with patch.object(database, "acreate_client", fake_acreate_client):
+        first, second = asyncio.run(fetch_twice())
+        third, _ = asyncio.run(fetch_twice())
+
+    assert first is second
+    assert third is not first
+    assert len(created) == 2
+
+    print("✓ Async client is cached per event loop")
+
+
+def test_concurrent_queries_overlap():
+    """Test concurrent orchestrator queries are in flight together, not serialized."""
+    db = FakeAsyncClient(data=[_STATUS_ROW], latency=0.05)
+    orchestrator = _orchestrator(db)
+
+    async def run():
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(orchestrator.get_pipeline_status("s1") for _ in range(20)))
+        return statuses, time.perf_counter() - start
+
+    statuses, elapsed = asyncio.run(run())
+
+    assert all(s.deep_complete for s in statuses)
+    assert db.peak == 20
+    # Serialized blocking calls would take 20 * 50ms = 1s
+    assert elapsed < 0.5, f"{elapsed:.2f}s"
+
+    print(f"✓ 20 concurrent queries completed in {elapsed * 1000:.0f}ms (peak in-flight {db.peak})")
+
+
+def test_orchestrator_awaits_analyzer_and_update():
+    """Test mood analysis awaits the analyzer and writes through the async client."""
+    db = FakeAsyncClient(data={"id": "s1", "transcript": [{"speaker": "SPEAKER_01", "text": "hi"}]}, latency=0)
+    orchestrator = _orchestrator(db)
+    orchestrator.mood_analyzer.analyze_session_mood = AsyncMock(return_value=SimpleNamespace(
+        mood_score=6.5,
+        confidence=0.8,
+        rationale="steady",
+        key_indicators=["calm"],
+        emotional_tone="hopeful",
+    ))
+
+    asyncio.run(orchestrator._analyze_mood("s1"))
+
+    orchestrator.mood_analyzer.analyze_session_mood.assert_awaited_once()
+    tables = [table for table, _ in db.executed]
+    assert tables == ["therapy_sessions", "therapy_sessions"]
+    update_calls = dict(db.executed[1][1])
+    assert update_calls["update"][0]["mood_score"] == 6.5
+
+    print("✓ Orchestrator awaits analyzers and async updates")
+
+
+def test_require_demo_auth_is_async():
+    """Test the demo auth dependency awaits the async client instead of asyncio.run()."""
+    from app.middleware import demo_auth
+
+    user = {"id": "u1", "demo_token": "00000000-0000-0000-0000-000000000001", "is_demo": True}
+    db = FakeAsyncClient(data=user, latency=0)
+    request = SimpleNamespace(headers={"x-demo-token": user["demo_token"]})
+
+    async def run():
+        with patch.object(demo_auth, "get_async_supabase", AsyncMock(return_value=db)):
+            return await demo_auth.require_demo_auth(request)
+
+    assert asyncio.run(run()) == user
+    assert db.executed[0][0] == "users"
+
+    print("✓ Demo auth dependency is async")
+
+
+def test_session_write_routes_await_queries():
+    """Test session write routes use the async client, so concurrent uploads overlap."""
+    from app.routers import sessions
+
+    db = FakeAsyncClient(data={"id": "s1", "patient_id": "p1"}, latency=0.05)
+    upload = SimpleNamespace(transcript=[{"speaker": "SPEAKER_00", "text": "hi"}], audio_file_url=None)
+
+    async def run():
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            sessions.upload_transcript(f"s{i}", upload, db=db) for i in range(10)
+        ))
+        return results, time.perf_counter() - start
+
+    with patch.object(sessions.settings, "breakthrough_auto_analyze", False):
+        results, elapsed = asyncio.run(run())
+
+    assert all(result["status"] == "completed" for result in results)
+    assert db.peak == 10
+    # Two blocking queries per upload, serialized, would take 10 * 2 * 50ms = 1s
+    assert elapsed < 0.5, f"{elapsed:.2f}s"
+
+    print(f"✓ 10 concurrent transcript uploads completed in {elapsed * 1000:.0f}ms")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Async Database Layer Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_async_client_cached_per_loop,
+        test_concurrent_queries_overlap,
+        test_orchestrator_awaits_analyzer_and_update,
+        test_require_demo_auth_is_async,
+        test_session_write_routes_await_queries,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -21,6 +21,11 @@ from app.services.base_ai_generator import (
     GenerationResult,
 )
 from app.config.model_config import ModelTier, set_tier, get_current_tier
+from app.services.openai_client_registry import (
+    PoolMetrics,
+    get_client_pool_stats,
+    reset_client_registry,
+)
 
 
 # =============================================================================
@@ -247,6 +252,176 @@ def test_missing_api_key_raises():
     print("✓ Missing API key raises ValueError")
 
 
+def test_generators_share_pooled_client():
+    """Test generators with the same API key borrow one shared client."""
+    reset_client_registry()
+    try:
+        gen1 = MockSyncGenerator(api_key="pool-key")
+        gen2 = MockSyncGenerator(api_key="pool-key")
+        gen3 = MockSyncGenerator(api_key="other-pool-key")
+
+        assert gen1.client is gen2.client
+        assert gen1.client is not gen3.client
+
+        # Retries belong to the rate limiter, not the SDK
+        assert gen1.client.max_retries == 0
+
+        stats = get_client_pool_stats()
+        assert len(stats) == 2
+        assert all(s["kind"] == "sync" for s in stats)
+        assert all("pool-key" not in s["key_fingerprint"] for s in stats)
+    finally:
+        reset_client_registry()
+
+    print("✓ Generators share pooled OpenAI clients")
+
+
+def test_async_clients_scoped_per_event_loop():
+    """Test async clients are shared within a loop but not across loops."""
+    import asyncio
+
+    reset_client_registry()
+
+    async def build_pair():
+        gen1 = MockAsyncGenerator(api_key="pool-key")
+        gen2 = MockAsyncGenerator(api_key="pool-key")
+        return gen1.client, gen2.client
+
+    try:
+        first_a, first_b = asyncio.run(build_pair())
+        second_a, _ = asyncio.run(build_pair())
+
+        assert first_a is first_b
+        assert first_a is not second_a
+        assert first_a.max_retries == 0
+    finally:
+        reset_client_registry()
+
+    print("✓ Async clients are scoped per event loop")
+
+
+def test_async_client_built_off_loop_is_not_shared():
+    """Test an async client created outside a loop is never handed to another loop."""
+    import asyncio
+
+    reset_client_registry()
+    try:
+        gen = MockAsyncGenerator(api_key="pool-key")
+        off_loop = gen._client
+
+        async def current_client():
+            return gen.client, MockAsyncGenerator(api_key="pool-key").client
+
+        first, first_shared = asyncio.run(current_client())
+        second, second_shared = asyncio.run(current_client())
+
+        assert first is off_loop  # bound to the first loop that used it
+        assert first_shared is not off_loop
+        assert second is second_shared  # rebound to the second loop's client
+        assert second is not first
+    finally:
+        reset_client_registry()
+
+    print("✓ Off-loop async clients are not shared across loops")
+
+
+def test_metered_transport_finishes_after_body():
+    """Test a request stays in flight until its response body has been read."""
+    import asyncio
+    import httpx
+    from app.services.openai_client_registry import _MeteredAsyncTransport
+
+    metrics = PoolMetrics(
+        kind="async",
+        key_fingerprint="abc12345",
+        max_connections=2,
+        max_keepalive_connections=1,
+    )
+
+    async def headers_only(self, request):
+        return httpx.Response(200, stream=httpx.ByteStream(b'{"ok": true}'))
+
+    async def run():
+        transport = _MeteredAsyncTransport(metrics)
+        with patch.object(httpx.AsyncHTTPTransport, "handle_async_request", headers_only):
+            response = await transport.handle_async_request(httpx.Request("POST", "https://api.test"))
+        in_flight_after_headers = metrics.to_dict()["in_flight"]
+        await response.aread()
+        await response.aclose()
+        return in_flight_after_headers
+
+    assert asyncio.run(run()) == 1
+    assert metrics.to_dict()["in_flight"] == 0
+    assert metrics.to_dict()["requests_total"] == 1
+
+    print("✓ Requests are metered until the body is read")
+
+
+def test_wave2_generators_do_not_block_the_loop():
+    """Test deep analysis and prose calls overlap on one loop (async client end to end)."""
+    import asyncio
+    import time
+    from types import SimpleNamespace
+    from app.services.deep_analyzer import DeepAnalyzer
+    from app.services.prose_generator import ProseGenerator
+
+    async def slow_create(**kwargs):
+        await asyncio.sleep(0.2)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))], usage=None)
+
+    async def run():
+        deep = DeepAnalyzer(api_key="test-key", override_model="gpt-5-nano")
+        prose = ProseGenerator(api_key="test-key", override_model="gpt-5-nano")
+        deep.use_cache = prose.use_cache = False
+        for gen in (deep, prose):
+            gen.client.chat.completions.create = slow_create
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            deep.analyze_session("s1", {"patient_id": "p1", "transcript": []}),
+            prose.generate_prose("s2", {}, 0.8),
+        )
+        return time.perf_counter() - start
+
+    reset_client_registry()
+    try:
+        with patch("app.services.deep_analyzer.track_generation_cost"), \
+                patch("app.services.prose_generator.track_generation_cost"):
+            elapsed = asyncio.run(run())
+    finally:
+        reset_client_registry()
+
+    assert elapsed < 0.35
+
+    print("✓ Deep analysis and prose share the loop without blocking it")
+
+
+def test_pool_metrics_saturation():
+    """Test in-flight accounting flags requests that wait for a connection."""
+    metrics = PoolMetrics(
+        kind="sync",
+        key_fingerprint="abc12345",
+        max_connections=2,
+        max_keepalive_connections=1,
+    )
+
+    metrics.request_started()
+    metrics.request_started()
+    metrics.request_started()  # Pool is full - this one waits
+    metrics.request_finished()
+    metrics.request_finished(failed=True)
+
+    stats = metrics.to_dict()
+    assert stats["in_flight"] == 1
+    assert stats["peak_in_flight"] == 3
+    assert stats["requests_total"] == 3
+    assert stats["saturated_requests"] == 1
+    assert stats["errors_total"] == 1
+    assert stats["utilization"] == 0.5
+
+    print("✓ Pool metrics track saturation")
+
+
 def run_all_tests():
     """Run all tests."""
     import asyncio
@@ -267,6 +442,12 @@ def run_all_tests():
         test_parse_response,
         test_get_current_model,
         test_missing_api_key_raises,
+        test_generators_share_pooled_client,
+        test_async_clients_scoped_per_event_loop,
+        test_async_client_built_off_loop_is_not_shared,
+        test_metered_transport_finishes_after_body,
+        test_wave2_generators_do_not_block_the_loop,
+        test_pool_metrics_saturation,
     ]
 
     async_tests = [
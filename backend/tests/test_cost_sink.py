@@ -0,0 +1,281 @@
+"""
+Test suite for the generation cost sink
+
+Tests batching, time-based flushing, drop accounting, batch retry with
+row-by-row fallback, and shutdown flush
+using an in-memory batch writer (no database required).
+Run with: python -m pytest backend/tests/test_cost_sink.py -v
+Or directly: python backend/tests/test_cost_sink.py
+"""
+
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.config.model_config import GenerationCost, track_generation_cost
+from app.utils.cost_sink import CostSink, COST_COLUMNS, set_cost_sink
+
+
+class RecordingWriter:
+    """Batch writer that records batches instead of inserting them."""
+
+    def __init__(self, fail: bool = False, delay: float = 0.0, bad_task: str = None):
+        self.batches = []
+        self.calls = 0
+        self.fail = fail
+        self.delay = delay
+        self.bad_task = bad_task
+        self.closed = False
+
+    def __call__(self, rows):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        if any(row[0] == self.bad_task for row in rows):
+            raise ValueError("invalid input syntax")
+        self.batches.append(list(rows))
+
+    def close(self):
+        self.closed = True
+
+
+def _cost(task: str = "mood_analysis") -> GenerationCost:
+    return GenerationCost(
+        task=task,
+        model="gpt-5-nano",
+        input_tokens=100,
+        output_tokens=20,
+        cost=0.00001,
+        duration_ms=250,
+        session_id="session-1",
+        metadata={"attempt": 1},
+    )
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_batches_by_size():
+    """Test rows are written in multi-row batches of batch_size."""
+    writer = RecordingWriter()
+    sink = CostSink(writer, batch_size=5, flush_interval=60)
+
+    for _ in range(12):
+        assert sink.enqueue(_cost(), patient_id="patient-1")
+
+    assert sink.flush(timeout=5)
+    sink.shutdown()
+
+    sizes = [len(batch) for batch in writer.batches]
+    assert sum(sizes) == 12
+    assert max(sizes) <= 5
+    assert len(writer.batches[0][0]) == len(COST_COLUMNS)
+    assert writer.batches[0][0][7] == "patient-1"
+
+    stats = sink.get_stats()
+    assert stats["written"] == 12
+    assert stats["queue_depth"] == 0
+    assert writer.closed
+
+    print("✓ Cost rows are batched by size")
+
+
+def test_flushes_on_interval():
+    """Test a partial batch is written once the flush interval elapses."""
+    writer = RecordingWriter()
+    sink = CostSink(writer, batch_size=100, flush_interval=0.05)
+
+    sink.enqueue(_cost())
+    deadline = time.time() + 2
+    while not writer.batches and time.time() < deadline:
+        time.sleep(0.01)
+    sink.shutdown()
+
+    assert writer.batches and len(writer.batches[0]) == 1
+
+    print("✓ Partial batches flush on interval")
+
+
+def test_enqueue_never_blocks_and_counts_drops():
+    """Test a full queue drops records instead of blocking the caller."""
+    release = threading.Event()
+
+    class BlockedWriter(RecordingWriter):
+        def __call__(self, rows):
+            release.wait(5)
+            super().__call__(rows)
+
+    writer = BlockedWriter()
+    sink = CostSink(writer, batch_size=1, flush_interval=60, max_queue_size=2)
+
+    start = time.time()
+    results = [sink.enqueue(_cost()) for _ in range(10)]
+    elapsed = time.time() - start
+
+    release.set()
+    sink.shutdown()
+
+    assert elapsed < 1.0
+    assert results.count(False) >= 7
+    stats = sink.get_stats()
+    assert stats["dropped"] == results.count(False)
+    assert stats["written"] == results.count(True)
+
+    print("✓ Full queue drops without blocking")
+
+
+def test_writer_failure_is_counted():
+    """Test failed batches are counted and do not kill the worker."""
+    writer = RecordingWriter(fail=True)
+    sink = CostSink(writer, batch_size=2, flush_interval=60)
+
+    sink.enqueue(_cost())
+    sink.enqueue(_cost())
+    assert sink.flush(timeout=5)
+
+    writer.fail = False
+    sink.enqueue(_cost())
+    sink.shutdown()
+
+    stats = sink.get_stats()
+    assert stats["failed"] == 2
+    assert stats["written"] == 1
+
+    print("✓ Writer failures are counted")
+
+
+def test_bad_row_fails_alone():
+    """Test a batch with one bad row retries once, then stores the good rows one by one."""
+    writer = RecordingWriter(bad_task="broken")
+    sink = CostSink(writer, batch_size=3, flush_interval=60)
+
+    sink.enqueue(_cost("mood_analysis"))
+    sink.enqueue(_cost("broken"))
+    sink.enqueue(_cost("topic_extraction"))
+    sink.shutdown()
+
+    stats = sink.get_stats()
+    assert stats["failed"] == 1
+    assert stats["written"] == 2
+    assert writer.calls == 2 + 3  # Batch + retry, then one insert per row
+    assert [batch[0][0] for batch in writer.batches] == ["mood_analysis", "topic_extraction"]
+
+    print("✓ A bad row fails alone")
+
+
+def test_transient_failure_is_retried():
+    """Test a batch that fails once is retried whole."""
+    writer = RecordingWriter()
+    original = writer.__call__
+    failures = [RuntimeError("connection reset")]
+
+    def flaky(rows):
+        if failures:
+            raise failures.pop()
+        original(rows)
+
+    sink = CostSink(flaky, batch_size=2, flush_interval=60)
+    sink.enqueue(_cost())
+    sink.enqueue(_cost())
+    sink.shutdown()
+
+    assert sink.get_stats()["failed"] == 0
+    assert sink.get_stats()["batches"] == 1
+    assert [len(batch) for batch in writer.batches] == [2]
+
+    print("✓ Transient batch failures are retried")
+
+
+def test_disabled_sink_drops():
+    """Test a sink without a writer (no DATABASE_URL) drops and counts."""
+    sink = CostSink(None)
+
+    assert sink.enqueue(_cost()) is False
+    assert sink.get_stats()["dropped"] == 1
+    assert sink.get_stats()["worker_alive"] is False
+
+    print("✓ Disabled sink drops records")
+
+
+def test_track_generation_cost_enqueues():
+    """Test track_generation_cost hands records to the sink instead of the DB."""
+    from unittest.mock import Mock
+
+    writer = RecordingWriter()
+    sink = CostSink(writer, batch_size=10, flush_interval=60)
+    set_cost_sink(sink)
+
+    try:
+        response = Mock()
+        response.usage = Mock(prompt_tokens=100, completion_tokens=50)
+
+        with patch("app.config.model_config.store_generation_cost_sync") as direct_store:
+            cost_info = track_generation_cost(
+                response=response,
+                task="mood_analysis",
+                model="gpt-5-nano",
+                start_time=time.time(),
+                session_id="session-1",
+                patient_id="patient-1",
+            )
+
+        assert not direct_store.called
+        assert sink.flush(timeout=5)
+        assert writer.batches[0][0][0] == "mood_analysis"
+        assert cost_info.input_tokens == 100
+    finally:
+        set_cost_sink(None)
+        sink.shutdown()
+
+    print("✓ track_generation_cost enqueues to the sink")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Cost Sink Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_batches_by_size,
+        test_flushes_on_interval,
+        test_enqueue_never_blocks_and_counts_drops,
+        test_writer_failure_is_counted,
+        test_bad_row_fails_alone,
+        test_transient_failure_is_retried,
+        test_disabled_sink_drops,
+        test_track_generation_cost_enqueues,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,380 @@
+"""
+Test suite for the bounded Wave 2 cumulative context
+
+Tests the rolling window and compacted summary, that context size stays flat
+over 100 sessions, idempotent re-adds, rebuilds for re-run and out-of-order
+sessions, the store's one-time backfill and single-row reads, concurrent
+updates, and that DeepAnalyzer reads the stored context.
+Run with: python -m pytest backend/tests/test_cumulative_context.py -v
+Or directly: python backend/tests/test_cumulative_context.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.cumulative_context import (
+    CumulativeContext,
+    CumulativeContextStore,
+    MAX_TOPICS,
+    RECENT_WINDOW,
+)
+from app.services.deep_analyzer import DeepAnalyzer
+
+
+class UniqueViolation(Exception):
+    code = "23505"
+
+
+class FakeQuery:
+    """One-row-per-patient table: select/insert/update/upsert with eq filters"""
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = {}
+        self.op = "select"
+        self.row = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def _write(self, op, row):
+        self.op, self.row = op, json.loads(json.dumps(row))
+        return self
+
+    def insert(self, row):
+        return self._write("insert", row)
+
+    def update(self, row):
+        return self._write("update", row)
+
+    def upsert(self, row, on_conflict=None):
+        return self._write("upsert", row)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        await asyncio.sleep(0)  # Let concurrent callers interleave
+        self.db.log.append((self.table, self.op))
+        rows = self.db.tables.setdefault(self.table, [])
+        matching = [r for r in rows if all(r.get(k) == v for k, v in self.filters.items())]
+
+        if self.op == "select":
+            return SimpleNamespace(data=matching)
+        if self.op == "update":
+            for r in matching:
+                r.update(self.row)
+            return SimpleNamespace(data=matching)
+        existing = [r for r in rows if r["patient_id"] == self.row["patient_id"]]
+        if existing and self.op == "insert":
+            raise UniqueViolation("duplicate key value violates unique constraint")
+        for r in existing:
+            rows.remove(r)
+        rows.append(self.row)
+        return SimpleNamespace(data=[self.row])
+
+
+class FakeDB:
+    def __init__(self, sessions=None):
+        self.tables = {"therapy_sessions": sessions or []}
+        self.log = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def _session(number, patient_id="p1", **extra):
+    return {
+        "id": f"s{number}",
+        "patient_id": patient_id,
+        "session_date": f"2025-01-{number:03d}",
+        "mood_score": float(number % 10),
+        "topics": [f"Topic {number}", "Anxiety"],
+        "technique": "CBT",
+        "summary": f"Session {number} summary.",
+        "has_breakthrough": number % 3 == 0,
+        "breakthrough_data": {"type": "Discovery", "description": f"Breakthrough {number}"},
+        **extra,
+    }
+
+
+def _deep(number):
+    return {
+        "therapeutic_insights": {"key_realizations": [f"Realization {number}"], "patterns": [f"Pattern {number}"]},
+        "coping_skills": {"proficiency": {f"Skill {number}": "developing"}},
+        "therapeutic_relationship": {"engagement_level": "high", "openness": "very_open", "alliance_strength": "strong"},
+        "cost_info": {"cost": 0.01},
+    }
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_window_and_summary():
+    """Test the last sessions stay in full and older ones fold into the summary."""
+    context = CumulativeContext()
+    assert context.to_prompt_context() is None  # First session: no context
+
+    for number in range(1, 6):
+        context.add_session(_session(number), _deep(number))
+
+    prompt = context.to_prompt_context()
+    assert prompt["sessions_included"] == 5
+    assert [e["session_number"] for e in prompt["recent_sessions"]] == [3, 4, 5]
+    assert "cost_info" not in prompt["recent_sessions"][0]["wave2"]
+
+    earlier = prompt["earlier_sessions"]
+    assert earlier["sessions"] == 2 and earlier["session_range"] == [1, 2]
+    assert earlier["mood"] == {"first": 1.0, "min": 1.0, "max": 2.0, "average": 1.5, "count": 2, "latest": 2.0}
+    assert earlier["topic_counts"]["Anxiety"] == 2
+    assert earlier["key_realizations"] == ["Realization 1", "Realization 2"]
+
+    print("✓ Recent sessions in full, older ones summarized")
+
+
+def test_context_size_is_bounded():
+    """Test the serialized context stops growing once the window is full."""
+    context = CumulativeContext()
+    sizes = []
+    for number in range(1, 101):
+        context.add_session(_session(number), _deep(number))
+        sizes.append(len(json.dumps(context.to_prompt_context())))
+
+    earlier = context.earlier_sessions
+    assert len(context.recent_sessions) == RECENT_WINDOW
+    assert len(earlier["topic_counts"]) <= MAX_TOPICS
+    assert earlier["mood"]["first"] == 1.0 and earlier["breakthrough_count"] == 32
+    assert max(sizes[20:]) - min(sizes[20:]) < 200  # Flat, not linear
+
+    print(f"✓ Context size flat at ~{sizes[-1]} bytes over 100 sessions")
+
+
+def test_readd_and_exclude():
+    """Test re-adding a windowed session replaces it and the analyzed session is excluded."""
+    context = CumulativeContext()
+    for number in range(1, 4):
+        context.add_session(_session(number), _deep(number))
+
+    context.add_session(_session(3, summary="Revised."), _deep(3))
+    assert context.sessions_included == 3
+    assert context.recent_sessions[-1]["wave1"]["summary"] == "Revised."
+
+    prompt = context.to_prompt_context(exclude_session_id="s3")
+    assert prompt["sessions_included"] == 2
+    assert all(e["wave1"]["session_id"] != "s3" for e in prompt["recent_sessions"])
+
+    print("✓ Re-adds replace and the current session is excluded")
+
+
+def test_folded_and_out_of_order_sessions_are_not_appended():
+    """Test a session folded into the summary, or older than the newest one, isn't appended again."""
+    context = CumulativeContext()
+    for number in (1, 2, 3, 5, 6):
+        assert context.add_session(_session(number), _deep(number))
+
+    assert not context.add_session(_session(1), _deep(1))  # Re-run after folding
+    assert not context.add_session(_session(4), _deep(4))  # Arrives after session 5
+    assert not context.add_session(_session(6, session_date="2025-01-099"), _deep(6))  # Date changed
+    assert context.sessions_included == 5
+    assert context.folded_sessions == [["2025-01-001", "s1"], ["2025-01-002", "s2"], ["2025-01-003", "s3"],
+                                       ["2025-01-005", "s5"], ["2025-01-006", "s6"]]
+
+    assert context.precedes(_session(7)) and context.precedes(_session(6))
+    assert not context.precedes(_session(4))
+
+    print("✓ Folded, moved and out-of-order sessions need a rebuild")
+
+
+def test_store_rebuilds_rerun_and_out_of_order_sessions():
+    """Test record_session rebuilds in date order instead of double-counting a session."""
+    sessions = [_session(n, deep_analysis=_deep(n)) for n in range(1, 7)]
+    db = FakeDB(sessions)
+    store = CumulativeContextStore(db)
+
+    async def run():
+        for number in (1, 2, 3, 5, 6):
+            await store.record_session(_session(number), _deep(number))
+        await store.record_session(_session(1, summary="Re-run."), _deep(1))
+        await store.record_session(_session(4), _deep(4))  # Late: lands between 3 and 5
+
+    asyncio.run(run())
+    stored = db.tables["patient_cumulative_context"]
+    assert len(stored) == 1
+    context = CumulativeContext.from_row(stored[0])
+    assert context.sessions_included == 6 and context.earlier_sessions["sessions"] == 3
+    assert [key[1] for key in context.folded_sessions] == ["s1", "s2", "s3", "s4", "s5", "s6"]
+    assert [e["wave1"]["session_id"] for e in context.recent_sessions] == ["s4", "s5", "s6"]
+    assert context.revision == 7
+
+    print("✓ Re-run and late sessions rebuild the context in date order")
+
+
+def test_reanalysis_gets_only_earlier_sessions():
+    """Test re-analyzing session 2 of 10 gets session 1 as context, not sessions 3-10."""
+    sessions = [_session(n, deep_analysis=_deep(n)) for n in range(1, 11)]
+    db = FakeDB(sessions)
+    store = CumulativeContextStore(db)
+
+    async def run():
+        for number in range(1, 11):
+            await store.record_session(_session(number), _deep(number))
+        return (
+            await store.load_prompt_context("p1", exclude_session_id="s2", session_date=_session(2)["session_date"]),
+            await store.load_prompt_context("p1", exclude_session_id="s11", session_date=_session(11)["session_date"]),
+        )
+
+    rerun, latest = asyncio.run(run())
+    assert rerun["sessions_included"] == 1
+    assert [e["wave1"]["session_id"] for e in rerun["recent_sessions"]] == ["s1"]
+    assert latest["sessions_included"] == 10  # Newest session still reads the stored row
+    assert CumulativeContext.from_row(db.tables["patient_cumulative_context"][0]).sessions_included == 10
+
+    print("✓ Re-analysis of an older session only sees the sessions before it")
+
+
+def test_concurrent_record_session_loses_no_updates():
+    """Test concurrent pipelines (separate stores) all land, in date order, one row per patient."""
+    db = FakeDB([_session(n, deep_analysis=_deep(n)) for n in range(1, 9)])
+
+    async def run():
+        await asyncio.gather(*(
+            CumulativeContextStore(db).record_session(_session(number), _deep(number))
+            for number in (3, 1, 8, 2, 5, 4, 7, 6)
+        ))
+
+    asyncio.run(run())
+    stored = db.tables["patient_cumulative_context"]
+    assert len(stored) == 1
+    context = CumulativeContext.from_row(stored[0])
+    assert [key[1] for key in context.folded_sessions] == [f"s{n}" for n in range(1, 9)]
+    assert context.sessions_included == 8
+
+    print("✓ Concurrent record_session calls are serialized per patient")
+
+
+def test_record_session_retries_on_concurrent_write():
+    """Test a write from another process between load and save is re-applied, not overwritten."""
+    db = FakeDB([_session(n, deep_analysis=_deep(n)) for n in range(1, 4)])
+    store = CumulativeContextStore(db)
+
+    async def run():
+        await store.record_session(_session(1), _deep(1))
+        other_process = CumulativeContext.from_row(db.tables["patient_cumulative_context"][0])
+        other_process.add_session(_session(2), _deep(2))
+        load_row = store._load_row
+
+        async def load_then_race(patient_id):
+            loaded = await load_row(patient_id)
+            if other_process.revision == 1:
+                await CumulativeContextStore(db).save("p1", other_process)  # Lands first
+            return loaded
+
+        with patch.object(store, "_load_row", load_then_race):
+            await store.record_session(_session(3), _deep(3))
+
+    asyncio.run(run())
+    context = CumulativeContext.from_row(db.tables["patient_cumulative_context"][0])
+    assert [key[1] for key in context.folded_sessions] == ["s1", "s2", "s3"]
+    assert ("patient_cumulative_context", "update") in db.log
+
+    print("✓ Lost compare-and-swap reloads and re-applies")
+
+
+def test_store_backfills_once_then_reads_one_row():
+    """Test the store backfills from history once, then does one read and one write per session."""
+    sessions = [_session(n, deep_analysis=_deep(n)) for n in (1, 2)] + [_session(3)]  # s3 has no Wave 2
+    db = FakeDB(sessions)
+    store = CumulativeContextStore(db)
+
+    async def run():
+        first = await store.load_prompt_context("p1", exclude_session_id="s4")
+        await store.record_session(_session(4), _deep(4))
+        db.log.clear()
+        await store.record_session(_session(5), _deep(5))
+        return first
+
+    first = asyncio.run(run())
+    assert [e["session_number"] for e in first["recent_sessions"]] == [1, 2]
+    assert db.log == [("patient_cumulative_context", "select"), ("patient_cumulative_context", "update")]
+    stored = db.tables["patient_cumulative_context"][0]
+    assert stored["sessions_included"] == 4 and stored["last_session_id"] == "s5"
+
+    print("✓ Store backfills once, then one read + one write per session")
+
+
+def test_deep_analyzer_reads_store():
+    """Test DeepAnalyzer uses the stored context when none is passed in."""
+    store = SimpleNamespace(load_prompt_context=AsyncMock(return_value={
+        "sessions_included": 1,
+        "recent_sessions": [{"session_number": 1, "wave1": {"summary": "Stored session one"}, "wave2": {}}],
+    }))
+    analyzer = DeepAnalyzer(api_key="cumulative-context-test-key", context_store=store)
+    response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))])
+
+    with patch.object(analyzer, "_create_chat_completion_async", AsyncMock(return_value=response)) as create, \
+            patch("app.services.deep_analyzer.track_generation_cost"):
+        asyncio.run(analyzer.analyze_session("s2", {"patient_id": "p1", "transcript": []}))
+
+    store.load_prompt_context.assert_awaited_once_with("p1", exclude_session_id="s2", session_date=None)
+    prompt = create.call_args.kwargs["messages"][1]["content"]
+    assert '"summary": "Stored session one"' in prompt
+
+    print("✓ DeepAnalyzer reads the stored cumulative context")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Cumulative Context Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_window_and_summary,
+        test_context_size_is_bounded,
+        test_readd_and_exclude,
+        test_folded_and_out_of_order_sessions_are_not_appended,
+        test_store_backfills_once_then_reads_one_row,
+        test_store_rebuilds_rerun_and_out_of_order_sessions,
+        test_reanalysis_gets_only_earlier_sessions,
+        test_concurrent_record_session_loses_no_updates,
+        test_record_session_retries_on_concurrent_write,
+        test_deep_analyzer_reads_store,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
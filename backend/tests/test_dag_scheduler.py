@@ -0,0 +1,188 @@
+"""
+Test suite for the DAG scheduler
+
+Tests that nodes start as soon as their inputs exist, that failed deps skip
+dependents while "after" predecessors only order them, the critical path,
+graph validation, and that the orchestrator returns its session DAG timings.
+Run with: python -m pytest backend/tests/test_dag_scheduler.py -v
+Or directly: python backend/tests/test_dag_scheduler.py
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, patch
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services import dag_scheduler
+from app.services.dag_scheduler import DagScheduler, load_report, save_report
+from tests.test_session_snapshot import FakeDB, _orchestrator, _prose
+
+
+def _sleeper(seconds, events=None, name=None, result=None):
+    async def run():
+        if events is not None:
+            events.append(f"start:{name}")
+        await asyncio.sleep(seconds)
+        if events is not None:
+            events.append(f"end:{name}")
+        return result
+    return run
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_nodes_start_when_inputs_exist():
+    """Test a node waits only for its own predecessors, not a whole wave."""
+    events = []
+    scheduler = DagScheduler()
+    scheduler.add("slow", _sleeper(0.05, events, "slow"))
+    scheduler.add("fast", _sleeper(0.0, events, "fast", result="topics"))
+    scheduler.add("needs_fast", _sleeper(0.0, events, "needs_fast"), deps=("fast",))
+
+    report = asyncio.run(scheduler.run())
+
+    assert report.status == "completed"
+    assert events.index("start:needs_fast") < events.index("end:slow")
+    assert scheduler.results["fast"] == "topics"
+    assert report.wall_ms < report.serial_ms + 50
+
+    print("✓ Nodes start as soon as their inputs exist")
+
+
+def test_failed_deps_skip_but_after_only_orders():
+    """Test a failed dep skips its dependents while an 'after' edge only orders."""
+    async def fail():
+        raise RuntimeError("LLM unavailable")
+
+    scheduler = DagScheduler()
+    scheduler.add("deep:1", fail)
+    scheduler.add("prose:1", _sleeper(0), deps=("deep:1",))
+    scheduler.add("deep:2", _sleeper(0), after=("deep:1",))
+
+    report = asyncio.run(scheduler.run())
+    nodes = report.nodes
+
+    assert nodes["deep:1"].status == "failed" and nodes["deep:1"].error == "LLM unavailable"
+    assert nodes["prose:1"].status == "skipped" and nodes["prose:1"].started_ms is None
+    assert nodes["deep:2"].status == "completed"
+    assert nodes["deep:2"].started_ms >= nodes["deep:1"].finished_ms
+    assert report.status == "failed"
+
+    print("✓ Failed deps skip dependents; 'after' only orders")
+
+
+def test_critical_path_and_persistence():
+    """Test the critical path follows the predecessor each node waited on, and reports round-trip."""
+    updates = []
+    scheduler = DagScheduler(on_update=lambda report: updates.append(report.status))
+    scheduler.add("mood", _sleeper(0.01))
+    scheduler.add("topics", _sleeper(0.06))
+    scheduler.add("deep", _sleeper(0.01), deps=("mood", "topics"))
+    scheduler.add("summary", _sleeper(0.0), after=("topics",))
+
+    report = asyncio.run(scheduler.run())
+    assert report.critical_path == ["topics", "deep"]
+    assert report.critical_path_ms >= 60
+    assert updates[0] == "running" and updates[-1] == "completed"
+
+    original_dir = dag_scheduler.REPORT_DIR
+    dag_scheduler.REPORT_DIR = original_dir / "test_dag_scheduler"
+    try:
+        save_report("patient-1", report, phase="wave2")
+        saved = load_report("patient-1")
+        assert saved["phase"] == "wave2" and saved["critical_path"] == ["topics", "deep"]
+        assert saved["nodes"]["deep"]["deps"] == ["mood", "topics"]
+        assert load_report("missing") is None
+    finally:
+        for path in dag_scheduler.REPORT_DIR.glob("*"):
+            path.unlink()
+        dag_scheduler.REPORT_DIR.rmdir()
+        dag_scheduler.REPORT_DIR = original_dir
+
+    print(f"✓ Critical path {' → '.join(report.critical_path)} ({report.critical_path_ms:.0f}ms)")
+
+
+def test_invalid_graphs_are_rejected():
+    """Test duplicate nodes, unknown predecessors and cycles raise before running."""
+    scheduler = DagScheduler()
+    scheduler.add("a", _sleeper(0))
+    try:
+        scheduler.add("a", _sleeper(0))
+        assert False, "expected duplicate error"
+    except ValueError:
+        pass
+
+    for edges in ({"b": ("missing",)}, {"b": ("c",), "c": ("b",)}):
+        scheduler = DagScheduler()
+        for name, deps in edges.items():
+            scheduler.add(name, _sleeper(0), deps=deps)
+        try:
+            asyncio.run(scheduler.run())
+            assert False, f"expected invalid graph error for {edges}"
+        except ValueError:
+            pass
+
+    print("✓ Invalid graphs are rejected")
+
+
+def test_orchestrator_returns_session_timings():
+    """Test the full pipeline runs as a DAG and returns per-node timings."""
+    db = FakeDB()
+    orchestrator = _orchestrator(db)
+
+    with patch("app.services.analysis_orchestrator.ProseGenerator") as prose_generator:
+        prose_generator.return_value.generate_prose = AsyncMock(return_value=_prose())
+        status = asyncio.run(orchestrator.process_session_full_pipeline("s1"))
+
+    timings = status.timings
+    assert timings["status"] == "completed"
+    assert set(timings["nodes"]) == {"mood", "topics", "breakthrough", "action_summary", "deep", "prose"}
+    assert timings["nodes"]["prose"]["deps"] == ["deep"]
+    assert timings["critical_path"][-2:] == ["deep", "prose"]
+
+    print(f"✓ Orchestrator timings: critical path {' → '.join(timings['critical_path'])}")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("DAG Scheduler Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_nodes_start_when_inputs_exist,
+        test_failed_deps_skip_but_after_only_orders,
+        test_critical_path_and_persistence,
+        test_invalid_graphs_are_rejected,
+        test_orchestrator_returns_session_timings,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,210 @@
+"""
+Test suite for the in-process demo seeding pool
+
+Tests stages running in order with structured progress, failed and timed-out
+stages not blocking later ones, one pipeline per patient, the bound on
+concurrent pipelines, and stop/resume, using fake stage functions.
+Run with: python -m pytest backend/tests/test_demo_seeding.py -v
+Or directly: python backend/tests/test_demo_seeding.py
+"""
+
+import asyncio
+import os
+import sys
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.demo_seeding import TRANSCRIPTS, WAVE1, WAVE2, DemoSeedingPool
+
+
+def _stage(name, log, sessions=2, delay=0.0, error=None):
+    async def run(patient_id, report, **options):
+        log.append((patient_id, name, options))
+        for number in range(1, sessions + 1):
+            await asyncio.sleep(delay)
+            report(completed=number, total=sessions, status="complete", session_id=f"{patient_id}-{number}")
+        if error:
+            raise RuntimeError(error)
+    return run
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_stages_run_in_order_with_progress():
+    """Test stages run in order, get the pipeline options, and report structured progress."""
+    log, events = [], []
+    pool = DemoSeedingPool(stages={
+        TRANSCRIPTS: _stage(TRANSCRIPTS, log),
+        WAVE1: _stage(WAVE1, log),
+        WAVE2: _stage(WAVE2, log),
+    })
+
+    async def scenario():
+        run = pool.start("p1", (TRANSCRIPTS, WAVE1, WAVE2), on_progress=events.append, force=False)
+        assert pool.is_running("p1")
+        await run.task
+        return run
+
+    run = asyncio.run(scenario())
+
+    assert [name for _, name, _ in log] == [TRANSCRIPTS, WAVE1, WAVE2]
+    assert all(options == {"force": False} for _, _, options in log)
+    assert run.completed_stages == [TRANSCRIPTS, WAVE1, WAVE2] and not pool.is_running("p1")
+
+    wave1 = [(e.status, e.completed, e.total) for e in events if e.stage == WAVE1]
+    assert wave1 == [("started", 0, 0), ("progress", 1, 2), ("progress", 2, 2), ("complete", 2, 2)]
+    assert events[1].session_id == "p1-1"
+    assert pool.progress("p1")[WAVE2]["status"] == "complete"
+
+    print("✓ Stages run in order with progress")
+
+
+def test_failed_and_timed_out_stages_do_not_block_later_ones():
+    """Test a failing or timed-out stage is reported and the pipeline moves on."""
+    log, events = [], []
+    pool = DemoSeedingPool(
+        stages={
+            TRANSCRIPTS: _stage(TRANSCRIPTS, log, error="missing file"),
+            WAVE1: _stage(WAVE1, log, sessions=5, delay=0.05),
+            WAVE2: _stage(WAVE2, log),
+        },
+        timeouts={WAVE1: 0.01}
+    )
+
+    async def scenario():
+        run = pool.start("p1", (TRANSCRIPTS, WAVE1, WAVE2), on_progress=events.append)
+        await run.task
+        return run
+
+    run = asyncio.run(scenario())
+
+    assert run.failed_stages == [TRANSCRIPTS, WAVE1] and run.completed_stages == [WAVE2]
+    failures = {e.stage: e.error for e in events if e.status == "failed"}
+    assert failures[TRANSCRIPTS] == "missing file"
+    assert "Timed out" in failures[WAVE1]
+
+    print("✓ Failed and timed-out stages do not block later ones")
+
+
+def test_one_pipeline_per_patient_and_bounded_pipelines():
+    """Test a second start for a busy patient is deduplicated and pipelines beyond the bound wait."""
+    log = []
+    in_flight, peak = [], []
+
+    async def tracked(patient_id, report, **options):
+        in_flight.append(patient_id)
+        peak.append(len(in_flight))
+        log.append(patient_id)
+        await asyncio.sleep(0.02)
+        in_flight.remove(patient_id)
+
+    pool = DemoSeedingPool(max_pipelines=2, stages={WAVE1: tracked})
+
+    async def scenario():
+        first = pool.start("p1", (WAVE1,))
+        assert pool.start("p1", (WAVE1,)) is first
+        runs = [first] + [pool.start(f"p{number}", (WAVE1,)) for number in range(2, 6)]
+        await asyncio.gather(*(run.task for run in runs))
+
+    asyncio.run(scenario())
+
+    assert sorted(log) == ["p1", "p2", "p3", "p4", "p5"]
+    assert max(peak) == 2
+
+    print("✓ One pipeline per patient; pipelines are bounded")
+
+
+def test_stop_cancels_and_resume_restarts():
+    """Test stop() cancels the running stage, skips later ones, and a new start resumes."""
+    log, events = [], []
+    started = None
+
+    async def slow_wave1(patient_id, report, **options):
+        log.append((patient_id, WAVE1, options))
+        started.set()
+        await asyncio.sleep(10)
+
+    pool = DemoSeedingPool(stages={WAVE1: slow_wave1, WAVE2: _stage(WAVE2, log)})
+
+    async def scenario():
+        nonlocal started
+        started = asyncio.Event()
+        run = pool.start("p1", (WAVE1, WAVE2), on_progress=events.append)
+        await started.wait()
+
+        terminated = await pool.stop("p1")
+        assert terminated == [WAVE1]
+        assert run.task.cancelled() and not pool.is_running("p1")
+        assert await pool.stop("p1") == []
+
+        resumed = pool.start("p1", (WAVE2,))
+        await resumed.task
+        return resumed
+
+    resumed = asyncio.run(scenario())
+
+    assert [name for _, name, _ in log] == [WAVE1, WAVE2]
+    assert any(e.stage == WAVE1 and e.status == "stopped" for e in events)
+    assert resumed.completed_stages == [WAVE2]
+
+    print("✓ Stop cancels; resume restarts")
+
+
+def test_unknown_stage_is_rejected():
+    """Test starting an unknown stage raises before anything runs."""
+    pool = DemoSeedingPool(stages={WAVE1: _stage(WAVE1, [])})
+
+    async def scenario():
+        try:
+            pool.start("p1", (WAVE1, "wave3"))
+        except ValueError:
+            return True
+        return False
+
+    assert asyncio.run(scenario())
+    assert not pool.is_running("p1")
+
+    print("✓ Unknown stages are rejected")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Demo Seeding Pool Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_stages_run_in_order_with_progress,
+        test_failed_and_timed_out_stages_do_not_block_later_ones,
+        test_one_pipeline_per_patient_and_bounded_pipelines,
+        test_stop_cancels_and_resume_restarts,
+        test_unknown_stage_is_rejected,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,247 @@
+"""
+Test suite for delta-sync polling of /api/demo/status
+
+Tests that a poll with ?since=<cursor> returns only sessions whose status
+changed, sends prose/deep analysis only when Wave 2 advanced (fetched for
+those sessions alone), reports removed sessions, falls back to a full
+response for a bad cursor, and never reads whole transcripts, using the real
+app with a recording fake of the async Supabase client.
+Run with: python -m pytest backend/tests/test_demo_status_delta.py -v
+Or directly: python backend/tests/test_demo_status_delta.py
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database import get_async_db
+from app.main import app
+from app.middleware.demo_auth import require_demo_auth
+from app.middleware.response_cache import reset_response_cache, set_response_cache
+from app.routers.demo import decode_status_cursor, encode_status_cursor, session_watermark
+
+PROSE = "The patient described a week of steady progress. " * 60
+DEEP = {"progressIndicators": {"symptomReduction": "moderate"}, "notes": ["x" * 400] * 5}
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.columns = ""
+        self.ids = None
+
+    def select(self, columns, *args, **kwargs):
+        self.columns = columns
+        return self
+
+    def in_(self, column, values):
+        self.ids = list(values)
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        self.db.queries.append((self.table, self.columns, self.ids))
+        if self.table == "patients":
+            return SimpleNamespace(data={"id": "p1"})
+        if self.table == "patient_roadmap":
+            return SimpleNamespace(data=[])
+        fields = [column.strip() for column in self.columns.split(",")]
+        rows = [row for row in self.db.rows if self.ids is None or row["id"] in self.ids]
+        return SimpleNamespace(data=[
+            {field.split(":")[0]: self.db.column(row, field) for field in fields} for row in rows
+        ])
+
+
+class FakeDB:
+    def __init__(self, count=4):
+        self.queries = []
+        self.rows = [
+            {"id": f"s{n}", "session_date": f"2026-01-{n + 10:02d}", "transcript": [], "topics": None,
+             "mood_score": None, "summary": None, "technique": None, "action_items": None,
+             "topics_extracted_at": None, "mood_analyzed_at": None, "deep_analyzed_at": None,
+             "prose_generated_at": None, "prose_analysis": None, "deep_analysis": None}
+            for n in range(count)
+        ]
+
+    @staticmethod
+    def column(row, field):
+        if ":" in field:
+            # transcript_head:transcript->0
+            transcript = row["transcript"]
+            return transcript[0] if transcript else None
+        return row[field]
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def wave1(self, index):
+        self.rows[index].update({
+            "transcript": [{"speaker": "SPEAKER_00", "text": "Hello " * 2000}] * 50,
+            "topics": ["Sleep", "Work"], "mood_score": 6.0, "summary": "Discussed sleep.",
+            "technique": "CBT", "action_items": ["Journal"],
+            "topics_extracted_at": f"2026-02-01T10:0{index}:00", "mood_analyzed_at": f"2026-02-01T10:0{index}:00",
+        })
+
+    def wave2(self, index):
+        self.rows[index].update({
+            "deep_analysis": DEEP, "deep_analyzed_at": f"2026-02-01T11:0{index}:00",
+            "prose_analysis": PROSE, "prose_generated_at": f"2026-02-01T11:0{index}:30",
+        })
+
+    def session_queries(self):
+        return [query for query in self.queries if query[0] == "therapy_sessions"]
+
+
+def _client(db):
+    app.dependency_overrides = {
+        get_async_db: lambda: db,
+        require_demo_auth: lambda: {"id": "u1", "demo_token": "t1", "demo_expires_at": "2099-01-01T00:00:00+00:00",
+                                    "created_at": "2026-01-01T00:00:00+00:00"},
+    }
+    set_response_cache(None)
+    return TestClient(app)
+
+
+def _status(client, since=None):
+    response = client.get("/api/demo/status", params={"since": since} if since else None)
+    assert response.status_code == 200, response.text
+    return response.json(), len(response.content)
+
+
+def teardown_function(function):
+    """Restore the app's dependencies and the settings-driven cache."""
+    app.dependency_overrides = {}
+    reset_response_cache()
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_full_response_and_unchanged_delta():
+    """Test the full response carries a cursor and an unchanged poll carries no sessions."""
+    db = FakeDB()
+    db.wave1(0)
+    db.wave2(0)
+    client = _client(db)
+
+    full, full_bytes = _status(client)
+    assert not full["delta"] and len(full["sessions"]) == 4 and full["cursor"]
+    first = full["sessions"][0]
+    assert first["has_transcript"] and first["prose_analysis"] == PROSE and first["deep_analysis"] == DEEP
+    assert (full["wave1_complete"], full["wave2_complete"]) == (1, 1)
+    # Transcript presence comes from its first segment; the column is never read whole
+    assert all("transcript," not in columns + "," for _, columns, _ in db.session_queries())
+
+    db.queries.clear()
+    delta, delta_bytes = _status(client, full["cursor"])
+    assert delta["delta"] and delta["sessions"] == [] and delta["removed_session_ids"] == []
+    assert delta["cursor"] == full["cursor"] and delta["wave2_complete"] == 1 and delta["session_count"] == 4
+    assert len(db.session_queries()) == 1 and "prose_analysis" not in db.session_queries()[0][1]
+    assert delta_bytes < full_bytes / 4
+
+    print(f"✓ Unchanged poll: {full_bytes} bytes full → {delta_bytes} bytes delta")
+
+
+def test_delta_sends_changed_sessions_and_wave2_only_when_advanced():
+    """Test Wave 1 / Wave 2 progress arrives as deltas, heavy fields only when Wave 2 moved."""
+    db = FakeDB()
+    client = _client(db)
+    cursor = _status(client)[0]["cursor"]
+
+    db.wave1(1)
+    delta, _ = _status(client, cursor)
+    assert [s["session_id"] for s in delta["sessions"]] == ["s1"]
+    assert delta["sessions"][0]["changed_since_last_poll"] and delta["sessions"][0]["topics"] == ["Sleep", "Work"]
+    assert delta["wave1_complete"] == 1 and delta["analysis_status"] == "processing"
+    cursor = delta["cursor"]
+
+    db.queries.clear()
+    db.wave1(2)
+    db.wave2(1)
+    delta, _ = _status(client, cursor)
+    by_id = {s["session_id"]: s for s in delta["sessions"]}
+    assert sorted(by_id) == ["s1", "s2"]
+    assert by_id["s1"]["prose_analysis"] == PROSE and by_id["s1"]["unchanged_fields"] is None
+    assert by_id["s2"]["prose_analysis"] is None and not by_id["s2"]["wave2_complete"]
+    heavy = [query for query in db.session_queries() if query[2] is not None]
+    assert len(heavy) == 1 and heavy[0][2] == ["s1"]
+    cursor = delta["cursor"]
+
+    # A Wave 1 change on a Wave 2-complete session leaves its prose out
+    db.rows[1]["summary"] = "Revised summary."
+    delta, _ = _status(client, cursor)
+    session = delta["sessions"][0]
+    assert session["summary"] == "Revised summary." and session["wave2_complete"]
+    assert session["prose_analysis"] is None and session["unchanged_fields"] == ["prose_analysis", "deep_analysis"]
+
+    print("✓ Deltas carry changed sessions; Wave 2 output only when it advanced")
+
+
+def test_removed_sessions_and_bad_cursors():
+    """Test removed sessions are reported and bad cursors get a full response."""
+    db = FakeDB()
+    client = _client(db)
+    cursor = _status(client)[0]["cursor"]
+
+    removed = db.rows.pop()
+    delta, _ = _status(client, cursor)
+    assert delta["removed_session_ids"] == [removed["id"]] and delta["sessions"] == []
+
+    for bad in ("not-a-cursor", encode_status_cursor({})[:-3] + "!!", "eyJ2IjogOTl9"):
+        response, _ = _status(client, bad)
+        assert not response["delta"] and len(response["sessions"]) == 3
+
+    watermarks = {"s0": session_watermark(db.rows[0])}
+    assert decode_status_cursor(encode_status_cursor(watermarks)) == watermarks
+    assert decode_status_cursor("eyJ2IjogOTl9") is None  # {"v": 99}
+
+    print("✓ Removed sessions reported; bad cursors fall back to a full response")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Demo Status Delta Sync Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_full_response_and_unchanged_delta,
+        test_delta_sends_changed_sessions_and_wave2_only_when_advanced,
+        test_removed_sessions_and_bad_cursors,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+        finally:
+            teardown_function(test)
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
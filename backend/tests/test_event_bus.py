@@ -0,0 +1,458 @@
+"""
+Test suite for the pipeline event bus
+
+Tests in-process fan-out, cross-thread delivery latency, batched "consumed"
+acknowledgement, the push-based SSE generator, and PipelineLogger writing
+events off the caller's thread, using the local transport (no database
+required).
+Run with: python -m pytest backend/tests/test_event_bus.py -v
+Or directly: python backend/tests/test_event_bus.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.utils.event_bus import (
+    ConsumedAcknowledger,
+    EventBus,
+    LocalTransport,
+    PostgresNotifyTransport,
+    set_event_bus,
+)
+from app.utils.pipeline_logger import get_event_writer
+
+
+def _event(event_id=None, patient_id="patient-1", event="COMPLETE"):
+    return {
+        "id": event_id,
+        "patient_id": patient_id,
+        "session_id": "session-1",
+        "session_date": "2025-01-10",
+        "phase": "WAVE1",
+        "event": event,
+        "status": "success",
+        "message": "",
+        "metadata": {},
+    }
+
+
+class RecordingAckWriter:
+    """Acknowledgement writer that records batches instead of updating rows."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, event_ids):
+        self.batches.append(sorted(event_ids))
+
+
+class FakeRequest:
+    """Minimal stand-in for a Starlette request."""
+
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_fan_out_to_all_subscribers():
+    """Test one publish reaches every subscriber of that patient only."""
+    async def run():
+        bus = EventBus(LocalTransport(), acknowledger=ConsumedAcknowledger(writer=RecordingAckWriter()))
+        first = bus.subscribe("patient-1")
+        second = bus.subscribe("patient-1")
+        other = bus.subscribe("patient-2")
+
+        bus.publish(_event(1))
+
+        assert (await asyncio.wait_for(first.get(), 1))["id"] == 1
+        assert (await asyncio.wait_for(second.get(), 1))["id"] == 1
+        assert other.empty()
+
+        bus.unsubscribe("patient-1", first)
+        assert bus.broker.subscriber_count("patient-1") == 1
+        assert bus.get_stats()["delivered"] == 2
+
+    asyncio.run(run())
+
+    print("✓ Events fan out to all subscribers")
+
+
+def test_cross_thread_publish_latency():
+    """Test events published from a worker thread arrive in well under 50ms."""
+    async def run():
+        bus = EventBus(LocalTransport(), acknowledger=ConsumedAcknowledger(writer=RecordingAckWriter()))
+        queue = bus.subscribe("patient-1")
+        latencies = []
+
+        for i in range(20):
+            published_at = {}
+
+            def publish():
+                published_at["t"] = time.perf_counter()
+                bus.publish(_event(i))
+
+            threading.Thread(target=publish).start()
+            await asyncio.wait_for(queue.get(), 1)
+            latencies.append(time.perf_counter() - published_at["t"])
+
+        return latencies
+
+    latencies = asyncio.run(run())
+    assert max(latencies) < 0.05, f"max latency {max(latencies) * 1000:.1f}ms"
+
+    print(f"✓ Cross-thread delivery p100 {max(latencies) * 1000:.2f}ms")
+
+
+def test_slow_subscriber_drops_oldest():
+    """Test a full subscriber queue drops its oldest event instead of blocking."""
+    async def run():
+        bus = EventBus(LocalTransport(), acknowledger=ConsumedAcknowledger(writer=RecordingAckWriter()))
+        bus.broker.max_queue_size = 2
+        queue = bus.subscribe("patient-1")
+
+        for i in range(3):
+            bus.publish(_event(i))
+
+        assert [queue.get_nowait()["id"], queue.get_nowait()["id"]] == [1, 2]
+        assert bus.get_stats()["dropped"] == 1
+
+    asyncio.run(run())
+
+    print("✓ Slow subscribers drop oldest events")
+
+
+def test_acknowledgements_are_batched():
+    """Test many acknowledgements become a single UPDATE per batch."""
+    writer = RecordingAckWriter()
+
+    async def run():
+        ack = ConsumedAcknowledger(flush_interval=0.05, batch_size=100, writer=writer)
+        for event_id in range(10):
+            ack.ack(event_id)
+        ack.ack(None)  # In-memory fallback events have no row id
+        await asyncio.sleep(0.2)
+
+        ack.batch_size = 3
+        for event_id in range(10, 16):
+            ack.ack(event_id)
+        await ack.flush()
+        return ack
+
+    ack = asyncio.run(run())
+
+    assert writer.batches[0] == list(range(10))
+    assert sum(len(b) for b in writer.batches) == 16
+    assert all(len(b) <= 3 for b in writer.batches[1:])
+    assert ack.acknowledged == 16
+
+    print("✓ Acknowledgements are batched")
+
+
+def test_idle_sse_client_issues_no_queries():
+    """Test the SSE generator replays the backlog once, then only awaits pushes."""
+    from app.routers import sse
+
+    writer = RecordingAckWriter()
+    bus = EventBus(LocalTransport(), acknowledger=ConsumedAcknowledger(flush_interval=0.01, writer=writer))
+    set_event_bus(bus)
+    fetches = []
+
+    async def fake_fetch(patient_id):
+        fetches.append(patient_id)
+        return [_event(1, event="START")]
+
+    async def run():
+        request = FakeRequest()
+        gen = sse.event_generator("patient-1", request)
+
+        connected = json.loads((await gen.__anext__())[len("data: "):])
+        assert connected["event"] == "connected"
+        backlog = json.loads((await gen.__anext__())[len("data: "):])
+        assert backlog["event"] == "START"
+        assert "id" not in backlog
+
+        # Idle: a keepalive arrives without touching the database
+        assert (await gen.__anext__()).startswith(": keepalive")
+
+        # Duplicate of the replayed row is skipped; the new event is pushed
+        bus.publish(_event(1, event="START"))
+        bus.publish(_event(2, event="COMPLETE"))
+        start = time.perf_counter()
+        pushed = json.loads((await gen.__anext__())[len("data: "):])
+        assert pushed["event"] == "COMPLETE"
+        assert time.perf_counter() - start < 0.05
+
+        await gen.aclose()
+        await asyncio.sleep(0.05)
+
+    try:
+        with patch.object(sse, "_fetch_unconsumed_events", fake_fetch), \
+                patch.object(sse.settings, "sse_keepalive_seconds", 0.05):
+            asyncio.run(run())
+    finally:
+        set_event_bus(None)
+
+    assert fetches == ["patient-1"]
+    assert bus.broker.subscriber_count() == 0
+    assert sorted(sum(writer.batches, [])) == [1, 2]
+
+    print("✓ Idle SSE clients issue no database queries")
+
+
+def test_pipeline_logger_publishes_once():
+    """Test PipelineLogger publishes each persisted event once with its row id."""
+    from unittest.mock import MagicMock
+    from app.utils.pipeline_logger import PipelineLogger, LogPhase, LogEvent
+
+    published = []
+
+    class CapturingTransport(LocalTransport):
+        def publish(self, event):
+            published.append(event)
+
+    set_event_bus(EventBus(CapturingTransport()))
+    db = MagicMock()
+    db.table.return_value.insert.return_value.execute.return_value.data = [
+        {"id": 42, "created_at": "2026-01-03T00:00:00Z"}
+    ]
+
+    try:
+        with patch("app.database.get_supabase", return_value=db):
+            logger = PipelineLogger("patient-bus-test", LogPhase.WAVE1)
+            logger.log_event(LogEvent.MOOD_ANALYSIS, session_id="session-1", details={"mood": 6})
+            assert get_event_writer().flush(5)
+    finally:
+        set_event_bus(None)
+        try:
+            logger.log_file.unlink()
+        except Exception:
+            pass
+
+    assert len(published) == 1
+    assert published[0]["id"] == 42
+    assert published[0]["event"] == "MOOD_ANALYSIS"
+    assert published[0]["metadata"] == {"mood": 6}
+
+    print("✓ PipelineLogger publishes once")
+
+
+def test_pipeline_logger_does_not_block_on_writes():
+    """Test log_event returns before the slow insert, and events are written in order in batches."""
+    from unittest.mock import MagicMock
+    from app.utils.pipeline_logger import PipelineLogger, LogPhase, LogEvent
+
+    published, inserts = [], []
+
+    class CapturingTransport(LocalTransport):
+        def publish(self, event):
+            published.append(event)
+
+    def slow_insert(rows):
+        inserts.append(len(rows))
+        time.sleep(0.2)  # A database round trip
+        response = MagicMock()
+        response.execute.return_value.data = [{"id": len(published) + index} for index in range(len(rows))]
+        return response
+
+    set_event_bus(EventBus(CapturingTransport()))
+    db = MagicMock()
+    db.table.return_value.insert.side_effect = slow_insert
+
+    try:
+        with patch("app.database.get_supabase", return_value=db):
+            logger = PipelineLogger("patient-writer-test", LogPhase.WAVE2)
+            start = time.perf_counter()
+            for number in range(5):
+                logger.log_event(LogEvent.DEEP_ANALYSIS, session_id=f"session-{number}")
+            elapsed = time.perf_counter() - start
+            assert get_event_writer().flush(5)
+    finally:
+        set_event_bus(None)
+        try:
+            logger.log_file.unlink()
+        except Exception:
+            pass
+
+    assert elapsed < 0.1
+    assert [event["session_id"] for event in published] == [f"session-{n}" for n in range(5)]
+    assert sum(inserts) == 5 and len(inserts) <= 2  # The first event alone, the rest batched
+
+    print("✓ PipelineLogger writes off the caller's thread")
+
+
+def test_postgres_payload_is_truncated():
+    """Test oversized NOTIFY payloads drop metadata instead of failing."""
+    transport = PostgresNotifyTransport("postgresql://unused")
+    sent = []
+
+    class FakeCursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+        def execute(self, sql, params):
+            sent.append(params)
+
+    class FakeConn:
+        closed = False
+        autocommit = False
+
+        def cursor(self):
+            return FakeCursor()
+
+    transport._publish_conn = FakeConn()
+    with patch.dict(sys.modules, {"psycopg2": object()}):
+        transport.publish({**_event(1), "metadata": {"blob": "x" * 10_000}})
+        transport.flush()
+    transport.stop()
+
+    channel, payload = sent[0]
+    assert channel == "pipeline_events"
+    assert json.loads(payload)["metadata"] == {"truncated": True}
+
+    print("✓ Oversized NOTIFY payloads are truncated")
+
+
+def test_postgres_publish_does_not_block():
+    """Test publish() hands the NOTIFY to the sender thread instead of waiting on it."""
+    transport = PostgresNotifyTransport("postgresql://unused")
+    sent = []
+
+    class SlowCursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+        def execute(self, sql, params):
+            time.sleep(0.1)
+            sent.append(params)
+
+    class FakeConn:
+        closed = False
+        autocommit = False
+
+        def cursor(self):
+            return SlowCursor()
+
+    transport._publish_conn = FakeConn()
+    with patch.dict(sys.modules, {"psycopg2": object()}):
+        start = time.perf_counter()
+        for i in range(3):
+            transport.publish(_event(i))
+        elapsed = time.perf_counter() - start
+        transport.flush()
+    transport.stop()
+
+    assert elapsed < 0.05
+    assert [json.loads(payload)["id"] for _, payload in sent] == [0, 1, 2]
+
+    print("✓ Postgres publish does not block the caller")
+
+
+def test_sse_dedupe_is_bounded():
+    """Test replayed ids are forgotten once live events pass the backlog high-water mark."""
+    from app.routers import sse
+
+    bus = EventBus(LocalTransport(), acknowledger=ConsumedAcknowledger(writer=RecordingAckWriter()))
+    set_event_bus(bus)
+
+    def stamped(event_id, created_at, event="COMPLETE"):
+        return {**_event(event_id, event=event), "created_at": created_at}
+
+    async def fake_fetch(patient_id):
+        return [stamped("a", "2026-01-03T00:00:01Z", "START"), stamped("b", "2026-01-03T00:00:02Z", "START")]
+
+    async def run():
+        gen = sse.event_generator("patient-1", FakeRequest())
+        await gen.__anext__()  # connected
+        await gen.__anext__()
+        await gen.__anext__()
+
+        bus.publish(stamped("a", "2026-01-03T00:00:01Z", "START"))  # duplicate
+        bus.publish(stamped("c", "2026-01-03T00:00:03Z"))  # past the high-water mark
+        pushed = json.loads((await gen.__anext__())[len("data: "):])
+        assert pushed["event"] == "COMPLETE"
+
+        locals_ = gen.ag_frame.f_locals
+        assert locals_["replayed_ids"] == set()
+
+        # A late duplicate of "b" can't happen once "c" (newer) was delivered;
+        # live events are never remembered
+        for i in range(50):
+            bus.publish(stamped(f"live-{i}", f"2026-01-03T00:01:{i:02d}Z"))
+        for _ in range(50):
+            await gen.__anext__()
+        assert gen.ag_frame.f_locals["replayed_ids"] == set()
+        await gen.aclose()
+
+    try:
+        with patch.object(sse, "_fetch_unconsumed_events", fake_fetch), \
+                patch.object(sse.settings, "sse_keepalive_seconds", 1):
+            asyncio.run(run())
+    finally:
+        set_event_bus(None)
+
+    print("✓ SSE dedupe state is bounded by the backlog")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Event Bus Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_fan_out_to_all_subscribers,
+        test_cross_thread_publish_latency,
+        test_slow_subscriber_drops_oldest,
+        test_acknowledgements_are_batched,
+        test_idle_sse_client_issues_no_queries,
+        test_pipeline_logger_publishes_once,
+        test_pipeline_logger_does_not_block_on_writes,
+        test_postgres_payload_is_truncated,
+        test_postgres_publish_does_not_block,
+        test_sse_dedupe_is_bounded,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,271 @@
+"""
+Test suite for the durable job queue and job worker
+
+Tests idempotent (session, wave) keys, exclusive claims and redelivery after
+a lease expires, retries up to max_attempts, checkpointed state surviving
+redelivery, the worker running, retrying and heartbeating jobs, that
+heartbeats hold a lease while a handler blocks the worker's event loop, and
+that workers' schedules queue one aggregates sweep per interval.
+Run with: python -m pytest backend/tests/test_job_queue.py -v
+Or directly: python backend/tests/test_job_queue.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.job_queue import COMPLETED, FAILED, QUEUED, RUNNING, SQLiteJobQueue, job_key
+from app.services.job_worker import JobWorker
+
+
+def _queue(tmp, **kwargs):
+    return SQLiteJobQueue(Path(tmp) / "jobs.sqlite3", **kwargs)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_enqueue_is_idempotent_per_session_and_wave():
+    """Test an active key is not queued twice, other waves are separate, and finished keys re-queue."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = _queue(tmp)
+        key = job_key("s1", "full_pipeline")
+
+        first, created = queue.enqueue("full_pipeline", key, {"session_id": "s1"})
+        again, created_again = queue.enqueue("full_pipeline", key, {"session_id": "s1"})
+        _, other_wave = queue.enqueue("wave1", job_key("s1", "wave1"))
+
+        assert created and not created_again and other_wave
+        assert again.key == first.key == "s1:full_pipeline"
+        assert queue.stats() == {QUEUED: 2}
+
+        job = queue.claim("w1", ["full_pipeline"])
+        queue.enqueue("full_pipeline", key)  # Running: still deduplicated
+        assert queue.complete(job.key, "w1", {"ok": True})
+        _, requeued = queue.enqueue("full_pipeline", key)
+        assert requeued and queue.get(key).status == QUEUED
+
+    print("✓ Enqueue is idempotent per (session, wave)")
+
+
+def test_claims_are_exclusive_and_expired_leases_redeliver():
+    """Test a job is leased to one worker and redelivered once its lease expires."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = _queue(tmp, visibility_timeout=0.05)
+        other = _queue(tmp, visibility_timeout=0.05)  # Second connection, as in another process
+        queue.enqueue("wave1", "s1:wave1")
+
+        job = queue.claim("w1", ["wave1"])
+        assert job.status == RUNNING and job.attempts == 1
+        assert other.claim("w2", ["wave1"]) is None
+        assert queue.claim("w1", ["full_pipeline"]) is None
+
+        time.sleep(0.06)
+        redelivered = other.claim("w2", ["wave1"])
+        assert redelivered.worker_id == "w2" and redelivered.attempts == 2
+        assert not queue.heartbeat(job.key, "w1")  # w1 lost the lease
+        assert not queue.complete(job.key, "w1")
+        assert other.complete(job.key, "w2")
+        assert queue.get(job.key).status == COMPLETED
+
+    print("✓ Claims are exclusive; expired leases are redelivered")
+
+
+def test_failed_attempts_retry_until_max_attempts():
+    """Test failures requeue with backoff and the last one marks the job failed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = _queue(tmp, max_attempts=2)
+        queue.enqueue("breakthrough", "s1:breakthrough")
+
+        with patch("app.services.job_queue.backoff_delay", return_value=0.0):
+            job = queue.claim("w1", ["breakthrough"])
+            retried = queue.fail(job.key, "w1", "rate limited")
+            assert retried.status == QUEUED and retried.error == "rate limited"
+
+            job = queue.claim("w1", ["breakthrough"])
+            assert job.attempts == 2
+            failed = queue.fail(job.key, "w1", "rate limited again")
+
+        assert failed.status == FAILED
+        assert queue.claim("w1", ["breakthrough"]) is None
+        assert queue.fail(job.key, "w2", "not mine") is None
+
+    print("✓ Failed attempts retry until max_attempts")
+
+
+def test_checkpointed_state_survives_redelivery():
+    """Test a handler's checkpoint is visible to the next delivery of the job."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = _queue(tmp, visibility_timeout=0.05)
+        queue.enqueue("full_pipeline", "s1:full_pipeline", {"session_id": "s1", "force": True})
+
+        job = queue.claim("w1", ["full_pipeline"])
+        assert job.state == {}
+        assert queue.checkpoint(job.key, "w1", {"reset": True})
+
+        time.sleep(0.06)  # w1 dies
+        job = queue.claim("w2", ["full_pipeline"])
+        assert job.state == {"reset": True} and job.payload["force"] is True
+        assert not queue.checkpoint(job.key, "w1", {"reset": False})
+
+    print("✓ Checkpointed state survives redelivery")
+
+
+def test_worker_runs_retries_and_heartbeats():
+    """Test the worker bounds concurrency, retries failures and keeps long jobs leased."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = _queue(tmp, visibility_timeout=0.1, max_attempts=3)
+        for number in range(6):
+            queue.enqueue("fast", f"s{number}:fast")
+        queue.enqueue("flaky", "s9:flaky")
+        queue.enqueue("slow", "s9:slow")
+
+        in_flight = []
+        peak = []
+
+        async def fast(ctx):
+            in_flight.append(ctx.job.key)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(ctx.job.key)
+            return ctx.payload
+
+        async def flaky(ctx):
+            if not ctx.state.get("first_half_done"):
+                await ctx.checkpoint(first_half_done=True)
+                raise RuntimeError("transient")
+            return "resumed"
+
+        async def slow(ctx):
+            await asyncio.sleep(0.25)  # Outlives the visibility timeout without heartbeats
+            return "done"
+
+        worker = JobWorker({"fast": fast, "flaky": flaky, "slow": slow}, queue=queue, concurrency=3)
+        with patch("app.services.job_queue.backoff_delay", return_value=0.0):
+            asyncio.run(worker.run_until_idle())
+
+        assert max(peak) <= 3
+        assert queue.stats() == {COMPLETED: 8}
+        assert queue.get("s9:flaky").result == "resumed" and queue.get("s9:flaky").attempts == 2
+        assert queue.get("s9:slow").attempts == 1  # Never redelivered
+        assert worker.completed == 8 and worker.failed == 1
+
+    print("✓ Worker runs, retries and heartbeats jobs")
+
+
+def test_heartbeat_survives_a_blocked_loop():
+    """Test a handler blocking its loop past the visibility timeout keeps its lease (no redelivery)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = _queue(tmp, visibility_timeout=0.1)
+        queue.enqueue("blocking", "s1:blocking")
+        started = threading.Event()
+
+        async def blocking(ctx):
+            started.set()
+            time.sleep(0.4)  # A sync call on the worker's loop
+            return "done"
+
+        worker = JobWorker({"blocking": blocking}, queue=queue, poll_interval=0.01)
+        worker.start_thread()  # As the API embeds it: its own thread and loop
+        assert started.wait(2)
+
+        stolen = []
+        deadline = time.time() + 0.3
+        while time.time() < deadline:
+            stolen.append(queue.claim("other-worker", ["blocking"]))
+            time.sleep(0.02)
+        asyncio.run(worker.stop_thread())
+
+        assert stolen and all(job is None for job in stolen)
+        job = queue.get("s1:blocking")
+        assert job.status == COMPLETED and job.result == "done" and job.attempts == 1
+        assert worker.completed == 1
+
+    print("✓ Heartbeats hold the lease while the loop is blocked")
+
+
+def test_schedules_queue_one_aggregates_sweep_per_interval():
+    """Test every worker runs its schedules, and the sweep they queue is deduplicated per interval."""
+    from app.services import analysis_jobs
+    from app.services.analysis_jobs import AGGREGATES_SWEEP, schedule_aggregates_sweep
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = _queue(tmp)
+        calls = []
+
+        async def counted():
+            calls.append(True)
+            return await schedule_aggregates_sweep()
+
+        async def scenario():
+            workers = [JobWorker({}, queue=queue, poll_interval=0.01, schedules=[(0.05, counted)]) for _ in range(3)]
+            runs = [asyncio.create_task(worker.run()) for worker in workers]
+            await asyncio.sleep(0.12)
+            for worker in workers:
+                await worker.stop()
+            await asyncio.gather(*runs)
+
+        with patch.object(analysis_jobs, "get_job_queue", return_value=queue), \
+                patch.object(analysis_jobs.settings, "aggregates_check_interval_hours", 24.0):
+            asyncio.run(scenario())
+            assert len(calls) >= 6  # At start and every 50ms, per worker
+            assert queue.stats() == {QUEUED: 1}
+            assert queue.claim("w1", [AGGREGATES_SWEEP]).key.endswith(f":{AGGREGATES_SWEEP}")
+
+            # The next interval gets its own sweep; a disabled interval queues nothing
+            assert asyncio.run(schedule_aggregates_sweep(now=time.time() + 86400)) is not None
+            with patch.object(analysis_jobs.settings, "aggregates_check_interval_hours", 0):
+                assert asyncio.run(schedule_aggregates_sweep()) is None
+
+    print("✓ Schedules queue one aggregates sweep per interval")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Job Queue Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_enqueue_is_idempotent_per_session_and_wave,
+        test_claims_are_exclusive_and_expired_leases_redeliver,
+        test_failed_attempts_retry_until_max_attempts,
+        test_checkpointed_state_survives_redelivery,
+        test_worker_runs_retries_and_heartbeats,
+        test_heartbeat_survives_a_blocked_loop,
+        test_schedules_queue_one_aggregates_sweep_per_interval,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,220 @@
+"""
+Test suite for incremental roadmap compaction
+
+Tests that sessions fold into tier 1/2/3 with only closed windows compacted,
+that tier sizes and the tier 3 arc stay bounded, that re-folding is
+idempotent (including sessions already in the tier 3 arc), and that JourneyCompactor backfills once and then reads a single
+row per session.
+Run with: python -m pytest backend/tests/test_journey_compactor.py -v
+Or directly: python backend/tests/test_journey_compactor.py
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+from uuid import uuid4
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.journey_compactor import JourneyCompactor, JourneyTiers
+from app.services.roadmap_generator import RoadmapGenerator, TIER3_MAX_CHARS
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = {}
+        self.row = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.row = row
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        if self.row is not None:
+            self.db.tables[self.table] = [self.row]
+            return SimpleNamespace(data=[self.row])
+        self.db.reads.append(self.table)
+        rows = self.db.tables.get(self.table, [])
+        return SimpleNamespace(data=[r for r in rows if all(r.get(k) == v for k, v in self.filters.items())])
+
+
+class FakeDB:
+    def __init__(self, sessions=None):
+        self.tables = {"therapy_sessions": sessions or []}
+        self.reads = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def _fold(tiers, count, start=1):
+    for number in range(start, start + count):
+        tiers.fold(f"s{number}", f"2025-01-{number:02d}", [f"Insight from session {number}. More detail here."])
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_fold_compacts_closed_windows():
+    """Test tier 1 compacts in windows of 5 while keeping the newest 3 sessions."""
+    tiers = JourneyTiers()
+    _fold(tiers, 7)
+    assert (len(tiers.tier1), len(tiers.tier2)) == (7, 0)
+
+    assert tiers.fold("s8", "2025-01-08", ["Insight from session 8."]) == ["tier1_to_tier2"]
+    assert [entry["number"] for entry in tiers.tier1] == [6, 7, 8]
+    assert tiers.tier2[0]["session_ids"] == ["s1", "s2", "s3", "s4", "s5"]
+    assert tiers.tier2[0]["summary"].startswith("Session 1 (2025-01-01): Insight from session 1.")
+
+    print("✓ Tier 1 compacts closed 5-session windows")
+
+
+def test_tiers_stay_bounded():
+    """Test tier sizes and the tier 3 arc stay bounded over 200 sessions."""
+    tiers = JourneyTiers()
+    _fold(tiers, 200)
+
+    assert len(tiers.tier1) < 8 and len(tiers.tier2) < 4
+    assert tiers.tier3["first"] == 1
+    assert len(tiers.tier3["summary"]) <= TIER3_MAX_CHARS
+    assert tiers.tier3["summary"].startswith("Session 1 (2025-01-01)")  # Where the journey started
+    assert tiers.sessions_folded == 200
+
+    context = tiers.to_context(exclude_session_id="s200")
+    assert "Session 200 (2025-01-200)" not in context["tier1_summaries"]
+    assert context["tier3_range"] == f"Sessions 1-{tiers.tier3['last']}"
+
+    print("✓ Tiers stay bounded over 200 sessions")
+
+
+def test_refold_is_idempotent():
+    """Test re-folding a session updates tier 1 or is ignored once compacted."""
+    tiers = JourneyTiers()
+    _fold(tiers, 8)
+
+    assert tiers.fold("s8", "2025-01-08", ["Revised insight."]) == []
+    assert tiers.tier1[-1]["insights"] == ["Revised insight."]
+    assert tiers.fold("s2", "2025-01-02", ["Late retry."]) == []
+    assert tiers.sessions_folded == 8
+
+    print("✓ Re-folding a session is idempotent")
+
+
+def test_refold_after_tier3_compaction_is_ignored():
+    """Test sessions folded into the tier 3 arc are not appended again."""
+    tiers = JourneyTiers()
+    _fold(tiers, 30)
+    assert tiers.tier3 is not None and "s1" in tiers.tier3["session_ids"]
+    snapshot = tiers.to_row("p1")
+
+    for session_id in ("s1", "s10"):
+        assert tiers.fold(session_id, "2025-01-01", ["Late retry."]) == []
+    assert tiers.sessions_folded == 30
+    assert tiers.to_row("p1")["tier1"] == snapshot["tier1"]
+
+    restored = JourneyTiers.from_row(tiers.to_row("p1"))
+    assert restored.fold("s1", "2025-01-01", ["Late retry."]) == []
+    assert restored.sessions_folded == 30
+
+    print("✓ Re-folding a session compacted into tier 3 is ignored")
+
+
+def test_compact_helpers_bound_output():
+    """Test the RoadmapGenerator compaction helpers clip sentences and the arc."""
+    paragraph = RoadmapGenerator.compact_tier1_to_tier2({
+        "Session 1": ["First insight. Second sentence."],
+        "Session 2": ["x" * 500],
+        "Session 3": [],
+    })
+    assert paragraph.startswith("Session 1: First insight. Session 2: xxx")
+    assert "Second sentence" not in paragraph and "Session 3" not in paragraph
+
+    arc = None
+    for window in range(50):
+        arc = RoadmapGenerator.compact_tier2_to_tier3([f"Window {window} milestone."], previous_arc=arc)
+    assert arc.startswith("Window 0 milestone.") and arc.endswith("Window 49 milestone.")
+    assert len(arc) <= TIER3_MAX_CHARS
+
+    print("✓ Compaction helpers produce bounded summaries")
+
+
+def test_compactor_backfills_once_then_reads_one_row():
+    """Test a patient without stored tiers is backfilled once, then each session reads one row."""
+    patient_id = str(uuid4())
+    sessions = [
+        {
+            "id": f"s{n}", "patient_id": patient_id, "session_date": f"2025-01-{n:02d}",
+            "prose_analysis": "Prose." if n != 3 else None,
+            "deep_analysis": {"themes": [{"description": f"Theme {n}."}]},
+        }
+        for n in range(1, 6)
+    ]
+    db = FakeDB(sessions)
+    compactor = JourneyCompactor(db)
+
+    tiers = compactor.add_session(patient_id, "s5", "2025-01-05", ["New insight."])
+    assert [entry["session_id"] for entry in tiers.tier1] == ["s1", "s2", "s4", "s5"]
+    assert tiers.tier1[0]["insights"] == ["Theme 1."]
+    assert db.reads == ["patient_journey_tiers", "therapy_sessions"]
+
+    db.reads.clear()
+    tiers = compactor.add_session(patient_id, "s6", "2025-01-06", ["Next insight."])
+    assert db.reads == ["patient_journey_tiers"]
+    assert tiers.sessions_folded == 5
+
+    print("✓ Compactor backfills once, then reads one row per session")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Journey Compactor Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_fold_compacts_closed_windows,
+        test_tiers_stay_bounded,
+        test_refold_is_idempotent,
+        test_refold_after_tier3_compaction_is_ignored,
+        test_compact_helpers_bound_output,
+        test_compactor_backfills_once_then_reads_one_row,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,316 @@
+"""
+Test suite for the LLM rate limiter
+
+Tests token bucket admission, per-model RPM/TPM budgets, background headroom
+for interactive calls, 429 retry-after handling, usage settlement, and that
+BaseAIGenerator chat completions go through the limiter. Time is simulated
+with a fake clock.
+Run with: python -m pytest backend/tests/test_llm_rate_limiter.py -v
+Or directly: python backend/tests/test_llm_rate_limiter.py
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, patch
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.base_ai_generator import AsyncAIGenerator
+from app.services.llm_rate_limiter import (
+    LLMRateLimiter,
+    Priority,
+    TokenBucket,
+    estimate_request_tokens,
+    is_rate_limit_error,
+    llm_priority,
+    retry_after_seconds,
+    set_rate_limiter,
+)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, message="Too Many Requests", headers=None):
+        super().__init__(message)
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _limiter(clock, limits, **kwargs):
+    kwargs.setdefault("background_headroom", 0.0)
+    return LLMRateLimiter(limits=limits, scale=1.0, clock=clock, sleep=clock.sleep, **kwargs)
+
+
+class RateLimitedAsyncGenerator(AsyncAIGenerator):
+    """Test implementation of AsyncAIGenerator."""
+
+    use_cache = False
+
+    def get_task_name(self) -> str:
+        return "mood_analysis"
+
+    def build_messages(self, context: Dict[str, Any]) -> List[Dict[str, str]]:
+        return [{"role": "user", "content": context["text"]}]
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_token_bucket_reserve():
+    """Test a bucket admits a burst up to capacity, then makes callers wait."""
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=60, refill_per_second=1.0, clock=clock)
+
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(30) == 30.0  # In debt: wait for the deficit to refill
+    clock.now += 30
+    assert round(bucket.level) == 0
+    assert bucket.reserve(1000) == 60.0  # Oversized requests are capped at capacity
+
+    print("✓ Token bucket admits bursts and computes waits")
+
+
+def test_limiter_enforces_rpm():
+    """Test the limiter spaces requests once a model's RPM burst is used up."""
+    clock = FakeClock()
+    limiter = _limiter(clock, {"gpt-5-nano": (2, 1_000_000)})
+
+    async def run():
+        for _ in range(4):
+            await limiter.acquire("gpt-5-nano", tokens=100)
+
+    asyncio.run(run())
+
+    # 2 RPM: two immediate, then one every 30s
+    assert clock.sleeps == [30.0, 30.0]
+    stats = limiter.get_stats()["models"]["gpt-5-nano"]
+    assert stats["admitted"]["interactive"] == 4 and stats["delayed"] == 2
+
+    print("✓ Limiter enforces per-model RPM")
+
+
+def test_limiter_uses_registry_limits():
+    """Test models without overrides use MODEL_REGISTRY limits times scale."""
+    limiter = LLMRateLimiter(scale=2.0)
+    budget = limiter.budget("gpt-5-nano")
+    assert (budget.rpm, budget.tpm) == (1000, 400_000)
+
+    print("✓ Limiter reads RPM/TPM from MODEL_REGISTRY")
+
+
+def test_background_leaves_headroom_for_interactive():
+    """Test background calls stop at the headroom while interactive calls go straight through."""
+    clock = FakeClock()
+    limiter = _limiter(clock, {"gpt-5": (10, 1_000_000)}, background_headroom=0.2)
+    budget = limiter.budget("gpt-5")
+
+    for _ in range(8):
+        assert budget.reserve(100, Priority.BACKGROUND) == (True, 0.0)
+
+    admitted, wait = budget.reserve(100, Priority.BACKGROUND)
+    assert not admitted and wait > 0  # Would dip into the interactive reserve
+
+    assert budget.reserve(100, Priority.INTERACTIVE) == (True, 0.0)
+    assert budget.reserve(100, Priority.INTERACTIVE) == (True, 0.0)
+
+    print("✓ Background calls leave headroom for interactive calls")
+
+
+def test_priority_context():
+    """Test llm_priority() sets the priority used by acquire()."""
+    clock = FakeClock()
+    limiter = _limiter(clock, {"gpt-5": (10, 1_000_000)})
+
+    async def run():
+        with llm_priority(Priority.BACKGROUND):
+            await asyncio.gather(*(limiter.acquire("gpt-5", 10) for _ in range(3)))
+        await limiter.acquire("gpt-5", 10)
+
+    asyncio.run(run())
+
+    admitted = limiter.get_stats()["models"]["gpt-5"]["admitted"]
+    assert admitted == {"interactive": 1, "background": 3}
+
+    print("✓ llm_priority() applies to tasks started in the block")
+
+
+def test_rate_limit_detection():
+    """Test 429s are detected through wrapping and retry-after is parsed."""
+    try:
+        try:
+            raise RateLimited(headers={"retry-after": "7"})
+        except RateLimited as e:
+            raise Exception(f"Topic extraction failed: {e}")
+    except Exception as wrapped:
+        assert is_rate_limit_error(wrapped)
+        assert retry_after_seconds(wrapped) == 7.0
+
+    assert retry_after_seconds(RateLimited(headers={"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(RateLimited()) is None
+    assert not is_rate_limit_error(ValueError("bad json"))
+
+    print("✓ 429s and retry-after are detected through wrapping")
+
+
+def test_call_honors_retry_after():
+    """Test a 429 pauses the model for retry-after and the call is retried."""
+    clock = FakeClock()
+    limiter = _limiter(clock, {"gpt-5-mini": (100, 1_000_000)}, max_retries=2)
+    request = AsyncMock(side_effect=[RateLimited(headers={"retry-after": "7"}), "ok"])
+
+    result = asyncio.run(limiter.call("gpt-5-mini", 500, request))
+
+    assert result == "ok"
+    assert request.await_count == 2
+    assert limiter.retries == 1
+    assert sum(clock.sleeps) >= 7.0
+    assert limiter.get_stats()["models"]["gpt-5-mini"]["rate_limited"] == 1
+
+    print("✓ 429 retry-after pauses the model and retries")
+
+
+def test_call_gives_up_after_max_retries():
+    """Test persistent 429s and non-429 errors are raised to the caller."""
+    clock = FakeClock()
+    limiter = _limiter(clock, {"gpt-5-mini": (100, 1_000_000)}, max_retries=1)
+
+    for error, expected_calls in ((RateLimited(), 2), (ValueError("bad request"), 1)):
+        request = AsyncMock(side_effect=error)
+        try:
+            asyncio.run(limiter.call("gpt-5-mini", 500, request))
+            assert False, "expected error"
+        except type(error):
+            pass
+        assert request.await_count == expected_calls
+
+    print("✓ Errors are raised once retries are exhausted")
+
+
+def test_call_retries_transient_errors():
+    """Test 5xx/connection errors back off this call without pausing the model."""
+    class ServerError(Exception):
+        status_code = 503
+
+    class APIConnectionError(Exception):
+        pass
+
+    clock = FakeClock()
+    limiter = _limiter(clock, {"gpt-5-mini": (100, 1_000_000)}, max_retries=2)
+    request = AsyncMock(side_effect=[ServerError(), APIConnectionError(), "ok"])
+
+    assert asyncio.run(limiter.call("gpt-5-mini", 500, request)) == "ok"
+    assert request.await_count == 3
+    assert limiter.retries == 2
+    assert limiter.get_stats()["models"]["gpt-5-mini"]["rate_limited"] == 0
+
+    # Anything else is raised straight away
+    request = AsyncMock(side_effect=ValueError("bad request"))
+    try:
+        asyncio.run(limiter.call("gpt-5-mini", 500, request))
+        assert False, "Should have raised"
+    except ValueError:
+        pass
+    assert request.await_count == 1
+
+    print("✓ Transient errors are retried with backoff")
+
+
+def test_call_settles_actual_usage():
+    """Test the token bucket is corrected to the usage reported by the API."""
+    clock = FakeClock()
+    limiter = _limiter(clock, {"gpt-5-nano": (100, 10_000)})
+    response = SimpleNamespace(usage=SimpleNamespace(total_tokens=1_000))
+
+    asyncio.run(limiter.call("gpt-5-nano", 4_000, AsyncMock(return_value=response)))
+
+    assert limiter.get_stats()["models"]["gpt-5-nano"]["tokens_available"] == 9_000
+
+    print("✓ Estimates are settled against actual usage")
+
+
+def test_generator_calls_go_through_limiter():
+    """Test BaseAIGenerator chat completions are admitted and retried by the limiter."""
+    clock = FakeClock()
+    limiter = _limiter(clock, {"gpt-5-nano": (100, 1_000_000)}, max_retries=2)
+    set_rate_limiter(limiter)
+
+    try:
+        gen = RateLimitedAsyncGenerator(api_key="rate-limit-test-key")
+        messages = [{"role": "user", "content": "x" * 4000}]
+        create = AsyncMock(side_effect=[RateLimited(), SimpleNamespace(usage=None)])
+
+        with patch.object(gen._client.chat.completions, "create", create):
+            asyncio.run(gen._create_chat_completion_async(messages))
+
+        assert create.await_count == 2
+        stats = limiter.get_stats()["models"][gen.model]
+        assert stats["admitted"]["interactive"] == 2
+        assert estimate_request_tokens("mood_analysis", messages) == 1000 + 4 + 3 + 200
+    finally:
+        set_rate_limiter(None)
+
+    print("✓ Generator calls go through the rate limiter")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("LLM Rate Limiter Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_token_bucket_reserve,
+        test_limiter_enforces_rpm,
+        test_limiter_uses_registry_limits,
+        test_background_leaves_headroom_for_interactive,
+        test_priority_context,
+        test_rate_limit_detection,
+        test_call_honors_retry_after,
+        test_call_gives_up_after_max_retries,
+        test_call_retries_transient_errors,
+        test_call_settles_actual_usage,
+        test_generator_calls_go_through_limiter,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,308 @@
+"""
+Test suite for the LLM response cache
+
+Tests backends (memory LRU, SQLite), key hashing, cache integration with
+BaseAIGenerator cost tracking, and that async generation keeps sqlite cache
+I/O off the event loop.
+Run with: python -m pytest backend/tests/test_llm_response_cache.py -v
+Or directly: python backend/tests/test_llm_response_cache.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
+from typing import Dict, List, Any
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.base_ai_generator import AsyncAIGenerator, SyncAIGenerator
+from app.services.llm_response_cache import (
+    CachedCompletion,
+    LLMResponseCache,
+    MemoryLRUBackend,
+    SQLiteBackend,
+    build_cache_key,
+    set_llm_cache,
+    reset_llm_cache,
+)
+
+
+class CachingSyncGenerator(SyncAIGenerator):
+    """Test implementation of SyncAIGenerator."""
+
+    def get_task_name(self) -> str:
+        return "mood_analysis"
+
+    def build_messages(self, context: Dict[str, Any]) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": "You are a mood analyzer."},
+            {"role": "user", "content": f"Analyze: {context.get('text', '')}"}
+        ]
+
+
+class CachingAsyncGenerator(AsyncAIGenerator):
+    """Test implementation of AsyncAIGenerator."""
+
+    def get_task_name(self) -> str:
+        return "deep_analysis"
+
+    def build_messages(self, context: Dict[str, Any]) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": "You are a deep analyzer."},
+            {"role": "user", "content": f"Analyze: {context.get('text', '')}"}
+        ]
+
+
+class ThreadRecordingSQLiteBackend(SQLiteBackend):
+    """SQLite backend that records which thread each get()/set() ran on."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, value):
+        self.threads.append(threading.get_ident())
+        super().set(key, value)
+
+
+def _mock_response(content: str) -> Mock:
+    response = Mock()
+    response.choices = [Mock(message=Mock(content=content))]
+    response.usage = Mock(prompt_tokens=120, completion_tokens=30)
+    return response
+
+
+def _completion(content: str = '{"mood_score": 6.0}') -> CachedCompletion:
+    return CachedCompletion(
+        content=content,
+        model="gpt-5-nano",
+        prompt_tokens=120,
+        completion_tokens=30,
+        created_at=time.time(),
+    )
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_cache_key_is_content_addressed():
+    """Test identical requests hash equal and any change alters the key."""
+    messages = [{"role": "user", "content": "hello"}]
+    params = {"response_format": {"type": "json_object"}}
+
+    key = build_cache_key("mood_analysis", "gpt-5-nano", messages, params)
+
+    assert key == build_cache_key("mood_analysis", "gpt-5-nano", list(messages), dict(params))
+    assert key != build_cache_key("topic_extraction", "gpt-5-nano", messages, params)
+    assert key != build_cache_key("mood_analysis", "gpt-5-mini", messages, params)
+    assert key != build_cache_key("mood_analysis", "gpt-5-nano", [{"role": "user", "content": "hello!"}], params)
+    assert key != build_cache_key("mood_analysis", "gpt-5-nano", messages, {})
+
+    print("✓ Cache keys are content-addressed")
+
+
+def test_memory_backend_lru_eviction():
+    """Test the memory backend evicts least recently used entries."""
+    backend = MemoryLRUBackend(max_entries=2)
+    backend.set("a", {"v": 1})
+    backend.set("b", {"v": 2})
+    backend.get("a")  # "b" is now least recently used
+    backend.set("c", {"v": 3})
+
+    assert backend.get("a") == {"v": 1}
+    assert backend.get("b") is None
+    assert backend.get("c") == {"v": 3}
+    assert len(backend) == 2
+
+    print("✓ Memory backend evicts LRU entries")
+
+
+def test_memory_backend_ttl():
+    """Test expired entries are not returned."""
+    backend = MemoryLRUBackend(max_entries=10, ttl_seconds=60)
+    backend.set("a", {"v": 1})
+
+    with patch("app.services.llm_response_cache.time.time", return_value=time.time() + 120):
+        assert backend.get("a") is None
+
+    assert len(backend) == 0
+
+    print("✓ Memory backend honours TTL")
+
+
+def test_sqlite_backend_persists_and_evicts():
+    """Test the SQLite backend survives re-opening and trims to max_entries."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.sqlite3"
+
+        backend = SQLiteBackend(path, max_entries=2)
+        backend.set("a", {"v": 1})
+        backend.set("b", {"v": 2})
+
+        reopened = SQLiteBackend(path, max_entries=2)
+        assert reopened.get("a") == {"v": 1}
+
+        reopened.set("c", {"v": 3})  # "b" is least recently used
+        assert reopened.get("b") is None
+        assert reopened.get("c") == {"v": 3}
+        assert len(reopened) == 2
+
+    print("✓ SQLite backend persists and evicts")
+
+
+def test_cache_facade_counts_hits_and_misses():
+    """Test hit/miss accounting."""
+    cache = LLMResponseCache(MemoryLRUBackend(max_entries=10))
+
+    assert cache.get("missing") is None
+    cache.set("k", _completion())
+    hit = cache.get("k")
+
+    assert hit.cache_hit is True
+    assert hit.choices[0].message.content == '{"mood_score": 6.0}'
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+    print("✓ Cache facade counts hits and misses")
+
+
+def test_generator_second_call_served_from_cache():
+    """Test a repeated request skips the API and is tracked as a zero-cost hit."""
+    set_llm_cache(LLMResponseCache(MemoryLRUBackend(max_entries=10)))
+
+    try:
+        gen = CachingSyncGenerator(api_key="cache-test-key")
+        create = Mock(return_value=_mock_response('{"mood_score": 7.5}'))
+
+        with patch.object(gen._client.chat.completions, "create", create), \
+                patch("app.config.model_config.enqueue_generation_cost"):
+            first = gen.generate({"text": "same transcript"}, session_id="s1")
+            second = gen.generate({"text": "same transcript"}, session_id="s1")
+            third = gen.generate({"text": "different transcript"}, session_id="s1")
+
+        assert create.call_count == 2
+        assert first.content == second.content == {"mood_score": 7.5}
+        assert third.content == {"mood_score": 7.5}
+
+        assert first.cost_info.cache_hit is False
+        assert first.cost_info.cost > 0
+
+        assert second.cost_info.cache_hit is True
+        assert second.cost_info.cost == 0.0
+        assert second.cost_info.input_tokens == 0
+        assert second.cost_info.metadata["cached_input_tokens"] == 120
+    finally:
+        reset_llm_cache()
+
+    print("✓ Generator serves repeated requests from cache")
+
+
+def test_generator_cache_disabled():
+    """Test use_cache=False always calls the API."""
+    set_llm_cache(LLMResponseCache(MemoryLRUBackend(max_entries=10)))
+
+    try:
+        gen = CachingSyncGenerator(api_key="cache-test-key")
+        gen.use_cache = False
+        create = Mock(return_value=_mock_response('{"mood_score": 5.0}'))
+
+        with patch.object(gen._client.chat.completions, "create", create), \
+                patch("app.config.model_config.enqueue_generation_cost"):
+            gen.generate({"text": "same transcript"})
+            gen.generate({"text": "same transcript"})
+
+        assert create.call_count == 2
+    finally:
+        reset_llm_cache()
+
+    print("✓ use_cache=False bypasses the cache")
+
+
+def test_async_generator_keeps_sqlite_cache_off_the_loop():
+    """Test async generation runs sqlite cache reads and writes in a worker thread."""
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = ThreadRecordingSQLiteBackend(Path(tmp) / "cache.sqlite3", max_entries=10)
+        set_llm_cache(LLMResponseCache(backend))
+
+        try:
+            gen = CachingAsyncGenerator(api_key="cache-test-key")
+            create = AsyncMock(return_value=_mock_response('{"confidence": 0.9}'))
+            client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+            async def run():
+                first = await gen.generate({"text": "same transcript"}, session_id="s1")
+                second = await gen.generate({"text": "same transcript"}, session_id="s1")
+                return first, second, threading.get_ident()
+
+            with patch.object(CachingAsyncGenerator, "client", new_callable=PropertyMock, return_value=client), \
+                    patch("app.config.model_config.enqueue_generation_cost"):
+                first, second, loop_thread = asyncio.run(run())
+
+            assert create.call_count == 1
+            assert first.content == second.content == {"confidence": 0.9}
+            assert second.cost_info.cache_hit is True
+            assert len(backend.threads) == 3  # miss, store, hit
+            assert loop_thread not in backend.threads
+        finally:
+            reset_llm_cache()
+
+    print("✓ Async generator keeps sqlite cache I/O off the event loop")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("LLM Response Cache Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_cache_key_is_content_addressed,
+        test_memory_backend_lru_eviction,
+        test_memory_backend_ttl,
+        test_sqlite_backend_persists_and_evicts,
+        test_cache_facade_counts_hits_and_misses,
+        test_generator_second_call_served_from_cache,
+        test_generator_cache_disabled,
+        test_async_generator_keeps_sqlite_cache_off_the_loop,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,444 @@
+"""
+Test suite for the materialized patient aggregates
+
+Tests that consistency and progress metrics served from the aggregates match
+the original per-request computations, that incremental updates (inserts,
+moved dates, removals, mood re-analysis) end in the same state as a rebuild,
+and that the store backfills, skips no-op writes and repairs drift, using an
+in-memory fake of the async Supabase client.
+Run with: python -m pytest backend/tests/test_patient_aggregates.py -v
+Or directly: python backend/tests/test_patient_aggregates.py
+"""
+
+import asyncio
+import copy
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.patient_aggregates import (
+    AGGREGATES_VERSION,
+    PatientAggregates,
+    PatientAggregatesStore,
+)
+from app.services.progress_metrics_extractor import ProgressMetricsExtractor
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def _original_consistency(session_dates, days, now):
+    """Reference: the endpoint's original computation over the sessions it fetched."""
+    end_date = now
+    start_date = end_date - timedelta(days=days)
+    session_dates = sorted(d for d in session_dates if start_date <= d <= end_date)
+    if not session_dates:
+        return None
+
+    gaps = [(session_dates[i] - session_dates[i - 1]).days for i in range(1, len(session_dates))]
+    average_gap = sum(gaps) / len(gaps) if gaps else 0
+    weeks_in_period = days / 7
+    expected_sessions = int(weeks_in_period)
+    attendance_rate = min(100, (len(session_dates) / expected_sessions * 100)) if expected_sessions > 0 else 0
+
+    weekly_data = []
+    current_week_start = start_date
+    week_num = 1
+    while current_week_start < end_date:
+        week_end = current_week_start + timedelta(days=7)
+        count = sum(1 for d in session_dates if current_week_start <= d < week_end)
+        weekly_data.append({
+            "week": f"W{week_num}",
+            "attended": 1 if count > 0 else 0,
+            "session_count": count,
+            "week_start": current_week_start.strftime("%Y-%m-%d"),
+        })
+        current_week_start = week_end
+        week_num += 1
+
+    current_streak = longest_streak = 0
+    for week in weekly_data:
+        current_streak = current_streak + 1 if week["attended"] else 0
+        longest_streak = max(longest_streak, current_streak)
+
+    scores = []
+    for gap in gaps:
+        deviation = abs(gap - 7)
+        scores.append(100 if deviation <= 3 else 70 if deviation <= 7 else 40 if deviation <= 14 else 10)
+    regularity = sum(scores) / len(scores) if scores else 0
+    streak_bonus = min(20, (longest_streak / weeks_in_period) * 20) if weeks_in_period > 0 else 0
+
+    return {
+        "consistency_score": round(min(100, attendance_rate * 0.4 + regularity * 0.4 + streak_bonus), 1),
+        "attendance_rate": round(attendance_rate, 1),
+        "average_gap_days": round(average_gap, 1),
+        "longest_streak_weeks": longest_streak,
+        "missed_weeks": sum(1 for week in weekly_data if week["attended"] == 0),
+        "weekly_data": weekly_data,
+        "total_sessions": len(session_dates),
+        "expected_sessions": expected_sessions,
+        "period_start": start_date.isoformat(),
+        "period_end": end_date.isoformat(),
+    }
+
+
+def _original_progress_metrics(rows, limit):
+    """Reference: the endpoint's original reshape into pipeline JSON."""
+    pipeline_data = {"sessions": []}
+    for idx, session in enumerate(rows[:limit], start=1):
+        pipeline_data["sessions"].append({
+            "session_num": idx,
+            "session_id": session["id"],
+            "wave1": {
+                "session_num": idx,
+                "mood_score": session.get("mood_score"),
+                "mood_confidence": session.get("mood_confidence", 0.8),
+                "analyzed_at": session.get("mood_analyzed_at") or session.get("created_at"),
+            },
+            "wave2": None,
+        })
+    return ProgressMetricsExtractor.extract_from_pipeline_json(pipeline_data)
+
+
+def _sessions(rng, count, start=NOW - timedelta(days=200)):
+    rows, when = [], start
+    for number in range(count):
+        when += timedelta(days=rng.choice([3, 6, 7, 7, 7, 8, 10, 14, 21, 40]), hours=rng.randrange(-6, 7))
+        rows.append({
+            "id": f"s{number}",
+            "patient_id": "p1",
+            "session_date": when.isoformat(),
+            "created_at": when.isoformat() + "Z",
+            "mood_score": rng.choice([None, 3.5, 5.0, 6.5, 8.0]),
+            "mood_confidence": rng.choice([0.7, 0.9, None]),
+            "mood_analyzed_at": rng.choice([None, (when + timedelta(hours=1)).isoformat() + "Z"]),
+        })
+    return rows
+
+
+def _built(rows):
+    aggregates = PatientAggregates()
+    for row in rows:
+        aggregates.add_session(row["id"], row["session_date"])
+        if row["mood_score"] is not None:
+            aggregates.set_mood(row)
+    return aggregates
+
+
+def _state(aggregates):
+    """Stored row without timestamps."""
+    row = aggregates.to_row("p1")
+    row.pop("updated_at")
+    if row["progress_metrics"]:
+        row["progress_metrics"] = {**row["progress_metrics"], "extracted_at": None}
+    return row
+
+
+class UniqueViolation(Exception):
+    code = "23505"
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.kind = "select"
+        self.payload = None
+        self.filters = {}
+
+    def insert(self, payload, **kwargs):
+        self.kind, self.payload = "insert", payload
+        return self
+
+    def update(self, payload, **kwargs):
+        self.kind, self.payload = "update", payload
+        return self
+
+    def upsert(self, payload, **kwargs):
+        self.kind, self.payload = "upsert", payload
+        return self
+
+    def delete(self):
+        self.kind = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        await asyncio.sleep(0)  # A round trip: lets other tasks interleave
+        self.db.log.append((self.table, self.kind))
+        if self.table == "therapy_sessions":
+            return SimpleNamespace(data=sorted(self.db.sessions, key=lambda row: row["session_date"]))
+        if self.kind == "insert":
+            if self.db.row is not None:
+                raise UniqueViolation("duplicate key value violates unique constraint")
+            self.db.row = copy.deepcopy(self.payload)
+        elif self.kind == "update":
+            if self.db.row is None or any(self.db.row.get(k) != v for k, v in self.filters.items()):
+                return SimpleNamespace(data=[])
+            self.db.row = copy.deepcopy(self.payload)
+        elif self.kind == "upsert":
+            self.db.row = copy.deepcopy(self.payload)
+        elif self.kind == "delete":
+            self.db.row = None
+        return SimpleNamespace(data=[copy.deepcopy(self.db.row)] if self.db.row else [])  # Fresh JSON, like PostgREST
+
+
+class FakeDB:
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.row = None
+        self.log = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_consistency_matches_original_computation():
+    """Test every window's response matches the original per-request computation."""
+    rng = random.Random(3)
+    checked = 0
+    for trial in range(40):
+        rows = _sessions(rng, rng.randrange(0, 30))
+        aggregates = _built(rows)
+        dates = [datetime.fromisoformat(row["session_date"]) for row in rows]
+
+        for days in (0, 1, 7, 30, 90, 95, 180, 365):
+            expected = _original_consistency(dates, days, NOW)
+            actual = aggregates.consistency(days, now=NOW)
+            all_time = actual.pop("all_time")
+            if expected is None:
+                assert actual["total_sessions"] == 0 and actual["weekly_data"] == []
+            else:
+                assert actual == expected, (trial, days)
+            assert all_time["total_sessions"] == len(rows)
+            checked += 1
+
+    print(f"✓ Consistency matches the original computation ({checked} windows)")
+
+
+def test_progress_metrics_match_original_extraction():
+    """Test materialized and on-demand progress metrics match the pipeline-JSON extraction."""
+    rng = random.Random(5)
+    for trial in range(30):
+        rows = _sessions(rng, rng.randrange(1, 70))
+        aggregates = _built(rows)
+        mood_rows = [row for row in rows if row["mood_score"] is not None]
+
+        for limit in (1, 3, 10, 50, 200):
+            if not mood_rows:
+                assert aggregates.progress_metrics_for(limit).session_count == 0
+                continue
+            expected = _original_progress_metrics(mood_rows, limit).model_dump()
+            actual = aggregates.progress_metrics_for(limit).model_dump()
+            expected.pop("extracted_at")
+            actual.pop("extracted_at")
+            assert actual == expected, (trial, limit)
+
+        if mood_rows:
+            assert aggregates.progress_metrics is not None
+
+    print("✓ Progress metrics match the original extraction")
+
+
+def test_incremental_updates_equal_rebuild():
+    """Test out-of-order inserts, moved dates, removals and re-analysis end in the rebuilt state."""
+    rng = random.Random(11)
+    for trial in range(25):
+        rows = _sessions(rng, rng.randrange(2, 40))
+        aggregates = PatientAggregates()
+
+        for row in rng.sample(rows, len(rows)):
+            aggregates.add_session(row["id"], row["session_date"])
+            if row["mood_score"] is not None:
+                aggregates.set_mood(row)
+
+        moved = rng.choice(rows)
+        moved["session_date"] = (datetime.fromisoformat(moved["session_date"]) + timedelta(days=rng.randrange(-60, 60))).isoformat()
+        aggregates.set_mood(moved)
+
+        removed = rng.choice(rows)
+        rows.remove(removed)
+        assert aggregates.remove_session(removed["id"])
+        assert not aggregates.remove_session(removed["id"])
+
+        if rows:
+            reanalyzed = rng.choice(rows)
+            reanalyzed["mood_score"] = 9.5 if reanalyzed["mood_score"] is None else None
+            aggregates.set_mood(reanalyzed)
+
+        expected = _built(sorted(rows, key=lambda row: row["session_date"]))
+        assert _state(aggregates) == _state(expected), trial
+
+    aggregates = PatientAggregates()
+    for date in ("2026-01-05T10:00:00", "2026-01-13T10:00:00", "2026-01-20T10:00:00", "2026-02-02T10:00:00"):
+        aggregates.add_session(date, date)
+    assert (aggregates.attendance_start, aggregates.attendance_bitmap) == ("2026-01-05", "11101")
+    assert (aggregates.longest_streak_weeks, aggregates.latest_streak_weeks) == (3, 1)
+    assert aggregates.gap_buckets == {"perfect": 2, "good": 1, "fair": 0, "poor": 0}
+    assert not aggregates.add_session("2026-01-05T10:00:00", "2026-01-05T10:00:00Z")
+
+    print("✓ Incremental updates equal a rebuild")
+
+
+def test_store_backfills_records_and_repairs_drift():
+    """Test backfill on first use, incremental recording, version invalidation and the drift check."""
+    rows = _sessions(random.Random(2), 8)
+    db = FakeDB(rows[:6])
+    store = PatientAggregatesStore(db)
+
+    async def scenario():
+        aggregates = await store.get("p1")
+        assert len(aggregates.sessions) == 6 and db.row["version"] == AGGREGATES_VERSION
+
+        # Created, then Wave 1 complete: one read + one conditional update each
+        db.sessions.append(rows[6])
+        db.log.clear()
+        await store.record_session(rows[6])
+        await store.record_wave1({**rows[6], "mood_score": 7.0})
+        assert db.log == [("patient_aggregates", "select"), ("patient_aggregates", "update")] * 2
+        rows[6]["mood_score"] = 7.0
+
+        # Recording the same state again does not write
+        db.log.clear()
+        await store.record_session(rows[6])
+        assert db.log == [("patient_aggregates", "select")]
+        assert await store.check("p1") == {"patient_id": "p1", "status": "ok", "drift": []}
+
+        # A session written outside the API is caught and repaired by the check
+        db.sessions.append(rows[7])
+        report = await store.check("p1")
+        assert report["status"] == "repaired" and "sessions" in report["drift"]
+        assert len((await store.load("p1")).sessions) == 8
+
+        # Rows from an older version are rebuilt on next access
+        db.row["version"] = AGGREGATES_VERSION - 1
+        assert await store.load("p1") is None
+        assert len((await store.get("p1")).sessions) == 8
+
+        await store.invalidate("p1")
+        assert db.row is None
+        assert (await store.check("p1"))["status"] == "missing"
+
+    asyncio.run(scenario())
+
+    print("✓ Store backfills, records incrementally and repairs drift")
+
+
+def test_concurrent_stores_do_not_lose_updates():
+    """Test separate store instances recording one patient's sessions at once keep every session."""
+    rows = _sessions(random.Random(4), 12)
+    db = FakeDB(rows[:2])
+
+    async def scenario():
+        await PatientAggregatesStore(db).get("p1")
+        db.sessions.extend(rows[2:])
+        # One store per caller, as the routers and pipelines create them
+        await asyncio.gather(*(PatientAggregatesStore(db).record_session(row) for row in rows[2:]))
+        await asyncio.gather(*(PatientAggregatesStore(db).record_wave1(row) for row in rows if row["mood_score"] is not None))
+
+        stored = await PatientAggregatesStore(db).load("p1")
+        assert _state(stored) == {**_state(_built(rows)), "revision": stored.revision}
+        assert (await PatientAggregatesStore(db).check("p1"))["status"] == "ok"
+
+    asyncio.run(scenario())
+
+    print("✓ Concurrent stores do not lose updates")
+
+
+def test_conditional_write_retries_after_outside_change():
+    """Test a write that lost the revision race to another process reloads and reapplies."""
+    rows = _sessions(random.Random(6), 4)
+    db = FakeDB(rows[:2])
+
+    def write_from_other_process(row):
+        """Another process records a session (its lock is not ours), bumping the revision."""
+        aggregates = PatientAggregates.from_row(db.row)
+        aggregates.add_session(row["id"], row["session_date"])
+        aggregates.revision += 1
+        db.row = aggregates.to_row("p1")
+
+    async def scenario():
+        store = PatientAggregatesStore(db)
+        await store.get("p1")
+        db.sessions.extend(rows[2:])
+        races = []
+
+        async def execute(query):
+            if query.kind == "update" and races:
+                write_from_other_process(races.pop())
+            return await query.execute()
+
+        store._execute = execute
+        races.append(rows[2])
+        db.log.clear()
+        await store.record_session(rows[3])
+        assert db.log == [("patient_aggregates", "select"), ("patient_aggregates", "update")] * 2
+        stored = await store.load("p1")
+        assert {session_id for _, session_id in stored.sessions} == {row["id"] for row in rows}
+        assert stored.revision == 3
+
+        # A check that races a writer leaves the row to it
+        db.row["sessions"] = []
+        races.append(rows[0])
+        assert (await store.check("p1"))["status"] == "changed"
+        assert (await store.check("p1"))["status"] == "repaired"
+        assert (await store.check("p1"))["status"] == "ok"
+
+    asyncio.run(scenario())
+
+    print("✓ Conditional writes retry after an outside change")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Patient Aggregates Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_consistency_matches_original_computation,
+        test_progress_metrics_match_original_extraction,
+        test_incremental_updates_equal_rebuild,
+        test_store_backfills_records_and_repairs_drift,
+        test_concurrent_stores_do_not_lose_updates,
+        test_conditional_write_retries_after_outside_change,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,262 @@
+"""
+Test suite for vectorized progress analytics
+
+Tests that batched consistency and mood trends over NumPy arrays give the
+same results as the per-patient Python computations (the original
+/consistency loop and ProgressMetricsExtractor's mood trend insight),
+including empty patients, timezone-aware dates and the run-length streaks,
+and that the therapist overview reads every session past PostgREST's row cap.
+Run with: python -m pytest backend/tests/test_progress_analytics.py -v
+Or directly: python backend/tests/test_progress_analytics.py
+"""
+
+import asyncio
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.progress_analytics import (
+    consistency_batch,
+    longest_runs,
+    mood_trends_batch,
+    progress_overview,
+)
+from app.services.progress_metrics_extractor import ProgressMetricsExtractor
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def _original_consistency(session_dates, days, now):
+    """Reference: the original /consistency loop for one patient."""
+    end_date = now
+    start_date = end_date - timedelta(days=days)
+    session_dates = sorted(d for d in session_dates if start_date <= d <= end_date)
+    period = {"period_start": start_date.isoformat(), "period_end": end_date.isoformat()}
+    if not session_dates:
+        return {"consistency_score": 0, "attendance_rate": 0, "average_gap_days": 0, "longest_streak_weeks": 0,
+                "missed_weeks": 0, "weekly_data": [], "total_sessions": 0, **period}
+
+    gaps = [(session_dates[i] - session_dates[i - 1]).days for i in range(1, len(session_dates))]
+    average_gap = sum(gaps) / len(gaps) if gaps else 0
+    weeks_in_period = days / 7
+    expected_sessions = int(weeks_in_period)
+    attendance_rate = min(100, (len(session_dates) / expected_sessions * 100)) if expected_sessions > 0 else 0
+
+    weekly_data = []
+    current_week_start = start_date
+    while current_week_start < end_date:
+        week_end = current_week_start + timedelta(days=7)
+        count = sum(1 for d in session_dates if current_week_start <= d < week_end)
+        weekly_data.append({"week": f"W{len(weekly_data) + 1}", "attended": 1 if count > 0 else 0,
+                            "session_count": count, "week_start": current_week_start.strftime("%Y-%m-%d")})
+        current_week_start = week_end
+
+    current_streak = longest_streak = 0
+    for week in weekly_data:
+        current_streak = current_streak + 1 if week["attended"] else 0
+        longest_streak = max(longest_streak, current_streak)
+
+    scores = []
+    for gap in gaps:
+        deviation = abs(gap - 7)
+        scores.append(100 if deviation <= 3 else 70 if deviation <= 7 else 40 if deviation <= 14 else 10)
+    regularity = sum(scores) / len(scores) if scores else 0
+    streak_bonus = min(20, (longest_streak / weeks_in_period) * 20) if weeks_in_period > 0 else 0
+
+    return {
+        "consistency_score": round(min(100, attendance_rate * 0.4 + regularity * 0.4 + streak_bonus), 1),
+        "attendance_rate": round(attendance_rate, 1),
+        "average_gap_days": round(average_gap, 1),
+        "longest_streak_weeks": longest_streak,
+        "missed_weeks": sum(1 for week in weekly_data if week["attended"] == 0),
+        "weekly_data": weekly_data,
+        "total_sessions": len(session_dates),
+        "expected_sessions": expected_sessions,
+        **period,
+    }
+
+
+def _patient_dates(rng, count):
+    when = NOW - timedelta(days=rng.randrange(30, 400))
+    dates = []
+    for _ in range(count):
+        when += timedelta(days=rng.choice([1, 5, 7, 7, 7, 9, 12, 20, 35]), minutes=rng.randrange(-600, 600))
+        dates.append(when)
+    rng.shuffle(dates)
+    return dates
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_consistency_batch_matches_per_patient_loop():
+    """Test every patient's batched result equals the original loop, for several windows."""
+    rng = random.Random(4)
+    patients = {f"p{number}": _patient_dates(rng, rng.randrange(0, 60)) for number in range(120)}
+    iso = {pid: [d.isoformat() for d in dates] for pid, dates in patients.items()}
+
+    for days in (0, 1, 6, 7, 30, 90, 100, 365):
+        results = consistency_batch(iso, days=days, now=NOW)
+        assert list(results) == list(patients)
+        for pid, dates in patients.items():
+            assert results[pid] == _original_consistency(dates, days, NOW), (pid, days)
+
+    print(f"✓ Batched consistency matches the per-patient loop ({len(patients)} patients x 8 windows)")
+
+
+def test_timezone_aware_dates_and_scores_only():
+    """Test offset/Z dates are normalized to UTC and weekly data can be skipped."""
+    aware = ["2026-02-01T09:00:00+02:00", "2026-02-08T07:00:00Z", "2026-02-15T07:00:00.250000+00:00"]
+    naive = [datetime(2026, 2, 1, 7), datetime(2026, 2, 8, 7), datetime(2026, 2, 15, 7, 0, 0, 250000)]
+
+    result = consistency_batch({"p1": aware}, days=60, now=NOW)["p1"]
+    assert result == _original_consistency(naive, 60, NOW)
+
+    scores_only = consistency_batch({"p1": aware}, days=60, now=NOW, include_weekly=False)["p1"]
+    assert scores_only["weekly_data"] == [] and scores_only["consistency_score"] == result["consistency_score"]
+
+    print("✓ Timezone-aware dates normalized; weekly data optional")
+
+
+def test_mood_trends_match_extractor_insight():
+    """Test batched mood trends produce the extractor's insight for every patient."""
+    rng = random.Random(9)
+    steps = [x / 2 for x in range(1, 21)]
+    moods = {f"p{number}": [rng.choice(steps) for _ in range(rng.randrange(0, 15))] for number in range(300)}
+    moods["zero_first"] = [0.0, 5.0, 6.0]
+
+    trends = mood_trends_batch(moods)
+
+    for pid, scores in moods.items():
+        sessions = [{"session_num": n, "wave1": {"mood_score": s, "analyzed_at": None}} for n, s in enumerate(scores, 1)]
+        if pid == "zero_first":
+            assert trends[pid]["insight"] is None and trends[pid]["improvement_pct"] is None
+            continue
+        expected = ProgressMetricsExtractor._extract_mood_trends(sessions).insight
+        assert trends[pid]["insight"] == expected, (pid, scores)
+        assert trends[pid]["sessions"] == len(scores)
+
+    print(f"✓ Mood trends match the extractor ({len(moods)} patients)")
+
+
+def test_longest_runs_and_overview():
+    """Test run-length streaks and the grouped clinician overview."""
+    attended = np.array([
+        [1, 1, 0, 1, 1, 1, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [1, 1, 1, 1, 1, 1, 1],
+        [0, 1, 0, 1, 0, 1, 1],
+    ], dtype=bool)
+    assert longest_runs(attended).tolist() == [3, 0, 7, 2]
+    assert longest_runs(np.zeros((2, 0), dtype=bool)).tolist() == [0, 0]
+
+    rows = [
+        {"patient_id": "a", "session_date": "2026-02-01T10:00:00", "mood_score": 5.0},
+        {"patient_id": "b", "session_date": "2026-02-02T10:00:00", "mood_score": None},
+        {"patient_id": "a", "session_date": "2026-02-08T10:00:00", "mood_score": 6.0},
+    ]
+    overview = progress_overview(rows, days=30, now=NOW)
+    assert [entry["patient_id"] for entry in overview] == ["a", "b"]
+    assert overview[0]["consistency"]["total_sessions"] == 2 and "weekly_data" not in overview[0]["consistency"]
+    assert overview[0]["mood_trend"]["insight"] == "+20% mood change over 2 sessions"
+    assert overview[1]["mood_trend"]["sessions"] == 0
+
+    print("✓ Run-length streaks and overview grouping")
+
+
+class CappedQuery:
+    """Sessions query against a PostgREST that returns at most MAX_ROWS rows per request."""
+
+    MAX_ROWS = 1000
+
+    def __init__(self, db):
+        self.db = db
+        self.start, self.end = 0, None
+
+    def range(self, start, end):
+        self.start, self.end = start, end
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        self.db.requests += 1
+        end = len(self.db.rows) - 1 if self.end is None else self.end
+        end = min(end, self.start + self.MAX_ROWS - 1)
+        return SimpleNamespace(data=self.db.rows[self.start:end + 1])
+
+
+def test_therapist_overview_reads_past_row_cap():
+    """Test the overview endpoint pages through sessions beyond PostgREST's max-rows."""
+    from app.routers.sessions import OVERVIEW_PAGE_SIZE, get_therapist_progress_overview
+
+    rng = random.Random(8)
+    start = datetime.now() - timedelta(days=400)
+    rows = sorted(
+        ({"patient_id": f"p{rng.randrange(40)}", "session_date": (start + timedelta(hours=rng.randrange(9000))).isoformat(),
+          "mood_score": rng.choice([None, 4.0, 6.5])} for _ in range(2 * OVERVIEW_PAGE_SIZE + 137)),
+        key=lambda row: row["session_date"],
+    )
+    db = SimpleNamespace(rows=rows, requests=0, table=lambda name: CappedQuery(db))
+
+    result = asyncio.run(get_therapist_progress_overview("t1", days=90, db=db))
+    assert db.requests == 3
+    expected = progress_overview(rows, days=90)
+    for entries in (result["patients"], expected):
+        for entry in entries:
+            del entry["consistency"]["period_start"], entry["consistency"]["period_end"]  # now() per call
+    assert result["patients"] == expected
+    assert sum(entry["mood_trend"]["sessions"] for entry in expected) == sum(
+        row["mood_score"] is not None for row in rows
+    )
+
+    print(f"✓ Therapist overview reads all {len(rows)} sessions in {db.requests} pages")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Progress Analytics Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_consistency_batch_matches_per_patient_loop,
+        test_timezone_aware_dates_and_scores_only,
+        test_mood_trends_match_extractor_insight,
+        test_longest_runs_and_overview,
+        test_therapist_overview_reads_past_row_cap,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
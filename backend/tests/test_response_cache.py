@@ -0,0 +1,309 @@
+"""
+Test suite for the versioned GET response cache
+
+Tests that the dashboard's read endpoints (session list, mood history,
+roadmap, demo status) answer a warm conditional GET with 304 and zero
+database calls (demo-token lookup included), that writes and pipeline events
+invalidate per patient, that a write racing a read is never cached, that
+token-scoped entries stop at the token's expiry and on demo reset, and the
+ETag/LRU/TTL mechanics, using the real app with a call-counting fake of the
+async Supabase client.
+Run with: python -m pytest backend/tests/test_response_cache.py -v
+Or directly: python backend/tests/test_response_cache.py
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database import get_async_db
+from app.main import app
+from app.middleware.demo_auth import get_demo_user, require_demo_auth
+from app.middleware.response_cache import (
+    CachedResponse,
+    ResponseCache,
+    etag_matches,
+    invalidate_on_event,
+    invalidate_patient,
+    invalidate_token,
+    reset_response_cache,
+    set_response_cache,
+)
+from app.utils.event_bus import EventBus, LocalTransport
+
+TOKEN = "8c3d5d0e-3d1f-4a5e-9a55-1f6f4c9d2b10"
+OTHER_TOKEN = "0b9f2d5c-7a41-4f0e-8d6e-5e2c1a7b3c99"
+
+ROUTES = (
+    "/api/sessions/",
+    "/api/sessions/patient/p1/mood-history",
+    "/api/patients/p1/roadmap",
+    "/api/demo/status",
+)
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    @property
+    def not_(self):
+        return self
+
+    async def execute(self):
+        self.db.calls += 1
+        if self.db.on_read:
+            self.db.on_read()
+        if self.table == "patients":
+            return SimpleNamespace(data={"id": "p1"})
+        if self.table == "patient_roadmap":
+            return SimpleNamespace(data=[{"roadmap_data": self.db.roadmap, "metadata": {"sessions_analyzed": 2}}])
+        return SimpleNamespace(data=[dict(session) for session in self.db.sessions])
+
+
+class FakeDB:
+    def __init__(self):
+        self.calls = 0
+        self.on_read = None
+        self.roadmap = {"current_phase": "Building skills"}
+        self.sessions = [
+            {"id": "s1", "patient_id": "p1", "session_date": "2026-01-05", "mood_score": 5.5,
+             "mood_confidence": 0.8, "emotional_tone": "anxious", "topics": ["Work"], "prose_analysis": None},
+            {"id": "s2", "patient_id": "p1", "session_date": "2026-01-12", "mood_score": 6.5,
+             "mood_confidence": 0.9, "emotional_tone": "hopeful", "topics": ["Family"], "prose_analysis": None},
+        ]
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def _client(db, cache=None, expires_at="2099-01-01T00:00:00+00:00"):
+    """The real app with the database and demo-token lookup replaced by counting fakes."""
+    def demo_user():
+        db.calls += 1
+        return {"id": "u1", "demo_token": TOKEN, "demo_expires_at": expires_at,
+                "created_at": "2026-01-01T00:00:00+00:00"}
+
+    app.dependency_overrides = {
+        get_async_db: lambda: db,
+        get_demo_user: demo_user,
+        require_demo_auth: demo_user,
+    }
+    set_response_cache(cache if cache is not None else ResponseCache())
+    return TestClient(app)
+
+
+def teardown_function(function):
+    """Restore the app's dependencies and the settings-driven cache."""
+    app.dependency_overrides = {}
+    reset_response_cache()
+
+
+def _get(client, path, etag=None, token=TOKEN):
+    headers = {"X-Demo-Token": token}
+    if etag:
+        headers["If-None-Match"] = etag
+    return client.get(path, headers=headers)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_warm_conditional_get_makes_zero_db_calls():
+    """Test every cached route answers If-None-Match with 304 and no DB or auth calls."""
+    db = FakeDB()
+    cache = ResponseCache()
+    client = _client(db, cache)
+
+    for path in ROUTES:
+        first = _get(client, path)
+        assert first.status_code == 200, (path, first.text)
+        etag = first.headers["etag"]
+        assert etag.startswith('"') and first.headers["cache-control"] == "private, no-cache"
+        calls = db.calls
+        assert calls > 0
+
+        conditional = _get(client, path, etag=etag)
+        assert conditional.status_code == 304 and conditional.content == b""
+        assert conditional.headers["etag"] == etag
+
+        plain = _get(client, path)
+        assert plain.status_code == 200 and plain.content == first.content
+        assert db.calls == calls, path
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["not_modified"]) == (8, 4, 4)
+    assert stats["hit_ratio"] == round(8 / 12, 3)
+    assert stats["routes"]["demo_status"] == {"hits": 2, "misses": 1, "not_modified": 1}
+
+    print("✓ Warm conditional GETs return 304 with zero database calls")
+
+
+def test_writes_and_events_invalidate_per_patient():
+    """Test invalidation by writers and by pipeline events, and token-scoped keys."""
+    db = FakeDB()
+    client = _client(db)
+    etags = {path: _get(client, path).headers["etag"] for path in ROUTES}
+
+    # Unchanged data after a bump: the DB is read again, but the content ETag still matches
+    invalidate_patient("p2")
+    calls = db.calls
+    assert _get(client, ROUTES[1], etag=etags[ROUTES[1]]).status_code == 304 and db.calls == calls
+    invalidate_patient("p1")
+    assert _get(client, ROUTES[1], etag=etags[ROUTES[1]]).status_code == 304 and db.calls > calls
+
+    # A pipeline event (any process) invalidates through the event bus listener
+    bus = EventBus(LocalTransport())
+    bus.add_listener(invalidate_on_event)
+    db.sessions[1]["mood_score"] = 8.0
+    bus.publish({"patient_id": "p1", "phase": "WAVE1", "event": "COMPLETE", "status": "success"})
+    changed = _get(client, ROUTES[1], etag=etags[ROUTES[1]])
+    assert changed.status_code == 200 and changed.headers["etag"] != etags[ROUTES[1]]
+    assert changed.json()[1]["mood_score"] == 8.0
+
+    # Token-scoped routes keep one entry per demo token
+    calls = db.calls
+    assert _get(client, "/api/demo/status").status_code == 200 and db.calls > calls
+    calls = db.calls
+    assert _get(client, "/api/demo/status").status_code == 200 and db.calls == calls
+    assert _get(client, "/api/demo/status", token=OTHER_TOKEN).status_code == 200 and db.calls > calls
+
+    print("✓ Writes and pipeline events invalidate per patient")
+
+
+def test_write_racing_a_read_is_not_cached():
+    """Test a response built while its patient was written is served but never stored."""
+    db = FakeDB()
+    cache = ResponseCache()
+    client = _client(db, cache)
+
+    db.on_read = lambda: invalidate_patient("p1")
+    assert _get(client, "/api/sessions/").status_code == 200
+    assert _get(client, "/api/sessions/patient/p1/mood-history").status_code == 200
+    assert len(cache) == 0 and cache.stores == 0
+
+    db.on_read = None
+    _get(client, "/api/sessions/")
+    calls = db.calls
+    _get(client, "/api/sessions/")
+    assert db.calls == calls and len(cache) == 1
+
+    print("✓ Responses racing a write are not cached")
+
+
+def test_token_scoped_entries_respect_token_expiry_and_reset():
+    """Test token-scoped hits stop at the token's expiry and are purged on demo reset."""
+    db = FakeDB()
+    cache = ResponseCache(ttl_seconds=300)
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    client = _client(db, cache, expires_at=expires_at.isoformat())
+
+    for path in ("/api/sessions/", "/api/demo/status"):
+        assert _get(client, path).status_code == 200
+        calls = db.calls
+        assert _get(client, path).status_code == 200 and db.calls == calls
+
+    def rejected():
+        raise HTTPException(status_code=401, detail="Invalid or missing demo token.")
+
+    app.dependency_overrides[get_demo_user] = lambda: None
+    app.dependency_overrides[require_demo_auth] = rejected
+
+    # Past the token's expiry (still within the TTL) the request reaches auth again
+    later = SimpleNamespace(time=lambda: expires_at.timestamp() + 1)
+    with patch("app.middleware.response_cache.time", later):
+        assert _get(client, "/api/sessions/").status_code == 401
+        assert _get(client, "/api/demo/status").status_code == 401
+
+    # Reset drops the token's entries; other tokens keep theirs
+    app.dependency_overrides = {}
+    client = _client(db, cache)
+    _get(client, "/api/demo/status")
+    _get(client, "/api/demo/status", token=OTHER_TOKEN)
+    invalidate_token(TOKEN)
+    app.dependency_overrides[require_demo_auth] = rejected
+    assert _get(client, "/api/demo/status").status_code == 401
+    assert _get(client, "/api/demo/status", token=OTHER_TOKEN).status_code == 200
+
+    print("✓ Token-scoped entries respect token expiry and demo reset")
+
+
+def test_errors_etags_eviction_and_ttl():
+    """Test non-200 responses bypass the cache, If-None-Match parsing, LRU bound and TTL."""
+    db = FakeDB()
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    client = _client(db, cache)
+    app.dependency_overrides[get_demo_user] = lambda: None
+    assert client.get("/api/sessions/").status_code == 401
+    assert client.get("/api/sessions/").status_code == 401
+    assert len(cache) == 0
+
+    assert etag_matches('W/"abc", "def"', '"abc"') and etag_matches("*", '"x"')
+    assert not etag_matches('"abcd"', '"abc"') and not etag_matches(None, '"abc"')
+
+    def entry(stored_at):
+        return CachedResponse("p9", cache.version("p9"), '"e"', b"{}", "application/json", stored_at)
+
+    for name in ("a", "b", "c"):
+        assert cache.set((name, "/", "", ""), entry(time.time()))
+    assert len(cache) == 2 and cache.get(("a", "/", "", "")) is None
+    cache.set(("old", "/", "", ""), entry(time.time() - 61))
+    assert cache.get(("old", "/", "", "")) is None
+
+    print("✓ Errors uncached; ETag matching, LRU bound and TTL")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Response Cache Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_warm_conditional_get_makes_zero_db_calls,
+        test_writes_and_events_invalidate_per_patient,
+        test_write_racing_a_read_is_not_cached,
+        test_token_scoped_entries_respect_token_expiry_and_reset,
+        test_errors_etags_eviction_and_ttl,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+        finally:
+            teardown_function(test)
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
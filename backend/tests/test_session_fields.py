@@ -0,0 +1,178 @@
+"""
+Test suite for therapy_sessions field sets
+
+Tests field set resolution and that session endpoints select the projected
+columns (no transcript) unless "full" is requested.
+Run with: python -m pytest backend/tests/test_session_fields.py -v
+Or directly: python backend/tests/test_session_fields.py
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi import HTTPException
+
+from app.utils.session_fields import (
+    SESSION_FIELD_SETS,
+    SUMMARY_FIELDS,
+    WAVE1_FIELDS,
+    WAVE2_FIELDS,
+    session_columns,
+)
+
+
+class RecordingQuery:
+    """Chainable async query builder that records select() columns."""
+
+    def __init__(self, client, data):
+        self.client = client
+        self.data = data
+
+    def select(self, columns):
+        self.client.selects.append(columns)
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        return SimpleNamespace(data=self.data)
+
+
+class RecordingClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.selects = []
+
+    def table(self, name):
+        data = {"id": "patient-1"} if name == "patients" else self.rows
+        return RecordingQuery(self, data)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_field_sets_are_nested():
+    """Test each field set extends the previous and only full has the transcript."""
+    assert set(SUMMARY_FIELDS) < set(WAVE1_FIELDS) < set(WAVE2_FIELDS)
+    for name in ("summary", "wave1", "wave2"):
+        assert "transcript" not in SESSION_FIELD_SETS[name]
+    assert session_columns("full") == "*"
+    assert "deep_analysis" in session_columns("wave2")
+    assert "deep_analysis" not in session_columns("summary")
+
+    print("✓ Field sets are nested and exclude the transcript")
+
+
+def test_unknown_field_set_rejected():
+    """Test unknown names raise ValueError and names are case-insensitive."""
+    assert session_columns(" Summary ") == session_columns("summary")
+    try:
+        session_columns("everything")
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "summary" in str(e)
+
+    print("✓ Unknown field sets are rejected")
+
+
+def test_session_list_defaults_to_summary():
+    """Test the dashboard list selects the slim projection by default."""
+    from app.routers.sessions import get_all_sessions
+
+    db = RecordingClient([{"id": "s1", "technique": None}])
+    sessions = asyncio.run(get_all_sessions(
+        request=None,
+        fields="summary",
+        demo_user={"id": "user-1"},
+        db=db,
+    ))
+
+    assert db.selects[-1] == session_columns("summary")
+    assert sessions[0]["technique_definition"] is None
+
+    print("✓ Session list defaults to the summary projection")
+
+
+def test_session_list_rejects_bad_fields():
+    """Test an unknown ?fields= value returns 400."""
+    from app.routers.sessions import get_all_sessions
+
+    try:
+        asyncio.run(get_all_sessions(
+            request=None,
+            fields="bogus",
+            demo_user={"id": "user-1"},
+            db=RecordingClient([]),
+        ))
+        assert False, "expected HTTPException"
+    except HTTPException as e:
+        assert e.status_code == 400
+
+    print("✓ Unknown ?fields= returns 400")
+
+
+def test_transcript_endpoint():
+    """Test the lazy transcript endpoint selects only the transcript."""
+    from app.routers.sessions import get_session_transcript
+
+    segments = [{"start": 0.0, "end": 1.0, "speaker": "SPEAKER_00", "text": "Hi"}]
+    db = RecordingClient([{"id": "s1", "transcript": segments}])
+    result = asyncio.run(get_session_transcript("s1", db=db))
+
+    assert db.selects == ["id, transcript"]
+    assert result == {"session_id": "s1", "transcript": segments}
+
+    try:
+        asyncio.run(get_session_transcript("missing", db=RecordingClient([])))
+        assert False, "expected HTTPException"
+    except HTTPException as e:
+        assert e.status_code == 404
+
+    print("✓ Transcript endpoint returns only the transcript")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Session Field Set Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_field_sets_are_nested,
+        test_unknown_field_set_rejected,
+        test_session_list_defaults_to_summary,
+        test_session_list_rejects_bad_fields,
+        test_transcript_endpoint,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,250 @@
+"""
+Test suite for the session snapshot (unit of work)
+
+Tests coalesced write-back, refresh semantics, and database round-trips per
+AnalysisOrchestrator run using an in-memory fake of the async Supabase client.
+Run with: python -m pytest backend/tests/test_session_snapshot.py -v
+Or directly: python backend/tests/test_session_snapshot.py
+"""
+
+import asyncio
+import os
+import sys
+from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.analysis_orchestrator import AnalysisOrchestrator
+from app.services.session_snapshot import SessionSnapshot
+
+
+_STATUS_ROW = {
+    "session_id": "s1",
+    "analysis_status": "complete",
+    "mood_complete": True,
+    "topics_complete": True,
+    "breakthrough_complete": True,
+    "wave1_complete": True,
+    "deep_complete": True,
+}
+
+
+class FakeQuery:
+    """Chainable async query builder backed by FakeDB."""
+
+    def __init__(self, db, table, kind=None):
+        self.db = db
+        self.table = table
+        self.kind = kind
+        self.payload = None
+
+    def select(self, *args):
+        self.kind = self.kind or "select"
+        return self
+
+    def update(self, payload):
+        self.kind = "update"
+        self.payload = payload
+        return self
+
+    def insert(self, payload):
+        self.kind = "insert"
+        self.payload = payload
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        self.db.log.append((self.table, self.kind))
+        if self.table == "therapy_sessions":
+            if self.kind == "update":
+                self.db.updates.append(dict(self.payload))
+                self.db.row.update(self.payload)
+                return SimpleNamespace(data=[dict(self.db.row)])
+            return SimpleNamespace(data=dict(self.db.row))
+        if self.kind == "rpc":
+            return SimpleNamespace(data=[_STATUS_ROW])
+        return SimpleNamespace(data=[{}])
+
+
+class FakeDB:
+    def __init__(self):
+        self.log = []
+        self.updates = []
+        self.row = {"id": "s1", "transcript": [{"speaker": "SPEAKER_01", "text": "I feel better"}]}
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        return FakeQuery(self, f"rpc:{name}", "rpc")
+
+
+def _orchestrator(db, topics_error=None):
+    with patch("app.services.analysis_orchestrator.MoodAnalyzer"), \
+            patch("app.services.analysis_orchestrator.TopicExtractor"), \
+            patch("app.services.analysis_orchestrator.BreakthroughDetector"), \
+            patch("app.services.analysis_orchestrator.DeepAnalyzer"), \
+            patch("app.services.analysis_orchestrator.ActionItemsSummarizer"):
+        orchestrator = AnalysisOrchestrator(db=db)
+
+    orchestrator.mood_analyzer.analyze_session_mood = AsyncMock(return_value=SimpleNamespace(
+        mood_score=6.5, confidence=0.8, rationale="steady", key_indicators=[], emotional_tone="hopeful",
+    ))
+    orchestrator.topic_extractor.extract_metadata = AsyncMock(
+        side_effect=topics_error,
+        return_value=SimpleNamespace(
+            topics=["Anxiety"], action_items=["Journal", "Walk"], technique="CBT",
+            summary="Progress.", confidence=0.9, raw_meta_summary="meta",
+        ),
+    )
+    orchestrator.breakthrough_detector.analyze_session = AsyncMock(return_value=SimpleNamespace(
+        primary_breakthrough=None, has_breakthrough=False,
+    ))
+    orchestrator.action_items_summarizer.summarize_action_items = AsyncMock(return_value=SimpleNamespace(
+        summary="Journal and walk", character_count=16,
+    ))
+    orchestrator.deep_analyzer.analyze_session = AsyncMock(return_value=SimpleNamespace(
+        to_dict=lambda: {"progress": "good"}, confidence_score=0.8,
+    ))
+    return orchestrator
+
+
+def _prose():
+    return SimpleNamespace(prose_text="Narrative", generated_at=datetime.utcnow(), word_count=1, paragraph_count=1)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_snapshot_coalesces_updates():
+    """Test staged updates are visible immediately and written in one UPDATE."""
+    db = FakeDB()
+
+    async def run():
+        snapshot = await SessionSnapshot.load(db, "s1")
+        snapshot.stage({"mood_score": 6.5})
+        snapshot.stage({"topics": ["Anxiety"], "mood_score": 7.0})
+        assert snapshot.get("mood_score") == 7.0
+        assert await snapshot.flush() is True
+        assert await snapshot.flush() is False  # Nothing pending
+        return snapshot
+
+    snapshot = asyncio.run(run())
+
+    assert db.updates == [{"mood_score": 7.0, "topics": ["Anxiety"]}]
+    assert (snapshot.reads, snapshot.writes) == (1, 1)
+
+    print("✓ Snapshot coalesces staged updates")
+
+
+def test_snapshot_refresh_keeps_staged_values():
+    """Test refresh() picks up external changes without losing staged columns."""
+    db = FakeDB()
+
+    async def run():
+        snapshot = await SessionSnapshot.load(db, "s1")
+        snapshot.stage({"mood_score": 6.5})
+        db.row["summary"] = "written by another process"
+        db.row["mood_score"] = 1.0
+        await snapshot.refresh()
+        return snapshot
+
+    snapshot = asyncio.run(run())
+
+    assert snapshot.get("summary") == "written by another process"
+    assert snapshot.get("mood_score") == 6.5
+    assert snapshot.has_pending
+
+    print("✓ Refresh keeps staged values")
+
+
+def test_pipeline_run_round_trips():
+    """Test a full run reads the session once and coalesces session UPDATEs."""
+    db = FakeDB()
+    orchestrator = _orchestrator(db)
+
+    with patch("app.services.analysis_orchestrator.ProseGenerator") as prose_generator:
+        prose_generator.return_value.generate_prose = AsyncMock(return_value=_prose())
+        status = asyncio.run(orchestrator.process_session_full_pipeline("s1"))
+
+    calls = Counter(db.log)
+    assert calls[("therapy_sessions", "select")] == 1  # was 7
+    assert calls[("therapy_sessions", "update")] == 3  # was 10
+    assert status.db_round_trips == len(db.log) == 15  # was 28
+
+    # Every analysis result reached the database
+    assert db.row["mood_score"] == 6.5
+    assert db.row["action_items_summary"] == "Journal and walk"
+    assert db.row["prose_analysis"] == "Narrative"
+    assert db.row["analysis_status"] == "complete"
+
+    # Action items summary saw topic extraction's in-memory result
+    orchestrator.action_items_summarizer.summarize_action_items.assert_awaited_once()
+
+    print(f"✓ Full run: {status.db_round_trips} DB round-trips (1 session read, 3 session writes)")
+
+
+def test_failed_run_flushes_partial_results():
+    """Test completed waves are persisted when a later wave fails."""
+    db = FakeDB()
+    orchestrator = _orchestrator(db, topics_error=RuntimeError("LLM unavailable"))
+
+    try:
+        with patch("app.services.analysis_orchestrator.asyncio.sleep", AsyncMock()):
+            asyncio.run(orchestrator.process_session_full_pipeline("s1"))
+        assert False, "expected pipeline failure"
+    except Exception as e:
+        assert "Wave 1 failed" in str(e)
+
+    assert db.row["mood_score"] == 6.5
+    assert db.row["breakthrough_analyzed_at"] is not None
+    assert db.row["analysis_status"] == "failed"
+    assert orchestrator._snapshots == {}
+
+    print("✓ Failed run flushes partial results")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Session Snapshot Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_snapshot_coalesces_updates,
+        test_snapshot_refresh_keeps_staged_values,
+        test_pipeline_run_round_trips,
+        test_failed_run_flushes_partial_results,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
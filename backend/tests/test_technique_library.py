@@ -0,0 +1,163 @@
+"""
+Test suite for the indexed technique library
+
+Tests that the hash and trigram indexes give the same answers as scanning
+every technique (exact, fuzzy and definition lookups on the shipped
+library, including perturbed inputs), and that validation results are
+memoized.
+Run with: python -m pytest backend/tests/test_technique_library.py -v
+Or directly: python backend/tests/test_technique_library.py
+"""
+
+import os
+import random
+import sys
+from difflib import SequenceMatcher
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.technique_library import TechniqueLibrary
+
+
+def _scan_exact(library, technique_str):
+    """Reference: the original linear scan."""
+    technique_lower = technique_str.lower().strip()
+    for technique in library.techniques:
+        keys = [technique.name, technique.formatted_name, *technique.aliases]
+        if any(key.lower() == technique_lower for key in keys):
+            return technique
+    return None
+
+
+def _scan_fuzzy(library, technique_str, threshold=0.8):
+    """Reference: SequenceMatcher against every name and alias."""
+    technique_lower = technique_str.lower().strip()
+    best_match, best_score = None, 0.0
+    for technique in library.techniques:
+        for text in (technique.name, *technique.aliases):
+            score = SequenceMatcher(None, technique_lower, text.lower()).ratio()
+            if score > best_score:
+                best_score, best_match = score, technique
+    return (best_match, best_score) if best_score >= threshold else None
+
+
+def _perturb(text, rng):
+    """Drop, swap or duplicate one character (a typical LLM/typing variation)."""
+    if len(text) < 4:
+        return text + "s"
+    i = rng.randrange(1, len(text) - 2)
+    choice = rng.randrange(3)
+    if choice == 0:
+        return text[:i] + text[i + 1:]
+    if choice == 1:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + text[i] + text[i:]
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_exact_index_matches_linear_scan():
+    """Test names, formatted names and aliases resolve as the scan did, case- and space-insensitively."""
+    library = TechniqueLibrary()
+    inputs = ["", "unknown technique"]
+    for technique in library.techniques:
+        inputs += [technique.name, f"  {technique.formatted_name.upper()} ", *technique.aliases]
+
+    for text in inputs:
+        assert library.exact_match(text) is _scan_exact(library, text), text
+
+    print(f"✓ Exact index matches linear scan ({len(inputs)} inputs)")
+
+
+def test_fuzzy_index_matches_full_comparison():
+    """Test trigram-pruned fuzzy matching returns the same technique and score as comparing every entry."""
+    library = TechniqueLibrary()
+    rng = random.Random(7)
+    inputs = ["cognitive reframing", "thought challenging", "TIP skills", "defusion", "mindfulness", "xyz", "a"]
+    for technique in library.techniques:
+        for text in (technique.name, *technique.aliases):
+            inputs.append(_perturb(text, rng))
+
+    for text in inputs:
+        expected = _scan_fuzzy(library, text)
+        actual = library.fuzzy_match(text)
+        if expected is None:
+            assert actual is None, text
+        else:
+            assert actual[0] is expected[0] and abs(actual[1] - expected[1]) < 1e-12, text
+
+    print(f"✓ Fuzzy index matches full comparison ({len(inputs)} inputs)")
+
+
+def test_definitions_and_modalities_are_indexed():
+    """Test definition and modality lookups agree with the technique list."""
+    library = TechniqueLibrary()
+    for technique in library.techniques:
+        assert library.get_technique_definition(technique.formatted_name) == technique.definition
+    assert library.get_technique_definition("CBT - Not A Technique") is None
+
+    for modality in library.modalities:
+        expected = [t for t in library.techniques if t.modality == modality]
+        assert library.get_techniques_by_modality(modality) == expected
+    assert library.get_techniques_by_modality("XYZ") == []
+
+    print("✓ Definitions and modalities are indexed")
+
+
+def test_validation_results_are_memoized():
+    """Test repeated validation of the same string is served from the LRU."""
+    library = TechniqueLibrary()
+
+    first = library.validate_and_standardize("cognitive restructurin")
+    again = library.validate_and_standardize("cognitive restructurin")
+    library.validate_and_standardize("cognitive restructurin", fuzzy_threshold=0.9)
+
+    assert first == again and first[2] == "fuzzy"
+    info = library._validate_cached.cache_info()
+    assert info.hits == 1 and info.misses == 2
+    assert library.validate_and_standardize("") == (None, 0.0, "none")
+    assert library.validate_and_standardize("Radical Acceptance") == ("DBT - Radical Acceptance", 1.0, "exact")
+
+    print("✓ Validation results are memoized")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Technique Library Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_exact_index_matches_linear_scan,
+        test_fuzzy_index_matches_full_comparison,
+        test_definitions_and_modalities_are_indexed,
+        test_validation_results_are_memoized,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
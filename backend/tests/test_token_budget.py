@@ -0,0 +1,161 @@
+"""
+Test suite for transcript token budgeting
+
+Tests that transcripts within budget pass through unchanged, that long ones are
+windowed within budget keeping anchors, risk language and salient turns, that
+the report is deterministic, and that generators record the window with
+their cost.
+Run with: python -m pytest backend/tests/test_token_budget.py -v
+Or directly: python backend/tests/test_token_budget.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.topic_extractor import TopicExtractor
+from app.utils.token_budget import count_tokens, fit_transcript
+
+
+def _render(segment):
+    return f"{segment['speaker']}: {segment['text']}"
+
+
+def _transcript(turns=40):
+    """Alternating therapist/client segments, 30 seconds each."""
+    segments = []
+    for i in range(turns):
+        speaker = "SPEAKER_00" if i % 2 == 0 else "SPEAKER_01"
+        text = f"Turn {i} talks about the weather and the commute and the week in general."
+        segments.append({"speaker": speaker, "text": text, "start": i * 30.0, "end": i * 30.0 + 29})
+    return segments
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_fits_unchanged():
+    """Test a transcript within budget is rendered in full with no markers."""
+    segments = _transcript(6)
+    fitted = fit_transcript(segments, budget_tokens=10_000, render_segment=_render)
+
+    assert fitted.text == "\n".join(_render(s) for s in segments)
+    assert not fitted.report.truncated
+    assert fitted.report.reduction == 0.0
+
+    print("✓ Transcripts within budget are unchanged")
+
+
+def test_truncation_respects_budget():
+    """Test a long transcript is windowed within budget with anchors and markers."""
+    segments = _transcript(40)
+    fitted = fit_transcript(segments, budget_tokens=300, render_segment=_render)
+    report = fitted.report
+
+    assert report.truncated
+    assert count_tokens(fitted.text) <= 300
+    assert fitted.text.startswith(_render(segments[0]))
+    assert fitted.text.endswith(_render(segments[-1]))
+    assert "turns omitted" in fitted.text
+    assert report.kept_turns + sum(span.turns for span in report.dropped) == 40
+
+    print(f"✓ Windowed to {report.kept_tokens}/{report.original_tokens} tokens")
+
+
+def test_risk_and_salient_turns_kept():
+    """Test risk language is pinned and insight turns keep their prompting question."""
+    segments = _transcript(40)
+    segments[15]["text"] = "Sometimes I think about how to end my life."
+    segments[27]["text"] = "I never connected those things, but now I realize why I feel so anxious."
+    segments[26]["text"] = "What do you notice when you put those together?"
+
+    fitted = fit_transcript(segments, budget_tokens=300, render_segment=_render)
+
+    assert "end my life" in fitted.text
+    assert "I never connected those things" in fitted.text
+    assert "What do you notice" in fitted.text
+    assert "Turn 20 " not in fitted.text
+
+    print("✓ Risk and salient turns survive windowing")
+
+
+def test_report_is_deterministic():
+    """Test the same input always keeps the same turns and reports the same spans."""
+    segments = _transcript(60)
+    first = fit_transcript(segments, budget_tokens=400, render_segment=_render)
+    second = fit_transcript(segments, budget_tokens=400, render_segment=_render)
+
+    assert first.text == second.text
+    assert first.report.to_dict() == second.report.to_dict()
+    span = first.report.dropped[0]
+    assert span.start == span.first_turn * 30.0
+    assert first.report.cost_metadata()["transcript_window"]["truncated"] is True
+
+    print("✓ Window selection and report are deterministic")
+
+
+def test_generator_records_window():
+    """Test a generator prompts with the windowed transcript and records the window."""
+    extractor = TopicExtractor(api_key="token-budget-test-key")
+    extractor.transcript_token_budget = 300
+    content = json.dumps({"topics": ["Anxiety"], "action_items": [], "technique": "", "summary": ""})
+    response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    create = AsyncMock(return_value=response)
+
+    with patch.object(extractor, "_create_chat_completion_async", create), \
+            patch("app.services.topic_extractor.track_generation_cost") as track:
+        asyncio.run(extractor.extract_metadata("s1", _transcript(40)))
+
+    prompt = create.await_args.kwargs["messages"][1]["content"]
+    assert "turns omitted" in prompt
+    window = track.call_args.kwargs["metadata"]["transcript_window"]
+    assert window["budget_tokens"] == 300 and window["dropped"]
+
+    print("✓ Generators prompt with the window and record it with the cost")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Token Budget Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_fits_unchanged,
+        test_truncation_respects_budget,
+        test_risk_and_salient_turns_kept,
+        test_report_is_deterministic,
+        test_generator_records_window,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,292 @@
+"""
+Test suite for the Wave 1 batch runner
+
+Tests bounded concurrency across sessions, background priority, skipping
+completed tasks, progress streaming, and that slow pipeline event writes do
+not serialize the sessions, using fake analyzers and an in-memory fake of
+the async Supabase client.
+Run with: python -m pytest backend/tests/test_wave1_batch_runner.py -v
+Or directly: python backend/tests/test_wave1_batch_runner.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.llm_rate_limiter import Priority, current_priority
+from app.services.wave1_batch_runner import Wave1BatchRunner
+
+
+class FakeQuery:
+    def __init__(self, db):
+        self.db = db
+        self.payload = None
+        self.filters = {}
+
+    def select(self, *args):
+        return self
+
+    def update(self, payload):
+        self.payload = payload
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def in_(self, column, values):
+        self.filters[column] = list(values)
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        if self.payload is not None:
+            self.db.updates.append((self.filters["id"], dict(self.payload)))
+            return SimpleNamespace(data=[])
+        ids = self.filters.get("id", [])
+        return SimpleNamespace(data=[row for row in self.db.rows if row["id"] in ids])
+
+
+class FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.updates = []
+
+    def table(self, name):
+        return FakeQuery(self)
+
+
+class FakeAnalyzers:
+    """Analyzer stand-ins that record peak concurrency and call priorities."""
+
+    def __init__(self, failing_task=None):
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+        self.priorities = set()
+        self.failing_task = failing_task
+
+    async def _call(self, result, task=None):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        self.priorities.add(current_priority())
+        try:
+            await asyncio.sleep(0.001)
+            if task is not None and task == self.failing_task:
+                raise Exception(f"{task} failed: model unavailable")
+            return result
+        finally:
+            self.in_flight -= 1
+
+    def build(self):
+        mood = SimpleNamespace(
+            mood_score=6.0, confidence=0.8, rationale="steady", key_indicators=[], emotional_tone="calm",
+        )
+        topics = SimpleNamespace(
+            topics=["Anxiety"], action_items=["Journal", "Walk"], technique="CBT",
+            summary="Progress.", confidence=0.9,
+        )
+        breakthrough = SimpleNamespace(has_breakthrough=False, primary_breakthrough=None)
+        summary = SimpleNamespace(summary="Journal and walk", character_count=16)
+        return {
+            "mood_analysis": SimpleNamespace(
+                model="gpt-5-nano", analyze_session_mood=lambda **kw: self._call(mood)),
+            "topic_extraction": SimpleNamespace(
+                model="gpt-5-mini", extract_metadata=lambda **kw: self._call(topics, "topic_extraction")),
+            "breakthrough_detection": SimpleNamespace(
+                model="gpt-5", analyze_session=lambda **kw: self._call(breakthrough)),
+            "action_summary": SimpleNamespace(
+                model="gpt-5-nano", summarize_action_items=lambda **kw: self._call(summary)),
+        }
+
+
+def _rows(count, **extra):
+    return [
+        {"id": f"s{i}", "patient_id": None, "session_date": f"2025-01-{i + 1:02d}", "transcript": [], **extra}
+        for i in range(count)
+    ]
+
+
+def _runner(db, analyzers, **kwargs):
+    return Wave1BatchRunner(db=db, analyzers=analyzers.build(), **kwargs)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_batch_bounds_concurrency():
+    """Test 12 sessions never exceed max_concurrency LLM calls in flight."""
+    db = FakeDB(_rows(12))
+    analyzers = FakeAnalyzers()
+    runner = _runner(db, analyzers, max_concurrency=4)
+
+    with patch("app.services.wave1_batch_runner.PipelineLogger"):
+        results = asyncio.run(runner.run([row["id"] for row in db.rows]))
+
+    assert analyzers.peak == 4  # Was 36 with the unbounded gather
+    assert analyzers.calls == 12 * 4  # 3 analyses + action summary per session
+    assert all(result.succeeded for result in results)
+    assert len(db.updates) == 12
+    assert db.updates[0][1]["action_items_summary"] == "Journal and walk"
+
+    print(f"✓ Batch of 12 sessions peaked at {analyzers.peak} concurrent calls")
+
+
+def test_batch_runs_at_background_priority():
+    """Test batch LLM calls run at background priority and failures are per task."""
+    db = FakeDB(_rows(2))
+    analyzers = FakeAnalyzers(failing_task="topic_extraction")
+    runner = _runner(db, analyzers)
+    events = []
+
+    with patch("app.services.wave1_batch_runner.PipelineLogger"):
+        results = asyncio.run(runner.run(["s0", "s1"], on_progress=events.append))
+
+    assert analyzers.priorities == {Priority.BACKGROUND}
+    assert current_priority() == Priority.INTERACTIVE  # Not leaked to the caller
+    assert all("topic_extraction" in result.errors for result in results)
+    assert "mood_score" in db.updates[0][1]  # Other tasks were still written
+    assert "action_items_summary" not in db.updates[0][1]
+    session_events = [e for e in events if e.task == "session"]
+    assert [e.status for e in session_events] == ["complete", "complete"]
+    assert session_events[-1].completed_sessions == 2
+
+    print("✓ Batch runs at background priority with per-task failures")
+
+
+def test_batch_skips_completed_and_streams():
+    """Test completed tasks are skipped unless forced and progress is streamed."""
+    db = FakeDB(_rows(1, mood_analyzed_at="2025-01-01T00:00:00"))
+    analyzers = FakeAnalyzers()
+    runner = _runner(db, analyzers)
+
+    async def collect():
+        return [event async for event in runner.stream(["s0", "missing"])]
+
+    with patch("app.services.wave1_batch_runner.PipelineLogger"):
+        events = asyncio.run(collect())
+
+    statuses = {(e.session_id, e.task): e.status for e in events}
+    assert statuses[("s0", "mood_analysis")] == "skipped"
+    assert statuses[("s0", "topic_extraction")] == "complete"
+    assert statuses[("missing", "session")] == "failed"
+    assert events[-1].completed_sessions == 2
+    assert "mood_score" not in db.updates[0][1]
+
+    print("✓ Completed tasks are skipped and progress is streamed")
+
+
+def test_slow_event_writes_do_not_serialize_sessions():
+    """Test sessions still run concurrently when every pipeline event insert takes 50ms."""
+    from app.utils.pipeline_logger import get_event_writer
+
+    db = FakeDB(_rows(8))
+    for row in db.rows:
+        row["patient_id"] = "patient-wave1-events"
+    analyzers = FakeAnalyzers()
+    runner = _runner(db, analyzers, max_concurrency=8)
+    inserts = []
+
+    def slow_insert(rows):
+        inserts.append(len(rows))
+        time.sleep(0.05)  # A sync Supabase round trip
+        response = MagicMock()
+        response.execute.return_value.data = [{"id": index} for index in range(len(rows))]
+        return response
+
+    events_db = MagicMock()
+    events_db.table.return_value.insert.side_effect = slow_insert
+
+    with patch("app.database.get_supabase", return_value=events_db), \
+            patch.object(runner.aggregates_store, "record_wave1", AsyncMock()):
+        start = time.perf_counter()
+        results = asyncio.run(runner.run([row["id"] for row in db.rows]))
+        elapsed = time.perf_counter() - start
+        assert get_event_writer().flush(10)
+
+    try:
+        os.remove(os.path.join(os.path.dirname(__file__), "..", "logs", "pipeline_patient-wave1-events.log"))
+    except OSError:
+        pass
+
+    events = sum(inserts)
+    assert all(result.succeeded for result in results)
+    assert analyzers.peak == 8
+    assert events >= 8 * 2  # At least start and complete per session
+    assert elapsed < events * 0.05 / 2, (elapsed, events)  # Inline writes would take events * 50ms
+
+    print(f"✓ {events} slow event writes did not serialize 8 sessions ({elapsed:.2f}s)")
+
+
+def test_admin_runner_uses_service_role_client():
+    """Test admin=True resolves the service role client for sessions and aggregates."""
+    admin_db, anon_db = FakeDB(_rows(1)), FakeDB(_rows(1))
+
+    async def admin_client():
+        return admin_db
+
+    async def anon_client():
+        return anon_db
+
+    async def resolve(runner):
+        return await runner._get_db()
+
+    with patch("app.services.wave1_batch_runner.get_async_supabase_admin", admin_client), \
+            patch("app.services.wave1_batch_runner.get_async_supabase", anon_client):
+        admin_runner = Wave1BatchRunner(admin=True, analyzers=FakeAnalyzers().build())
+        assert asyncio.run(resolve(admin_runner)) is admin_db
+        assert admin_runner.aggregates_store.db is admin_db
+
+        assert asyncio.run(resolve(Wave1BatchRunner(analyzers=FakeAnalyzers().build()))) is anon_db
+
+    print("✓ Admin runner uses the service role client")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "=" * 60)
+    print("Wave 1 Batch Runner Tests")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_batch_bounds_concurrency,
+        test_batch_runs_at_background_priority,
+        test_batch_skips_completed_and_streams,
+        test_slow_event_writes_do_not_serialize_sessions,
+        test_admin_runner_uses_service_role_client,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__}: ERROR - {e}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -6,12 +6,13 @@
  * - Top bar with navigation
  * - FIXED: Dark mode support + gray border
  * - FIXED: Accessibility - focus trap, Escape key, focus restoration
+ * - Transcript is lazy-loaded (session list omits it)
  */
 
 import { useRef, useEffect, useState } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { X, ArrowLeft, Star } from 'lucide-react';
-import { Session } from '../lib/types';
+import { Session, TranscriptEntry } from '../lib/types';
 import { getMoodEmoji, fullscreenVariants } from '../lib/utils';
 import { useModalAccessibility } from '../hooks/useModalAccessibility';
 import { useSessionData } from '../contexts/SessionDataContext';
@@ -21,6 +22,7 @@ import { DobbyLogo } from './DobbyLogo';
 import { mapNumericMoodToCategory, formatMoodScore } from '../../../lib/mood-mapper';
 import { renderMoodEmoji } from './SessionIcons';
 import { useTheme } from 'next-themes';
+import { apiClient } from '@/lib/api-client';
 
 // Font families - matching dashboard standard (Inter + Crimson Pro)
 const TYPOGRAPHY = {
@@ -247,6 +249,31 @@ export function SessionDetail({ session, onClose }: SessionDetailProps) {
     setMounted(true);
   }, []);
 
+  // Lazy-load transcript (session list is fetched without transcripts)
+  const [loadedTranscript, setLoadedTranscript] = useState<{ sessionId: string; entries: TranscriptEntry[] } | null>(null);
+  const hasInlineTranscript = !!session?.transcript && session.transcript.length > 0;
+
+  useEffect(() => {
+    if (!session || hasInlineTranscript || loadedTranscript?.sessionId === session.id) return;
+
+    let cancelled = false;
+    apiClient.getSessionTranscript(session.id).then((result) => {
+      if (!cancelled && result.success && result.data) {
+        setLoadedTranscript({ sessionId: session.id, entries: result.data.transcript || [] });
+      }
+    });
+
+    return () => {
+      cancelled = true;
+    };
+  }, [session?.id, hasInlineTranscript, loadedTranscript?.sessionId]);
+
+  const transcript: TranscriptEntry[] = hasInlineTranscript
+    ? session!.transcript!
+    : loadedTranscript && session && loadedTranscript.sessionId === session.id
+      ? loadedTranscript.entries
+      : [];
+
   const isDark = theme === 'dark';
   const toggleTheme = () => setTheme(isDark ? 'light' : 'dark');
 
@@ -363,9 +390,9 @@ export function SessionDetail({ session, onClose }: SessionDetailProps) {
               Session Transcript
             </h3>
 
-            {session.transcript && session.transcript.length > 0 ? (
+            {transcript.length > 0 ? (
               <div className="space-y-6">
-                {session.transcript.map((entry, idx) => (
+                {transcript.map((entry, idx) => (
                   <div key={idx} className="flex gap-4">
                     {/* Timestamp on the left */}
                     <div className="flex-shrink-0 w-[50px] pt-0.5">
@@ -352,6 +352,14 @@ export function usePatientSessions() {
 
         setAnalysisStatus(status.analysis_status);
 
+        // Forget sessions the server reported removed (status.sessions is the merged full list)
+        const currentIds = new Set(status.sessions.map(s => s.session_id));
+        for (const sessionId of Array.from(sessionStatesRef.current.keys())) {
+          if (!currentIds.has(sessionId)) {
+            sessionStatesRef.current.delete(sessionId);
+          }
+        }
+
         // Detect which sessions changed
         const changedSessions = detectChangedSessions(status.sessions, sessionStatesRef.current);
         console.log(`[LoadingOverlay Debug] Detected ${changedSessions.length} changed sessions:`, changedSessions.map(s => s.session_id));
@@ -370,7 +378,7 @@ export function usePatientSessions() {
         }
 
         // Detect roadmap updates (PR #3)
-        const roadmapTimestamp = (status as any).roadmap_updated_at;
+        const roadmapTimestamp = status.roadmap_updated_at;
         const lastRoadmapTimestamp = (sessionStatesRef.current as any)._last_roadmap_timestamp;
 
         console.log(`[Roadmap Debug] Checking roadmap: current=${roadmapTimestamp}, last=${lastRoadmapTimestamp}`);
@@ -46,9 +46,9 @@ export function useWaveCompletionPolling(
       const response = await demoApiClient.getStatus();
 
       if (response) {
-        // Count completed sessions from the sessions array
-        const wave1CompletedCount = response.sessions?.filter(s => s.wave1_complete).length || 0;
-        const wave2CompletedCount = response.sessions?.filter(s => s.wave2_complete).length || 0;
+        // Totals from the server (they cover all sessions, delta poll or not)
+        const wave1CompletedCount = response.wave1_complete;
+        const wave2CompletedCount = response.wave2_complete;
 
         const newStatus: WaveCompletionStatus = {
           wave1Complete: wave1CompletedCount === response.session_count,
@@ -522,9 +522,18 @@ class ApiClient {
   /**
    * Fetch ALL sessions for the current demo patient.
    * Sessions are sorted by date (newest first).
+   * Transcripts are excluded - load them with getSessionTranscript().
    */
   async getAllSessions(): Promise<{ success: boolean; data?: any[]; error?: string }> {
-    const result = await this.get<any[]>('/api/sessions/');
+    const result = await this.get<any[]>('/api/sessions/?fields=wave2');
+    return this.toSimpleResult(result);
+  }
+
+  /**
+   * Fetch only the transcript for a session (lazy-loaded by SessionDetail).
+   */
+  async getSessionTranscript(sessionId: string): Promise<{ success: boolean; data?: { session_id: string; transcript: any[] }; error?: string }> {
+    const result = await this.get<{ session_id: string; transcript: any[] }>(`/api/sessions/${sessionId}/transcript`);
     return this.toSimpleResult(result);
   }
 
@@ -26,6 +26,21 @@ export interface SessionStatus {
   has_transcript: boolean;
   wave1_complete: boolean;
   wave2_complete: boolean;
+
+  // Wave 1 / Wave 2 output (null until the wave completes)
+  topics?: string[] | null;
+  mood_score?: number | null;
+  summary?: string | null;
+  technique?: string | null;
+  action_items?: string[] | null;
+  prose_analysis?: string | null;
+  deep_analysis?: Record<string, unknown> | null;
+  last_wave1_update?: string | null;
+  last_wave2_update?: string | null;
+
+  // Delta polls: heavy fields the server left out because they did not change
+  changed_since_last_poll?: boolean;
+  unchanged_fields?: string[] | null;
 }
 
 export interface DemoStatusResponse {
@@ -45,6 +60,87 @@ export interface DemoStatusResponse {
   processing_state: 'running' | 'stopped' | 'complete' | 'not_started';
   stopped_at_session_id?: string;
   can_resume: boolean;
+
+  // Delta sync: send cursor back as ?since= to receive only changed sessions
+  cursor?: string | null;
+  delta?: boolean;
+  removed_session_ids?: string[];
+}
+
+/**
+ * Apply a delta status response to the last full status.
+ * Changed sessions replace their previous entry (keeping prose/deep analysis
+ * listed in unchanged_fields), removed sessions are dropped. Returns null if
+ * the delta refers to a session the previous status lacks.
+ */
+export function mergeStatusDelta(
+  previous: DemoStatusResponse,
+  delta: DemoStatusResponse
+): DemoStatusResponse | null {
+  const sessions = new Map(previous.sessions.map((session) => [session.session_id, session]));
+
+  for (const session of delta.sessions) {
+    const unchanged = session.unchanged_fields || [];
+    const known = sessions.get(session.session_id);
+    if (unchanged.length > 0 && !known) {
+      return null;
+    }
+
+    const merged: SessionStatus = { ...session };
+    for (const field of unchanged) {
+      (merged as any)[field] = (known as any)[field];
+    }
+    merged.unchanged_fields = null;
+    sessions.set(session.session_id, merged);
+  }
+
+  for (const sessionId of delta.removed_session_ids || []) {
+    sessions.delete(sessionId);
+  }
+
+  return {
+    ...delta,
+    sessions: Array.from(sessions.values()).sort((a, b) => a.session_date.localeCompare(b.session_date)),
+    delta: false,
+    removed_session_ids: [],
+  };
+}
+
+// Last full status per demo token, and the cursor it was built from. Shared
+// by every poller (navigation bar, session list, wave polling): each gets the
+// merged full status, while the server only sends what changed.
+let statusSnapshot: { token: string; cursor: string; status: DemoStatusResponse } | null = null;
+let statusInFlight: { token: string; promise: Promise<DemoStatusResponse | null> } | null = null;
+
+async function fetchStatus(token: string): Promise<DemoStatusResponse | null> {
+  const snapshot = statusSnapshot?.token === token ? statusSnapshot : null;
+  const query = snapshot ? `?since=${encodeURIComponent(snapshot.cursor)}` : '';
+
+  const result = await apiClient.get<DemoStatusResponse>(`/api/demo/status${query}`, {
+    headers: {
+      'X-Demo-Token': token,
+    },
+  });
+
+  if (!result.success) {
+    console.error('[Demo API] ✗ Status check failed:', result.error);
+    return null;
+  }
+
+  // A delta applies to the snapshot it was requested against; a full response
+  // (first poll, or the server rejected the cursor) replaces it
+  const status = result.data.delta && snapshot
+    ? mergeStatusDelta(snapshot.status, result.data)
+    : { ...result.data, delta: false };
+
+  if (!status) {
+    console.warn('[Demo API] Status delta did not match the cached sessions; next poll fetches everything');
+    statusSnapshot = null;
+    return null;
+  }
+
+  statusSnapshot = result.data.cursor ? { token, cursor: result.data.cursor, status } : null;
+  return status;
 }
 
 export const demoApiClient = {
@@ -62,6 +158,7 @@ export const demoApiClient = {
 
     if (result.success) {
       console.log('[Demo API] ✓ Demo initialized:', result.data);
+      demoApiClient.clearStatusCache();
 
       // Save token to localStorage
       demoTokenStorage.store(
@@ -104,6 +201,7 @@ export const demoApiClient = {
 
     if (result.success) {
       console.log('[Demo API] ✓ Demo reset:', result.data);
+      demoApiClient.clearStatusCache();
       return result.data;
     } else {
       console.error('[Demo API] ✗ Demo reset failed:', result.error);
@@ -112,7 +210,9 @@ export const demoApiClient = {
   },
 
   /**
-   * Get demo user status (session count, expiry, etc.)
+   * Get demo user status (session count, expiry, per-session analysis).
+   * Polls after the first send the previous response's cursor and receive
+   * only changed sessions; the returned status is always the full merged view.
    */
   async getStatus(): Promise<DemoStatusResponse | null> {
     const token = demoTokenStorage.getToken();
@@ -121,18 +221,25 @@ export const demoApiClient = {
       return null;
     }
 
-    const result = await apiClient.get<DemoStatusResponse>('/api/demo/status', {
-      headers: {
-        'X-Demo-Token': token,
-      },
+    // Concurrent pollers share one request (and one cursor)
+    if (statusInFlight?.token === token) {
+      return statusInFlight.promise;
+    }
+    const promise = fetchStatus(token).finally(() => {
+      if (statusInFlight?.promise === promise) {
+        statusInFlight = null;
+      }
     });
+    statusInFlight = { token, promise };
+    return promise;
+  },
 
-    if (result.success) {
-      return result.data;
-    } else {
-      console.error('[Demo API] ✗ Status check failed:', result.error);
-      return null;
-    }
+  /**
+   * Forget the cached status and cursor (the next getStatus() fetches everything)
+   */
+  clearStatusCache(): void {
+    statusSnapshot = null;
+    statusInFlight = null;
   },
 
   /**